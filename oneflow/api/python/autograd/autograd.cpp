@@ -99,6 +99,8 @@ Maybe<one::TensorTuple> Grad(const one::TensorTuple& outputs, const one::TensorT
 ONEFLOW_API_PYBIND11_MODULE("autograd", m) {
   m.def("backward", &Backward);
   m.def("grad", &Grad);
+  m.def("is_backward_schedule_cache_enabled", &one::IsBackwardScheduleCacheEnabled);
+  m.def("set_backward_schedule_cache_enabled", &one::SetBackwardScheduleCacheEnabled);
 }
 
 }  // namespace autograd
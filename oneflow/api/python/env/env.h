@@ -18,6 +18,7 @@ limitations under the License.
 
 #include <string>
 #include <google/protobuf/text_format.h>
+#include "oneflow/api/python/env/lazy_init.h"
 #include "oneflow/core/common/protobuf.h"
 #include "oneflow/core/job/cluster.h"
 #include "oneflow/core/job/cluster_instruction.h"
@@ -46,13 +47,29 @@ inline Maybe<void> EnableEagerEnvironment(bool enable_eager_execution) {
   return Maybe<void>::Ok();
 }
 
-inline Maybe<long long> CurrentMachineId() { return GlobalProcessCtx::Rank(); }
+inline Maybe<long long> CurrentMachineId() {
+  JUST(TryInitEnvOnFirstUse());
+  return GlobalProcessCtx::Rank();
+}
 
-inline Maybe<int64_t> GetRank() { return GlobalProcessCtx::Rank(); }
-inline Maybe<size_t> GetWorldSize() { return GlobalProcessCtx::WorldSize(); }
-inline Maybe<size_t> GetNodeSize() { return GlobalProcessCtx::NodeSize(); }
-inline Maybe<size_t> GetLocalRank() { return GlobalProcessCtx::LocalRank(); }
+inline Maybe<int64_t> GetRank() {
+  JUST(TryInitEnvOnFirstUse());
+  return GlobalProcessCtx::Rank();
+}
+inline Maybe<size_t> GetWorldSize() {
+  JUST(TryInitEnvOnFirstUse());
+  return GlobalProcessCtx::WorldSize();
+}
+inline Maybe<size_t> GetNodeSize() {
+  JUST(TryInitEnvOnFirstUse());
+  return GlobalProcessCtx::NodeSize();
+}
+inline Maybe<size_t> GetLocalRank() {
+  JUST(TryInitEnvOnFirstUse());
+  return GlobalProcessCtx::LocalRank();
+}
 inline Maybe<size_t> CudaGetDeviceCount() {
+  JUST(TryInitEnvOnFirstUse());
   return Global<ResourceDesc, ForSession>::Get()->GpuDeviceNum();
 }
 inline Maybe<void> SetFLAGS_alsologtostderr(bool flag) {
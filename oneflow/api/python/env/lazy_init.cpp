@@ -0,0 +1,51 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <pybind11/pybind11.h>
+#include "oneflow/api/python/env/lazy_init.h"
+#include "oneflow/api/python/of_api_registry.h"
+
+namespace py = pybind11;
+
+namespace oneflow {
+
+namespace {
+
+py::object* MutEnvInitializer() {
+  // Leaked on purpose: destroying a python object after the interpreter is finalized crashes.
+  static py::object* initializer = new py::object();
+  return initializer;
+}
+
+void SetEnvInitializer(const py::object& initializer) { *MutEnvInitializer() = initializer; }
+
+}  // namespace
+
+Maybe<void> InitEnvOnFirstUse() {
+  py::gil_scoped_acquire acquire;
+  py::object* initializer = MutEnvInitializer();
+  // No initializer means the env was created eagerly or has already been torn down.
+  if (!*initializer || initializer->is_none()) { return Maybe<void>::Ok(); }
+  (*initializer)();
+  *initializer = py::none();
+  return Maybe<void>::Ok();
+}
+
+ONEFLOW_API_PYBIND11_MODULE("", m) {
+  m.def("SetEnvInitializer", &SetEnvInitializer);
+  m.def("IsEnvInited", []() { return Global<EnvGlobalObjectsScope>::Get() != nullptr; });
+}
+
+}  // namespace oneflow
@@ -0,0 +1,42 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_API_PYTHON_ENV_LAZY_INIT_H_
+#define ONEFLOW_API_PYTHON_ENV_LAZY_INIT_H_
+
+#include "oneflow/core/common/global.h"
+#include "oneflow/core/common/maybe.h"
+#include "oneflow/core/common/util.h"
+
+namespace oneflow {
+
+class EnvGlobalObjectsScope;
+
+// Calls the env initializer registered by `SetEnvInitializer`. The initializer is dropped once
+// it returns, so the env is created at most once.
+Maybe<void> InitEnvOnFirstUse();
+
+// Entry points that may be reached before the env exists (functional api, placement
+// construction) call this. It is a single pointer check once the env has been created.
+inline Maybe<void> TryInitEnvOnFirstUse() {
+  if (OF_PREDICT_FALSE(Global<EnvGlobalObjectsScope>::Get() == nullptr)) {
+    JUST(InitEnvOnFirstUse());
+  }
+  return Maybe<void>::Ok();
+}
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_API_PYTHON_ENV_LAZY_INIT_H_
@@ -0,0 +1,44 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <pybind11/pybind11.h>
+#include "oneflow/api/python/of_api_registry.h"
+#include "oneflow/core/framework/autocast.h"
+#include "oneflow/core/framework/to_string.h"
+
+namespace py = pybind11;
+
+namespace oneflow {
+
+namespace autocast {
+
+ONEFLOW_API_PYBIND11_MODULE("autocast", m) {
+  m.def("is_enabled", &is_enabled);
+  m.def("set_enabled", &set_enabled);
+  m.def("get_autocast_device_type",
+        []() { return *CHECK_JUST(DeviceTag4DeviceType(get_autocast_device_type())); });
+  m.def("set_autocast_device_type", [](const std::string& device_type) {
+    set_autocast_device_type(CHECK_JUST(DeviceType4DeviceTag(device_type)));
+  });
+  m.def("get_autocast_dtype", &get_autocast_dtype);
+  m.def("set_autocast_dtype", &set_autocast_dtype);
+  m.def("is_autocast_cache_enabled", &is_autocast_cache_enabled);
+  m.def("set_autocast_cache_enabled", &set_autocast_cache_enabled);
+  m.def("clear_cache", &clear_cache);
+}
+
+}  // namespace autocast
+
+}  // namespace oneflow
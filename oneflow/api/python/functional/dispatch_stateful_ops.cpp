@@ -186,10 +186,12 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
       });
   m.add_functor("DispatchOfrecordImageDecoder",
                 [](const std::shared_ptr<OpExpr>& op, const std::shared_ptr<Tensor>& input,
-                   const std::string& name, const std::string& color_space) -> Maybe<Tensor> {
+                   const std::string& name, const std::string& color_space,
+                   int64_t cache_size_bytes) -> Maybe<Tensor> {
                   MutableAttrMap attrs;
                   JUST(attrs.SetAttr("name", name));
                   JUST(attrs.SetAttr("color_space", color_space));
+                  JUST(attrs.SetAttr("cache_size_bytes", cache_size_bytes));
                   return OpInterpUtil::Dispatch<Tensor>(*op, {input}, attrs);
                 });
   m.add_functor("DispatchImageDecoderRandomCropResize",
@@ -488,6 +490,46 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
         JUST(OpInterpUtil::Dispatch<TensorTuple>(*op, inputs, attrs));
         return Maybe<void>::Ok();
       });
+  m.add_functor("DispatchIndexedSlicesSgdUpdate",
+                [](const std::shared_ptr<OpExpr>& op, const TensorTuple& inputs,
+                   float weight_decay) -> Maybe<void> {
+                  MutableAttrMap attrs;
+                  JUST(attrs.SetAttr("weight_decay", weight_decay));
+                  JUST(OpInterpUtil::Dispatch<TensorTuple>(*op, inputs, attrs));
+                  return Maybe<void>::Ok();
+                });
+  m.add_functor("DispatchIndexedSlicesMomentumUpdate",
+                [](const std::shared_ptr<OpExpr>& op, const TensorTuple& inputs, float beta,
+                   float weight_decay) -> Maybe<void> {
+                  MutableAttrMap attrs;
+                  JUST(attrs.SetAttr("beta", beta));
+                  JUST(attrs.SetAttr("weight_decay", weight_decay));
+                  JUST(OpInterpUtil::Dispatch<TensorTuple>(*op, inputs, attrs));
+                  return Maybe<void>::Ok();
+                });
+  m.add_functor(
+      "DispatchIndexedSlicesAdamUpdate",
+      [](const std::shared_ptr<OpExpr>& op, const TensorTuple& inputs, float beta1, float beta2,
+         float epsilon, float weight_decay, bool amsgrad, bool do_bias_correction) -> Maybe<void> {
+        MutableAttrMap attrs;
+        JUST(attrs.SetAttr("beta1", beta1));
+        JUST(attrs.SetAttr("beta2", beta2));
+        JUST(attrs.SetAttr("epsilon", epsilon));
+        JUST(attrs.SetAttr("weight_decay", weight_decay));
+        JUST(attrs.SetAttr("amsgrad", amsgrad));
+        JUST(attrs.SetAttr("do_bias_correction", do_bias_correction));
+        JUST(OpInterpUtil::Dispatch<TensorTuple>(*op, inputs, attrs));
+        return Maybe<void>::Ok();
+      });
+  m.add_functor("DispatchIndexedSlicesAdagradUpdate",
+                [](const std::shared_ptr<OpExpr>& op, const TensorTuple& inputs, float epsilon,
+                   float weight_decay) -> Maybe<void> {
+                  MutableAttrMap attrs;
+                  JUST(attrs.SetAttr("epsilon", epsilon));
+                  JUST(attrs.SetAttr("weight_decay", weight_decay));
+                  JUST(OpInterpUtil::Dispatch<TensorTuple>(*op, inputs, attrs));
+                  return Maybe<void>::Ok();
+                });
   m.add_functor("DispatchLambUpdate",
                 [](const std::shared_ptr<OpExpr>& op, const TensorTuple& inputs,
                    float learning_rate, float bias_correction1, float bias_correction2,
@@ -20,6 +20,7 @@ limitations under the License.
 #include <Python.h>
 #include <string>
 
+#include "oneflow/api/python/env/lazy_init.h"
 #include "oneflow/api/python/functional/common.h"
 #include "oneflow/api/python/functional/function_def.h"
 #include "oneflow/api/python/functional/python_arg.h"
@@ -29,6 +30,7 @@ limitations under the License.
 #include "oneflow/core/common/util.h"
 #include "oneflow/core/job/lazy_mode.h"
 #include "oneflow/core/framework/op_interpreter/dispatch_frame.h"
+#include "oneflow/core/profiler/event_recorder.h"
 
 namespace py = pybind11;
 
@@ -119,8 +121,11 @@ std::string get_cur_frame_stack_str() {
 template<typename... SchemaT>
 inline py::object PyFunction(const py::args& args, const py::kwargs& kwargs) {
   static PyFunctionDispatcher<SchemaT...> dispatcher;
+  TryInitEnvOnFirstUse().GetOrThrow();
 
-  if (OF_PREDICT_FALSE(LazyMode::is_enabled())) {
+  if (OF_PREDICT_FALSE(
+          LazyMode::is_enabled()
+          || (profiler::EventRecorder::IsEnabled() && profiler::EventRecorder::WithStack()))) {
     // Create the last 2 frame stack string in Python Interpreter.
     std::string cur_f_str =
         get_cur_frame_stack_str() + "; C API: <func " + dispatcher.func_name() + ">";
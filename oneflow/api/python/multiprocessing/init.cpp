@@ -67,16 +67,27 @@ void set_num_threads(int num) {
     num = cpu_logic_core;
   }
 
+  // CpuDeviceManager::GetDevice resets the device to the manager's thread count, so update both.
+  ep::CpuDeviceManager* cpu_device_manager = dynamic_cast<ep::CpuDeviceManager*>(
+      Global<ep::DeviceManagerRegistry>::Get()->GetDeviceManager(DeviceType::kCPU));
+  cpu_device_manager->SetDeviceNumThreads(num);
   auto cpu_device = std::static_pointer_cast<ep::CpuDevice>(
       Global<ep::DeviceManagerRegistry>::Get()->GetDevice(DeviceType::kCPU, 0));
   cpu_device->SetNumThreads(num);
 }
 
+int get_num_threads() {
+  auto cpu_device = std::static_pointer_cast<ep::CpuDevice>(
+      Global<ep::DeviceManagerRegistry>::Get()->GetDevice(DeviceType::kCPU, 0));
+  return cpu_device->GetNumThreads();
+}
+
 ONEFLOW_API_PYBIND11_MODULE("", m) {
   py::options options;
   options.disable_function_signatures();
   m.def("_multiprocessing_init", &multiprocessing_init);
   m.def("_set_num_threads", &set_num_threads);
+  m.def("_get_num_threads", &get_num_threads);
   options.disable_function_signatures();
 }
 
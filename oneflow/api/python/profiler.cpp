@@ -14,9 +14,11 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
 #include "oneflow/api/python/of_api_registry.h"
 
 #include "oneflow/core/profiler/profiler.h"
+#include "oneflow/core/profiler/event_recorder.h"
 
 namespace py = pybind11;
 
@@ -30,6 +32,35 @@ ONEFLOW_API_PYBIND11_MODULE("profiler", m) {
   m.def("ProfilerStart", []() { profiler::ProfilerStart(); });
 
   m.def("ProfilerStop", []() { profiler::ProfilerStop(); });
+
+  m.def("EnableEventRecorder", [](bool record_shapes, bool with_stack) {
+    profiler::EventRecorder::Get()->Enable(record_shapes, with_stack);
+  });
+
+  m.def("IsEventRecorderEnabled", []() { return profiler::EventRecorder::IsEnabled(); });
+
+  m.def("DisableEventRecorder", []() {
+    py::list ret;
+    for (const auto& event : profiler::EventRecorder::Get()->Disable()) {
+      py::dict item;
+      item["name"] = event.name;
+      item["kind"] = event.kind == profiler::EventKind::kKernel ? "kernel" : "dispatch";
+      item["device"] = event.device;
+      item["input_shapes"] = event.input_shapes;
+      item["input_dtypes"] = event.input_dtypes;
+      item["start_ns"] = event.start_ns;
+      item["end_ns"] = event.end_ns;
+      item["allocated_bytes"] = event.allocated_bytes;
+      item["thread_id"] = event.thread_id;
+      item["stack"] = event.stack;
+      ret.append(item);
+    }
+    return ret;
+  });
+
+  m.def("NowNs", []() { return profiler::EventRecorder::NowNs(); });
+
+  m.def("CurrentThreadId", []() { return profiler::EventRecorder::CurrentThreadId(); });
 }
 
 }  // namespace oneflow
@@ -0,0 +1,81 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <atomic>
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include "oneflow/api/python/of_api_registry.h"
+#include "oneflow/core/common/blocking_counter.h"
+#include "oneflow/core/framework/instructions_builder.h"
+#include "oneflow/core/framework/tensor.h"
+#include "oneflow/core/vm/virtual_machine.h"
+
+namespace py = pybind11;
+
+namespace oneflow {
+
+namespace {
+
+// Completion handle of an asynchronous collective. It is notified by the vm once every output
+// tensor of the collective has been written.
+class CommWork final {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(CommWork);
+  explicit CommWork(int64_t num_tensors)
+      : num_pending_tensors_(num_tensors), blocking_counter_(num_tensors) {}
+  ~CommWork() = default;
+
+  bool IsCompleted() const { return num_pending_tensors_ == 0; }
+
+  Maybe<void> Wait() {
+    return blocking_counter_.WaitUntilCntEqualZero(
+        VirtualMachine::GetPredicatorNoMoreInstructionsFinished());
+  }
+
+  void NotifyTensorReady() {
+    --num_pending_tensors_;
+    blocking_counter_.Decrease();
+  }
+
+ private:
+  std::atomic<int64_t> num_pending_tensors_;
+  BlockingCounter blocking_counter_;
+};
+
+Maybe<CommWork> RecordCommWork(const std::vector<std::shared_ptr<one::Tensor>>& tensors) {
+  const auto& work = std::make_shared<CommWork>(tensors.size());
+  JUST(PhysicalRun([&](InstructionsBuilder* builder) -> Maybe<void> {
+    for (const auto& tensor : tensors) {
+      const auto& local_tensor = JUST(tensor->AsMirroredTensor());
+      // Instructions on a tensor run in order, so this callback fires after the collective wrote
+      // it.
+      JUST(builder->AccessBlobByCallback(
+          local_tensor, [work](uint64_t) { work->NotifyTensorReady(); }, "const"));
+    }
+    return Maybe<void>::Ok();
+  }));
+  return work;
+}
+
+}  // namespace
+
+ONEFLOW_API_PYBIND11_MODULE("comm", m) {
+  py::class_<CommWork, std::shared_ptr<CommWork>>(m, "CommWork")
+      .def("is_completed", &CommWork::IsCompleted)
+      .def("wait", &CommWork::Wait, py::call_guard<py::gil_scoped_release>());
+  m.def("RecordCommWork", &RecordCommWork);
+}
+
+}  // namespace oneflow
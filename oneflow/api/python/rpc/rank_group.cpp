@@ -35,10 +35,20 @@ Maybe<void> CheckCurrentRankGroupConsistency() {
   return Maybe<void>::Ok();
 }
 
+Maybe<RankGroupScope> NewRankGroupScope(const std::vector<int64_t>& ranks) {
+  const auto& rank_group = JUST(RankGroup::New(std::set<int64_t>{ranks.begin(), ranks.end()}));
+  return RankGroupScope::MakeNestedRankGroupScope(rank_group);
+}
+
 }  // namespace
 
 ONEFLOW_API_PYBIND11_MODULE("", m) {
   m.def("check_current_rank_group_consistency", &CheckCurrentRankGroupConsistency);
+
+  // The scope is popped when the returned object is destroyed, scopes must be released in reverse
+  // order of creation.
+  py::class_<RankGroupScope, std::shared_ptr<RankGroupScope>>(m, "RankGroupScope");
+  m.def("NewRankGroupScope", &NewRankGroupScope);
 }
 
 }  // namespace oneflow
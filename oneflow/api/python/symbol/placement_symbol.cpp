@@ -18,6 +18,7 @@ limitations under the License.
 #include <pybind11/operators.h>
 
 #include "oneflow/extension/python/numpy.h"
+#include "oneflow/api/python/env/lazy_init.h"
 #include "oneflow/api/python/framework/size.h"
 #include "oneflow/api/python/of_api_registry.h"
 #include "oneflow/core/control/global_process_ctx.h"
@@ -134,6 +135,7 @@ struct PlacementSymbolExportUtil {
   static Maybe<Symbol<ParallelDesc>> CreateParallelDescSymbol(
       const std::string& type, const py::dict& device_ids,
       const std::shared_ptr<Shape>& hierarchy) {
+    JUST(TryInitEnvOnFirstUse());
     const auto& formated_machine_device_ids = JUST(ParseAndFormatRanks(device_ids));
     return SymbolOf(*JUST(CreateParallelDesc(type, *formated_machine_device_ids, hierarchy)));
   }
@@ -141,6 +143,7 @@ struct PlacementSymbolExportUtil {
   // create Symbol<ParallelDesc> object through given device_type and ranks parameters
   static Maybe<Symbol<ParallelDesc>> CreateParallelDescSymbol(const std::string& type,
                                                               const py::object& ranks) {
+    JUST(TryInitEnvOnFirstUse());
     auto* obj = reinterpret_cast<PyArrayObject*>(PyArray_FromAny(
         ranks.ptr(), nullptr, 0, 0, NPY_ARRAY_DEFAULT | NPY_ARRAY_ENSURECOPY, nullptr));
     if (!obj) { return Error::RuntimeError() << "placement ranks must be int64 array."; }
@@ -152,6 +155,7 @@ struct PlacementSymbolExportUtil {
 
   static Maybe<Symbol<ParallelDesc>> AllDevicePlacement(const std::string& type) {
     static thread_local HashMap<std::string, Symbol<ParallelDesc>> device_tag2placement;
+    JUST(TryInitEnvOnFirstUse());
     CHECK_NOTNULL((Global<ResourceDesc, ForEnv>::Get()));
     JUST(CheckDeviceTag(type));
     auto it = device_tag2placement.find(type);
@@ -0,0 +1,46 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <pybind11/pybind11.h>
+#include "oneflow/api/python/of_api_registry.h"
+#include "oneflow/core/vm/cpu_allocator.h"
+
+namespace py = pybind11;
+
+namespace oneflow {
+namespace vm {
+
+ONEFLOW_API_PYBIND11_MODULE("cpu", m) {
+  m.def("MemoryStats", []() {
+    const CpuAllocatorStats stats = Global<CpuAllocator>::Get()->GetStats();
+    py::dict ret;
+    ret["allocated_bytes"] = stats.allocated_bytes;
+    ret["reserved_bytes"] = stats.reserved_bytes;
+    ret["peak_allocated_bytes"] = stats.peak_allocated_bytes;
+    ret["peak_reserved_bytes"] = stats.peak_reserved_bytes;
+    ret["num_alloc_calls"] = stats.num_alloc_calls;
+    ret["num_free_calls"] = stats.num_free_calls;
+    ret["num_system_allocs"] = stats.num_system_allocs;
+    ret["num_system_frees"] = stats.num_system_frees;
+    return ret;
+  });
+
+  m.def("ResetPeakMemoryStats", []() { Global<CpuAllocator>::Get()->ResetPeakStats(); });
+
+  m.def("EmptyCache", []() { Global<CpuAllocator>::Get()->EmptyCache(); });
+}
+
+}  // namespace vm
+}  // namespace oneflow
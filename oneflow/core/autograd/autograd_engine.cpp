@@ -83,6 +83,150 @@ Maybe<void> CheckConsistentTensorsMeta(const TensorTuple& tensor_tuple) {
   return Maybe<void>::Ok();
 }
 
+bool* MutThreadLocalBackwardScheduleCacheEnabled() {
+  thread_local static bool enabled =
+      ParseBooleanFromEnv("ONEFLOW_AUTOGRAD_CACHE_BACKWARD_SCHEDULE", false);
+  return &enabled;
+}
+
+// The autograd graph of one backward pass. The nodes are numbered in the order they are reached
+// by a breadth first search from the roots, and the edges to the next functions of each node are
+// stored in CSR format.
+struct BackwardGraph {
+  std::vector<FunctionNode*> nodes;
+  std::vector<int32_t> root_indices;
+  std::vector<int32_t> next_offsets;
+  std::vector<int32_t> next_indices;
+  size_t hash_value = 0;
+};
+
+// The backward schedule of a graph structure, i.e. the topological order and the initial
+// dependency count of each node. The op types and output shapes of the nodes are part of the key.
+struct BackwardSchedule {
+  std::vector<std::string> op_type_names;
+  std::vector<int32_t> output_offsets;
+  std::vector<std::shared_ptr<const Shape>> output_shapes;
+  std::vector<DataType> output_data_types;
+  std::vector<int32_t> root_indices;
+  std::vector<int32_t> next_offsets;
+  std::vector<int32_t> next_indices;
+  std::vector<int32_t> order;
+  std::vector<int32_t> dependencies;
+};
+
+static constexpr size_t kMaxCachedBackwardSchedules = 16;
+
+HashMap<size_t, std::shared_ptr<BackwardSchedule>>* MutThreadLocalBackwardScheduleCache() {
+  thread_local static HashMap<size_t, std::shared_ptr<BackwardSchedule>> cache;
+  return &cache;
+}
+
+void NumberBackwardGraph(const std::vector<FunctionNode*>& roots, BackwardGraph* graph) {
+  thread_local static int64_t epoch = 0;
+  epoch += 1;
+  const auto& Visit = [&](FunctionNode* node) -> int32_t {
+    if (node->schedule_epoch() != epoch) {
+      node->set_schedule_index(epoch, graph->nodes.size());
+      graph->nodes.emplace_back(node);
+    }
+    return node->schedule_index();
+  };
+  size_t hash_value = 0;
+  for (FunctionNode* root : roots) {
+    graph->root_indices.emplace_back(Visit(root));
+    HashCombine(&hash_value, graph->root_indices.back());
+  }
+  graph->next_offsets.emplace_back(0);
+  // `graph->nodes` grows while it is being traversed.
+  for (size_t i = 0; i < graph->nodes.size(); ++i) {
+    FunctionNode* node = graph->nodes.at(i);
+    HashCombine(&hash_value, std::hash<std::string>()(node->GetOpTypeName()));
+    for (const auto& tensor_info : node->GetOutputTensorInfos()) {
+      HashCombine(&hash_value, std::hash<Shape>()(*tensor_info.shape()));
+    }
+    for (const auto& next_function : *node->GetNextFunctions()) {
+      graph->next_indices.emplace_back(Visit(next_function.get()));
+      HashCombine(&hash_value, graph->next_indices.back());
+    }
+    graph->next_offsets.emplace_back(graph->next_indices.size());
+  }
+  graph->hash_value = hash_value;
+}
+
+bool IsScheduleOf(const BackwardSchedule& schedule, const BackwardGraph& graph) {
+  if (schedule.op_type_names.size() != graph.nodes.size()
+      || schedule.root_indices != graph.root_indices || schedule.next_offsets != graph.next_offsets
+      || schedule.next_indices != graph.next_indices) {
+    return false;
+  }
+  for (size_t i = 0; i < graph.nodes.size(); ++i) {
+    const FunctionNode* node = graph.nodes.at(i);
+    if (schedule.op_type_names.at(i) != node->GetOpTypeName()) { return false; }
+    const auto& tensor_infos = node->GetOutputTensorInfos();
+    const int32_t offset = schedule.output_offsets.at(i);
+    if (schedule.output_offsets.at(i + 1) - offset != tensor_infos.size()) { return false; }
+    for (size_t j = 0; j < tensor_infos.size(); ++j) {
+      if (*schedule.output_shapes.at(offset + j) != *tensor_infos.at(j).shape()
+          || schedule.output_data_types.at(offset + j) != tensor_infos.at(j).dtype()->data_type()) {
+        return false;
+      }
+    }
+  }
+  return true;
+}
+
+std::shared_ptr<BackwardSchedule> MakeBackwardSchedule(const BackwardGraph& graph) {
+  auto schedule = std::make_shared<BackwardSchedule>();
+  const size_t num_nodes = graph.nodes.size();
+  schedule->op_type_names.reserve(num_nodes);
+  schedule->output_offsets.emplace_back(0);
+  for (const FunctionNode* node : graph.nodes) {
+    schedule->op_type_names.emplace_back(node->GetOpTypeName());
+    for (const auto& tensor_info : node->GetOutputTensorInfos()) {
+      schedule->output_shapes.emplace_back(tensor_info.shape());
+      schedule->output_data_types.emplace_back(tensor_info.dtype()->data_type());
+    }
+    schedule->output_offsets.emplace_back(schedule->output_shapes.size());
+  }
+  schedule->root_indices = graph.root_indices;
+  schedule->next_offsets = graph.next_offsets;
+  schedule->next_indices = graph.next_indices;
+
+  schedule->dependencies.resize(num_nodes, 0);
+  for (int32_t next_index : graph.next_indices) { schedule->dependencies.at(next_index) += 1; }
+  // Kahn's algorithm, which gives the same order as `GraphTask::Apply` when every node is ready.
+  std::vector<int32_t> dependencies = schedule->dependencies;
+  std::vector<bool> is_queued(num_nodes, false);
+  std::queue<int32_t> queue;
+  for (int32_t root_index : graph.root_indices) {
+    if (dependencies.at(root_index) == 0 && !is_queued.at(root_index)) {
+      is_queued.at(root_index) = true;
+      queue.push(root_index);
+    }
+  }
+  schedule->order.reserve(num_nodes);
+  while (!queue.empty()) {
+    const int32_t index = queue.front();
+    queue.pop();
+    schedule->order.emplace_back(index);
+    for (int32_t i = graph.next_offsets.at(index); i < graph.next_offsets.at(index + 1); ++i) {
+      const int32_t next_index = graph.next_indices.at(i);
+      if (--dependencies.at(next_index) == 0) { queue.push(next_index); }
+    }
+  }
+  return schedule;
+}
+
+std::shared_ptr<BackwardSchedule> GetOrMakeBackwardSchedule(const BackwardGraph& graph) {
+  auto* cache = MutThreadLocalBackwardScheduleCache();
+  const auto& it = cache->find(graph.hash_value);
+  if (it != cache->end() && IsScheduleOf(*it->second, graph)) { return it->second; }
+  if (cache->size() >= kMaxCachedBackwardSchedules) { cache->clear(); }
+  const auto& schedule = MakeBackwardSchedule(graph);
+  (*cache)[graph.hash_value] = schedule;
+  return schedule;
+}
+
 }  // namespace
 
 Maybe<void> AutogradEngine::RunBackwardAndSaveGrads4LeafTensorIf(const TensorTuple& outputs,
@@ -444,6 +588,28 @@ Maybe<void> GraphTask::Apply(bool save_grad_for_leaf) {
   return Maybe<void>::Ok();
 }
 
+Maybe<void> GraphTask::ApplyWithCachedSchedule(bool save_grad_for_leaf) {
+  BackwardGraph graph;
+  NumberBackwardGraph(roots_, &graph);
+  const auto& schedule = GetOrMakeBackwardSchedule(graph);
+  std::vector<int32_t> dependencies = schedule->dependencies;
+  for (int32_t index : schedule->order) {
+    // The node is skipped like in `Apply` if one of the nodes before it was not ready to run.
+    if (dependencies.at(index) != 0) { continue; }
+    FunctionNode* node = graph.nodes.at(index);
+    if (/*bool not_ready_to_apply=*/!(JUST(node->Apply(create_graph_)))) { continue; }
+    if (save_grad_for_leaf) { JUST(node->AccGrad4LeafTensor(create_graph_)); }
+    JUST(node->AccGrad4RetainGradTensor());
+    node->ReleaseOutTensorArgs();
+    if (!retain_graph_) { node->ReleaseData(); }
+
+    for (int32_t i = graph.next_offsets.at(index); i < graph.next_offsets.at(index + 1); ++i) {
+      dependencies.at(graph.next_indices.at(i)) -= 1;
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
 Maybe<void> GraphAutogradEngine::RunBackwardAndSaveGrads4LeafTensor(const TensorTuple& outputs,
                                                                     const TensorTuple& out_grads,
                                                                     bool retain_graph,
@@ -452,8 +618,12 @@ Maybe<void> GraphAutogradEngine::RunBackwardAndSaveGrads4LeafTensor(const Tensor
     JUST(JUST(outputs.at(i)->current_grad())->PushPartialTensor(out_grads.at(i)));
   }
   GraphTask graph_task(outputs, retain_graph, create_graph);
-  JUST(graph_task.ComputeDependencies());
-  JUST(graph_task.Apply(/*save_grad_for_leaf=*/true));
+  if (IsBackwardScheduleCacheEnabled()) {
+    JUST(graph_task.ApplyWithCachedSchedule(/*save_grad_for_leaf=*/true));
+  } else {
+    JUST(graph_task.ComputeDependencies());
+    JUST(graph_task.Apply(/*save_grad_for_leaf=*/true));
+  }
   return Maybe<void>::Ok();
 }
 
@@ -511,6 +681,13 @@ AutogradEngine* GetThreadLocalAutogradEngine() {
   return &autograd_engine;
 }
 
+bool IsBackwardScheduleCacheEnabled() { return *MutThreadLocalBackwardScheduleCacheEnabled(); }
+
+void SetBackwardScheduleCacheEnabled(bool enabled) {
+  *MutThreadLocalBackwardScheduleCacheEnabled() = enabled;
+  if (!enabled) { MutThreadLocalBackwardScheduleCache()->clear(); }
+}
+
 Maybe<void> AddAccumulateFunctionNode(const std::shared_ptr<Tensor>& tensor) {
   auto backward_fn =
       std::make_shared<std::function<Maybe<void>(const TensorTuple&, TensorTuple*, bool)>>(
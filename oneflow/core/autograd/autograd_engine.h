@@ -49,6 +49,16 @@ class FunctionNode {
     return next_functions_;
   }
   const std::string& GetOpTypeName() const { return op_type_name_; }
+  const std::vector<TensorInfo>& GetOutputTensorInfos() const { return output_tensor_infos_; }
+
+  // The index of this node in the backward pass numbered `schedule_epoch`, used by `GraphTask`
+  // to number the nodes without a hash map.
+  int64_t schedule_epoch() const { return schedule_epoch_; }
+  int32_t schedule_index() const { return schedule_index_; }
+  void set_schedule_index(int64_t epoch, int32_t index) {
+    schedule_epoch_ = epoch;
+    schedule_index_ = index;
+  }
 
  protected:
   explicit FunctionNode(const std::string& op_type_name)
@@ -57,6 +67,8 @@ class FunctionNode {
 
   const std::string op_type_name_;
   std::shared_ptr<std::vector<std::shared_ptr<FunctionNode>>> next_functions_;
+  int64_t schedule_epoch_ = -1;
+  int32_t schedule_index_ = -1;
 
   std::vector<std::shared_ptr<AutogradMeta>> input_meta_data_;
   std::vector<std::shared_ptr<AutogradMeta>> output_meta_data_;
@@ -171,6 +183,9 @@ class GraphTask final {
   Maybe<void> ComputeDependencies();
   Maybe<void> ComputeDependenciesAndPruneNode(const TensorTuple& inputs);
   Maybe<void> Apply(bool save_grad_for_leaf);
+  // Same as `ComputeDependencies` followed by `Apply`, but the topological order and the
+  // dependency counts are cached and replayed for structurally identical autograd graphs.
+  Maybe<void> ApplyWithCachedSchedule(bool save_grad_for_leaf);
 
  private:
   bool retain_graph_;
@@ -206,6 +221,11 @@ class GraphAutogradEngine final : public AutogradEngine {
 
 AutogradEngine* GetThreadLocalAutogradEngine();
 
+// Whether `backward()` caches the backward schedule, thread local. The default value is read from
+// the env var `ONEFLOW_AUTOGRAD_CACHE_BACKWARD_SCHEDULE`.
+bool IsBackwardScheduleCacheEnabled();
+void SetBackwardScheduleCacheEnabled(bool enabled);
+
 Maybe<void> AddAccumulateFunctionNode(const std::shared_ptr<Tensor>& tensor);
 
 }  // namespace one
@@ -97,6 +97,8 @@ class TensorInfo final {
   explicit TensorInfo(const Tensor& tensor);
 
   Maybe<Tensor> zeros() const;
+  const std::shared_ptr<const Shape>& shape() const { return shape_; }
+  Symbol<DType> dtype() const { return dtype_; }
   Optional<Symbol<ParallelDesc>> placement() const { return parallel_desc_; }
   Optional<Symbol<NdSbp>> sbp() const { return nd_sbp_; }
 
@@ -23,7 +23,6 @@ limitations under the License.
 #include "oneflow/core/common/container_util.h"
 #include "oneflow/core/functional/functional.h"
 #include "oneflow/core/functional/functional_api.yaml.h"
-#if CUDA_VERSION >= 11040
 
 namespace oneflow {
 
@@ -184,4 +183,3 @@ REGISTER_OP_EXPR_GRAD_FUNCTION("cublas_fused_mlp", CublasFusedMLP);
 }  // namespace one
 
 }  // namespace oneflow
-#endif  // CUDA_VERSION >= 11040
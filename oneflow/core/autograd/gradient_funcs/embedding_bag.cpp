@@ -0,0 +1,104 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/op_expr_grad_function.h"
+#include "oneflow/core/framework/op_expr.h"
+#include "oneflow/core/framework/op_interpreter/op_interpreter_util.h"
+#include "oneflow/core/functional/functional.h"
+
+namespace oneflow {
+namespace one {
+
+struct EmbeddingBagCaptureState : public AutoGradCaptureState {
+  std::string mode;
+  bool weight_requires_grad;
+  bool per_sample_weights_requires_grad;
+  bool has_per_sample_weights;
+};
+
+class EmbeddingBag : public OpExprGradFunction<EmbeddingBagCaptureState> {
+ public:
+  Maybe<void> Init(const OpExpr& op) override;
+  Maybe<void> Capture(EmbeddingBagCaptureState* ctx, const TensorTuple& inputs,
+                      const TensorTuple& outputs, const AttrMap& attrs) const override;
+  Maybe<void> Apply(const EmbeddingBagCaptureState* ctx, const TensorTuple& out_grads,
+                    TensorTuple* in_grads) const override;
+
+ private:
+  AttrMap base_attrs_;
+};
+
+Maybe<void> EmbeddingBag::Init(const OpExpr& op) {
+  const UserOpExpr* fw_op_expr = dynamic_cast<const UserOpExpr*>(&op);
+  CHECK_NOTNULL_OR_RETURN(fw_op_expr);
+  base_attrs_ = MakeAttrMapFromUserOpConf(fw_op_expr->proto());
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> EmbeddingBag::Capture(EmbeddingBagCaptureState* ctx, const TensorTuple& inputs,
+                                  const TensorTuple& outputs, const AttrMap& attrs) const {
+  ctx->has_per_sample_weights = inputs.size() == 4;
+  ctx->weight_requires_grad = inputs.at(0)->requires_grad();
+  ctx->per_sample_weights_requires_grad =
+      ctx->has_per_sample_weights && inputs.at(3)->requires_grad();
+  if (!ctx->weight_requires_grad && !ctx->per_sample_weights_requires_grad) {
+    return Maybe<void>::Ok();
+  }
+
+  ctx->SaveTensorForBackward(inputs.at(0));  // weight
+  ctx->SaveTensorForBackward(inputs.at(1));  // indices
+  ctx->SaveTensorForBackward(inputs.at(2));  // offsets
+  if (ctx->has_per_sample_weights) { ctx->SaveTensorForBackward(inputs.at(3)); }
+
+  ComposedAttrMap composed_attrs(attrs, base_attrs_);
+  ctx->mode = JUST(composed_attrs.GetAttr<std::string>("mode"));
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> EmbeddingBag::Apply(const EmbeddingBagCaptureState* ctx, const TensorTuple& out_grads,
+                                TensorTuple* in_grads) const {
+  if (!ctx->weight_requires_grad && !ctx->per_sample_weights_requires_grad) {
+    return Maybe<void>::Ok();
+  }
+  CHECK_EQ_OR_RETURN(out_grads.size(), 1);
+  const auto& weight = ctx->SavedTensors().at(0);
+  const auto& indices = ctx->SavedTensors().at(1);
+  const auto& offsets = ctx->SavedTensors().at(2);
+  in_grads->resize(ctx->has_per_sample_weights ? 4 : 3);
+  if (ctx->weight_requires_grad) {
+    Optional<Tensor> per_sample_weights;
+    if (ctx->has_per_sample_weights) { per_sample_weights = ctx->SavedTensors().at(3); }
+    // Per-lookup gradient rows are reduced into the table with the same segment sum as gather.
+    const auto& embedding_grad = JUST(functional::EmbeddingBagGrad(
+        out_grads.at(0), weight, indices, offsets, per_sample_weights, ctx->mode));
+    in_grads->at(0) = JUST(functional::UnsortedSegmentSumLike(embedding_grad, indices, weight, 0));
+  }
+  if (ctx->per_sample_weights_requires_grad) {
+    // per_sample_weights are only supported by mode "sum", where out[bag] sums
+    // per_sample_weights[i] * weight[indices[i]], so the gradient of per_sample_weights[i] is
+    // the dot product of the gradient of its bag with the row it scales.
+    const auto& bag_grad = JUST(functional::EmbeddingBagGrad(out_grads.at(0), weight, indices,
+                                                             offsets, NullOpt, ctx->mode));
+    const auto& rows = JUST(functional::Gather(weight, indices, 0));
+    in_grads->at(3) =
+        JUST(functional::ReduceSum(JUST(functional::Mul(bag_grad, rows)), {1}, false));
+  }
+  return Maybe<void>::Ok();
+}
+
+REGISTER_OP_EXPR_GRAD_FUNCTION("embedding_bag", EmbeddingBag);
+
+}  // namespace one
+}  // namespace oneflow
@@ -0,0 +1,107 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/op_expr_grad_function.h"
+#include "oneflow/core/functional/functional.h"
+
+namespace oneflow {
+namespace one {
+
+struct GroupNormCaptureState : public AutoGradCaptureState {
+  bool x_requires_grad = false;
+  bool gamma_requires_grad = false;
+  bool beta_requires_grad = false;
+
+  size_t x_index = 0;
+  size_t mean_index = 1;
+  size_t inv_variance_index = 2;
+  size_t gamma_saved_index = 3;
+  bool has_saved_gamma = false;
+};
+
+// y, mean, inv_variance = group_norm(x, [gamma], [beta], num_groups=1, epsilon=1e-5)
+class GroupNorm : public OpExprGradFunction<GroupNormCaptureState> {
+ public:
+  Maybe<void> Init(const OpExpr& op) override;
+
+  Maybe<void> Capture(GroupNormCaptureState* ctx, const TensorTuple& inputs,
+                      const TensorTuple& outputs, const AttrMap& attrs) const override;
+
+  Maybe<void> Apply(const GroupNormCaptureState* ctx, const TensorTuple& out_grads,
+                    TensorTuple* in_grads) const override;
+
+ private:
+  int32_t gamma_index_ = -1;
+  int32_t beta_index_ = -1;
+};
+
+Maybe<void> GroupNorm::Init(const OpExpr& op) {
+  const auto* fw_op_expr = dynamic_cast<const UserOpExpr*>(&op);
+  CHECK_NOTNULL_OR_RETURN(fw_op_expr);
+  gamma_index_ = fw_op_expr->input_arg_tuple()->TensorTupleIndex4ArgNameAndIndex("gamma", 0);
+  beta_index_ = fw_op_expr->input_arg_tuple()->TensorTupleIndex4ArgNameAndIndex("beta", 0);
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> GroupNorm::Capture(GroupNormCaptureState* ctx, const TensorTuple& inputs,
+                               const TensorTuple& outputs, const AttrMap& attrs) const {
+  CHECK_EQ_OR_RETURN(inputs.size(), 1 + (gamma_index_ >= 0) + (beta_index_ >= 0));
+  CHECK_EQ_OR_RETURN(outputs.size(), 3);
+  ctx->x_requires_grad = inputs.at(0)->requires_grad();
+  ctx->gamma_requires_grad = gamma_index_ >= 0 && inputs.at(gamma_index_)->requires_grad();
+  ctx->beta_requires_grad = beta_index_ >= 0 && inputs.at(beta_index_)->requires_grad();
+  if (!(ctx->x_requires_grad || ctx->gamma_requires_grad || ctx->beta_requires_grad)) {
+    return Maybe<void>::Ok();
+  }
+  ctx->x_index = ctx->SaveTensorForBackward(inputs.at(0));
+  ctx->mean_index = ctx->SaveTensorForBackward(outputs.at(1));
+  ctx->inv_variance_index = ctx->SaveTensorForBackward(outputs.at(2));
+  ctx->has_saved_gamma = ctx->x_requires_grad && gamma_index_ >= 0;
+  if (ctx->has_saved_gamma) {
+    ctx->gamma_saved_index = ctx->SaveTensorForBackward(inputs.at(gamma_index_));
+  }
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> GroupNorm::Apply(const GroupNormCaptureState* ctx, const TensorTuple& out_grads,
+                             TensorTuple* in_grads) const {
+  CHECK_EQ_OR_RETURN(out_grads.size(), 3);
+  in_grads->resize(1 + (gamma_index_ >= 0) + (beta_index_ >= 0));
+  const auto& saved_tensors = ctx->SavedTensors();
+  const auto& dy = out_grads.at(0);
+  const auto& x = saved_tensors.at(ctx->x_index);
+  const auto& mean = saved_tensors.at(ctx->mean_index);
+  const auto& inv_variance = saved_tensors.at(ctx->inv_variance_index);
+
+  if (ctx->gamma_requires_grad || ctx->beta_requires_grad) {
+    const auto& results = JUST(functional::GroupNormParamGrad(dy, x, mean, inv_variance));
+    if (ctx->gamma_requires_grad) { in_grads->at(gamma_index_) = results->at(0); }
+    if (ctx->beta_requires_grad) { in_grads->at(beta_index_) = results->at(1); }
+  }
+  if (ctx->x_requires_grad) {
+    if (ctx->has_saved_gamma) {
+      const auto& gamma = saved_tensors.at(ctx->gamma_saved_index);
+      in_grads->at(0) = JUST(functional::GroupNormGrad(dy, x, mean, inv_variance, gamma));
+    } else {
+      in_grads->at(0) = JUST(functional::GroupNormGrad(dy, x, mean, inv_variance, NullOpt));
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
+REGISTER_OP_EXPR_GRAD_FUNCTION("group_norm", GroupNorm);
+
+}  // namespace one
+}  // namespace oneflow
@@ -0,0 +1,104 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/attr_map.h"
+#include "oneflow/core/framework/op_expr_grad_function.h"
+#include "oneflow/core/functional/functional.h"
+
+namespace oneflow {
+namespace one {
+
+struct ScaledDotProductAttentionCaptureState : public AutoGradCaptureState {
+  bool query_requires_grad = false;
+  bool key_requires_grad = false;
+  bool value_requires_grad = false;
+  bool has_attn_mask = false;
+
+  double scale = 1.0;
+  float dropout_rate = 0.0f;
+  bool is_causal = false;
+};
+
+// out, softmax_lse, rng_seed =
+//   scaled_dot_product_attention(query, key, value, [attn_mask], scale, dropout_rate, is_causal)
+// attn_mask is an additive constant and gets no gradient.
+class ScaledDotProductAttention : public OpExprGradFunction<ScaledDotProductAttentionCaptureState> {
+ public:
+  Maybe<void> Init(const OpExpr& op) override {
+    const auto* fw_op_expr = dynamic_cast<const UserOpExpr*>(&op);
+    CHECK_NOTNULL_OR_RETURN(fw_op_expr);
+    base_attrs_ = MakeAttrMapFromUserOpConf(fw_op_expr->proto());
+    return Maybe<void>::Ok();
+  }
+
+  Maybe<void> Capture(ScaledDotProductAttentionCaptureState* ctx, const TensorTuple& inputs,
+                      const TensorTuple& outputs, const AttrMap& attrs) const override {
+    CHECK_OR_RETURN(inputs.size() == 3 || inputs.size() == 4);
+    CHECK_EQ_OR_RETURN(outputs.size(), 3);
+    ctx->query_requires_grad = inputs.at(0)->requires_grad();
+    ctx->key_requires_grad = inputs.at(1)->requires_grad();
+    ctx->value_requires_grad = inputs.at(2)->requires_grad();
+    if (!(ctx->query_requires_grad || ctx->key_requires_grad || ctx->value_requires_grad)) {
+      return Maybe<void>::Ok();
+    }
+    ComposedAttrMap composed_attrs(attrs, base_attrs_);
+    ctx->scale = JUST(composed_attrs.GetAttr<double>("scale"));
+    ctx->dropout_rate = JUST(composed_attrs.GetAttr<float>("dropout_rate"));
+    ctx->is_causal = JUST(composed_attrs.GetAttr<bool>("is_causal"));
+    ctx->has_attn_mask = inputs.size() == 4;
+    ctx->SaveTensorForBackward(inputs.at(0));   // query
+    ctx->SaveTensorForBackward(inputs.at(1));   // key
+    ctx->SaveTensorForBackward(inputs.at(2));   // value
+    ctx->SaveTensorForBackward(outputs.at(0));  // out
+    ctx->SaveTensorForBackward(outputs.at(1));  // softmax_lse
+    ctx->SaveTensorForBackward(outputs.at(2));  // rng_seed
+    if (ctx->has_attn_mask) { ctx->SaveTensorForBackward(inputs.at(3)); }
+    return Maybe<void>::Ok();
+  }
+
+  Maybe<void> Apply(const ScaledDotProductAttentionCaptureState* ctx, const TensorTuple& out_grads,
+                    TensorTuple* in_grads) const override {
+    CHECK_EQ_OR_RETURN(out_grads.size(), 3);
+    in_grads->resize(ctx->has_attn_mask ? 4 : 3);
+    if (!(ctx->query_requires_grad || ctx->key_requires_grad || ctx->value_requires_grad)) {
+      return Maybe<void>::Ok();
+    }
+    const auto& saved_tensors = ctx->SavedTensors();
+    const auto& Grad = [&](const Optional<one::Tensor>& attn_mask) {
+      return functional::ScaledDotProductAttentionGrad(
+          out_grads.at(0), saved_tensors.at(0), saved_tensors.at(1), saved_tensors.at(2),
+          saved_tensors.at(3), saved_tensors.at(4), saved_tensors.at(5), ctx->scale,
+          ctx->dropout_rate, ctx->is_causal, attn_mask);
+    };
+    std::shared_ptr<TensorTuple> results;
+    if (ctx->has_attn_mask) {
+      results = JUST(Grad(saved_tensors.at(6)));
+    } else {
+      results = JUST(Grad(NullOpt));
+    }
+    if (ctx->query_requires_grad) { in_grads->at(0) = results->at(0); }
+    if (ctx->key_requires_grad) { in_grads->at(1) = results->at(1); }
+    if (ctx->value_requires_grad) { in_grads->at(2) = results->at(2); }
+    return Maybe<void>::Ok();
+  }
+
+ private:
+  AttrMap base_attrs_;
+};
+
+REGISTER_OP_EXPR_GRAD_FUNCTION("scaled_dot_product_attention", ScaledDotProductAttention);
+
+}  // namespace one
+}  // namespace oneflow
@@ -21,6 +21,7 @@ limitations under the License.
 #include "oneflow/core/common/data_type.h"
 #include "oneflow/core/common/data_type_seq.h"
 #include "oneflow/core/common/balanced_splitter.h"
+#include "oneflow/core/common/container_util.h"
 #include "oneflow/core/rpc/include/global_process_ctx.h"
 #include "oneflow/core/thread/thread_manager.h"
 #include "oneflow/core/job/eager_nccl_comm_manager.h"
@@ -61,6 +62,73 @@ void VecAdd(size_t size, T* out, const T* in0, const T* in1) {
   });
 }
 
+// Reduce switches from the binomial tree to reduce-scatter + gather above this buffer size.
+constexpr size_t kBinomialTreeReduceMaxBytes = 1 << 20;
+
+Maybe<int64_t> GetCurrentParallelId(Symbol<ParallelDesc> parallel_desc) {
+  const auto& opt_parallel_id = JUST(GetParallelId4CurrentProcessCtx(parallel_desc));
+  CHECK_OR_RETURN(opt_parallel_id->has_value());
+  return JUST(*opt_parallel_id);
+}
+
+Maybe<int64_t> GetRootParallelId(const ParallelDesc& parallel_desc, int64_t root) {
+  CHECK_EQ_OR_RETURN(parallel_desc.parallel_num(), parallel_desc.sorted_machine_ids().size());
+  return parallel_desc.ParallelId4MachineDeviceId(root, GlobalProcessCtx::LocalRank(root));
+}
+
+// Binomial trees are built on parallel ids relative to the root, so relative id 0 is the root and
+// the subtree of relative id r covers the consecutive ids [r, r + BinomialSubtreeSize(r)).
+int64_t BinomialSubtreeSize(int64_t relative_id, int64_t parallel_num) {
+  if (relative_id == 0) { return parallel_num; }
+  return std::min(relative_id & -relative_id, parallel_num - relative_id);
+}
+
+// Children of relative id r are r + mask for mask = BinomialTopChildMask(r), ..., 2, 1.
+int64_t BinomialTopChildMask(int64_t relative_id, int64_t parallel_num) {
+  if (relative_id != 0) { return (relative_id & -relative_id) >> 1; }
+  int64_t mask = 1;
+  while ((mask << 1) < parallel_num) { mask <<= 1; }
+  return mask;
+}
+
+Maybe<int64_t> MachineId4RelativeId(const ParallelDesc& parallel_desc, int64_t relative_id,
+                                    int64_t root_parallel_id) {
+  return parallel_desc.MachineId4ParallelId((relative_id + root_parallel_id)
+                                            % parallel_desc.parallel_num());
+}
+
+using RankBuffers = HashMap<int64_t, std::pair<void*, size_t>>;
+
+// Sends and receives all the buffers in one round, so that transfers to different ranks overlap.
+Maybe<void> ExchangeWithRanks(const TransportToken& transport_token,
+                              const RankBuffers& send_buffers, const RankBuffers& recv_buffers) {
+  if (send_buffers.empty() && recv_buffers.empty()) { return Maybe<void>::Ok(); }
+  const auto& PrepareBuffer = [](const RankBuffers& buffers) {
+    return [&buffers](int64_t rank, void** buffer, std::size_t* size,
+                      std::function<void()>* Cb) -> Maybe<void> {
+      const auto& pair = JUST(MapAt(buffers, rank));
+      *buffer = pair.first;
+      *size = pair.second;
+      *Cb = [] {};
+      return Maybe<void>::Ok();
+    };
+  };
+  NaiveAsyncTransportCtx ctx(transport_token, PrepareBuffer(send_buffers),
+                             PrepareBuffer(recv_buffers));
+  for (const auto& pair : send_buffers) {
+    if (pair.second.second > 0) {
+      JUST(TransportUtil::SendDataToRank(pair.first, transport_token, &ctx));
+    }
+  }
+  for (const auto& pair : recv_buffers) {
+    if (pair.second.second > 0) {
+      JUST(TransportUtil::ReceiveDataFromRank(pair.first, transport_token, &ctx));
+    }
+  }
+  JUST_MSG(ctx.WaitDone(), kAsymmetricCodeErrorMsg);
+  return Maybe<void>::Ok();
+}
+
 }  // namespace
 
 template<typename T, ReduceType reduce_type>
@@ -354,6 +422,63 @@ template<typename T>
 struct DtypeReduce<T, kSum> {
   static Maybe<void> Call(const void* void_in, void* void_out, size_t elem_cnt, int64_t root,
                           Symbol<ParallelDesc> parallel_desc) {
+    // Small buffers are latency bound: the tree needs log(n) steps where the ring needs 2(n - 1).
+    if (elem_cnt * sizeof(T) <= kBinomialTreeReduceMaxBytes) {
+      return BinomialTreeReduce(void_in, void_out, elem_cnt, root, parallel_desc);
+    }
+    return RingReduce(void_in, void_out, elem_cnt, root, parallel_desc);
+  }
+
+ private:
+  static Maybe<void> BinomialTreeReduce(const void* void_in, void* void_out, size_t elem_cnt,
+                                        int64_t root, Symbol<ParallelDesc> parallel_desc) {
+    const T* in = reinterpret_cast<const T*>(void_in);
+    T* out = reinterpret_cast<T*>(void_out);
+    const int64_t parallel_num = parallel_desc->parallel_num();
+    const int64_t root_parallel_id = JUST(GetRootParallelId(*parallel_desc, root));
+    const int64_t relative_id =
+        (JUST(GetCurrentParallelId(parallel_desc)) - root_parallel_id + parallel_num)
+        % parallel_num;
+    const bool has_child = relative_id + 1 < parallel_num && (relative_id & 1) == 0;
+
+    // void_out is only used on rank root and ignored for other ranks.
+    std::unique_ptr<T[]> acc_buffer;
+    T* acc = nullptr;
+    if (relative_id == 0) {
+      if (void_in != void_out) { std::memcpy(out, in, elem_cnt * sizeof(T)); }
+      acc = out;
+    } else if (has_child) {
+      acc_buffer = std::make_unique<T[]>(elem_cnt);
+      std::memcpy(acc_buffer.get(), in, elem_cnt * sizeof(T));
+      acc = acc_buffer.get();
+    } else {
+      // Leaves send their input as is.
+      acc = const_cast<T*>(in);
+    }
+    if (parallel_num == 1 || elem_cnt == 0) { return Maybe<void>::Ok(); }
+
+    auto recv_buffer = std::make_unique<T[]>(has_child ? elem_cnt : 0);
+    TransportToken transport_token =
+        JUST(TransportToken::NewTransportToken(kTransportTokenTypeData));
+    for (int64_t mask = 1; mask < parallel_num; mask <<= 1) {
+      if (relative_id & mask) {
+        int64_t parent_rank =
+            JUST(MachineId4RelativeId(*parallel_desc, relative_id - mask, root_parallel_id));
+        JUST(ExchangeWithRanks(transport_token, {{parent_rank, {acc, elem_cnt * sizeof(T)}}}, {}));
+        break;
+      }
+      if (relative_id + mask >= parallel_num) { continue; }
+      int64_t child_rank =
+          JUST(MachineId4RelativeId(*parallel_desc, relative_id + mask, root_parallel_id));
+      JUST(ExchangeWithRanks(transport_token, {},
+                             {{child_rank, {recv_buffer.get(), elem_cnt * sizeof(T)}}}));
+      VecAdd(elem_cnt, acc, acc, recv_buffer.get());
+    }
+    return Maybe<void>::Ok();
+  }
+
+  static Maybe<void> RingReduce(const void* void_in, void* void_out, size_t elem_cnt, int64_t root,
+                                Symbol<ParallelDesc> parallel_desc) {
     const T* in = reinterpret_cast<const T*>(void_in);
     T* out = reinterpret_cast<T*>(void_out);
 
@@ -480,6 +605,143 @@ Maybe<void> Reduce<DeviceType::kCPU>(const void* in, void* out, size_t elem_cnt,
   return SwitchDtypeReduce(SwitchCase(dtype, reduce_type), in, out, elem_cnt, root, parallel_desc);
 }
 
+template<>
+Maybe<void> AllToAll<DeviceType::kCPU>(const void* in, void* out, size_t elem_cnt, DataType dtype,
+                                       Symbol<ParallelDesc> parallel_desc, ep::Stream* stream) {
+  CHECK_OR_RETURN(IsPODDataType(dtype));
+  CHECK_NE_OR_RETURN(in, out) << "in-place all_to_all is not supported";
+  const int64_t parallel_num = parallel_desc->parallel_num();
+  CHECK_EQ_OR_RETURN(parallel_num, parallel_desc->sorted_machine_ids().size());
+  const size_t chunk_size = elem_cnt * GetSizeOfDataType(dtype);
+  const char* char_in = reinterpret_cast<const char*>(in);
+  char* char_out = reinterpret_cast<char*>(out);
+  const int64_t parallel_id = JUST(GetCurrentParallelId(parallel_desc));
+  std::memcpy(char_out + parallel_id * chunk_size, char_in + parallel_id * chunk_size, chunk_size);
+  if (chunk_size == 0) { return Maybe<void>::Ok(); }
+  TransportToken transport_token = JUST(TransportToken::NewTransportToken(kTransportTokenTypeData));
+  // Pairwise exchange: in step i every rank sends to the i-th next rank and receives from the i-th
+  // previous one, so each step is a permutation and no rank is flooded by all the others at once.
+  for (int64_t i = 1; i < parallel_num; ++i) {
+    int64_t dst_parallel_id = (parallel_id + i) % parallel_num;
+    int64_t src_parallel_id = (parallel_id - i + parallel_num) % parallel_num;
+    int64_t dst_rank = JUST(parallel_desc->MachineId4ParallelId(dst_parallel_id));
+    int64_t src_rank = JUST(parallel_desc->MachineId4ParallelId(src_parallel_id));
+    JUST(ExchangeWithRanks(
+        transport_token,
+        {{dst_rank, {const_cast<char*>(char_in) + dst_parallel_id * chunk_size, chunk_size}}},
+        {{src_rank, {char_out + src_parallel_id * chunk_size, chunk_size}}}));
+  }
+  return Maybe<void>::Ok();
+}
+
+template<>
+Maybe<void> Scatter<DeviceType::kCPU>(const void* in, void* out, size_t elem_cnt, DataType dtype,
+                                      int64_t root, Symbol<ParallelDesc> parallel_desc,
+                                      ep::Stream* stream) {
+  CHECK_OR_RETURN(IsPODDataType(dtype));
+  const int64_t parallel_num = parallel_desc->parallel_num();
+  const size_t chunk_size = elem_cnt * GetSizeOfDataType(dtype);
+  const int64_t root_parallel_id = JUST(GetRootParallelId(*parallel_desc, root));
+  const int64_t relative_id =
+      (JUST(GetCurrentParallelId(parallel_desc)) - root_parallel_id + parallel_num) % parallel_num;
+  const int64_t subtree_size = BinomialSubtreeSize(relative_id, parallel_num);
+  const char* char_in = reinterpret_cast<const char*>(in);
+  char* char_out = reinterpret_cast<char*>(out);
+
+  // `chunks` holds the chunks of the whole subtree in relative order, the own chunk first.
+  std::unique_ptr<char[]> buffer;
+  char* chunks = nullptr;
+  if (relative_id == 0 && root_parallel_id == 0) {
+    chunks = const_cast<char*>(char_in);
+  } else if (subtree_size == 1) {
+    chunks = char_out;
+  } else {
+    buffer = std::make_unique<char[]>(subtree_size * chunk_size);
+    chunks = buffer.get();
+  }
+  if (relative_id == 0 && root_parallel_id != 0) {
+    const size_t head_size = (parallel_num - root_parallel_id) * chunk_size;
+    std::memcpy(chunks, char_in + root_parallel_id * chunk_size, head_size);
+    std::memcpy(chunks + head_size, char_in, root_parallel_id * chunk_size);
+  }
+
+  if (parallel_num > 1 && chunk_size > 0) {
+    TransportToken transport_token =
+        JUST(TransportToken::NewTransportToken(kTransportTokenTypeData));
+    if (relative_id != 0) {
+      int64_t parent_rank = JUST(MachineId4RelativeId(
+          *parallel_desc, relative_id - (relative_id & -relative_id), root_parallel_id));
+      JUST(ExchangeWithRanks(transport_token, {},
+                             {{parent_rank, {chunks, subtree_size * chunk_size}}}));
+    }
+    RankBuffers send_buffers;
+    for (int64_t mask = BinomialTopChildMask(relative_id, parallel_num); mask > 0; mask >>= 1) {
+      int64_t child = relative_id + mask;
+      if (child >= parallel_num) { continue; }
+      int64_t child_rank = JUST(MachineId4RelativeId(*parallel_desc, child, root_parallel_id));
+      send_buffers[child_rank] = {chunks + mask * chunk_size,
+                                  BinomialSubtreeSize(child, parallel_num) * chunk_size};
+    }
+    JUST(ExchangeWithRanks(transport_token, send_buffers, {}));
+  }
+  if (chunks != char_out) { std::memcpy(char_out, chunks, chunk_size); }
+  return Maybe<void>::Ok();
+}
+
+template<>
+Maybe<void> Gather<DeviceType::kCPU>(const void* in, void* out, size_t elem_cnt, DataType dtype,
+                                     int64_t root, Symbol<ParallelDesc> parallel_desc,
+                                     ep::Stream* stream) {
+  CHECK_OR_RETURN(IsPODDataType(dtype));
+  const int64_t parallel_num = parallel_desc->parallel_num();
+  const size_t chunk_size = elem_cnt * GetSizeOfDataType(dtype);
+  const int64_t root_parallel_id = JUST(GetRootParallelId(*parallel_desc, root));
+  const int64_t relative_id =
+      (JUST(GetCurrentParallelId(parallel_desc)) - root_parallel_id + parallel_num) % parallel_num;
+  const int64_t subtree_size = BinomialSubtreeSize(relative_id, parallel_num);
+  const char* char_in = reinterpret_cast<const char*>(in);
+  char* char_out = reinterpret_cast<char*>(out);
+
+  // `chunks` collects the chunks of the whole subtree in relative order, the own chunk first.
+  std::unique_ptr<char[]> buffer;
+  char* chunks = nullptr;
+  if (relative_id == 0 && root_parallel_id == 0) {
+    chunks = char_out;
+  } else if (subtree_size == 1) {
+    chunks = const_cast<char*>(char_in);
+  } else {
+    buffer = std::make_unique<char[]>(subtree_size * chunk_size);
+    chunks = buffer.get();
+  }
+  if (chunks != char_in) { std::memcpy(chunks, char_in, chunk_size); }
+
+  if (parallel_num > 1 && chunk_size > 0) {
+    TransportToken transport_token =
+        JUST(TransportToken::NewTransportToken(kTransportTokenTypeData));
+    RankBuffers recv_buffers;
+    for (int64_t mask = BinomialTopChildMask(relative_id, parallel_num); mask > 0; mask >>= 1) {
+      int64_t child = relative_id + mask;
+      if (child >= parallel_num) { continue; }
+      int64_t child_rank = JUST(MachineId4RelativeId(*parallel_desc, child, root_parallel_id));
+      recv_buffers[child_rank] = {chunks + mask * chunk_size,
+                                  BinomialSubtreeSize(child, parallel_num) * chunk_size};
+    }
+    JUST(ExchangeWithRanks(transport_token, {}, recv_buffers));
+    if (relative_id != 0) {
+      int64_t parent_rank = JUST(MachineId4RelativeId(
+          *parallel_desc, relative_id - (relative_id & -relative_id), root_parallel_id));
+      JUST(ExchangeWithRanks(transport_token, {{parent_rank, {chunks, subtree_size * chunk_size}}},
+                             {}));
+    }
+  }
+  if (relative_id == 0 && root_parallel_id != 0) {
+    const size_t head_size = (parallel_num - root_parallel_id) * chunk_size;
+    std::memcpy(char_out + root_parallel_id * chunk_size, chunks, head_size);
+    std::memcpy(char_out, chunks + head_size, root_parallel_id * chunk_size);
+  }
+  return Maybe<void>::Ok();
+}
+
 #ifdef WITH_CUDA
 std::pair<ncclComm_t, int64_t> RawGetNcclCommAndPeerNcclRank(int64_t peer_process_id) {
   std::set<std::pair<int64_t, int64_t>> device_set;
@@ -74,6 +74,23 @@ Maybe<void> Reduce(const void* in, void* out, size_t elem_cnt, DataType dtype,
                    ReduceType reduce_type, int64_t root, Symbol<ParallelDesc> parallel_desc,
                    ep::Stream* stream);
 
+// Exchanges `elem_cnt` elements with every rank: chunk i of `in` is sent to the i-th parallel id
+// and chunk i of `out` is received from it.
+template<DeviceType device_type>
+Maybe<void> AllToAll(const void* in, void* out, size_t elem_cnt, DataType dtype,
+                     Symbol<ParallelDesc> parallel_desc, ep::Stream* stream);
+
+// `in` holds parallel_num chunks of `elem_cnt` elements on rank `root` and is ignored elsewhere.
+template<DeviceType device_type>
+Maybe<void> Scatter(const void* in, void* out, size_t elem_cnt, DataType dtype, int64_t root,
+                    Symbol<ParallelDesc> parallel_desc, ep::Stream* stream);
+
+// `out` receives parallel_num chunks of `elem_cnt` elements on rank `root` and is ignored
+// elsewhere.
+template<DeviceType device_type>
+Maybe<void> Gather(const void* in, void* out, size_t elem_cnt, DataType dtype, int64_t root,
+                   Symbol<ParallelDesc> parallel_desc, ep::Stream* stream);
+
 Maybe<void> CpuBroadcast(const void* in, void* out, size_t buffer_size, int64_t root,
                          Symbol<ParallelDesc> parallel_desc, const TransportToken& transport_token);
 
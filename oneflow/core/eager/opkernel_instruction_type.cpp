@@ -35,6 +35,7 @@ limitations under the License.
 #include "oneflow/core/operator/op_conf_symbol.h"
 #include "oneflow/user/kernels/stateful_local_opkernel.h"
 #include "oneflow/core/profiler/profiler.h"
+#include "oneflow/core/profiler/event_recorder.h"
 #include "oneflow/core/common/cpp_attribute.h"
 
 namespace oneflow {
@@ -42,6 +43,56 @@ namespace vm {
 
 struct LocalCallOpKernelUtil final {
   static inline Maybe<void> Compute(const vm::InstructionMsg& instr_msg) {
+    if (unlikely(profiler::EventRecorder::IsEnabled())) { return ProfiledCompute(instr_msg); }
+    return UnprofiledCompute(instr_msg);
+  }
+
+  static inline LocalCallOpKernelPhyInstrOperand* GetLocalCallOpKernelPhyInstrOperand(
+      const vm::InstructionMsg& instr_msg) {
+    auto* operand = CHECK_NOTNULL(instr_msg.phy_instr_operand().get());
+    return CHECK_NOTNULL(dynamic_cast<LocalCallOpKernelPhyInstrOperand*>(operand));
+  }
+
+ private:
+  // NOTE: kernel time is measured on the host. For asynchronous devices such as cuda it is the
+  // kernel launch time rather than the device execution time.
+  static Maybe<void> ProfiledCompute(const vm::InstructionMsg& instr_msg) {
+    auto* operand = LocalCallOpKernelUtil::GetLocalCallOpKernelPhyInstrOperand(instr_msg);
+    profiler::OpEvent event;
+    event.name = operand->opkernel().op_type_name();
+    event.kind = profiler::EventKind::kKernel;
+    event.device = operand->opkernel().stream()->device()->ToString();
+    event.thread_id = profiler::EventRecorder::CurrentThreadId();
+    if (profiler::EventRecorder::RecordShapes()) {
+      for (const auto& blob_object : *operand->inputs()) {
+        event.input_shapes.emplace_back(blob_object->blob_desc().shape().ToString());
+        event.input_dtypes.emplace_back(DataType_Name(blob_object->blob_desc().data_type()));
+      }
+    }
+    // Only the outputs without storage are allocated by this instruction.
+    std::vector<bool> need_allocate(operand->outputs()->size());
+    for (int i = 0; i < operand->outputs()->size(); ++i) {
+      need_allocate[i] = operand->outputs()->at(i)->tensor_storage()->blob_dptr() == nullptr;
+    }
+    event.start_ns = profiler::EventRecorder::NowNs();
+    JUST(UnprofiledCompute(instr_msg));
+    event.end_ns = profiler::EventRecorder::NowNs();
+    int64_t allocated_bytes = 0;
+    for (int i = 0; i < operand->outputs()->size(); ++i) {
+      if (need_allocate[i]) {
+        allocated_bytes += operand->outputs()->at(i)->tensor_storage()->blob_bytes();
+      }
+    }
+    if (operand->need_temp_storage()) {
+      allocated_bytes +=
+          operand->mut_opkernel()->mut_temp_blob_object()->blob_desc().ByteSizeOfBlobBody();
+    }
+    event.allocated_bytes = allocated_bytes;
+    profiler::EventRecorder::Get()->Record(std::move(event));
+    return Maybe<void>::Ok();
+  }
+
+  static inline Maybe<void> UnprofiledCompute(const vm::InstructionMsg& instr_msg) {
     OF_PROFILER_RANGE_PUSH("ResetPrior");
     auto* operand = LocalCallOpKernelUtil::GetLocalCallOpKernelPhyInstrOperand(instr_msg);
     operand->mut_opkernel()->composed_attrs_for_scheduler_thread()->ResetPrior(operand->attrs());
@@ -73,13 +124,6 @@ struct LocalCallOpKernelUtil final {
     return Maybe<void>::Ok();
   }
 
-  static inline LocalCallOpKernelPhyInstrOperand* GetLocalCallOpKernelPhyInstrOperand(
-      const vm::InstructionMsg& instr_msg) {
-    auto* operand = CHECK_NOTNULL(instr_msg.phy_instr_operand().get());
-    return CHECK_NOTNULL(dynamic_cast<LocalCallOpKernelPhyInstrOperand*>(operand));
-  }
-
- private:
   static inline void InferTempStorageBlobDesc(LocalCallOpKernelPhyInstrOperand* operand) {
     const auto& InferTmpSizeFn = operand->opkernel().GetInferTmpSizeFn(operand->user_opkernel());
     auto* temp_blob_desc = operand->mut_opkernel()->mut_temp_blob_object()->mut_blob_desc();
@@ -99,6 +99,13 @@ class CpuStream : public Stream {
     ParallelFor(begin, end, func, kParallelForDefaultGrain);
   }
 
+  // Returns the grain size of a `ParallelFor` whose every index processes `elems_per_index`
+  // elements, so that each task still handles about kParallelForDefaultGrain elements.
+  static size_t GrainSizeFor(int64_t elems_per_index) {
+    if (elems_per_index <= 0) { return kParallelForDefaultGrain; }
+    return std::max<size_t>(1, kParallelForDefaultGrain / static_cast<size_t>(elems_per_index));
+  }
+
   template<typename F>
   void ParallelFor(int64_t begin, int64_t end, const F& func, size_t grain_size) {
 #if OF_CPU_THREADING_RUNTIME != OF_RUNTIME_SEQ
@@ -15,6 +15,8 @@ limitations under the License.
 */
 #include "oneflow/core/ep/include/primitive/copy_nd.h"
 #include "oneflow/core/ep/common/primitive/copy_nd.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 
@@ -24,11 +26,12 @@ namespace primitive {
 namespace {
 
 template<size_t num_dims, size_t movement_size, typename IndexType>
-void CopyNdKernel(CopyNdKernelParams<num_dims, IndexType> params) {
+void CopyNdKernel(const CopyNdKernelParams<num_dims, IndexType>& params, IndexType begin,
+                  IndexType end) {
   using T = typename std::aligned_storage<movement_size, movement_size>::type;
   const T* src = reinterpret_cast<const T*>(params.src);
   T* dst = reinterpret_cast<T*>(params.dst);
-  for (IndexType i = 0; i < params.count; ++i) {
+  for (IndexType i = begin; i < end; ++i) {
     IndexType copy_index[num_dims];
     IndexType src_index[num_dims];
     IndexType dst_index[num_dims];
@@ -45,7 +48,12 @@ void CopyNdKernel(CopyNdKernelParams<num_dims, IndexType> params) {
 
 template<size_t num_dims, size_t movement_size, typename IndexType>
 void LaunchKernel(Stream* stream, CopyNdKernelParams<num_dims, IndexType> params) {
-  CopyNdKernel<num_dims, movement_size, IndexType>(params);
+  stream->As<CpuStream>()->ParallelFor(
+      0, params.count,
+      [&params](int64_t begin, int64_t end) {
+        CopyNdKernel<num_dims, movement_size, IndexType>(params, begin, end);
+      },
+      CpuStream::GrainSizeFor(num_dims));
 }
 
 class CopyNdImpl : public CopyNd {
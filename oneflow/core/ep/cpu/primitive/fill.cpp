@@ -16,6 +16,8 @@ limitations under the License.
 #include "oneflow/core/ep/include/primitive/fill.h"
 #include "oneflow/core/ep/cpu/primitive/type_seq.h"
 #include "oneflow/core/common/scalar.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 
@@ -42,7 +44,12 @@ class FillImpl : public Fill {
   ~FillImpl() override = default;
 
   void Launch(Stream* stream, void* dst, Scalar value, size_t count) override {
-    std::fill_n(reinterpret_cast<T*>(dst), count, GetValue<T>(value));
+    T* dst_ptr = reinterpret_cast<T*>(dst);
+    const T fill_value = GetValue<T>(value);
+    stream->As<CpuStream>()->ParallelFor(0, count,
+                                         [dst_ptr, fill_value](int64_t begin, int64_t end) {
+                                           std::fill(dst_ptr + begin, dst_ptr + end, fill_value);
+                                         });
   }
 };
 
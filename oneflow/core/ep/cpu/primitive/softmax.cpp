@@ -16,6 +16,8 @@ limitations under the License.
 #include "oneflow/core/ep/include/primitive/softmax.h"
 #include "oneflow/core/ep/include/primitive/log_softmax.h"
 #include "oneflow/core/ep/cpu/primitive/type_seq.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 
@@ -69,7 +71,14 @@ class SoftmaxImpl : public SoftmaxBase {
   ~SoftmaxImpl() override = default;
 
   void Launch(Stream* stream, size_t rows, size_t cols, const void* x, void* y) override {
-    SoftmaxCpu<algorithm, T>(rows, cols, reinterpret_cast<const T*>(x), reinterpret_cast<T*>(y));
+    const T* x_ptr = reinterpret_cast<const T*>(x);
+    T* y_ptr = reinterpret_cast<T*>(y);
+    stream->As<CpuStream>()->ParallelFor(
+        0, rows,
+        [cols, x_ptr, y_ptr](int64_t begin, int64_t end) {
+          SoftmaxCpu<algorithm, T>(end - begin, cols, x_ptr + begin * cols, y_ptr + begin * cols);
+        },
+        CpuStream::GrainSizeFor(cols));
   }
 };
 
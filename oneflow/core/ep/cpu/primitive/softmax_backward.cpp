@@ -16,6 +16,8 @@ limitations under the License.
 #include "oneflow/core/ep/include/primitive/softmax_backward.h"
 #include "oneflow/core/ep/include/primitive/log_softmax_backward.h"
 #include "oneflow/core/ep/cpu/primitive/type_seq.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 
@@ -67,8 +69,17 @@ class SoftmaxBackwardImpl : public SoftmaxBackwardBase {
 
   void Launch(Stream* stream, size_t rows, size_t cols, const void* y, const void* dy,
               void* dx) override {
-    SoftmaxBackwardCpu<algorithm, T>(rows, cols, reinterpret_cast<const T*>(y),
-                                     reinterpret_cast<const T*>(dy), reinterpret_cast<T*>(dx));
+    const T* y_ptr = reinterpret_cast<const T*>(y);
+    const T* dy_ptr = reinterpret_cast<const T*>(dy);
+    T* dx_ptr = reinterpret_cast<T*>(dx);
+    stream->As<CpuStream>()->ParallelFor(
+        0, rows,
+        [cols, y_ptr, dy_ptr, dx_ptr](int64_t begin, int64_t end) {
+          const size_t offset = begin * cols;
+          SoftmaxBackwardCpu<algorithm, T>(end - begin, cols, y_ptr + offset, dy_ptr + offset,
+                                           dx_ptr + offset);
+        },
+        CpuStream::GrainSizeFor(cols));
   }
 };
 
@@ -0,0 +1,149 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/autocast.h"
+#include "oneflow/core/framework/op_expr.h"
+#include "oneflow/core/framework/tensor.h"
+#include "oneflow/core/framework/tensor_tuple.h"
+#include "oneflow/core/functional/functional.h"
+#include "oneflow/core/job_rewriter/auto_mixed_precision_lists.h"
+
+namespace oneflow {
+
+namespace autocast {
+
+namespace {
+
+enum class CastPolicy {
+  kNone = 0,
+  kLowPrecision = 1,  // white list
+  kPromote = 2,       // gray list
+  kFullPrecision = 3  // black list
+};
+
+struct AutoCastState {
+  bool enabled = false;
+  bool cache_enabled = true;
+  DeviceType device_type = DeviceType::kCUDA;
+  Symbol<DType> dtype = DType::Float16();
+};
+
+AutoCastState* MutThreadLocalState() {
+  static thread_local AutoCastState state;
+  return &state;
+}
+
+struct CacheValue {
+  std::weak_ptr<one::Tensor> source;
+  std::shared_ptr<one::Tensor> casted;
+};
+
+HashMap<std::pair<const one::Tensor*, DataType>, CacheValue>* MutThreadLocalCache() {
+  static thread_local HashMap<std::pair<const one::Tensor*, DataType>, CacheValue> cache;
+  return &cache;
+}
+
+CastPolicy GetCastPolicy(const std::string& op_type_name) {
+  if (AutoMixedPrecisionLists::WhiteList().count(op_type_name) > 0) {
+    return CastPolicy::kLowPrecision;
+  }
+  if (AutoMixedPrecisionLists::GrayList().count(op_type_name) > 0) { return CastPolicy::kPromote; }
+  if (AutoMixedPrecisionLists::BlackList().count(op_type_name) > 0) {
+    return CastPolicy::kFullPrecision;
+  }
+  return CastPolicy::kNone;
+}
+
+Maybe<DeviceType> GetDeviceType(const std::shared_ptr<one::Tensor>& tensor) {
+  if (tensor->is_consistent()) { return JUST(tensor->parallel_desc())->device_type(); }
+  return JUST(tensor->device())->enum_type();
+}
+
+Maybe<one::Tensor> CachedCast(const std::shared_ptr<one::Tensor>& tensor, Symbol<DType> dtype) {
+  const bool cacheable =
+      is_autocast_cache_enabled() && tensor->is_leaf() && tensor->requires_grad();
+  if (!cacheable) { return one::functional::Cast(tensor, dtype); }
+  auto* cache = MutThreadLocalCache();
+  const auto key = std::make_pair(tensor.get(), dtype->data_type());
+  const auto& it = cache->find(key);
+  // The address of a released tensor may be reused, so the source tensor is checked as well.
+  if (it != cache->end() && it->second.source.lock() == tensor) { return it->second.casted; }
+  const auto& casted = JUST(one::functional::Cast(tensor, dtype));
+  (*cache)[key] = CacheValue{tensor, casted};
+  return casted;
+}
+
+}  // namespace
+
+bool is_enabled() { return MutThreadLocalState()->enabled; }
+void set_enabled(bool enabled) { MutThreadLocalState()->enabled = enabled; }
+
+DeviceType get_autocast_device_type() { return MutThreadLocalState()->device_type; }
+void set_autocast_device_type(DeviceType device_type) {
+  MutThreadLocalState()->device_type = device_type;
+}
+
+Symbol<DType> get_autocast_dtype() { return MutThreadLocalState()->dtype; }
+void set_autocast_dtype(Symbol<DType> dtype) { MutThreadLocalState()->dtype = dtype; }
+
+bool is_autocast_cache_enabled() { return MutThreadLocalState()->cache_enabled; }
+void set_autocast_cache_enabled(bool enabled) { MutThreadLocalState()->cache_enabled = enabled; }
+
+void clear_cache() { MutThreadLocalCache()->clear(); }
+
+Maybe<one::TensorTuple> MaybeCastInputs(const one::OpExpr& op_expr,
+                                        const one::TensorTuple& inputs) {
+  if (inputs.empty() || !dynamic_cast<const one::UserOpExpr*>(&op_expr)) { return nullptr; }
+  const CastPolicy policy = GetCastPolicy(op_expr.op_type_name());
+  if (policy == CastPolicy::kNone) { return nullptr; }
+  if (JUST(GetDeviceType(inputs.at(0))) != get_autocast_device_type()) { return nullptr; }
+
+  Symbol<DType> target_dtype;
+  if (policy == CastPolicy::kLowPrecision) {
+    target_dtype = get_autocast_dtype();
+  } else if (policy == CastPolicy::kFullPrecision) {
+    target_dtype = DType::Float();
+  } else {
+    for (const auto& input : inputs) {
+      if (!input->dtype()->is_floating_point()) { continue; }
+      if (!target_dtype
+          || DType::priority_order[input->dtype()->data_type()]
+                 > DType::priority_order[target_dtype->data_type()]) {
+        target_dtype = input->dtype();
+      }
+    }
+    if (!target_dtype) { return nullptr; }
+  }
+
+  const auto& NeedCast = [&](const std::shared_ptr<one::Tensor>& tensor) {
+    return tensor->dtype()->is_floating_point() && tensor->dtype() != target_dtype;
+  };
+  if (std::none_of(inputs.begin(), inputs.end(), NeedCast)) { return nullptr; }
+
+  auto casted_inputs = std::make_shared<one::TensorTuple>(inputs.size());
+  for (int i = 0; i < inputs.size(); ++i) {
+    const auto& input = inputs.at(i);
+    if (NeedCast(input)) {
+      casted_inputs->at(i) = JUST(CachedCast(input, target_dtype));
+    } else {
+      casted_inputs->at(i) = input;
+    }
+  }
+  return casted_inputs;
+}
+
+}  // namespace autocast
+
+}  // namespace oneflow
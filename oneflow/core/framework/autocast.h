@@ -0,0 +1,67 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_CORE_FRAMEWORK_AUTOCAST_H_
+#define ONEFLOW_CORE_FRAMEWORK_AUTOCAST_H_
+
+#include "oneflow/core/common/maybe.h"
+#include "oneflow/core/common/symbol.h"
+#include "oneflow/core/common/device_type.pb.h"
+#include "oneflow/core/framework/dtype.h"
+
+namespace oneflow {
+
+namespace one {
+
+class OpExpr;
+class TensorTuple;
+
+}  // namespace one
+
+namespace autocast {
+
+// The eager counterpart of the `auto_mixed_precision` job pass. When autocast is enabled the
+// floating inputs of user ops running on the autocast device are casted at dispatch time
+// according to the white, gray and black lists in `AutoMixedPrecisionLists`:
+//   - white ops run in the autocast dtype,
+//   - gray ops run in the widest floating dtype of their inputs,
+//   - black ops run in float32,
+//   - the other ops are not changed.
+// The state is thread local like the grad mode.
+
+bool is_enabled();
+void set_enabled(bool enabled);
+
+DeviceType get_autocast_device_type();
+void set_autocast_device_type(DeviceType device_type);
+
+Symbol<DType> get_autocast_dtype();
+void set_autocast_dtype(Symbol<DType> dtype);
+
+// Casts of leaf tensors that require grad, i.e. the model weights, are cached until
+// `clear_cache` is called when leaving the outermost autocast region, so each weight is casted
+// only once per step.
+bool is_autocast_cache_enabled();
+void set_autocast_cache_enabled(bool enabled);
+void clear_cache();
+
+// Returns the casted inputs of `op_expr`, or nullptr if none of them need to be casted.
+Maybe<one::TensorTuple> MaybeCastInputs(const one::OpExpr& op_expr, const one::TensorTuple& inputs);
+
+}  // namespace autocast
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_CORE_FRAMEWORK_AUTOCAST_H_
@@ -41,6 +41,9 @@ limitations under the License.
 #include "oneflow/core/framework/id_util.h"
 #include "oneflow/core/functional/functional.h"
 #include "oneflow/core/rpc/include/global_process_ctx.h"
+#include "oneflow/core/framework/op_interpreter/dispatch_frame.h"
+#include "oneflow/core/profiler/event_recorder.h"
+#include "oneflow/core/common/cpp_attribute.h"
 
 namespace oneflow {
 namespace one {
@@ -81,6 +84,36 @@ std::vector<TensorMeta*>* ThreadLocalDefaultOutputMutTensorMetas(int64_t size) {
   return &ptr_vec;
 }
 
+// Kernels address their operands as dense row-major buffers. Strided views (e.g. channels_last
+// activations) are materialized before launch, which is not possible for operands the kernel
+// writes to.
+Maybe<void> MakeInputsContiguous(const UserOpExpr& user_op_expr,
+                                 const StatefulLocalOpKernel& kernel, const TensorTuple& inputs,
+                                 const TensorTuple& outputs,
+                                 EagerBlobObjectList* input_eager_blob_objects) {
+  if (user_op_expr.op_type_name() == "to_contiguous") { return Maybe<void>::Ok(); }
+  for (int64_t index : kernel.input_tuple_indexes4mut_ibns()) {
+    CHECK_OR_RETURN(inputs.at(index)->is_contiguous())
+        << Error::RuntimeError() << user_op_expr.op_type_name()
+        << " modifies a non-contiguous tensor in place, which is not supported. Call "
+           ".contiguous() on it first.";
+  }
+  for (const auto& output : outputs) {
+    CHECK_OR_RETURN(output->is_contiguous())
+        << Error::RuntimeError() << "Inplace " << user_op_expr.op_type_name()
+        << " on a non-contiguous tensor is not supported. Call .contiguous() on it first.";
+  }
+  // The copies are kernel operands only, gradients flow through the op's original inputs.
+  autograd::AutoGradMode mode(false);
+  for (int64_t index : kernel.input_tuple_indexes4const_ibns()) {
+    const auto& input = inputs.at(index);
+    if (input->is_contiguous()) { continue; }
+    input_eager_blob_objects->at(index) =
+        JUST(JUST(functional::ToContiguous(input))->eager_blob_object());
+  }
+  return Maybe<void>::Ok();
+}
+
 }  // namespace
 
 Maybe<void> NaiveInterpret(const UserOpExpr& user_op_expr, const TensorTuple& inputs,
@@ -155,6 +188,8 @@ Maybe<void> NaiveInterpret(const UserOpExpr& user_op_expr, const TensorTuple& in
 
   const auto& kernel = JUST(user_op_expr.MutKernel4Stream(stream));
   kernel->set_need_check_mem_case(need_check_mem_case);
+  JUST(MakeInputsContiguous(user_op_expr, *kernel, inputs, *outputs,
+                            input_eager_blob_objects.get()));
 
   for (int64_t index : kernel->output_tuple_indexes4mut2_obns()) {
     output_eager_blob_objects->at(index)->set_is_shape_synced(false);
@@ -189,9 +224,38 @@ static Maybe<void> NaiveInterpret(const UserOpExpr& user_op_expr, const TensorTu
   return NaiveInterpret(user_op_expr, inputs, default_device, outputs, ctx);
 }
 
+static Maybe<void> ProfiledNaiveInterpret(const UserOpExpr& user_op_expr, const TensorTuple& inputs,
+                                          TensorTuple* outputs, const OpExprInterpContext& ctx) {
+  profiler::OpEvent event;
+  event.name = user_op_expr.op_type_name();
+  event.kind = profiler::EventKind::kDispatch;
+  event.allocated_bytes = 0;
+  event.thread_id = profiler::EventRecorder::CurrentThreadId();
+  if (profiler::EventRecorder::RecordShapes()) {
+    for (const auto& input : inputs) {
+      event.input_shapes.emplace_back(input->shape()->ToString());
+      event.input_dtypes.emplace_back(input->dtype()->name());
+    }
+  }
+  if (profiler::EventRecorder::WithStack()) { event.stack = DispatchFrame::get_str(); }
+  event.start_ns = profiler::EventRecorder::NowNs();
+  JUST(NaiveInterpret(user_op_expr, inputs, outputs, ctx));
+  event.end_ns = profiler::EventRecorder::NowNs();
+  if (!outputs->empty()) {
+    event.device = JUST(outputs->at(0)->device())->ToString();
+  } else if (!inputs.empty()) {
+    event.device = JUST(inputs.at(0)->device())->ToString();
+  }
+  profiler::EventRecorder::Get()->Record(std::move(event));
+  return Maybe<void>::Ok();
+}
+
 Maybe<void> EagerMirroredInterpreter::ApplyImpl(const UserOpExpr& op_expr,
                                                 const TensorTuple& inputs, TensorTuple* outputs,
                                                 const OpExprInterpContext& ctx) const {
+  if (unlikely(profiler::EventRecorder::IsEnabled())) {
+    return ProfiledNaiveInterpret(op_expr, inputs, outputs, ctx);
+  }
   return NaiveInterpret(op_expr, inputs, outputs, ctx);
 }
 
@@ -17,6 +17,8 @@ limitations under the License.
 
 #include "oneflow/core/autograd/autograd_engine.h"
 #include "oneflow/core/autograd/autograd_mode.h"
+#include "oneflow/core/common/cpp_attribute.h"
+#include "oneflow/core/framework/autocast.h"
 #include "oneflow/core/framework/op_interpreter/op_interpreter_util.h"
 #include "oneflow/core/framework/instructions_builder.h"
 #include "oneflow/core/framework/op_arg_util.h"
@@ -85,6 +87,14 @@ Maybe<void> EagerInterpreter::ApplyImpl(const FunctionOpExpr& op_expr, const Ten
 
 Maybe<void> AutogradInterpreter::Apply(const OpExpr& op_expr, const TensorTuple& inputs,
                                        TensorTuple* outputs, const OpExprInterpContext& ctx) const {
+  // Inplace ops keep the dtype of their outputs, so they are never autocasted.
+  if (unlikely(autocast::is_enabled()) && !LazyMode::is_enabled()
+      && std::all_of(outputs->begin(), outputs->end(),
+                     [](const std::shared_ptr<Tensor>& output) { return !output; })) {
+    const auto& casted_inputs = JUST(autocast::MaybeCastInputs(op_expr, inputs));
+    // The casted inputs never need to be casted again, so this recursion is at most one level.
+    if (casted_inputs) { return Apply(op_expr, *casted_inputs, outputs, ctx); }
+  }
   bool requires_grad = false;
   if (autograd::GradMode::is_enabled() && !JUST(op_expr.IsGradDisabled())) {
     requires_grad =
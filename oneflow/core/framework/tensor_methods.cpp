@@ -272,6 +272,60 @@ Maybe<Tensor> Squeeze(const std::shared_ptr<Tensor>& input,
   return output;
 }
 
+Maybe<Tensor> Transpose(const std::shared_ptr<Tensor>& input, const std::vector<int32_t>& permute) {
+  CHECK_OR_RETURN(IsViewApplicable(input))
+      << Error::RuntimeError() << "view::Transpose(): input should be eager local tensor, but got "
+      << (input->is_lazy() ? "lazy tensor" : "consistent tensor")
+      << " with shape: " << input->shape()->ToString() << "; element count: " << input->nelement();
+
+  const auto& shape = input->shape();
+  const auto& strides = JUST(input->stride());
+  const int64_t ndim = shape->NumAxes();
+  CHECK_EQ_OR_RETURN(permute.size(), ndim)
+      << Error::RuntimeError() << "view::Transpose(): number of dims don't match in permute";
+
+  DimVector target_dim_vec(ndim);
+  StrideVector target_stride_vec(ndim);
+  std::vector<int32_t> inverse_permute(ndim);
+  for (int64_t i = 0; i < ndim; ++i) {
+    const int32_t dim = permute[i];
+    CHECK_OR_RETURN(dim >= 0 && dim < ndim)
+        << Error::IndexError() << "Dimension out of range (expected to be in range of [0, " << ndim
+        << "), but got " << dim << ")";
+    target_dim_vec[i] = shape->At(dim);
+    target_stride_vec[i] = strides->At(dim);
+    inverse_permute[dim] = i;
+  }
+
+  int64_t storage_offset = JUST(JUST(input->AsMirroredTensor())->storage_offset());
+  std::shared_ptr<Tensor> output =
+      JUST(BasicView(input, Shape(target_dim_vec), Stride(target_stride_vec), storage_offset));
+
+  if (autograd::GradMode::is_enabled() && input->requires_grad()) {
+    auto backward_fn =
+        std::make_shared<std::function<Maybe<void>(const TensorTuple&, TensorTuple*, bool)>>(
+            [=](const TensorTuple& out_grads, TensorTuple* in_grads,
+                bool create_graph) -> Maybe<void> {
+              autograd::AutoGradMode mode(create_graph);
+              CHECK_EQ_OR_RETURN(out_grads.size(), 1);
+              in_grads->resize(1);
+              const auto& out_grad = JUST(oneflow::VectorAt(out_grads, 0));
+              // Permuting the gradient back is free when it shares the layout of the output.
+              if (IsViewApplicable(out_grad)) {
+                *JUST(oneflow::VectorAt(in_grads, 0)) = JUST(Transpose(out_grad, inverse_permute));
+              } else {
+                *JUST(oneflow::VectorAt(in_grads, 0)) =
+                    JUST(functional::Transpose(out_grad, inverse_permute));
+              }
+              return Maybe<void>::Ok();
+            });
+    TensorTuple outputs{output};
+    JUST(GetThreadLocalAutogradEngine()->AddBackwardFuncPtr("view::transpose_backward", backward_fn,
+                                                            {input}, &outputs));
+  }
+  return output;
+}
+
 }  // namespace view
 }  // namespace one
 }  // namespace oneflow
@@ -38,6 +38,10 @@ class ReluFunctor {
  public:
   ReluFunctor() { op_ = CHECK_JUST(one::OpBuilder("relu").Input("x", 1).Output("y", 1).Build()); }
   Maybe<Tensor> operator()(const std::shared_ptr<Tensor>& x, bool inplace) const {
+    if (JUST(IsChannelsLast(x))) {
+      // The NHWC view shares storage with x, so the inplace version still updates x.
+      return NhwcToChannelsLast(JUST((*this)(JUST(ChannelsLastToNhwc(x)), inplace)));
+    }
     if (inplace) {
       JUST(CheckInplaceValid(x));
       std::shared_ptr<TensorTuple> outputs = std::make_shared<TensorTuple>(1);
@@ -32,6 +32,7 @@ limitations under the License.
 #include "oneflow/core/framework/placement_utils.h"
 #include "oneflow/core/framework/tensor.h"
 #include "oneflow/core/framework/tensor_tuple.h"
+#include "oneflow/core/framework/tensor_methods.h"
 #include "oneflow/core/framework/random_generator_impl.h"
 #include "oneflow/core/functional/functional.h"
 #include "oneflow/core/functional/function_library.h"
@@ -1093,6 +1094,25 @@ class ToContiguousFunctor {
   std::shared_ptr<OpExpr> op_;
 };
 
+class ToMemoryFormatFunctor {
+ public:
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& input,
+                           const std::string& memory_format) const {
+    if (memory_format == "contiguous_format") { return input->contiguous(); }
+    CHECK_EQ_OR_RETURN(memory_format, "channels_last")
+        << "memory_format must be one of contiguous_format and channels_last, but got "
+        << memory_format;
+    CHECK_EQ_OR_RETURN(input->ndim(), 4)
+        << "channels_last memory format is only supported for 4-D tensors, but got a "
+        << input->ndim() << "-D tensor";
+    // Memory format is a layout hint, tensors which can not be viewed keep their own layout.
+    if (!view::IsViewApplicable(input) || JUST(IsChannelsLast(input))) { return input; }
+    const auto& shape = input->shape();
+    if (shape->At(1) == 1 || shape->At(2) * shape->At(3) == 1) { return input->contiguous(); }
+    return NhwcToChannelsLast(JUST(functional::Transpose(input, {0, 2, 3, 1})));
+  }
+};
+
 class SliceBaseFunctor {
  public:
   SliceBaseFunctor() = default;
@@ -1447,6 +1467,13 @@ class UpsampleNearest2DFunctor {
   }
   Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x, const float& height_scale,
                            const float& width_scale, const std::string& data_format) const {
+    // Only the cpu kernel has an NHWC implementation.
+    if (data_format == "channels_first" && JUST(x->device())->type() == "cpu"
+        && JUST(IsChannelsLast(x))) {
+      const auto& y =
+          JUST((*this)(JUST(ChannelsLastToNhwc(x)), height_scale, width_scale, "channels_last"));
+      return NhwcToChannelsLast(y);
+    }
     MutableAttrMap attrs;
     JUST(attrs.SetAttr<float>("height_scale", height_scale));
     JUST(attrs.SetAttr<float>("width_scale", width_scale));
@@ -1486,6 +1513,13 @@ class UpsampleBilinear2DFunctor {
   Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x, const float& height_scale,
                            const float& width_scale, const bool& align_corners,
                            const std::string& data_format) const {
+    // Only the cpu kernel has an NHWC implementation.
+    if (data_format == "channels_first" && JUST(x->device())->type() == "cpu"
+        && JUST(IsChannelsLast(x))) {
+      const auto& y = JUST((*this)(JUST(ChannelsLastToNhwc(x)), height_scale, width_scale,
+                                   align_corners, "channels_last"));
+      return NhwcToChannelsLast(y);
+    }
     MutableAttrMap attrs;
     JUST(attrs.SetAttr<float>("height_scale", height_scale));
     JUST(attrs.SetAttr<float>("width_scale", width_scale));
@@ -2752,6 +2786,7 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
   m.add_functor<impl::ReshapeFunctor>("Reshape");
   m.add_functor<impl::ViewFunctor>("View");
   m.add_functor<impl::ToContiguousFunctor>("ToContiguous");
+  m.add_functor<impl::ToMemoryFormatFunctor>("ToMemoryFormat");
   m.add_functor<impl::SliceFunctor>("Slice");
   m.add_functor<impl::SliceGradFunctor>("SliceGrad");
   m.add_functor<impl::NarrowFunctor>("Narrow");
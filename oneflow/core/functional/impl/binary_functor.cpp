@@ -65,6 +65,14 @@ class AddFunctor {
       }
       return input;
     }
+    if (*input->shape() == *other->shape() && JUST(IsChannelsLast(input))) {
+      // Add on the NHWC views so that the result, or input itself if inplace, stays channels_last.
+      const auto& nhwc_other = JUST(IsChannelsLast(other))
+                                   ? JUST(ChannelsLastToNhwc(other))
+                                   : JUST(functional::Transpose(other, {0, 2, 3, 1}));
+      const auto& y = JUST((*this)(JUST(ChannelsLastToNhwc(input)), nhwc_other, alpha, inplace));
+      return NhwcToChannelsLast(y);
+    }
 
     const OpExpr* op = nullptr;
 
@@ -121,6 +121,41 @@ Maybe<one::UserOpExpr> EagerNcclReduce(Symbol<ParallelDesc> parallel_desc, int64
 
 auto* CachedEagerNcclReduceOpExpr = DECORATE(&EagerNcclReduce, ThreadLocal);
 
+Maybe<one::UserOpExpr> EagerNcclScatter(Symbol<ParallelDesc> parallel_desc, int64_t root) {
+  return one::OpBuilder("eager_nccl_scatter", *JUST(UniqueStr("eager_nccl_scatter")))
+      .Input("in")
+      .Output("out")
+      .Attr<std::string>("parallel_conf", PbMessage2TxtString(parallel_desc->parallel_conf()))
+      .Attr<int64_t>("root", root)
+      .Attr<Shape>("shape", Shape())
+      .Build();
+}
+
+auto* CachedEagerNcclScatterOpExpr = DECORATE(&EagerNcclScatter, ThreadLocal);
+
+Maybe<one::UserOpExpr> EagerNcclGather(Symbol<ParallelDesc> parallel_desc, int64_t root) {
+  return one::OpBuilder("eager_nccl_gather", *JUST(UniqueStr("eager_nccl_gather")))
+      .Input("in")
+      .Output("out")
+      .Attr<std::string>("parallel_conf", PbMessage2TxtString(parallel_desc->parallel_conf()))
+      .Attr<int64_t>("root", root)
+      .Attr<Shape>("shape", Shape())
+      .Build();
+}
+
+auto* CachedEagerNcclGatherOpExpr = DECORATE(&EagerNcclGather, ThreadLocal);
+
+// Parallel desc of the current rank group on the device of the local tensor `x`.
+Maybe<Symbol<ParallelDesc>> GetCurrentRankGroupParallelDesc(const std::shared_ptr<one::Tensor>& x) {
+  const auto& device = JUST(x->device());
+  CHECK_EQ_OR_RETURN(device->device_id(), GlobalProcessCtx::LocalRank());
+  const std::string& device_type_str = device->type();
+  CHECK_OR_RETURN(device_type_str == "cuda" || device_type_str == "cpu");
+  DeviceType device_type = device_type_str == "cuda" ? DeviceType::kCUDA : DeviceType::kCPU;
+  const auto& rank_group = JUST(RankGroupScope::CurrentRankGroup());
+  return RankGroup::GetDefaultParallelDesc(device_type, rank_group);
+}
+
 }  // namespace
 
 class BroadcastFunctor {
@@ -366,26 +401,7 @@ class LocalReduceFunctor {
  public:
   LocalReduceFunctor() = default;
   Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x, int64_t dst, bool inplace) const {
-    const auto& device = JUST(x->device());
-    { CHECK_EQ_OR_RETURN(device->device_id(), GlobalProcessCtx::LocalRank()); }
-    static thread_local std::unordered_map<Symbol<RankGroup>, Symbol<ParallelDesc>>
-        rank_group2parallel_desc;
-    const auto& rank_group = JUST(RankGroupScope::CurrentRankGroup());
-    auto iter = rank_group2parallel_desc.find(rank_group);
-    Symbol<ParallelDesc> parallel_desc;
-    if (iter == rank_group2parallel_desc.end()) {
-      ParallelConf parallel_conf;
-      parallel_conf.set_device_tag(device->type());
-      JUST(rank_group->ForEachRank([&parallel_conf](int64_t rank) -> Maybe<void> {
-        parallel_conf.add_device_name("@" + std::to_string(rank) + ":"
-                                      + std::to_string(GlobalProcessCtx::LocalRank(rank)));
-        return Maybe<void>::Ok();
-      }));
-      parallel_desc = SymbolOf(ParallelDesc(parallel_conf));
-      rank_group2parallel_desc[rank_group] = parallel_desc;
-    } else {
-      parallel_desc = iter->second;
-    }
+    const auto& parallel_desc = JUST(GetCurrentRankGroupParallelDesc(x));
     std::shared_ptr<OpExpr> op_expr = JUST(CachedEagerNcclReduceOpExpr(parallel_desc, dst));
     if (inplace) {
       TensorTuple outputs{x};
@@ -397,6 +413,47 @@ class LocalReduceFunctor {
   }
 };
 
+class LocalScatterFunctor {
+ public:
+  LocalScatterFunctor() = default;
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x, int64_t src) const {
+    const auto& parallel_desc = JUST(GetCurrentRankGroupParallelDesc(x));
+    std::shared_ptr<OpExpr> op_expr = JUST(CachedEagerNcclScatterOpExpr(parallel_desc, src));
+    // On rank src, x stacks one chunk per rank along dim 0; other ranks pass a tensor shaped like
+    // the chunk they receive.
+    Shape shape = *x->shape();
+    if (GlobalProcessCtx::Rank() == src) {
+      CHECK_GE_OR_RETURN(shape.NumAxes(), 1);
+      CHECK_EQ_OR_RETURN(shape.At(0), parallel_desc->parallel_num())
+          << "the tensor to scatter should stack " << parallel_desc->parallel_num()
+          << " chunks along dim 0";
+      DimVector dim_vec(shape.dim_vec().begin() + 1, shape.dim_vec().end());
+      shape = Shape(dim_vec);
+    }
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<Shape>("shape", shape));
+    return OpInterpUtil::Dispatch<Tensor>(*op_expr, {x}, attrs);
+  }
+};
+
+class LocalGatherFunctor {
+ public:
+  LocalGatherFunctor() = default;
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x, int64_t dst) const {
+    const auto& parallel_desc = JUST(GetCurrentRankGroupParallelDesc(x));
+    std::shared_ptr<OpExpr> op_expr = JUST(CachedEagerNcclGatherOpExpr(parallel_desc, dst));
+    // Rank dst gets one chunk per rank stacked along dim 0, the other ranks an empty tensor.
+    DimVector dim_vec{0};
+    if (GlobalProcessCtx::Rank() == dst) {
+      dim_vec = x->shape()->dim_vec();
+      dim_vec.insert(dim_vec.begin(), parallel_desc->parallel_num());
+    }
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<Shape>("shape", Shape(dim_vec)));
+    return OpInterpUtil::Dispatch<Tensor>(*op_expr, {x}, attrs);
+  }
+};
+
 }  // namespace impl
 
 ONEFLOW_FUNCTION_LIBRARY(m) {
@@ -410,6 +467,8 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
   m.add_functor<impl::SendFunctor>("Send");
   m.add_functor<impl::RecvFunctor>("Recv");
   m.add_functor<impl::LocalReduceFunctor>("LocalReduce");
+  m.add_functor<impl::LocalScatterFunctor>("LocalScatter");
+  m.add_functor<impl::LocalGatherFunctor>("LocalGather");
 };
 
 }  // namespace functional
@@ -15,6 +15,8 @@ limitations under the License.
 */
 #include "oneflow/core/functional/impl/common.h"
 #include "oneflow/core/autograd/autograd_mode.h"
+#include "oneflow/core/framework/tensor_methods.h"
+#include "oneflow/core/functional/functional.h"
 
 namespace oneflow {
 namespace one {
@@ -155,6 +157,29 @@ Maybe<Shape> InferShape(const std::shared_ptr<one::Tensor>& x, const Shape& shap
   return infered_shape;
 }
 
+Maybe<bool> IsChannelsLast(const std::shared_ptr<Tensor>& x) {
+  // Tensors whose NCHW and NHWC layouts coincide (e.g. C == 1) are plain contiguous tensors.
+  if (x->ndim() != 4 || x->is_contiguous() || !view::IsViewApplicable(x)) { return false; }
+  const auto& shape = x->shape();
+  const auto& stride = JUST(x->stride());
+  int64_t expected_stride = 1;
+  // Walk the NCHW dims from the innermost to the outermost in NHWC order: C, W, H, N.
+  for (int32_t dim : {1, 3, 2, 0}) {
+    if (shape->At(dim) != 1 && stride->At(dim) != expected_stride) { return false; }
+    expected_stride *= shape->At(dim);
+  }
+  return true;
+}
+
+Maybe<Tensor> ChannelsLastToNhwc(const std::shared_ptr<Tensor>& x) {
+  return view::Transpose(x, {0, 2, 3, 1});
+}
+
+Maybe<Tensor> NhwcToChannelsLast(const std::shared_ptr<Tensor>& x) {
+  if (!view::IsViewApplicable(x)) { return functional::Transpose(x, {0, 3, 1, 2}); }
+  return view::Transpose(x, {0, 3, 1, 2});
+}
+
 }  // namespace functional
 }  // namespace one
 }  // namespace oneflow
@@ -38,6 +38,13 @@ Maybe<void> CheckShapeCanExpandTo(const Shape& shape, const Shape& expand_shape)
 Optional<Stride> ComputeStride(const Shape& shape, const Stride& stride, const Shape& target_shape);
 Maybe<Shape> InferShape(const std::shared_ptr<one::Tensor>& x, const Shape& shape);
 
+// A channels_last tensor is a 4-D NCHW tensor whose elements are laid out in NHWC order. Layout
+// aware functors run their NHWC kernels on the dense NHWC view of such a tensor and hand the
+// result back as channels_last, so the layout survives through the network.
+Maybe<bool> IsChannelsLast(const std::shared_ptr<Tensor>& x);
+Maybe<Tensor> ChannelsLastToNhwc(const std::shared_ptr<Tensor>& x);
+Maybe<Tensor> NhwcToChannelsLast(const std::shared_ptr<Tensor>& x);
+
 }  // namespace functional
 }  // namespace one
 }  // namespace oneflow
@@ -77,6 +77,16 @@ class ConvBaseFunctor {
                            const std::vector<int32_t>& padding,
                            const std::vector<int32_t>& dilation, const int32_t& groups,
                            const std::string& channel_pos) const {
+    if (num_spatial_dims_ == 2 && channel_pos == "channels_first" && JUST(IsChannelsLast(x))) {
+      // Parameters stay contiguous so that optimizers can update them inplace, the weight is
+      // permuted to OHWI for every call unless it has been made channels_last explicitly.
+      const auto& nhwc_weight = JUST(IsChannelsLast(weight))
+                                    ? JUST(ChannelsLastToNhwc(weight))
+                                    : JUST(functional::Transpose(weight, {0, 2, 3, 1}));
+      const auto& y = JUST((*this)(JUST(ChannelsLastToNhwc(x)), nhwc_weight, bias, stride, padding,
+                                   dilation, groups, "channels_last"));
+      return NhwcToChannelsLast(y);
+    }
     MutableAttrMap conv_attrs;
     std::vector<int32_t> kernel_size_vec(num_spatial_dims_);
     int32_t kernel_idx_offset = 2;
@@ -96,7 +106,8 @@ class ConvBaseFunctor {
         JUST(OpInterpUtil::Dispatch<Tensor>(*conv_op_, {x, weight}, conv_attrs));
     if (bias) {
       MutableAttrMap bias_attrs;
-      JUST(bias_attrs.SetAttr<int32_t>("axis", 1));
+      const int32_t bias_axis = channel_pos == "channels_last" ? num_spatial_dims_ + 1 : 1;
+      JUST(bias_attrs.SetAttr<int32_t>("axis", bias_axis));
       return OpInterpUtil::Dispatch<Tensor>(*bias_op_, {conv_out, JUST(bias)}, bias_attrs);
     } else {
       return conv_out;
@@ -267,7 +278,6 @@ class BatchMatMulFunctor {
 class FusedMLPFunctor {
  public:
   FusedMLPFunctor() {
-#if CUDA_VERSION >= 11040
     fused_op_.resize(kMaxInputCount /*the maximum number of inputs*/);
     for (int n = 1; n < fused_op_.size(); ++n) {
       fused_op_[n] = CHECK_JUST(one::OpBuilder("cublas_fused_mlp")
@@ -279,7 +289,6 @@ class FusedMLPFunctor {
                                     .Output("hidden", n)
                                     .Build());
     }
-#endif
   }
   Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x, const TensorTuple& weights,
                            const TensorTuple& biases, bool skip_final_activation) const {
@@ -313,15 +322,21 @@ class FusedMLPFunctor {
       k = n;
     }
 
-#if CUDA_VERSION >= 11050
     DeviceType device_type{};
     if (x->is_consistent()) {
       device_type = JUST(x->parallel_desc())->device_type();
     } else {
       device_type = JUST(x->device())->enum_type();
     }
+    // The CPU kernels of cublas_fused_mlp support float and double only.
+    bool has_fused_kernel = device_type == DeviceType::kCPU
+                            && (x->dtype()->data_type() == DataType::kFloat
+                                || x->dtype()->data_type() == DataType::kDouble);
+#if CUDA_VERSION >= 11050
+    has_fused_kernel = has_fused_kernel || device_type == DeviceType::kCUDA;
+#endif  // CUDA_VERSION >= 11050
 
-    if ((device_type == DeviceType::kCUDA) && (weight_size <= kMaxInputCount)
+    if (has_fused_kernel && (weight_size < kMaxInputCount)
         && (!ParseBooleanFromEnv("ONEFLOW_FUNCTOR_DISABLE_FUSED_MLP", false))) {
       TensorTuple input(2 * weight_size + 1);
       input[0] = x;
@@ -332,7 +347,6 @@ class FusedMLPFunctor {
       JUST(attrs.SetAttr<bool>("skip_final_activation", skip_final_activation));
       return OpInterpUtil::Dispatch<Tensor>(*fused_op_[weight_size], input, attrs);
     }
-#endif  // CUDA_VERSION >= 11050
 
     // Fall back to Naive matmul + bias_add + relu
     std::shared_ptr<one::Tensor> out = x;
@@ -352,9 +366,7 @@ class FusedMLPFunctor {
   }
 
  private:
-#if CUDA_VERSION >= 11040
   std::vector<std::shared_ptr<OpExpr>> fused_op_;
-#endif
 };
 
 class LayerNormFunctor {
@@ -411,6 +423,187 @@ class LayerNormAffineFunctor {
   std::shared_ptr<OpExpr> op_;
 };
 
+class GroupNormFunctor {
+ public:
+  GroupNormFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("group_norm")
+                         .Input("x")
+                         .Output("y")
+                         .Output("mean")
+                         .Output("inv_variance")
+                         .Build());
+    scale_op_ = CHECK_JUST(one::OpBuilder("group_norm")
+                               .Input("x")
+                               .Input("gamma")
+                               .Output("y")
+                               .Output("mean")
+                               .Output("inv_variance")
+                               .Build());
+    center_op_ = CHECK_JUST(one::OpBuilder("group_norm")
+                                .Input("x")
+                                .Input("beta")
+                                .Output("y")
+                                .Output("mean")
+                                .Output("inv_variance")
+                                .Build());
+    affine_op_ = CHECK_JUST(one::OpBuilder("group_norm")
+                                .Input("x")
+                                .Input("gamma")
+                                .Input("beta")
+                                .Output("y")
+                                .Output("mean")
+                                .Output("inv_variance")
+                                .Build());
+  }
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x, const int32_t& num_groups,
+                           const Optional<one::Tensor>& weight, const Optional<one::Tensor>& bias,
+                           const double& eps) const {
+    const auto& x_shape = x->shape();
+    CHECK_GE_OR_RETURN(x_shape->NumAxes(), 2)
+        << "Expected at least 2 dimensions for input tensor but received " << x_shape->NumAxes();
+    const int64_t channels = x_shape->At(1);
+    CHECK_GT_OR_RETURN(num_groups, 0) << "num_groups must be positive, but got " << num_groups;
+    CHECK_EQ_OR_RETURN(channels % num_groups, 0)
+        << "Expected number of channels in input to be divisible by num_groups, but got input of "
+           "shape "
+        << x_shape->ToString() << " and num_groups=" << num_groups;
+    DeviceType device_type{};
+    if (x->is_consistent()) {
+      device_type = JUST(x->parallel_desc())->device_type();
+    } else {
+      device_type = JUST(x->device())->enum_type();
+    }
+    if (device_type == DeviceType::kCPU) {
+      MutableAttrMap attrs;
+      JUST(attrs.SetAttr<int32_t>("num_groups", num_groups));
+      JUST(attrs.SetAttr<double>("epsilon", eps));
+      if (weight && bias) {
+        return OpInterpUtil::Dispatch<Tensor>(*affine_op_, {x, JUST(weight), JUST(bias)}, attrs);
+      } else if (weight) {
+        return OpInterpUtil::Dispatch<Tensor>(*scale_op_, {x, JUST(weight)}, attrs);
+      } else if (bias) {
+        return OpInterpUtil::Dispatch<Tensor>(*center_op_, {x, JUST(bias)}, attrs);
+      }
+      return OpInterpUtil::Dispatch<Tensor>(*op_, {x}, attrs);
+    }
+    // Other devices have no group_norm kernel: normalize each group with layer_norm over a
+    // (N, G, D) view and apply the per-channel affine afterwards.
+    const auto grouped = JUST(functional::Reshape(x, Shape({x_shape->At(0), num_groups, -1})));
+    auto y = JUST(functional::Reshape(
+        JUST(functional::LayerNorm(grouped, /*begin_norm_axis=*/2, /*begin_params_axis=*/2, eps)),
+        *x_shape));
+    if (weight || bias) {
+      DimVector param_dims(x_shape->NumAxes(), 1);
+      param_dims[1] = channels;
+      const Shape param_shape(param_dims);
+      if (weight) {
+        y = JUST(functional::Mul(y, JUST(functional::Reshape(JUST(weight), param_shape))));
+      }
+      if (bias) {
+        y = JUST(functional::Add(y, JUST(functional::Reshape(JUST(bias), param_shape)), /*alpha=*/1,
+                                 /*inplace=*/false));
+      }
+    }
+    return y;
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+  std::shared_ptr<OpExpr> scale_op_;
+  std::shared_ptr<OpExpr> center_op_;
+  std::shared_ptr<OpExpr> affine_op_;
+};
+
+class ScaledDotProductAttentionFunctor {
+ public:
+  ScaledDotProductAttentionFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("scaled_dot_product_attention")
+                         .Input("query")
+                         .Input("key")
+                         .Input("value")
+                         .Output("out")
+                         .Output("softmax_lse")
+                         .Output("rng_seed")
+                         .Build());
+    masked_op_ = CHECK_JUST(one::OpBuilder("scaled_dot_product_attention")
+                                .Input("query")
+                                .Input("key")
+                                .Input("value")
+                                .Input("attn_mask")
+                                .Output("out")
+                                .Output("softmax_lse")
+                                .Output("rng_seed")
+                                .Build());
+  }
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& query,
+                           const std::shared_ptr<one::Tensor>& key,
+                           const std::shared_ptr<one::Tensor>& value,
+                           const Optional<one::Tensor>& attn_mask, const float& dropout_p,
+                           const bool& is_causal, const Optional<Scalar>& scale,
+                           const Optional<one::Generator>& generator) const {
+    const int64_t num_axes = query->shape()->NumAxes();
+    CHECK_GE_OR_RETURN(num_axes, 3)
+        << "query should have at least 3 dimensions, but got " << num_axes;
+    CHECK_OR_RETURN(dropout_p >= 0.0f && dropout_p < 1.0f)
+        << "dropout probability has to be in [0, 1), but got " << dropout_p;
+    const double scale_value =
+        scale ? JUST(JUST(scale).As<double>())
+              : 1.0 / std::sqrt(static_cast<double>(query->shape()->At(num_axes - 1)));
+    std::shared_ptr<one::Tensor> mask;
+    if (attn_mask) {
+      mask = JUST(attn_mask);
+      const int64_t mask_num_axes = mask->shape()->NumAxes();
+      CHECK_LE_OR_RETURN(mask_num_axes, num_axes)
+          << "attn_mask should not have more dimensions than query";
+      if (mask_num_axes < num_axes) {
+        DimVector mask_dims(num_axes - mask_num_axes, 1);
+        for (int64_t i = 0; i < mask_num_axes; ++i) { mask_dims.push_back(mask->shape()->At(i)); }
+        mask = JUST(functional::Reshape(mask, Shape(mask_dims)));
+      }
+    }
+    DeviceType device_type{};
+    if (query->is_consistent()) {
+      device_type = JUST(query->parallel_desc())->device_type();
+    } else {
+      device_type = JUST(query->device())->enum_type();
+    }
+    const auto gen = generator.value_or(JUST(one::DefaultAutoGenerator()));
+    if (device_type == DeviceType::kCPU) {
+      MutableAttrMap attrs;
+      JUST(attrs.SetAttr<double>("scale", scale_value));
+      JUST(attrs.SetAttr<float>("dropout_rate", dropout_p));
+      JUST(attrs.SetAttr<bool>("is_causal", is_causal));
+      const auto& dropout_state = std::make_shared<FusedDropoutKernelState>(gen);
+      if (mask) {
+        return OpInterpUtil::Dispatch<Tensor>(*masked_op_, {query, key, value, mask},
+                                              OpExprInterpContext(attrs, dropout_state));
+      }
+      return OpInterpUtil::Dispatch<Tensor>(*op_, {query, key, value},
+                                            OpExprInterpContext(attrs, dropout_state));
+    }
+    // Other devices have no blockwise kernel and compute the attention weights explicitly.
+    auto weights = JUST(functional::MatMul(query, key, /*transpose_a=*/false,
+                                           /*transpose_b=*/true, scale_value));
+    if (is_causal) {
+      weights = JUST(functional::FusedScaleTril(weights, /*diagonal=*/0,
+                                                Scalar(-std::numeric_limits<double>::infinity()),
+                                                /*scale=*/Scalar(1.0)));
+    }
+    if (mask) { weights = JUST(functional::Add(weights, mask, /*alpha=*/1, /*inplace=*/false)); }
+    weights = JUST(functional::Softmax(weights, num_axes - 1));
+    if (dropout_p > 0.0f) {
+      weights = JUST(functional::Dropout(weights, dropout_p, /*training=*/true, /*inplace=*/false,
+                                         gen, /*addend=*/NullOpt));
+    }
+    return functional::MatMul(weights, value, /*transpose_a=*/false, /*transpose_b=*/false,
+                              /*alpha=*/1.0);
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+  std::shared_ptr<OpExpr> masked_op_;
+};
+
 class PixelShuffleFunctor {
  public:
   PixelShuffleFunctor() {}
@@ -479,6 +672,12 @@ class PoolingNDFunctor {
                                 const std::vector<int32_t>& padding,
                                 const std::vector<int32_t>& dilation, const bool& return_indices,
                                 const bool& ceil_mode, const std::string& data_format) const {
+    if (data_format == "channels_first" && !return_indices && JUST(IsChannelsLast(x))) {
+      auto output = JUST((*this)(JUST(ChannelsLastToNhwc(x)), kernel_size, stride, padding,
+                                 dilation, return_indices, ceil_mode, "channels_last"));
+      (*output)[0] = JUST(NhwcToChannelsLast(output->at(0)));
+      return output;
+    }
     if (x->ndim() == 4 && data_format == "channels_last") {
       if (!return_indices && dilation.at(0) == 1 && dilation.at(1) == 1) {
         // legacy tf style maxpool2d , use cudnn implementation
@@ -1218,6 +1417,42 @@ class CombinedMarginLossFunctor {
   std::shared_ptr<OpExpr> op_;
 };
 
+class EmbeddingBagFunctor {
+ public:
+  EmbeddingBagFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("embedding_bag")
+                         .Input("weight")
+                         .Input("indices")
+                         .Input("offsets")
+                         .Output("out")
+                         .Build());
+    weighted_op_ = CHECK_JUST(one::OpBuilder("embedding_bag")
+                                  .Input("weight")
+                                  .Input("indices")
+                                  .Input("offsets")
+                                  .Input("per_sample_weights")
+                                  .Output("out")
+                                  .Build());
+  }
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& weight,
+                           const std::shared_ptr<one::Tensor>& indices,
+                           const std::shared_ptr<one::Tensor>& offsets,
+                           const Optional<one::Tensor>& per_sample_weights,
+                           const std::string& mode) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<std::string>("mode", mode));
+    if (per_sample_weights) {
+      return OpInterpUtil::Dispatch<Tensor>(
+          *weighted_op_, {weight, indices, offsets, JUST(per_sample_weights)}, attrs);
+    }
+    return OpInterpUtil::Dispatch<Tensor>(*op_, {weight, indices, offsets}, attrs);
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+  std::shared_ptr<OpExpr> weighted_op_;
+};
+
 class CtcLossFunctor {
  public:
   CtcLossFunctor() {
@@ -1398,6 +1633,11 @@ class NormalizationFunctor {
                            const Optional<one::Tensor>& gamma, const Optional<one::Tensor>& beta,
                            const int32_t& axis, const float& epsilon, const float& momentum,
                            const bool& training) const {
+    if (axis == 1 && JUST(IsChannelsLast(x))) {
+      const auto& y = JUST((*this)(JUST(ChannelsLastToNhwc(x)), moving_mean, moving_variance, gamma,
+                                   beta, /*axis=*/3, epsilon, momentum, training));
+      return NhwcToChannelsLast(y);
+    }
     MutableAttrMap attrs;
     JUST(attrs.SetAttr<int32_t>("axis", axis));
     JUST(attrs.SetAttr<float>("epsilon", epsilon));
@@ -1416,7 +1656,7 @@ class NormalizationFunctor {
       gamma_val = JUST(gamma);
       beta_val = JUST(beta);
     } else {
-      const Shape gamma_beta_shape = Shape({x->shape()->At(1)});
+      const Shape gamma_beta_shape = Shape({x->shape()->At(axis)});
       gamma_val = JUST(functional::Constant(gamma_beta_shape, 1.0, x->dtype(), JUST(x->device())));
       beta_val = JUST(functional::Constant(gamma_beta_shape, 0.0, x->dtype(), JUST(x->device())));
     }
@@ -1702,6 +1942,12 @@ class AvgPoolingNDFunctor {
                            const std::vector<int32_t>& padding, const bool& ceil_mode,
                            const bool& count_include_pad, const int32_t& divisor_override,
                            const std::string& data_format) const {
+    if (data_format == "channels_first" && JUST(IsChannelsLast(x))) {
+      const auto& y =
+          JUST((*this)(JUST(ChannelsLastToNhwc(x)), kernel_size, stride, padding, ceil_mode,
+                       count_include_pad, divisor_override, "channels_last"));
+      return NhwcToChannelsLast(y);
+    }
     MutableAttrMap attrs;
     JUST(attrs.SetAttr<std::string>("data_format", data_format));
     JUST(attrs.SetAttr<std::vector<int32_t>>("padding", padding));
@@ -2550,6 +2796,8 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
   m.add_functor<impl::FusedMLPFunctor>("FusedMLP");
   m.add_functor<impl::LayerNormFunctor>("LayerNorm");
   m.add_functor<impl::LayerNormAffineFunctor>("LayerNormAffine");
+  m.add_functor<impl::GroupNormFunctor>("GroupNorm");
+  m.add_functor<impl::ScaledDotProductAttentionFunctor>("ScaledDotProductAttention");
   m.add_functor<impl::TFAvgPool2DFunctor>("AvgPool2D");
   m.add_functor<impl::Maxpool1DFunctor>("Maxpool1D");
   m.add_functor<impl::Maxpool2DFunctor>("Maxpool2D");
@@ -2574,6 +2822,7 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
   m.add_functor<impl::TripletMarginLossFunctor>("TripletMarginLoss");
   m.add_functor<impl::MarginRankingLossFunctor>("MarginRankingLoss");
   m.add_functor<impl::CtcLossFunctor>("CtcLoss");
+  m.add_functor<impl::EmbeddingBagFunctor>("EmbeddingBag");
   m.add_functor<impl::AffineGridFunctor>("AffineGrid");
   m.add_functor<impl::GridSampleFunctor>("GridSample");
   m.add_functor<impl::NormalizationFunctor>("Normalization");
@@ -592,6 +592,45 @@ class CtcLossGradFunctor {
   std::shared_ptr<OpExpr> op_;
 };
 
+class EmbeddingBagGradFunctor {
+ public:
+  EmbeddingBagGradFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("embedding_bag_grad")
+                         .Input("dy")
+                         .Input("weight")
+                         .Input("indices")
+                         .Input("offsets")
+                         .Output("embedding_grad")
+                         .Build());
+    weighted_op_ = CHECK_JUST(one::OpBuilder("embedding_bag_grad")
+                                  .Input("dy")
+                                  .Input("weight")
+                                  .Input("indices")
+                                  .Input("offsets")
+                                  .Input("per_sample_weights")
+                                  .Output("embedding_grad")
+                                  .Build());
+  }
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& dy,
+                           const std::shared_ptr<one::Tensor>& weight,
+                           const std::shared_ptr<one::Tensor>& indices,
+                           const std::shared_ptr<one::Tensor>& offsets,
+                           const Optional<one::Tensor>& per_sample_weights,
+                           const std::string& mode) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<std::string>("mode", mode));
+    if (per_sample_weights) {
+      return OpInterpUtil::Dispatch<Tensor>(
+          *weighted_op_, {dy, weight, indices, offsets, JUST(per_sample_weights)}, attrs);
+    }
+    return OpInterpUtil::Dispatch<Tensor>(*op_, {dy, weight, indices, offsets}, attrs);
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+  std::shared_ptr<OpExpr> weighted_op_;
+};
+
 class PadGradFunctor {
  public:
   PadGradFunctor() {
@@ -830,6 +869,117 @@ class LayerNormParamGradFunctor {
   std::shared_ptr<OpExpr> op_;
 };
 
+class GroupNormGradFunctor {
+ public:
+  GroupNormGradFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("group_norm_grad")
+                         .Input("dy")
+                         .Input("x")
+                         .Input("mean")
+                         .Input("inv_variance")
+                         .Output("dx")
+                         .Build());
+    affine_op_ = CHECK_JUST(one::OpBuilder("group_norm_grad")
+                                .Input("dy")
+                                .Input("x")
+                                .Input("mean")
+                                .Input("inv_variance")
+                                .Input("gamma")
+                                .Output("dx")
+                                .Build());
+  }
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& dy,
+                           const std::shared_ptr<one::Tensor>& x,
+                           const std::shared_ptr<one::Tensor>& mean,
+                           const std::shared_ptr<one::Tensor>& inv_variance,
+                           const Optional<one::Tensor>& gamma) const {
+    if (gamma) {
+      return OpInterpUtil::Dispatch<Tensor>(*affine_op_, {dy, x, mean, inv_variance, JUST(gamma)});
+    }
+    return OpInterpUtil::Dispatch<Tensor>(*op_, {dy, x, mean, inv_variance});
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+  std::shared_ptr<OpExpr> affine_op_;
+};
+
+class GroupNormParamGradFunctor {
+ public:
+  GroupNormParamGradFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("group_norm_param_grad")
+                         .Input("dy")
+                         .Input("x")
+                         .Input("mean")
+                         .Input("inv_variance")
+                         .Output("gamma_diff")
+                         .Output("beta_diff")
+                         .Build());
+  }
+  Maybe<TensorTuple> operator()(const std::shared_ptr<one::Tensor>& dy,
+                                const std::shared_ptr<one::Tensor>& x,
+                                const std::shared_ptr<one::Tensor>& mean,
+                                const std::shared_ptr<one::Tensor>& inv_variance) const {
+    return OpInterpUtil::Dispatch<TensorTuple>(*op_, {dy, x, mean, inv_variance});
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+};
+
+class ScaledDotProductAttentionGradFunctor {
+ public:
+  ScaledDotProductAttentionGradFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("scaled_dot_product_attention_grad")
+                         .Input("out_grad")
+                         .Input("query")
+                         .Input("key")
+                         .Input("value")
+                         .Input("out")
+                         .Input("softmax_lse")
+                         .Input("rng_seed")
+                         .Output("query_grad")
+                         .Output("key_grad")
+                         .Output("value_grad")
+                         .Build());
+    masked_op_ = CHECK_JUST(one::OpBuilder("scaled_dot_product_attention_grad")
+                                .Input("out_grad")
+                                .Input("query")
+                                .Input("key")
+                                .Input("value")
+                                .Input("out")
+                                .Input("softmax_lse")
+                                .Input("rng_seed")
+                                .Input("attn_mask")
+                                .Output("query_grad")
+                                .Output("key_grad")
+                                .Output("value_grad")
+                                .Build());
+  }
+  Maybe<TensorTuple> operator()(
+      const std::shared_ptr<one::Tensor>& out_grad, const std::shared_ptr<one::Tensor>& query,
+      const std::shared_ptr<one::Tensor>& key, const std::shared_ptr<one::Tensor>& value,
+      const std::shared_ptr<one::Tensor>& out, const std::shared_ptr<one::Tensor>& softmax_lse,
+      const std::shared_ptr<one::Tensor>& rng_seed, const double& scale, const float& dropout_p,
+      const bool& is_causal, const Optional<one::Tensor>& attn_mask) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<double>("scale", scale));
+    JUST(attrs.SetAttr<float>("dropout_rate", dropout_p));
+    JUST(attrs.SetAttr<bool>("is_causal", is_causal));
+    if (attn_mask) {
+      return OpInterpUtil::Dispatch<TensorTuple>(
+          *masked_op_, {out_grad, query, key, value, out, softmax_lse, rng_seed, JUST(attn_mask)},
+          attrs);
+    }
+    return OpInterpUtil::Dispatch<TensorTuple>(
+        *op_, {out_grad, query, key, value, out, softmax_lse, rng_seed}, attrs);
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+  std::shared_ptr<OpExpr> masked_op_;
+};
+
 class BroadcastMatmulGradBFunctor {
  public:
   BroadcastMatmulGradBFunctor() {
@@ -1026,8 +1176,12 @@ ONEFLOW_FUNCTION_LIBRARY(m) {
   m.add_functor<impl::LayerNormGradFunctor>("LayerNormGrad");
   m.add_functor<impl::LayerNormAffineGradFunctor>("LayerNormAffineGrad");
   m.add_functor<impl::LayerNormParamGradFunctor>("LayerNormParamGrad");
+  m.add_functor<impl::GroupNormGradFunctor>("GroupNormGrad");
+  m.add_functor<impl::GroupNormParamGradFunctor>("GroupNormParamGrad");
+  m.add_functor<impl::ScaledDotProductAttentionGradFunctor>("ScaledDotProductAttentionGrad");
   m.add_functor<impl::BroadcastMatmulGradBFunctor>("BroadcastMatmulGradB");
   m.add_functor<impl::CtcLossGradFunctor>("CtcLossGrad");
+  m.add_functor<impl::EmbeddingBagGradFunctor>("EmbeddingBagGrad");
   m.add_functor<impl::FusedScaleTrilSoftmaxMaskScaleGradFunctor>(
       "FusedScaleTrilSoftmaxMaskScaleGrad");
   m.add_functor<impl::FusedScaleMaskSoftmaxGradFunctor>("FusedScaleMaskSoftmaxGrad");
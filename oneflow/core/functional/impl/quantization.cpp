@@ -143,6 +143,89 @@ class QuantizationFunctor {
   std::shared_ptr<OpExpr> op_;
 };
 
+class QuantizedLinearFunctor {
+ public:
+  QuantizedLinearFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("quantized_linear")
+                         .Input("x")
+                         .Input("weight")
+                         .Input("weight_scale")
+                         .Output("out")
+                         .Build());
+    bias_op_ = CHECK_JUST(one::OpBuilder("quantized_linear")
+                              .Input("x")
+                              .Input("weight")
+                              .Input("weight_scale")
+                              .Input("bias")
+                              .Output("out")
+                              .Build());
+  }
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x,
+                           const std::shared_ptr<one::Tensor>& weight,
+                           const std::shared_ptr<one::Tensor>& weight_scale,
+                           const float& input_scale, const int32_t& input_zero_point,
+                           const Optional<one::Tensor>& bias, const std::string& activation) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<float>("input_scale", input_scale));
+    JUST(attrs.SetAttr<int32_t>("input_zero_point", input_zero_point));
+    JUST(attrs.SetAttr<std::string>("activation", activation));
+    if (bias) {
+      return OpInterpUtil::Dispatch<Tensor>(*bias_op_, {x, weight, weight_scale, JUST(bias)},
+                                            attrs);
+    }
+    return OpInterpUtil::Dispatch<Tensor>(*op_, {x, weight, weight_scale}, attrs);
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+  std::shared_ptr<OpExpr> bias_op_;
+};
+
+class QuantizedConv2dFunctor {
+ public:
+  QuantizedConv2dFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("quantized_conv2d")
+                         .Input("x")
+                         .Input("weight")
+                         .Input("weight_scale")
+                         .Output("out")
+                         .Build());
+    bias_op_ = CHECK_JUST(one::OpBuilder("quantized_conv2d")
+                              .Input("x")
+                              .Input("weight")
+                              .Input("weight_scale")
+                              .Input("bias")
+                              .Output("out")
+                              .Build());
+  }
+  Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x,
+                           const std::shared_ptr<one::Tensor>& weight,
+                           const std::shared_ptr<one::Tensor>& weight_scale,
+                           const float& input_scale, const int32_t& input_zero_point,
+                           const Optional<one::Tensor>& bias, const std::vector<int32_t>& stride,
+                           const std::vector<int32_t>& padding,
+                           const std::vector<int32_t>& dilation, const int32_t& groups,
+                           const std::string& activation) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<std::vector<int32_t>>("padding_before", padding));
+    JUST(attrs.SetAttr<std::vector<int32_t>>("strides", stride));
+    JUST(attrs.SetAttr<std::vector<int32_t>>("dilation_rate", dilation));
+    JUST(attrs.SetAttr<int32_t>("groups", groups));
+    JUST(attrs.SetAttr<float>("input_scale", input_scale));
+    JUST(attrs.SetAttr<int32_t>("input_zero_point", input_zero_point));
+    JUST(attrs.SetAttr<std::string>("activation", activation));
+    if (bias) {
+      return OpInterpUtil::Dispatch<Tensor>(*bias_op_, {x, weight, weight_scale, JUST(bias)},
+                                            attrs);
+    }
+    return OpInterpUtil::Dispatch<Tensor>(*op_, {x, weight, weight_scale}, attrs);
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+  std::shared_ptr<OpExpr> bias_op_;
+};
+
 }  // namespace impl
 
 ONEFLOW_FUNCTION_LIBRARY(m) { m.add_functor<impl::FakeQuantizationFunctor>("FakeQuantization"); };
@@ -151,6 +234,8 @@ ONEFLOW_FUNCTION_LIBRARY(m) { m.add_functor<impl::MinMaxObserverFunctor>("MinMax
 ONEFLOW_FUNCTION_LIBRARY(m) {
   m.add_functor<impl::MovingAverageMinMaxObserverFunctor>("MovingAverageMinMaxObserver");
 };
+ONEFLOW_FUNCTION_LIBRARY(m) { m.add_functor<impl::QuantizedLinearFunctor>("QuantizedLinear"); };
+ONEFLOW_FUNCTION_LIBRARY(m) { m.add_functor<impl::QuantizedConv2dFunctor>("QuantizedConv2d"); };
 
 }  // namespace functional
 }  // namespace one
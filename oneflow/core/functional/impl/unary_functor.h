@@ -33,6 +33,10 @@ namespace impl {
 class UnaryFunctor {
  public:
   Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x) const {
+    // Elementwise ops run on the dense NHWC view and keep the channels_last memory format.
+    if (JUST(IsChannelsLast(x))) {
+      return NhwcToChannelsLast(JUST((*this)(JUST(ChannelsLastToNhwc(x)))));
+    }
     return OpInterpUtil::Dispatch<Tensor>(*op_, {x});
   }
 
@@ -67,6 +71,9 @@ class InplaceUnaryFunctor {
 class FloatUnaryFunctor {
  public:
   Maybe<Tensor> operator()(const std::shared_ptr<one::Tensor>& x) const {
+    if (JUST(IsChannelsLast(x))) {
+      return NhwcToChannelsLast(JUST((*this)(JUST(ChannelsLastToNhwc(x)))));
+    }
     // The functor lowest Dtype is Float32. (For sigmoid, tanh and etc. )
     TensorProcessor tensor_processor;
     JUST(tensor_processor.AddInputs({x}, DType::Float()).Apply());
@@ -17,6 +17,7 @@ limitations under the License.
 #include "oneflow/core/common/just.h"
 #include "oneflow/core/common/maybe.h"
 #include "oneflow/core/common/util.h"
+#include "oneflow/core/framework/attr_map.h"
 #include "oneflow/core/framework/op_builder.h"
 #include "oneflow/core/framework/op_expr.h"
 #include "oneflow/core/framework/op_interpreter/op_interpreter_util.h"
@@ -53,12 +54,85 @@ class IsInfFunctor final : public UtilOpsFunctor {
   IsInfFunctor() { op_ = CHECK_JUST(one::OpBuilder("isinf").Input("in").Output("out").Build()); }
 };
 
+class MultiCountNotFiniteFunctor {
+ public:
+  MultiCountNotFiniteFunctor() {
+    op_.resize(kMaxInputCount /*the maximum number of inputs*/);
+    for (int n = 0; n < op_.size(); ++n) {
+      op_[n] = CHECK_JUST(
+          one::OpBuilder("multi_count_not_finite").Input("x", n + 1).Output("y").Build());
+    }
+  }
+  Maybe<Tensor> operator()(const TensorTuple& inputs) const {
+    CHECK_GE_OR_RETURN(inputs.size(), 1);
+    // All the inputs of one multi_count_not_finite op must have the same data type, so the inputs
+    // are grouped by data type and each group is counted in chunks of at most kMaxInputCount.
+    HashMap<DataType, TensorTuple> data_type2inputs;
+    std::vector<DataType> data_types;
+    for (const auto& input : inputs) {
+      const DataType data_type = input->dtype()->data_type();
+      auto it = data_type2inputs.find(data_type);
+      if (it == data_type2inputs.end()) {
+        data_types.emplace_back(data_type);
+        it = data_type2inputs.emplace(data_type, TensorTuple()).first;
+      }
+      it->second.emplace_back(input);
+    }
+    std::shared_ptr<Tensor> count;
+    for (const DataType data_type : data_types) {
+      const TensorTuple& group = data_type2inputs.at(data_type);
+      for (int i = 0; i < group.size(); i += kMaxInputCount) {
+        size_t size = (i + kMaxInputCount) < group.size() ? kMaxInputCount : group.size() - i;
+        TensorTuple partial_inputs(size);
+        std::copy(group.begin() + i, group.begin() + i + size, partial_inputs.begin());
+        const auto& partial_count =
+            JUST(OpInterpUtil::Dispatch<Tensor>(*op_.at(size - 1), partial_inputs));
+        count = count ? JUST(functional::Add(count, partial_count, /*alpha=*/1, /*inplace=*/false))
+                      : partial_count;
+      }
+    }
+    return count;
+  }
+
+ private:
+  std::vector<std::shared_ptr<OpExpr>> op_;
+};
+
+class DynamicLossScaleScheduleFunctor {
+ public:
+  DynamicLossScaleScheduleFunctor() {
+    op_ = CHECK_JUST(one::OpBuilder("dynamic_loss_scale_schedule")
+                         .Input("count_not_finite")
+                         .Input("loss_scale")
+                         .Input("good_step_counter")
+                         .Build());
+  }
+  Maybe<void> operator()(const std::shared_ptr<Tensor>& count_not_finite,
+                         const std::shared_ptr<Tensor>& loss_scale,
+                         const std::shared_ptr<Tensor>& good_step_counter,
+                         const int64_t& increment_period, const float& multiplier) const {
+    MutableAttrMap attrs;
+    JUST(attrs.SetAttr<int64_t>("increment_period", increment_period));
+    JUST(attrs.SetAttr<float>("multiplier", multiplier));
+    JUST(OpInterpUtil::Dispatch<TensorTuple>(
+        *op_, {count_not_finite, loss_scale, good_step_counter}, attrs));
+    return Maybe<void>::Ok();
+  }
+
+ private:
+  std::shared_ptr<OpExpr> op_;
+};
+
 }  // namespace impl
 
 using namespace impl;
 
 ONEFLOW_FUNCTION_LIBRARY(m) { m.add_functor<IsNanFunctor>("IsNan"); };
 ONEFLOW_FUNCTION_LIBRARY(m) { m.add_functor<IsInfFunctor>("IsInf"); };
+ONEFLOW_FUNCTION_LIBRARY(m) {
+  m.add_functor<MultiCountNotFiniteFunctor>("MultiCountNotFinite");
+  m.add_functor<DynamicLossScaleScheduleFunctor>("DynamicLossScaleSchedule");
+};
 
 }  // namespace functional
 }  // namespace one
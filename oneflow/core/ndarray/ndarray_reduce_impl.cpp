@@ -17,6 +17,8 @@ limitations under the License.
 #include "oneflow/core/common/preprocessor.h"
 #include "oneflow/core/ndarray/ndarray_reduce_impl.h"
 #include "oneflow/core/ndarray/binary_func.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 
@@ -52,7 +54,29 @@ template<typename T, int NDIMS, template<typename> class binary_func>
 struct NdarrayReduceCoreWrapper<DeviceType::kCPU, T, NDIMS, binary_func> final {
   static void ReduceAxis(ep::Stream* stream, const XpuReducedNdarray<T, NDIMS>& dst_reduced,
                          const XpuReducedNdarray<T, NDIMS>& x, int axis) {
-    NdarrayReduceCore<T, NDIMS, binary_func>::ReduceAxis(dst_reduced, x, axis);
+    // Same per-element reduction order as NdarrayReduceCore, but split into contiguous ranges on
+    // the stream's CPU threading runtime instead of one pool task per output element. Outputs
+    // only overwrite the first `dst_dim_val` slices along `axis`, which no other output reads.
+    const int64_t n = dst_reduced.shape().ElemNum();
+    const int64_t dst_dim_val = dst_reduced.shape().At(axis);
+    const int64_t x_dim_val = x.shape().At(axis);
+    const int64_t reduce_cnt = (x_dim_val + dst_dim_val - 1) / dst_dim_val;
+    stream->As<ep::CpuStream>()->ParallelFor(
+        0, n,
+        [&](int64_t begin, int64_t end) {
+          int64_t coord[NDIMS];
+          FOR_RANGE(int64_t, i, begin, end) {
+            T* dst_reduced_ptr = dst_reduced.template Mut(i);
+            dst_reduced.shape().template Offset2Coordinate<NDIMS>(i, coord);
+            T reduced = UnitOfBinaryFunc<T, binary_func>::Val();
+            while (coord[axis] < x_dim_val) {
+              reduced = binary_func<T>::Invoke(reduced, x.template Get<NDIMS>(coord));
+              coord[axis] += dst_dim_val;
+            }
+            *dst_reduced_ptr = reduced;
+          }
+        },
+        ep::CpuStream::GrainSizeFor(reduce_cnt));
   }
 };
 
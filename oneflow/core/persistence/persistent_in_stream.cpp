@@ -17,8 +17,10 @@ limitations under the License.
 #include "oneflow/core/persistence/binary_in_stream_with_local_copy.h"
 #include "oneflow/core/persistence/binary_in_stream_without_local_copy.h"
 #include "oneflow/core/job/job_set.pb.h"
+#include <chrono>
 #include <cstring>
 #include "oneflow/core/common/constant.h"
+#include "oneflow/core/common/util.h"
 
 namespace oneflow {
 
@@ -41,6 +43,15 @@ size_t GetBufferSize() {
   return kDefaultBufferSize;
 }
 
+constexpr int64_t kDefaultReadAheadBufferNum = 2;
+constexpr int64_t kDefaultReadAheadBufferSize = 4 * 1024 * 1024;  // 4MB
+
+int64_t NanosecondsSince(std::chrono::steady_clock::time_point start) {
+  return std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::steady_clock::now()
+                                                              - start)
+      .count();
+}
+
 }  // namespace
 
 PersistentInStream::PersistentInStream(fs::FileSystem* fs,
@@ -69,6 +80,9 @@ PersistentInStream::PersistentInStream(int64_t session_id, fs::FileSystem* fs,
   cur_buf_begin_ = buffer_.data();
   cur_buf_end_ = buffer_.data();
   *cur_buf_end_ = '\0';
+  read_ahead_done_ = false;
+  read_ahead_stopped_ = false;
+  stats_ = Stats{0, 0, 0, 0};
 }
 
 PersistentInStream::PersistentInStream(fs::FileSystem* fs,
@@ -92,6 +106,83 @@ PersistentInStream::PersistentInStream(int64_t session_id, fs::FileSystem* fs,
                                        const std::string& file_path)
     : PersistentInStream(session_id, fs, std::vector<std::string>({file_path}), 0, false, false) {}
 
+PersistentInStream::~PersistentInStream() {
+  if (read_ahead_thread_.joinable()) {
+    {
+      std::unique_lock<std::mutex> lock(mutex_);
+      read_ahead_stopped_ = true;
+    }
+    cond_.notify_all();
+    read_ahead_thread_.join();
+  }
+  if (stats_.bytes_read > 0) {
+    VLOG(1) << "PersistentInStream read " << stats_.bytes_read << " bytes at "
+            << stats_.bytes_read * 1e3 / std::max<int64_t>(stats_.read_nanoseconds, 1)
+            << " MB/s, stalled " << stats_.stall_count << " times for "
+            << stats_.stall_nanoseconds / 1e6 << " ms";
+  }
+}
+
+void PersistentInStream::EnableReadAhead() {
+  CHECK(!read_ahead_thread_.joinable());
+  CHECK(cur_buf_begin_ == buffer_.data() && cur_buf_end_ == buffer_.data())
+      << "EnableReadAhead must be called before the first read";
+  const int64_t buffer_num = ParseIntegerFromEnv("ONEFLOW_PERSISTENT_IN_STREAM_READ_AHEAD_BUFFERS",
+                                                 kDefaultReadAheadBufferNum);
+  if (buffer_num <= 0) { return; }
+  const int64_t buffer_size = ParseIntegerFromEnv(
+      "ONEFLOW_PERSISTENT_IN_STREAM_READ_AHEAD_BUFFER_SIZE_BYTES", kDefaultReadAheadBufferSize);
+  CHECK_GT(buffer_size, 0);
+  buffer_.resize(buffer_size + 1);
+  cur_buf_begin_ = buffer_.data();
+  cur_buf_end_ = buffer_.data();
+  *cur_buf_end_ = '\0';
+  for (int64_t i = 0; i < buffer_num; ++i) { free_buffers_.emplace_back(buffer_size + 1); }
+  read_ahead_thread_ = std::thread(&PersistentInStream::ReadAheadLoop, this);
+}
+
+PersistentInStream::Stats PersistentInStream::stats() const {
+  std::unique_lock<std::mutex> lock(mutex_);
+  return stats_;
+}
+
+uint64_t PersistentInStream::ReadIntoBuffer(std::vector<char>* buffer) {
+  const auto start = std::chrono::steady_clock::now();
+  uint64_t n = stream_scanner_->UpdateBuffer(buffer);
+  const int64_t elapsed = NanosecondsSince(start);
+  std::unique_lock<std::mutex> lock(mutex_);
+  stats_.bytes_read += n;
+  stats_.read_nanoseconds += elapsed;
+  return n;
+}
+
+void PersistentInStream::ReadAheadLoop() {
+  // Only this thread touches stream_scanner_ once read-ahead is enabled.
+  bool eof = stream_scanner_->IsEof();
+  while (!eof) {
+    std::vector<char> buffer;
+    {
+      std::unique_lock<std::mutex> lock(mutex_);
+      cond_.wait(lock, [this]() { return read_ahead_stopped_ || !free_buffers_.empty(); });
+      if (read_ahead_stopped_) { return; }
+      buffer = std::move(free_buffers_.back());
+      free_buffers_.pop_back();
+    }
+    uint64_t n = ReadIntoBuffer(&buffer);
+    eof = n == 0 || stream_scanner_->IsEof();
+    {
+      std::unique_lock<std::mutex> lock(mutex_);
+      if (n > 0) { filled_buffers_.emplace_back(std::move(buffer), n); }
+    }
+    cond_.notify_all();
+  }
+  {
+    std::unique_lock<std::mutex> lock(mutex_);
+    read_ahead_done_ = true;
+  }
+  cond_.notify_all();
+}
+
 int32_t PersistentInStream::ReadLine(std::string* l) {
   if (IsEof()) { return -1; }
   l->clear();
@@ -126,13 +217,41 @@ int32_t PersistentInStream::ReadFully(char* s, size_t n) {
 
 void PersistentInStream::UpdateBuffer() {
   CHECK_EQ(cur_buf_begin_, cur_buf_end_);
-  uint64_t n = stream_scanner_->UpdateBuffer(&buffer_);
+  uint64_t n = 0;
+  if (read_ahead_thread_.joinable()) {
+    std::unique_lock<std::mutex> lock(mutex_);
+    if (filled_buffers_.empty() && !read_ahead_done_) {
+      const auto start = std::chrono::steady_clock::now();
+      cond_.wait(lock, [this]() { return !filled_buffers_.empty() || read_ahead_done_; });
+      stats_.stall_count += 1;
+      stats_.stall_nanoseconds += NanosecondsSince(start);
+    }
+    if (!filled_buffers_.empty()) {
+      std::swap(buffer_, filled_buffers_.front().first);
+      n = filled_buffers_.front().second;
+      free_buffers_.emplace_back(std::move(filled_buffers_.front().first));
+      filled_buffers_.pop_front();
+      lock.unlock();
+      cond_.notify_all();
+    }
+  } else {
+    // every synchronous read is a stall of the consumer
+    const auto start = std::chrono::steady_clock::now();
+    n = ReadIntoBuffer(&buffer_);
+    std::unique_lock<std::mutex> lock(mutex_);
+    stats_.stall_count += 1;
+    stats_.stall_nanoseconds += NanosecondsSince(start);
+  }
   cur_buf_begin_ = buffer_.data();
   cur_buf_end_ = buffer_.data() + n;
   *cur_buf_end_ = '\0';
 }
 
-bool PersistentInStream::IsEof() const {
-  return cur_buf_begin_ == cur_buf_end_ && stream_scanner_->IsEof();
+bool PersistentInStream::IsEof() {
+  if (cur_buf_begin_ != cur_buf_end_) { return false; }
+  if (!read_ahead_thread_.joinable()) { return stream_scanner_->IsEof(); }
+  std::unique_lock<std::mutex> lock(mutex_);
+  cond_.wait(lock, [this]() { return !filled_buffers_.empty() || read_ahead_done_; });
+  return filled_buffers_.empty();
 }
 }  // namespace oneflow
@@ -16,6 +16,10 @@ limitations under the License.
 #ifndef ONEFLOW_CORE_PERSISTENCE_PERSISTENT_IN_STREAM_H_
 #define ONEFLOW_CORE_PERSISTENCE_PERSISTENT_IN_STREAM_H_
 
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+#include <thread>
 #include "oneflow/core/persistence/file_system.h"
 #include "oneflow/core/persistence/stream_scanner.h"
 
@@ -24,7 +28,7 @@ namespace oneflow {
 class PersistentInStream {
  public:
   OF_DISALLOW_COPY_AND_MOVE(PersistentInStream);
-  virtual ~PersistentInStream() {}
+  virtual ~PersistentInStream();
   PersistentInStream(fs::FileSystem* fs, const std::vector<std::string>& file_paths,
                      uint64_t offset, bool cyclic, bool with_local_copy);
   PersistentInStream(fs::FileSystem* fs, const std::vector<std::string>& file_paths, bool cyclic,
@@ -44,15 +48,42 @@ class PersistentInStream {
   int32_t ReadLine(std::string* l);
   int32_t ReadFully(char* s, size_t n);
 
+  // Moves file reads to a background thread that keeps buffers filled ahead of the
+  // consumer. The buffer count and size come from
+  // ONEFLOW_PERSISTENT_IN_STREAM_READ_AHEAD_BUFFERS (0 disables read-ahead) and
+  // ONEFLOW_PERSISTENT_IN_STREAM_READ_AHEAD_BUFFER_SIZE_BYTES. Must be called before the first
+  // read. Worth it for long sequential scans, not for streams over a single small file.
+  void EnableReadAhead();
+
+  struct Stats {
+    int64_t bytes_read;
+    int64_t read_nanoseconds;  // time spent in file system reads
+    int64_t stall_count;       // times the consumer found no data buffered
+    int64_t stall_nanoseconds;
+  };
+  Stats stats() const;
+
  private:
-  bool IsEof() const;
+  bool IsEof();
   void UpdateBuffer();
+  uint64_t ReadIntoBuffer(std::vector<char>* buffer);
+  void ReadAheadLoop();
 
   std::unique_ptr<StreamScanner> stream_scanner_;
 
   std::vector<char> buffer_;
   char* cur_buf_begin_;
   char* cur_buf_end_;
+
+  // read-ahead state, guarded by mutex_
+  std::thread read_ahead_thread_;
+  mutable std::mutex mutex_;
+  std::condition_variable cond_;
+  std::deque<std::pair<std::vector<char>, uint64_t>> filled_buffers_;
+  std::vector<std::vector<char>> free_buffers_;
+  bool read_ahead_done_;
+  bool read_ahead_stopped_;
+  Stats stats_;
 };
 
 }  // namespace oneflow
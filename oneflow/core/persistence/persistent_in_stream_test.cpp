@@ -0,0 +1,81 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <gtest/gtest.h>
+#include <cstdlib>
+#include "oneflow/core/common/process_state.h"
+#include "oneflow/core/common/str_util.h"
+#include "oneflow/core/persistence/persistent_in_stream.h"
+#include "oneflow/core/persistence/posix/posix_file_system.h"
+
+namespace oneflow {
+
+namespace {
+
+std::vector<std::string> WriteTestFiles(fs::FileSystem* file_system,
+                                        const std::vector<size_t>& sizes, std::string* expected) {
+  std::string current_dir = GetCwd();
+  StringReplace(&current_dir, '\\', '/');
+  std::vector<std::string> file_paths;
+  for (size_t i = 0; i < sizes.size(); ++i) {
+    std::string file_path = JoinPath(current_dir, "/tmp_in_stream_test_" + std::to_string(i));
+    std::string content(sizes.at(i), '\0');
+    for (size_t j = 0; j < content.size(); ++j) { content[j] = static_cast<char>(j * 31 + i); }
+    std::unique_ptr<fs::WritableFile> file;
+    file_system->NewWritableFile(file_path, &file);
+    file->Append(content.data(), content.size());
+    file->Close();
+    expected->append(content);
+    file_paths.emplace_back(file_path);
+  }
+  return file_paths;
+}
+
+std::string ReadAll(fs::FileSystem* file_system, const std::vector<std::string>& file_paths,
+                    bool read_ahead, size_t chunk_size) {
+  PersistentInStream in_stream(file_system, file_paths, false, false);
+  if (read_ahead) { in_stream.EnableReadAhead(); }
+  std::string result;
+  std::string chunk(chunk_size, '\0');
+  while (in_stream.ReadFully(&chunk[0], chunk_size) == 0) { result.append(chunk); }
+  EXPECT_EQ(in_stream.stats().bytes_read, static_cast<int64_t>(result.size()));
+  return result;
+}
+
+}  // namespace
+
+TEST(PersistentInStream, read_ahead) {
+  setenv("ONEFLOW_PERSISTENT_IN_STREAM_READ_AHEAD_BUFFER_SIZE_BYTES", "1000", 1);
+  fs::FileSystem* file_system = new fs::PosixFileSystem();
+  std::string expected;
+  std::vector<std::string> file_paths = WriteTestFiles(file_system, {4000, 7, 6993}, &expected);
+  for (size_t chunk_size : {1, 10, 1000, 11000}) {
+    ASSERT_EQ(ReadAll(file_system, file_paths, false, chunk_size), expected);
+    ASSERT_EQ(ReadAll(file_system, file_paths, true, chunk_size), expected);
+  }
+  {
+    // stopping a cyclic stream early must not block on the read-ahead thread
+    PersistentInStream in_stream(file_system, file_paths, true, false);
+    in_stream.EnableReadAhead();
+    char c = 0;
+    ASSERT_EQ(in_stream.ReadFully(&c, 1), 0);
+    ASSERT_EQ(c, expected.at(0));
+  }
+  for (const auto& file_path : file_paths) { file_system->DelFile(file_path); }
+  unsetenv("ONEFLOW_PERSISTENT_IN_STREAM_READ_AHEAD_BUFFER_SIZE_BYTES");
+  delete file_system;
+}
+
+}  // namespace oneflow
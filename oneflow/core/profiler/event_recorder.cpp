@@ -0,0 +1,68 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/profiler/event_recorder.h"
+#include <chrono>
+#include <sys/syscall.h>
+#include <unistd.h>
+
+namespace oneflow {
+
+namespace profiler {
+
+/* static */ EventRecorder* EventRecorder::Get() {
+  static EventRecorder recorder;
+  return &recorder;
+}
+
+/* static */ int64_t EventRecorder::NowNs() {
+  return std::chrono::duration_cast<std::chrono::nanoseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+
+/* static */ int64_t EventRecorder::CurrentThreadId() {
+  static thread_local int64_t tid = static_cast<int64_t>(syscall(SYS_gettid));
+  return tid;
+}
+
+void EventRecorder::Enable(bool record_shapes, bool with_stack) {
+  std::lock_guard<std::mutex> lock(mutex_);
+  events_.clear();
+  record_shapes_.store(record_shapes, std::memory_order_relaxed);
+  with_stack_.store(with_stack, std::memory_order_relaxed);
+  enabled_.store(true, std::memory_order_release);
+}
+
+std::vector<OpEvent> EventRecorder::Disable() {
+  enabled_.store(false, std::memory_order_release);
+  std::vector<OpEvent> events;
+  {
+    std::lock_guard<std::mutex> lock(mutex_);
+    events.swap(events_);
+  }
+  return events;
+}
+
+void EventRecorder::Record(OpEvent&& event) {
+  std::lock_guard<std::mutex> lock(mutex_);
+  // Events from instructions still in flight when the profiler stops are dropped.
+  if (!enabled_.load(std::memory_order_relaxed)) { return; }
+  events_.emplace_back(std::move(event));
+}
+
+}  // namespace profiler
+
+}  // namespace oneflow
@@ -0,0 +1,82 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_CORE_PROFILER_EVENT_RECORDER_H_
+#define ONEFLOW_CORE_PROFILER_EVENT_RECORDER_H_
+
+#include <atomic>
+#include <mutex>
+#include "oneflow/core/common/util.h"
+
+namespace oneflow {
+
+namespace profiler {
+
+enum class EventKind {
+  kDispatch = 0,  // time spent by the interpreter thread dispatching an eager op
+  kKernel = 1,    // time spent by the vm worker thread running the op kernel
+};
+
+struct OpEvent {
+  std::string name;
+  EventKind kind;
+  std::string device;
+  std::vector<std::string> input_shapes;
+  std::vector<std::string> input_dtypes;
+  int64_t start_ns;
+  int64_t end_ns;
+  int64_t allocated_bytes;
+  int64_t thread_id;
+  std::string stack;
+};
+
+// EventRecorder collects op events for `oneflow.profiler.profile`. Recording is
+// off by default and `IsEnabled` is a single atomic load, so the instrumented
+// code paths cost nothing measurable when no profiler is active. It acquires
+// the release store in `Enable`, so callers that see recording enabled also see
+// the `RecordShapes`/`WithStack` options it was enabled with.
+class EventRecorder final {
+ public:
+  OF_DISALLOW_COPY_AND_MOVE(EventRecorder);
+  ~EventRecorder() = default;
+
+  static EventRecorder* Get();
+
+  static bool IsEnabled() { return Get()->enabled_.load(std::memory_order_acquire); }
+  static bool RecordShapes() { return Get()->record_shapes_.load(std::memory_order_relaxed); }
+  static bool WithStack() { return Get()->with_stack_.load(std::memory_order_relaxed); }
+  static int64_t NowNs();
+  static int64_t CurrentThreadId();
+
+  void Enable(bool record_shapes, bool with_stack);
+  std::vector<OpEvent> Disable();
+  void Record(OpEvent&& event);
+
+ private:
+  EventRecorder() : enabled_(false), record_shapes_(false), with_stack_(false) {}
+
+  std::atomic<bool> enabled_;
+  // written by Enable on the Python thread, read by the vm worker threads
+  std::atomic<bool> record_shapes_;
+  std::atomic<bool> with_stack_;
+  std::mutex mutex_;
+  std::vector<OpEvent> events_;
+};
+
+}  // namespace profiler
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_CORE_PROFILER_EVENT_RECORDER_H_
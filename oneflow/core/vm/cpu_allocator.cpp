@@ -14,17 +14,361 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include <cstdlib>
+#ifdef __linux__
+#include <sys/mman.h>
+#endif  // __linux__
 #include "oneflow/core/vm/cpu_allocator.h"
-#include "oneflow/core/common/util.h"
 
 namespace oneflow {
 namespace vm {
 
+namespace {
+
+inline size_t CpuMemAlignedBytes(size_t bytes) { return RoundUp(bytes, kHostAlignSize); }
+
+inline bool IsAlignedSize(size_t size) { return size % kHostAlignSize == 0; }
+
+static const size_t kPieceSplitThreshold = 128 << 20;  // 128MiB
+static const size_t kHugePageSize = 2 << 20;           // 2MiB
+
+size_t MaxCachedBytesFromEnv() {
+  const int64_t max_cached_mb = ParseIntegerFromEnv("ONEFLOW_CPU_ALLOCATOR_MAX_CACHED_MB", 2048);
+  return static_cast<size_t>(std::max<int64_t>(max_cached_mb, 0)) << 20;
+}
+
+}  // namespace
+
+constexpr size_t CpuAllocator::kMinBinSize;
+
+CpuAllocator::CpuAllocator()
+    : Allocator(),
+      enable_caching_(ParseBooleanFromEnv("ONEFLOW_CPU_CACHING_ALLOCATOR", true)),
+      use_huge_page_(ParseBooleanFromEnv("ONEFLOW_CPU_ALLOCATOR_HUGE_PAGE", false)),
+      max_cached_bytes_(MaxCachedBytesFromEnv()),
+      recycle_piece_list_(nullptr) {
+  bins_.resize(kBinNumSize);
+  for (int i = 0; i < kBinNumSize; ++i) {
+    size_t bin_size = BinSize4BinNum(i);
+    bins_.at(i).size = bin_size;
+    CHECK_EQ(BinNum4BinSize(bin_size), i);
+    CHECK_EQ(BinNum4BinSize(bin_size + kHostAlignSize - 1), i);
+    CHECK_EQ(BinNum4BinSize(bin_size * 2 - 1), i);
+    CHECK_EQ(BinNum4BinSize(bin_size * 2), i == (kBinNumSize - 1) ? i : i + 1);
+  }
+}
+
+CpuAllocator::~CpuAllocator() {
+  for (auto& pair : mem_ptr2block_) { std::free(pair.first); }
+}
+
+void CpuAllocator::InsertPiece2Bin(Piece* piece) {
+  CHECK(piece->is_free && piece->bin_num == kInvalidBinNum);
+  int32_t bin_num = BinNum4BinSize(piece->size);
+  piece->bin_num = bin_num;
+  CHECK(bins_.at(bin_num).pieces.insert(piece).second);
+}
+
+void CpuAllocator::RemovePieceFromBin(Piece* piece) {
+  CHECK(piece->is_free);
+  CHECK_NE(piece->bin_num, kInvalidBinNum);
+  CHECK_GT(bins_.at(piece->bin_num).pieces.erase(piece), 0);
+  piece->bin_num = kInvalidBinNum;
+}
+
+CpuAllocator::Piece* CpuAllocator::AllocatePiece() {
+  if (recycle_piece_list_) {
+    Piece* ret = recycle_piece_list_;
+    recycle_piece_list_ = recycle_piece_list_->next;
+    return ret;
+  } else {
+    pieces_.emplace_back(new Piece());
+    return pieces_.at(pieces_.size() - 1).get();
+  }
+}
+
+void CpuAllocator::DeallocatePiece(Piece* piece) {
+  piece->ptr = nullptr;
+  piece->size = 0;
+  piece->bin_num = kInvalidBinNum;
+  piece->is_free = true;
+  piece->prev = nullptr;
+  piece->next = recycle_piece_list_;
+  recycle_piece_list_ = piece;
+}
+
+void CpuAllocator::MarkPiece(Piece* piece) {
+  CHECK_NOTNULL(piece->ptr);
+  CHECK(ptr2piece_.emplace(piece->ptr, piece).second);
+}
+
+void CpuAllocator::UnMarkPiece(Piece* piece) {
+  CHECK_NOTNULL(piece->ptr);
+  auto it = ptr2piece_.find(piece->ptr);
+  CHECK(it != ptr2piece_.end());
+  ptr2piece_.erase(it);
+}
+
+CpuAllocator::Piece* CpuAllocator::FindPiece(size_t aligned_size) {
+  CHECK(IsAlignedSize(aligned_size));
+  for (int32_t bin_num = BinNum4BinSize(aligned_size); bin_num < kBinNumSize; ++bin_num) {
+    Bin* bin = &bins_.at(bin_num);
+    for (auto it = bin->pieces.begin(); it != bin->pieces.end(); ++it) {
+      Piece* piece = *it;
+      CHECK(piece->is_free);
+      CHECK_NOTNULL(piece->ptr);
+      CHECK_EQ(piece->bin_num, bin_num);
+      CHECK(IsAlignedSize(piece->size));
+      if (piece->size >= aligned_size) {
+        bin->pieces.erase(it);
+        piece->bin_num = kInvalidBinNum;
+        piece->is_free = false;
+        if (piece->size >= aligned_size * 2 || piece->size - aligned_size >= kPieceSplitThreshold) {
+          Piece* new_piece = AllocatePiece();
+          new_piece->ptr = piece->ptr + aligned_size;
+          new_piece->size = piece->size - aligned_size;
+          piece->size = aligned_size;
+
+          Piece* next_p = piece->next;
+          piece->next = new_piece;
+          new_piece->prev = piece;
+          new_piece->next = next_p;
+          if (next_p != nullptr) { next_p->prev = new_piece; }
+
+          new_piece->is_free = true;
+          new_piece->bin_num = kInvalidBinNum;
+          CHECK(IsAlignedSize(piece->size));
+          CHECK(IsAlignedSize(new_piece->size));
+          InsertPiece2Bin(new_piece);
+          MarkPiece(new_piece);
+        }
+        return piece;
+      }
+    }
+  }
+  return nullptr;
+}
+
+void CpuAllocator::MergeNeighbourFreePiece(Piece* lhs, Piece* rhs) {
+  CHECK(lhs->is_free);
+  CHECK(rhs->is_free);
+  CHECK(lhs->next == rhs);
+  CHECK(lhs == rhs->prev);
+  CHECK(lhs->ptr + lhs->size == rhs->ptr);
+
+  lhs->size += rhs->size;
+  lhs->next = rhs->next;
+  if (rhs->next != nullptr) { rhs->next->prev = lhs; }
+  UnMarkPiece(rhs);
+  DeallocatePiece(rhs);
+}
+
+char* CpuAllocator::SystemAllocate(size_t size) {
+  CHECK(IsAlignedSize(size));
+  const bool huge_page = use_huge_page_ && size % kHugePageSize == 0;
+  char* ptr =
+      reinterpret_cast<char*>(aligned_alloc(huge_page ? kHugePageSize : kHostAlignSize, size));
+  if (ptr == nullptr) { return nullptr; }
+#ifdef __linux__
+  // Only a hint, the kernel silently falls back to normal pages when THP is unavailable.
+  if (huge_page) { madvise(ptr, size, MADV_HUGEPAGE); }
+#endif  // __linux__
+  stats_.reserved_bytes += size;
+  stats_.peak_reserved_bytes = std::max(stats_.peak_reserved_bytes, stats_.reserved_bytes);
+  stats_.num_system_allocs += 1;
+  return ptr;
+}
+
+void CpuAllocator::SystemDeallocate(char* ptr, size_t size) {
+  std::free(ptr);
+  CHECK_GE(stats_.reserved_bytes, size);
+  stats_.reserved_bytes -= size;
+  stats_.num_system_frees += 1;
+}
+
+bool CpuAllocator::AllocateBlockToExtendTotalMem(size_t aligned_size) {
+  CHECK(IsAlignedSize(aligned_size));
+
+  size_t allocate_bytes = aligned_size;
+  if (allocate_bytes < 1048576) {
+    // Allocate 2MB if `allocate_bytes` is less than 1MB
+    allocate_bytes = 2097152;
+  } else if (allocate_bytes < 10485760) {
+    // Allocate 20MB if `allocate_bytes` is between 1MB and 10MB
+    allocate_bytes = 20971520;
+  } else {
+    // Round up to 2MB if `allocate_bytes` is larger than 10MB
+    allocate_bytes = RoundUp(allocate_bytes, 2097152);
+  }
+  const size_t final_allocate_bytes = CpuMemAlignedBytes(allocate_bytes);
+
+  if (final_allocate_bytes < aligned_size) { return false; }
+
+  char* mem_ptr = SystemAllocate(final_allocate_bytes);
+  if (mem_ptr == nullptr) { return false; }
+
+  Piece* piece = AllocatePiece();
+  piece->size = final_allocate_bytes;
+  piece->ptr = mem_ptr;
+  piece->prev = nullptr;
+  piece->next = nullptr;
+  piece->is_free = true;
+  piece->bin_num = kInvalidBinNum;
+  InsertPiece2Bin(piece);
+  MarkPiece(piece);
+
+  CHECK(mem_ptr2block_.emplace(mem_ptr, Block(piece)).second);
+
+  return true;
+}
+
+void CpuAllocator::DeallocateBlock(Piece* piece) {
+  CHECK(piece->is_free);
+  CHECK(piece->prev == nullptr && piece->next == nullptr);
+  auto it = mem_ptr2block_.find(piece->ptr);
+  CHECK(it != mem_ptr2block_.end());
+  CHECK_EQ(it->second.start_piece, piece);
+  CHECK_EQ(it->second.size, piece->size);
+  char* ptr = piece->ptr;
+  const size_t size = piece->size;
+  RemovePieceFromBin(piece);
+  UnMarkPiece(piece);
+  DeallocatePiece(piece);
+  mem_ptr2block_.erase(it);
+  SystemDeallocate(ptr, size);
+}
+
+bool CpuAllocator::DeallocateFreeBlockForGarbageCollection() {
+  // Free neighbours are merged eagerly in Deallocate(), so a Block is unused iff it consists of a
+  // single free Piece.
+  std::vector<Piece*> free_block_pieces;
+  size_t total_free_bytes = 0;
+  for (const auto& pair : mem_ptr2block_) {
+    Piece* p = pair.second.start_piece;
+    if (p->is_free && p->next == nullptr) {
+      total_free_bytes += p->size;
+      free_block_pieces.emplace_back(p);
+    }
+  }
+  if (total_free_bytes > 0) {
+    VLOG(3) << "CpuAllocator try deallocate free block for garbage collection. "
+            << " deallocate free bytes : " << total_free_bytes;
+  }
+  for (Piece* p : free_block_pieces) { DeallocateBlock(p); }
+  return total_free_bytes > 0;
+}
+
+void CpuAllocator::UpdateAllocatedBytes(size_t allocated_bytes) {
+  stats_.allocated_bytes = allocated_bytes;
+  stats_.peak_allocated_bytes = std::max(stats_.peak_allocated_bytes, allocated_bytes);
+}
+
 void CpuAllocator::Allocate(char** mem_ptr, std::size_t size) {
-  *mem_ptr = reinterpret_cast<char*>(aligned_alloc(kHostAlignSize, size));
+  if (size == 0) {
+    *mem_ptr = nullptr;
+    return;
+  }
+  size_t aligned_size = CpuMemAlignedBytes(size);
+
+  std::unique_lock<std::mutex> lock(mutex_);
+  stats_.num_alloc_calls += 1;
+  if (!enable_caching_) {
+    *mem_ptr = SystemAllocate(aligned_size);
+    CHECK(*mem_ptr != nullptr) << "Error! : Out of memory when allocate size : " << size;
+    UpdateAllocatedBytes(stats_.allocated_bytes + aligned_size);
+    return;
+  }
+
+  Piece* piece = FindPiece(aligned_size);
+  if (piece == nullptr) {
+    // Release the unused Blocks before growing when the cache is over its bound.
+    if (stats_.reserved_bytes - stats_.allocated_bytes > max_cached_bytes_) {
+      DeallocateFreeBlockForGarbageCollection();
+    }
+    if (AllocateBlockToExtendTotalMem(aligned_size)) { piece = FindPiece(aligned_size); }
+  }
+
+  if (piece == nullptr) {
+    if (DeallocateFreeBlockForGarbageCollection() && AllocateBlockToExtendTotalMem(aligned_size)) {
+      piece = FindPiece(aligned_size);
+    }
+  }
+
+  if (piece == nullptr) {
+    LOG(FATAL) << "Error! : Out of memory when allocate size : " << size
+               << ".\n The total_memory_bytes allocated by this CpuAllocator is : "
+               << stats_.reserved_bytes;
+  }
+  CHECK_NOTNULL(piece->ptr);
+  CHECK(ptr2piece_.find(piece->ptr) != ptr2piece_.end());
+  UpdateAllocatedBytes(stats_.allocated_bytes + piece->size);
+  *mem_ptr = piece->ptr;
+}
+
+void CpuAllocator::Deallocate(char* mem_ptr, std::size_t size) {
+  if (mem_ptr == nullptr) { return; }
+
+  std::unique_lock<std::mutex> lock(mutex_);
+  stats_.num_free_calls += 1;
+  if (!enable_caching_) {
+    const size_t aligned_size = CpuMemAlignedBytes(size);
+    SystemDeallocate(mem_ptr, aligned_size);
+    CHECK_GE(stats_.allocated_bytes, aligned_size);
+    stats_.allocated_bytes -= aligned_size;
+    return;
+  }
+
+  auto it = ptr2piece_.find(mem_ptr);
+  CHECK(it != ptr2piece_.end()) << "Error! : Try deallocate mem_ptr non-existent. mem ptr = "
+                                << mem_ptr << " size = " << size;
+  Piece* piece = it->second;
+  CHECK_NOTNULL(piece);
+  CHECK_EQ(piece->ptr, mem_ptr);
+  CHECK(!piece->is_free);
+
+  piece->is_free = true;
+  CHECK_GE(stats_.allocated_bytes, piece->size);
+  stats_.allocated_bytes -= piece->size;
+
+  Piece* last_piece_insert_to_bin = piece;
+  Piece* next_p = piece->next;
+  Piece* prev_p = piece->prev;
+
+  if (next_p != nullptr && next_p->is_free) {
+    CHECK_EQ(next_p->ptr, piece->ptr + piece->size);
+    RemovePieceFromBin(next_p);
+    MergeNeighbourFreePiece(piece, next_p);
+  }
+
+  if (prev_p != nullptr && prev_p->is_free) {
+    CHECK_EQ(piece->ptr, prev_p->ptr + prev_p->size);
+    RemovePieceFromBin(prev_p);
+    MergeNeighbourFreePiece(prev_p, piece);
+    last_piece_insert_to_bin = prev_p;
+  }
+  InsertPiece2Bin(last_piece_insert_to_bin);
+
+  // Return the Block to the system as soon as it becomes unused if the cache is over its bound.
+  if (last_piece_insert_to_bin->prev == nullptr && last_piece_insert_to_bin->next == nullptr
+      && stats_.reserved_bytes - stats_.allocated_bytes > max_cached_bytes_) {
+    DeallocateBlock(last_piece_insert_to_bin);
+  }
+}
+
+void CpuAllocator::EmptyCache() {
+  std::unique_lock<std::mutex> lock(mutex_);
+  if (enable_caching_) { DeallocateFreeBlockForGarbageCollection(); }
+}
+
+CpuAllocatorStats CpuAllocator::GetStats() const {
+  std::unique_lock<std::mutex> lock(mutex_);
+  return stats_;
 }
 
-void CpuAllocator::Deallocate(char* mem_ptr, std::size_t size) { std::free(mem_ptr); }
+void CpuAllocator::ResetPeakStats() {
+  std::unique_lock<std::mutex> lock(mutex_);
+  stats_.peak_allocated_bytes = stats_.allocated_bytes;
+  stats_.peak_reserved_bytes = stats_.reserved_bytes;
+}
 
 COMMAND(Global<CpuAllocator>::SetAllocated(new CpuAllocator()));
 
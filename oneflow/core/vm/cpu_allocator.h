@@ -17,18 +17,127 @@ limitations under the License.
 #define ONEFLOW_CORE_VM_CPU_ALLOCATOR_H_
 
 #include <cstdint>
+#include <mutex>
 #include "oneflow/core/vm/allocator.h"
+#include "oneflow/core/common/util.h"
 
 namespace oneflow {
 namespace vm {
 
+struct CpuAllocatorStats {
+  // Bytes held by live allocations, counted by the size of the Pieces handed out.
+  size_t allocated_bytes = 0;
+  // Bytes obtained from the system, including the cached free pieces.
+  size_t reserved_bytes = 0;
+  size_t peak_allocated_bytes = 0;
+  size_t peak_reserved_bytes = 0;
+  int64_t num_alloc_calls = 0;
+  int64_t num_free_calls = 0;
+  // Number of Blocks requested from / returned to the system.
+  int64_t num_system_allocs = 0;
+  int64_t num_system_frees = 0;
+};
+
+// CpuAllocator is a caching host allocator with the same Piece/Bin/Block layout as
+// CudaAllocator. Host memory is requested from the system in large Blocks, split into Pieces
+// on Allocate() and merged back on Deallocate(), so that steady-state training does not hit
+// aligned_alloc/free for every tensor.
+//
+// The allocator is shared by every cpu device context, so all public methods are thread safe.
+//
+// Environment variables:
+//   ONEFLOW_CPU_CACHING_ALLOCATOR        (default true)  false falls back to aligned_alloc/free
+//   ONEFLOW_CPU_ALLOCATOR_MAX_CACHED_MB  (default 2048) unused Blocks are released back to the
+//                                        system once the cached free bytes exceed this bound
+//   ONEFLOW_CPU_ALLOCATOR_HUGE_PAGE      (default false) align Blocks to 2MiB and advise the
+//                                        kernel to back them with transparent huge pages
 class CpuAllocator final : public Allocator {
  public:
-  explicit CpuAllocator() = default;
-  ~CpuAllocator() override = default;
+  CpuAllocator();
+  ~CpuAllocator() override;
 
   void Allocate(char** mem_ptr, std::size_t size) override;
   void Deallocate(char* mem_ptr, std::size_t size) override;
+
+  // Release every Block without any Piece in use back to the system.
+  void EmptyCache();
+  CpuAllocatorStats GetStats() const;
+  void ResetPeakStats();
+
+ private:
+  static constexpr int32_t kInvalidBinNum = -1;
+  static constexpr int32_t kBinNumSize = 20;
+  static constexpr size_t kMinBinSize = 512;
+
+  // See CudaAllocator for the meaning of Piece, Bin and Block.
+  struct Piece {
+    size_t size = 0;
+    char* ptr = nullptr;
+    bool is_free = false;
+    Piece* prev = nullptr;
+    Piece* next = nullptr;
+    int32_t bin_num = kInvalidBinNum;
+  };
+
+  //    BinNum:   Bin0, Bin1, Bin2, Bin3, ..., Bin19
+  //    BinSize:  512, 1024, 2048, 4096, ... , 256MB
+  struct Bin {
+    size_t size = 0;
+
+    struct PieceCmp {
+      bool operator()(const Piece* lhs, const Piece* rhs) const {
+        if (lhs->size != rhs->size) { return lhs->size < rhs->size; }
+        return lhs->ptr < rhs->ptr;
+      }
+    };
+    std::set<Piece*, PieceCmp> pieces;
+  };
+
+  struct Block {
+    size_t size = 0;
+    char* ptr = nullptr;
+    Piece* start_piece = nullptr;
+    Block(Piece* p) : size(p->size), ptr(p->ptr), start_piece(p) {}
+  };
+
+  size_t BinSize4BinNum(int32_t bin_num) { return kMinBinSize << bin_num; }
+
+  int32_t BinNum4BinSize(size_t size) {
+    uint64_t value = std::max(size, kMinBinSize) >> 9;
+    return std::min(kBinNumSize - 1, static_cast<int32_t>(63 ^ __builtin_clzll(value)));
+  }
+
+  Piece* FindPiece(size_t aligned_size);
+  void InsertPiece2Bin(Piece* piece);
+  Piece* AllocatePiece();
+  void DeallocatePiece(Piece* piece);
+  void MarkPiece(Piece* piece);
+  void UnMarkPiece(Piece* piece);
+  void MergeNeighbourFreePiece(Piece* lhs, Piece* rhs);
+  void RemovePieceFromBin(Piece* piece);
+
+  char* SystemAllocate(size_t size);
+  void SystemDeallocate(char* ptr, size_t size);
+
+  bool AllocateBlockToExtendTotalMem(size_t aligned_size);
+  // Return the Block which starts at `piece` to the system. `piece` must cover the whole Block.
+  void DeallocateBlock(Piece* piece);
+  bool DeallocateFreeBlockForGarbageCollection();
+
+  void UpdateAllocatedBytes(size_t allocated_bytes);
+
+  const bool enable_caching_;
+  const bool use_huge_page_;
+  const size_t max_cached_bytes_;
+
+  HashMap<char*, Block> mem_ptr2block_;
+  std::vector<Bin> bins_;
+  std::vector<std::unique_ptr<Piece>> pieces_;
+  HashMap<char*, Piece*> ptr2piece_;
+  Piece* recycle_piece_list_;
+
+  CpuAllocatorStats stats_;
+  mutable std::mutex mutex_;
 };
 
 }  // namespace vm
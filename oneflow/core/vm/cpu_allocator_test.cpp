@@ -0,0 +1,105 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "gtest/gtest.h"
+#include "oneflow/core/vm/cpu_allocator.h"
+
+namespace oneflow {
+namespace vm {
+
+TEST(CpuAllocator, cpu_allocator) {
+  CpuAllocator allocator;
+  Allocator* a = &allocator;
+  std::vector<char*> ptrs;
+  for (int i = 0; i < 512; ++i) {
+    char* ptr = nullptr;
+    a->Allocate(&ptr, 1);
+    ASSERT_TRUE(ptr != nullptr);
+    ASSERT_EQ(reinterpret_cast<uintptr_t>(ptr) % kHostAlignSize, 0);
+    ptrs.emplace_back(ptr);
+  }
+  std::sort(ptrs.begin(), ptrs.end());
+  for (int i = 0; i < 512; ++i) {
+    if (i > 0) {
+      ASSERT_TRUE(ptrs.at(i) != ptrs.at(i - 1));
+      ASSERT_TRUE(std::abs(ptrs.at(i) - ptrs.at(i - 1)) >= kHostAlignSize);
+    }
+    a->Deallocate(ptrs.at(i), 1);
+  }
+  ASSERT_EQ(allocator.GetStats().allocated_bytes, 0);
+
+  ptrs.clear();
+  for (int i = 0; i < 2048; ++i) {
+    char* ptr = nullptr;
+    a->Allocate(&ptr, 10000);
+    ASSERT_TRUE(ptr != nullptr);
+    ptrs.emplace_back(ptr);
+  }
+  std::sort(ptrs.begin(), ptrs.end());
+  for (int i = 0; i < 2048; ++i) {
+    if (i > 0) {
+      ASSERT_TRUE(ptrs.at(i) != ptrs.at(i - 1));
+      ASSERT_TRUE(std::abs(ptrs.at(i) - ptrs.at(i - 1)) >= 10000);
+    }
+    a->Deallocate(ptrs.at(i), 10000);
+  }
+
+  char* data_ptr_1 = nullptr;
+  a->Allocate(&data_ptr_1, 2048 * sizeof(float));
+
+  char* data_ptr_2 = nullptr;
+  a->Allocate(&data_ptr_2, 4096 * sizeof(double));
+
+  ASSERT_TRUE(data_ptr_1 != data_ptr_2);
+  if (data_ptr_1 < data_ptr_2) {
+    ASSERT_TRUE(data_ptr_1 + 2048 * sizeof(float) <= data_ptr_2);
+  } else {
+    ASSERT_TRUE(data_ptr_2 + 4096 * sizeof(double) <= data_ptr_1);
+  }
+
+  a->Deallocate(data_ptr_2, 4096 * sizeof(double));
+  a->Deallocate(data_ptr_1, 2048 * sizeof(float));
+}
+
+TEST(CpuAllocator, cpu_allocator_stats) {
+  CpuAllocator allocator;
+  char* ptr = nullptr;
+  allocator.Allocate(&ptr, 1000);
+  CpuAllocatorStats stats = allocator.GetStats();
+  ASSERT_GE(stats.allocated_bytes, 1000);
+  ASSERT_GE(stats.reserved_bytes, stats.allocated_bytes);
+  ASSERT_EQ(stats.peak_allocated_bytes, stats.allocated_bytes);
+  const int64_t num_system_allocs = stats.num_system_allocs;
+
+  // A freed piece is reused without going back to the system.
+  allocator.Deallocate(ptr, 1000);
+  allocator.Allocate(&ptr, 1000);
+  ASSERT_EQ(allocator.GetStats().num_system_allocs, num_system_allocs);
+  allocator.Deallocate(ptr, 1000);
+
+  stats = allocator.GetStats();
+  ASSERT_EQ(stats.allocated_bytes, 0);
+  ASSERT_GT(stats.peak_allocated_bytes, 0);
+  allocator.ResetPeakStats();
+  ASSERT_EQ(allocator.GetStats().peak_allocated_bytes, 0);
+
+  allocator.EmptyCache();
+  stats = allocator.GetStats();
+  ASSERT_EQ(stats.reserved_bytes, 0);
+  ASSERT_EQ(stats.num_system_allocs, stats.num_system_frees);
+}
+
+}  // namespace vm
+}  // namespace oneflow
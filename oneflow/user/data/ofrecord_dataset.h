@@ -79,6 +79,7 @@ class OFRecordDataset final : public Dataset<TensorBuffer> {
     std::vector<std::string> local_file_paths = GetLocalFilePaths();
     in_stream_.reset(
         new PersistentInStream(DataFS(), local_file_paths, !shuffle_after_epoch_, false));
+    in_stream_->EnableReadAhead();
   }
   ~OFRecordDataset() = default;
 
@@ -109,6 +110,7 @@ class OFRecordDataset final : public Dataset<TensorBuffer> {
     std::shuffle(data_file_paths_.begin(), data_file_paths_.end(), g);
     std::vector<std::string> local_file_paths = GetLocalFilePaths();
     in_stream_.reset(new PersistentInStream(DataFS(), local_file_paths, false, false));
+    in_stream_->EnableReadAhead();
   }
 
   std::vector<std::string> GetLocalFilePaths() {
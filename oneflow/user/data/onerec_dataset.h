@@ -150,6 +150,7 @@ class OneRecDataset final : public Dataset<TensorBuffer> {
     }
     std::vector<std::string> file_paths = GetLocalFilePaths();
     in_stream_.reset(new PersistentInStream(DataFS(), file_paths, false, false));
+    in_stream_->EnableReadAhead();
   }
 
   std::vector<std::string> GetLocalFilePaths() {
@@ -0,0 +1,96 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/user/image/image_cache.h"
+#include <cstring>
+
+namespace oneflow {
+
+DecodedImageCache::DecodedImageCache(int64_t capacity_bytes, Hasher hasher)
+    : capacity_bytes_(capacity_bytes),
+      hasher_(std::move(hasher)),
+      size_bytes_(0),
+      hit_count_(0),
+      miss_count_(0) {
+  CHECK_GE(capacity_bytes_, 0);
+}
+
+DecodedImageCache::~DecodedImageCache() {
+  if (enabled()) {
+    VLOG(1) << "DecodedImageCache holds " << entries_.size() << " images (" << size_bytes_ << " of "
+            << capacity_bytes_ << " bytes), " << hit_count_ << " hits, " << miss_count_
+            << " misses";
+  }
+}
+
+DecodedImageCache::Key DecodedImageCache::MakeKey(const std::string& encoded) const {
+  return Key{hasher_(encoded), encoded.size()};
+}
+
+bool DecodedImageCache::Lookup(const std::string& encoded, TensorBuffer* out) {
+  if (!enabled()) { return false; }
+  const Key key = MakeKey(encoded);
+  std::shared_ptr<const std::string> stored;
+  std::shared_ptr<const TensorBuffer> image;
+  {
+    std::unique_lock<std::mutex> lock(mutex_);
+    auto it = index_.find(key);
+    if (it != index_.end()) {
+      entries_.splice(entries_.begin(), entries_, it->second);
+      stored = it->second->encoded;
+      image = it->second->image;
+    }
+  }
+  // compare and copy outside of the lock, the shared_ptrs keep the entry alive if it gets
+  // evicted meanwhile; equal hashes of different bytes are a miss
+  if (!image || std::memcmp(stored->data(), encoded.data(), encoded.size()) != 0) {
+    miss_count_ += 1;
+    return false;
+  }
+  out->CopyFrom(*image);
+  hit_count_ += 1;
+  return true;
+}
+
+void DecodedImageCache::Insert(const std::string& encoded, const TensorBuffer& image) {
+  const int64_t nbytes = image.nbytes() + static_cast<int64_t>(encoded.size());
+  if (!enabled() || nbytes > capacity_bytes_) { return; }
+  const Key key = MakeKey(encoded);
+  auto encoded_copy = std::make_shared<const std::string>(encoded);
+  auto copy = std::make_shared<TensorBuffer>();
+  copy->CopyFrom(image);
+  std::list<Entry> evicted;
+  {
+    std::unique_lock<std::mutex> lock(mutex_);
+    // an entry with the same key is kept, even when only the hashes of the bytes collide
+    if (index_.find(key) != index_.end()) { return; }
+    while (size_bytes_ + nbytes > capacity_bytes_) {
+      size_bytes_ -= entries_.back().nbytes;
+      index_.erase(entries_.back().key);
+      evicted.splice(evicted.begin(), entries_, std::prev(entries_.end()));
+    }
+    entries_.push_front(Entry{key, nbytes, std::move(encoded_copy), std::move(copy)});
+    index_.emplace(key, entries_.begin());
+    size_bytes_ += nbytes;
+  }
+  // evicted images are released here, outside of the lock
+}
+
+int64_t DecodedImageCache::size_bytes() {
+  std::unique_lock<std::mutex> lock(mutex_);
+  return size_bytes_;
+}
+
+}  // namespace oneflow
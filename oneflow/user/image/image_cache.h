@@ -0,0 +1,88 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_USER_IMAGE_IMAGE_CACHE_H_
+#define ONEFLOW_USER_IMAGE_IMAGE_CACHE_H_
+
+#include <atomic>
+#include <functional>
+#include <list>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include "oneflow/core/common/tensor_buffer.h"
+#include "oneflow/core/common/util.h"
+
+namespace oneflow {
+
+// Byte-budgeted LRU cache of decoded images, keyed by the encoded bytes they were decoded from.
+// It lets the image decode ops skip decoding records they have already seen in earlier epochs.
+// Entries are found by a hash of the encoded bytes and a hit is only reported when the stored
+// bytes are equal too, the budget covers both the decoded images and their encoded bytes.
+// All methods are thread-safe; a capacity of 0 disables the cache.
+class DecodedImageCache final {
+ public:
+  using Hasher = std::function<size_t(const std::string&)>;
+
+  OF_DISALLOW_COPY_AND_MOVE(DecodedImageCache);
+  // `hasher` only needs replacing to force hash collisions in tests
+  explicit DecodedImageCache(int64_t capacity_bytes, Hasher hasher = std::hash<std::string>());
+  ~DecodedImageCache();
+
+  bool enabled() const { return capacity_bytes_ > 0; }
+
+  // Copies the image previously decoded from `encoded` into `out`, returns false on a miss.
+  bool Lookup(const std::string& encoded, TensorBuffer* out);
+  // Caches a copy of `image` decoded from `encoded`, evicting least recently used images to
+  // stay within the capacity. Images larger than the whole capacity are not cached.
+  void Insert(const std::string& encoded, const TensorBuffer& image);
+
+  int64_t size_bytes();
+  int64_t hit_count() const { return hit_count_; }
+  int64_t miss_count() const { return miss_count_; }
+
+ private:
+  struct Key {
+    size_t hash;
+    size_t size;
+    bool operator==(const Key& other) const { return hash == other.hash && size == other.size; }
+  };
+  struct KeyHash {
+    size_t operator()(const Key& key) const { return key.hash ^ (key.size * 0x9E3779B97F4A7C15); }
+  };
+  struct Entry {
+    Key key;
+    int64_t nbytes;
+    std::shared_ptr<const std::string> encoded;
+    std::shared_ptr<const TensorBuffer> image;
+  };
+
+  Key MakeKey(const std::string& encoded) const;
+
+  const int64_t capacity_bytes_;
+  const Hasher hasher_;
+  std::mutex mutex_;
+  // most recently used first
+  std::list<Entry> entries_;
+  std::unordered_map<Key, std::list<Entry>::iterator, KeyHash> index_;
+  int64_t size_bytes_;
+  std::atomic<int64_t> hit_count_;
+  std::atomic<int64_t> miss_count_;
+};
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_USER_IMAGE_IMAGE_CACHE_H_
@@ -0,0 +1,106 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include <gtest/gtest.h>
+#include <thread>
+#include "oneflow/user/image/image_cache.h"
+
+namespace oneflow {
+
+namespace {
+
+TensorBuffer MakeImage(int64_t h, int64_t w, uint8_t value) {
+  TensorBuffer image;
+  image.Resize(Shape({h, w, 3}), DataType::kUInt8);
+  memset(image.mut_data<uint8_t>(), value, image.nbytes());
+  return image;
+}
+
+}  // namespace
+
+TEST(DecodedImageCache, lookup_and_insert) {
+  DecodedImageCache cache(1024);
+  TensorBuffer out;
+  ASSERT_FALSE(cache.Lookup("a", &out));
+  cache.Insert("a", MakeImage(4, 4, 7));
+  ASSERT_TRUE(cache.Lookup("a", &out));
+  ASSERT_EQ(out.shape(), Shape({4, 4, 3}));
+  ASSERT_EQ(out.data<uint8_t>()[out.nbytes() - 1], 7);
+  ASSERT_FALSE(cache.Lookup("b", &out));
+  ASSERT_EQ(cache.hit_count(), 1);
+  ASSERT_EQ(cache.miss_count(), 2);
+  // 48 bytes of image and 1 byte of encoded data
+  ASSERT_EQ(cache.size_bytes(), 49);
+}
+
+TEST(DecodedImageCache, evicts_least_recently_used) {
+  DecodedImageCache cache(100);
+  TensorBuffer out;
+  cache.Insert("a", MakeImage(4, 4, 1));
+  cache.Insert("b", MakeImage(4, 4, 2));
+  ASSERT_TRUE(cache.Lookup("a", &out));
+  cache.Insert("c", MakeImage(4, 4, 3));
+  ASSERT_TRUE(cache.Lookup("a", &out));
+  ASSERT_FALSE(cache.Lookup("b", &out));
+  ASSERT_TRUE(cache.Lookup("c", &out));
+  ASSERT_EQ(cache.size_bytes(), 98);
+  cache.Insert("d", MakeImage(8, 8, 4));
+  ASSERT_FALSE(cache.Lookup("d", &out));
+  ASSERT_EQ(cache.size_bytes(), 98);
+}
+
+TEST(DecodedImageCache, hash_collision) {
+  DecodedImageCache cache(1024, [](const std::string&) -> size_t { return 0; });
+  TensorBuffer out;
+  cache.Insert("ab", MakeImage(4, 4, 1));
+  cache.Insert("cd", MakeImage(4, 4, 2));
+  ASSERT_TRUE(cache.Lookup("ab", &out));
+  ASSERT_EQ(out.data<uint8_t>()[0], 1);
+  ASSERT_FALSE(cache.Lookup("cd", &out));
+  ASSERT_EQ(cache.hit_count(), 1);
+  ASSERT_EQ(cache.miss_count(), 1);
+  ASSERT_EQ(cache.size_bytes(), 50);
+}
+
+TEST(DecodedImageCache, disabled) {
+  DecodedImageCache cache(0);
+  TensorBuffer out;
+  ASSERT_FALSE(cache.enabled());
+  cache.Insert("a", MakeImage(1, 1, 1));
+  ASSERT_FALSE(cache.Lookup("a", &out));
+  ASSERT_EQ(cache.size_bytes(), 0);
+}
+
+TEST(DecodedImageCache, concurrent_access) {
+  DecodedImageCache cache(48 * 16);
+  std::vector<std::thread> threads;
+  for (int t = 0; t < 4; ++t) {
+    threads.emplace_back([&cache, t]() {
+      TensorBuffer out;
+      for (int i = 0; i < 1000; ++i) {
+        const std::string key = std::to_string((i * 7 + t) % 32);
+        if (cache.Lookup(key, &out)) {
+          ASSERT_EQ(out.data<uint8_t>()[0], static_cast<uint8_t>(key.size()));
+        } else {
+          cache.Insert(key, MakeImage(4, 4, static_cast<uint8_t>(key.size())));
+        }
+      }
+    });
+  }
+  for (auto& thread : threads) { thread.join(); }
+  ASSERT_LE(cache.size_bytes(), 48 * 16);
+}
+
+}  // namespace oneflow
@@ -83,6 +83,30 @@ struct AvgPoolingKernelUtil<DeviceType::kCPU, T, IDX> {
         params_3d.count_include_pad(), params_3d.divisor_override());
   }
 
+  static void Avgpool2dForwardCLast(ep::Stream* stream,
+                                    const NdIndexOffsetHelper<IDX, 4>& index_helper,
+                                    const IDX elem_num, const T* src, T* dest,
+                                    const AvgPoolingParams3D& params_3d) {
+    Avgpool2dForwardComputeCLast<T, IDX>(
+        index_helper, elem_num, src, dest, params_3d.padding()[1], params_3d.padding()[2],
+        params_3d.num_batch(), params_3d.num_channel(), params_3d.GetXShape5D().At(3),
+        params_3d.GetXShape5D().At(4), params_3d.pooling_size_3d()[1],
+        params_3d.pooling_size_3d()[2], params_3d.stride_3d()[1], params_3d.stride_3d()[2],
+        params_3d.count_include_pad(), params_3d.divisor_override());
+  }
+
+  static void Avgpool2dBackwardCLast(ep::Stream* stream,
+                                     const NdIndexOffsetHelper<IDX, 4>& index_helper,
+                                     const IDX elem_num, const T* src, T* dest,
+                                     const AvgPoolingParams3D& params_3d) {
+    Avgpool2dBackwardComputeCLast<T, IDX>(
+        index_helper, elem_num, src, dest, params_3d.padding()[1], params_3d.padding()[2],
+        params_3d.num_batch(), params_3d.num_channel(), params_3d.GetXShape5D().At(3),
+        params_3d.GetXShape5D().At(4), params_3d.pooling_size_3d()[1],
+        params_3d.pooling_size_3d()[2], params_3d.stride_3d()[1], params_3d.stride_3d()[2],
+        params_3d.count_include_pad(), params_3d.divisor_override());
+  }
+
   static void Avgpool3dForward(ep::Stream* stream, const NdIndexOffsetHelper<IDX, 4>& index_helper,
                                const IDX elem_num, const T* src, T* dest,
                                const AvgPoolingParams3D& params_3d) {
@@ -215,6 +239,21 @@ class AvgPool2dKernel final : public user_op::OpKernel {
     const T* src = x->dptr<T>();
     T* dest = y->mut_dptr<T>();
 
+    if (params_3d.data_format() == "channels_last") {
+      DimVector y_vector;
+      y->shape().ToDimVector(&y_vector);
+      if (elem_num < GetMaxVal<int32_t>()) {
+        NdIndexOffsetHelper<int32_t, 4> index_helper(y_vector.data());
+        AvgPoolingKernelUtil<device_type, T, int32_t>::Avgpool2dForwardCLast(
+            ctx->stream(), index_helper, elem_num, src, dest, params_3d);
+      } else {
+        NdIndexOffsetHelper<int64_t, 4> index_helper(y_vector.data());
+        AvgPoolingKernelUtil<device_type, T, int64_t>::Avgpool2dForwardCLast(
+            ctx->stream(), index_helper, elem_num, src, dest, params_3d);
+      }
+      return;
+    }
+
     DimVector y_vector(3);
     y_vector.at(0) = y->shape().At(0) * y->shape().At(1);
     y_vector.at(1) = y->shape().At(2);
@@ -259,6 +298,21 @@ class AvgPool2dGradKernel final : public user_op::OpKernel {
     size_t out_bytes_size = dx->shape().elem_cnt() * GetSizeOfDataType(dx->data_type());
     Memset<device_type>(ctx->stream(), dest, 0, out_bytes_size);
 
+    if (params_3d.data_format() == "channels_last") {
+      DimVector dy_vector;
+      dy->shape().ToDimVector(&dy_vector);
+      if (elem_num < GetMaxVal<int32_t>()) {
+        NdIndexOffsetHelper<int32_t, 4> index_helper(dy_vector.data());
+        AvgPoolingKernelUtil<device_type, T, int32_t>::Avgpool2dBackwardCLast(
+            ctx->stream(), index_helper, elem_num, src, dest, params_3d);
+      } else {
+        NdIndexOffsetHelper<int64_t, 4> index_helper(dy_vector.data());
+        AvgPoolingKernelUtil<device_type, T, int64_t>::Avgpool2dBackwardCLast(
+            ctx->stream(), index_helper, elem_num, src, dest, params_3d);
+      }
+      return;
+    }
+
     DimVector dy_vector(3);
     dy_vector.at(0) = dy->shape().At(0) * dy->shape().At(1);
     dy_vector.at(1) = dy->shape().At(2);
@@ -61,6 +61,21 @@ __launch_bounds__(kBlockSize) __global__
                              stride_w, count_include_pad, divisor_override);
 };
 
+template<typename T, typename IDX>
+__launch_bounds__(kBlockSize) __global__
+    void DoCUDAAvgPool2dForwardCLast(const NdIndexOffsetHelper<IDX, 4> index_helper, IDX elem_num,
+                                     const T* src, T* dest, const int32_t padding_h,
+                                     const int32_t padding_w, const int32_t n_batch,
+                                     const int32_t n_channel, const int32_t x_height,
+                                     const int32_t x_width, const int32_t kernel_size_h,
+                                     const int32_t kernel_size_w, const int32_t stride_h,
+                                     const int32_t stride_w, const bool count_include_pad,
+                                     const int32_t divisor_override) {
+  Avgpool2dForwardComputeCLast<T>(index_helper, elem_num, src, dest, padding_h, padding_w, n_batch,
+                                  n_channel, x_height, x_width, kernel_size_h, kernel_size_w,
+                                  stride_h, stride_w, count_include_pad, divisor_override);
+};
+
 template<typename T, typename IDX>
 __launch_bounds__(kBlockSize) __global__
     void DoCUDAAvgPool3dForward(const NdIndexOffsetHelper<IDX, 4> index_helper, IDX elem_num,
@@ -106,6 +121,22 @@ __launch_bounds__(kBlockSize) __global__
                               stride_h, stride_w, count_include_pad, divisor_override);
 };
 
+template<typename T, typename IDX>
+__launch_bounds__(kBlockSize) __global__
+    void DoCUDAAvgPool2dBackwardCLast(const NdIndexOffsetHelper<IDX, 4> index_helper, IDX elem_num,
+                                      const T* src, T* dest, const int32_t padding_h,
+                                      const int32_t padding_w, const int32_t n_batch,
+                                      const int32_t n_channel, const int32_t input_height,
+                                      const int32_t input_width, const int32_t kernel_size_h,
+                                      const int32_t kernel_size_w, const int32_t stride_h,
+                                      const int32_t stride_w, const bool count_include_pad,
+                                      int32_t divisor_override) {
+  Avgpool2dBackwardComputeCLast<T>(index_helper, elem_num, src, dest, padding_h, padding_w, n_batch,
+                                   n_channel, input_height, input_width, kernel_size_h,
+                                   kernel_size_w, stride_h, stride_w, count_include_pad,
+                                   divisor_override);
+};
+
 template<typename T, typename IDX>
 __launch_bounds__(kBlockSize) __global__ void DoCUDAAvgPool3dBackward(
     const NdIndexOffsetHelper<IDX, 4> index_helper, IDX elem_num, const T* src, T* dest,
@@ -166,6 +197,32 @@ struct AvgPoolingKernelUtil<DeviceType::kCUDA, T, IDX> {
         params_3d.count_include_pad(), params_3d.divisor_override());
   }
 
+  static void Avgpool2dForwardCLast(ep::Stream* stream,
+                                    const NdIndexOffsetHelper<IDX, 4>& index_helper,
+                                    const IDX elem_num, const T* src, T* dest,
+                                    const AvgPoolingParams3D& params_3d) {
+    DoCUDAAvgPool2dForwardCLast<T, IDX><<<GetNumBlocks(elem_num), GetMinThreadNum(elem_num), 0,
+                                          stream->As<ep::CudaStream>()->cuda_stream()>>>(
+        index_helper, elem_num, src, dest, params_3d.padding()[1], params_3d.padding()[2],
+        params_3d.num_batch(), params_3d.num_channel(), params_3d.GetXShape5D().At(3),
+        params_3d.GetXShape5D().At(4), params_3d.pooling_size_3d()[1],
+        params_3d.pooling_size_3d()[2], params_3d.stride_3d()[1], params_3d.stride_3d()[2],
+        params_3d.count_include_pad(), params_3d.divisor_override());
+  }
+
+  static void Avgpool2dBackwardCLast(ep::Stream* stream,
+                                     const NdIndexOffsetHelper<IDX, 4>& index_helper,
+                                     const IDX elem_num, const T* src, T* dest,
+                                     const AvgPoolingParams3D& params_3d) {
+    DoCUDAAvgPool2dBackwardCLast<T, IDX><<<GetNumBlocks(elem_num), GetMinThreadNum(elem_num), 0,
+                                           stream->As<ep::CudaStream>()->cuda_stream()>>>(
+        index_helper, elem_num, src, dest, params_3d.padding()[1], params_3d.padding()[2],
+        params_3d.num_batch(), params_3d.num_channel(), params_3d.GetXShape5D().At(3),
+        params_3d.GetXShape5D().At(4), params_3d.pooling_size_3d()[1],
+        params_3d.pooling_size_3d()[2], params_3d.stride_3d()[1], params_3d.stride_3d()[2],
+        params_3d.count_include_pad(), params_3d.divisor_override());
+  }
+
   static void Avgpool3dForward(ep::Stream* stream, const NdIndexOffsetHelper<IDX, 4>& index_helper,
                                const IDX elem_num, const T* src, T* dest,
                                const AvgPoolingParams3D& params_3d) {
@@ -123,6 +123,16 @@ struct AvgPoolingKernelUtil {
                                 const IDX elem_num, const T* src, T* dest,
                                 const AvgPoolingParams3D& params_3d);
 
+  static void Avgpool2dForwardCLast(ep::Stream* stream,
+                                    const NdIndexOffsetHelper<IDX, 4>& index_helper,
+                                    const IDX elem_num, const T* src, T* dest,
+                                    const AvgPoolingParams3D& params_3d);
+
+  static void Avgpool2dBackwardCLast(ep::Stream* stream,
+                                     const NdIndexOffsetHelper<IDX, 4>& index_helper,
+                                     const IDX elem_num, const T* src, T* dest,
+                                     const AvgPoolingParams3D& params_3d);
+
   static void Avgpool3dForward(ep::Stream* stream, const NdIndexOffsetHelper<IDX, 4>& index_helper,
                                const IDX elem_num, const T* src, T* dest,
                                const AvgPoolingParams3D& params_3d);
@@ -299,6 +309,97 @@ OF_DEVICE_FUNC void Avgpool2dBackwardCompute(
   }
 }
 
+template<typename T, typename IDX>
+OF_DEVICE_FUNC void Avgpool2dForwardComputeCLast(
+    const NdIndexOffsetHelper<IDX, 4> index_helper, IDX elem_num, const T* src, T* dest,
+    const int32_t padding_h, const int32_t padding_w, const int32_t n_batch,
+    const int32_t n_channel, const int32_t x_height, const int32_t x_width,
+    const int32_t kernel_size_h, const int32_t kernel_size_w, const int32_t stride_h,
+    const int32_t stride_w, const bool count_include_pad, int32_t divisor_override) {
+  XPU_1D_KERNEL_LOOP(num, elem_num) {
+    IDX n, h, w, c;
+    index_helper.OffsetToNdIndex(num, n, h, w, c);
+
+    const IDX start_idx = n * x_height * x_width * n_channel + c;
+    IDX hstart = h * stride_h - padding_h;
+    IDX wstart = w * stride_w - padding_w;
+
+    IDX hend = XPU_INT_MIN<IDX>(hstart + kernel_size_h, x_height + padding_h);
+    IDX wend = XPU_INT_MIN<IDX>(wstart + kernel_size_w, x_width + padding_w);
+    const IDX pool_size = (hend - hstart) * (wend - wstart);
+
+    hstart = XPU_INT_MAX<IDX>(0, hstart);
+    wstart = XPU_INT_MAX<IDX>(0, wstart);
+    hend = XPU_INT_MIN<IDX>(hend, x_height);
+    wend = XPU_INT_MIN<IDX>(wend, x_width);
+
+    IDX divide_factor;
+    if (divisor_override != static_cast<int32_t>(0)) {
+      divide_factor = divisor_override;
+    } else {
+      if (count_include_pad) {
+        divide_factor = pool_size;
+      } else {
+        divide_factor = (hend - hstart) * (wend - wstart);
+      }
+    }
+    T sum = 0;
+
+    const T* data = src + start_idx;
+    for (IDX i = hstart; i < hend; i += 1) {
+      for (IDX j = wstart; j < wend; j += 1) {
+        const IDX window_idx = (i * x_width + j) * n_channel;
+        sum += data[window_idx];
+      }
+    }
+    dest[num] = sum / divide_factor;
+  }
+}
+
+template<typename T, typename IDX>
+OF_DEVICE_FUNC void Avgpool2dBackwardComputeCLast(
+    const NdIndexOffsetHelper<IDX, 4> index_helper, IDX elem_num, const T* src, T* dest,
+    const int32_t padding_h, const int32_t padding_w, const int32_t n_batch,
+    const int32_t n_channel, const int32_t input_height, const int32_t input_width,
+    const int32_t kernel_size_h, const int32_t kernel_size_w, const int32_t stride_h,
+    const int32_t stride_w, const bool count_include_pad, int32_t divisor_override) {
+  XPU_1D_KERNEL_LOOP(num, elem_num) {
+    IDX n, h, w, c;
+    index_helper.OffsetToNdIndex(num, n, h, w, c);
+
+    const IDX start_idx = n * input_height * input_width * n_channel + c;
+    IDX hstart = h * stride_h - padding_h;
+    IDX wstart = w * stride_w - padding_w;
+    IDX hend = XPU_INT_MIN<IDX>(hstart + kernel_size_h, input_height + padding_h);
+    IDX wend = XPU_INT_MIN<IDX>(wstart + kernel_size_w, input_width + padding_w);
+    const IDX pool_size = (hend - hstart) * (wend - wstart);
+
+    hstart = XPU_INT_MAX<IDX>(IDX(0), hstart);
+    wstart = XPU_INT_MAX<IDX>(IDX(0), wstart);
+    hend = XPU_INT_MIN<IDX>(hend, input_height);
+    wend = XPU_INT_MIN<IDX>(wend, input_width);
+
+    IDX divide_factor;
+    if (divisor_override != static_cast<int32_t>(0)) {
+      divide_factor = divisor_override;
+    } else {
+      if (count_include_pad) {
+        divide_factor = pool_size;
+      } else {
+        divide_factor = (hend - hstart) * (wend - wstart);
+      }
+    }
+    T grad_delta = src[num] / divide_factor;
+    T* data = dest + start_idx;
+    for (IDX i = hstart; i < hend; i += 1) {
+      for (IDX j = wstart; j < wend; j += 1) {
+        const IDX window_idx = (i * input_width + j) * n_channel;
+        XPUAdd<T>::Invoke(&grad_delta, &data[window_idx]);  // dest[search_idx] += grad_delta
+      }
+    }
+  }
+}
+
 template<typename T, typename IDX>
 OF_DEVICE_FUNC void Avgpool3dForwardCompute(
     const NdIndexOffsetHelper<IDX, 4> index_helper, IDX elem_num, const T* src, T* dest,
@@ -15,6 +15,8 @@ limitations under the License.
 */
 #include "oneflow/core/framework/framework.h"
 #include "oneflow/user/kernels/dim_gather_kernel_util.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 
@@ -25,8 +27,19 @@ struct DimGatherFunctor<DeviceType::kCPU, IN_T, IDX_T> final {
   void operator()(ep::Stream* stream, const DimOpIndexNdHelper<IDX_T>& input_nd_helper,
                   const DimOpIndexNdHelper<IDX_T>& index_nd_helper, int ndim, int64_t elem_cnt,
                   int32_t dim, const IDX_T* index, const IN_T* input, IN_T* output) {
-    DoDimGather<IN_T, IDX_T>(input_nd_helper, index_nd_helper, ndim, elem_cnt, dim, index, input,
-                             output);
+    // Every output element is independent, so the flat index range is split across threads.
+    stream->As<ep::CpuStream>()->ParallelFor(
+        0, elem_cnt,
+        [&input_nd_helper, &index_nd_helper, ndim, dim, index, input, output](int64_t begin,
+                                                                              int64_t end) {
+          FOR_RANGE(int64_t, index_offset, begin, end) {
+            IDX_T coordinate[kDimGatherMaxDimCount] = {0};
+            index_nd_helper.OffsetToNdIndex(index_offset, coordinate, ndim);
+            coordinate[dim] = index[index_offset];
+            output[index_offset] = input[input_nd_helper.NdIndexToOffset(coordinate, ndim)];
+          }
+        },
+        ep::CpuStream::GrainSizeFor(ndim));
   }
 };
 
@@ -16,6 +16,8 @@ limitations under the License.
 
 #include "oneflow/core/framework/framework.h"
 #include "oneflow/user/kernels/dim_scatter_kernel_util.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 namespace user_op {
@@ -27,8 +29,40 @@ struct DimScatterFunctor<DeviceType::kCPU, IN_T, IDX_T, Opt> final {
                   const DimOpIndexNdHelper<IDX_T>& output_nd_helper, const int ndim,
                   const int64_t elem_cnt, const int32_t dim, const int64_t upper_bound,
                   const IDX_T* index, const IN_T* src, IN_T* output) {
-    DoDimScatter<IN_T, IDX_T, Opt>(src_nd_helper, idx_nd_helper, output_nd_helper, ndim, elem_cnt,
-                                   dim, upper_bound, index, src, output);
+    if (elem_cnt == 0) { return; }
+    // Two index elements can only hit the same output element when they differ in `dim` alone,
+    // so every lane of the index tensor along `dim` is scattered by one thread, in the same order
+    // as a single-threaded loop.
+    IDX_T last_coordinate[kDimGatherMaxDimCount] = {0};
+    idx_nd_helper.OffsetToNdIndex(elem_cnt - 1, last_coordinate, ndim);
+    const int64_t dim_size = last_coordinate[dim] + 1;
+    int64_t inner_size = 1;
+    for (int i = dim + 1; i < ndim; ++i) { inner_size *= last_coordinate[i] + 1; }
+    const int64_t num_lanes = elem_cnt / dim_size;
+    stream->As<ep::CpuStream>()->ParallelFor(
+        0, num_lanes,
+        [&](int64_t lane_begin, int64_t lane_end) {
+          FOR_RANGE(int64_t, lane, lane_begin, lane_end) {
+            const int64_t outer_idx = lane / inner_size;
+            const int64_t inner_idx = lane - outer_idx * inner_size;
+            FOR_RANGE(int64_t, d, 0, dim_size) {
+              const int64_t idx_offset = (outer_idx * dim_size + d) * inner_size + inner_idx;
+              IDX_T coordinate[kDimGatherMaxDimCount] = {0};
+              idx_nd_helper.OffsetToNdIndex(idx_offset, coordinate, ndim);
+              IDX_T idx_elem = index[idx_offset];
+              if (idx_elem >= upper_bound) {
+                UNIMPLEMENTED() << "The index element " << idx_elem
+                                << " is out of bounds for dimension " << dim << " with size "
+                                << upper_bound << ".";
+              }
+              IDX_T src_offset = src_nd_helper.NdIndexToOffset(coordinate, ndim);
+              coordinate[dim] = idx_elem;
+              IDX_T output_offset = output_nd_helper.NdIndexToOffset(coordinate, ndim);
+              Opt<IN_T>::apply(src + src_offset, output + output_offset);
+            }
+          }
+        },
+        ep::CpuStream::GrainSizeFor(dim_size * ndim));
   }
 };
 
@@ -53,20 +53,6 @@ size_t InferEagerCclS2SKernelTmpBufferSize(user_op::InferContext* ctx) {
   return tensor_byte_size * 2;
 }
 
-Maybe<std::vector<std::pair<int64_t, int64_t>>> RawGroupP2PPair(
-    Symbol<ParallelDesc> parallel_desc) {
-  std::shared_ptr<std::vector<std::pair<int64_t, int64_t>>> p2p_pairs =
-      std::make_shared<std::vector<std::pair<int64_t, int64_t>>>();
-  for (int64_t src : parallel_desc->sorted_machine_ids()) {
-    for (int64_t dst : parallel_desc->sorted_machine_ids()) {
-      p2p_pairs->emplace_back(std::make_pair(src, dst));
-    }
-  }
-  return p2p_pairs;
-}
-
-static constexpr auto* GroupP2PPair = DECORATE(&RawGroupP2PPair, ThreadLocal);
-
 void InitEagerCclOpKernelCache(user_op::KernelCacheContext* ctx,
                                std::shared_ptr<user_op::OpKernelCache>* cache_ptr) {
   // NOTE(jianhao): the cache only depends on parallel_conf, and the kernel is singleton
@@ -165,6 +151,81 @@ REGISTER_USER_KERNEL("eager_nccl_reduce")
     .SetCreateFn<EagerCclReduceKernel>()
     .SetIsMatchedHob(user_op::HobDeviceType() == DeviceType::kCPU);
 
+class EagerCclScatterKernel final : public user_op::OpKernel {
+ public:
+  EagerCclScatterKernel() = default;
+  ~EagerCclScatterKernel() override = default;
+
+  void InitOpKernelCacheWithFlags(
+      user_op::KernelCacheContext* ctx, int8_t flag,
+      std::shared_ptr<user_op::OpKernelCache>* cache_ptr) const override {
+    InitEagerCclOpKernelCache(ctx, cache_ptr);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState*,
+               const user_op::OpKernelCache* cache) const override {
+    auto* kernel_cache = dynamic_cast<const EagerCclOpKernelCache*>(cache);
+    CHECK(kernel_cache != nullptr);
+    const user_op::Tensor* in = ctx->Tensor4ArgNameAndIndex("in", 0);
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    int64_t root = ctx->Attr<int64_t>("root");
+    const void* in_ptr = nullptr;
+    if (GlobalProcessCtx::Rank() == root) {
+      CHECK_EQ(in->shape().elem_cnt(),
+               out->shape().elem_cnt() * kernel_cache->parallel_desc()->parallel_num());
+      in_ptr = in->dptr();
+    }
+    CHECK_JUST(ccl::Scatter<DeviceType::kCPU>(in_ptr, out->mut_dptr(), out->shape().elem_cnt(),
+                                              out->data_type(), root, kernel_cache->parallel_desc(),
+                                              ctx->stream()));
+  };
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+REGISTER_USER_KERNEL("eager_nccl_scatter")
+    .SetCreateFn<EagerCclScatterKernel>()
+    .SetIsMatchedHob(user_op::HobDeviceType() == DeviceType::kCPU);
+
+class EagerCclGatherKernel final : public user_op::OpKernel {
+ public:
+  EagerCclGatherKernel() = default;
+  ~EagerCclGatherKernel() override = default;
+
+  void InitOpKernelCacheWithFlags(
+      user_op::KernelCacheContext* ctx, int8_t flag,
+      std::shared_ptr<user_op::OpKernelCache>* cache_ptr) const override {
+    InitEagerCclOpKernelCache(ctx, cache_ptr);
+  }
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState*,
+               const user_op::OpKernelCache* cache) const override {
+    auto* kernel_cache = dynamic_cast<const EagerCclOpKernelCache*>(cache);
+    CHECK(kernel_cache != nullptr);
+    const user_op::Tensor* in = ctx->Tensor4ArgNameAndIndex("in", 0);
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    int64_t root = ctx->Attr<int64_t>("root");
+    void* out_ptr = nullptr;
+    if (GlobalProcessCtx::Rank() == root) {
+      CHECK_EQ(out->shape().elem_cnt(),
+               in->shape().elem_cnt() * kernel_cache->parallel_desc()->parallel_num());
+      out_ptr = out->mut_dptr();
+    }
+    CHECK_JUST(ccl::Gather<DeviceType::kCPU>(in->dptr(), out_ptr, in->shape().elem_cnt(),
+                                             in->data_type(), root, kernel_cache->parallel_desc(),
+                                             ctx->stream()));
+  };
+  // Only the root has a non-empty output, the other ranks still have to send their input.
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+REGISTER_USER_KERNEL("eager_nccl_gather")
+    .SetCreateFn<EagerCclGatherKernel>()
+    .SetIsMatchedHob(user_op::HobDeviceType() == DeviceType::kCPU);
+
 class EagerCclAllReduceKernel final : public user_op::OpKernel {
  public:
   EagerCclAllReduceKernel() = default;
@@ -335,35 +396,9 @@ class EagerCclS2SKernel final : public user_op::OpKernel {
     {
       // NOTE: Do S2S
       const int64_t elem_per_chunk = elem_cnt / num_ranks;
-      const int64_t chunk_size = elem_per_chunk * dtype_size;
-      const auto& p2p_pairs = CHECK_JUST(GroupP2PPair(kernel_cache->parallel_desc()));
-      for (const auto& pair : *p2p_pairs) {
-        int64_t src = pair.first;
-        int64_t dst = pair.second;
-
-        if (GlobalProcessCtx::Rank() == src) {
-          Symbol<ParallelDesc> parallel_desc = kernel_cache->parallel_desc();
-          int64_t device_id = GlobalProcessCtx::LocalRank(dst);
-          int64_t parallel_id =
-              CHECK_JUST(parallel_desc->ParallelId4MachineDeviceId(dst, device_id));
-
-          CHECK_JUST(Send<DeviceType::kCPU>(
-              reinterpret_cast<const void*>(reinterpret_cast<const char*>(pack_to_ptr)
-                                            + parallel_id * chunk_size),
-              elem_per_chunk, in->data_type(), dst, ctx->stream()));
-        }
-        if (GlobalProcessCtx::Rank() == dst) {
-          Symbol<ParallelDesc> parallel_desc = kernel_cache->parallel_desc();
-          int64_t device_id = GlobalProcessCtx::LocalRank(src);
-          int64_t parallel_id =
-              CHECK_JUST(parallel_desc->ParallelId4MachineDeviceId(src, device_id));
-
-          CHECK_JUST(Recv<DeviceType::kCPU>(
-              reinterpret_cast<void*>(reinterpret_cast<char*>(unpack_from_ptr)
-                                      + parallel_id * chunk_size),
-              elem_per_chunk, out->data_type(), src, ctx->stream()));
-        }
-      }
+      CHECK_JUST(ccl::AllToAll<DeviceType::kCPU>(pack_to_ptr, unpack_from_ptr, elem_per_chunk,
+                                                 in->data_type(), kernel_cache->parallel_desc(),
+                                                 ctx->stream()));
     }
 
     if (in_split_axis != 0) {
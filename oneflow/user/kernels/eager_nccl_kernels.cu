@@ -199,6 +199,97 @@ REGISTER_USER_KERNEL("eager_nccl_reduce")
     .SetCreateFn<EagerNcclReduceKernel>()
     .SetIsMatchedHob(user_op::HobDeviceType() == DeviceType::kCUDA);
 
+class EagerNcclScatterKernel final : public user_op::OpKernel {
+ public:
+  EagerNcclScatterKernel() = default;
+  ~EagerNcclScatterKernel() override = default;
+
+  void InitOpKernelCacheWithFlags(
+      user_op::KernelCacheContext* ctx, int8_t flag,
+      std::shared_ptr<user_op::OpKernelCache>* cache_ptr) const override {
+    InitEagerNcclOpKernelCache(ctx, cache_ptr);
+  }
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState*,
+               const user_op::OpKernelCache* cache) const override {
+    auto* kernel_cache = dynamic_cast<const EagerNcclOpKernelCache*>(cache);
+    CHECK(kernel_cache != nullptr);
+    const user_op::Tensor* in = ctx->Tensor4ArgNameAndIndex("in", 0);
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    int64_t root = ctx->Attr<int64_t>("root");
+    Symbol<ParallelDesc> parallel_desc = kernel_cache->parallel_desc();
+    const int64_t root_parallel_id = CHECK_JUST(
+        parallel_desc->ParallelId4MachineDeviceId(root, GlobalProcessCtx::LocalRank(root)));
+    const int64_t elem_cnt = out->shape().elem_cnt();
+    const int64_t chunk_size = elem_cnt * GetSizeOfDataType(out->data_type());
+    cudaStream_t cuda_stream = ctx->stream()->As<ep::CudaStream>()->cuda_stream();
+    OF_NCCL_CHECK(ncclGroupStart());
+    if (GlobalProcessCtx::Rank() == root) {
+      CHECK_EQ(in->shape().elem_cnt(), elem_cnt * parallel_desc->parallel_num());
+      for (int64_t j = 0; j < parallel_desc->parallel_num(); ++j) {
+        OF_NCCL_CHECK(ncclSend(in->dptr<char>() + j * chunk_size, elem_cnt,
+                               GetNcclDataType(out->data_type()), j, kernel_cache->comm(),
+                               cuda_stream));
+      }
+    }
+    OF_NCCL_CHECK(ncclRecv(out->mut_dptr(), elem_cnt, GetNcclDataType(out->data_type()),
+                           root_parallel_id, kernel_cache->comm(), cuda_stream));
+    OF_NCCL_CHECK(ncclGroupEnd());
+  };
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+REGISTER_USER_KERNEL("eager_nccl_scatter")
+    .SetCreateFn<EagerNcclScatterKernel>()
+    .SetIsMatchedHob(user_op::HobDeviceType() == DeviceType::kCUDA);
+
+class EagerNcclGatherKernel final : public user_op::OpKernel {
+ public:
+  EagerNcclGatherKernel() = default;
+  ~EagerNcclGatherKernel() override = default;
+
+  void InitOpKernelCacheWithFlags(
+      user_op::KernelCacheContext* ctx, int8_t flag,
+      std::shared_ptr<user_op::OpKernelCache>* cache_ptr) const override {
+    InitEagerNcclOpKernelCache(ctx, cache_ptr);
+  }
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState*,
+               const user_op::OpKernelCache* cache) const override {
+    auto* kernel_cache = dynamic_cast<const EagerNcclOpKernelCache*>(cache);
+    CHECK(kernel_cache != nullptr);
+    const user_op::Tensor* in = ctx->Tensor4ArgNameAndIndex("in", 0);
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    int64_t root = ctx->Attr<int64_t>("root");
+    Symbol<ParallelDesc> parallel_desc = kernel_cache->parallel_desc();
+    const int64_t root_parallel_id = CHECK_JUST(
+        parallel_desc->ParallelId4MachineDeviceId(root, GlobalProcessCtx::LocalRank(root)));
+    const int64_t elem_cnt = in->shape().elem_cnt();
+    const int64_t chunk_size = elem_cnt * GetSizeOfDataType(in->data_type());
+    cudaStream_t cuda_stream = ctx->stream()->As<ep::CudaStream>()->cuda_stream();
+    OF_NCCL_CHECK(ncclGroupStart());
+    OF_NCCL_CHECK(ncclSend(in->dptr(), elem_cnt, GetNcclDataType(in->data_type()), root_parallel_id,
+                           kernel_cache->comm(), cuda_stream));
+    if (GlobalProcessCtx::Rank() == root) {
+      CHECK_EQ(out->shape().elem_cnt(), elem_cnt * parallel_desc->parallel_num());
+      for (int64_t j = 0; j < parallel_desc->parallel_num(); ++j) {
+        OF_NCCL_CHECK(ncclRecv(out->mut_dptr<char>() + j * chunk_size, elem_cnt,
+                               GetNcclDataType(in->data_type()), j, kernel_cache->comm(),
+                               cuda_stream));
+      }
+    }
+    OF_NCCL_CHECK(ncclGroupEnd());
+  };
+  // Only the root has a non-empty output, the other ranks still have to send their input.
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+REGISTER_USER_KERNEL("eager_nccl_gather")
+    .SetCreateFn<EagerNcclGatherKernel>()
+    .SetIsMatchedHob(user_op::HobDeviceType() == DeviceType::kCUDA);
+
 class EagerNcclReduceScatterKernel final : public user_op::OpKernel {
  public:
   EagerNcclReduceScatterKernel() = default;
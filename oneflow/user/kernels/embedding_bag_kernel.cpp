@@ -0,0 +1,100 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/kernel/new_kernel_util.h"
+#include "oneflow/user/kernels/embedding_bag_kernel_util.h"
+
+namespace oneflow {
+
+namespace {
+
+template<typename T>
+const T* PerSampleWeightsPtr(user_op::KernelComputeContext* ctx) {
+  if (!ctx->has_input("per_sample_weights", 0)) { return nullptr; }
+  return ctx->Tensor4ArgNameAndIndex("per_sample_weights", 0)->dptr<T>();
+}
+
+}  // namespace
+
+template<DeviceType device_type, typename T, typename K>
+class EmbeddingBagKernel final : public user_op::OpKernel {
+ public:
+  EmbeddingBagKernel() = default;
+  ~EmbeddingBagKernel() = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* weight = ctx->Tensor4ArgNameAndIndex("weight", 0);
+    const user_op::Tensor* indices = ctx->Tensor4ArgNameAndIndex("indices", 0);
+    const user_op::Tensor* offsets = ctx->Tensor4ArgNameAndIndex("offsets", 0);
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    const EmbeddingBagMode mode = ParseEmbeddingBagMode(ctx->Attr<std::string>("mode"));
+    EmbeddingBagKernelUtil<device_type, T, K>::Forward(
+        ctx->stream(), mode, indices->shape().elem_cnt(), offsets->shape().elem_cnt(),
+        weight->shape().At(0), weight->shape().At(1), weight->dptr<T>(), indices->dptr<K>(),
+        offsets->dptr<K>(), PerSampleWeightsPtr<T>(ctx), out->mut_dptr<T>());
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+template<DeviceType device_type, typename T, typename K>
+class EmbeddingBagGradKernel final : public user_op::OpKernel {
+ public:
+  EmbeddingBagGradKernel() = default;
+  ~EmbeddingBagGradKernel() = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* weight = ctx->Tensor4ArgNameAndIndex("weight", 0);
+    const user_op::Tensor* indices = ctx->Tensor4ArgNameAndIndex("indices", 0);
+    const user_op::Tensor* offsets = ctx->Tensor4ArgNameAndIndex("offsets", 0);
+    user_op::Tensor* embedding_grad = ctx->Tensor4ArgNameAndIndex("embedding_grad", 0);
+    const EmbeddingBagMode mode = ParseEmbeddingBagMode(ctx->Attr<std::string>("mode"));
+    // Lookups outside every bag and non-maximal lookups in max mode receive no gradient.
+    Memset<device_type>(ctx->stream(), embedding_grad->mut_dptr(), 0,
+                        embedding_grad->shape().elem_cnt() * sizeof(T));
+    EmbeddingBagKernelUtil<device_type, T, K>::Backward(
+        ctx->stream(), mode, indices->shape().elem_cnt(), offsets->shape().elem_cnt(),
+        weight->shape().At(0), weight->shape().At(1), dy->dptr<T>(), weight->dptr<T>(),
+        indices->dptr<K>(), offsets->dptr<K>(), PerSampleWeightsPtr<T>(ctx),
+        embedding_grad->mut_dptr<T>());
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_EMBEDDING_BAG_KERNELS(device, data_type_pair, index_type_pair)               \
+  REGISTER_USER_KERNEL("embedding_bag")                                                       \
+      .SetCreateFn<EmbeddingBagKernel<device, OF_PP_PAIR_FIRST(data_type_pair),               \
+                                      OF_PP_PAIR_FIRST(index_type_pair)>>()                   \
+      .SetIsMatchedHob(                                                                       \
+          (user_op::HobDeviceType() == device)                                                \
+          && (user_op::HobDataType("out", 0) == OF_PP_PAIR_SECOND(data_type_pair))            \
+          && (user_op::HobDataType("indices", 0) == OF_PP_PAIR_SECOND(index_type_pair)));     \
+  REGISTER_USER_KERNEL("embedding_bag_grad")                                                  \
+      .SetCreateFn<EmbeddingBagGradKernel<device, OF_PP_PAIR_FIRST(data_type_pair),           \
+                                          OF_PP_PAIR_FIRST(index_type_pair)>>()               \
+      .SetIsMatchedHob(                                                                       \
+          (user_op::HobDeviceType() == device)                                                \
+          && (user_op::HobDataType("embedding_grad", 0) == OF_PP_PAIR_SECOND(data_type_pair)) \
+          && (user_op::HobDataType("indices", 0) == OF_PP_PAIR_SECOND(index_type_pair)));
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_EMBEDDING_BAG_KERNELS, DEVICE_TYPE_SEQ,
+                                 FLOATING_DATA_TYPE_SEQ, INDEX_DATA_TYPE_SEQ)
+
+#undef REGISTER_EMBEDDING_BAG_KERNELS
+
+}  // namespace oneflow
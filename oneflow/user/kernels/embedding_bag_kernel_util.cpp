@@ -0,0 +1,103 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/user/kernels/embedding_bag_kernel_util.h"
+
+namespace oneflow {
+
+template<typename T, typename K>
+struct EmbeddingBagKernelUtil<DeviceType::kCPU, T, K> final {
+  static void Forward(ep::Stream* stream, EmbeddingBagMode mode, int64_t num_indices,
+                      int64_t num_bags, int64_t num_embeddings, int64_t embedding_size,
+                      const T* weight, const K* indices, const K* offsets,
+                      const T* per_sample_weights, T* out) {
+    FOR_RANGE(int64_t, bag, 0, num_bags) {
+      int64_t begin = 0;
+      int64_t end = 0;
+      GetBagRange(offsets, num_bags, num_indices, bag, &begin, &end);
+      T* out_row = out + bag * embedding_size;
+      std::fill(out_row, out_row + embedding_size, static_cast<T>(0));
+      FOR_RANGE(int64_t, i, begin, end) {
+        const int64_t idx = static_cast<int64_t>(indices[i]);
+        CHECK(idx >= 0 && idx < num_embeddings)
+            << "embedding_bag index " << idx << " is out of range [0, " << num_embeddings << ")";
+        const T* weight_row = weight + idx * embedding_size;
+        if (mode == EmbeddingBagMode::kMax) {
+          if (i == begin) {
+            std::copy(weight_row, weight_row + embedding_size, out_row);
+          } else {
+            FOR_RANGE(int64_t, d, 0, embedding_size) {
+              out_row[d] = std::max(out_row[d], weight_row[d]);
+            }
+          }
+        } else {
+          const T scale = per_sample_weights != nullptr ? per_sample_weights[i] : 1;
+          FOR_RANGE(int64_t, d, 0, embedding_size) { out_row[d] += scale * weight_row[d]; }
+        }
+      }
+      if (mode == EmbeddingBagMode::kMean && end > begin) {
+        const T count = static_cast<T>(end - begin);
+        FOR_RANGE(int64_t, d, 0, embedding_size) { out_row[d] /= count; }
+      }
+    }
+  }
+
+  static void Backward(ep::Stream* stream, EmbeddingBagMode mode, int64_t num_indices,
+                       int64_t num_bags, int64_t num_embeddings, int64_t embedding_size,
+                       const T* dy, const T* weight, const K* indices, const K* offsets,
+                       const T* per_sample_weights, T* embedding_grad) {
+    std::vector<int64_t> arg_max;
+    if (mode == EmbeddingBagMode::kMax) { arg_max.resize(embedding_size); }
+    FOR_RANGE(int64_t, bag, 0, num_bags) {
+      int64_t begin = 0;
+      int64_t end = 0;
+      GetBagRange(offsets, num_bags, num_indices, bag, &begin, &end);
+      if (begin == end) { continue; }
+      const T* dy_row = dy + bag * embedding_size;
+      if (mode == EmbeddingBagMode::kMax) {
+        std::fill(arg_max.begin(), arg_max.end(), begin);
+        FOR_RANGE(int64_t, i, begin + 1, end) {
+          const T* weight_row = weight + static_cast<int64_t>(indices[i]) * embedding_size;
+          FOR_RANGE(int64_t, d, 0, embedding_size) {
+            const T max_val =
+                weight[static_cast<int64_t>(indices[arg_max[d]]) * embedding_size + d];
+            if (weight_row[d] > max_val) { arg_max[d] = i; }
+          }
+        }
+        FOR_RANGE(int64_t, d, 0, embedding_size) {
+          embedding_grad[arg_max[d] * embedding_size + d] = dy_row[d];
+        }
+      } else {
+        T scale = mode == EmbeddingBagMode::kMean ? static_cast<T>(1) / (end - begin) : 1;
+        FOR_RANGE(int64_t, i, begin, end) {
+          const T row_scale = per_sample_weights != nullptr ? scale * per_sample_weights[i] : scale;
+          T* grad_row = embedding_grad + i * embedding_size;
+          FOR_RANGE(int64_t, d, 0, embedding_size) { grad_row[d] = row_scale * dy_row[d]; }
+        }
+      }
+    }
+  }
+};
+
+#define INSTANTIATE_EMBEDDING_BAG_KERNEL_UTIL_CPU(data_type_pair, index_type_pair)           \
+  template struct EmbeddingBagKernelUtil<DeviceType::kCPU, OF_PP_PAIR_FIRST(data_type_pair), \
+                                         OF_PP_PAIR_FIRST(index_type_pair)>;
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(INSTANTIATE_EMBEDDING_BAG_KERNEL_UTIL_CPU, FLOATING_DATA_TYPE_SEQ,
+                                 INDEX_DATA_TYPE_SEQ)
+
+#undef INSTANTIATE_EMBEDDING_BAG_KERNEL_UTIL_CPU
+
+}  // namespace oneflow
@@ -0,0 +1,152 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/user/kernels/embedding_bag_kernel_util.h"
+#include "oneflow/core/ep/cuda/cuda_stream.h"
+#include <assert.h>
+
+namespace oneflow {
+
+namespace {
+
+// Reduces column d of one bag without materializing the gathered rows.
+template<typename T, typename K>
+OF_DEVICE_FUNC T EmbeddingBagReduce(EmbeddingBagMode mode, int64_t begin, int64_t end,
+                                    int64_t embedding_size, int64_t d, const T* weight,
+                                    const K* indices, const T* per_sample_weights) {
+  if (begin == end) { return static_cast<T>(0); }
+  if (mode == EmbeddingBagMode::kMax) {
+    T max_val = weight[static_cast<int64_t>(indices[begin]) * embedding_size + d];
+    for (int64_t i = begin + 1; i < end; ++i) {
+      const T val = weight[static_cast<int64_t>(indices[i]) * embedding_size + d];
+      if (val > max_val) { max_val = val; }
+    }
+    return max_val;
+  }
+  T sum = 0;
+  for (int64_t i = begin; i < end; ++i) {
+    T val = weight[static_cast<int64_t>(indices[i]) * embedding_size + d];
+    if (per_sample_weights != nullptr) { val *= per_sample_weights[i]; }
+    sum += val;
+  }
+  if (mode == EmbeddingBagMode::kMean) { sum /= static_cast<T>(end - begin); }
+  return sum;
+}
+
+// Scatters dy of column d back to the lookups of one bag. Max mode routes the gradient to the
+// first lookup holding the maximum, which is recomputed from weight instead of being stored.
+template<typename T, typename K>
+OF_DEVICE_FUNC void EmbeddingBagScatterGrad(EmbeddingBagMode mode, int64_t begin, int64_t end,
+                                            int64_t embedding_size, int64_t d, T dy,
+                                            const T* weight, const K* indices,
+                                            const T* per_sample_weights, T* embedding_grad) {
+  if (begin == end) { return; }
+  if (mode == EmbeddingBagMode::kMax) {
+    int64_t arg_max = begin;
+    T max_val = weight[static_cast<int64_t>(indices[begin]) * embedding_size + d];
+    for (int64_t i = begin; i < end; ++i) {
+      const T val = weight[static_cast<int64_t>(indices[i]) * embedding_size + d];
+      if (val > max_val) {
+        max_val = val;
+        arg_max = i;
+      }
+      embedding_grad[i * embedding_size + d] = 0;
+    }
+    embedding_grad[arg_max * embedding_size + d] = dy;
+    return;
+  }
+  if (mode == EmbeddingBagMode::kMean) { dy /= static_cast<T>(end - begin); }
+  for (int64_t i = begin; i < end; ++i) {
+    embedding_grad[i * embedding_size + d] =
+        per_sample_weights != nullptr ? dy * per_sample_weights[i] : dy;
+  }
+}
+
+template<typename T, typename K>
+__global__ void EmbeddingBagForwardGpu(const int64_t elem_cnt, EmbeddingBagMode mode,
+                                       const int64_t num_indices, const int64_t num_bags,
+                                       const int64_t num_embeddings, const int64_t embedding_size,
+                                       const T* weight, const K* indices, const K* offsets,
+                                       const T* per_sample_weights, T* out) {
+  CUDA_1D_KERNEL_LOOP_T(int64_t, i, elem_cnt) {
+    const int64_t bag = i / embedding_size;
+    const int64_t d = i % embedding_size;
+    int64_t begin = 0;
+    int64_t end = 0;
+    GetBagRange(offsets, num_bags, num_indices, bag, &begin, &end);
+    for (int64_t j = begin; j < end; ++j) {
+      assert(indices[j] >= 0 && indices[j] < num_embeddings);
+    }
+    out[i] = EmbeddingBagReduce(mode, begin, end, embedding_size, d, weight, indices,
+                                per_sample_weights);
+  }
+}
+
+template<typename T, typename K>
+__global__ void EmbeddingBagBackwardGpu(const int64_t elem_cnt, EmbeddingBagMode mode,
+                                        const int64_t num_indices, const int64_t num_bags,
+                                        const int64_t embedding_size, const T* dy, const T* weight,
+                                        const K* indices, const K* offsets,
+                                        const T* per_sample_weights, T* embedding_grad) {
+  CUDA_1D_KERNEL_LOOP_T(int64_t, i, elem_cnt) {
+    const int64_t bag = i / embedding_size;
+    const int64_t d = i % embedding_size;
+    int64_t begin = 0;
+    int64_t end = 0;
+    GetBagRange(offsets, num_bags, num_indices, bag, &begin, &end);
+    EmbeddingBagScatterGrad(mode, begin, end, embedding_size, d, dy[i], weight, indices,
+                            per_sample_weights, embedding_grad);
+  }
+}
+
+}  // namespace
+
+template<typename T, typename K>
+struct EmbeddingBagKernelUtil<DeviceType::kCUDA, T, K> final {
+  static void Forward(ep::Stream* stream, EmbeddingBagMode mode, int64_t num_indices,
+                      int64_t num_bags, int64_t num_embeddings, int64_t embedding_size,
+                      const T* weight, const K* indices, const K* offsets,
+                      const T* per_sample_weights, T* out) {
+    const int64_t elem_cnt = num_bags * embedding_size;
+    if (elem_cnt == 0) { return; }
+    EmbeddingBagForwardGpu<T, K><<<BlocksNum4ThreadsNum(elem_cnt), kCudaThreadsNumPerBlock, 0,
+                                   stream->As<ep::CudaStream>()->cuda_stream()>>>(
+        elem_cnt, mode, num_indices, num_bags, num_embeddings, embedding_size, weight, indices,
+        offsets, per_sample_weights, out);
+  }
+
+  static void Backward(ep::Stream* stream, EmbeddingBagMode mode, int64_t num_indices,
+                       int64_t num_bags, int64_t num_embeddings, int64_t embedding_size,
+                       const T* dy, const T* weight, const K* indices, const K* offsets,
+                       const T* per_sample_weights, T* embedding_grad) {
+    const int64_t elem_cnt = num_bags * embedding_size;
+    if (elem_cnt == 0) { return; }
+    EmbeddingBagBackwardGpu<T, K><<<BlocksNum4ThreadsNum(elem_cnt), kCudaThreadsNumPerBlock, 0,
+                                    stream->As<ep::CudaStream>()->cuda_stream()>>>(
+        elem_cnt, mode, num_indices, num_bags, embedding_size, dy, weight, indices, offsets,
+        per_sample_weights, embedding_grad);
+  }
+};
+
+#define INSTANTIATE_EMBEDDING_BAG_KERNEL_UTIL_CUDA(data_type_pair, index_type_pair)           \
+  template struct EmbeddingBagKernelUtil<DeviceType::kCUDA, OF_PP_PAIR_FIRST(data_type_pair), \
+                                         OF_PP_PAIR_FIRST(index_type_pair)>;
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(INSTANTIATE_EMBEDDING_BAG_KERNEL_UTIL_CUDA, FLOATING_DATA_TYPE_SEQ,
+                                 INDEX_DATA_TYPE_SEQ)
+
+#undef INSTANTIATE_EMBEDDING_BAG_KERNEL_UTIL_CUDA
+
+}  // namespace oneflow
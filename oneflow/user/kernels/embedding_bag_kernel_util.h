@@ -0,0 +1,56 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_USER_KERNELS_EMBEDDING_BAG_KERNEL_UTIL_H_
+#define ONEFLOW_USER_KERNELS_EMBEDDING_BAG_KERNEL_UTIL_H_
+
+#include "oneflow/core/kernel/kernel_util.h"
+
+namespace oneflow {
+
+enum class EmbeddingBagMode { kSum = 0, kMean = 1, kMax = 2 };
+
+inline EmbeddingBagMode ParseEmbeddingBagMode(const std::string& mode) {
+  if (mode == "sum") { return EmbeddingBagMode::kSum; }
+  if (mode == "mean") { return EmbeddingBagMode::kMean; }
+  CHECK_EQ(mode, "max") << "Unsupported embedding_bag mode " << mode;
+  return EmbeddingBagMode::kMax;
+}
+
+// Bag b covers indices[offsets[b], offsets[b + 1]), the last bag ends at num_indices.
+template<typename K>
+OF_DEVICE_FUNC void GetBagRange(const K* offsets, int64_t num_bags, int64_t num_indices,
+                                int64_t bag, int64_t* begin, int64_t* end) {
+  *begin = static_cast<int64_t>(offsets[bag]);
+  *end = bag + 1 < num_bags ? static_cast<int64_t>(offsets[bag + 1]) : num_indices;
+  if (*end > num_indices) { *end = num_indices; }
+  if (*end < *begin) { *end = *begin; }
+}
+
+template<DeviceType device_type, typename T, typename K>
+struct EmbeddingBagKernelUtil final {
+  static void Forward(ep::Stream* stream, EmbeddingBagMode mode, int64_t num_indices,
+                      int64_t num_bags, int64_t num_embeddings, int64_t embedding_size,
+                      const T* weight, const K* indices, const K* offsets,
+                      const T* per_sample_weights, T* out);
+  static void Backward(ep::Stream* stream, EmbeddingBagMode mode, int64_t num_indices,
+                       int64_t num_bags, int64_t num_embeddings, int64_t embedding_size,
+                       const T* dy, const T* weight, const K* indices, const K* offsets,
+                       const T* per_sample_weights, T* embedding_grad);
+};
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_USER_KERNELS_EMBEDDING_BAG_KERNEL_UTIL_H_
@@ -0,0 +1,220 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+
+namespace oneflow {
+
+namespace {
+
+// The interaction of concated features i and j (j < i + offset) is written to column
+// i * (i - 1 + 2 * offset) / 2 + j, i.e. the lower triangle in row major order, which by symmetry
+// holds the same values as the upper triangle.
+inline int64_t InteractionIndex(int64_t i, int64_t j, int64_t offset) {
+  return i * (i - 1 + 2 * offset) / 2 + j;
+}
+
+inline size_t GetGrainSize(int64_t elems_per_sample) {
+  return std::max<int64_t>(1, 32768 / std::max<int64_t>(elems_per_sample, 1));
+}
+
+// Locates row `row` of the concated features among the variadic feature tensors.
+struct FeatureRow {
+  int32_t input_index;
+  int64_t row;
+};
+
+std::vector<FeatureRow> GetFeatureRows(const std::vector<int64_t>& feature_dims) {
+  std::vector<FeatureRow> rows;
+  for (int32_t i = 0; i < feature_dims.size(); ++i) {
+    for (int64_t r = 0; r < feature_dims.at(i); ++r) { rows.push_back(FeatureRow{i, r}); }
+  }
+  return rows;
+}
+
+}  // namespace
+
+template<typename T>
+class FusedDotFeatureInteractionCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedDotFeatureInteractionCpuKernel() = default;
+  ~FusedDotFeatureInteractionCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    user_op::Tensor* padded_concated_features =
+        ctx->Tensor4ArgNameAndIndex("padded_concated_features", 0);
+    const int64_t batch_size = padded_concated_features->shape().At(0);
+    const int64_t concated_padded_dim = padded_concated_features->shape().At(1);
+    const int64_t vector_size = padded_concated_features->shape().At(2);
+    const int64_t out_dim = out->shape().At(1);
+    const int64_t offset = ctx->Attr<bool>("self_interaction") ? 1 : 0;
+    const int32_t num_features = ctx->input_size("features");
+    std::vector<const T*> feature_ptrs(num_features);
+    std::vector<int64_t> feature_dims(num_features);
+    int64_t features_concated_dim = 0;
+    for (int32_t i = 0; i < num_features; ++i) {
+      const user_op::Tensor* feature = ctx->Tensor4ArgNameAndIndex("features", i);
+      feature_ptrs[i] = feature->dptr<T>();
+      feature_dims[i] = feature->shape().At(1);
+      features_concated_dim += feature_dims[i];
+    }
+    int64_t output_concat_dim = 0;
+    const T* output_concat_ptr = nullptr;
+    if (ctx->has_input("output_concat", 0)) {
+      const user_op::Tensor* output_concat = ctx->Tensor4ArgNameAndIndex("output_concat", 0);
+      output_concat_dim = output_concat->shape().At(1);
+      output_concat_ptr = output_concat->dptr<T>();
+    }
+    const int64_t interaction_dim = InteractionIndex(features_concated_dim, 0, offset);
+    CHECK_LE(output_concat_dim + interaction_dim, out_dim);
+    T* concated_ptr = padded_concated_features->mut_dptr<T>();
+    T* out_ptr = out->mut_dptr<T>();
+    // Each sample's (features_concated_dim, vector_size) panel is concated once and then stays
+    // in cache while all of its pairwise dot products are taken.
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, batch_size,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t b = begin; b < end; ++b) {
+            T* concated = concated_ptr + b * concated_padded_dim * vector_size;
+            T* row_ptr = concated;
+            for (int32_t i = 0; i < num_features; ++i) {
+              const int64_t count = feature_dims[i] * vector_size;
+              std::copy(feature_ptrs[i] + b * count, feature_ptrs[i] + (b + 1) * count, row_ptr);
+              row_ptr += count;
+            }
+            std::fill(row_ptr, concated + concated_padded_dim * vector_size, static_cast<T>(0));
+            T* out_row = out_ptr + b * out_dim;
+            if (output_concat_ptr != nullptr) {
+              std::copy(output_concat_ptr + b * output_concat_dim,
+                        output_concat_ptr + (b + 1) * output_concat_dim, out_row);
+            }
+            T* interaction = out_row + output_concat_dim;
+            for (int64_t i = 0; i < features_concated_dim; ++i) {
+              const T* x_i = concated + i * vector_size;
+              for (int64_t j = 0; j < i + offset; ++j) {
+                const T* x_j = concated + j * vector_size;
+                T sum = 0;
+                for (int64_t d = 0; d < vector_size; ++d) { sum += x_i[d] * x_j[d]; }
+                interaction[InteractionIndex(i, j, offset)] = sum;
+              }
+            }
+            std::fill(interaction + interaction_dim, out_row + out_dim, static_cast<T>(0));
+          }
+        },
+        GetGrainSize(features_concated_dim * features_concated_dim * vector_size));
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_FUSED_DOT_FEATURE_INTERACTION_CPU_KERNEL(dtype)      \
+  REGISTER_USER_KERNEL("fused_dot_feature_interaction")               \
+      .SetCreateFn<FusedDotFeatureInteractionCpuKernel<dtype>>()      \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
+                       && (user_op::HobDataType("out", 0) == GetDataType<dtype>::value));
+
+REGISTER_FUSED_DOT_FEATURE_INTERACTION_CPU_KERNEL(float)
+REGISTER_FUSED_DOT_FEATURE_INTERACTION_CPU_KERNEL(double)
+
+template<typename T>
+class FusedDotFeatureInteractionGradCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedDotFeatureInteractionGradCpuKernel() = default;
+  ~FusedDotFeatureInteractionGradCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* padded_concated_features =
+        ctx->Tensor4ArgNameAndIndex("padded_concated_features", 0);
+    const int64_t batch_size = padded_concated_features->shape().At(0);
+    const int64_t concated_padded_dim = padded_concated_features->shape().At(1);
+    const int64_t vector_size = padded_concated_features->shape().At(2);
+    const int64_t out_dim = dy->shape().At(1);
+    const int64_t offset = ctx->Attr<bool>("self_interaction") ? 1 : 0;
+    const int32_t num_features = ctx->output_size("features_grad");
+    std::vector<T*> feature_grad_ptrs(num_features);
+    std::vector<int64_t> feature_dims(num_features);
+    int64_t features_concated_dim = 0;
+    for (int32_t i = 0; i < num_features; ++i) {
+      user_op::Tensor* feature_grad = ctx->Tensor4ArgNameAndIndex("features_grad", i);
+      feature_grad_ptrs[i] = feature_grad->mut_dptr<T>();
+      feature_dims[i] = feature_grad->shape().At(1);
+      features_concated_dim += feature_dims[i];
+    }
+    const std::vector<FeatureRow> feature_rows = GetFeatureRows(feature_dims);
+    int64_t output_concat_dim = 0;
+    T* output_concat_grad_ptr = nullptr;
+    if (ctx->has_output("output_concat_grad", 0)) {
+      user_op::Tensor* output_concat_grad = ctx->Tensor4ArgNameAndIndex("output_concat_grad", 0);
+      output_concat_dim = output_concat_grad->shape().At(1);
+      output_concat_grad_ptr = output_concat_grad->mut_dptr<T>();
+    }
+    const T* dy_ptr = dy->dptr<T>();
+    const T* concated_ptr = padded_concated_features->dptr<T>();
+    // d x_i = sum_j g_ij x_j with g the symmetric matrix whose lower triangle is dy; a diagonal
+    // entry contributes twice because x_i appears on both sides of <x_i, x_i>.
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, batch_size,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t b = begin; b < end; ++b) {
+            const T* dy_row = dy_ptr + b * out_dim;
+            if (output_concat_grad_ptr != nullptr) {
+              std::copy(dy_row, dy_row + output_concat_dim,
+                        output_concat_grad_ptr + b * output_concat_dim);
+            }
+            const T* interaction_grad = dy_row + output_concat_dim;
+            const T* concated = concated_ptr + b * concated_padded_dim * vector_size;
+            for (int64_t i = 0; i < features_concated_dim; ++i) {
+              const FeatureRow& feature_row = feature_rows[i];
+              T* dx_i =
+                  feature_grad_ptrs[feature_row.input_index]
+                  + (b * feature_dims[feature_row.input_index] + feature_row.row) * vector_size;
+              std::fill(dx_i, dx_i + vector_size, static_cast<T>(0));
+              for (int64_t j = 0; j < features_concated_dim; ++j) {
+                T g = 0;
+                if (j < i) {
+                  g = interaction_grad[InteractionIndex(i, j, offset)];
+                } else if (j > i) {
+                  g = interaction_grad[InteractionIndex(j, i, offset)];
+                } else if (offset == 1) {
+                  g = interaction_grad[InteractionIndex(i, i, offset)] * static_cast<T>(2);
+                }
+                if (g == static_cast<T>(0)) { continue; }
+                const T* x_j = concated + j * vector_size;
+                for (int64_t d = 0; d < vector_size; ++d) { dx_i[d] += g * x_j[d]; }
+              }
+            }
+          }
+        },
+        GetGrainSize(features_concated_dim * features_concated_dim * vector_size));
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_FUSED_DOT_FEATURE_INTERACTION_GRAD_CPU_KERNEL(dtype) \
+  REGISTER_USER_KERNEL("fused_dot_feature_interaction_grad")          \
+      .SetCreateFn<FusedDotFeatureInteractionGradCpuKernel<dtype>>()  \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
+                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value));
+
+REGISTER_FUSED_DOT_FEATURE_INTERACTION_GRAD_CPU_KERNEL(float)
+REGISTER_FUSED_DOT_FEATURE_INTERACTION_GRAD_CPU_KERNEL(double)
+
+}  // namespace oneflow
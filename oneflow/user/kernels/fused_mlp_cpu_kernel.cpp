@@ -0,0 +1,223 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/common/blas.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+
+namespace oneflow {
+
+namespace {
+
+// The CPU kernels of cublas_fused_mlp and cublas_bias_add_relu_matmul_grad. The op names come
+// from the cuBLASLt implementation; the CPU kernels share their shapes and store the relu mask
+// in cublas_aux as one bit per hidden unit at the start of each aux row.
+
+// Rows of a block are pushed through every layer before the next block starts, so a block's
+// activations stay in cache from the GEMM to its bias + relu epilogue and into the next layer.
+constexpr int64_t kBlockBytes = 256 * 1024;
+constexpr int64_t kMaxBlockRows = 256;
+
+int64_t GetRowBlockSize(int64_t max_width, size_t elem_size) {
+  const int64_t rows = kBlockBytes / std::max<int64_t>(max_width * elem_size, 1);
+  return std::max<int64_t>(1, std::min(rows, kMaxBlockRows));
+}
+
+inline void SetReluMask(int8_t* aux_row, int64_t col, bool positive) {
+  uint8_t* byte = reinterpret_cast<uint8_t*>(aux_row) + col / 8;
+  const uint8_t bit = static_cast<uint8_t>(1U << (col % 8));
+  *byte = positive ? (*byte | bit) : (*byte & ~bit);
+}
+
+inline bool GetReluMask(const int8_t* aux_row, int64_t col) {
+  return (reinterpret_cast<const uint8_t*>(aux_row)[col / 8] >> (col % 8)) & 1U;
+}
+
+// y = x * w^T for a block of rows, x: (rows, k), w: (n, k), y: (rows, n).
+template<typename T>
+void GemmNT(int64_t rows, int64_t n, int64_t k, const T* x, const T* w, T* y) {
+  cblas_gemm<T>(CblasRowMajor, CblasNoTrans, CblasTrans, rows, n, k, static_cast<T>(1), x, k, w, k,
+                static_cast<T>(0), y, n);
+}
+
+// y = dy * w for a block of rows, dy: (rows, n), w: (n, k), y: (rows, k).
+template<typename T>
+void GemmNN(int64_t rows, int64_t n, int64_t k, const T* dy, const T* w, T* y) {
+  cblas_gemm<T>(CblasRowMajor, CblasNoTrans, CblasNoTrans, rows, k, n, static_cast<T>(1), dy, n, w,
+                k, static_cast<T>(0), y, k);
+}
+
+}  // namespace
+
+template<typename T>
+class FusedMLPCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedMLPCpuKernel() = default;
+  ~FusedMLPCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    const bool skip_final_activation = ctx->Attr<bool>("skip_final_activation");
+    const int32_t num_layers = ctx->input_size("weights");
+    const int64_t m = x->shape().At(0);
+    std::vector<const T*> weights(num_layers);
+    std::vector<const T*> biases(num_layers);
+    std::vector<T*> outputs(num_layers);
+    std::vector<int8_t*> aux(num_layers);
+    std::vector<int64_t> aux_ld(num_layers);
+    std::vector<int64_t> widths(num_layers + 1);
+    widths[0] = x->shape().At(1);
+    int64_t max_width = widths[0];
+    for (int32_t l = 0; l < num_layers; ++l) {
+      const user_op::Tensor* weight = ctx->Tensor4ArgNameAndIndex("weights", l);
+      user_op::Tensor* cublas_aux = ctx->Tensor4ArgNameAndIndex("cublas_aux", l);
+      weights[l] = weight->dptr<T>();
+      biases[l] = ctx->Tensor4ArgNameAndIndex("biases", l)->dptr<T>();
+      outputs[l] = l == num_layers - 1 ? out->mut_dptr<T>()
+                                       : ctx->Tensor4ArgNameAndIndex("hidden", l)->mut_dptr<T>();
+      aux[l] = cublas_aux->mut_dptr<int8_t>();
+      aux_ld[l] = cublas_aux->shape().At(1);
+      widths[l + 1] = weight->shape().At(0);
+      max_width = std::max(max_width, widths[l + 1]);
+    }
+    const int64_t block_rows = GetRowBlockSize(max_width, sizeof(T));
+    const int64_t num_blocks = (m + block_rows - 1) / block_rows;
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, num_blocks,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t block = begin; block < end; ++block) {
+            const int64_t row_begin = block * block_rows;
+            const int64_t rows = std::min(block_rows, m - row_begin);
+            const T* in = x->dptr<T>() + row_begin * widths[0];
+            for (int32_t l = 0; l < num_layers; ++l) {
+              const int64_t n = widths[l + 1];
+              T* y = outputs[l] + row_begin * n;
+              GemmNT<T>(rows, n, widths[l], in, weights[l], y);
+              const bool relu = l != num_layers - 1 || !skip_final_activation;
+              for (int64_t r = 0; r < rows; ++r) {
+                T* y_row = y + r * n;
+                int8_t* aux_row = aux[l] + (row_begin + r) * aux_ld[l];
+                for (int64_t c = 0; c < n; ++c) {
+                  T v = y_row[c] + biases[l][c];
+                  if (relu) {
+                    const bool positive = v > static_cast<T>(0);
+                    SetReluMask(aux_row, c, positive);
+                    if (!positive) { v = 0; }
+                  }
+                  y_row[c] = v;
+                }
+              }
+              in = y;
+            }
+          }
+        },
+        1);
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+#define REGISTER_FUSED_MLP_CPU_KERNEL(dtype)                          \
+  REGISTER_USER_KERNEL("cublas_fused_mlp")                            \
+      .SetCreateFn<FusedMLPCpuKernel<dtype>>()                        \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
+                       && (user_op::HobDataType("out", 0) == GetDataType<dtype>::value));
+
+REGISTER_FUSED_MLP_CPU_KERNEL(float)
+REGISTER_FUSED_MLP_CPU_KERNEL(double)
+
+// d_grad = relu_grad(dy * weight, aux) and d_bias = reduce_sum(d_grad, 0): the previous layer's
+// input gradient and bias gradient in one pass over row blocks.
+template<typename T>
+class FusedMLPBiasAddReluMatmulGradCpuKernel final : public user_op::OpKernel {
+ public:
+  FusedMLPBiasAddReluMatmulGradCpuKernel() = default;
+  ~FusedMLPBiasAddReluMatmulGradCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* weight = ctx->Tensor4ArgNameAndIndex("weight", 0);
+    const user_op::Tensor* aux = ctx->Tensor4ArgNameAndIndex("aux", 0);
+    user_op::Tensor* d_grad = ctx->Tensor4ArgNameAndIndex("d_grad", 0);
+    user_op::Tensor* d_bias = ctx->Tensor4ArgNameAndIndex("d_bias", 0);
+    user_op::Tensor* tmp_buffer = ctx->Tensor4ArgNameAndIndex("tmp_buffer", 0);
+    const int64_t m = dy->shape().At(0);
+    const int64_t n = weight->shape().At(0);
+    const int64_t k = weight->shape().At(1);
+    const int64_t aux_ld = aux->shape().At(1);
+    const int64_t block_rows = GetRowBlockSize(k, sizeof(T));
+    const int64_t num_blocks = (m + block_rows - 1) / block_rows;
+    T* partial_bias = tmp_buffer->mut_dptr<T>();
+    CHECK_LE(num_blocks * k * sizeof(T), tmp_buffer->shape().elem_cnt());
+    ep::CpuStream* stream = ctx->stream()->As<ep::CpuStream>();
+    stream->ParallelFor(
+        0, num_blocks,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t block = begin; block < end; ++block) {
+            const int64_t row_begin = block * block_rows;
+            const int64_t rows = std::min(block_rows, m - row_begin);
+            T* grad = d_grad->mut_dptr<T>() + row_begin * k;
+            GemmNN<T>(rows, n, k, dy->dptr<T>() + row_begin * n, weight->dptr<T>(), grad);
+            T* bias_sum = partial_bias + block * k;
+            std::fill(bias_sum, bias_sum + k, static_cast<T>(0));
+            for (int64_t r = 0; r < rows; ++r) {
+              T* grad_row = grad + r * k;
+              const int8_t* aux_row = aux->dptr<int8_t>() + (row_begin + r) * aux_ld;
+              for (int64_t c = 0; c < k; ++c) {
+                if (!GetReluMask(aux_row, c)) { grad_row[c] = 0; }
+                bias_sum[c] += grad_row[c];
+              }
+            }
+          }
+        },
+        1);
+    T* d_bias_ptr = d_bias->mut_dptr<T>();
+    stream->ParallelFor(0, k, [&](int64_t begin, int64_t end) {
+      for (int64_t c = begin; c < end; ++c) {
+        T sum = 0;
+        for (int64_t block = 0; block < num_blocks; ++block) { sum += partial_bias[block * k + c]; }
+        d_bias_ptr[c] = sum;
+      }
+    });
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+template<typename T>
+user_op::InferTmpSizeFn GenFusedMLPBiasAddReluMatmulGradInferTmpSizeFn() {
+  return [](user_op::InferContext* ctx) {
+    const Shape& dy_shape = ctx->InputShape("dy", 0);
+    const Shape& weight_shape = ctx->InputShape("weight", 0);
+    const int64_t block_rows = GetRowBlockSize(weight_shape.At(1), sizeof(T));
+    const int64_t num_blocks = (dy_shape.At(0) + block_rows - 1) / block_rows;
+    return num_blocks * weight_shape.At(1) * sizeof(T);
+  };
+}
+
+#define REGISTER_FUSED_MLP_BIAS_ADD_RELU_MATMUL_GRAD_CPU_KERNEL(dtype)                  \
+  REGISTER_USER_KERNEL("cublas_bias_add_relu_matmul_grad")                              \
+      .SetCreateFn<FusedMLPBiasAddReluMatmulGradCpuKernel<dtype>>()                     \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                   \
+                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value)) \
+      .SetInferTmpSizeFn(GenFusedMLPBiasAddReluMatmulGradInferTmpSizeFn<dtype>());
+
+REGISTER_FUSED_MLP_BIAS_ADD_RELU_MATMUL_GRAD_CPU_KERNEL(float)
+REGISTER_FUSED_MLP_BIAS_ADD_RELU_MATMUL_GRAD_CPU_KERNEL(double)
+
+}  // namespace oneflow
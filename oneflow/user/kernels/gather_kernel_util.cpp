@@ -14,6 +14,8 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/user/kernels/gather_kernel_util.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 
@@ -76,19 +78,26 @@ void GatherKernelUtilImpl<DeviceType::kCPU, T, K>::Forward(ep::Stream* stream, c
   const int64_t outer_dim_size = flat_in_shape.At(0);
   const int64_t gather_dim_size = flat_in_shape.At(1);
   const int64_t inner_dim_size = flat_in_shape.At(2);
-  FOR_RANGE(int64_t, outer_idx, 0, outer_dim_size) {
-    FOR_RANGE(int64_t, i, 0, num_indices) {
-      CHECK_GE(indices[i], 0);
-      const int64_t idx = indices[i] - offset;
-      T* to = out + outer_idx * num_indices * inner_dim_size + i * inner_dim_size;
-      if (idx >= 0 && idx < gather_dim_size) {
-        const T* from = in + outer_idx * gather_dim_size * inner_dim_size + idx * inner_dim_size;
-        std::copy(from, from + inner_dim_size, to);
-      } else {
-        std::memset(reinterpret_cast<void*>(to), 0, inner_dim_size * sizeof(K));
-      }
-    }
-  }
+  // Each (outer_idx, i) pair copies one contiguous slice of `inner_dim_size` elements.
+  stream->As<ep::CpuStream>()->ParallelFor(
+      0, outer_dim_size * num_indices,
+      [=](int64_t begin, int64_t end) {
+        FOR_RANGE(int64_t, slice_idx, begin, end) {
+          const int64_t outer_idx = slice_idx / num_indices;
+          const int64_t i = slice_idx - outer_idx * num_indices;
+          CHECK_GE(indices[i], 0);
+          const int64_t idx = indices[i] - offset;
+          T* to = out + slice_idx * inner_dim_size;
+          if (idx >= 0 && idx < gather_dim_size) {
+            const T* from =
+                in + outer_idx * gather_dim_size * inner_dim_size + idx * inner_dim_size;
+            std::copy(from, from + inner_dim_size, to);
+          } else {
+            std::memset(reinterpret_cast<void*>(to), 0, inner_dim_size * sizeof(T));
+          }
+        }
+      },
+      ep::CpuStream::GrainSizeFor(inner_dim_size));
 }
 
 #define INITIATE_GATHER_KERNEL_UTIL_CPU_IMPL(in_type_pair, index_type_pair)              \
@@ -0,0 +1,249 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/user/kernels/norm_cpu_util.h"
+
+namespace oneflow {
+
+namespace {
+
+// The input of group norm is viewed as (batch_size, num_channels, spatial_size), and each of the
+// batch_size * num_groups instances is the contiguous block of the channels of one group.
+struct GroupNormShape {
+  GroupNormShape(const ShapeView& x_shape, int64_t num_groups)
+      : batch_size(x_shape.At(0)),
+        num_channels(x_shape.At(1)),
+        spatial_size(x_shape.Count(2)),
+        num_groups(num_groups),
+        channels_per_group(num_channels / num_groups),
+        instance_size(channels_per_group * spatial_size) {}
+
+  int64_t batch_size;
+  int64_t num_channels;
+  int64_t spatial_size;
+  int64_t num_groups;
+  int64_t channels_per_group;
+  int64_t instance_size;
+};
+
+}  // namespace
+
+template<typename T>
+class GroupNormCpuKernel final : public user_op::OpKernel {
+ public:
+  GroupNormCpuKernel() = default;
+  ~GroupNormCpuKernel() = default;
+
+ private:
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    user_op::Tensor* y = ctx->Tensor4ArgNameAndIndex("y", 0);
+    user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    user_op::Tensor* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    const double epsilon = ctx->Attr<double>("epsilon");
+    const GroupNormShape shape(x->shape(), ctx->Attr<int32_t>("num_groups"));
+    const T* gamma_ptr =
+        ctx->has_input("gamma", 0) ? ctx->Tensor4ArgNameAndIndex("gamma", 0)->dptr<T>() : nullptr;
+    const T* beta_ptr =
+        ctx->has_input("beta", 0) ? ctx->Tensor4ArgNameAndIndex("beta", 0)->dptr<T>() : nullptr;
+    const T* x_ptr = x->dptr<T>();
+    T* y_ptr = y->mut_dptr<T>();
+    T* mean_ptr = mean->mut_dptr<T>();
+    T* inv_variance_ptr = inv_variance->mut_dptr<T>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, shape.batch_size * shape.num_groups,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t i = begin; i < end; ++i) {
+            const T* x_instance = x_ptr + i * shape.instance_size;
+            T* y_instance = y_ptr + i * shape.instance_size;
+            T instance_mean = 0;
+            T variance = 0;
+            norm_cpu::WelfordMeanVariance(x_instance, shape.instance_size, &instance_mean,
+                                          &variance);
+            const T instance_inv_variance = norm_cpu::InvStd(variance, epsilon);
+            mean_ptr[i] = instance_mean;
+            inv_variance_ptr[i] = instance_inv_variance;
+            const int64_t first_channel = (i % shape.num_groups) * shape.channels_per_group;
+            // The normalization and the affine transform are folded into y = x * scale + shift.
+            for (int64_t c = 0; c < shape.channels_per_group; ++c) {
+              const int64_t channel = first_channel + c;
+              const T gamma = gamma_ptr != nullptr ? gamma_ptr[channel] : static_cast<T>(1);
+              const T beta = beta_ptr != nullptr ? beta_ptr[channel] : static_cast<T>(0);
+              const T scale = instance_inv_variance * gamma;
+              const T shift = beta - instance_mean * scale;
+              const T* x_channel = x_instance + c * shape.spatial_size;
+              T* y_channel = y_instance + c * shape.spatial_size;
+              for (int64_t s = 0; s < shape.spatial_size; ++s) {
+                y_channel[s] = x_channel[s] * scale + shift;
+              }
+            }
+          }
+        },
+        norm_cpu::GetGrainSize(shape.instance_size));
+  };
+};
+
+#define REGISTER_GROUP_NORM_CPU_KERNEL(dtype)                         \
+  REGISTER_USER_KERNEL("group_norm")                                  \
+      .SetCreateFn<GroupNormCpuKernel<dtype>>()                       \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
+                       && (user_op::HobDataType("x", 0) == GetDataType<dtype>::value));
+
+REGISTER_GROUP_NORM_CPU_KERNEL(float)
+REGISTER_GROUP_NORM_CPU_KERNEL(double)
+
+// With g = dy * gamma and x_hat = (x - mean) * inv_variance, the input grad of one instance is
+// dx = inv_variance * (g - mean(g) - x_hat * mean(g * x_hat)). The sums over the instance are
+// computed from the per channel sums of dy and dy * x, then dx = a[c] * dy + b * x + c0.
+template<typename T>
+class GroupNormGradCpuKernel final : public user_op::OpKernel {
+ public:
+  GroupNormGradCpuKernel() = default;
+  ~GroupNormGradCpuKernel() = default;
+
+ private:
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    const user_op::Tensor* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    user_op::Tensor* dx = ctx->Tensor4ArgNameAndIndex("dx", 0);
+    const GroupNormShape shape(x->shape(), mean->shape().At(1));
+    const T* gamma_ptr =
+        ctx->has_input("gamma", 0) ? ctx->Tensor4ArgNameAndIndex("gamma", 0)->dptr<T>() : nullptr;
+    const T* dy_ptr = dy->dptr<T>();
+    const T* x_ptr = x->dptr<T>();
+    const T* mean_ptr = mean->dptr<T>();
+    const T* inv_variance_ptr = inv_variance->dptr<T>();
+    T* dx_ptr = dx->mut_dptr<T>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, shape.batch_size * shape.num_groups,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t i = begin; i < end; ++i) {
+            const int64_t offset = i * shape.instance_size;
+            const int64_t first_channel = (i % shape.num_groups) * shape.channels_per_group;
+            const T instance_mean = mean_ptr[i];
+            const T instance_inv_variance = inv_variance_ptr[i];
+            T sum_g = 0;
+            T sum_g_x = 0;
+            for (int64_t c = 0; c < shape.channels_per_group; ++c) {
+              const int64_t channel_offset = offset + c * shape.spatial_size;
+              T sum_dy = 0;
+              T sum_dy_x = 0;
+              for (int64_t s = 0; s < shape.spatial_size; ++s) {
+                sum_dy += dy_ptr[channel_offset + s];
+                sum_dy_x += dy_ptr[channel_offset + s] * x_ptr[channel_offset + s];
+              }
+              const T gamma =
+                  gamma_ptr != nullptr ? gamma_ptr[first_channel + c] : static_cast<T>(1);
+              sum_g += gamma * sum_dy;
+              sum_g_x += gamma * sum_dy_x;
+            }
+            const T inv_size = static_cast<T>(1) / static_cast<T>(shape.instance_size);
+            const T sum_g_x_hat = instance_inv_variance * (sum_g_x - instance_mean * sum_g);
+            const T b = -instance_inv_variance * instance_inv_variance * sum_g_x_hat * inv_size;
+            const T c0 = -instance_inv_variance * sum_g * inv_size - b * instance_mean;
+            for (int64_t c = 0; c < shape.channels_per_group; ++c) {
+              const int64_t channel_offset = offset + c * shape.spatial_size;
+              const T gamma =
+                  gamma_ptr != nullptr ? gamma_ptr[first_channel + c] : static_cast<T>(1);
+              const T a = instance_inv_variance * gamma;
+              for (int64_t s = 0; s < shape.spatial_size; ++s) {
+                dx_ptr[channel_offset + s] =
+                    a * dy_ptr[channel_offset + s] + b * x_ptr[channel_offset + s] + c0;
+              }
+            }
+          }
+        },
+        norm_cpu::GetGrainSize(shape.instance_size));
+  };
+};
+
+#define REGISTER_GROUP_NORM_GRAD_CPU_KERNEL(dtype)                    \
+  REGISTER_USER_KERNEL("group_norm_grad")                             \
+      .SetCreateFn<GroupNormGradCpuKernel<dtype>>()                   \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
+                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value));
+
+REGISTER_GROUP_NORM_GRAD_CPU_KERNEL(float)
+REGISTER_GROUP_NORM_GRAD_CPU_KERNEL(double)
+
+// gamma_diff[c] = sum_n inv_variance * (sum_s dy * x - mean * sum_s dy), beta_diff[c] =
+// sum_n sum_s dy, each task owns a block of channels.
+template<typename T>
+class GroupNormParamGradCpuKernel final : public user_op::OpKernel {
+ public:
+  GroupNormParamGradCpuKernel() = default;
+  ~GroupNormParamGradCpuKernel() = default;
+
+ private:
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    const user_op::Tensor* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    user_op::Tensor* gamma_diff = ctx->Tensor4ArgNameAndIndex("gamma_diff", 0);
+    user_op::Tensor* beta_diff = ctx->Tensor4ArgNameAndIndex("beta_diff", 0);
+    const GroupNormShape shape(x->shape(), mean->shape().At(1));
+    const T* dy_ptr = dy->dptr<T>();
+    const T* x_ptr = x->dptr<T>();
+    const T* mean_ptr = mean->dptr<T>();
+    const T* inv_variance_ptr = inv_variance->dptr<T>();
+    T* gamma_diff_ptr = gamma_diff->mut_dptr<T>();
+    T* beta_diff_ptr = beta_diff->mut_dptr<T>();
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, shape.num_channels,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t channel = begin; channel < end; ++channel) {
+            const int64_t group = channel / shape.channels_per_group;
+            T channel_gamma_diff = 0;
+            T channel_beta_diff = 0;
+            for (int64_t n = 0; n < shape.batch_size; ++n) {
+              const int64_t instance = n * shape.num_groups + group;
+              const T* dy_channel =
+                  dy_ptr + (n * shape.num_channels + channel) * shape.spatial_size;
+              const T* x_channel = x_ptr + (n * shape.num_channels + channel) * shape.spatial_size;
+              T sum_dy = 0;
+              T sum_dy_x = 0;
+              for (int64_t s = 0; s < shape.spatial_size; ++s) {
+                sum_dy += dy_channel[s];
+                sum_dy_x += dy_channel[s] * x_channel[s];
+              }
+              channel_gamma_diff +=
+                  inv_variance_ptr[instance] * (sum_dy_x - mean_ptr[instance] * sum_dy);
+              channel_beta_diff += sum_dy;
+            }
+            gamma_diff_ptr[channel] = channel_gamma_diff;
+            beta_diff_ptr[channel] = channel_beta_diff;
+          }
+        },
+        norm_cpu::GetGrainSize(shape.batch_size * shape.spatial_size));
+  };
+};
+
+#define REGISTER_GROUP_NORM_PARAM_GRAD_CPU_KERNEL(dtype)              \
+  REGISTER_USER_KERNEL("group_norm_param_grad")                       \
+      .SetCreateFn<GroupNormParamGradCpuKernel<dtype>>()              \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
+                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value));
+
+REGISTER_GROUP_NORM_PARAM_GRAD_CPU_KERNEL(float)
+REGISTER_GROUP_NORM_PARAM_GRAD_CPU_KERNEL(double)
+
+}  // namespace oneflow
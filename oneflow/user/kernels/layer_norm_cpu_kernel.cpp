@@ -14,9 +14,113 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/core/framework/framework.h"
+#include "oneflow/user/kernels/norm_cpu_util.h"
 
 namespace oneflow {
 
+namespace {
+
+template<typename T, bool do_scale, bool do_center>
+void LayerNormForwardCpu(ep::CpuStream* stream, const int64_t num_instances,
+                         const int64_t norm_size, const double epsilon, const T* x_ptr,
+                         const T* gamma_ptr, const T* beta_ptr, T* y_ptr, T* mean_ptr,
+                         T* inv_variance_ptr) {
+  stream->ParallelFor(
+      0, num_instances,
+      [&](int64_t begin, int64_t end) {
+        for (int64_t i = begin; i < end; ++i) {
+          const T* x_row = x_ptr + i * norm_size;
+          T* y_row = y_ptr + i * norm_size;
+          T mean = 0;
+          T variance = 0;
+          norm_cpu::WelfordMeanVariance(x_row, norm_size, &mean, &variance);
+          const T inv_variance = norm_cpu::InvStd(variance, epsilon);
+          mean_ptr[i] = mean;
+          inv_variance_ptr[i] = inv_variance;
+          for (int64_t j = 0; j < norm_size; ++j) {
+            T normalized = (x_row[j] - mean) * inv_variance;
+            if (do_scale) { normalized *= gamma_ptr[j]; }
+            if (do_center) { normalized += beta_ptr[j]; }
+            y_row[j] = normalized;
+          }
+        }
+      },
+      norm_cpu::GetGrainSize(norm_size));
+}
+
+template<typename T>
+void DispatchLayerNormForwardCpu(ep::CpuStream* stream, const int64_t num_instances,
+                                 const int64_t norm_size, const double epsilon, const T* x_ptr,
+                                 const T* gamma_ptr, const T* beta_ptr, T* y_ptr, T* mean_ptr,
+                                 T* inv_variance_ptr) {
+  if (gamma_ptr != nullptr && beta_ptr != nullptr) {
+    LayerNormForwardCpu<T, true, true>(stream, num_instances, norm_size, epsilon, x_ptr, gamma_ptr,
+                                       beta_ptr, y_ptr, mean_ptr, inv_variance_ptr);
+  } else if (gamma_ptr != nullptr && beta_ptr == nullptr) {
+    LayerNormForwardCpu<T, true, false>(stream, num_instances, norm_size, epsilon, x_ptr, gamma_ptr,
+                                        beta_ptr, y_ptr, mean_ptr, inv_variance_ptr);
+  } else if (gamma_ptr == nullptr && beta_ptr != nullptr) {
+    LayerNormForwardCpu<T, false, true>(stream, num_instances, norm_size, epsilon, x_ptr, gamma_ptr,
+                                        beta_ptr, y_ptr, mean_ptr, inv_variance_ptr);
+  } else {
+    LayerNormForwardCpu<T, false, false>(stream, num_instances, norm_size, epsilon, x_ptr,
+                                         gamma_ptr, beta_ptr, y_ptr, mean_ptr, inv_variance_ptr);
+  }
+}
+
+// dx = inv_variance * (g - mean(g) - x_hat * mean(g * x_hat)), where g = dy * gamma and
+// x_hat = (x - mean) * inv_variance.
+template<typename T, bool do_scale, bool do_add>
+void LayerNormBackwardCpu(ep::CpuStream* stream, const int64_t num_instances,
+                          const int64_t norm_size, const T* dy_ptr, const T* x_ptr,
+                          const T* mean_ptr, const T* inv_variance_ptr, const T* gamma_ptr,
+                          const T* add_to_output_ptr, T* dx_ptr) {
+  stream->ParallelFor(
+      0, num_instances,
+      [&](int64_t begin, int64_t end) {
+        for (int64_t i = begin; i < end; ++i) {
+          const int64_t offset = i * norm_size;
+          const T mean = mean_ptr[i];
+          const T inv_variance = inv_variance_ptr[i];
+          T sum_g = 0;
+          T sum_g_x_hat = 0;
+          for (int64_t j = 0; j < norm_size; ++j) {
+            const T g = do_scale ? dy_ptr[offset + j] * gamma_ptr[j] : dy_ptr[offset + j];
+            sum_g += g;
+            sum_g_x_hat += g * (x_ptr[offset + j] - mean) * inv_variance;
+          }
+          const T mean_g = sum_g / static_cast<T>(norm_size);
+          const T mean_g_x_hat = sum_g_x_hat / static_cast<T>(norm_size);
+          for (int64_t j = 0; j < norm_size; ++j) {
+            const T g = do_scale ? dy_ptr[offset + j] * gamma_ptr[j] : dy_ptr[offset + j];
+            const T x_hat = (x_ptr[offset + j] - mean) * inv_variance;
+            T dx = inv_variance * (g - mean_g - x_hat * mean_g_x_hat);
+            if (do_add) { dx += add_to_output_ptr[offset + j]; }
+            dx_ptr[offset + j] = dx;
+          }
+        }
+      },
+      norm_cpu::GetGrainSize(norm_size));
+}
+
+template<typename T, bool do_scale>
+void DispatchLayerNormBackwardDoAdd(ep::CpuStream* stream, const int64_t num_instances,
+                                    const int64_t norm_size, const T* dy_ptr, const T* x_ptr,
+                                    const T* mean_ptr, const T* inv_variance_ptr,
+                                    const T* gamma_ptr, const T* add_to_output_ptr, T* dx_ptr) {
+  if (add_to_output_ptr != nullptr) {
+    LayerNormBackwardCpu<T, do_scale, true>(stream, num_instances, norm_size, dy_ptr, x_ptr,
+                                            mean_ptr, inv_variance_ptr, gamma_ptr,
+                                            add_to_output_ptr, dx_ptr);
+  } else {
+    LayerNormBackwardCpu<T, do_scale, false>(stream, num_instances, norm_size, dy_ptr, x_ptr,
+                                             mean_ptr, inv_variance_ptr, gamma_ptr,
+                                             add_to_output_ptr, dx_ptr);
+  }
+}
+
+}  // namespace
+
 template<typename T>
 class LayerNormCpuKernel final : public user_op::OpKernel {
  public:
@@ -25,7 +129,27 @@ class LayerNormCpuKernel final : public user_op::OpKernel {
 
  private:
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
-  void Compute(user_op::KernelComputeContext* ctx) const override { TODO(); };
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    user_op::Tensor* y = ctx->Tensor4ArgNameAndIndex("y", 0);
+    user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    user_op::Tensor* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    const double epsilon = ctx->Attr<double>("epsilon");
+    const int64_t num_instances = mean->shape().elem_cnt();
+    if (num_instances == 0) { return; }
+    const int64_t norm_size = x->shape().elem_cnt() / num_instances;
+    const T* gamma_ptr = nullptr;
+    const T* beta_ptr = nullptr;
+    if (ctx->has_input("gamma", 0)) {
+      const user_op::Tensor* gamma = ctx->Tensor4ArgNameAndIndex("gamma", 0);
+      gamma_ptr = gamma->dptr<T>();
+      CHECK_EQ(gamma->shape().elem_cnt(), norm_size);
+    }
+    if (ctx->has_input("beta", 0)) { beta_ptr = ctx->Tensor4ArgNameAndIndex("beta", 0)->dptr<T>(); }
+    DispatchLayerNormForwardCpu<T>(ctx->stream()->As<ep::CpuStream>(), num_instances, norm_size,
+                                   epsilon, x->dptr<T>(), gamma_ptr, beta_ptr, y->mut_dptr<T>(),
+                                   mean->mut_dptr<T>(), inv_variance->mut_dptr<T>());
+  };
 };
 
 #define REGISTER_LAYER_NORM_CPU_KERNEL(dtype)                         \
@@ -45,14 +169,52 @@ class LayerNormGradCpuKernel final : public user_op::OpKernel {
 
  private:
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
-  void Compute(user_op::KernelComputeContext* ctx) const override { TODO(); };
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    const user_op::Tensor* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    user_op::Tensor* dx = ctx->Tensor4ArgNameAndIndex("dx", 0);
+    const int64_t num_instances = mean->shape().elem_cnt();
+    if (num_instances == 0) { return; }
+    const int64_t norm_size = x->shape().elem_cnt() / num_instances;
+    const T* gamma_ptr = nullptr;
+    if (ctx->has_input("gamma", 0)) {
+      gamma_ptr = ctx->Tensor4ArgNameAndIndex("gamma", 0)->dptr<T>();
+    }
+    const T* add_to_output_ptr = nullptr;
+    if (ctx->has_input("_add_to_output", 0)) {
+      const user_op::Tensor* add_to_output = ctx->Tensor4ArgNameAndIndex("_add_to_output", 0);
+      CHECK_EQ(add_to_output->data_type(), dx->data_type());
+      CHECK_EQ(add_to_output->shape(), dx->shape());
+      add_to_output_ptr = add_to_output->dptr<T>();
+    }
+    ep::CpuStream* stream = ctx->stream()->As<ep::CpuStream>();
+    if (gamma_ptr != nullptr) {
+      DispatchLayerNormBackwardDoAdd<T, true>(
+          stream, num_instances, norm_size, dy->dptr<T>(), x->dptr<T>(), mean->dptr<T>(),
+          inv_variance->dptr<T>(), gamma_ptr, add_to_output_ptr, dx->mut_dptr<T>());
+    } else {
+      DispatchLayerNormBackwardDoAdd<T, false>(
+          stream, num_instances, norm_size, dy->dptr<T>(), x->dptr<T>(), mean->dptr<T>(),
+          inv_variance->dptr<T>(), gamma_ptr, add_to_output_ptr, dx->mut_dptr<T>());
+    }
+  };
 };
 
-#define REGISTER_LAYER_NORM_GRAD_CPU_KERNEL(dtype)                    \
-  REGISTER_USER_KERNEL("layer_norm_grad")                             \
-      .SetCreateFn<LayerNormGradCpuKernel<dtype>>()                   \
-      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
-                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value));
+#define REGISTER_LAYER_NORM_GRAD_CPU_KERNEL(dtype)                                         \
+  REGISTER_USER_KERNEL("layer_norm_grad")                                                  \
+      .SetCreateFn<LayerNormGradCpuKernel<dtype>>()                                        \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)                      \
+                       && (user_op::HobDataType("dy", 0) == GetDataType<dtype>::value))    \
+      .SetInplaceProposalFn(                                                               \
+          [](const user_op::InferContext& ctx,                                             \
+             const user_op::AddInplaceArgPair& AddInplaceArgPairFn) -> Maybe<void> {       \
+            if (ctx.has_input("_add_to_output", 0)) {                                      \
+              OF_RETURN_IF_ERROR(AddInplaceArgPairFn("dx", 0, "_add_to_output", 0, true)); \
+            }                                                                              \
+            return Maybe<void>::Ok();                                                      \
+          });
 
 REGISTER_LAYER_NORM_GRAD_CPU_KERNEL(float)
 REGISTER_LAYER_NORM_GRAD_CPU_KERNEL(double)
@@ -65,7 +227,48 @@ class LayerNormParamGradCpuKernel final : public user_op::OpKernel {
 
  private:
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
-  void Compute(user_op::KernelComputeContext* ctx) const override { TODO(); };
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* dy = ctx->Tensor4ArgNameAndIndex("dy", 0);
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* mean = ctx->Tensor4ArgNameAndIndex("mean", 0);
+    const user_op::Tensor* inv_variance = ctx->Tensor4ArgNameAndIndex("inv_variance", 0);
+    T* gamma_diff_ptr = nullptr;
+    T* beta_diff_ptr = nullptr;
+    if (ctx->has_output("gamma_diff", 0)) {
+      gamma_diff_ptr = ctx->Tensor4ArgNameAndIndex("gamma_diff", 0)->mut_dptr<T>();
+    }
+    if (ctx->has_output("beta_diff", 0)) {
+      beta_diff_ptr = ctx->Tensor4ArgNameAndIndex("beta_diff", 0)->mut_dptr<T>();
+    }
+    const int64_t num_instances = mean->shape().elem_cnt();
+    const int64_t norm_size = num_instances == 0 ? 0 : x->shape().elem_cnt() / num_instances;
+    const T* dy_ptr = dy->dptr<T>();
+    const T* x_ptr = x->dptr<T>();
+    const T* mean_ptr = mean->dptr<T>();
+    const T* inv_variance_ptr = inv_variance->dptr<T>();
+    // Each task reduces a block of columns over all the rows, so no reduction buffer is needed.
+    ctx->stream()->As<ep::CpuStream>()->ParallelFor(
+        0, norm_size,
+        [&](int64_t begin, int64_t end) {
+          for (int64_t j = begin; j < end; ++j) {
+            if (gamma_diff_ptr != nullptr) { gamma_diff_ptr[j] = 0; }
+            if (beta_diff_ptr != nullptr) { beta_diff_ptr[j] = 0; }
+          }
+          for (int64_t i = 0; i < num_instances; ++i) {
+            const int64_t offset = i * norm_size;
+            const T mean = mean_ptr[i];
+            const T inv_variance = inv_variance_ptr[i];
+            for (int64_t j = begin; j < end; ++j) {
+              const T dy_val = dy_ptr[offset + j];
+              if (gamma_diff_ptr != nullptr) {
+                gamma_diff_ptr[j] += dy_val * (x_ptr[offset + j] - mean) * inv_variance;
+              }
+              if (beta_diff_ptr != nullptr) { beta_diff_ptr[j] += dy_val; }
+            }
+          }
+        },
+        norm_cpu::GetGrainSize(num_instances));
+  };
 };
 
 #define REGISTER_LAYER_NORM_PARAM_GRAD_CPU_KERNEL(dtype)              \
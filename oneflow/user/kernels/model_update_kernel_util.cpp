@@ -220,8 +220,8 @@ struct IndexedSlicesAdamMdUpdateKernelUtil<DeviceType::kCPU, T, K, IDX> {
       if (instance_id >= lower_bound && instance_id < upper_bound) {
         const IDX model_idx = (instance_id - lower_bound) * feature_size + inner_idx;
         AdamUpdateFunctor<T, T>()(values + i, model + model_idx, m + model_idx, v + model_idx,
-                                  max_v + i, /*scale=*/1.0, /*l1=*/0.0, /*l2=*/0.0, beta1, beta2,
-                                  epsilon, weight_decay, amsgrad, bias_correction1,
+                                  max_v + model_idx, /*scale=*/1.0, /*l1=*/0.0, /*l2=*/0.0, beta1,
+                                  beta2, epsilon, weight_decay, amsgrad, bias_correction1,
                                   bias_correction2, lr);
       }
     }
@@ -269,6 +269,43 @@ void AdagradUpdateKernelUtil<DeviceType::kCPU, T, G>::Update(
 template struct AdagradUpdateKernelUtil<DeviceType::kCPU, float, float>;
 template struct AdagradUpdateKernelUtil<DeviceType::kCPU, double, double>;
 
+template<typename T, typename K, typename IDX>
+struct IndexedSlicesAdagradMdUpdateKernelUtil<DeviceType::kCPU, T, K, IDX> {
+  static void Update(ep::Stream* stream, float epsilon, float weight_decay, int64_t num_instance,
+                     int64_t feature_size, int64_t lower_bound, int64_t upper_bound,
+                     const IDX* num_unique_instance, const float* learning_rate, const K* indices,
+                     const T* values, T* model, T* sum);
+};
+
+template<typename T, typename K, typename IDX>
+void IndexedSlicesAdagradMdUpdateKernelUtil<DeviceType::kCPU, T, K, IDX>::Update(
+    ep::Stream* stream, float epsilon, float weight_decay, int64_t num_instance,
+    int64_t feature_size, int64_t lower_bound, int64_t upper_bound, const IDX* num_unique_instance,
+    const float* learning_rate, const K* indices, const T* values, T* model, T* sum) {
+  const int64_t n = *num_unique_instance * feature_size;
+  const float lr = *learning_rate;
+  FOR_RANGE(int64_t, i, 0, n) {
+    const IDX indices_idx = i / feature_size;
+    const IDX inner_idx = i - indices_idx * feature_size;
+    const IDX instance_id = indices[indices_idx];
+    if (instance_id >= lower_bound && instance_id < upper_bound) {
+      const IDX model_idx = (instance_id - lower_bound) * feature_size + inner_idx;
+      AdagradUpdateFunctor<T, T>()(values + i, model + model_idx, sum + model_idx,
+                                   /*scale=*/static_cast<T>(1), /*l1=*/0.0,
+                                   /*l2=*/weight_decay, epsilon, weight_decay, lr);
+    }
+  }
+}
+
+#define INSTANTIATE_INDEXED_SLICES_ADAGRAD_MODEL_UPDATE_KERNEL_UTIL_CPU(                  \
+    val_type_pair, key_type_pair, idx_type_pair)                                          \
+  template struct IndexedSlicesAdagradMdUpdateKernelUtil<                                 \
+      DeviceType::kCPU, OF_PP_PAIR_FIRST(val_type_pair), OF_PP_PAIR_FIRST(key_type_pair), \
+      OF_PP_PAIR_FIRST(idx_type_pair)>;
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(INSTANTIATE_INDEXED_SLICES_ADAGRAD_MODEL_UPDATE_KERNEL_UTIL_CPU,
+                                 FLOATING_DATA_TYPE_SEQ, INDEX_DATA_TYPE_SEQ, INDEX_DATA_TYPE_SEQ);
+#undef INSTANTIATE_INDEXED_SLICES_ADAGRAD_MODEL_UPDATE_KERNEL_UTIL_CPU
+
 template<typename T, typename G>
 struct LambUpdateKernelUtil<DeviceType::kCPU, T, G> {
   static void Update(ep::Stream* stream, int64_t n, float scale, float l1, float l2, float beta1,
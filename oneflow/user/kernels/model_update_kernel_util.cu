@@ -314,7 +314,7 @@ __global__ void IndexedSlicesAdamUpdateGpu(
     if (instance_id >= lower_bound && instance_id < upper_bound) {
       const IDX model_idx = (instance_id - lower_bound) * feature_size + inner_idx;
       AdamUpdateFunctor<T, T>()(values + i, model + model_idx, m + model_idx, v + model_idx,
-                                max_v + i, static_cast<T>(1), 0, 0, beta1, beta2, epsilon,
+                                max_v + model_idx, static_cast<T>(1), 0, 0, beta1, beta2, epsilon,
                                 weight_decay, amsgrad, bias_correction1, bias_correction2, lr);
     }
   }
@@ -450,6 +450,59 @@ void AdagradUpdateKernelUtil<DeviceType::kCUDA, T, G>::Update(
 template struct AdagradUpdateKernelUtil<DeviceType::kCUDA, float, float>;
 template struct AdagradUpdateKernelUtil<DeviceType::kCUDA, double, double>;
 
+namespace {
+
+template<typename T, typename K, typename IDX>
+__global__ void IndexedSlicesAdagradUpdateGpu(float epsilon, float weight_decay,
+                                              int64_t feature_size, int64_t lower_bound,
+                                              int64_t upper_bound, const IDX* num_unique_instance,
+                                              const float* learning_rate, const K* indices,
+                                              const T* values, T* model, T* sum) {
+  const int64_t n = *num_unique_instance * feature_size;
+  const float lr = *learning_rate;
+  CUDA_1D_KERNEL_LOOP(i, n) {
+    const IDX indices_idx = i / feature_size;
+    const IDX inner_idx = i - indices_idx * feature_size;
+    const IDX instance_id = indices[indices_idx];
+    if (instance_id >= lower_bound && instance_id < upper_bound) {
+      const IDX model_idx = (instance_id - lower_bound) * feature_size + inner_idx;
+      AdagradUpdateFunctor<T, T>()(values + i, model + model_idx, sum + model_idx,
+                                   static_cast<T>(1), 0, weight_decay, epsilon, weight_decay, lr);
+    }
+  }
+}
+
+}  // namespace
+
+template<typename T, typename K, typename IDX>
+struct IndexedSlicesAdagradMdUpdateKernelUtil<DeviceType::kCUDA, T, K, IDX> {
+  static void Update(ep::Stream* stream, float epsilon, float weight_decay, int64_t num_instance,
+                     int64_t feature_size, int64_t lower_bound, int64_t upper_bound,
+                     const IDX* num_unique_instance, const float* learning_rate, const K* indices,
+                     const T* values, T* model, T* sum);
+};
+
+template<typename T, typename K, typename IDX>
+void IndexedSlicesAdagradMdUpdateKernelUtil<DeviceType::kCUDA, T, K, IDX>::Update(
+    ep::Stream* stream, float epsilon, float weight_decay, int64_t num_instance,
+    int64_t feature_size, int64_t lower_bound, int64_t upper_bound, const IDX* num_unique_instance,
+    const float* learning_rate, const K* indices, const T* values, T* model, T* sum) {
+  IndexedSlicesAdagradUpdateGpu<T, K, IDX>
+      <<<BlocksNum4ThreadsNum(num_instance * feature_size), kCudaThreadsNumPerBlock, 0,
+         stream->As<ep::CudaStream>()->cuda_stream()>>>(
+          epsilon, weight_decay, feature_size, lower_bound, upper_bound, num_unique_instance,
+          learning_rate, indices, values, model, sum);
+}
+
+#define INSTANTIATE_INDEXED_SLICES_ADAGRAD_MODEL_UPDATE_KERNEL_UTIL_CUDA(                  \
+    val_type_pair, key_type_pair, idx_type_pair)                                           \
+  template struct IndexedSlicesAdagradMdUpdateKernelUtil<                                  \
+      DeviceType::kCUDA, OF_PP_PAIR_FIRST(val_type_pair), OF_PP_PAIR_FIRST(key_type_pair), \
+      OF_PP_PAIR_FIRST(idx_type_pair)>;
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(INSTANTIATE_INDEXED_SLICES_ADAGRAD_MODEL_UPDATE_KERNEL_UTIL_CUDA,
+                                 FLOATING_DATA_TYPE_SEQ, INDEX_DATA_TYPE_SEQ, INT_DATA_TYPE_SEQ);
+#undef INSTANTIATE_INDEXED_SLICES_ADAGRAD_MODEL_UPDATE_KERNEL_UTIL_CUDA
+
 template<typename T, typename G>
 struct LambUpdateKernelUtil<DeviceType::kCUDA, T, G> {
   static void Update(ep::Stream* stream, int64_t n, float scale, float l1, float l2, float beta1,
@@ -221,6 +221,14 @@ struct IndexedSlicesAdamMdUpdateKernelUtil {
                      T* m, T* v, T* max_v);
 };
 
+template<DeviceType device_type, typename T, typename K, typename IDX>
+struct IndexedSlicesAdagradMdUpdateKernelUtil {
+  static void Update(ep::Stream* stream, float epsilon, float weight_decay, int64_t num_instance,
+                     int64_t feature_size, int64_t lower_bound, int64_t upper_bound,
+                     const IDX* num_unique_instance, const float* learning_rate, const K* indices,
+                     const T* values, T* model, T* sum);
+};
+
 template<DeviceType device_type, typename T, typename G>
 struct LambUpdateKernelUtil {
  public:
@@ -93,6 +93,11 @@ class IndexedSlicesUpdateOpKernelCache final : public user_op::OpKernelCache {
 
 std::shared_ptr<user_op::OpKernelCache> CreateIndexedSlicesUpdateOpKernelCache(
     user_op::KernelCacheContext* ctx) {
+  if (ctx->parallel_ctx().parallel_num() == 1) {
+    // Eager local tensors carry no sbp, the whole model lives on this device.
+    return std::make_shared<IndexedSlicesUpdateOpKernelCache>(
+        0, ctx->TensorDesc4ArgNameAndIndex("model", 0)->shape().At(0));
+  }
   const SbpParallel& model_sbp = ctx->SbpParallel4ArgNameAndIndex("model", 0);
   const user_op::TensorDesc* model_logical_desc =
       ctx->LogicalTensorDesc4ArgNameAndIndex("model", 0);
@@ -537,6 +542,78 @@ REGISTER_ADAGRAD_UPDATE_KERNEL(DeviceType::kCUDA, float, float);
 REGISTER_ADAGRAD_UPDATE_KERNEL(DeviceType::kCUDA, double, double);
 #endif  // WITH_CUDA
 
+template<DeviceType device_type, typename T, typename K>
+class IndexedSlicesAdagradUpdateKernel final : public user_op::OpKernel {
+ public:
+  IndexedSlicesAdagradUpdateKernel() = default;
+  ~IndexedSlicesAdagradUpdateKernel() override = default;
+
+  std::shared_ptr<user_op::OpKernelCache> InitOpKernelCache(
+      user_op::KernelCacheContext* ctx) const override {
+    return CreateIndexedSlicesUpdateOpKernelCache(ctx);
+  }
+
+ private:
+  using ReduceSumUtilT = IndexedSlicesReduceSumKernelUtil<device_type, K, T, int32_t>;
+  using MdUpdateUtilT = IndexedSlicesAdagradMdUpdateKernelUtil<device_type, T, K, int32_t>;
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState*,
+               const user_op::OpKernelCache* cache) const override {
+    const user_op::Tensor* learning_rate = ctx->Tensor4ArgNameAndIndex("learning_rate", 0);
+    const user_op::Tensor* model_diff_indices =
+        ctx->Tensor4ArgNameAndIndex("model_diff_indices", 0);
+    const user_op::Tensor* model_diff_values = ctx->Tensor4ArgNameAndIndex("model_diff_values", 0);
+    user_op::Tensor* model = ctx->Tensor4ArgNameAndIndex("model", 0);
+    user_op::Tensor* sum = ctx->Tensor4ArgNameAndIndex("sum", 0);
+    const auto epsilon = ctx->Attr<float>("epsilon");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const int64_t num_indices = model_diff_indices->shape().elem_cnt();
+    const int64_t num_values = model_diff_values->shape().elem_cnt();
+    if (num_indices == 0) {
+      CHECK_EQ(num_values, 0);
+      return;
+    }
+    CHECK_NE(num_values, 0);
+    CHECK_EQ(num_values % num_indices, 0);
+    const int64_t feature_size = num_values / num_indices;
+    CHECK_EQ(feature_size, model_diff_values->shape().Count(model_diff_indices->shape().NumAxes()));
+    auto* kernel_cache = dynamic_cast<const IndexedSlicesUpdateOpKernelCache*>(cache);
+    CHECK_NOTNULL(kernel_cache);
+    CHECK_EQ(model->shape().At(0), kernel_cache->upper() - kernel_cache->lower());
+    user_op::Tensor* tmp_buffer = ctx->Tensor4ArgNameAndIndex("tmp_buffer", 0);
+    TmpBufferManager<device_type, T, K> buffer_manager(tmp_buffer->mut_dptr(), num_indices,
+                                                       num_values);
+    CHECK_GE(tmp_buffer->shape().elem_cnt(), buffer_manager.GetTotalBufferSize());
+    ReduceSumUtilT::ReduceSum(
+        ctx->stream(), num_indices, feature_size, model_diff_indices->dptr<K>(),
+        model_diff_values->dptr<T>(), buffer_manager.NumUniqueDiffIndicesPtr(),
+        buffer_manager.UniqueDiffIndicesPtr(), buffer_manager.UniqueDiffValuesPtr(),
+        buffer_manager.UniqueWorkspacePtr(), buffer_manager.UniqueWorkspaceBytes());
+    MdUpdateUtilT::Update(
+        ctx->stream(), epsilon, weight_decay, num_indices, feature_size, kernel_cache->lower(),
+        kernel_cache->upper(), buffer_manager.NumUniqueDiffIndicesPtr(),
+        learning_rate->dptr<float>(), buffer_manager.UniqueDiffIndicesPtr(),
+        buffer_manager.UniqueDiffValuesPtr(), model->mut_dptr<T>(), sum->mut_dptr<T>());
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_INDEXED_SLICES_ADAGRAD_UPDATE_KERNEL(device_type_v, data_type_pair,               \
+                                                      indices_type_pair)                           \
+  REGISTER_USER_KERNEL("indexed_slices_adagrad_update")                                            \
+      .SetCreateFn<IndexedSlicesAdagradUpdateKernel<                                               \
+          device_type_v, OF_PP_PAIR_FIRST(data_type_pair), OF_PP_PAIR_FIRST(indices_type_pair)>>() \
+      .SetIsMatchedHob(                                                                            \
+          (user_op::HobDeviceType() == device_type_v)                                              \
+          && (user_op::HobDataType("model", 0) == OF_PP_PAIR_SECOND(data_type_pair))               \
+          && (user_op::HobDataType("model_diff_values", 0) == OF_PP_PAIR_SECOND(data_type_pair))   \
+          && (user_op::HobDataType("model_diff_indices", 0)                                        \
+              == OF_PP_PAIR_SECOND(indices_type_pair)))                                            \
+      .SetInferTmpSizeFn(GenInferTmpSizeFn<device_type_v, OF_PP_PAIR_FIRST(data_type_pair),        \
+                                           OF_PP_PAIR_FIRST(indices_type_pair)>());
+
+OF_PP_SEQ_PRODUCT_FOR_EACH_TUPLE(REGISTER_INDEXED_SLICES_ADAGRAD_UPDATE_KERNEL, DEVICE_TYPE_SEQ,
+                                 FLOATING_DATA_TYPE_SEQ, INDEX_DATA_TYPE_SEQ)
+
 template<DeviceType device_type, typename T, typename K>
 class IndexedSlicesAdamUpdateKernel final : public user_op::OpKernel {
  public:
@@ -0,0 +1,78 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_USER_KERNELS_NORM_CPU_UTIL_H_
+#define ONEFLOW_USER_KERNELS_NORM_CPU_UTIL_H_
+
+#include <cmath>
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+
+namespace oneflow {
+
+namespace norm_cpu {
+
+// The number of elements each task of `ParallelFor` should at least process.
+constexpr int64_t kParallelGrainElems = 32768;
+
+inline int64_t GetGrainSize(int64_t elems_per_index) {
+  return std::max<int64_t>(1, kParallelGrainElems / std::max<int64_t>(1, elems_per_index));
+}
+
+// Computes the mean and the biased variance of x[0, n) in one pass with Welford's algorithm.
+// kLanes states are updated in lockstep so that they share the reciprocal of the count and the
+// inner loop can be vectorized, then the states are merged with Chan's formula.
+template<typename T>
+void WelfordMeanVariance(const T* x, int64_t n, T* mean, T* variance) {
+  constexpr int kLanes = 8;
+  T lane_mean[kLanes] = {0};
+  T lane_m2[kLanes] = {0};
+  const int64_t num_packs = n / kLanes;
+  for (int64_t p = 0; p < num_packs; ++p) {
+    const T inv_count = static_cast<T>(1) / static_cast<T>(p + 1);
+    const T* pack = x + p * kLanes;
+    for (int l = 0; l < kLanes; ++l) {
+      const T delta = pack[l] - lane_mean[l];
+      lane_mean[l] += delta * inv_count;
+      lane_m2[l] += delta * (pack[l] - lane_mean[l]);
+    }
+  }
+  T merged_mean = 0;
+  T merged_m2 = 0;
+  int64_t merged_count = 0;
+  const auto Merge = [&](T other_mean, T other_m2, int64_t other_count) {
+    if (other_count == 0) { return; }
+    const int64_t count = merged_count + other_count;
+    const T delta = other_mean - merged_mean;
+    const T ratio = static_cast<T>(other_count) / static_cast<T>(count);
+    merged_mean += delta * ratio;
+    merged_m2 += other_m2 + delta * delta * static_cast<T>(merged_count) * ratio;
+    merged_count = count;
+  };
+  for (int l = 0; l < kLanes; ++l) { Merge(lane_mean[l], lane_m2[l], num_packs); }
+  for (int64_t i = num_packs * kLanes; i < n; ++i) { Merge(x[i], 0, 1); }
+  *mean = merged_mean;
+  *variance = merged_count > 0 ? merged_m2 / static_cast<T>(merged_count) : 0;
+}
+
+template<typename T>
+T InvStd(T variance, double epsilon) {
+  return static_cast<T>(1) / std::sqrt(variance + static_cast<T>(epsilon));
+}
+
+}  // namespace norm_cpu
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_USER_KERNELS_NORM_CPU_UTIL_H_
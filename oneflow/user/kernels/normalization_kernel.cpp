@@ -17,21 +17,60 @@ limitations under the License.
 
 namespace oneflow {
 
+template<typename T>
+struct MeanAndVarParams {
+  MeanAndVarParams(const int64_t reduce_count, const float epsilon, const float momentum)
+      : reduce_count(reduce_count), epsilon(epsilon), momentum(momentum) {
+    // NOTE(Liang Depeng): the following parameters were used to compute mean and var
+    const int64_t unbias_reduce_count = reduce_count - 1;
+    reduce_scale_factor = static_cast<T>(1) / reduce_count;
+    unbias_reduce_scale_factor = static_cast<T>(1) / unbias_reduce_count;
+    unbias_reduce_scale_factor_m2 = unbias_reduce_scale_factor * -static_cast<T>(2);
+    unbias_reduce_scale_factor_mn = reduce_count * unbias_reduce_scale_factor;
+    exponential_average_factor = 1.0f - momentum;
+  }
+  int64_t reduce_count;
+  float epsilon;
+  float momentum;
+  T reduce_scale_factor;
+  T unbias_reduce_scale_factor;
+  T unbias_reduce_scale_factor_m2;
+  T unbias_reduce_scale_factor_mn;
+  T exponential_average_factor;
+};
+
+template<typename T>
+static inline void UpdateMeanAndVar(const MeanAndVarParams<T>& params, const T sum,
+                                    const T sum_square, const int64_t channel, T* mean_ptr,
+                                    T* inv_variance_ptr, T* moving_mean_ptr,
+                                    T* moving_variance_ptr) {
+  const T temp_mean = sum * params.reduce_scale_factor;
+  mean_ptr[channel] = temp_mean;
+
+  const T temp_mean_square = temp_mean * temp_mean;
+  const T temp_variance = sum_square * params.reduce_scale_factor - temp_mean_square;
+
+  const T temp_unbias_variance = sum_square * params.unbias_reduce_scale_factor
+                                 + params.unbias_reduce_scale_factor_m2 * temp_mean * sum
+                                 + params.unbias_reduce_scale_factor_mn * temp_mean_square;
+
+  inv_variance_ptr[channel] = static_cast<T>(1) / std::sqrt(temp_variance + params.epsilon);
+
+  if (moving_mean_ptr != nullptr && moving_variance_ptr != nullptr) {
+    moving_mean_ptr[channel] =
+        moving_mean_ptr[channel] * params.momentum + temp_mean * params.exponential_average_factor;
+    moving_variance_ptr[channel] = moving_variance_ptr[channel] * params.momentum
+                                   + temp_unbias_variance * params.exponential_average_factor;
+  }
+}
+
 template<typename T>
 static void ComputeMeanAndVar(const T* input_ptr, T* mean_ptr, T* inv_variance_ptr,
                               T* moving_mean_ptr, T* moving_variance_ptr, const int64_t batch_size,
                               const int64_t channel_size, const int64_t spatial_size,
                               const float epsilon, const float momentum) {
-  // NOTE(Liang Depeng): the following parameters were used to compute mean and var
   const int64_t jump_step = spatial_size * channel_size;
-  const int64_t reduce_count = batch_size * spatial_size;
-  const int64_t unbias_reduce_count = reduce_count - 1;
-  const T reduce_scale_factor = static_cast<T>(1) / reduce_count;
-  const T unbias_reduce_scale_factor = static_cast<T>(1) / unbias_reduce_count;
-  const T unbias_reduce_scale_factor_m2 = unbias_reduce_scale_factor * -static_cast<T>(2);
-  const T unbias_reduce_scale_factor_mn = reduce_count * unbias_reduce_scale_factor;
-
-  const T exponential_average_factor = 1.0f - momentum;
+  const MeanAndVarParams<T> params(batch_size * spatial_size, epsilon, momentum);
 
   for (int64_t channel = 0; channel < channel_size; ++channel) {
     const T* temp_input_ptr = input_ptr + channel * spatial_size;
@@ -45,26 +84,33 @@ static void ComputeMeanAndVar(const T* input_ptr, T* mean_ptr, T* inv_variance_p
       }
       temp_input_ptr += jump_step;
     }
+    UpdateMeanAndVar(params, sum, sum_square, channel, mean_ptr, inv_variance_ptr, moving_mean_ptr,
+                     moving_variance_ptr);
+  }
+}
 
-    const T temp_mean = sum * reduce_scale_factor;
-    mean_ptr[channel] = temp_mean;
-
-    const T temp_mean_square = temp_mean * temp_mean;
-    const T temp_variance = sum_square * reduce_scale_factor - temp_mean_square;
-
-    const T temp_unbias_variance = sum_square * unbias_reduce_scale_factor
-                                   + unbias_reduce_scale_factor_m2 * temp_mean * sum
-                                   + unbias_reduce_scale_factor_mn * temp_mean_square;
-
-    inv_variance_ptr[channel] = static_cast<T>(1) / std::sqrt(temp_variance + epsilon);
-
-    if (moving_mean_ptr != nullptr && moving_variance_ptr != nullptr) {
-      moving_mean_ptr[channel] =
-          moving_mean_ptr[channel] * momentum + temp_mean * exponential_average_factor;
-      moving_variance_ptr[channel] = moving_variance_ptr[channel] * momentum
-                                     + temp_unbias_variance * exponential_average_factor;
+// NOTE: channels-last variant, the input is viewed as [rows, channel_size] and every row is
+// accumulated as a whole so that the inner loop runs over contiguous memory.
+template<typename T>
+static void ComputeMeanAndVarChannelsLast(const T* input_ptr, T* mean_ptr, T* inv_variance_ptr,
+                                          T* moving_mean_ptr, T* moving_variance_ptr,
+                                          const int64_t rows, const int64_t channel_size,
+                                          const float epsilon, const float momentum) {
+  const MeanAndVarParams<T> params(rows, epsilon, momentum);
+  std::vector<T> sum(channel_size, 0);
+  std::vector<T> sum_square(channel_size, 0);
+  for (int64_t row = 0; row < rows; ++row) {
+    const T* row_ptr = input_ptr + row * channel_size;
+    for (int64_t channel = 0; channel < channel_size; ++channel) {
+      const T x = row_ptr[channel];
+      sum[channel] += x;
+      sum_square[channel] += x * x;
     }
   }
+  for (int64_t channel = 0; channel < channel_size; ++channel) {
+    UpdateMeanAndVar(params, sum[channel], sum_square[channel], channel, mean_ptr, inv_variance_ptr,
+                     moving_mean_ptr, moving_variance_ptr);
+  }
 }
 
 template<typename T>
@@ -92,6 +138,27 @@ static void Normalize(const T* input_ptr, const T* mean_ptr, const T* variance_p
   }
 }
 
+template<typename T>
+static void NormalizeChannelsLast(const T* input_ptr, const T* mean_ptr, const T* variance_ptr,
+                                  const T* gamma_ptr, const T* beta_ptr, T* output_ptr,
+                                  const int64_t rows, const int64_t channel_size,
+                                  const float epsilon, const bool training) {
+  std::vector<T> scale(channel_size);
+  for (int64_t channel = 0; channel < channel_size; ++channel) {
+    T inv_variance = variance_ptr[channel];
+    if (!training) { inv_variance = 1.0f / std::sqrt(inv_variance + epsilon); }
+    scale[channel] = gamma_ptr[channel] * inv_variance;
+  }
+  for (int64_t row = 0; row < rows; ++row) {
+    const T* row_input_ptr = input_ptr + row * channel_size;
+    T* row_output_ptr = output_ptr + row * channel_size;
+    for (int64_t channel = 0; channel < channel_size; ++channel) {
+      row_output_ptr[channel] =
+          (row_input_ptr[channel] - mean_ptr[channel]) * scale[channel] + beta_ptr[channel];
+    }
+  }
+}
+
 template<typename T>
 static void AddToOutput(const T* add_to_output_ptr, T* output_ptr, const int64_t elem_count) {
   for (int64_t i = 0; i < elem_count; ++i) { output_ptr[i] += add_to_output_ptr[i]; }
@@ -294,33 +361,33 @@ class NormalizationInferenceCpuKernel final : public user_op::OpKernel {
     CHECK_GE(axis, 0);
     CHECK_LT(axis, x->shape().NumAxes());
 
-    if (axis == 1) {  // NOTE(Liang Depeng): NCHW format
-      const T* input_ptr = x->dptr<T>();
-      const T* gamma_ptr = gamma->dptr<T>();
-      const T* beta_ptr = beta->dptr<T>();
+    const T* input_ptr = x->dptr<T>();
+    const T* gamma_ptr = gamma->dptr<T>();
+    const T* beta_ptr = beta->dptr<T>();
 
-      T* output_ptr = y->mut_dptr<T>();
-      T* moving_mean_ptr = moving_mean->mut_dptr<T>();
-      T* moving_variance_ptr = moving_variance->mut_dptr<T>();
+    T* output_ptr = y->mut_dptr<T>();
+    T* moving_mean_ptr = moving_mean->mut_dptr<T>();
+    T* moving_variance_ptr = moving_variance->mut_dptr<T>();
 
-      const int64_t batch_size = x->shape().At(0);
-      const int64_t channel_size = x->shape().At(axis);
-      const int64_t spatial_size = x->shape().Count(axis + 1);
+    const int64_t batch_size = x->shape().Count(0, axis);
+    const int64_t channel_size = x->shape().At(axis);
+    const int64_t spatial_size = x->shape().Count(axis + 1);
 
-      // NOTE(Liang Depeng):
-      // compute the normalization result
+    // NOTE(Liang Depeng):
+    // compute the normalization result
+    if (spatial_size == 1) {  // NOTE: NHWC format
+      NormalizeChannelsLast(input_ptr, moving_mean_ptr, moving_variance_ptr, gamma_ptr, beta_ptr,
+                            output_ptr, batch_size, channel_size, epsilon, false);
+    } else {  // NOTE(Liang Depeng): NCHW format
       Normalize(input_ptr, moving_mean_ptr, moving_variance_ptr, gamma_ptr, beta_ptr, output_ptr,
                 batch_size, channel_size, spatial_size, epsilon, false);
+    }
 
-      if (ctx->has_input("_add_to_output", 0)) {
-        const user_op::Tensor* add_to_output = ctx->Tensor4ArgNameAndIndex("_add_to_output", 0);
-        CHECK_EQ(add_to_output->data_type(), y->data_type());
-        CHECK_EQ(add_to_output->shape(), y->shape());
-        AddToOutput(add_to_output->dptr<T>(), output_ptr, x->shape().elem_cnt());
-      }
-
-    } else {  // TODO(Liang Depeng): NHWC format
-      UNIMPLEMENTED() << "cpu normalization op only support nchw data_format now!";
+    if (ctx->has_input("_add_to_output", 0)) {
+      const user_op::Tensor* add_to_output = ctx->Tensor4ArgNameAndIndex("_add_to_output", 0);
+      CHECK_EQ(add_to_output->data_type(), y->data_type());
+      CHECK_EQ(add_to_output->shape(), y->shape());
+      AddToOutput(add_to_output->dptr<T>(), output_ptr, x->shape().elem_cnt());
     }
   }
 
@@ -383,26 +450,32 @@ class NormalizationTrainCpuKernel final : public user_op::OpKernel {
       moving_variance = ctx->Tensor4ArgNameAndIndex("moving_variance", 0);
     }
 
-    if (axis == 1) {  // NOTE(Liang Depeng): NCHW format
-      const T* input_ptr = x->dptr<T>();
-      const T* gamma_ptr = gamma->dptr<T>();
-      const T* beta_ptr = beta->dptr<T>();
+    const T* input_ptr = x->dptr<T>();
+    const T* gamma_ptr = gamma->dptr<T>();
+    const T* beta_ptr = beta->dptr<T>();
 
-      T* output_ptr = y->mut_dptr<T>();
-      T* mean_ptr = mean->mut_dptr<T>();
-      T* inv_variance_ptr = inv_variance->mut_dptr<T>();
+    T* output_ptr = y->mut_dptr<T>();
+    T* mean_ptr = mean->mut_dptr<T>();
+    T* inv_variance_ptr = inv_variance->mut_dptr<T>();
 
-      T* moving_mean_ptr = nullptr;
-      T* moving_variance_ptr = nullptr;
-      if (moving_mean != nullptr && moving_variance != nullptr) {
-        moving_mean_ptr = moving_mean->mut_dptr<T>();
-        moving_variance_ptr = moving_variance->mut_dptr<T>();
-      }
-
-      const int64_t batch_size = x->shape().At(0);
-      const int64_t channel_size = x->shape().At(axis);
-      const int64_t spatial_size = x->shape().Count(axis + 1);
+    T* moving_mean_ptr = nullptr;
+    T* moving_variance_ptr = nullptr;
+    if (moving_mean != nullptr && moving_variance != nullptr) {
+      moving_mean_ptr = moving_mean->mut_dptr<T>();
+      moving_variance_ptr = moving_variance->mut_dptr<T>();
+    }
 
+    const int64_t batch_size = x->shape().Count(0, axis);
+    const int64_t channel_size = x->shape().At(axis);
+    const int64_t spatial_size = x->shape().Count(axis + 1);
+
+    if (spatial_size == 1) {  // NOTE: NHWC format
+      ComputeMeanAndVarChannelsLast(input_ptr, mean_ptr, inv_variance_ptr, moving_mean_ptr,
+                                    moving_variance_ptr, batch_size, channel_size, epsilon,
+                                    momentum);
+      NormalizeChannelsLast(input_ptr, mean_ptr, inv_variance_ptr, gamma_ptr, beta_ptr, output_ptr,
+                            batch_size, channel_size, epsilon, true);
+    } else {  // NOTE(Liang Depeng): NCHW format
       // NOTE(Liang Depeng):
       // Compute mean & inv_variance and update moving_mean & moving_variance for each channel.
       ComputeMeanAndVar(input_ptr, mean_ptr, inv_variance_ptr, moving_mean_ptr, moving_variance_ptr,
@@ -412,26 +485,25 @@ class NormalizationTrainCpuKernel final : public user_op::OpKernel {
       // compute the normalization result
       Normalize(input_ptr, mean_ptr, inv_variance_ptr, gamma_ptr, beta_ptr, output_ptr, batch_size,
                 channel_size, spatial_size, epsilon, true);
+    }
 
-      if (ctx->has_input("_add_to_output", 0)) {
-        const user_op::Tensor* add_to_output = ctx->Tensor4ArgNameAndIndex("_add_to_output", 0);
-        CHECK_EQ(add_to_output->data_type(), y->data_type());
-        CHECK_EQ(add_to_output->shape(), y->shape());
-        AddToOutput(add_to_output->dptr<T>(), output_ptr, x->shape().elem_cnt());
-      }
+    if (ctx->has_input("_add_to_output", 0)) {
+      const user_op::Tensor* add_to_output = ctx->Tensor4ArgNameAndIndex("_add_to_output", 0);
+      CHECK_EQ(add_to_output->data_type(), y->data_type());
+      CHECK_EQ(add_to_output->shape(), y->shape());
+      AddToOutput(add_to_output->dptr<T>(), output_ptr, x->shape().elem_cnt());
+    }
 
-      if (ctx->op_type_name() == "normalization_add_relu") {
-        CHECK(!ctx->has_input("_add_to_output", 0));
-        auto* mask = ctx->Tensor4ArgNameAndIndex("reserve_space", 0);
+    if (ctx->op_type_name() == "normalization_add_relu") {
+      CHECK(!ctx->has_input("_add_to_output", 0));
+      auto* mask = ctx->Tensor4ArgNameAndIndex("reserve_space", 0);
 
-        if (ctx->has_input("addend", 0)) {
-          const auto* addend = ctx->Tensor4ArgNameAndIndex("addend", 0);
-          AddRelu(addend->dptr<T>(), mask->mut_dptr<int32_t>(), output_ptr, x->shape().elem_cnt());
-        } else {
-          Relu(mask->mut_dptr<int32_t>(), output_ptr, x->shape().elem_cnt());
-        }
+      if (ctx->has_input("addend", 0)) {
+        const auto* addend = ctx->Tensor4ArgNameAndIndex("addend", 0);
+        AddRelu(addend->dptr<T>(), mask->mut_dptr<int32_t>(), output_ptr, x->shape().elem_cnt());
+      } else {
+        Relu(mask->mut_dptr<int32_t>(), output_ptr, x->shape().elem_cnt());
       }
-    } else {  // TODO(Liang Depeng): NHWC format
     }
   }
 
@@ -517,61 +589,92 @@ class NormalizationGradCpuKernel final : public user_op::OpKernel {
       UNIMPLEMENTED();
     }
 
-    if (axis == 1) {  // NOTE(Liang Depeng): NCHW format
-      const T* x_ptr = x->dptr<T>();
-      const T* gamma_ptr = gamma->dptr<T>();
-      const T* mean_ptr = mean->dptr<T>();
-      const T* inv_variance_ptr = inv_variance->dptr<T>();
-
-      T* dx_ptr = dx->mut_dptr<T>();
-      T* gamma_diff_ptr = gamma_diff->mut_dptr<T>();
-      T* beta_diff_ptr = beta_diff->mut_dptr<T>();
-
-      const int64_t batch_size = x->shape().At(0);
-      const int64_t channel_size = x->shape().At(axis);
-      const int64_t spatial_size = x->shape().Count(axis + 1);
-      const int64_t jump_step = spatial_size * channel_size;
-      const int64_t reduce_count = batch_size * spatial_size;
-
-      // NOTE(Liang Depeng):
-      // Borrow the MXNet implementation to compute dx, gamma_diff and beta_diff.
-      // For more details pls refers to:
-      // https://github.com/apache/incubator-mxnet/blob/master/src/operator/nn/batch_norm.cc
+    const T* x_ptr = x->dptr<T>();
+    const T* gamma_ptr = gamma->dptr<T>();
+    const T* mean_ptr = mean->dptr<T>();
+    const T* inv_variance_ptr = inv_variance->dptr<T>();
+
+    T* dx_ptr = dx->mut_dptr<T>();
+    T* gamma_diff_ptr = gamma_diff->mut_dptr<T>();
+    T* beta_diff_ptr = beta_diff->mut_dptr<T>();
+
+    const int64_t batch_size = x->shape().Count(0, axis);
+    const int64_t channel_size = x->shape().At(axis);
+    const int64_t spatial_size = x->shape().Count(axis + 1);
+    const int64_t jump_step = spatial_size * channel_size;
+    const int64_t reduce_count = batch_size * spatial_size;
+
+    if (spatial_size == 1) {  // NOTE: NHWC format
+      std::vector<T> sum_dy_out(channel_size, 0);
+      std::vector<T> dotp(channel_size, 0);
+      for (int64_t row = 0; row < batch_size; ++row) {
+        const T* row_x_ptr = x_ptr + row * channel_size;
+        const T* row_dy_ptr = dy_ptr + row * channel_size;
+        for (int64_t channel = 0; channel < channel_size; ++channel) {
+          sum_dy_out[channel] += row_dy_ptr[channel];
+          dotp[channel] += (row_x_ptr[channel] - mean_ptr[channel]) * row_dy_ptr[channel];
+        }
+      }
+      std::vector<T> k(channel_size);
+      std::vector<T> iw(channel_size);
+      std::vector<T> grad_mean(channel_size);
       for (int64_t channel = 0; channel < channel_size; ++channel) {
-        const T gamma_c = gamma_ptr[channel];
-        const T mean_c = mean_ptr[channel];
         const T inv_variance_c = inv_variance_ptr[channel];
-
-        // NOTE(Liang Depeng): sum dy for specific channel over all samples
-        T sum_dy_out = 0;
-        ForEachFast(dy_ptr, batch_size, spatial_size, jump_step, channel,
-                    [&sum_dy_out](const T* dy_data) { sum_dy_out += *dy_data; });
-
-        // NOTE(Liang Depeng): dot product of the x and dy
-        T dotp = 0;
-        ForEachFast(x_ptr, dy_ptr, batch_size, spatial_size, jump_step, channel,
-                    [&dotp, mean_c](const T* x_data, const T* dy_data) {
-                      dotp += (*x_data - mean_c) * (*dy_data);
-                    });
-
-        // NOTE(Liang Depeng): projection of dy on to output scaled by std
-        const T k = dotp * inv_variance_c * inv_variance_c / reduce_count;
-        const T iw = inv_variance_c * gamma_c;
-        const T grad_mean_c = sum_dy_out / reduce_count;
-        ForEachFast(
-            x_ptr, dx_ptr, batch_size, spatial_size, jump_step, channel,
-            [&mean_c, &k](const T* x_data, T* dx_data) { *dx_data = (*x_data - mean_c) * k; });
-
-        ForEachFast(dy_ptr, dx_ptr, batch_size, spatial_size, jump_step, channel,
-                    [iw, grad_mean_c](const T* dy_data, T* dx_data) {
-                      *dx_data = (*dy_data - grad_mean_c - *dx_data) * iw;
-                    });
-
-        gamma_diff_ptr[channel] = dotp * inv_variance_c;
-        beta_diff_ptr[channel] = sum_dy_out;
+        k[channel] = dotp[channel] * inv_variance_c * inv_variance_c / reduce_count;
+        iw[channel] = inv_variance_c * gamma_ptr[channel];
+        grad_mean[channel] = sum_dy_out[channel] / reduce_count;
+        gamma_diff_ptr[channel] = dotp[channel] * inv_variance_c;
+        beta_diff_ptr[channel] = sum_dy_out[channel];
       }
+      for (int64_t row = 0; row < batch_size; ++row) {
+        const T* row_x_ptr = x_ptr + row * channel_size;
+        const T* row_dy_ptr = dy_ptr + row * channel_size;
+        T* row_dx_ptr = dx_ptr + row * channel_size;
+        for (int64_t channel = 0; channel < channel_size; ++channel) {
+          row_dx_ptr[channel] = (row_dy_ptr[channel] - grad_mean[channel]
+                                 - (row_x_ptr[channel] - mean_ptr[channel]) * k[channel])
+                                * iw[channel];
+        }
+      }
+      return;
+    }
 
-    } else {  // TODO(Liang Depeng): NHWC format
+    // NOTE(Liang Depeng): NCHW format
+    // Borrow the MXNet implementation to compute dx, gamma_diff and beta_diff.
+    // For more details pls refers to:
+    // https://github.com/apache/incubator-mxnet/blob/master/src/operator/nn/batch_norm.cc
+    for (int64_t channel = 0; channel < channel_size; ++channel) {
+      const T gamma_c = gamma_ptr[channel];
+      const T mean_c = mean_ptr[channel];
+      const T inv_variance_c = inv_variance_ptr[channel];
+
+      // NOTE(Liang Depeng): sum dy for specific channel over all samples
+      T sum_dy_out = 0;
+      ForEachFast(dy_ptr, batch_size, spatial_size, jump_step, channel,
+                  [&sum_dy_out](const T* dy_data) { sum_dy_out += *dy_data; });
+
+      // NOTE(Liang Depeng): dot product of the x and dy
+      T dotp = 0;
+      ForEachFast(x_ptr, dy_ptr, batch_size, spatial_size, jump_step, channel,
+                  [&dotp, mean_c](const T* x_data, const T* dy_data) {
+                    dotp += (*x_data - mean_c) * (*dy_data);
+                  });
+
+      // NOTE(Liang Depeng): projection of dy on to output scaled by std
+      const T k = dotp * inv_variance_c * inv_variance_c / reduce_count;
+      const T iw = inv_variance_c * gamma_c;
+      const T grad_mean_c = sum_dy_out / reduce_count;
+      ForEachFast(
+          x_ptr, dx_ptr, batch_size, spatial_size, jump_step, channel,
+          [&mean_c, &k](const T* x_data, T* dx_data) { *dx_data = (*x_data - mean_c) * k; });
+
+      ForEachFast(dy_ptr, dx_ptr, batch_size, spatial_size, jump_step, channel,
+                  [iw, grad_mean_c](const T* dy_data, T* dx_data) {
+                    *dx_data = (*dy_data - grad_mean_c - *dx_data) * iw;
+                  });
+
+      gamma_diff_ptr[channel] = dotp * inv_variance_c;
+      beta_diff_ptr[channel] = sum_dy_out;
     }
   }
 
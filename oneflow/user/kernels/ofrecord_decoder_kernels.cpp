@@ -21,6 +21,7 @@ limitations under the License.
 #include "oneflow/core/kernel/kernel_util.h"
 #include "oneflow/core/thread/thread_manager.h"
 #include "oneflow/user/image/random_crop_generator.h"
+#include "oneflow/user/image/image_cache.h"
 #include "oneflow/user/image/image_util.h"
 #include "oneflow/user/kernels/random_crop_kernel_state.h"
 #include "oneflow/user/kernels/op_kernel_wrapper.h"
@@ -165,14 +166,18 @@ REGISTER_USER_KERNEL("ofrecord_bytes_decoder")
 
 namespace {
 
-void DecodeRandomCropImageFromOneRecord(const OFRecord& record, TensorBuffer* buffer,
-                                        const std::string& name, const std::string& color_space,
-                                        RandomCropGenerator* random_crop_gen) {
+const std::string& GetEncodedImageFromOneRecord(const OFRecord& record, const std::string& name) {
   CHECK(record.feature().find(name) != record.feature().end()) << "Field " << name << " not found";
   const Feature& feature = record.feature().at(name);
   CHECK(feature.has_bytes_list());
   CHECK(feature.bytes_list().value_size() == 1);
-  const std::string& src_data = feature.bytes_list().value(0);
+  return feature.bytes_list().value(0);
+}
+
+void DecodeRandomCropImageFromOneRecord(const OFRecord& record, TensorBuffer* buffer,
+                                        const std::string& name, const std::string& color_space,
+                                        RandomCropGenerator* random_crop_gen) {
+  const std::string& src_data = GetEncodedImageFromOneRecord(record, name);
   cv::Mat image;
 
   if (JpegPartialDecodeRandomCropImage(reinterpret_cast<const unsigned char*>(src_data.data()),
@@ -248,13 +253,37 @@ REGISTER_USER_KERNEL("ofrecord_image_decoder_random_crop")
                      && (user_op::HobDataType("in", 0) == DataType::kOFRecord)
                      && (user_op::HobDataType("out", 0) == DataType::kTensorBuffer));
 
+namespace {
+
+class DecodedImageCacheKernelState final : public user_op::OpKernelState {
+ public:
+  explicit DecodedImageCacheKernelState(int64_t capacity_bytes) : cache_(capacity_bytes) {}
+  ~DecodedImageCacheKernelState() override = default;
+
+  DecodedImageCache* cache() { return &cache_; }
+
+ private:
+  DecodedImageCache cache_;
+};
+
+}  // namespace
+
 class OFRecordImageDecoderKernel final : public user_op::OpKernel {
  public:
   OFRecordImageDecoderKernel() = default;
   ~OFRecordImageDecoderKernel() override = default;
 
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    return std::make_shared<DecodedImageCacheKernelState>(ctx->Attr<int64_t>("cache_size_bytes"));
+  }
+
  private:
-  void Compute(user_op::KernelComputeContext* ctx) const override {
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    auto* cache_state = dynamic_cast<DecodedImageCacheKernelState*>(state);
+    CHECK_NOTNULL(cache_state);
+    DecodedImageCache* cache = cache_state->cache();
     user_op::Tensor* out_blob = ctx->Tensor4ArgNameAndIndex("out", 0);
     int64_t record_num = out_blob->shape().At(0);
     CHECK(record_num > 0);
@@ -268,7 +297,14 @@ class OFRecordImageDecoderKernel final : public user_op::OpKernel {
     MultiThreadLoop(record_num, [&](size_t i) {
       const OFRecord& record = *(records + i);
       TensorBuffer* buffer = buffers + i;
+      if (!cache->enabled()) {
+        DecodeRandomCropImageFromOneRecord(record, buffer, name, color_space, nullptr);
+        return;
+      }
+      const std::string& src_data = GetEncodedImageFromOneRecord(record, name);
+      if (cache->Lookup(src_data, buffer)) { return; }
       DecodeRandomCropImageFromOneRecord(record, buffer, name, color_space, nullptr);
+      cache->Insert(src_data, *buffer);
     });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
@@ -0,0 +1,43 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_USER_KERNELS_PLANE_PARALLEL_CPU_UTIL_H_
+#define ONEFLOW_USER_KERNELS_PLANE_PARALLEL_CPU_UTIL_H_
+
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
+
+namespace oneflow {
+
+// Runs `func(begin, end)` over the flat element range [0, elem_cnt) of a tensor made of
+// `num_planes` contiguous planes (the (n, c) planes of an NC... layout), splitting the range only
+// at plane boundaries. Backward kernels that scatter-add inside the plane of their output thus
+// never share a destination across threads, and every plane is still visited in the order of a
+// single-threaded loop.
+template<typename F>
+void ParallelForEachPlane(ep::Stream* stream, int64_t elem_cnt, int64_t num_planes, const F& func) {
+  if (elem_cnt == 0 || num_planes == 0) { return; }
+  const int64_t plane_size = elem_cnt / num_planes;
+  stream->As<ep::CpuStream>()->ParallelFor(
+      0, num_planes,
+      [&](int64_t plane_begin, int64_t plane_end) {
+        func(plane_begin * plane_size, plane_end * plane_size);
+      },
+      ep::CpuStream::GrainSizeFor(plane_size));
+}
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_USER_KERNELS_PLANE_PARALLEL_CPU_UTIL_H_
@@ -17,6 +17,8 @@ limitations under the License.
 #include "oneflow/user/kernels/op_kernel_wrapper.h"
 #include "oneflow/user/utils/pool_util.h"
 #include "oneflow/core/common/eigen_util.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 
@@ -63,108 +65,115 @@ struct PoolCpuKernelUtil {
                              ConstEigenArrayMap<T>& out_diff_arr, EigenArrayMap<T>& in_diff_arr)>
       CLastProcessGrad;
 
-  static void CFirstForward(const Params3D& params_3d, const user_op::Tensor* in_blob,
-                            user_op::Tensor* out_blob, const ForwardInitialize& initialize,
-                            const CFirstProcess& process, const CFirstFinalize& finalize) {
+  static void CFirstForward(ep::Stream* stream, const Params3D& params_3d,
+                            const user_op::Tensor* in_blob, user_op::Tensor* out_blob,
+                            const ForwardInitialize& initialize, const CFirstProcess& process,
+                            const CFirstFinalize& finalize) {
     const Shape& in = params_3d.GetXShape5D();
     const Shape& out = params_3d.GetYShape5D();
     const std::vector<int32_t>& pool_size = params_3d.pool_size_3d();
     const std::vector<int32_t>& strides = params_3d.strides_3d();
     const std::vector<int32_t>& padding_before = params_3d.padding_before_3d();
 
-    const T* input = in_blob->dptr<T>();
-    T* output = out_blob->mut_dptr<T>();
-    FOR_RANGE(int64_t, n, 0, in.At(0)) {
-      FOR_RANGE(int64_t, c, 0, in.At(1)) {
-        FOR_RANGE(int64_t, pd, 0, out.At(2)) {
-          int64_t dstart = pd * strides.at(0) - padding_before.at(0);
-          int64_t dend = std::min(dstart + pool_size.at(0), in.At(2));
-          dstart = std::max(dstart, static_cast<int64_t>(0));
-          FOR_RANGE(int64_t, ph, 0, out.At(3)) {
-            int64_t hstart = ph * strides.at(1) - padding_before.at(1);
-            int64_t hend = std::min(hstart + pool_size.at(1), in.At(3));
-            hstart = std::max(hstart, static_cast<int64_t>(0));
-            FOR_RANGE(int64_t, pw, 0, out.At(4)) {
-              int64_t wstart = pw * strides.at(2) - padding_before.at(2);
-              int64_t wend = std::min(wstart + pool_size.at(2), in.At(4));
-              wstart = std::max(wstart, static_cast<int64_t>(0));
-
-              const int64_t pool_index = pd * out.Count(3) + ph * out.At(4) + pw;
-              T res = initialize();
-              FOR_RANGE(int64_t, d, dstart, dend) {
-                FOR_RANGE(int64_t, h, hstart, hend) {
-                  FOR_RANGE(int64_t, w, wstart, wend) {
-                    const int64_t input_index = d * in.Count(3) + h * in.At(4) + w;
-                    process(input[input_index], res);
+    // Every (n, c) plane is pooled independently.
+    const int64_t num_planes = in.At(0) * in.At(1);
+    stream->As<ep::CpuStream>()->ParallelFor(
+        0, num_planes,
+        [&](int64_t plane_begin, int64_t plane_end) {
+          FOR_RANGE(int64_t, plane, plane_begin, plane_end) {
+            const T* input = in_blob->dptr<T>() + plane * in.Count(2);
+            T* output = out_blob->mut_dptr<T>() + plane * out.Count(2);
+            FOR_RANGE(int64_t, pd, 0, out.At(2)) {
+              int64_t dstart = pd * strides.at(0) - padding_before.at(0);
+              int64_t dend = std::min(dstart + pool_size.at(0), in.At(2));
+              dstart = std::max(dstart, static_cast<int64_t>(0));
+              FOR_RANGE(int64_t, ph, 0, out.At(3)) {
+                int64_t hstart = ph * strides.at(1) - padding_before.at(1);
+                int64_t hend = std::min(hstart + pool_size.at(1), in.At(3));
+                hstart = std::max(hstart, static_cast<int64_t>(0));
+                FOR_RANGE(int64_t, pw, 0, out.At(4)) {
+                  int64_t wstart = pw * strides.at(2) - padding_before.at(2);
+                  int64_t wend = std::min(wstart + pool_size.at(2), in.At(4));
+                  wstart = std::max(wstart, static_cast<int64_t>(0));
+
+                  const int64_t pool_index = pd * out.Count(3) + ph * out.At(4) + pw;
+                  T res = initialize();
+                  FOR_RANGE(int64_t, d, dstart, dend) {
+                    FOR_RANGE(int64_t, h, hstart, hend) {
+                      FOR_RANGE(int64_t, w, wstart, wend) {
+                        const int64_t input_index = d * in.Count(3) + h * in.At(4) + w;
+                        process(input[input_index], res);
+                      }
+                    }
                   }
+                  finalize((dend - dstart) * (hend - hstart) * (wend - wstart), res);
+                  output[pool_index] = res;
                 }
               }
-              finalize((dend - dstart) * (hend - hstart) * (wend - wstart), res);
-              output[pool_index] = res;
             }
           }
-        }
-        input += in.Count(2);
-        output += out.Count(2);
-      }
-    }
+        },
+        ep::CpuStream::GrainSizeFor(in.Count(2)));
   }
 
-  static void CFirstBackward(const Params3D& params_3d, const user_op::Tensor* out_diff_blob,
-                             const user_op::Tensor* out_blob, const user_op::Tensor* in_blob,
-                             user_op::Tensor* in_diff_blob, const CFirstProcessGrad& process) {
+  static void CFirstBackward(ep::Stream* stream, const Params3D& params_3d,
+                             const user_op::Tensor* out_diff_blob, const user_op::Tensor* out_blob,
+                             const user_op::Tensor* in_blob, user_op::Tensor* in_diff_blob,
+                             const CFirstProcessGrad& process) {
     const Shape& in = params_3d.GetXShape5D();
     const Shape& out = params_3d.GetYShape5D();
     const std::vector<int32_t>& pool_size = params_3d.pool_size_3d();
     const std::vector<int32_t>& strides = params_3d.strides_3d();
     const std::vector<int32_t>& padding_before = params_3d.padding_before_3d();
 
-    const T* output_diff = out_diff_blob->dptr<T>();
-    const T* output = out_blob->dptr<T>();
-    const T* input = in_blob->dptr<T>();
-    std::memset(in_diff_blob->mut_dptr<T>(), T(0), in.elem_cnt() * sizeof(T));
-    T* input_diff = in_diff_blob->mut_dptr<T>();
-    FOR_RANGE(int64_t, n, 0, in.At(0)) {
-      FOR_RANGE(int64_t, c, 0, in.At(1)) {
-        FOR_RANGE(int64_t, pd, 0, out.At(2)) {
-          int64_t dstart = pd * strides.at(0) - padding_before.at(0);
-          int64_t dend = std::min(dstart + pool_size.at(0), in.At(2));
-          dstart = std::max(dstart, static_cast<int64_t>(0));
-          FOR_RANGE(int64_t, ph, 0, out.At(3)) {
-            int64_t hstart = ph * strides.at(1) - padding_before.at(1);
-            int64_t hend = std::min(hstart + pool_size.at(1), in.At(3));
-            hstart = std::max(hstart, static_cast<int64_t>(0));
-            FOR_RANGE(int64_t, pw, 0, out.At(4)) {
-              int64_t wstart = pw * strides.at(2) - padding_before.at(2);
-              int64_t wend = std::min(wstart + pool_size.at(2), in.At(4));
-              wstart = std::max(wstart, static_cast<int64_t>(0));
-
-              const int64_t size = (dend - dstart) * (hend - hstart) * (wend - wstart);
-              const int64_t pool_index = pd * out.Count(3) + ph * out.At(4) + pw;
-              FOR_RANGE(int64_t, d, dstart, dend) {
-                FOR_RANGE(int64_t, h, hstart, hend) {
-                  FOR_RANGE(int64_t, w, wstart, wend) {
-                    const int64_t index = d * in.Count(3) + h * in.At(4) + w;
-                    process(input[index], output[pool_index], output_diff[pool_index], size,
-                            input_diff[index]);
+    // Overlapping windows only accumulate into the in_diff of their own (n, c) plane, so the
+    // planes can be processed in parallel without synchronization.
+    const int64_t num_planes = in.At(0) * in.At(1);
+    stream->As<ep::CpuStream>()->ParallelFor(
+        0, num_planes,
+        [&](int64_t plane_begin, int64_t plane_end) {
+          FOR_RANGE(int64_t, plane, plane_begin, plane_end) {
+            const T* output_diff = out_diff_blob->dptr<T>() + plane * out.Count(2);
+            const T* output = out_blob->dptr<T>() + plane * out.Count(2);
+            const T* input = in_blob->dptr<T>() + plane * in.Count(2);
+            T* input_diff = in_diff_blob->mut_dptr<T>() + plane * in.Count(2);
+            std::memset(input_diff, T(0), in.Count(2) * sizeof(T));
+            FOR_RANGE(int64_t, pd, 0, out.At(2)) {
+              int64_t dstart = pd * strides.at(0) - padding_before.at(0);
+              int64_t dend = std::min(dstart + pool_size.at(0), in.At(2));
+              dstart = std::max(dstart, static_cast<int64_t>(0));
+              FOR_RANGE(int64_t, ph, 0, out.At(3)) {
+                int64_t hstart = ph * strides.at(1) - padding_before.at(1);
+                int64_t hend = std::min(hstart + pool_size.at(1), in.At(3));
+                hstart = std::max(hstart, static_cast<int64_t>(0));
+                FOR_RANGE(int64_t, pw, 0, out.At(4)) {
+                  int64_t wstart = pw * strides.at(2) - padding_before.at(2);
+                  int64_t wend = std::min(wstart + pool_size.at(2), in.At(4));
+                  wstart = std::max(wstart, static_cast<int64_t>(0));
+
+                  const int64_t size = (dend - dstart) * (hend - hstart) * (wend - wstart);
+                  const int64_t pool_index = pd * out.Count(3) + ph * out.At(4) + pw;
+                  FOR_RANGE(int64_t, d, dstart, dend) {
+                    FOR_RANGE(int64_t, h, hstart, hend) {
+                      FOR_RANGE(int64_t, w, wstart, wend) {
+                        const int64_t index = d * in.Count(3) + h * in.At(4) + w;
+                        process(input[index], output[pool_index], output_diff[pool_index], size,
+                                input_diff[index]);
+                      }
+                    }
                   }
                 }
               }
             }
           }
-        }
-        // offset
-        input += in.Count(2);
-        input_diff += in.Count(2);
-        output += out.Count(2);
-        output_diff += out.Count(2);
-      }
-    }
+        },
+        ep::CpuStream::GrainSizeFor(in.Count(2)));
   }
 
-  static void CLastForward(const Params3D& params_3d, const user_op::Tensor* in_blob,
-                           user_op::Tensor* out_blob, const ForwardInitialize& forward_initialize,
-                           const CLastProcess& process, const CLastFinalize& finalize) {
+  static void CLastForward(ep::Stream* stream, const Params3D& params_3d,
+                           const user_op::Tensor* in_blob, user_op::Tensor* out_blob,
+                           const ForwardInitialize& forward_initialize, const CLastProcess& process,
+                           const CLastFinalize& finalize) {
     const Shape& in = params_3d.GetXShape5D();
     const Shape& out = params_3d.GetYShape5D();
     const std::vector<int32_t>& pool_size = params_3d.pool_size_3d();
@@ -173,39 +182,46 @@ struct PoolCpuKernelUtil {
 
     ConstEigenMatrixMap<T> in_mat(in_blob->dptr<T>(), in.At(1), in.elem_cnt() / in.At(1));
     EigenMatrixMap<T> out_mat(out_blob->mut_dptr<T>(), out.At(1), out.elem_cnt() / out.At(1));
-    FOR_RANGE(int64_t, n, 0, in.At(0)) {
-      FOR_RANGE(int64_t, pd, 0, out.At(2)) {
-        int64_t dstart = pd * strides.at(0) - padding_before.at(0);
-        int64_t dend = std::min(dstart + pool_size.at(0), in.At(2));
-        dstart = std::max(dstart, static_cast<int64_t>(0));
-        FOR_RANGE(int64_t, ph, 0, out.At(3)) {
-          int64_t hstart = ph * strides.at(1) - padding_before.at(1);
-          int64_t hend = std::min(hstart + pool_size.at(1), in.At(3));
-          hstart = std::max(hstart, static_cast<int64_t>(0));
-          FOR_RANGE(int64_t, pw, 0, out.At(4)) {
-            int64_t wstart = pw * strides.at(2) - padding_before.at(2);
-            int64_t wend = std::min(wstart + pool_size.at(2), in.At(4));
-            wstart = std::max(wstart, static_cast<int64_t>(0));
-            const int out_col = ((n * out.At(2) + pd) * out.At(3) + ph) * out.At(4) + pw;
-            out_mat.col(out_col).setConstant(forward_initialize());
-            FOR_RANGE(int64_t, d, dstart, dend) {
-              FOR_RANGE(int64_t, h, hstart, hend) {
-                FOR_RANGE(int64_t, w, wstart, wend) {
-                  const int in_col = ((n * in.At(2) + d) * in.At(3) + h) * in.At(4) + w;
-                  process(in_col, out_col, in_mat, out_mat);
+    // Samples write disjoint columns of out_mat.
+    stream->As<ep::CpuStream>()->ParallelFor(
+        0, in.At(0),
+        [&](int64_t n_begin, int64_t n_end) {
+          FOR_RANGE(int64_t, n, n_begin, n_end) {
+            FOR_RANGE(int64_t, pd, 0, out.At(2)) {
+              int64_t dstart = pd * strides.at(0) - padding_before.at(0);
+              int64_t dend = std::min(dstart + pool_size.at(0), in.At(2));
+              dstart = std::max(dstart, static_cast<int64_t>(0));
+              FOR_RANGE(int64_t, ph, 0, out.At(3)) {
+                int64_t hstart = ph * strides.at(1) - padding_before.at(1);
+                int64_t hend = std::min(hstart + pool_size.at(1), in.At(3));
+                hstart = std::max(hstart, static_cast<int64_t>(0));
+                FOR_RANGE(int64_t, pw, 0, out.At(4)) {
+                  int64_t wstart = pw * strides.at(2) - padding_before.at(2);
+                  int64_t wend = std::min(wstart + pool_size.at(2), in.At(4));
+                  wstart = std::max(wstart, static_cast<int64_t>(0));
+                  const int out_col = ((n * out.At(2) + pd) * out.At(3) + ph) * out.At(4) + pw;
+                  out_mat.col(out_col).setConstant(forward_initialize());
+                  FOR_RANGE(int64_t, d, dstart, dend) {
+                    FOR_RANGE(int64_t, h, hstart, hend) {
+                      FOR_RANGE(int64_t, w, wstart, wend) {
+                        const int in_col = ((n * in.At(2) + d) * in.At(3) + h) * in.At(4) + w;
+                        process(in_col, out_col, in_mat, out_mat);
+                      }
+                    }
+                  }
+                  finalize((hend - hstart) * (wend - wstart) * (dend - dstart), out_col, out_mat);
                 }
               }
             }
-            finalize((hend - hstart) * (wend - wstart) * (dend - dstart), out_col, out_mat);
           }
-        }
-      }
-    }
+        },
+        ep::CpuStream::GrainSizeFor(in.Count(1)));
   }
 
-  static void CLastBackward(const Params3D& params_3d, const user_op::Tensor* out_diff_blob,
-                            const user_op::Tensor* out_blob, const user_op::Tensor* in_blob,
-                            user_op::Tensor* in_diff_blob, const CLastProcessGrad& process) {
+  static void CLastBackward(ep::Stream* stream, const Params3D& params_3d,
+                            const user_op::Tensor* out_diff_blob, const user_op::Tensor* out_blob,
+                            const user_op::Tensor* in_blob, user_op::Tensor* in_diff_blob,
+                            const CLastProcessGrad& process) {
     const Shape& in = params_3d.GetXShape5D();
     const Shape& out = params_3d.GetYShape5D();
     const std::vector<int32_t>& pool_size = params_3d.pool_size_3d();
@@ -219,34 +235,42 @@ struct PoolCpuKernelUtil {
                                        out.elem_cnt() / out.At(1));
     std::memset(in_diff_blob->mut_dptr<T>(), T(0), in.elem_cnt() * sizeof(T));
     EigenArrayMap<T> in_diff_mat(in_diff_blob->mut_dptr<T>(), in.At(1), in.elem_cnt() / in.At(1));
-    FOR_RANGE(int64_t, n, 0, in.At(0)) {
-      FOR_RANGE(int64_t, pd, 0, out.At(2)) {
-        int64_t dstart = pd * strides.at(0) - padding_before.at(0);
-        int64_t dend = std::min(dstart + pool_size.at(0), in.At(2));
-        dstart = std::max(dstart, static_cast<int64_t>(0));
-        FOR_RANGE(int64_t, ph, 0, out.At(3)) {
-          int64_t hstart = ph * strides.at(1) - padding_before.at(1);
-          int64_t hend = std::min(hstart + pool_size.at(1), in.At(3));
-          hstart = std::max(hstart, static_cast<int64_t>(0));
-          FOR_RANGE(int64_t, pw, 0, out.At(4)) {
-            int64_t wstart = pw * strides.at(2) - padding_before.at(2);
-            int64_t wend = std::min(wstart + pool_size.at(2), in.At(4));
-            wstart = std::max(wstart, static_cast<int64_t>(0));
-            const int64_t pool_index = ((n * out.At(2) + pd) * out.At(3) + ph) * out.At(4) + pw;
-            const int64_t size = (dend - dstart) * (hend - hstart) * (wend - wstart);
-            FOR_RANGE(int64_t, d, dstart, dend) {
-              FOR_RANGE(int64_t, h, hstart, hend) {
-                FOR_RANGE(int64_t, w, wstart, wend) {
-                  const int64_t input_index = ((n * in.At(2) + d) * in.At(3) + h) * in.At(4) + w;
-                  process(pool_index, input_index, size, out_mat, in_mat, out_diff_mat,
-                          in_diff_mat);
+    // Samples accumulate into disjoint columns of in_diff_mat.
+    stream->As<ep::CpuStream>()->ParallelFor(
+        0, in.At(0),
+        [&](int64_t n_begin, int64_t n_end) {
+          FOR_RANGE(int64_t, n, n_begin, n_end) {
+            FOR_RANGE(int64_t, pd, 0, out.At(2)) {
+              int64_t dstart = pd * strides.at(0) - padding_before.at(0);
+              int64_t dend = std::min(dstart + pool_size.at(0), in.At(2));
+              dstart = std::max(dstart, static_cast<int64_t>(0));
+              FOR_RANGE(int64_t, ph, 0, out.At(3)) {
+                int64_t hstart = ph * strides.at(1) - padding_before.at(1);
+                int64_t hend = std::min(hstart + pool_size.at(1), in.At(3));
+                hstart = std::max(hstart, static_cast<int64_t>(0));
+                FOR_RANGE(int64_t, pw, 0, out.At(4)) {
+                  int64_t wstart = pw * strides.at(2) - padding_before.at(2);
+                  int64_t wend = std::min(wstart + pool_size.at(2), in.At(4));
+                  wstart = std::max(wstart, static_cast<int64_t>(0));
+                  const int64_t pool_index =
+                      ((n * out.At(2) + pd) * out.At(3) + ph) * out.At(4) + pw;
+                  const int64_t size = (dend - dstart) * (hend - hstart) * (wend - wstart);
+                  FOR_RANGE(int64_t, d, dstart, dend) {
+                    FOR_RANGE(int64_t, h, hstart, hend) {
+                      FOR_RANGE(int64_t, w, wstart, wend) {
+                        const int64_t input_index =
+                            ((n * in.At(2) + d) * in.At(3) + h) * in.At(4) + w;
+                        process(pool_index, input_index, size, out_mat, in_mat, out_diff_mat,
+                                in_diff_mat);
+                      }
+                    }
+                  }
                 }
               }
             }
           }
-        }
-      }
-    }
+        },
+        ep::CpuStream::GrainSizeFor(in.Count(1)));
   }
 
   static void AvgFWCompute(user_op::KernelComputeContext* ctx,
@@ -257,11 +281,12 @@ struct PoolCpuKernelUtil {
     const std::string& data_format = ctx->Attr<std::string>("data_format");
     if (data_format == "channels_first") {
       CFirstForward(
-          pool_state->GetParams3D(), x, y, GetZeroVal<T>, [](const T& lhs, T& rhs) { rhs += lhs; },
+          ctx->stream(), pool_state->GetParams3D(), x, y, GetZeroVal<T>,
+          [](const T& lhs, T& rhs) { rhs += lhs; },
           [](const int64_t size, T& out) { out /= size; });
     } else if (data_format == "channels_last") {
       CLastForward(
-          pool_state->GetParams3D(), x, y, GetZeroVal<T>,
+          ctx->stream(), pool_state->GetParams3D(), x, y, GetZeroVal<T>,
           [](const int64_t in_col, const int64_t out_col, ConstEigenMatrixMap<T>& in_mat,
              EigenMatrixMap<T>& out_mat) { out_mat.col(out_col) += in_mat.col(in_col); },
           [](const int64_t size, const int64_t col, EigenMatrixMap<T>& out_mat) {
@@ -281,11 +306,11 @@ struct PoolCpuKernelUtil {
     CHECK_NOTNULL(pool_state);
     const std::string& data_format = ctx->Attr<std::string>("data_format");
     if (data_format == "channels_first") {
-      CFirstBackward(pool_state->GetParams3D(), dy, y, x, dx,
+      CFirstBackward(ctx->stream(), pool_state->GetParams3D(), dy, y, x, dx,
                      [](const T& in, const T& out, const T& out_diff, const int64_t size,
                         T& in_diff) { in_diff += (out_diff / static_cast<T>(size)); });
     } else if (data_format == "channels_last") {
-      CLastBackward(pool_state->GetParams3D(), dy, y, x, dx,
+      CLastBackward(ctx->stream(), pool_state->GetParams3D(), dy, y, x, dx,
                     [](const int64_t out_col, const int64_t in_col, const int64_t size,
                        ConstEigenArrayMap<T>& out_arr, ConstEigenArrayMap<T>& in_arr,
                        ConstEigenArrayMap<T>& out_diff_arr, EigenArrayMap<T>& in_diff_arr) {
@@ -304,14 +329,14 @@ struct PoolCpuKernelUtil {
     const std::string& data_format = ctx->Attr<std::string>("data_format");
     if (data_format == "channels_first") {
       CFirstForward(
-          pool_state->GetParams3D(), x, y, GetMinVal<T>,
+          ctx->stream(), pool_state->GetParams3D(), x, y, GetMinVal<T>,
           [](const T& lhs, T& rhs) {
             if (lhs > rhs) { rhs = lhs; }
           },
           [](const int64_t size, T& out) {});
     } else if (data_format == "channels_last") {
       CLastForward(
-          pool_state->GetParams3D(), x, y, GetMinVal<T>,
+          ctx->stream(), pool_state->GetParams3D(), x, y, GetMinVal<T>,
           [](const int64_t in_col, const int64_t out_col, ConstEigenMatrixMap<T>& in_mat,
              EigenMatrixMap<T>& out_mat) {
             out_mat.col(out_col) = out_mat.col(out_col).cwiseMax(in_mat.col(in_col));
@@ -332,13 +357,13 @@ struct PoolCpuKernelUtil {
     const std::string& data_format = ctx->Attr<std::string>("data_format");
     if (data_format == "channels_first") {
       CFirstBackward(
-          pool_state->GetParams3D(), dy, y, x, dx,
+          ctx->stream(), pool_state->GetParams3D(), dy, y, x, dx,
           [](const T& in, const T& out, const T& out_diff, const int64_t size, T& in_diff) {
             if (in == out) { in_diff += out_diff; }
           });
     } else if (data_format == "channels_last") {
       CLastBackward(
-          pool_state->GetParams3D(), dy, y, x, dx,
+          ctx->stream(), pool_state->GetParams3D(), dy, y, x, dx,
           [](const int64_t out_col, const int64_t in_col, const int64_t size,
              ConstEigenArrayMap<T>& out_arr, ConstEigenArrayMap<T>& in_arr,
              ConstEigenArrayMap<T>& out_diff_arr, EigenArrayMap<T>& in_diff_arr) {
@@ -0,0 +1,194 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/user/kernels/quantized_gemm_cpu_util.h"
+
+namespace oneflow {
+
+namespace {
+
+struct QuantizedConvParams {
+  int64_t batch;
+  int64_t in_channels;
+  int64_t in_h;
+  int64_t in_w;
+  int64_t out_channels;
+  int64_t out_h;
+  int64_t out_w;
+  int64_t kernel_h;
+  int64_t kernel_w;
+  int64_t pad_h;
+  int64_t pad_w;
+  int64_t stride_h;
+  int64_t stride_w;
+  int64_t dilation_h;
+  int64_t dilation_w;
+  int64_t groups;
+
+  int64_t in_channels_per_group() const { return in_channels / groups; }
+  int64_t out_channels_per_group() const { return out_channels / groups; }
+  int64_t col_rows() const { return out_h * out_w; }
+  int64_t col_cols() const { return in_channels_per_group() * kernel_h * kernel_w; }
+};
+
+QuantizedConvParams MakeQuantizedConvParams(const Shape& in_shape, const Shape& weight_shape,
+                                            const std::vector<int32_t>& padding_before,
+                                            const std::vector<int32_t>& strides,
+                                            const std::vector<int32_t>& dilation_rate,
+                                            int32_t groups, const Shape& out_shape) {
+  QuantizedConvParams params{};
+  params.batch = in_shape.At(0);
+  params.in_channels = in_shape.At(1);
+  params.in_h = in_shape.At(2);
+  params.in_w = in_shape.At(3);
+  params.out_channels = weight_shape.At(0);
+  params.out_h = out_shape.At(2);
+  params.out_w = out_shape.At(3);
+  params.kernel_h = weight_shape.At(2);
+  params.kernel_w = weight_shape.At(3);
+  params.pad_h = padding_before.at(0);
+  params.pad_w = padding_before.at(1);
+  params.stride_h = strides.at(0);
+  params.stride_w = strides.at(1);
+  params.dilation_h = dilation_rate.at(0);
+  params.dilation_w = dilation_rate.at(1);
+  params.groups = groups;
+  return params;
+}
+
+QuantizedConvParams MakeQuantizedConvParams(user_op::InferContext* ctx) {
+  return MakeQuantizedConvParams(
+      ctx->InputShape("x", 0), ctx->InputShape("weight", 0),
+      ctx->Attr<std::vector<int32_t>>("padding_before"), ctx->Attr<std::vector<int32_t>>("strides"),
+      ctx->Attr<std::vector<int32_t>>("dilation_rate"), ctx->Attr<int32_t>("groups"),
+      ctx->OutputTensorDesc("out", 0)->shape());
+}
+
+// tmp buffer: the uint8 quantized image, the uint8 im2col matrix of one group and the int32
+// accumulators of one group. Images and groups are processed one after another and every step is
+// parallel inside.
+size_t QuantizedImageBufferSize(const QuantizedConvParams& params) {
+  return GetCudaAlignedSize(params.in_channels * params.in_h * params.in_w);
+}
+
+size_t ColBufferSize(const QuantizedConvParams& params) {
+  return GetCudaAlignedSize(params.col_rows() * params.col_cols());
+}
+
+size_t AccBufferSize(const QuantizedConvParams& params) {
+  return params.col_rows() * params.out_channels_per_group() * sizeof(int32_t);
+}
+
+// col[p, (c, kh, kw)] is the input pixel that output pixel p multiplies with weight (c, kh, kw).
+// Padding is filled with the zero point, i.e. the quantized value of 0.
+void Im2Col(ep::Stream* stream, const QuantizedConvParams& params, const uint8_t* image,
+            int32_t zero_point, uint8_t* col) {
+  const int64_t channels = params.in_channels_per_group();
+  const int64_t col_cols = params.col_cols();
+  stream->As<ep::CpuStream>()->ParallelFor(
+      0, params.col_rows(),
+      [&](int64_t begin, int64_t end) {
+        for (int64_t p = begin; p < end; ++p) {
+          const int64_t oh = p / params.out_w;
+          const int64_t ow = p % params.out_w;
+          uint8_t* col_p = col + p * col_cols;
+          for (int64_t c = 0; c < channels; ++c) {
+            const uint8_t* image_c = image + c * params.in_h * params.in_w;
+            for (int64_t i = 0; i < params.kernel_h; ++i) {
+              const int64_t ih = oh * params.stride_h - params.pad_h + i * params.dilation_h;
+              for (int64_t j = 0; j < params.kernel_w; ++j) {
+                const int64_t iw = ow * params.stride_w - params.pad_w + j * params.dilation_w;
+                const bool inside = ih >= 0 && ih < params.in_h && iw >= 0 && iw < params.in_w;
+                *col_p++ =
+                    inside ? image_c[ih * params.in_w + iw] : static_cast<uint8_t>(zero_point);
+              }
+            }
+          }
+        }
+      },
+      ep::CpuStream::GrainSizeFor(col_cols));
+}
+
+class QuantizedConv2dCpuKernel final : public user_op::OpKernel {
+ public:
+  QuantizedConv2dCpuKernel() = default;
+  ~QuantizedConv2dCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* weight = ctx->Tensor4ArgNameAndIndex("weight", 0);
+    const user_op::Tensor* weight_scale = ctx->Tensor4ArgNameAndIndex("weight_scale", 0);
+    const user_op::Tensor* bias =
+        ctx->has_input("bias", 0) ? ctx->Tensor4ArgNameAndIndex("bias", 0) : nullptr;
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    user_op::Tensor* tmp_buffer = ctx->Tensor4ArgNameAndIndex("tmp_buffer", 0);
+    const float input_scale = ctx->Attr<float>("input_scale");
+    const int32_t input_zero_point = ctx->Attr<int32_t>("input_zero_point");
+    const bool relu = ctx->Attr<std::string>("activation") == "relu";
+    const QuantizedConvParams params = MakeQuantizedConvParams(
+        x->shape(), weight->shape(), ctx->Attr<std::vector<int32_t>>("padding_before"),
+        ctx->Attr<std::vector<int32_t>>("strides"),
+        ctx->Attr<std::vector<int32_t>>("dilation_rate"), ctx->Attr<int32_t>("groups"),
+        out->shape());
+
+    uint8_t* image = tmp_buffer->mut_dptr<uint8_t>();
+    uint8_t* col = image + QuantizedImageBufferSize(params);
+    int32_t* acc = reinterpret_cast<int32_t*>(col + ColBufferSize(params));
+
+    const int64_t image_size = params.in_channels * params.in_h * params.in_w;
+    const int64_t group_image_size = params.in_channels_per_group() * params.in_h * params.in_w;
+    const int64_t out_plane_size = params.out_h * params.out_w;
+    const int64_t out_group_size = params.out_channels_per_group() * out_plane_size;
+    const int64_t weight_group_size = params.out_channels_per_group() * params.col_cols();
+    const float* bias_ptr = bias == nullptr ? nullptr : bias->dptr<float>();
+    for (int64_t b = 0; b < params.batch; ++b) {
+      QuantizeToUint8(ctx->stream(), image_size, x->dptr<float>() + b * image_size, input_scale,
+                      input_zero_point, image);
+      float* out_b = out->mut_dptr<float>() + b * params.out_channels * out_plane_size;
+      for (int64_t g = 0; g < params.groups; ++g) {
+        const int64_t channel_offset = g * params.out_channels_per_group();
+        Im2Col(ctx->stream(), params, image + g * group_image_size, input_zero_point, col);
+        QuantizedGemmNT(ctx->stream(), params.col_rows(), params.out_channels_per_group(),
+                        params.col_cols(), col, input_zero_point,
+                        weight->dptr<int8_t>() + g * weight_group_size, acc);
+        // acc is (pixels, channels) while out is (channels, pixels).
+        RequantizeGemmOutput(ctx->stream(), params.col_rows(), params.out_channels_per_group(), acc,
+                             input_scale, weight_scale->dptr<float>() + channel_offset,
+                             bias_ptr == nullptr ? nullptr : bias_ptr + channel_offset, relu,
+                             out_b + g * out_group_size, /*out_row_stride=*/1,
+                             /*out_col_stride=*/out_plane_size);
+      }
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+}  // namespace
+
+REGISTER_USER_KERNEL("quantized_conv2d")
+    .SetCreateFn<QuantizedConv2dCpuKernel>()
+    .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)
+                     && (user_op::HobDataType("x", 0) == DataType::kFloat)
+                     && (user_op::HobDataType("weight", 0) == DataType::kInt8))
+    .SetInferTmpSizeFn([](user_op::InferContext* ctx) {
+      const QuantizedConvParams params = MakeQuantizedConvParams(ctx);
+      return QuantizedImageBufferSize(params) + ColBufferSize(params) + AccBufferSize(params);
+    });
+
+}  // namespace oneflow
@@ -0,0 +1,164 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/user/kernels/quantized_gemm_cpu_util.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
+#include <cmath>
+
+namespace oneflow {
+
+namespace {
+
+// Columns of b handled by one task of the default gemm, so that a single row of a (the batch size 1
+// inference case) is still split over threads.
+constexpr int64_t kGemmBlockN = 64;
+
+#ifdef WITH_ONEDNN
+
+void QuantizedGemmNTOneDnn(ep::Stream* stream, int64_t m, int64_t n, int64_t k, const uint8_t* a,
+                           int32_t a_zero_point, const int8_t* b, int32_t* c) {
+  ep::CpuStream* cpu_stream = stream->As<ep::CpuStream>();
+  size_t num_threads = static_cast<ep::CpuDevice*>(cpu_stream->device())->GetNumThreads();
+  ep::CpuNumThreadsGuard guard(num_threads);
+
+  dnnl::engine* onednn_engine = cpu_stream->onednn_engine();
+  dnnl::stream* onednn_stream = cpu_stream->onednn_stream();
+
+  // b is stored as (n, k), which is the (k, n) weights matrix of the matmul in column major.
+  auto a_md = dnnl::memory::desc({m, k}, dnnl::memory::data_type::u8, dnnl::memory::format_tag::ab);
+  auto b_md = dnnl::memory::desc({k, n}, dnnl::memory::data_type::s8, dnnl::memory::format_tag::ba);
+  auto c_md =
+      dnnl::memory::desc({m, n}, dnnl::memory::data_type::s32, dnnl::memory::format_tag::ab);
+  dnnl::primitive_attr attr;
+  if (a_zero_point != 0) { attr.set_zero_points(DNNL_ARG_SRC, /*mask=*/0, {a_zero_point}); }
+  auto matmul_pd =
+      dnnl::matmul::primitive_desc(dnnl::matmul::desc(a_md, b_md, c_md), attr, *onednn_engine);
+
+  auto a_mem = dnnl::memory(a_md, *onednn_engine, const_cast<uint8_t*>(a));
+  auto b_mem = dnnl::memory(b_md, *onednn_engine, const_cast<int8_t*>(b));
+  auto c_mem = dnnl::memory(c_md, *onednn_engine, c);
+  dnnl::matmul(matmul_pd).execute(
+      *onednn_stream, {{DNNL_ARG_SRC, a_mem}, {DNNL_ARG_WEIGHTS, b_mem}, {DNNL_ARG_DST, c_mem}});
+  onednn_stream->wait();
+}
+
+#endif  // WITH_ONEDNN
+
+void QuantizedGemmNTDefault(ep::Stream* stream, int64_t m, int64_t n, int64_t k, const uint8_t* a,
+                            int32_t a_zero_point, const int8_t* b, int32_t* c) {
+  const int64_t num_blocks_n = (n + kGemmBlockN - 1) / kGemmBlockN;
+  stream->As<ep::CpuStream>()->ParallelFor(
+      0, m * num_blocks_n,
+      [&](int64_t begin, int64_t end) {
+        // The zero point is subtracted once per row, the products of int16 and int8 then fit the
+        // multiply-add instructions the compiler vectorizes the dot products to.
+        std::vector<int16_t> a_row(k);
+        int64_t centered_row = -1;
+        for (int64_t task = begin; task < end; ++task) {
+          const int64_t i = task / num_blocks_n;
+          const int64_t j_begin = (task % num_blocks_n) * kGemmBlockN;
+          const int64_t j_end = std::min(j_begin + kGemmBlockN, n);
+          if (i != centered_row) {
+            const uint8_t* a_i = a + i * k;
+            for (int64_t p = 0; p < k; ++p) {
+              a_row[p] = static_cast<int16_t>(static_cast<int32_t>(a_i[p]) - a_zero_point);
+            }
+            centered_row = i;
+          }
+          const int16_t* a_ptr = a_row.data();
+          int32_t* c_i = c + i * n;
+          int64_t j = j_begin;
+          for (; j + 4 <= j_end; j += 4) {
+            const int8_t* b0 = b + j * k;
+            const int8_t* b1 = b0 + k;
+            const int8_t* b2 = b1 + k;
+            const int8_t* b3 = b2 + k;
+            int32_t sum0 = 0;
+            int32_t sum1 = 0;
+            int32_t sum2 = 0;
+            int32_t sum3 = 0;
+            for (int64_t p = 0; p < k; ++p) {
+              const int32_t a_val = a_ptr[p];
+              sum0 += a_val * b0[p];
+              sum1 += a_val * b1[p];
+              sum2 += a_val * b2[p];
+              sum3 += a_val * b3[p];
+            }
+            c_i[j] = sum0;
+            c_i[j + 1] = sum1;
+            c_i[j + 2] = sum2;
+            c_i[j + 3] = sum3;
+          }
+          for (; j < j_end; ++j) {
+            const int8_t* b_j = b + j * k;
+            int32_t sum = 0;
+            for (int64_t p = 0; p < k; ++p) { sum += static_cast<int32_t>(a_ptr[p]) * b_j[p]; }
+            c_i[j] = sum;
+          }
+        }
+      },
+      ep::CpuStream::GrainSizeFor(kGemmBlockN * k));
+}
+
+}  // namespace
+
+void QuantizeToUint8(ep::Stream* stream, int64_t elem_cnt, const float* in, float scale,
+                     int32_t zero_point, uint8_t* out) {
+  stream->As<ep::CpuStream>()->ParallelFor(0, elem_cnt, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; ++i) {
+      float q = std::nearbyint(in[i] / scale) + static_cast<float>(zero_point);
+      q = q > 255.f ? 255.f : q;
+      q = q < 0.f ? 0.f : q;
+      out[i] = static_cast<uint8_t>(q);
+    }
+  });
+}
+
+void QuantizedGemmNT(ep::Stream* stream, int64_t m, int64_t n, int64_t k, const uint8_t* a,
+                     int32_t a_zero_point, const int8_t* b, int32_t* c) {
+  if (m == 0 || n == 0) { return; }
+  if (k == 0) {
+    std::fill(c, c + m * n, 0);
+    return;
+  }
+#ifdef WITH_ONEDNN
+  QuantizedGemmNTOneDnn(stream, m, n, k, a, a_zero_point, b, c);
+#else
+  QuantizedGemmNTDefault(stream, m, n, k, a, a_zero_point, b, c);
+#endif  // WITH_ONEDNN
+}
+
+void RequantizeGemmOutput(ep::Stream* stream, int64_t m, int64_t n, const int32_t* acc,
+                          float a_scale, const float* b_scale, const float* bias, bool relu,
+                          float* out, int64_t out_row_stride, int64_t out_col_stride) {
+  stream->As<ep::CpuStream>()->ParallelFor(
+      0, m,
+      [&](int64_t begin, int64_t end) {
+        for (int64_t i = begin; i < end; ++i) {
+          const int32_t* acc_i = acc + i * n;
+          float* out_i = out + i * out_row_stride;
+          for (int64_t j = 0; j < n; ++j) {
+            float y = static_cast<float>(acc_i[j]) * (a_scale * b_scale[j]);
+            if (bias != nullptr) { y += bias[j]; }
+            if (relu && y < 0.f) { y = 0.f; }
+            out_i[j * out_col_stride] = y;
+          }
+        }
+      },
+      ep::CpuStream::GrainSizeFor(n));
+}
+
+}  // namespace oneflow
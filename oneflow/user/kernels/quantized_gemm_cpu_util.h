@@ -0,0 +1,44 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#ifndef ONEFLOW_USER_KERNELS_QUANTIZED_GEMM_CPU_UTIL_H_
+#define ONEFLOW_USER_KERNELS_QUANTIZED_GEMM_CPU_UTIL_H_
+
+#include "oneflow/core/ep/include/stream.h"
+
+namespace oneflow {
+
+// Quantizes `in` to affine uint8 values, out = clamp(round(in / scale) + zero_point, 0, 255), which
+// is the "google" "affine" 8 bit scheme of the quantization op.
+void QuantizeToUint8(ep::Stream* stream, int64_t elem_cnt, const float* in, float scale,
+                     int32_t zero_point, uint8_t* out);
+
+// c[i, j] = sum_k (a[i, k] - a_zero_point) * b[j, k], where a is an (m, k) uint8 matrix, b is an
+// (n, k) int8 matrix and c is an (m, n) int32 matrix, all row major.
+void QuantizedGemmNT(ep::Stream* stream, int64_t m, int64_t n, int64_t k, const uint8_t* a,
+                     int32_t a_zero_point, const int8_t* b, int32_t* c);
+
+// Requantizes the int32 accumulators of QuantizedGemmNT to float and applies the bias and the
+// activation:
+//   out[i * out_row_stride + j * out_col_stride] =
+//       act(acc[i, j] * a_scale * b_scale[j] + bias[j])
+// `bias` may be nullptr.
+void RequantizeGemmOutput(ep::Stream* stream, int64_t m, int64_t n, const int32_t* acc,
+                          float a_scale, const float* b_scale, const float* bias, bool relu,
+                          float* out, int64_t out_row_stride, int64_t out_col_stride);
+
+}  // namespace oneflow
+
+#endif  // ONEFLOW_USER_KERNELS_QUANTIZED_GEMM_CPU_UTIL_H_
@@ -0,0 +1,80 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/user/kernels/quantized_gemm_cpu_util.h"
+
+namespace oneflow {
+
+namespace {
+
+// tmp buffer: the uint8 quantized input followed by the int32 accumulators.
+size_t QuantizedInputBufferSize(int64_t m, int64_t k) {
+  return GetCudaAlignedSize(m * k * sizeof(uint8_t));
+}
+
+class QuantizedLinearCpuKernel final : public user_op::OpKernel {
+ public:
+  QuantizedLinearCpuKernel() = default;
+  ~QuantizedLinearCpuKernel() override = default;
+
+ private:
+  using user_op::OpKernel::Compute;
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* x = ctx->Tensor4ArgNameAndIndex("x", 0);
+    const user_op::Tensor* weight = ctx->Tensor4ArgNameAndIndex("weight", 0);
+    const user_op::Tensor* weight_scale = ctx->Tensor4ArgNameAndIndex("weight_scale", 0);
+    const user_op::Tensor* bias =
+        ctx->has_input("bias", 0) ? ctx->Tensor4ArgNameAndIndex("bias", 0) : nullptr;
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    user_op::Tensor* tmp_buffer = ctx->Tensor4ArgNameAndIndex("tmp_buffer", 0);
+    const float input_scale = ctx->Attr<float>("input_scale");
+    const int32_t input_zero_point = ctx->Attr<int32_t>("input_zero_point");
+    const bool relu = ctx->Attr<std::string>("activation") == "relu";
+
+    const int64_t k = weight->shape().At(1);
+    const int64_t n = weight->shape().At(0);
+    const int64_t m = x->shape().elem_cnt() / k;
+    uint8_t* quantized_x = tmp_buffer->mut_dptr<uint8_t>();
+    int32_t* acc =
+        reinterpret_cast<int32_t*>(tmp_buffer->mut_dptr<char>() + QuantizedInputBufferSize(m, k));
+
+    QuantizeToUint8(ctx->stream(), m * k, x->dptr<float>(), input_scale, input_zero_point,
+                    quantized_x);
+    QuantizedGemmNT(ctx->stream(), m, n, k, quantized_x, input_zero_point, weight->dptr<int8_t>(),
+                    acc);
+    RequantizeGemmOutput(ctx->stream(), m, n, acc, input_scale, weight_scale->dptr<float>(),
+                         bias == nullptr ? nullptr : bias->dptr<float>(), relu,
+                         out->mut_dptr<float>(), /*out_row_stride=*/n, /*out_col_stride=*/1);
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+};
+
+}  // namespace
+
+REGISTER_USER_KERNEL("quantized_linear")
+    .SetCreateFn<QuantizedLinearCpuKernel>()
+    .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU)
+                     && (user_op::HobDataType("x", 0) == DataType::kFloat)
+                     && (user_op::HobDataType("weight", 0) == DataType::kInt8))
+    .SetInferTmpSizeFn([](user_op::InferContext* ctx) {
+      const Shape& x_shape = ctx->InputShape("x", 0);
+      const Shape& weight_shape = ctx->InputShape("weight", 0);
+      const int64_t k = weight_shape.At(1);
+      const int64_t m = x_shape.elem_cnt() / k;
+      return QuantizedInputBufferSize(m, k) + m * weight_shape.At(0) * sizeof(int32_t);
+    });
+
+}  // namespace oneflow
@@ -0,0 +1,411 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/user/kernels/dropout_kernel.h"
+
+namespace oneflow {
+
+namespace {
+
+// Attention weights are computed for a tile of kQueryBlockSize queries against kKeyBlockSize keys
+// at a time, so the working set of a thread stays O(block) instead of O(Lq * Lk).
+constexpr int64_t kQueryBlockSize = 32;
+constexpr int64_t kKeyBlockSize = 128;
+
+inline uint64_t SplitMix64(uint64_t x) {
+  x += 0x9E3779B97F4A7C15ULL;
+  x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+  x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+  return x ^ (x >> 31);
+}
+
+// The dropout decision of every attention weight is a hash of (seed, position), so the backward
+// kernel regenerates exactly the forward mask without it ever being materialized.
+class AttentionDropout {
+ public:
+  AttentionDropout(uint64_t seed, float rate, int64_t query_len, int64_t key_len)
+      : seed_(seed), rate_(rate), query_len_(query_len), key_len_(key_len) {
+    keep_scale_ = rate < 1.0f ? 1.0 / (1.0 - rate) : 0.0;
+    // Keep when the top 24 bits of the hash, as a uniform number in [0, 1), are >= rate.
+    threshold_ = static_cast<uint64_t>(static_cast<double>(rate) * (1 << 24));
+  }
+
+  bool enabled() const { return rate_ > 0.0f; }
+
+  template<typename T>
+  T Scale(int64_t batch, int64_t i, int64_t j) const {
+    const uint64_t index = (static_cast<uint64_t>(batch) * query_len_ + i) * key_len_ + j;
+    const bool keep = (SplitMix64(seed_ ^ SplitMix64(index)) >> 40) >= threshold_;
+    return keep ? static_cast<T>(keep_scale_) : static_cast<T>(0);
+  }
+
+ private:
+  uint64_t seed_;
+  float rate_;
+  int64_t query_len_;
+  int64_t key_len_;
+  double keep_scale_;
+  uint64_t threshold_;
+};
+
+// Maps (batch, i, j) to the offset of an attn_mask that is broadcast along any axis of size 1.
+class AttentionMaskIndexer {
+ public:
+  AttentionMaskIndexer(const ShapeView& query_shape, const ShapeView& mask_shape) {
+    const int64_t num_batch_axes = query_shape.NumAxes() - 2;
+    batch_dims_.resize(num_batch_axes);
+    batch_strides_.resize(num_batch_axes);
+    int64_t stride = mask_shape.At(num_batch_axes) * mask_shape.At(num_batch_axes + 1);
+    for (int64_t axis = num_batch_axes - 1; axis >= 0; --axis) {
+      batch_dims_[axis] = query_shape.At(axis);
+      batch_strides_[axis] = mask_shape.At(axis) == 1 ? 0 : stride;
+      stride *= mask_shape.At(axis);
+    }
+    row_stride_ = mask_shape.At(num_batch_axes) == 1 ? 0 : mask_shape.At(num_batch_axes + 1);
+    col_stride_ = mask_shape.At(num_batch_axes + 1) == 1 ? 0 : 1;
+  }
+
+  int64_t BatchOffset(int64_t batch) const {
+    int64_t offset = 0;
+    for (int64_t axis = static_cast<int64_t>(batch_dims_.size()) - 1; axis >= 0; --axis) {
+      offset += (batch % batch_dims_[axis]) * batch_strides_[axis];
+      batch /= batch_dims_[axis];
+    }
+    return offset;
+  }
+  int64_t Offset(int64_t i, int64_t j) const { return i * row_stride_ + j * col_stride_; }
+
+ private:
+  std::vector<int64_t> batch_dims_;
+  std::vector<int64_t> batch_strides_;
+  int64_t row_stride_ = 0;
+  int64_t col_stride_ = 0;
+};
+
+struct AttentionParams {
+  int64_t batch_size;
+  int64_t query_len;
+  int64_t key_len;
+  int64_t head_size;
+  int64_t value_head_size;
+  double scale;
+  bool is_causal;
+};
+
+template<typename T>
+T Dot(const T* a, const T* b, int64_t n) {
+  T sum = 0;
+  for (int64_t d = 0; d < n; ++d) { sum += a[d] * b[d]; }
+  return sum;
+}
+
+template<typename T>
+struct AttentionScore {
+  const AttentionParams& params;
+  const T* query;
+  const T* key;
+  const T* mask;
+  const AttentionMaskIndexer* mask_indexer;
+
+  T operator()(int64_t i, int64_t j) const {
+    T score = Dot(query + i * params.head_size, key + j * params.head_size, params.head_size)
+              * static_cast<T>(params.scale);
+    if (mask != nullptr) { score += mask[mask_indexer->Offset(i, j)]; }
+    return score;
+  }
+};
+
+// Online softmax: every query row keeps its running max and running sum of exponentials, and the
+// output accumulator is rescaled whenever the max grows, so rows never see a full softmax.
+template<typename T>
+void AttentionForwardCpu(ep::CpuStream* stream, const AttentionParams& params, const T* query,
+                         const T* key, const T* value, const T* mask,
+                         const AttentionMaskIndexer* mask_indexer, const AttentionDropout& dropout,
+                         T* out, T* softmax_lse) {
+  const int64_t query_len = params.query_len;
+  const int64_t key_len = params.key_len;
+  const int64_t head_size = params.head_size;
+  const int64_t value_head_size = params.value_head_size;
+  stream->ParallelFor(
+      0, params.batch_size,
+      [&](int64_t begin, int64_t end) {
+        std::vector<T> scores(kQueryBlockSize * kKeyBlockSize);
+        std::vector<T> row_max(kQueryBlockSize);
+        std::vector<T> row_sum(kQueryBlockSize);
+        std::vector<T> acc(kQueryBlockSize * value_head_size);
+        for (int64_t batch = begin; batch < end; ++batch) {
+          const T* q = query + batch * query_len * head_size;
+          const T* k = key + batch * key_len * head_size;
+          const T* v = value + batch * key_len * value_head_size;
+          T* o = out + batch * query_len * value_head_size;
+          T* lse = softmax_lse + batch * query_len;
+          const T* batch_mask = mask == nullptr ? nullptr : mask + mask_indexer->BatchOffset(batch);
+          const AttentionScore<T> Score{params, q, k, batch_mask, mask_indexer};
+          for (int64_t i0 = 0; i0 < query_len; i0 += kQueryBlockSize) {
+            const int64_t rows = std::min(kQueryBlockSize, query_len - i0);
+            std::fill(row_max.begin(), row_max.end(), -std::numeric_limits<T>::infinity());
+            std::fill(row_sum.begin(), row_sum.end(), static_cast<T>(0));
+            std::fill(acc.begin(), acc.end(), static_cast<T>(0));
+            for (int64_t j0 = 0; j0 < key_len; j0 += kKeyBlockSize) {
+              if (params.is_causal && j0 > i0 + rows - 1) { break; }
+              const int64_t cols = std::min(kKeyBlockSize, key_len - j0);
+              for (int64_t r = 0; r < rows; ++r) {
+                const int64_t i = i0 + r;
+                T* s = scores.data() + r * kKeyBlockSize;
+                T block_max = -std::numeric_limits<T>::infinity();
+                for (int64_t c = 0; c < cols; ++c) {
+                  const int64_t j = j0 + c;
+                  s[c] = (params.is_causal && j > i) ? -std::numeric_limits<T>::infinity()
+                                                     : Score(i, j);
+                  block_max = std::max(block_max, s[c]);
+                }
+                const T new_max = std::max(row_max[r], block_max);
+                if (new_max == -std::numeric_limits<T>::infinity()) { continue; }
+                const T correction = std::exp(row_max[r] - new_max);
+                T* a = acc.data() + r * value_head_size;
+                if (correction != static_cast<T>(1)) {
+                  for (int64_t d = 0; d < value_head_size; ++d) { a[d] *= correction; }
+                }
+                T sum = 0;
+                for (int64_t c = 0; c < cols; ++c) {
+                  T p = std::exp(s[c] - new_max);
+                  sum += p;
+                  if (dropout.enabled()) { p *= dropout.Scale<T>(batch, i, j0 + c); }
+                  if (p == static_cast<T>(0)) { continue; }
+                  const T* v_row = v + (j0 + c) * value_head_size;
+                  for (int64_t d = 0; d < value_head_size; ++d) { a[d] += p * v_row[d]; }
+                }
+                row_sum[r] = row_sum[r] * correction + sum;
+                row_max[r] = new_max;
+              }
+            }
+            for (int64_t r = 0; r < rows; ++r) {
+              T* o_row = o + (i0 + r) * value_head_size;
+              const T* a = acc.data() + r * value_head_size;
+              if (row_sum[r] > static_cast<T>(0)) {
+                const T inv_sum = static_cast<T>(1) / row_sum[r];
+                for (int64_t d = 0; d < value_head_size; ++d) { o_row[d] = a[d] * inv_sum; }
+                lse[i0 + r] = row_max[r] + std::log(row_sum[r]);
+              } else {
+                // Every key is masked out for this query.
+                std::fill(o_row, o_row + value_head_size, static_cast<T>(0));
+                lse[i0 + r] = -std::numeric_limits<T>::infinity();
+              }
+            }
+          }
+        }
+      },
+      1);
+}
+
+// With P = softmax(S) recomputed from softmax_lse and Z the scaled dropout mask:
+//   dV = (P * Z)^T dO, dP = (dO V^T) * Z, dS = P * (dP - rowsum(dO * O)),
+//   dQ = scale * dS K, dK = scale * dS^T Q.
+// Keys are the outer loop so a key tile and its dK / dV rows stay in cache while all queries
+// stream past it.
+template<typename T>
+void AttentionBackwardCpu(ep::CpuStream* stream, const AttentionParams& params, const T* out_grad,
+                          const T* query, const T* key, const T* value, const T* out,
+                          const T* softmax_lse, const T* mask,
+                          const AttentionMaskIndexer* mask_indexer, const AttentionDropout& dropout,
+                          T* query_grad, T* key_grad, T* value_grad) {
+  const int64_t query_len = params.query_len;
+  const int64_t key_len = params.key_len;
+  const int64_t head_size = params.head_size;
+  const int64_t value_head_size = params.value_head_size;
+  const T scale = static_cast<T>(params.scale);
+  stream->ParallelFor(
+      0, params.batch_size,
+      [&](int64_t begin, int64_t end) {
+        std::vector<T> out_dot_out_grad(query_len);
+        for (int64_t batch = begin; batch < end; ++batch) {
+          const T* q = query + batch * query_len * head_size;
+          const T* k = key + batch * key_len * head_size;
+          const T* v = value + batch * key_len * value_head_size;
+          const T* o = out + batch * query_len * value_head_size;
+          const T* d_o = out_grad + batch * query_len * value_head_size;
+          const T* lse = softmax_lse + batch * query_len;
+          T* dq = query_grad + batch * query_len * head_size;
+          T* dk = key_grad + batch * key_len * head_size;
+          T* dv = value_grad + batch * key_len * value_head_size;
+          const T* batch_mask = mask == nullptr ? nullptr : mask + mask_indexer->BatchOffset(batch);
+          const AttentionScore<T> Score{params, q, k, batch_mask, mask_indexer};
+          std::fill(dq, dq + query_len * head_size, static_cast<T>(0));
+          std::fill(dk, dk + key_len * head_size, static_cast<T>(0));
+          std::fill(dv, dv + key_len * value_head_size, static_cast<T>(0));
+          for (int64_t i = 0; i < query_len; ++i) {
+            out_dot_out_grad[i] =
+                Dot(o + i * value_head_size, d_o + i * value_head_size, value_head_size);
+          }
+          for (int64_t j0 = 0; j0 < key_len; j0 += kKeyBlockSize) {
+            const int64_t j1 = std::min(j0 + kKeyBlockSize, key_len);
+            for (int64_t i = params.is_causal ? j0 : 0; i < query_len; ++i) {
+              if (lse[i] == -std::numeric_limits<T>::infinity()) { continue; }
+              const T* q_row = q + i * head_size;
+              const T* d_o_row = d_o + i * value_head_size;
+              T* dq_row = dq + i * head_size;
+              const int64_t j_end = params.is_causal ? std::min(j1, i + 1) : j1;
+              for (int64_t j = j0; j < j_end; ++j) {
+                const T p = std::exp(Score(i, j) - lse[i]);
+                if (p == static_cast<T>(0)) { continue; }
+                const T* v_row = v + j * value_head_size;
+                T d_p = 0;
+                const T z = dropout.enabled() ? dropout.Scale<T>(batch, i, j) : static_cast<T>(1);
+                if (z != static_cast<T>(0)) {
+                  T* dv_row = dv + j * value_head_size;
+                  const T p_z = p * z;
+                  for (int64_t d = 0; d < value_head_size; ++d) { dv_row[d] += p_z * d_o_row[d]; }
+                  d_p = z * Dot(d_o_row, v_row, value_head_size);
+                }
+                const T d_s = p * (d_p - out_dot_out_grad[i]) * scale;
+                const T* k_row = k + j * head_size;
+                T* dk_row = dk + j * head_size;
+                for (int64_t d = 0; d < head_size; ++d) {
+                  dq_row[d] += d_s * k_row[d];
+                  dk_row[d] += d_s * q_row[d];
+                }
+              }
+            }
+          }
+        }
+      },
+      1);
+}
+
+AttentionParams GetAttentionParams(user_op::KernelComputeContext* ctx) {
+  const ShapeView& query_shape = ctx->Tensor4ArgNameAndIndex("query", 0)->shape();
+  const ShapeView& value_shape = ctx->Tensor4ArgNameAndIndex("value", 0)->shape();
+  const int64_t num_axes = query_shape.NumAxes();
+  AttentionParams params{};
+  params.batch_size = query_shape.Count(0, num_axes - 2);
+  params.query_len = query_shape.At(num_axes - 2);
+  params.key_len = value_shape.At(num_axes - 2);
+  params.head_size = query_shape.At(num_axes - 1);
+  params.value_head_size = value_shape.At(num_axes - 1);
+  params.scale = ctx->Attr<double>("scale");
+  params.is_causal = ctx->Attr<bool>("is_causal");
+  return params;
+}
+
+std::unique_ptr<AttentionMaskIndexer> NewAttentionMaskIndexer(user_op::KernelComputeContext* ctx) {
+  if (!ctx->has_input("attn_mask", 0)) { return nullptr; }
+  return std::make_unique<AttentionMaskIndexer>(
+      ctx->Tensor4ArgNameAndIndex("query", 0)->shape(),
+      ctx->Tensor4ArgNameAndIndex("attn_mask", 0)->shape());
+}
+
+template<typename T>
+const T* AttentionMaskPtr(user_op::KernelComputeContext* ctx) {
+  if (!ctx->has_input("attn_mask", 0)) { return nullptr; }
+  return ctx->Tensor4ArgNameAndIndex("attn_mask", 0)->dptr<T>();
+}
+
+}  // namespace
+
+template<typename T>
+class ScaledDotProductAttentionCpuKernel final : public user_op::OpKernel {
+ public:
+  ScaledDotProductAttentionCpuKernel() = default;
+  ~ScaledDotProductAttentionCpuKernel() = default;
+
+  std::shared_ptr<user_op::OpKernelState> CreateOpKernelState(
+      user_op::KernelInitContext* ctx) const override {
+    const auto& generator = CHECK_JUST(one::MakeGenerator(DeviceType::kCPU));
+    return std::make_shared<FusedDropoutKernelState>(generator);
+  }
+
+ private:
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  void Compute(user_op::KernelComputeContext* ctx, user_op::OpKernelState* state,
+               const user_op::OpKernelCache*) const override {
+    const user_op::Tensor* query = ctx->Tensor4ArgNameAndIndex("query", 0);
+    const user_op::Tensor* key = ctx->Tensor4ArgNameAndIndex("key", 0);
+    const user_op::Tensor* value = ctx->Tensor4ArgNameAndIndex("value", 0);
+    user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    user_op::Tensor* softmax_lse = ctx->Tensor4ArgNameAndIndex("softmax_lse", 0);
+    user_op::Tensor* rng_seed = ctx->Tensor4ArgNameAndIndex("rng_seed", 0);
+    const float dropout_rate = ctx->Attr<float>("dropout_rate");
+    uint64_t seed = 0;
+    if (dropout_rate > 0.0f) {
+      auto* dropout_state = dynamic_cast<FusedDropoutKernelState*>(state);
+      CHECK_NOTNULL(dropout_state);
+      const auto& cpu_generator =
+          CHECK_JUST(dropout_state->generator()->Get<one::CPUGeneratorImpl>());
+      seed = (static_cast<uint64_t>(cpu_generator->engine()()) << 32) | cpu_generator->engine()();
+    }
+    *rng_seed->mut_dptr<int64_t>() = static_cast<int64_t>(seed);
+    const AttentionParams params = GetAttentionParams(ctx);
+    const auto mask_indexer = NewAttentionMaskIndexer(ctx);
+    const AttentionDropout dropout(seed, dropout_rate, params.query_len, params.key_len);
+    AttentionForwardCpu<T>(ctx->stream()->As<ep::CpuStream>(), params, query->dptr<T>(),
+                           key->dptr<T>(), value->dptr<T>(), AttentionMaskPtr<T>(ctx),
+                           mask_indexer.get(), dropout, out->mut_dptr<T>(),
+                           softmax_lse->mut_dptr<T>());
+  }
+};
+
+#define REGISTER_SCALED_DOT_PRODUCT_ATTENTION_CPU_KERNEL(dtype)       \
+  REGISTER_USER_KERNEL("scaled_dot_product_attention")                \
+      .SetCreateFn<ScaledDotProductAttentionCpuKernel<dtype>>()       \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
+                       && (user_op::HobDataType("out", 0) == GetDataType<dtype>::value));
+
+REGISTER_SCALED_DOT_PRODUCT_ATTENTION_CPU_KERNEL(float)
+REGISTER_SCALED_DOT_PRODUCT_ATTENTION_CPU_KERNEL(double)
+
+template<typename T>
+class ScaledDotProductAttentionGradCpuKernel final : public user_op::OpKernel {
+ public:
+  ScaledDotProductAttentionGradCpuKernel() = default;
+  ~ScaledDotProductAttentionGradCpuKernel() = default;
+
+ private:
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const user_op::Tensor* out_grad = ctx->Tensor4ArgNameAndIndex("out_grad", 0);
+    const user_op::Tensor* query = ctx->Tensor4ArgNameAndIndex("query", 0);
+    const user_op::Tensor* key = ctx->Tensor4ArgNameAndIndex("key", 0);
+    const user_op::Tensor* value = ctx->Tensor4ArgNameAndIndex("value", 0);
+    const user_op::Tensor* out = ctx->Tensor4ArgNameAndIndex("out", 0);
+    const user_op::Tensor* softmax_lse = ctx->Tensor4ArgNameAndIndex("softmax_lse", 0);
+    const user_op::Tensor* rng_seed = ctx->Tensor4ArgNameAndIndex("rng_seed", 0);
+    user_op::Tensor* query_grad = ctx->Tensor4ArgNameAndIndex("query_grad", 0);
+    user_op::Tensor* key_grad = ctx->Tensor4ArgNameAndIndex("key_grad", 0);
+    user_op::Tensor* value_grad = ctx->Tensor4ArgNameAndIndex("value_grad", 0);
+    const AttentionParams params = GetAttentionParams(ctx);
+    const auto mask_indexer = NewAttentionMaskIndexer(ctx);
+    const AttentionDropout dropout(static_cast<uint64_t>(*rng_seed->dptr<int64_t>()),
+                                   ctx->Attr<float>("dropout_rate"), params.query_len,
+                                   params.key_len);
+    AttentionBackwardCpu<T>(ctx->stream()->As<ep::CpuStream>(), params, out_grad->dptr<T>(),
+                            query->dptr<T>(), key->dptr<T>(), value->dptr<T>(), out->dptr<T>(),
+                            softmax_lse->dptr<T>(), AttentionMaskPtr<T>(ctx), mask_indexer.get(),
+                            dropout, query_grad->mut_dptr<T>(), key_grad->mut_dptr<T>(),
+                            value_grad->mut_dptr<T>());
+  }
+};
+
+#define REGISTER_SCALED_DOT_PRODUCT_ATTENTION_GRAD_CPU_KERNEL(dtype)  \
+  REGISTER_USER_KERNEL("scaled_dot_product_attention_grad")           \
+      .SetCreateFn<ScaledDotProductAttentionGradCpuKernel<dtype>>()   \
+      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCPU) \
+                       && (user_op::HobDataType("query_grad", 0) == GetDataType<dtype>::value));
+
+REGISTER_SCALED_DOT_PRODUCT_ATTENTION_GRAD_CPU_KERNEL(float)
+REGISTER_SCALED_DOT_PRODUCT_ATTENTION_GRAD_CPU_KERNEL(double)
+
+}  // namespace oneflow
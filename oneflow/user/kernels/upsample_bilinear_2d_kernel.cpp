@@ -17,19 +17,20 @@ limitations under the License.
 #include "oneflow/core/kernel/new_kernel_util.h"
 #include "oneflow/core/common/nd_index_offset_helper.h"
 #include "oneflow/user/kernels/upsample_kernel.h"
+#include "oneflow/user/kernels/plane_parallel_cpu_util.h"
 
 namespace oneflow {
 
 namespace {
 
 template<typename T>
-static void UpsampleBilinear2DForward(const int64_t elem_cnt, const T* in_dptr,
+static void UpsampleBilinear2DForward(const int64_t begin, const int64_t end, const T* in_dptr,
                                       NdIndexOffsetHelper<int64_t, 4> in_helper,
                                       NdIndexOffsetHelper<int64_t, 4> out_helper,
                                       const int64_t in_height, const int64_t in_width,
                                       const T scale_h, const T scale_w, const bool align_corners,
                                       T* out_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h, w;
     out_helper.OffsetToNdIndex(index, n, c, h, w);
     BilinearParam<T> params;
@@ -47,13 +48,13 @@ static void UpsampleBilinear2DForward(const int64_t elem_cnt, const T* in_dptr,
 }
 
 template<typename T>
-static void UpsampleBilinearBackward(const int64_t elem_cnt, const T* dy_dptr,
+static void UpsampleBilinearBackward(const int64_t begin, const int64_t end, const T* dy_dptr,
                                      NdIndexOffsetHelper<int64_t, 4> dy_helper,
                                      NdIndexOffsetHelper<int64_t, 4> dx_helper,
                                      const int64_t dx_height, const int64_t dx_width,
                                      const T scale_h, const T scale_w, const bool align_corners,
                                      T* dx_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h, w;
     dy_helper.OffsetToNdIndex(index, n, c, h, w);
     BilinearParam<T> params;
@@ -72,6 +73,66 @@ static void UpsampleBilinearBackward(const int64_t elem_cnt, const T* dy_dptr,
   }
 }
 
+// NOTE: channels_last variants, [begin, end) indexes the (n, h, w) pixels of dy / y and every
+// pixel is a contiguous vector of `channels` elements.
+template<typename T>
+static void UpsampleBilinear2DForwardCLast(const int64_t begin, const int64_t end, const T* in_dptr,
+                                           const int64_t channels, const int64_t in_height,
+                                           const int64_t in_width, const int64_t out_height,
+                                           const int64_t out_width, const T scale_h,
+                                           const T scale_w, const bool align_corners, T* out_dptr) {
+  for (int64_t index = begin; index < end; ++index) {
+    const int64_t w = index % out_width;
+    const int64_t h = (index / out_width) % out_height;
+    const int64_t n = index / (out_width * out_height);
+    BilinearParam<T> params;
+    GetBilinearParam(align_corners, h, w, in_height, in_width, scale_h, scale_w, &params);
+    const T* top_dptr = in_dptr + (n * in_height + params.top_h_index) * in_width * channels;
+    const T* bottom_dptr = in_dptr + (n * in_height + params.bottom_h_index) * in_width * channels;
+    const T* top_left = top_dptr + params.left_w_index * channels;
+    const T* top_right = top_dptr + params.right_w_index * channels;
+    const T* bottom_left = bottom_dptr + params.left_w_index * channels;
+    const T* bottom_right = bottom_dptr + params.right_w_index * channels;
+    T* y = out_dptr + index * channels;
+    for (int64_t c = 0; c < channels; ++c) {
+      y[c] =
+          (1 - params.h_lerp) * ((1 - params.w_lerp) * top_left[c] + params.w_lerp * top_right[c])
+          + params.h_lerp
+                * ((1 - params.w_lerp) * bottom_left[c] + params.w_lerp * bottom_right[c]);
+    }
+  }
+}
+
+template<typename T>
+static void UpsampleBilinearBackwardCLast(const int64_t begin, const int64_t end, const T* dy_dptr,
+                                          const int64_t channels, const int64_t dx_height,
+                                          const int64_t dx_width, const int64_t dy_height,
+                                          const int64_t dy_width, const T scale_h, const T scale_w,
+                                          const bool align_corners, T* dx_dptr) {
+  for (int64_t index = begin; index < end; ++index) {
+    const int64_t w = index % dy_width;
+    const int64_t h = (index / dy_width) % dy_height;
+    const int64_t n = index / (dy_width * dy_height);
+    BilinearParam<T> params;
+    GetBilinearParam(align_corners, h, w, dx_height, dx_width, scale_h, scale_w, &params);
+    T* top_dptr = dx_dptr + (n * dx_height + params.top_h_index) * dx_width * channels;
+    T* bottom_dptr = dx_dptr + (n * dx_height + params.bottom_h_index) * dx_width * channels;
+    T* top_left = top_dptr + params.left_w_index * channels;
+    T* top_right = top_dptr + params.right_w_index * channels;
+    T* bottom_left = bottom_dptr + params.left_w_index * channels;
+    T* bottom_right = bottom_dptr + params.right_w_index * channels;
+    const T* dy = dy_dptr + index * channels;
+    for (int64_t c = 0; c < channels; ++c) {
+      const T dbottom = params.h_lerp * dy[c];
+      const T dtop = dy[c] - dbottom;
+      bottom_left[c] += static_cast<T>((1 - params.w_lerp) * dbottom);
+      bottom_right[c] += static_cast<T>(params.w_lerp * dbottom);
+      top_left[c] += static_cast<T>((1 - params.w_lerp) * dtop);
+      top_right[c] += static_cast<T>(params.w_lerp * dtop);
+    }
+  }
+}
+
 }  // namespace
 
 template<typename T>
@@ -88,6 +149,24 @@ class UpsampleBilinear2DCPUKernel final : public user_op::OpKernel {
     const float width_scale = ctx->Attr<float>("width_scale");
     const bool align_corners = ctx->Attr<bool>("align_corners");
     const int64_t elem_cnt = y_tensor->shape().elem_cnt();
+    if (ctx->Attr<std::string>("data_format") == "channels_last") {
+      const int64_t channels = x_tensor->shape().At(3);
+      const int64_t in_height = x_tensor->shape().At(1);
+      const int64_t in_width = x_tensor->shape().At(2);
+      const int64_t out_height = y_tensor->shape().At(1);
+      const int64_t out_width = y_tensor->shape().At(2);
+      const int64_t out_pixels = elem_cnt / channels;
+      const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
+      const T scale_width = GetAreaPixelScale(in_width, out_width, align_corners, width_scale);
+      ParallelForEachPlane(ctx->stream(), out_pixels, y_tensor->shape().At(0) * out_height,
+                           [&](int64_t begin, int64_t end) {
+                             UpsampleBilinear2DForwardCLast<T>(
+                                 begin, end, x_tensor->dptr<T>(), channels, in_height, in_width,
+                                 out_height, out_width, scale_height, scale_width, align_corners,
+                                 y_tensor->mut_dptr<T>());
+                           });
+      return;
+    }
     NdIndexOffsetHelper<int64_t, 4> in_helper(x_tensor->shape().At(0), x_tensor->shape().At(1),
                                               x_tensor->shape().At(2), x_tensor->shape().At(3));
     NdIndexOffsetHelper<int64_t, 4> out_helper(y_tensor->shape().At(0), y_tensor->shape().At(1),
@@ -106,9 +185,13 @@ class UpsampleBilinear2DCPUKernel final : public user_op::OpKernel {
     } else {
       const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
       const T scale_width = GetAreaPixelScale(in_width, out_width, align_corners, width_scale);
-      UpsampleBilinear2DForward<T>(elem_cnt, x_tensor->dptr<T>(), in_helper, out_helper, in_height,
-                                   in_width, scale_height, scale_width, align_corners,
-                                   y_tensor->mut_dptr<T>());
+      ParallelForEachPlane(
+          ctx->stream(), elem_cnt, y_tensor->shape().At(0) * y_tensor->shape().At(1),
+          [&](int64_t begin, int64_t end) {
+            UpsampleBilinear2DForward<T>(begin, end, x_tensor->dptr<T>(), in_helper, out_helper,
+                                         in_height, in_width, scale_height, scale_width,
+                                         align_corners, y_tensor->mut_dptr<T>());
+          });
     }
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
@@ -130,6 +213,24 @@ class UpsampleBilinear2DGradCPUKernel final : public user_op::OpKernel {
     const float width_scale = ctx->Attr<float>("width_scale");
     const bool align_corners = ctx->Attr<bool>("align_corners");
     const int64_t elem_cnt = dy_tensor->shape().elem_cnt();
+    if (ctx->Attr<std::string>("data_format") == "channels_last") {
+      const int64_t channels = dx_tensor->shape().At(3);
+      const int64_t in_height = dx_tensor->shape().At(1);
+      const int64_t in_width = dx_tensor->shape().At(2);
+      const int64_t out_height = dy_tensor->shape().At(1);
+      const int64_t out_width = dy_tensor->shape().At(2);
+      const int64_t out_pixels = elem_cnt / channels;
+      const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
+      const T scale_width = GetAreaPixelScale(in_width, out_width, align_corners, width_scale);
+      // Split at batch boundaries only, so that threads never scatter into the same dx pixel.
+      ParallelForEachPlane(
+          ctx->stream(), out_pixels, dy_tensor->shape().At(0), [&](int64_t begin, int64_t end) {
+            UpsampleBilinearBackwardCLast<T>(begin, end, dy_tensor->dptr<T>(), channels, in_height,
+                                             in_width, out_height, out_width, scale_height,
+                                             scale_width, align_corners, dx_tensor->mut_dptr<T>());
+          });
+      return;
+    }
     NdIndexOffsetHelper<int64_t, 4> dy_helper(dy_tensor->shape().At(0), dy_tensor->shape().At(1),
                                               dy_tensor->shape().At(2), dy_tensor->shape().At(3));
     NdIndexOffsetHelper<int64_t, 4> dx_helper(dx_tensor->shape().At(0), dx_tensor->shape().At(1),
@@ -147,9 +248,13 @@ class UpsampleBilinear2DGradCPUKernel final : public user_op::OpKernel {
     } else {
       const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
       const T scale_width = GetAreaPixelScale(in_width, out_width, align_corners, width_scale);
-      UpsampleBilinearBackward<T>(elem_cnt, dy_tensor->dptr<T>(), dy_helper, dx_helper, in_height,
-                                  in_width, scale_height, scale_width, align_corners,
-                                  dx_tensor->mut_dptr<T>());
+      ParallelForEachPlane(
+          ctx->stream(), elem_cnt, dy_tensor->shape().At(0) * dy_tensor->shape().At(1),
+          [&](int64_t begin, int64_t end) {
+            UpsampleBilinearBackward<T>(begin, end, dy_tensor->dptr<T>(), dy_helper, dx_helper,
+                                        in_height, in_width, scale_height, scale_width,
+                                        align_corners, dx_tensor->mut_dptr<T>());
+          });
     }
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
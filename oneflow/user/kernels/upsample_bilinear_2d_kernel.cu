@@ -159,15 +159,19 @@ class UpsampleBilinear2DGradGPUKernel final : public user_op::OpKernel {
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
 
-#define REGISTER_UPSAMPLE_BILINEAR_2D_CUDA_KERNEL(dtype)                                \
-  REGISTER_USER_KERNEL("upsample_bilinear_2d")                                          \
-      .SetCreateFn<UpsampleBilinear2DGPUKernel<dtype>>()                                \
-      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCUDA)                  \
-                       && (user_op::HobDataType("y", 0) == GetDataType<dtype>::value)); \
-  REGISTER_USER_KERNEL("upsample_bilinear_2d_grad")                                     \
-      .SetCreateFn<UpsampleBilinear2DGradGPUKernel<dtype>>()                            \
-      .SetIsMatchedHob((user_op::HobDeviceType() == DeviceType::kCUDA)                  \
-                       && (user_op::HobDataType("dx", 0) == GetDataType<dtype>::value));
+#define REGISTER_UPSAMPLE_BILINEAR_2D_CUDA_KERNEL(dtype)                                       \
+  REGISTER_USER_KERNEL("upsample_bilinear_2d")                                                 \
+      .SetCreateFn<UpsampleBilinear2DGPUKernel<dtype>>()                                       \
+      .SetIsMatchedHob(                                                                        \
+          (user_op::HobDeviceType() == DeviceType::kCUDA)                                      \
+          && (user_op::HobDataType("y", 0) == GetDataType<dtype>::value)                       \
+          && (user_op::HobAttr<std::string>("data_format") == std::string("channels_first"))); \
+  REGISTER_USER_KERNEL("upsample_bilinear_2d_grad")                                            \
+      .SetCreateFn<UpsampleBilinear2DGradGPUKernel<dtype>>()                                   \
+      .SetIsMatchedHob(                                                                        \
+          (user_op::HobDeviceType() == DeviceType::kCUDA)                                      \
+          && (user_op::HobDataType("dx", 0) == GetDataType<dtype>::value)                      \
+          && (user_op::HobAttr<std::string>("data_format") == std::string("channels_first")));
 
 REGISTER_UPSAMPLE_BILINEAR_2D_CUDA_KERNEL(float)
 REGISTER_UPSAMPLE_BILINEAR_2D_CUDA_KERNEL(double)
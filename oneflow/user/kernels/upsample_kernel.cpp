@@ -17,18 +17,19 @@ limitations under the License.
 #include "oneflow/core/kernel/new_kernel_util.h"
 #include "oneflow/core/common/nd_index_offset_helper.h"
 #include "oneflow/user/kernels/upsample_kernel.h"
+#include "oneflow/user/kernels/plane_parallel_cpu_util.h"
 
 namespace oneflow {
 
 namespace {
 
 template<typename T>
-static void UpsampleNearestForward(const int64_t elem_cnt, const T* in_dptr,
+static void UpsampleNearestForward(const int64_t begin, const int64_t end, const T* in_dptr,
                                    NdIndexOffsetHelper<int64_t, 4> in_helper,
                                    NdIndexOffsetHelper<int64_t, 4> out_helper,
                                    const int64_t in_height, const int64_t in_width,
                                    const float scale_h, const float scale_w, T* out_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h, w;
     out_helper.OffsetToNdIndex(index, n, c, h, w);
     const int64_t in_h = GetNearestInputIndex(h, scale_h, in_height);
@@ -38,12 +39,12 @@ static void UpsampleNearestForward(const int64_t elem_cnt, const T* in_dptr,
 }
 
 template<typename T>
-static void UpsampleNearestBackward(const int64_t elem_cnt, const T* dy_dptr,
+static void UpsampleNearestBackward(const int64_t begin, const int64_t end, const T* dy_dptr,
                                     NdIndexOffsetHelper<int64_t, 4> dy_helper,
                                     NdIndexOffsetHelper<int64_t, 4> dx_helper,
                                     const int64_t dx_height, const int64_t dx_width,
                                     const float scale_h, const float scale_w, T* dx_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h, w;
     dy_helper.OffsetToNdIndex(index, n, c, h, w);
     const int64_t dx_h = GetNearestInputIndex(h, scale_h, dx_height);
@@ -53,13 +54,13 @@ static void UpsampleNearestBackward(const int64_t elem_cnt, const T* dy_dptr,
 }
 
 template<typename T>
-static void UpsampleBilinearForward(const int64_t elem_cnt, const T* in_dptr,
+static void UpsampleBilinearForward(const int64_t begin, const int64_t end, const T* in_dptr,
                                     NdIndexOffsetHelper<int64_t, 4> in_helper,
                                     NdIndexOffsetHelper<int64_t, 4> out_helper,
                                     const int64_t in_height, const int64_t in_width,
                                     const T scale_h, const T scale_w, const bool align_corners,
                                     T* out_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h, w;
     out_helper.OffsetToNdIndex(index, n, c, h, w);
     BilinearParam<T> params;
@@ -77,13 +78,13 @@ static void UpsampleBilinearForward(const int64_t elem_cnt, const T* in_dptr,
 }
 
 template<typename T>
-static void UpsampleBilinearBackward(const int64_t elem_cnt, const T* dy_dptr,
+static void UpsampleBilinearBackward(const int64_t begin, const int64_t end, const T* dy_dptr,
                                      NdIndexOffsetHelper<int64_t, 4> dy_helper,
                                      NdIndexOffsetHelper<int64_t, 4> dx_helper,
                                      const int64_t dx_height, const int64_t dx_width,
                                      const T scale_h, const T scale_w, const bool align_corners,
                                      T* dx_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h, w;
     dy_helper.OffsetToNdIndex(index, n, c, h, w);
     BilinearParam<T> params;
@@ -121,9 +122,13 @@ class UpsampleNearestCPUKernel final : public user_op::OpKernel {
                                               x_blob->shape().At(2), x_blob->shape().At(3));
     NdIndexOffsetHelper<int64_t, 4> out_helper(y_blob->shape().At(0), y_blob->shape().At(1),
                                                y_blob->shape().At(2), y_blob->shape().At(3));
-    UpsampleNearestForward<T>(elem_cnt, x_blob->dptr<T>(), in_helper, out_helper,
-                              x_blob->shape().At(2), x_blob->shape().At(3), 1.f / height_scale,
-                              1.f / width_scale, y_blob->mut_dptr<T>());
+    ParallelForEachPlane(ctx->stream(), elem_cnt, y_blob->shape().At(0) * y_blob->shape().At(1),
+                         [&](int64_t begin, int64_t end) {
+                           UpsampleNearestForward<T>(begin, end, x_blob->dptr<T>(), in_helper,
+                                                     out_helper, x_blob->shape().At(2),
+                                                     x_blob->shape().At(3), 1.f / height_scale,
+                                                     1.f / width_scale, y_blob->mut_dptr<T>());
+                         });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
@@ -148,9 +153,13 @@ class UpsampleNearestGradCPUKernel final : public user_op::OpKernel {
                                               dy_blob->shape().At(2), dy_blob->shape().At(3));
     NdIndexOffsetHelper<int64_t, 4> dx_helper(dx_blob->shape().At(0), dx_blob->shape().At(1),
                                               dx_blob->shape().At(2), dx_blob->shape().At(3));
-    UpsampleNearestBackward<T>(elem_cnt, dy_blob->dptr<T>(), dy_helper, dx_helper,
-                               dx_blob->shape().At(2), dx_blob->shape().At(3), 1.f / height_scale,
-                               1.f / width_scale, dx_blob->mut_dptr<T>());
+    ParallelForEachPlane(ctx->stream(), elem_cnt, dy_blob->shape().At(0) * dy_blob->shape().At(1),
+                         [&](int64_t begin, int64_t end) {
+                           UpsampleNearestBackward<T>(begin, end, dy_blob->dptr<T>(), dy_helper,
+                                                      dx_helper, dx_blob->shape().At(2),
+                                                      dx_blob->shape().At(3), 1.f / height_scale,
+                                                      1.f / width_scale, dx_blob->mut_dptr<T>());
+                         });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
@@ -197,9 +206,13 @@ class UpsampleBilinearCPUKernel final : public user_op::OpKernel {
     const int64_t out_width = y_blob->shape().At(3);
     const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
     const T scale_width = GetAreaPixelScale(in_width, out_width, align_corners, width_scale);
-    UpsampleBilinearForward<T>(elem_cnt, x_blob->dptr<T>(), in_helper, out_helper, in_height,
-                               in_width, scale_height, scale_width, align_corners,
-                               y_blob->mut_dptr<T>());
+    ParallelForEachPlane(ctx->stream(), elem_cnt, y_blob->shape().At(0) * y_blob->shape().At(1),
+                         [&](int64_t begin, int64_t end) {
+                           UpsampleBilinearForward<T>(begin, end, x_blob->dptr<T>(), in_helper,
+                                                      out_helper, in_height, in_width, scale_height,
+                                                      scale_width, align_corners,
+                                                      y_blob->mut_dptr<T>());
+                         });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
@@ -232,9 +245,13 @@ class UpsampleBilinearGradCPUKernel final : public user_op::OpKernel {
     const int64_t out_width = dy_blob->shape().At(3);
     const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
     const T scale_width = GetAreaPixelScale(in_width, out_width, align_corners, width_scale);
-    UpsampleBilinearBackward<T>(elem_cnt, dy_blob->dptr<T>(), dy_helper, dx_helper, in_height,
-                                in_width, scale_height, scale_width, align_corners,
-                                dx_blob->mut_dptr<T>());
+    ParallelForEachPlane(ctx->stream(), elem_cnt, dy_blob->shape().At(0) * dy_blob->shape().At(1),
+                         [&](int64_t begin, int64_t end) {
+                           UpsampleBilinearBackward<T>(begin, end, dy_blob->dptr<T>(), dy_helper,
+                                                       dx_helper, in_height, in_width, scale_height,
+                                                       scale_width, align_corners,
+                                                       dx_blob->mut_dptr<T>());
+                         });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
@@ -17,17 +17,18 @@ limitations under the License.
 #include "oneflow/core/kernel/new_kernel_util.h"
 #include "oneflow/core/common/nd_index_offset_helper.h"
 #include "oneflow/user/kernels/upsample_kernel.h"
+#include "oneflow/user/kernels/plane_parallel_cpu_util.h"
 
 namespace oneflow {
 
 namespace {
 
 template<typename T>
-static void UpsampleLinear1DForward(const int64_t elem_cnt, const T* in_dptr,
+static void UpsampleLinear1DForward(const int64_t begin, const int64_t end, const T* in_dptr,
                                     NdIndexOffsetHelper<int64_t, 3> in_helper,
                                     NdIndexOffsetHelper<int64_t, 3> out_helper, const int in_height,
                                     const float scale_factor, bool align_corners, T* out_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h;
     out_helper.OffsetToNdIndex(index, n, c, h);
     const T h1r = GetLinearInputIndex(h, scale_factor, align_corners);
@@ -41,11 +42,11 @@ static void UpsampleLinear1DForward(const int64_t elem_cnt, const T* in_dptr,
 }
 
 template<typename T>
-static void UpsampleLinear1DBackward(const int64_t elem_cnt, const T* dy_dptr,
+static void UpsampleLinear1DBackward(const int64_t begin, const int64_t end, const T* dy_dptr,
                                      NdIndexOffsetHelper<int64_t, 3> dy_helper,
                                      NdIndexOffsetHelper<int64_t, 3> dx_helper, const int in_height,
                                      const float scale_factor, bool align_corners, T* dx_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h;
     dy_helper.OffsetToNdIndex(index, n, c, h);
     const T h1r = GetLinearInputIndex(h, scale_factor, align_corners);
@@ -87,8 +88,13 @@ class UpsampleLinear1DCPUKernel final : public user_op::OpKernel {
              sizeof(T) * nbatch * channels * in_height);
     } else {
       const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
-      UpsampleLinear1DForward<T>(elem_cnt, x_tensor->dptr<T>(), in_helper, out_helper, in_height,
-                                 scale_height, align_corners, y_tensor->mut_dptr<T>());
+      ParallelForEachPlane(ctx->stream(), elem_cnt,
+                           y_tensor->shape().At(0) * y_tensor->shape().At(1),
+                           [&](int64_t begin, int64_t end) {
+                             UpsampleLinear1DForward<T>(begin, end, x_tensor->dptr<T>(), in_helper,
+                                                        out_helper, in_height, scale_height,
+                                                        align_corners, y_tensor->mut_dptr<T>());
+                           });
     }
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
@@ -124,8 +130,13 @@ class UpsampleLinearGrad1DCPUKernel final : public user_op::OpKernel {
              sizeof(T) * nbatch * channels * in_height);
     } else {
       const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
-      UpsampleLinear1DBackward<T>(elem_cnt, dy_tensor->dptr<T>(), dy_helper, dx_helper, in_height,
-                                  scale_height, align_corners, dx_tensor->mut_dptr<T>());
+      ParallelForEachPlane(ctx->stream(), elem_cnt,
+                           dy_tensor->shape().At(0) * dy_tensor->shape().At(1),
+                           [&](int64_t begin, int64_t end) {
+                             UpsampleLinear1DBackward<T>(
+                                 begin, end, dy_tensor->dptr<T>(), dy_helper, dx_helper, in_height,
+                                 scale_height, align_corners, dx_tensor->mut_dptr<T>());
+                           });
     }
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
@@ -17,18 +17,19 @@ limitations under the License.
 #include "oneflow/core/kernel/new_kernel_util.h"
 #include "oneflow/core/common/nd_index_offset_helper.h"
 #include "oneflow/user/kernels/upsample_kernel.h"
+#include "oneflow/user/kernels/plane_parallel_cpu_util.h"
 
 namespace oneflow {
 
 namespace {
 
 template<typename T>
-static void UpsampleNearest1DForward(const int64_t elem_cnt, const T* in_dptr,
+static void UpsampleNearest1DForward(const int64_t begin, const int64_t end, const T* in_dptr,
                                      NdIndexOffsetHelper<int64_t, 3> in_helper,
                                      NdIndexOffsetHelper<int64_t, 3> out_helper,
                                      const int64_t in_height, const float scale_factor,
                                      T* out_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h;
     out_helper.OffsetToNdIndex(index, n, c, h);
     const int64_t in_h = GetNearestInputIndex(h, scale_factor, in_height);
@@ -37,12 +38,12 @@ static void UpsampleNearest1DForward(const int64_t elem_cnt, const T* in_dptr,
 }
 
 template<typename T>
-static void UpsampleNearest1DBackward(const int64_t elem_cnt, const T* dy_dptr,
+static void UpsampleNearest1DBackward(const int64_t begin, const int64_t end, const T* dy_dptr,
                                       NdIndexOffsetHelper<int64_t, 3> dy_helper,
                                       NdIndexOffsetHelper<int64_t, 3> dx_helper,
                                       const int64_t in_height, const float scale_factor,
                                       T* dx_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h;
     dy_helper.OffsetToNdIndex(index, n, c, h);
     const int64_t dx_h = GetNearestInputIndex(h, scale_factor, in_height);
@@ -51,12 +52,12 @@ static void UpsampleNearest1DBackward(const int64_t elem_cnt, const T* dy_dptr,
 }
 
 template<typename T>
-static void UpsampleNearest2DForward(const int64_t elem_cnt, const T* in_dptr,
+static void UpsampleNearest2DForward(const int64_t begin, const int64_t end, const T* in_dptr,
                                      NdIndexOffsetHelper<int64_t, 4> in_helper,
                                      NdIndexOffsetHelper<int64_t, 4> out_helper,
                                      const int64_t in_height, const int64_t in_width,
                                      const float scale_h, const float scale_w, T* out_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h, w;
     out_helper.OffsetToNdIndex(index, n, c, h, w);
     const int64_t in_h = GetNearestInputIndex(h, scale_h, in_height);
@@ -66,12 +67,12 @@ static void UpsampleNearest2DForward(const int64_t elem_cnt, const T* in_dptr,
 }
 
 template<typename T>
-static void UpsampleNearest2DBackward(const int64_t elem_cnt, const T* dy_dptr,
+static void UpsampleNearest2DBackward(const int64_t begin, const int64_t end, const T* dy_dptr,
                                       NdIndexOffsetHelper<int64_t, 4> dy_helper,
                                       NdIndexOffsetHelper<int64_t, 4> dx_helper,
                                       const int64_t dx_height, const int64_t dx_width,
                                       const float scale_h, const float scale_w, T* dx_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, h, w;
     dy_helper.OffsetToNdIndex(index, n, c, h, w);
     const int64_t dx_h = GetNearestInputIndex(h, scale_h, dx_height);
@@ -80,14 +81,51 @@ static void UpsampleNearest2DBackward(const int64_t elem_cnt, const T* dy_dptr,
   }
 }
 
+// NOTE: channels_last variants, [begin, end) indexes the (n, h, w) pixels of dy / y and every
+// pixel is a contiguous vector of `channels` elements.
 template<typename T>
-static void UpsampleNearest3DForward(const int64_t elem_cnt, const T* in_dptr,
+static void UpsampleNearest2DForwardCLast(const int64_t begin, const int64_t end, const T* in_dptr,
+                                          const int64_t channels, const int64_t in_height,
+                                          const int64_t in_width, const int64_t out_height,
+                                          const int64_t out_width, const float scale_h,
+                                          const float scale_w, T* out_dptr) {
+  for (int64_t index = begin; index < end; ++index) {
+    const int64_t w = index % out_width;
+    const int64_t h = (index / out_width) % out_height;
+    const int64_t n = index / (out_width * out_height);
+    const int64_t in_h = GetNearestInputIndex(h, scale_h, in_height);
+    const int64_t in_w = GetNearestInputIndex(w, scale_w, in_width);
+    const T* x = in_dptr + ((n * in_height + in_h) * in_width + in_w) * channels;
+    std::copy(x, x + channels, out_dptr + index * channels);
+  }
+}
+
+template<typename T>
+static void UpsampleNearest2DBackwardCLast(const int64_t begin, const int64_t end, const T* dy_dptr,
+                                           const int64_t channels, const int64_t dx_height,
+                                           const int64_t dx_width, const int64_t dy_height,
+                                           const int64_t dy_width, const float scale_h,
+                                           const float scale_w, T* dx_dptr) {
+  for (int64_t index = begin; index < end; ++index) {
+    const int64_t w = index % dy_width;
+    const int64_t h = (index / dy_width) % dy_height;
+    const int64_t n = index / (dy_width * dy_height);
+    const int64_t dx_h = GetNearestInputIndex(h, scale_h, dx_height);
+    const int64_t dx_w = GetNearestInputIndex(w, scale_w, dx_width);
+    const T* dy = dy_dptr + index * channels;
+    T* dx = dx_dptr + ((n * dx_height + dx_h) * dx_width + dx_w) * channels;
+    for (int64_t c = 0; c < channels; ++c) { dx[c] += dy[c]; }
+  }
+}
+
+template<typename T>
+static void UpsampleNearest3DForward(const int64_t begin, const int64_t end, const T* in_dptr,
                                      NdIndexOffsetHelper<int64_t, 5> in_helper,
                                      NdIndexOffsetHelper<int64_t, 5> out_helper,
                                      const int64_t in_depth, const int64_t in_height,
                                      const int64_t in_width, const float scale_d,
                                      const float scale_h, const float scale_w, T* out_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, d, h, w;
     out_helper.OffsetToNdIndex(index, n, c, d, h, w);
     const int64_t in_h = GetNearestInputIndex(h, scale_h, in_height);
@@ -98,13 +136,13 @@ static void UpsampleNearest3DForward(const int64_t elem_cnt, const T* in_dptr,
 }
 
 template<typename T>
-static void UpsampleNearest3DBackward(const int64_t elem_cnt, const T* dy_dptr,
+static void UpsampleNearest3DBackward(const int64_t begin, const int64_t end, const T* dy_dptr,
                                       NdIndexOffsetHelper<int64_t, 5> dy_helper,
                                       NdIndexOffsetHelper<int64_t, 5> dx_helper,
                                       const int64_t in_depth, const int64_t in_height,
                                       const int64_t in_width, const float scale_d,
                                       const float scale_h, const float scale_w, T* dx_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, d, h, w;
     dy_helper.OffsetToNdIndex(index, n, c, d, h, w);
     const int64_t dx_h = GetNearestInputIndex(h, scale_h, in_height);
@@ -142,9 +180,13 @@ class UpsampleNearest1DCPUKernel final : public user_op::OpKernel {
                                                 x_tensor->shape().At(2));
       NdIndexOffsetHelper<int64_t, 3> out_helper(y_tensor->shape().At(0), y_tensor->shape().At(1),
                                                  y_tensor->shape().At(2));
-      UpsampleNearest1DForward<T>(elem_cnt, x_tensor->dptr<T>(), in_helper, out_helper,
-                                  x_tensor->shape().At(2), 1.f / height_scale,
-                                  y_tensor->mut_dptr<T>());
+      ParallelForEachPlane(
+          ctx->stream(), elem_cnt, y_tensor->shape().At(0) * y_tensor->shape().At(1),
+          [&](int64_t begin, int64_t end) {
+            UpsampleNearest1DForward<T>(begin, end, x_tensor->dptr<T>(), in_helper, out_helper,
+                                        x_tensor->shape().At(2), 1.f / height_scale,
+                                        y_tensor->mut_dptr<T>());
+          });
     }
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
@@ -178,9 +220,13 @@ class UpsampleNearestGrad1DCPUKernel final : public user_op::OpKernel {
                                                 dy_tensor->shape().At(2));
       NdIndexOffsetHelper<int64_t, 3> dx_helper(dx_tensor->shape().At(0), dx_tensor->shape().At(1),
                                                 dx_tensor->shape().At(2));
-      UpsampleNearest1DBackward<T>(elem_cnt, dy_tensor->dptr<T>(), dy_helper, dx_helper,
-                                   dx_tensor->shape().At(2), 1.f / height_scale,
-                                   dx_tensor->mut_dptr<T>());
+      ParallelForEachPlane(
+          ctx->stream(), elem_cnt, dy_tensor->shape().At(0) * dy_tensor->shape().At(1),
+          [&](int64_t begin, int64_t end) {
+            UpsampleNearest1DBackward<T>(begin, end, dy_tensor->dptr<T>(), dy_helper, dx_helper,
+                                         dx_tensor->shape().At(2), 1.f / height_scale,
+                                         dx_tensor->mut_dptr<T>());
+          });
     }
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
@@ -210,6 +256,26 @@ class UpsampleNearest2DCPUKernel final : public user_op::OpKernel {
     const user_op::Tensor* x_tensor = ctx->Tensor4ArgNameAndIndex("x", 0);
     user_op::Tensor* y_tensor = ctx->Tensor4ArgNameAndIndex("y", 0);
 
+    const float height_scale = ctx->Attr<float>("height_scale");
+    const float width_scale = ctx->Attr<float>("width_scale");
+    const int64_t elem_cnt = y_tensor->shape().elem_cnt();
+
+    if (ctx->Attr<std::string>("data_format") == "channels_last") {
+      const int64_t channels = x_tensor->shape().At(3);
+      const int64_t in_height = x_tensor->shape().At(1);
+      const int64_t in_width = x_tensor->shape().At(2);
+      const int64_t out_height = y_tensor->shape().At(1);
+      const int64_t out_width = y_tensor->shape().At(2);
+      ParallelForEachPlane(ctx->stream(), elem_cnt / channels, y_tensor->shape().At(0) * out_height,
+                           [&](int64_t begin, int64_t end) {
+                             UpsampleNearest2DForwardCLast<T>(
+                                 begin, end, x_tensor->dptr<T>(), channels, in_height, in_width,
+                                 out_height, out_width, 1.f / height_scale, 1.f / width_scale,
+                                 y_tensor->mut_dptr<T>());
+                           });
+      return;
+    }
+
     const int64_t nbatch = x_tensor->shape().At(0);
     const int64_t channels = x_tensor->shape().At(1);
     const int64_t in_height = x_tensor->shape().At(2);
@@ -217,10 +283,6 @@ class UpsampleNearest2DCPUKernel final : public user_op::OpKernel {
     const int64_t out_height = y_tensor->shape().At(2);
     const int64_t out_width = y_tensor->shape().At(3);
 
-    const float height_scale = ctx->Attr<float>("height_scale");
-    const float width_scale = ctx->Attr<float>("width_scale");
-    const int64_t elem_cnt = y_tensor->shape().elem_cnt();
-
     if (in_height == out_height && in_width == out_width) {
       memcpy(y_tensor->mut_dptr<void>(), x_tensor->dptr<void>(),
              sizeof(T) * nbatch * channels * in_height * in_width);
@@ -229,9 +291,14 @@ class UpsampleNearest2DCPUKernel final : public user_op::OpKernel {
                                                 x_tensor->shape().At(2), x_tensor->shape().At(3));
       NdIndexOffsetHelper<int64_t, 4> out_helper(y_tensor->shape().At(0), y_tensor->shape().At(1),
                                                  y_tensor->shape().At(2), y_tensor->shape().At(3));
-      UpsampleNearest2DForward<T>(elem_cnt, x_tensor->dptr<T>(), in_helper, out_helper,
-                                  x_tensor->shape().At(2), x_tensor->shape().At(3),
-                                  1.f / height_scale, 1.f / width_scale, y_tensor->mut_dptr<T>());
+      ParallelForEachPlane(ctx->stream(), elem_cnt,
+                           y_tensor->shape().At(0) * y_tensor->shape().At(1),
+                           [&](int64_t begin, int64_t end) {
+                             UpsampleNearest2DForward<T>(
+                                 begin, end, x_tensor->dptr<T>(), in_helper, out_helper,
+                                 x_tensor->shape().At(2), x_tensor->shape().At(3),
+                                 1.f / height_scale, 1.f / width_scale, y_tensor->mut_dptr<T>());
+                           });
     }
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
@@ -251,6 +318,27 @@ class UpsampleNearest2DGradCPUKernel final : public user_op::OpKernel {
                              dx_tensor->shape().elem_cnt() * sizeof(T));
     const user_op::Tensor* dy_tensor = ctx->Tensor4ArgNameAndIndex("dy", 0);
 
+    const float height_scale = ctx->Attr<float>("height_scale");
+    const float width_scale = ctx->Attr<float>("width_scale");
+    const int64_t elem_cnt = dy_tensor->shape().elem_cnt();
+
+    if (ctx->Attr<std::string>("data_format") == "channels_last") {
+      const int64_t channels = dx_tensor->shape().At(3);
+      const int64_t in_height = dx_tensor->shape().At(1);
+      const int64_t in_width = dx_tensor->shape().At(2);
+      const int64_t out_height = dy_tensor->shape().At(1);
+      const int64_t out_width = dy_tensor->shape().At(2);
+      // Split at batch boundaries only, so that threads never scatter into the same dx pixel.
+      ParallelForEachPlane(ctx->stream(), elem_cnt / channels, dy_tensor->shape().At(0),
+                           [&](int64_t begin, int64_t end) {
+                             UpsampleNearest2DBackwardCLast<T>(
+                                 begin, end, dy_tensor->dptr<T>(), channels, in_height, in_width,
+                                 out_height, out_width, 1.f / height_scale, 1.f / width_scale,
+                                 dx_tensor->mut_dptr<T>());
+                           });
+      return;
+    }
+
     const int64_t nbatch = dx_tensor->shape().At(0);
     const int64_t channels = dx_tensor->shape().At(1);
     const int64_t in_height = dx_tensor->shape().At(2);
@@ -258,10 +346,6 @@ class UpsampleNearest2DGradCPUKernel final : public user_op::OpKernel {
     const int64_t out_height = dy_tensor->shape().At(2);
     const int64_t out_width = dy_tensor->shape().At(3);
 
-    const float height_scale = ctx->Attr<float>("height_scale");
-    const float width_scale = ctx->Attr<float>("width_scale");
-    const int64_t elem_cnt = dy_tensor->shape().elem_cnt();
-
     if (in_height == out_height && in_width == out_width) {
       memcpy(dx_tensor->mut_dptr<void>(), dy_tensor->dptr<void>(),
              sizeof(T) * nbatch * channels * in_height * in_width);
@@ -270,9 +354,14 @@ class UpsampleNearest2DGradCPUKernel final : public user_op::OpKernel {
                                                 dy_tensor->shape().At(2), dy_tensor->shape().At(3));
       NdIndexOffsetHelper<int64_t, 4> dx_helper(dx_tensor->shape().At(0), dx_tensor->shape().At(1),
                                                 dx_tensor->shape().At(2), dx_tensor->shape().At(3));
-      UpsampleNearest2DBackward<T>(elem_cnt, dy_tensor->dptr<T>(), dy_helper, dx_helper,
-                                   dx_tensor->shape().At(2), dx_tensor->shape().At(3),
-                                   1.f / height_scale, 1.f / width_scale, dx_tensor->mut_dptr<T>());
+      ParallelForEachPlane(ctx->stream(), elem_cnt,
+                           dy_tensor->shape().At(0) * dy_tensor->shape().At(1),
+                           [&](int64_t begin, int64_t end) {
+                             UpsampleNearest2DBackward<T>(
+                                 begin, end, dy_tensor->dptr<T>(), dy_helper, dx_helper,
+                                 dx_tensor->shape().At(2), dx_tensor->shape().At(3),
+                                 1.f / height_scale, 1.f / width_scale, dx_tensor->mut_dptr<T>());
+                           });
     }
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
@@ -311,10 +400,14 @@ class UpsampleNearest3DCPUKernel final : public user_op::OpKernel {
     NdIndexOffsetHelper<int64_t, 5> out_helper(y_blob->shape().At(0), y_blob->shape().At(1),
                                                y_blob->shape().At(2), y_blob->shape().At(3),
                                                y_blob->shape().At(4));
-    UpsampleNearest3DForward<T>(elem_cnt, x_blob->dptr<T>(), in_helper, out_helper,
-                                x_blob->shape().At(2), x_blob->shape().At(3), x_blob->shape().At(4),
-                                1.f / depth_scale, 1.f / height_scale, 1.f / width_scale,
-                                y_blob->mut_dptr<T>());
+    ParallelForEachPlane(ctx->stream(), elem_cnt, y_blob->shape().At(0) * y_blob->shape().At(1),
+                         [&](int64_t begin, int64_t end) {
+                           UpsampleNearest3DForward<T>(begin, end, x_blob->dptr<T>(), in_helper,
+                                                       out_helper, x_blob->shape().At(2),
+                                                       x_blob->shape().At(3), x_blob->shape().At(4),
+                                                       1.f / depth_scale, 1.f / height_scale,
+                                                       1.f / width_scale, y_blob->mut_dptr<T>());
+                         });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
@@ -342,10 +435,14 @@ class UpsampleNearestGrad3DCPUKernel final : public user_op::OpKernel {
     NdIndexOffsetHelper<int64_t, 5> dx_helper(dx_blob->shape().At(0), dx_blob->shape().At(1),
                                               dx_blob->shape().At(2), dx_blob->shape().At(3),
                                               dx_blob->shape().At(4));
-    UpsampleNearest3DBackward<T>(elem_cnt, dy_blob->dptr<T>(), dy_helper, dx_helper,
-                                 dx_blob->shape().At(2), dx_blob->shape().At(3),
-                                 dx_blob->shape().At(4), 1.f / depth_scale, 1.f / height_scale,
-                                 1.f / width_scale, dx_blob->mut_dptr<T>());
+    ParallelForEachPlane(ctx->stream(), elem_cnt, dy_blob->shape().At(0) * dy_blob->shape().At(1),
+                         [&](int64_t begin, int64_t end) {
+                           UpsampleNearest3DBackward<T>(
+                               begin, end, dy_blob->dptr<T>(), dy_helper, dx_helper,
+                               dx_blob->shape().At(2), dx_blob->shape().At(3),
+                               dx_blob->shape().At(4), 1.f / depth_scale, 1.f / height_scale,
+                               1.f / width_scale, dx_blob->mut_dptr<T>());
+                         });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
@@ -17,19 +17,20 @@ limitations under the License.
 #include "oneflow/core/kernel/new_kernel_util.h"
 #include "oneflow/core/common/nd_index_offset_helper.h"
 #include "oneflow/user/kernels/upsample_kernel.h"
+#include "oneflow/user/kernels/plane_parallel_cpu_util.h"
 
 namespace oneflow {
 
 namespace {
 
 template<typename T>
-static void UpsampleTrilinear3DForward(const int64_t elem_cnt, const T* in_dptr,
+static void UpsampleTrilinear3DForward(const int64_t begin, const int64_t end, const T* in_dptr,
                                        NdIndexOffsetHelper<int64_t, 5> in_helper,
                                        NdIndexOffsetHelper<int64_t, 5> out_helper,
                                        const int64_t in_depth, const int64_t in_height,
                                        const int64_t in_width, const T rdepth, const T rheight,
                                        const T rwidth, const bool align_corners, T* out_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, d, h, w;
     out_helper.OffsetToNdIndex(index, n, c, d, h, w);
 
@@ -69,13 +70,13 @@ static void UpsampleTrilinear3DForward(const int64_t elem_cnt, const T* in_dptr,
 }
 
 template<typename T>
-static void UpsampleTrilinear3DBackward(const int64_t elem_cnt, const T* dy_dptr,
+static void UpsampleTrilinear3DBackward(const int64_t begin, const int64_t end, const T* dy_dptr,
                                         NdIndexOffsetHelper<int64_t, 5> dy_helper,
                                         NdIndexOffsetHelper<int64_t, 5> dx_helper,
                                         const int64_t in_depth, const int64_t in_height,
                                         const int64_t in_width, const T rdepth, const T rheight,
                                         const T rwidth, const bool align_corners, T* dx_dptr) {
-  for (int64_t index = 0; index < elem_cnt; ++index) {
+  for (int64_t index = begin; index < end; ++index) {
     int64_t n, c, d, h, w;
     dy_helper.OffsetToNdIndex(index, n, c, d, h, w);
 
@@ -148,10 +149,14 @@ class UpsampleTrilinear3DCPUKernel final : public user_op::OpKernel {
     const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
     const T scale_width = GetAreaPixelScale(in_width, out_width, align_corners, width_scale);
 
-    UpsampleTrilinear3DForward<T>(elem_cnt, x_tensor->dptr<T>(), in_helper, out_helper,
-                                  x_tensor->shape().At(2), x_tensor->shape().At(3),
-                                  x_tensor->shape().At(4), scale_depth, scale_height, scale_width,
-                                  align_corners, y_tensor->mut_dptr<T>());
+    ParallelForEachPlane(ctx->stream(), elem_cnt, y_tensor->shape().At(0) * y_tensor->shape().At(1),
+                         [&](int64_t begin, int64_t end) {
+                           UpsampleTrilinear3DForward<T>(
+                               begin, end, x_tensor->dptr<T>(), in_helper, out_helper,
+                               x_tensor->shape().At(2), x_tensor->shape().At(3),
+                               x_tensor->shape().At(4), scale_depth, scale_height, scale_width,
+                               align_corners, y_tensor->mut_dptr<T>());
+                         });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
@@ -193,10 +198,14 @@ class UpsampleTrilinearGrad3DCPUKernel final : public user_op::OpKernel {
     const T scale_height = GetAreaPixelScale(in_height, out_height, align_corners, height_scale);
     const T scale_width = GetAreaPixelScale(in_width, out_width, align_corners, width_scale);
 
-    UpsampleTrilinear3DBackward<T>(elem_cnt, dy_tensor->dptr<T>(), dy_helper, dx_helper,
-                                   dx_tensor->shape().At(2), dx_tensor->shape().At(3),
-                                   dx_tensor->shape().At(4), scale_depth, scale_height, scale_width,
-                                   align_corners, dx_tensor->mut_dptr<T>());
+    ParallelForEachPlane(
+        ctx->stream(), elem_cnt, dy_tensor->shape().At(0) * dy_tensor->shape().At(1),
+        [&](int64_t begin, int64_t end) {
+          UpsampleTrilinear3DBackward<T>(begin, end, dy_tensor->dptr<T>(), dy_helper, dx_helper,
+                                         dx_tensor->shape().At(2), dx_tensor->shape().At(3),
+                                         dx_tensor->shape().At(4), scale_depth, scale_height,
+                                         scale_width, align_corners, dx_tensor->mut_dptr<T>());
+        });
   }
   bool AlwaysComputeWhenAllOutputsEmpty() const override { return false; }
 };
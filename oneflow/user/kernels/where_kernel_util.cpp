@@ -14,6 +14,8 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/user/kernels/where_kernel_util.h"
+#include "oneflow/core/ep/cpu/cpu_stream.h"
+#include "oneflow/core/ep/cpu/cpu_device.h"
 
 namespace oneflow {
 
@@ -21,21 +23,29 @@ template<typename T, typename CondT>
 struct WhereKernelUtil<DeviceType::kCPU, T, CondT> {
   static void Where(ep::Stream* stream, const int64_t elem_cnt, const CondT* cond, const T* lhs,
                     const T* rhs, T* out) {
-    FOR_RANGE(int64_t, i, 0, elem_cnt) { out[i] = static_cast<bool>(cond[i]) ? lhs[i] : rhs[i]; }
+    stream->As<ep::CpuStream>()->ParallelFor(0, elem_cnt, [=](int64_t begin, int64_t end) {
+      FOR_RANGE(int64_t, i, begin, end) { out[i] = static_cast<bool>(cond[i]) ? lhs[i] : rhs[i]; }
+    });
   }
   static void WhereXScalar(ep::Stream* stream, const int64_t elem_cnt, const CondT* cond,
                            const T x_scalar, const T* rhs, T* out) {
-    FOR_RANGE(int64_t, i, 0, elem_cnt) { out[i] = static_cast<bool>(cond[i]) ? x_scalar : rhs[i]; }
+    stream->As<ep::CpuStream>()->ParallelFor(0, elem_cnt, [=](int64_t begin, int64_t end) {
+      FOR_RANGE(int64_t, i, begin, end) { out[i] = static_cast<bool>(cond[i]) ? x_scalar : rhs[i]; }
+    });
   }
   static void WhereYScalar(ep::Stream* stream, const int64_t elem_cnt, const CondT* cond,
                            const T* lhs, const T y_scalar, T* out) {
-    FOR_RANGE(int64_t, i, 0, elem_cnt) { out[i] = static_cast<bool>(cond[i]) ? lhs[i] : y_scalar; }
+    stream->As<ep::CpuStream>()->ParallelFor(0, elem_cnt, [=](int64_t begin, int64_t end) {
+      FOR_RANGE(int64_t, i, begin, end) { out[i] = static_cast<bool>(cond[i]) ? lhs[i] : y_scalar; }
+    });
   }
   static void WhereXYScalar(ep::Stream* stream, const int64_t elem_cnt, const CondT* cond,
                             const T x_scalar, const T y_scalar, T* out) {
-    FOR_RANGE(int64_t, i, 0, elem_cnt) {
-      out[i] = static_cast<bool>(cond[i]) ? x_scalar : y_scalar;
-    }
+    stream->As<ep::CpuStream>()->ParallelFor(0, elem_cnt, [=](int64_t begin, int64_t end) {
+      FOR_RANGE(int64_t, i, begin, end) {
+        out[i] = static_cast<bool>(cond[i]) ? x_scalar : y_scalar;
+      }
+    });
   }
 };
 
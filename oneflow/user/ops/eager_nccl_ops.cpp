@@ -95,6 +95,29 @@ namespace oneflow {
   return DeviceAndStreamInferFn<&IsAsyncLaunched>(ctx);
 }
 
+/* static */ Maybe<void> EagerNcclGatherOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
+  *ctx->OutputShape("out", 0) = ctx->Attr<Shape>("shape");
+  return Maybe<void>::Ok();
+}
+
+/*static*/ Maybe<void> EagerNcclGatherOp::InferPhysicalTensorDesc(user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> EagerNcclGatherOp::GetSbp(user_op::SbpContext* ctx) {
+  UNIMPLEMENTED_THEN_RETURN() << "consistent tensor are not supported";
+}
+
+/* static */ Maybe<void> EagerNcclGatherOp::InferDataType(user_op::InferContext* ctx) {
+  *ctx->OutputDType("out", 0) = ctx->InputDType("in", 0);
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<Symbol<Stream>> EagerNcclGatherOp::InferDeviceAndStream(
+    user_op::DeviceAndStreamInferContext* ctx) {
+  return DeviceAndStreamInferFn<&SyncLaunched>(ctx);
+}
+
 /* static */ Maybe<void> EagerNcclReduceOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
   *ctx->OutputShape("out", 0) = ctx->InputShape("in", 0);
   return Maybe<void>::Ok();
@@ -269,4 +292,27 @@ namespace oneflow {
   return DeviceAndStreamInferFn<&SyncLaunched>(ctx);
 }
 
+/* static */ Maybe<void> EagerNcclScatterOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
+  *ctx->OutputShape("out", 0) = ctx->Attr<Shape>("shape");
+  return Maybe<void>::Ok();
+}
+
+/*static*/ Maybe<void> EagerNcclScatterOp::InferPhysicalTensorDesc(user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> EagerNcclScatterOp::GetSbp(user_op::SbpContext* ctx) {
+  UNIMPLEMENTED_THEN_RETURN() << "consistent tensor are not supported";
+}
+
+/* static */ Maybe<void> EagerNcclScatterOp::InferDataType(user_op::InferContext* ctx) {
+  *ctx->OutputDType("out", 0) = ctx->InputDType("in", 0);
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<Symbol<Stream>> EagerNcclScatterOp::InferDeviceAndStream(
+    user_op::DeviceAndStreamInferContext* ctx) {
+  return DeviceAndStreamInferFn<&SyncLaunched>(ctx);
+}
+
 }  // namespace oneflow
@@ -0,0 +1,209 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/framework/op_generated.h"
+
+namespace oneflow {
+
+namespace {
+
+Maybe<void> CheckEmbeddingBagInputs(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& weight = ctx->InputTensorDesc("weight", 0);
+  const user_op::TensorDesc& indices = ctx->InputTensorDesc("indices", 0);
+  const user_op::TensorDesc& offsets = ctx->InputTensorDesc("offsets", 0);
+  CHECK_EQ_OR_RETURN(weight.shape().NumAxes(), 2) << "weight of embedding_bag must be 2-D";
+  CHECK_EQ_OR_RETURN(indices.shape().NumAxes(), 1) << "indices of embedding_bag must be 1-D";
+  CHECK_EQ_OR_RETURN(offsets.shape().NumAxes(), 1) << "offsets of embedding_bag must be 1-D";
+  const std::string& mode = ctx->Attr<std::string>("mode");
+  CHECK_OR_RETURN(mode == "sum" || mode == "mean" || mode == "max")
+      << "embedding_bag mode must be one of sum, mean or max, but got " << mode;
+  if (ctx->has_input("per_sample_weights", 0)) {
+    CHECK_EQ_OR_RETURN(mode, "sum") << "per_sample_weights is only supported for mode='sum'";
+    const user_op::TensorDesc& per_sample_weights = ctx->InputTensorDesc("per_sample_weights", 0);
+    CHECK_EQ_OR_RETURN(per_sample_weights.shape(), indices.shape());
+  }
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> CheckEmbeddingBagDataType(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& weight = ctx->InputTensorDesc("weight", 0);
+  const user_op::TensorDesc& indices = ctx->InputTensorDesc("indices", 0);
+  const user_op::TensorDesc& offsets = ctx->InputTensorDesc("offsets", 0);
+  CHECK_OR_RETURN(IsIndexDataType(indices.data_type()));
+  CHECK_EQ_OR_RETURN(offsets.data_type(), indices.data_type());
+  if (ctx->has_input("per_sample_weights", 0)) {
+    CHECK_EQ_OR_RETURN(ctx->InputTensorDesc("per_sample_weights", 0).data_type(),
+                       weight.data_type());
+  }
+  return Maybe<void>::Ok();
+}
+
+}  // namespace
+
+/*static*/ auto EmbeddingBagOp::InferLogicalTensorDesc(user_op::InferContext* ctx) -> Maybe<void> {
+  JUST(CheckEmbeddingBagInputs(ctx));
+  const user_op::TensorDesc& weight = ctx->InputTensorDesc("weight", 0);
+  const user_op::TensorDesc& offsets = ctx->InputTensorDesc("offsets", 0);
+  user_op::TensorDesc* out = ctx->OutputTensorDesc("out", 0);
+  *out->mut_shape() = Shape({offsets.shape().At(0), weight.shape().At(1)});
+  out->set_is_dynamic(offsets.is_dynamic());
+  return Maybe<void>::Ok();
+}
+/*static*/ auto EmbeddingBagOp::InferPhysicalTensorDesc(user_op::InferContext* ctx) -> Maybe<void> {
+  return EmbeddingBagOp::InferLogicalTensorDesc(ctx);
+}
+/*static*/ auto EmbeddingBagOp::ModifyInputArg(
+    const user_op::GetInputArgModifier& GetInputArgModifierFn, const user_op::UserOpConfWrapper&)
+    -> Maybe<void> {
+  user_op::InputArgModifier* indices_modifier = GetInputArgModifierFn("indices", 0);
+  CHECK_OR_RETURN(indices_modifier != nullptr);
+  indices_modifier->set_requires_grad(false);
+  user_op::InputArgModifier* offsets_modifier = GetInputArgModifierFn("offsets", 0);
+  CHECK_OR_RETURN(offsets_modifier != nullptr);
+  offsets_modifier->set_requires_grad(false);
+  return Maybe<void>::Ok();
+}
+/*static*/ auto EmbeddingBagOp::GetSbp(user_op::SbpContext* ctx) -> Maybe<void> {
+  // Bags are delimited by absolute offsets into indices, so only the embedding dimension can be
+  // split without rewriting offsets.
+  ctx->NewBuilder()
+      .Split(user_op::OpArg("weight", 0), 1)
+      .Broadcast(ctx->inputs())
+      .Split(user_op::OpArg("out", 0), 1)
+      .Build();
+  return Maybe<void>::Ok();
+}
+/*static*/ auto EmbeddingBagOp::InferDataType(user_op::InferContext* ctx) -> Maybe<void> {
+  JUST(CheckEmbeddingBagDataType(ctx));
+  *ctx->OutputDType("out", 0) = ctx->InputDType("weight", 0);
+  return Maybe<void>::Ok();
+}
+
+/*static*/ auto EmbeddingBagGradOp::InferLogicalTensorDesc(user_op::InferContext* ctx)
+    -> Maybe<void> {
+  JUST(CheckEmbeddingBagInputs(ctx));
+  const user_op::TensorDesc& weight = ctx->InputTensorDesc("weight", 0);
+  const user_op::TensorDesc& indices = ctx->InputTensorDesc("indices", 0);
+  const user_op::TensorDesc& offsets = ctx->InputTensorDesc("offsets", 0);
+  const user_op::TensorDesc& dy = ctx->InputTensorDesc("dy", 0);
+  CHECK_EQ_OR_RETURN(dy.shape(), Shape({offsets.shape().At(0), weight.shape().At(1)}));
+  user_op::TensorDesc* embedding_grad = ctx->OutputTensorDesc("embedding_grad", 0);
+  *embedding_grad->mut_shape() = Shape({indices.shape().At(0), weight.shape().At(1)});
+  embedding_grad->set_is_dynamic(indices.is_dynamic());
+  return Maybe<void>::Ok();
+}
+/*static*/ auto EmbeddingBagGradOp::InferPhysicalTensorDesc(user_op::InferContext* ctx)
+    -> Maybe<void> {
+  return EmbeddingBagGradOp::InferLogicalTensorDesc(ctx);
+}
+/*static*/ auto EmbeddingBagGradOp::GetSbp(user_op::SbpContext* ctx) -> Maybe<void> {
+  ctx->NewBuilder()
+      .Split(user_op::OpArg("dy", 0), 1)
+      .Split(user_op::OpArg("weight", 0), 1)
+      .Broadcast(user_op::OpArg("indices", 0))
+      .Broadcast(user_op::OpArg("offsets", 0))
+      .Split(user_op::OpArg("embedding_grad", 0), 1)
+      .Build();
+  return Maybe<void>::Ok();
+}
+/*static*/ auto EmbeddingBagGradOp::InferDataType(user_op::InferContext* ctx) -> Maybe<void> {
+  JUST(CheckEmbeddingBagDataType(ctx));
+  CHECK_EQ_OR_RETURN(ctx->InputDType("dy", 0), ctx->InputDType("weight", 0));
+  *ctx->OutputDType("embedding_grad", 0) = ctx->InputDType("weight", 0);
+  return Maybe<void>::Ok();
+}
+
+REGISTER_USER_OP_GRAD("embedding_bag")
+    .SetGenBackwardOpConfFn([](const user_op::UserOpWrapper& op,
+                               user_op::AddOpFn AddOp) -> Maybe<void> {
+      if (op.NeedGenGradTensor4OpInput("weight", 0)) {
+        user_op::UserOpConfWrapperBuilder grad_builder(op.op_name() + "_grad");
+        grad_builder.Op("embedding_bag_grad")
+            .Input("dy", op.GetGradTensorWithOpOutput("out", 0))
+            .Input("weight", op.input("weight", 0))
+            .Input("indices", op.input("indices", 0))
+            .Input("offsets", op.input("offsets", 0));
+        if (op.user_op_conf().has_input("per_sample_weights", 0)) {
+          grad_builder.Input("per_sample_weights", op.input("per_sample_weights", 0));
+        }
+        user_op::UserOpConfWrapper grad_op = grad_builder.Output("embedding_grad")
+                                                 .Attr("mode", op.attr<std::string>("mode"))
+                                                 .Build();
+        AddOp(grad_op);
+
+        user_op::UserOpConfWrapperBuilder weight_grad_builder(op.op_name() + "_weight_grad");
+        user_op::UserOpConfWrapper weight_grad_op =
+            weight_grad_builder.Op("unsorted_segment_sum_like")
+                .Input("data", grad_op.output("embedding_grad", 0))
+                .Input("segment_ids", op.input("indices", 0))
+                .Input("like", op.input("weight", 0))
+                .Output("out")
+                .Attr<int64_t>("axis", 0)
+                .Build();
+        op.BindGradTensorWithOpInput(weight_grad_op.output("out", 0), "weight", 0);
+        AddOp(weight_grad_op);
+      }
+      if (op.user_op_conf().has_input("per_sample_weights", 0)
+          && op.NeedGenGradTensor4OpInput("per_sample_weights", 0)) {
+        // mode "sum": the gradient of per_sample_weights[i] is the dot product of the gradient
+        // of its bag with the row weight[indices[i]] it scales
+        user_op::UserOpConfWrapperBuilder bag_grad_builder(op.op_name() + "_bag_grad");
+        user_op::UserOpConfWrapper bag_grad_op =
+            bag_grad_builder.Op("embedding_bag_grad")
+                .Input("dy", op.GetGradTensorWithOpOutput("out", 0))
+                .Input("weight", op.input("weight", 0))
+                .Input("indices", op.input("indices", 0))
+                .Input("offsets", op.input("offsets", 0))
+                .Output("embedding_grad")
+                .Attr("mode", op.attr<std::string>("mode"))
+                .Build();
+        AddOp(bag_grad_op);
+
+        user_op::UserOpConfWrapperBuilder rows_builder(op.op_name() + "_rows");
+        user_op::UserOpConfWrapper rows_op = rows_builder.Op("gather")
+                                                 .Input("in", op.input("weight", 0))
+                                                 .Input("indices", op.input("indices", 0))
+                                                 .Output("out")
+                                                 .Attr<int64_t>("axis", 0)
+                                                 .Build();
+        AddOp(rows_op);
+
+        user_op::UserOpConfWrapperBuilder product_builder(op.op_name() + "_product");
+        user_op::UserOpConfWrapper product_op =
+            product_builder.Op("broadcast_mul")
+                .Input("x", bag_grad_op.output("embedding_grad", 0))
+                .Input("y", rows_op.output("out", 0))
+                .Output("z")
+                .Build();
+        AddOp(product_op);
+
+        user_op::UserOpConfWrapperBuilder psw_grad_builder(op.op_name()
+                                                           + "_per_sample_weights_grad");
+        user_op::UserOpConfWrapper psw_grad_op =
+            psw_grad_builder.Op("reduce_sum")
+                .Input("input_tensor", product_op.output("z", 0))
+                .Output("output_tensor")
+                .Attr("axis", std::vector<int32_t>{1})
+                .Attr("keepdims", false)
+                .Build();
+        op.BindGradTensorWithOpInput(psw_grad_op.output("output_tensor", 0), "per_sample_weights",
+                                     0);
+        AddOp(psw_grad_op);
+      }
+      return Maybe<void>::Ok();
+    });
+
+}  // namespace oneflow
@@ -0,0 +1,202 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/framework/op_generated.h"
+
+namespace oneflow {
+
+namespace {
+
+Maybe<void> CheckGroupNormParamShape(const user_op::TensorDesc& x,
+                                     const user_op::TensorDesc& param) {
+  CHECK_EQ_OR_RETURN(param.shape(), Shape({x.shape().At(1)}))
+      << "the shape of the affine params should be (" << x.shape().At(1) << ",), but got "
+      << param.shape().ToString();
+  return Maybe<void>::Ok();
+}
+
+}  // namespace
+
+/* static */ Maybe<void> GroupNormOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& x = ctx->InputTensorDesc("x", 0);
+  const int32_t num_groups = ctx->Attr<int32_t>("num_groups");
+  CHECK_GE_OR_RETURN(x.shape().NumAxes(), 2);
+  CHECK_GT_OR_RETURN(num_groups, 0);
+  CHECK_EQ_OR_RETURN(x.shape().At(1) % num_groups, 0)
+      << "the number of channels " << x.shape().At(1) << " must be divisible by num_groups "
+      << num_groups;
+  if (ctx->has_input("gamma", 0)) {
+    JUST(CheckGroupNormParamShape(x, ctx->InputTensorDesc("gamma", 0)));
+  }
+  if (ctx->has_input("beta", 0)) {
+    JUST(CheckGroupNormParamShape(x, ctx->InputTensorDesc("beta", 0)));
+  }
+  user_op::TensorDesc* y = ctx->OutputTensorDesc("y", 0);
+  *y->mut_shape() = x.shape();
+  *y->mut_is_dynamic() = x.is_dynamic();
+  user_op::TensorDesc* mean = ctx->OutputTensorDesc("mean", 0);
+  *mean->mut_shape() = Shape({x.shape().At(0), num_groups});
+  *ctx->OutputTensorDesc("inv_variance", 0) = *mean;
+  return Maybe<void>::Ok();
+}
+
+/*static*/ Maybe<void> GroupNormOp::InferPhysicalTensorDesc(user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> GroupNormOp::GetSbp(user_op::SbpContext* ctx) {
+  std::vector<user_op::OpArg> split_args{user_op::OpArg("x", 0)};
+  std::vector<user_op::OpArg> broadcast_args;
+  if (ctx->user_op_conf().has_input("gamma", 0)) {
+    broadcast_args.emplace_back(user_op::OpArg("gamma", 0));
+  }
+  if (ctx->user_op_conf().has_input("beta", 0)) {
+    broadcast_args.emplace_back(user_op::OpArg("beta", 0));
+  }
+  ctx->NewBuilder().Split(split_args, 0).Split(ctx->outputs(), 0).Broadcast(broadcast_args).Build();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> GroupNormOp::InferDataType(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& x = ctx->InputTensorDesc("x", 0);
+  if (ctx->has_input("gamma", 0)) {
+    CHECK_EQ_OR_RETURN(ctx->InputTensorDesc("gamma", 0).data_type(), x.data_type());
+  }
+  if (ctx->has_input("beta", 0)) {
+    CHECK_EQ_OR_RETURN(ctx->InputTensorDesc("beta", 0).data_type(), x.data_type());
+  }
+  *ctx->OutputTensorDesc("y", 0)->mut_data_type() = x.data_type();
+  *ctx->OutputTensorDesc("mean", 0)->mut_data_type() = x.data_type();
+  *ctx->OutputTensorDesc("inv_variance", 0)->mut_data_type() = x.data_type();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> GroupNormGradOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& dy = ctx->InputTensorDesc("dy", 0);
+  const user_op::TensorDesc& x = ctx->InputTensorDesc("x", 0);
+  const user_op::TensorDesc& mean = ctx->InputTensorDesc("mean", 0);
+  CHECK_EQ_OR_RETURN(dy.shape(), x.shape());
+  CHECK_EQ_OR_RETURN(mean.shape().NumAxes(), 2);
+  CHECK_EQ_OR_RETURN(mean.shape().At(0), x.shape().At(0));
+  CHECK_EQ_OR_RETURN(ctx->InputTensorDesc("inv_variance", 0).shape(), mean.shape());
+  if (ctx->has_input("gamma", 0)) {
+    JUST(CheckGroupNormParamShape(x, ctx->InputTensorDesc("gamma", 0)));
+  }
+  user_op::TensorDesc* dx = ctx->OutputTensorDesc("dx", 0);
+  *dx->mut_shape() = dy.shape();
+  *dx->mut_is_dynamic() = dy.is_dynamic();
+  return Maybe<void>::Ok();
+}
+
+/*static*/ Maybe<void> GroupNormGradOp::InferPhysicalTensorDesc(user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> GroupNormGradOp::GetSbp(user_op::SbpContext* ctx) {
+  std::vector<user_op::OpArg> split_args{user_op::OpArg("dy", 0), user_op::OpArg("x", 0),
+                                         user_op::OpArg("mean", 0),
+                                         user_op::OpArg("inv_variance", 0)};
+  std::vector<user_op::OpArg> broadcast_args;
+  if (ctx->user_op_conf().has_input("gamma", 0)) {
+    broadcast_args.emplace_back(user_op::OpArg("gamma", 0));
+  }
+  ctx->NewBuilder().Split(split_args, 0).Split(ctx->outputs(), 0).Broadcast(broadcast_args).Build();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> GroupNormGradOp::InferDataType(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& dy = ctx->InputTensorDesc("dy", 0);
+  CHECK_EQ_OR_RETURN(ctx->InputTensorDesc("x", 0).data_type(), dy.data_type());
+  CHECK_EQ_OR_RETURN(ctx->InputTensorDesc("mean", 0).data_type(), dy.data_type());
+  CHECK_EQ_OR_RETURN(ctx->InputTensorDesc("inv_variance", 0).data_type(), dy.data_type());
+  *ctx->OutputTensorDesc("dx", 0)->mut_data_type() = dy.data_type();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> GroupNormParamGradOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& dy = ctx->InputTensorDesc("dy", 0);
+  const user_op::TensorDesc& x = ctx->InputTensorDesc("x", 0);
+  const user_op::TensorDesc& mean = ctx->InputTensorDesc("mean", 0);
+  CHECK_EQ_OR_RETURN(dy.shape(), x.shape());
+  CHECK_EQ_OR_RETURN(mean.shape().NumAxes(), 2);
+  CHECK_EQ_OR_RETURN(mean.shape().At(0), x.shape().At(0));
+  CHECK_EQ_OR_RETURN(ctx->InputTensorDesc("inv_variance", 0).shape(), mean.shape());
+  const Shape param_shape({x.shape().At(1)});
+  *ctx->OutputTensorDesc("gamma_diff", 0)->mut_shape() = param_shape;
+  *ctx->OutputTensorDesc("beta_diff", 0)->mut_shape() = param_shape;
+  return Maybe<void>::Ok();
+}
+
+/*static*/ Maybe<void> GroupNormParamGradOp::InferPhysicalTensorDesc(user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> GroupNormParamGradOp::GetSbp(user_op::SbpContext* ctx) {
+  ctx->NewBuilder().Split(ctx->inputs(), 0).PartialSum(ctx->outputs()).Build();
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> GroupNormParamGradOp::InferDataType(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& dy = ctx->InputTensorDesc("dy", 0);
+  CHECK_EQ_OR_RETURN(ctx->InputTensorDesc("x", 0).data_type(), dy.data_type());
+  *ctx->OutputTensorDesc("gamma_diff", 0)->mut_data_type() = dy.data_type();
+  *ctx->OutputTensorDesc("beta_diff", 0)->mut_data_type() = dy.data_type();
+  return Maybe<void>::Ok();
+}
+
+REGISTER_USER_OP_GRAD("group_norm")
+    .SetGenBackwardOpConfFn([](const user_op::UserOpWrapper& op,
+                               user_op::AddOpFn AddOp) -> Maybe<void> {
+      const bool has_gamma = op.user_op_conf().has_input("gamma", 0);
+      const bool has_beta = op.user_op_conf().has_input("beta", 0);
+      const bool need_gamma_diff = has_gamma && op.NeedGenGradTensor4OpInput("gamma", 0);
+      const bool need_beta_diff = has_beta && op.NeedGenGradTensor4OpInput("beta", 0);
+      if (need_gamma_diff || need_beta_diff) {
+        user_op::UserOpConfWrapperBuilder builder(op.op_name() + "_param_grad");
+        user_op::UserOpConfWrapper grad_op =
+            builder.Op("group_norm_param_grad")
+                .Input("dy", op.GetGradTensorWithOpOutput("y", 0))
+                .Input("x", op.input("x", 0))
+                .Input("mean", op.output("mean", 0))
+                .Input("inv_variance", op.output("inv_variance", 0))
+                .Output("gamma_diff")
+                .Output("beta_diff")
+                .Build();
+        if (need_gamma_diff) {
+          op.BindGradTensorWithOpInput(grad_op.output("gamma_diff", 0), "gamma", 0);
+        }
+        if (need_beta_diff) {
+          op.BindGradTensorWithOpInput(grad_op.output("beta_diff", 0), "beta", 0);
+        }
+        AddOp(grad_op);
+      }
+      if (op.NeedGenGradTensor4OpInput("x", 0)) {
+        user_op::UserOpConfWrapperBuilder builder(op.op_name() + "_grad");
+        builder.Op("group_norm_grad")
+            .Input("dy", op.GetGradTensorWithOpOutput("y", 0))
+            .Input("x", op.input("x", 0))
+            .Input("mean", op.output("mean", 0))
+            .Input("inv_variance", op.output("inv_variance", 0))
+            .Output("dx");
+        if (has_gamma) { builder.Input("gamma", op.input("gamma", 0)); }
+        user_op::UserOpConfWrapper grad_op = builder.Build();
+        op.BindGradTensorWithOpInput(grad_op.output("dx", 0), "x", 0);
+        AddOp(grad_op);
+      }
+      return Maybe<void>::Ok();
+    });
+
+}  // namespace oneflow
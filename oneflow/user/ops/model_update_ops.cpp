@@ -219,6 +219,27 @@ Maybe<void> InferAdagradUpdateDataType(user_op::InferContext* ctx) {
   return Maybe<void>::Ok();
 }
 
+Maybe<void> InferIndexedSlicesAdagradUpdateTensorDesc(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& model = ctx->InputTensorDesc("model", 0);
+  const user_op::TensorDesc& model_diff_indices = ctx->InputTensorDesc("model_diff_indices", 0);
+  const user_op::TensorDesc& model_diff_values = ctx->InputTensorDesc("model_diff_values", 0);
+  JUST(CheckIndexedSlicesModelDiffDesc(&model, &model_diff_indices, &model_diff_values));
+  const user_op::TensorDesc& sum = ctx->InputTensorDesc("sum", 0);
+  JUST(CheckShapeLike(&sum, &model));
+  JUST(CheckLearningRateShape(ctx));
+  return Maybe<void>::Ok();
+}
+Maybe<void> InferIndexedSlicesAdagradUpdateDataType(user_op::InferContext* ctx) {
+  const user_op::TensorDesc& model = ctx->InputTensorDesc("model", 0);
+  const user_op::TensorDesc& model_diff_indices = ctx->InputTensorDesc("model_diff_indices", 0);
+  const user_op::TensorDesc& model_diff_values = ctx->InputTensorDesc("model_diff_values", 0);
+  JUST(CheckIndexedSlicesModelDiffDataType(&model, &model_diff_indices, &model_diff_values));
+  const user_op::TensorDesc& sum = ctx->InputTensorDesc("sum", 0);
+  JUST(CheckDataTypeLike(&sum, &model));
+  JUST(CheckLearningRateDataType(ctx));
+  return Maybe<void>::Ok();
+}
+
 Maybe<void> InferIndexedSlicesAdamUpdateTensorDesc(user_op::InferContext* ctx) {
   const user_op::TensorDesc& model = ctx->InputTensorDesc("model", 0);
   const user_op::TensorDesc& model_diff_indices = ctx->InputTensorDesc("model_diff_indices", 0);
@@ -625,6 +646,48 @@ Maybe<void> InferLarsUpdateDataType(user_op::InferContext* ctx) {
   return InferAdagradUpdateDataType(ctx);
 }
 
+/* static */ Maybe<void> IndexedSlicesAdagradUpdateOp::InferLogicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferIndexedSlicesAdagradUpdateTensorDesc(ctx);
+}
+
+/*static*/ Maybe<void> IndexedSlicesAdagradUpdateOp::InferPhysicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> IndexedSlicesAdagradUpdateOp::GetSbp(user_op::SbpContext* ctx) {
+  const user_op::TensorDesc& model = ctx->LogicalTensorDesc4InputArgNameAndIndex("model", 0);
+  const user_op::TensorDesc& model_diff_indices =
+      ctx->LogicalTensorDesc4InputArgNameAndIndex("model_diff_indices", 0);
+  ctx->NewBuilder()
+      .Broadcast(user_op::OpArg("learning_rate", 0))
+      .Broadcast(user_op::OpArg("model_diff_indices", 0))
+      .Broadcast(user_op::OpArg("model_diff_values", 0))
+      .Split(user_op::OpArg("model", 0), 0)
+      .Split(user_op::OpArg("sum", 0), 0)
+      .Build();
+  FOR_RANGE(int64_t, i, 1, model.shape().NumAxes()) {
+    ctx->NewBuilder()
+        .Broadcast(user_op::OpArg("learning_rate", 0))
+        .Broadcast(user_op::OpArg("model_diff_indices", 0))
+        .Split(user_op::OpArg("model_diff_values", 0), model_diff_indices.shape().NumAxes() + i - 1)
+        .Split(user_op::OpArg("model", 0), i)
+        .Split(user_op::OpArg("sum", 0), i)
+        .Build();
+  }
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> IndexedSlicesAdagradUpdateOp::ModifyInputArg(
+    const GetInputArgModifier& GetInputArgModifierFn, const user_op::UserOpConfWrapper& conf) {
+  return AdagradInputArgModifyFn(GetInputArgModifierFn, conf);
+}
+
+/* static */ Maybe<void> IndexedSlicesAdagradUpdateOp::InferDataType(user_op::InferContext* ctx) {
+  return InferIndexedSlicesAdagradUpdateDataType(ctx);
+}
+
 /* static */ Maybe<void> IndexedSlicesAdamUpdateOp::InferLogicalTensorDesc(
     user_op::InferContext* ctx) {
   return InferIndexedSlicesAdamUpdateTensorDesc(ctx);
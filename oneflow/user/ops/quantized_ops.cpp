@@ -0,0 +1,163 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/framework/op_generated.h"
+
+namespace oneflow {
+
+namespace {
+
+// weight: (out_features, ...) int8, weight_scale: (out_features,) per output channel scales of the
+// symmetric weights, bias: optional (out_features,).
+Maybe<void> CheckQuantizedWeight(user_op::InferContext* ctx) {
+  const int64_t out_features = ctx->InputShape("weight", 0).At(0);
+  CHECK_EQ_OR_RETURN(ctx->InputShape("weight_scale", 0).elem_cnt(), out_features)
+      << "weight_scale should have one scale per output channel";
+  if (ctx->has_input("bias", 0)) {
+    const Shape& bias_shape = ctx->InputShape("bias", 0);
+    CHECK_EQ_OR_RETURN(bias_shape.NumAxes(), 1);
+    CHECK_EQ_OR_RETURN(bias_shape.At(0), out_features);
+  }
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> InferQuantizedDataType(user_op::InferContext* ctx) {
+  CHECK_EQ_OR_RETURN(ctx->InputDType("x", 0), DataType::kFloat)
+      << "quantized ops only support float32 input";
+  CHECK_EQ_OR_RETURN(ctx->InputDType("weight", 0), DataType::kInt8)
+      << "quantized ops only support int8 weight";
+  CHECK_EQ_OR_RETURN(ctx->InputDType("weight_scale", 0), DataType::kFloat);
+  if (ctx->has_input("bias", 0)) {
+    CHECK_EQ_OR_RETURN(ctx->InputDType("bias", 0), DataType::kFloat);
+  }
+  *ctx->OutputDType("out", 0) = DataType::kFloat;
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> CheckQuantizedAttr(const user_op::UserOpConfWrapper& op_conf) {
+  CHECK_GT_OR_RETURN(op_conf.attr<float>("input_scale"), 0.f);
+  const int32_t input_zero_point = op_conf.attr<int32_t>("input_zero_point");
+  CHECK_OR_RETURN(input_zero_point >= 0 && input_zero_point <= 255)
+      << "input_zero_point of the uint8 input should be in [0, 255], but got " << input_zero_point;
+  const std::string& activation = op_conf.attr<std::string>("activation");
+  CHECK_OR_RETURN(activation == "none" || activation == "relu")
+      << "activation should be \"none\" or \"relu\", but got " << activation;
+  return Maybe<void>::Ok();
+}
+
+// Splitting the weight along output channels splits out along `out_channel_axis`.
+Maybe<void> GetQuantizedSbp(user_op::SbpContext* ctx, int64_t out_channel_axis) {
+  std::vector<user_op::OpArg> weight_args{user_op::OpArg("weight", 0),
+                                          user_op::OpArg("weight_scale", 0)};
+  if (ctx->user_op_conf().has_input("bias", 0)) { weight_args.emplace_back("bias", 0); }
+  ctx->NewBuilder()
+      .Split(user_op::OpArg("x", 0), 0)
+      .Broadcast(weight_args)
+      .Split(user_op::OpArg("out", 0), 0)
+      .Build();
+  ctx->NewBuilder()
+      .Broadcast(user_op::OpArg("x", 0))
+      .Split(weight_args, 0)
+      .Split(user_op::OpArg("out", 0), out_channel_axis)
+      .Build();
+  return Maybe<void>::Ok();
+}
+
+}  // namespace
+
+/* static */ Maybe<void> QuantizedLinearOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
+  const Shape& x_shape = ctx->InputShape("x", 0);
+  const Shape& weight_shape = ctx->InputShape("weight", 0);
+  CHECK_GE_OR_RETURN(x_shape.NumAxes(), 2);
+  CHECK_EQ_OR_RETURN(weight_shape.NumAxes(), 2);
+  CHECK_EQ_OR_RETURN(x_shape.At(x_shape.NumAxes() - 1), weight_shape.At(1))
+      << "in_features of x " << x_shape.ToString() << " and weight " << weight_shape.ToString()
+      << " mismatch";
+  JUST(CheckQuantizedWeight(ctx));
+  DimVector out_dims = x_shape.dim_vec();
+  out_dims.back() = weight_shape.At(0);
+  *ctx->OutputShape("out", 0) = Shape(out_dims);
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> QuantizedLinearOp::InferPhysicalTensorDesc(user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> QuantizedLinearOp::GetSbp(user_op::SbpContext* ctx) {
+  const int64_t num_axes = ctx->LogicalTensorDesc4InputArgNameAndIndex("x", 0).shape().NumAxes();
+  return GetQuantizedSbp(ctx, num_axes - 1);
+}
+
+/* static */ Maybe<void> QuantizedLinearOp::InferDataType(user_op::InferContext* ctx) {
+  return InferQuantizedDataType(ctx);
+}
+
+/* static */ Maybe<void> QuantizedLinearOp::CheckAttr(const user_op::UserOpDefWrapper&,
+                                                      const user_op::UserOpConfWrapper& op_conf) {
+  return CheckQuantizedAttr(op_conf);
+}
+
+/* static */ Maybe<void> QuantizedConv2DOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
+  const Shape& x_shape = ctx->InputShape("x", 0);
+  const Shape& weight_shape = ctx->InputShape("weight", 0);
+  const auto& padding_before = ctx->Attr<std::vector<int32_t>>("padding_before");
+  const auto& strides = ctx->Attr<std::vector<int32_t>>("strides");
+  const auto& dilation_rate = ctx->Attr<std::vector<int32_t>>("dilation_rate");
+  const int32_t groups = ctx->Attr<int32_t>("groups");
+  CHECK_EQ_OR_RETURN(x_shape.NumAxes(), 4) << "quantized_conv2d only supports NCHW input";
+  CHECK_EQ_OR_RETURN(weight_shape.NumAxes(), 4);
+  CHECK_GT_OR_RETURN(groups, 0);
+  CHECK_EQ_OR_RETURN(x_shape.At(1) % groups, 0);
+  CHECK_EQ_OR_RETURN(weight_shape.At(0) % groups, 0);
+  CHECK_EQ_OR_RETURN(weight_shape.At(1), x_shape.At(1) / groups)
+      << "in_channels of x " << x_shape.ToString() << " and weight " << weight_shape.ToString()
+      << " mismatch";
+  JUST(CheckQuantizedWeight(ctx));
+  DimVector out_dims{x_shape.At(0), weight_shape.At(0), 0, 0};
+  for (int i = 0; i < 2; ++i) {
+    const int64_t effective_kernel = dilation_rate.at(i) * (weight_shape.At(2 + i) - 1) + 1;
+    const int64_t padded = x_shape.At(2 + i) + 2 * padding_before.at(i);
+    CHECK_GE_OR_RETURN(padded, effective_kernel)
+        << "kernel size can't be greater than the padded input size";
+    out_dims.at(2 + i) = (padded - effective_kernel) / strides.at(i) + 1;
+  }
+  *ctx->OutputShape("out", 0) = Shape(out_dims);
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> QuantizedConv2DOp::InferPhysicalTensorDesc(user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> QuantizedConv2DOp::GetSbp(user_op::SbpContext* ctx) {
+  return GetQuantizedSbp(ctx, 1);
+}
+
+/* static */ Maybe<void> QuantizedConv2DOp::InferDataType(user_op::InferContext* ctx) {
+  return InferQuantizedDataType(ctx);
+}
+
+/* static */ Maybe<void> QuantizedConv2DOp::CheckAttr(const user_op::UserOpDefWrapper&,
+                                                      const user_op::UserOpConfWrapper& op_conf) {
+  for (const char* name : {"padding_before", "strides", "dilation_rate"}) {
+    const auto& value = op_conf.attr<std::vector<int32_t>>(name);
+    CHECK_EQ_OR_RETURN(value.size(), 2) << name << " of quantized_conv2d should have 2 elements";
+  }
+  return CheckQuantizedAttr(op_conf);
+}
+
+}  // namespace oneflow
@@ -0,0 +1,206 @@
+/*
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+#include "oneflow/core/framework/framework.h"
+#include "oneflow/core/framework/op_generated.h"
+
+namespace oneflow {
+
+namespace {
+
+// query: (*, Lq, D), key: (*, Lk, D), value: (*, Lk, Dv), attn_mask: broadcastable to (*, Lq, Lk)
+// with the same number of axes as query.
+Maybe<void> CheckAttentionInputs(user_op::InferContext* ctx) {
+  const Shape& query_shape = ctx->InputShape("query", 0);
+  const Shape& key_shape = ctx->InputShape("key", 0);
+  const Shape& value_shape = ctx->InputShape("value", 0);
+  const int64_t num_axes = query_shape.NumAxes();
+  CHECK_GE_OR_RETURN(num_axes, 3) << "query should have at least 3 axes, but got "
+                                  << query_shape.ToString();
+  CHECK_EQ_OR_RETURN(key_shape.NumAxes(), num_axes);
+  CHECK_EQ_OR_RETURN(value_shape.NumAxes(), num_axes);
+  for (int64_t i = 0; i < num_axes - 2; ++i) {
+    CHECK_EQ_OR_RETURN(key_shape.At(i), query_shape.At(i))
+        << "batch dims of query " << query_shape.ToString() << " and key " << key_shape.ToString()
+        << " mismatch";
+    CHECK_EQ_OR_RETURN(value_shape.At(i), query_shape.At(i))
+        << "batch dims of query " << query_shape.ToString() << " and value "
+        << value_shape.ToString() << " mismatch";
+  }
+  CHECK_EQ_OR_RETURN(key_shape.At(num_axes - 1), query_shape.At(num_axes - 1))
+      << "query and key should have the same embedding size";
+  CHECK_EQ_OR_RETURN(value_shape.At(num_axes - 2), key_shape.At(num_axes - 2))
+      << "key and value should have the same sequence length";
+  if (ctx->has_input("attn_mask", 0)) {
+    const Shape& mask_shape = ctx->InputShape("attn_mask", 0);
+    CHECK_EQ_OR_RETURN(mask_shape.NumAxes(), num_axes);
+    for (int64_t i = 0; i < num_axes; ++i) {
+      const int64_t expected = i == num_axes - 1 ? key_shape.At(i) : query_shape.At(i);
+      CHECK_OR_RETURN(mask_shape.At(i) == 1 || mask_shape.At(i) == expected)
+          << "attn_mask of shape " << mask_shape.ToString()
+          << " can not be broadcast to the attention weights of query " << query_shape.ToString()
+          << " and key " << key_shape.ToString();
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> CheckAttentionDataType(user_op::InferContext* ctx) {
+  const DataType data_type = ctx->InputDType("query", 0);
+  CHECK_EQ_OR_RETURN(ctx->InputDType("key", 0), data_type);
+  CHECK_EQ_OR_RETURN(ctx->InputDType("value", 0), data_type);
+  if (ctx->has_input("attn_mask", 0)) {
+    CHECK_EQ_OR_RETURN(ctx->InputDType("attn_mask", 0), data_type)
+        << "attn_mask should be an additive mask with the same data type as query";
+  }
+  return Maybe<void>::Ok();
+}
+
+// Every batch axis may be split. attn_mask follows the split when it is not broadcast along that
+// axis, and rng_seed, which only ties a forward op to its grad op, is broadcast.
+Maybe<void> GetAttentionSbp(user_op::SbpContext* ctx, const std::vector<std::string>& split_args) {
+  const Shape& query_shape = ctx->LogicalTensorDesc4InputArgNameAndIndex("query", 0).shape();
+  const bool has_mask = ctx->user_op_conf().has_input("attn_mask", 0);
+  for (int64_t i = 0; i < query_shape.NumAxes() - 2; ++i) {
+    std::vector<user_op::OpArg> split;
+    std::vector<user_op::OpArg> broadcast;
+    for (const auto& name : split_args) { split.emplace_back(std::string(name), 0); }
+    if (has_mask) {
+      const Shape& mask_shape = ctx->LogicalTensorDesc4InputArgNameAndIndex("attn_mask", 0).shape();
+      if (mask_shape.At(i) == 1) {
+        broadcast.emplace_back("attn_mask", 0);
+      } else {
+        split.emplace_back("attn_mask", 0);
+      }
+    }
+    if (ctx->user_op_conf().has_input("rng_seed", 0)) { broadcast.emplace_back("rng_seed", 0); }
+    auto builder = ctx->NewBuilder().Split(split, i).Broadcast(broadcast);
+    if (ctx->user_op_conf().has_output("rng_seed", 0)) {
+      std::vector<user_op::OpArg> outputs{user_op::OpArg("out", 0),
+                                          user_op::OpArg("softmax_lse", 0)};
+      builder.Split(outputs, i).Broadcast(user_op::OpArg("rng_seed", 0));
+    } else {
+      builder.Split(ctx->outputs(), i);
+    }
+    builder.Build();
+  }
+  return Maybe<void>::Ok();
+}
+
+}  // namespace
+
+/* static */ Maybe<void> ScaledDotProductAttentionOp::InferLogicalTensorDesc(
+    user_op::InferContext* ctx) {
+  JUST(CheckAttentionInputs(ctx));
+  const Shape& query_shape = ctx->InputShape("query", 0);
+  const Shape& value_shape = ctx->InputShape("value", 0);
+  const int64_t num_axes = query_shape.NumAxes();
+  DimVector out_dims = query_shape.dim_vec();
+  out_dims[num_axes - 1] = value_shape.At(num_axes - 1);
+  *ctx->OutputShape("out", 0) = Shape(out_dims);
+  *ctx->OutputShape("softmax_lse", 0) =
+      Shape(DimVector(query_shape.dim_vec().begin(), query_shape.dim_vec().end() - 1));
+  *ctx->OutputShape("rng_seed", 0) = Shape({1});
+  return Maybe<void>::Ok();
+}
+
+/*static*/ Maybe<void> ScaledDotProductAttentionOp::InferPhysicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> ScaledDotProductAttentionOp::GetSbp(user_op::SbpContext* ctx) {
+  return GetAttentionSbp(ctx, {"query", "key", "value"});
+}
+
+/* static */ Maybe<void> ScaledDotProductAttentionOp::InferDataType(user_op::InferContext* ctx) {
+  JUST(CheckAttentionDataType(ctx));
+  const DataType data_type = ctx->InputDType("query", 0);
+  *ctx->OutputDType("out", 0) = data_type;
+  *ctx->OutputDType("softmax_lse", 0) = data_type;
+  *ctx->OutputDType("rng_seed", 0) = DataType::kInt64;
+  return Maybe<void>::Ok();
+}
+
+/* static */ Maybe<void> ScaledDotProductAttentionGradOp::InferLogicalTensorDesc(
+    user_op::InferContext* ctx) {
+  JUST(CheckAttentionInputs(ctx));
+  CHECK_EQ_OR_RETURN(ctx->InputShape("out_grad", 0), ctx->InputShape("out", 0));
+  *ctx->OutputShape("query_grad", 0) = ctx->InputShape("query", 0);
+  *ctx->OutputShape("key_grad", 0) = ctx->InputShape("key", 0);
+  *ctx->OutputShape("value_grad", 0) = ctx->InputShape("value", 0);
+  return Maybe<void>::Ok();
+}
+
+/*static*/ Maybe<void> ScaledDotProductAttentionGradOp::InferPhysicalTensorDesc(
+    user_op::InferContext* ctx) {
+  return InferLogicalTensorDesc(ctx);
+}
+
+/* static */ Maybe<void> ScaledDotProductAttentionGradOp::GetSbp(user_op::SbpContext* ctx) {
+  return GetAttentionSbp(ctx, {"out_grad", "query", "key", "value", "out", "softmax_lse"});
+}
+
+/* static */ Maybe<void> ScaledDotProductAttentionGradOp::InferDataType(
+    user_op::InferContext* ctx) {
+  JUST(CheckAttentionDataType(ctx));
+  const DataType data_type = ctx->InputDType("query", 0);
+  CHECK_EQ_OR_RETURN(ctx->InputDType("out_grad", 0), data_type);
+  CHECK_EQ_OR_RETURN(ctx->InputDType("rng_seed", 0), DataType::kInt64);
+  *ctx->OutputDType("query_grad", 0) = data_type;
+  *ctx->OutputDType("key_grad", 0) = data_type;
+  *ctx->OutputDType("value_grad", 0) = data_type;
+  return Maybe<void>::Ok();
+}
+
+REGISTER_USER_OP_GRAD("scaled_dot_product_attention")
+    .SetGenBackwardOpConfFn([](const user_op::UserOpWrapper& op,
+                               user_op::AddOpFn AddOp) -> Maybe<void> {
+      if (op.NeedGenGradTensor4OpInput("query", 0) || op.NeedGenGradTensor4OpInput("key", 0)
+          || op.NeedGenGradTensor4OpInput("value", 0)) {
+        user_op::UserOpConfWrapperBuilder builder(op.op_name() + "_grad");
+        builder.Op("scaled_dot_product_attention_grad")
+            .Input("out_grad", op.GetGradTensorWithOpOutput("out", 0))
+            .Input("query", op.input("query", 0))
+            .Input("key", op.input("key", 0))
+            .Input("value", op.input("value", 0))
+            .Input("out", op.output("out", 0))
+            .Input("softmax_lse", op.output("softmax_lse", 0))
+            .Input("rng_seed", op.output("rng_seed", 0))
+            .Output("query_grad")
+            .Output("key_grad")
+            .Output("value_grad")
+            .Attr("scale", op.attr<double>("scale"))
+            .Attr("dropout_rate", op.attr<float>("dropout_rate"))
+            .Attr("is_causal", op.attr<bool>("is_causal"));
+        if (op.user_op_conf().has_input("attn_mask", 0)) {
+          builder.Input("attn_mask", op.input("attn_mask", 0));
+        }
+        user_op::UserOpConfWrapper grad_op = builder.Build();
+        if (op.NeedGenGradTensor4OpInput("query", 0)) {
+          op.BindGradTensorWithOpInput(grad_op.output("query_grad", 0), "query", 0);
+        }
+        if (op.NeedGenGradTensor4OpInput("key", 0)) {
+          op.BindGradTensorWithOpInput(grad_op.output("key_grad", 0), "key", 0);
+        }
+        if (op.NeedGenGradTensor4OpInput("value", 0)) {
+          op.BindGradTensorWithOpInput(grad_op.output("value_grad", 0), "value", 0);
+        }
+        AddOp(grad_op);
+      }
+      return Maybe<void>::Ok();
+    });
+
+}  // namespace oneflow
@@ -74,9 +74,16 @@ namespace oneflow {
   user_op::TensorDesc* y_desc = ctx->OutputTensorDesc("y", 0);
   const float height_scale = ctx->Attr<float>("height_scale");
   const float width_scale = ctx->Attr<float>("width_scale");
-  CHECK_OR_RETURN(ctx->Attr<std::string>("data_format") == "channels_first"
+  const std::string& data_format = ctx->Attr<std::string>("data_format");
+  CHECK_OR_RETURN((data_format == "channels_first" || data_format == "channels_last")
                   && x_desc.shape().NumAxes() == 4)
-      << "upsample_nearest_2d only supports NCHW";
+      << "upsample_nearest_2d only supports NCHW and NHWC";
+  if (data_format == "channels_last") {
+    *y_desc->mut_shape() =
+        Shape({x_desc.shape().At(0), static_cast<int32_t>(height_scale * x_desc.shape().At(1)),
+               static_cast<int32_t>(width_scale * x_desc.shape().At(2)), x_desc.shape().At(3)});
+    return Maybe<void>::Ok();
+  }
   *y_desc->mut_shape() = Shape({x_desc.shape().At(0), x_desc.shape().At(1),
                                 static_cast<int32_t>(height_scale * x_desc.shape().At(2)),
                                 static_cast<int32_t>(width_scale * x_desc.shape().At(3))});
@@ -99,9 +106,16 @@ namespace oneflow {
   user_op::TensorDesc* y_desc = ctx->OutputTensorDesc("y", 0);
   const float height_scale = ctx->Attr<float>("height_scale");
   const float width_scale = ctx->Attr<float>("width_scale");
-  CHECK_OR_RETURN(ctx->Attr<std::string>("data_format") == "channels_first"
+  const std::string& data_format = ctx->Attr<std::string>("data_format");
+  CHECK_OR_RETURN((data_format == "channels_first" || data_format == "channels_last")
                   && x_desc.shape().NumAxes() == 4)
-      << "upsample_bilinear_2d only supports NCHW";
+      << "upsample_bilinear_2d only supports NCHW and NHWC";
+  if (data_format == "channels_last") {
+    *y_desc->mut_shape() =
+        Shape({x_desc.shape().At(0), static_cast<int32_t>(height_scale * x_desc.shape().At(1)),
+               static_cast<int32_t>(width_scale * x_desc.shape().At(2)), x_desc.shape().At(3)});
+    return Maybe<void>::Ok();
+  }
   *y_desc->mut_shape() = Shape({x_desc.shape().At(0), x_desc.shape().At(1),
                                 static_cast<int32_t>(height_scale * x_desc.shape().At(2)),
                                 static_cast<int32_t>(width_scale * x_desc.shape().At(3))});
@@ -281,9 +295,10 @@ namespace oneflow {
 /*static*/ Maybe<void> UpsampleNearest2DGradOp::InferLogicalTensorDesc(user_op::InferContext* ctx) {
   const Shape& dy_shape = ctx->InputShape("dy", 0);
   Shape* dx_shape = ctx->OutputShape("dx", 0);
-  CHECK_OR_RETURN(ctx->Attr<std::string>("data_format") == "channels_first"
+  const std::string& data_format = ctx->Attr<std::string>("data_format");
+  CHECK_OR_RETURN((data_format == "channels_first" || data_format == "channels_last")
                   && dy_shape.NumAxes() == 4)
-      << "upsample_nearest_2d_grad only supports NCHW";
+      << "upsample_nearest_2d_grad only supports NCHW and NHWC";
   *dx_shape = ctx->InputShape("x", 0);
   return Maybe<void>::Ok();
 }
@@ -308,9 +323,10 @@ namespace oneflow {
     user_op::InferContext* ctx) {
   const Shape& dy_shape = ctx->InputShape("dy", 0);
   Shape* dx_shape = ctx->OutputShape("dx", 0);
-  CHECK_OR_RETURN(ctx->Attr<std::string>("data_format") == "channels_first"
+  const std::string& data_format = ctx->Attr<std::string>("data_format");
+  CHECK_OR_RETURN((data_format == "channels_first" || data_format == "channels_last")
                   && dy_shape.NumAxes() == 4)
-      << "upsample_bilinear_2d_grad only supports NCHW";
+      << "upsample_bilinear_2d_grad only supports NCHW and NHWC";
   *dx_shape = ctx->InputShape("x", 0);
   return Maybe<void>::Ok();
 }
@@ -18,6 +18,11 @@ import os
 import sys
 import collections
 
+if os.getenv("ONEFLOW_IMPORT_PROFILE"):
+    import oneflow.framework.import_profile as _import_profile
+
+    _import_profile.start()
+
 import oneflow._oneflow_internal
 
 oneflow._oneflow_internal.InitNumpyCAPI()
@@ -191,11 +196,19 @@ from oneflow._C import less_equal as le
 from oneflow._C import isnan
 from oneflow._C import isinf
 from oneflow._oneflow_internal import _set_num_threads as set_num_threads
+from oneflow._oneflow_internal import _get_num_threads as get_num_threads
 
 from . import sbp
 
 sbp.sbp.__call__ = lambda self: self
 
+from oneflow.framework.memory_format import (
+    memory_format,
+    contiguous_format,
+    channels_last,
+    preserve_format,
+)
+
 import atexit
 
 import oneflow.framework.c_api_util
@@ -210,11 +223,14 @@ import oneflow.framework.scope_util as scope_util
 import oneflow.framework.session_context as session_ctx
 from oneflow.framework.tensor_str import set_printoptions
 
-__oneflow_global_unique_env = env_util.GetEnv()
-session_ctx.NewDefaultSession(__oneflow_global_unique_env)
+# With ONEFLOW_LAZY_INIT the env and default session are created on first use, which
+# keeps `import oneflow` cheap for processes that never run a tensor op.
+if env_util.LazyInitEnabled():
+    oneflow._oneflow_internal.SetEnvInitializer(env_util.InitDefaultEnv)
+else:
+    env_util.InitDefaultEnv()
 
 oneflow._oneflow_internal.RegisterGILForeignLockHelper()
-oneflow._oneflow_internal.InitDefaultConsistentTransportTokenScope()
 
 oneflow._oneflow_internal.EnableEagerEnvironment(True)
 from oneflow.framework import python_callback, register_python_callback
@@ -256,8 +272,13 @@ hook = ExitHook()
 
 
 def atexit_hook(hook):
+    env = env_util.GetDefaultEnv()
+    if env is None:
+        # Never used, make sure nothing creates the env during interpreter teardown.
+        oneflow._oneflow_internal.SetEnvInitializer(None)
+        return
     oneflow.framework.session_context.TryCloseDefaultSession()
-    __oneflow_global_unique_env.switch_to_shutting_down(hook.is_normal_exit())
+    env.switch_to_shutting_down(hook.is_normal_exit())
 
 
 atexit.register(atexit_hook, hook)
@@ -272,6 +293,7 @@ from oneflow._C import tensor, batch_gather
 from oneflow._C import from_numpy
 
 from oneflow.autograd import grad_enable, no_grad, inference_mode, is_grad_enabled
+from oneflow.amp import autocast
 import oneflow.nn.image
 
 from oneflow.framework.check_point_v2 import load
@@ -387,19 +409,57 @@ from . import (
     linalg,
     optim,
     comm,
-    boxing,
     backends,
     amp,
 )
 import oneflow.utils.data
 import oneflow.comm
-import oneflow.framework.docstr as docstr
 import oneflow.cuda
+import oneflow.cpu
 import oneflow.multiprocessing
-import oneflow.one_embedding
+
+import oneflow.framework.docstr as docstr
+
+# Rarely used subpackages are imported on first attribute access, see `__getattr__`.
+_LAZY_SUBMODULES = {
+    "benchmark": "oneflow.benchmark",
+    "boxing": "oneflow.boxing",
+    "one_embedding": "oneflow.one_embedding",
+    "profiler": "oneflow.profiler",
+    "quantization": "oneflow.quantization",
+}
+
+if sys.version_info < (3, 7):
+    # module level __getattr__ (PEP 562) needs python 3.7
+    import oneflow.benchmark as benchmark
+    import oneflow.boxing as boxing
+    import oneflow.one_embedding as one_embedding
+    import oneflow.profiler as profiler
+    import oneflow.quantization as quantization
+
+
+def __getattr__(name):
+    module_name = _LAZY_SUBMODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'oneflow' has no attribute '{name}'")
+    import importlib
+
+    module = importlib.import_module(module_name)
+    globals()[name] = module
+    if "_import_profile" in globals():
+        _import_profile.report(f"oneflow.{name} import profile")
+    return module
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_SUBMODULES))
+
 
 if oneflow._oneflow_internal.flags.with_mlir():
     oneflow_internal_path = oneflow._oneflow_internal.__file__
     if os.getenv("ONEFLOW_MLIR_ENABLE_CODEGEN_FUSERS"):
         print("MLIR JIT engine will load:", oneflow_internal_path, file=sys.stderr)
         oneflow._oneflow_internal.ir.load_jit_shared_lib(oneflow_internal_path)
+
+if "_import_profile" in globals():
+    _import_profile.report("oneflow import profile")
@@ -13,5 +13,6 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+from .autocast_mode import autocast, is_autocast_enabled
 from .grad_scaler import GradScaler
 from .grad_scaler import StaticGradScaler
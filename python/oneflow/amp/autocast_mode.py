@@ -0,0 +1,118 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import functools
+import warnings
+
+import oneflow as flow
+import oneflow._oneflow_internal.autocast as _autocast
+
+
+class autocast(object):
+    r"""
+    Context-manager that runs the eager ops in its region in mixed precision.
+
+    Inside an autocast region the floating inputs of user ops running on ``device_type`` are
+    casted automatically, following the same op lists as the ``auto_mixed_precision`` pass of
+    ``nn.Graph``: white list ops such as ``matmul`` and ``conv2d`` run in ``dtype``, gray list
+    ops such as ``softmax`` run in the widest dtype of their inputs, black list ops run in float32
+    and the other ops are not changed.
+
+    Autocast should only wrap the forward pass and the loss computation, the backward ops run in
+    the dtype chosen for their forward ops. It is thread local and also functions as a decorator.
+
+    Args:
+        device_type (str): ``"cuda"`` or ``"cpu"``.
+        dtype (oneflow.dtype, optional): the low precision dtype. Default: ``oneflow.float16``
+            for ``"cuda"`` and ``oneflow.bfloat16`` for ``"cpu"``.
+        enabled (bool, optional): whether autocast is enabled in the region. Default: ``True``
+        cache_enabled (bool, optional): whether the casted weights are cached inside the region.
+            Default: ``True``
+
+    .. note::
+        The CPU kernels of this build do not support low precision compute, so autocast is
+        disabled with a warning when ``device_type`` is ``"cpu"``.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> model = flow.nn.Linear(4, 4).to("cuda")  # doctest: +SKIP
+        >>> with flow.autocast("cuda"):  # doctest: +SKIP
+        ...     y = model(flow.randn(2, 4, device="cuda"))
+        >>> y.dtype  # doctest: +SKIP
+        oneflow.float16
+
+    """
+
+    def __init__(self, device_type, dtype=None, enabled=True, cache_enabled=True):
+        if device_type not in ("cuda", "cpu"):
+            raise ValueError(
+                "autocast expects device_type to be 'cuda' or 'cpu', but got {}".format(
+                    device_type
+                )
+            )
+        if dtype is None:
+            dtype = flow.float16 if device_type == "cuda" else flow.bfloat16
+        if enabled and device_type == "cpu":
+            warnings.warn(
+                "CPU autocast is not supported in this build since the CPU kernels have no "
+                "low precision implementation, autocast will be disabled."
+            )
+            enabled = False
+        if enabled and dtype not in (flow.float16, flow.bfloat16):
+            raise ValueError(
+                "autocast only supports oneflow.float16 and oneflow.bfloat16, but got {}".format(
+                    dtype
+                )
+            )
+        self.device_type = device_type
+        self.fast_dtype = dtype
+        self._enabled = enabled
+        self._cache_enabled = cache_enabled
+
+    def __enter__(self):
+        self.prev = _autocast.is_enabled()
+        self.prev_device_type = _autocast.get_autocast_device_type()
+        self.prev_fast_dtype = _autocast.get_autocast_dtype()
+        self.prev_cache_enabled = _autocast.is_autocast_cache_enabled()
+        _autocast.set_enabled(self._enabled)
+        _autocast.set_autocast_device_type(self.device_type)
+        _autocast.set_autocast_dtype(self.fast_dtype)
+        _autocast.set_autocast_cache_enabled(self._cache_enabled)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # The weight cache only lives as long as the outermost autocast region.
+        if not self.prev:
+            _autocast.clear_cache()
+        _autocast.set_enabled(self.prev)
+        _autocast.set_autocast_device_type(self.prev_device_type)
+        _autocast.set_autocast_dtype(self.prev_fast_dtype)
+        _autocast.set_autocast_cache_enabled(self.prev_cache_enabled)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self:
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def is_autocast_enabled():
+    return _autocast.is_enabled()
@@ -15,13 +15,62 @@ limitations under the License.
 """
 
 
+from enum import Enum
+
+import oneflow as flow
+
+
+class _OptState(Enum):
+    READY = 0
+    UNSCALED = 1
+    STEPPED = 2
+
+
+def _refresh_per_optimizer_state():
+    return {"stage": _OptState.READY, "found_inf": None}
+
+
 class GradScaler(object):
+    r"""
+    Dynamic loss scaler for mixed precision training.
+
+    In ``nn.Graph`` the scaler is translated to the dynamic loss scale policy of the job. In
+    eager mode it is used like this:
+
+    .. code-block:: python
+
+        scaler = flow.amp.GradScaler()
+        for x, y in data:
+            with flow.autocast("cuda"):
+                loss = loss_fn(model(x), y)
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
+            optimizer.zero_grad()
+
+    The inf/nan check of all the gradients is a single fused ``multi_count_not_finite`` op and the
+    scale is updated on device by ``dynamic_loss_scale_schedule``, so ``scale``, ``unscale_`` and
+    ``update`` never wait for the device. ``step`` reads the check result once to decide whether
+    the optimizer runs, because the eager optimizers keep their step counters on the host.
+
+    Args:
+        init_scale (float, optional): the initial scale factor. Default: ``2.0 ** 16``
+        growth_factor (float, optional): the factor the scale is multiplied by after
+            ``growth_interval`` consecutive steps without inf/nan gradients. Default: ``2.0``
+        backoff_factor (float, optional): the factor the scale is multiplied by on inf/nan
+            gradients, only ``1.0 / growth_factor`` is supported. Default: ``0.5``
+        growth_interval (int, optional): Default: ``2000``
+        enabled (bool, optional): if ``False``, ``scale``, ``unscale_`` and ``update`` do nothing
+            and ``step`` simply calls ``optimizer.step()``. Default: ``True``
+    """
+
     def __init__(
         self,
         init_scale=2.0 ** 16,
         growth_factor=2.0,
         backoff_factor=0.5,
         growth_interval=2000,
+        enabled=True,
     ):
         self._init_scale = init_scale
         self._growth_factor = growth_factor
@@ -32,6 +81,182 @@ class GradScaler(object):
                 "got {}".format(backoff_factor)
             )
         self._growth_interval = growth_interval
+        self._enabled = enabled
+        self._init_growth_tracker = 0
+        self._scale = None
+        self._growth_tracker = None
+        self._per_optimizer_states = dict()
+
+    def _lazy_init_scale_growth_tracker(self, device):
+        self._scale = flow.full(
+            (1,), self._init_scale, dtype=flow.float32, device=device
+        )
+        self._growth_tracker = flow.full(
+            (1,), self._init_growth_tracker, dtype=flow.int64, device=device
+        )
+
+    def _get_optimizer_state(self, optimizer):
+        key = id(optimizer)
+        if key not in self._per_optimizer_states:
+            self._per_optimizer_states[key] = _refresh_per_optimizer_state()
+        return self._per_optimizer_states[key]
+
+    def is_enabled(self):
+        return self._enabled
+
+    def scale(self, outputs):
+        """Multiplies a tensor or a (nested) list or tuple of tensors by the scale factor."""
+        if not self._enabled:
+            return outputs
+        if isinstance(outputs, flow.Tensor):
+            if self._scale is None:
+                self._lazy_init_scale_growth_tracker(outputs.device)
+            return outputs * self._scale.to(dtype=outputs.dtype)
+        if isinstance(outputs, (list, tuple)):
+            return type(outputs)(self.scale(output) for output in outputs)
+        raise ValueError("outputs must be a Tensor or an iterable of Tensors")
+
+    def unscale_(self, optimizer):
+        """
+        Divides the gradients of the parameters of ``optimizer`` by the scale factor in place and
+        records whether any of them contains inf or nan. Call it before clipping the gradients.
+        """
+        if not self._enabled:
+            return
+        if self._scale is None:
+            raise RuntimeError("unscale_() must be called after scale()")
+        state = self._get_optimizer_state(optimizer)
+        if state["stage"] is _OptState.UNSCALED:
+            raise RuntimeError(
+                "unscale_() has already been called on this optimizer since the last update()."
+            )
+        elif state["stage"] is _OptState.STEPPED:
+            raise RuntimeError("unscale_() is being called after step().")
+
+        from oneflow.nn.modules.sparse import get_sparse_grad
+
+        grads = [
+            param.grad
+            for param_group in optimizer.param_groups
+            for param in param_group.parameters
+            if param.grad is not None
+        ]
+        # the values of sparse embedding gradients are unscaled and checked as well
+        grads += [
+            get_sparse_grad(param)[1]
+            for param_group in optimizer.param_groups
+            for param in param_group.parameters
+            if get_sparse_grad(param) is not None
+        ]
+        with flow.no_grad():
+            inv_scale = flow.reciprocal(self._scale)
+            dtype2inv_scale = {flow.float32: inv_scale}
+            for grad in grads:
+                if grad.dtype not in dtype2inv_scale:
+                    dtype2inv_scale[grad.dtype] = inv_scale.to(dtype=grad.dtype)
+                grad.mul_(dtype2inv_scale[grad.dtype])
+            if len(grads) > 0:
+                state["found_inf"] = flow._C.multi_count_not_finite(grads)
+            else:
+                state["found_inf"] = flow.zeros(
+                    (1,), dtype=flow.int64, device=self._scale.device
+                )
+        state["stage"] = _OptState.UNSCALED
+
+    def step(self, optimizer, *args, **kwargs):
+        """
+        Unscales the gradients of ``optimizer`` if ``unscale_`` has not been called yet, then
+        calls ``optimizer.step(*args, **kwargs)`` unless the gradients contain inf or nan.
+        """
+        if not self._enabled:
+            return optimizer.step(*args, **kwargs)
+        state = self._get_optimizer_state(optimizer)
+        if state["stage"] is _OptState.STEPPED:
+            raise RuntimeError(
+                "step() has already been called since the last update()."
+            )
+        if state["stage"] is _OptState.READY:
+            self.unscale_(optimizer)
+        retval = None
+        if state["found_inf"].item() == 0:
+            retval = optimizer.step(*args, **kwargs)
+        state["stage"] = _OptState.STEPPED
+        return retval
+
+    def update(self, new_scale=None):
+        """
+        Updates the scale factor. Without ``new_scale``, the scale is divided by
+        ``growth_factor`` if any optimizer stepped in this iteration found inf or nan gradients,
+        and multiplied by ``growth_factor`` after ``growth_interval`` consecutive clean steps.
+        """
+        if not self._enabled or self._scale is None:
+            return
+        with flow.no_grad():
+            if new_scale is not None:
+                if isinstance(new_scale, flow.Tensor):
+                    new_scale = new_scale.to(
+                        dtype=flow.float32, device=self._scale.device
+                    )
+                    self._scale.copy_(new_scale.reshape(self._scale.shape))
+                else:
+                    self._scale.fill_(new_scale)
+            else:
+                found_infs = [
+                    state["found_inf"]
+                    for state in self._per_optimizer_states.values()
+                    if state["found_inf"] is not None
+                ]
+                if len(found_infs) == 0:
+                    raise RuntimeError("No inf checks were recorded prior to update().")
+                found_inf = found_infs[0]
+                for other in found_infs[1:]:
+                    found_inf = found_inf + other
+                flow._C.dynamic_loss_scale_schedule(
+                    found_inf,
+                    self._scale,
+                    self._growth_tracker,
+                    increment_period=self._growth_interval,
+                    multiplier=self._growth_factor,
+                )
+        self._per_optimizer_states = dict()
+
+    def get_scale(self):
+        """Returns the current scale factor as a python float, it waits for the device."""
+        if not self._enabled:
+            return 1.0
+        if self._scale is None:
+            return self._init_scale
+        return self._scale.item()
+
+    def state_dict(self):
+        if not self._enabled:
+            return {}
+        return {
+            "scale": self.get_scale(),
+            "growth_factor": self._growth_factor,
+            "backoff_factor": self._backoff_factor,
+            "growth_interval": self._growth_interval,
+            "_growth_tracker": 0
+            if self._growth_tracker is None
+            else self._growth_tracker.item(),
+        }
+
+    def load_state_dict(self, state_dict):
+        if not self._enabled:
+            return
+        if len(state_dict) == 0:
+            raise RuntimeError(
+                "The source state dict is empty, possibly because it was saved "
+                "from a disabled instance of GradScaler."
+            )
+        self._init_scale = state_dict["scale"]
+        self._growth_factor = state_dict["growth_factor"]
+        self._backoff_factor = state_dict["backoff_factor"]
+        self._growth_interval = state_dict["growth_interval"]
+        self._init_growth_tracker = state_dict["_growth_tracker"]
+        if self._scale is not None:
+            self._scale.fill_(state_dict["scale"])
+            self._growth_tracker.fill_(state_dict["_growth_tracker"])
 
     def _generate_conf_for_graph(self, train_conf):
         train_conf.mutable_dynamic_loss_scale_policy().set_initial_loss_scale(
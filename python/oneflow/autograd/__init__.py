@@ -17,6 +17,7 @@ limitations under the License.
 from oneflow.autograd.autograd import backward, grad
 from oneflow.autograd.autograd_function import Function
 from oneflow.autograd.autograd_mode import (
+    cache_backward_schedule,
     grad_enable,
     inference_mode,
     is_grad_enabled,
@@ -27,6 +28,7 @@ __all__ = [
     "backward",
     "grad",
     "Function",
+    "cache_backward_schedule",
     "grad_enable",
     "inference_mode",
     "is_grad_enabled",
@@ -163,6 +163,64 @@ class no_grad:
         pass
 
 
+class cache_backward_schedule:
+    r"""
+    Context-manager that enables or disables the backward schedule cache.
+
+    By default every ``backward()`` walks the autograd graph to compute the dependencies and the
+    topological order of its nodes. With the cache enabled, the order and the dependency counts
+    are cached by the structure of the graph, i.e. the op types, the output shapes and dtypes of
+    the nodes and the edges between them, and replayed when the next ``backward()`` runs on a
+    structurally identical graph, e.g. the same model in the next training step. This reduces
+    the host overhead of models made of many small ops.
+
+    The cache can also be enabled by setting the env var
+    ``ONEFLOW_AUTOGRAD_CACHE_BACKWARD_SCHEDULE=1``. It only applies to ``backward()``, not to
+    ``oneflow.autograd.grad``.
+
+    This context manager is thread local; it will not affect computation in other threads.
+
+    Also functions as a decorator. (Make sure to instantiate with parenthesis.)
+
+    Args:
+        mode (bool): Flag whether to enable or disable the cache. (default: True)
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> linear = flow.nn.Linear(3, 3)
+        >>> with flow.autograd.cache_backward_schedule():
+        ...     for _ in range(2):
+        ...         linear(flow.ones(2, 3)).sum().backward()
+        >>> linear.bias.grad
+        tensor([4., 4., 4.], dtype=oneflow.float32)
+    """
+
+    def __init__(self, mode=True):
+        self.mode = mode
+
+    def __call__(self, func):
+        def wrapper(*args, **kwargs):
+            with cache_backward_schedule(self.mode):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def __enter__(self):
+        self.prev = (
+            oneflow._oneflow_internal.autograd.is_backward_schedule_cache_enabled()
+        )
+        oneflow._oneflow_internal.autograd.set_backward_schedule_cache_enabled(
+            self.mode
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        oneflow._oneflow_internal.autograd.set_backward_schedule_cache_enabled(
+            self.prev
+        )
+
+
 if __name__ == "__main__":
     import doctest
 
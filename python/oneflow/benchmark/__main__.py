@@ -0,0 +1,140 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+"""
+Runs the benchmark cases and emits their statistics as JSON, e.g.
+
+    python3 -m oneflow.benchmark -k kernels --output current.json
+    python3 -m oneflow.benchmark --compare baseline.json --threshold 0.05
+    python3 -m oneflow.benchmark -k cpu_parallel --num-threads 1 --output serial.json
+
+Exits with status 1 when ``--compare`` finds a regression, or a baseline case that
+is missing from or failed in the current run.
+"""
+import argparse
+import json
+import sys
+
+from oneflow.benchmark.compare import FAILURES, compare, format_comparison
+from oneflow.benchmark.core import (
+    DEFAULT_ROUNDS,
+    DEFAULT_WARMUP,
+    collect,
+    environment,
+    run,
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python3 -m oneflow.benchmark",
+        description="OneFlow microbenchmark runner with baseline comparison",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="bench_*.py files or directories to collect cases from, default to the built-in cases",
+    )
+    parser.add_argument(
+        "-k", dest="pattern", default=None, help="only run cases matching this pattern"
+    )
+    parser.add_argument("--device", default="cpu", help="device the cases run on")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument(
+        "--num-threads",
+        type=int,
+        default=None,
+        help="intra-op threads of the cpu kernels, default to the oneflow setting",
+    )
+    parser.add_argument(
+        "--output", default=None, help="write the JSON report here instead of stdout"
+    )
+    parser.add_argument(
+        "--compare", default=None, help="JSON report of a baseline run to compare with"
+    )
+    parser.add_argument(
+        "--metric",
+        default="p50",
+        choices=["mean", "p50", "p99", "min"],
+        help="statistic used for the comparison",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown that counts as a regression",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="list the collected cases and exit"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cases = collect(args.paths, args.pattern)
+    if args.list:
+        for name in cases:
+            print(name)
+        return 0
+
+    if args.num_threads is not None:
+        import oneflow as flow
+
+        flow.set_num_threads(args.num_threads)
+
+    def log(line):
+        print(line, file=sys.stderr, flush=True)
+
+    results = run(
+        cases, device=args.device, warmup=args.warmup, rounds=args.rounds, log=log
+    )
+    report = {
+        "environment": environment(),
+        "config": {
+            "device": args.device,
+            "warmup": args.warmup,
+            "rounds": args.rounds,
+            "num_threads": args.num_threads,
+        },
+        "results": results,
+    }
+    exit_code = 0
+    if args.compare is not None:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["results"]
+        # cases deselected by -k or the paths are not missing, they were not asked for
+        baseline = {name: stats for name, stats in baseline.items() if name in cases}
+        rows = compare(results, baseline, metric=args.metric, threshold=args.threshold)
+        report["comparison"] = {
+            "baseline": args.compare,
+            "metric": args.metric,
+            "threshold": args.threshold,
+            "cases": rows,
+        }
+        log(format_comparison(rows, args.metric))
+        if any(row["status"] in FAILURES for row in rows):
+            exit_code = 1
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
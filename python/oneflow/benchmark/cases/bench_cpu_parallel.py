@@ -0,0 +1,110 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+"""
+CPU kernels split across the intra-op thread pool. Measure the speedup by running
+them once with ``--num-threads 1`` and comparing the default run against it:
+
+    python3 -m oneflow.benchmark -k cpu_parallel --num-threads 1 --output serial.json
+    python3 -m oneflow.benchmark -k cpu_parallel --compare serial.json
+"""
+import oneflow as flow
+
+
+def _forward_backward(op, x):
+    x = x.detach().requires_grad_()
+
+    def step():
+        op(x).sum().backward()
+
+    return step
+
+
+def bench_softmax_backward(benchmark):
+    x = flow.randn(512, 1000, device=benchmark.device)
+    benchmark(_forward_backward(lambda t: flow.softmax(t, dim=-1), x))
+
+
+def bench_log_softmax_backward(benchmark):
+    x = flow.randn(512, 1000, device=benchmark.device)
+    benchmark(_forward_backward(lambda t: flow.log_softmax(t, dim=-1), x))
+
+
+def bench_reduce_max(benchmark):
+    x = flow.randn(64, 256, 64, device=benchmark.device)
+    benchmark(flow._C.reduce_max, x, [1])
+
+
+def bench_reduce_prod(benchmark):
+    x = flow.randn(64, 256, 64, device=benchmark.device)
+    benchmark(flow.prod, x, dim=1)
+
+
+def bench_avg_pool2d_nhwc_backward(benchmark):
+    x = flow.randn(16, 56, 56, 32, device=benchmark.device)
+    benchmark(
+        _forward_backward(
+            lambda t: flow._C.avg_pool2d_nhwc(
+                t, [3, 3], [2, 2], "customized", [1, 1], [1, 1], "channels_last",
+            ),
+            x,
+        )
+    )
+
+
+def bench_index_select(benchmark):
+    x = flow.randn(1000, 256, device=benchmark.device)
+    index = flow.randint(0, 1000, (4096,), device=benchmark.device)
+    benchmark(flow.index_select, x, 0, index)
+
+
+def bench_scatter_add(benchmark):
+    src = flow.randn(64, 128, 32, device=benchmark.device)
+    index = flow.randint(0, 16, (64, 128, 32), device=benchmark.device)
+
+    def step():
+        flow.scatter_add(
+            flow.zeros(64, 128, 32, device=benchmark.device), 1, index, src
+        )
+
+    benchmark(step)
+
+
+def bench_upsample_bilinear_backward(benchmark):
+    x = flow.randn(8, 32, 64, 64, device=benchmark.device)
+    benchmark(
+        _forward_backward(
+            lambda t: flow.nn.functional.interpolate(
+                t, scale_factor=2.0, mode="bilinear"
+            ),
+            x,
+        )
+    )
+
+
+def bench_constant_pad_backward(benchmark):
+    x = flow.randn(16, 32, 64, 64, device=benchmark.device)
+    benchmark(
+        _forward_backward(
+            lambda t: flow.nn.functional.pad(t, (1, 2, 3, 4), value=1.0), x
+        )
+    )
+
+
+def bench_where(benchmark):
+    cond = flow.randn(1 << 20, device=benchmark.device) > 0
+    x = flow.randn(1 << 20, device=benchmark.device)
+    y = flow.randn(1 << 20, device=benchmark.device)
+    benchmark(flow.where, cond, x, y)
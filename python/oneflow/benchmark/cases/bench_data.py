@@ -0,0 +1,55 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+"""
+DataLoader throughput: one timed call iterates a whole epoch, items per second are
+reported in ``items_per_second``.
+"""
+import oneflow as flow
+from oneflow.utils.data import DataLoader, TensorDataset
+
+NUM_SAMPLES = 8192
+BATCH_SIZE = 64
+
+
+def _dataset():
+    return TensorDataset(
+        flow.randn(NUM_SAMPLES, 3, 32, 32), flow.randint(0, 10, (NUM_SAMPLES,))
+    )
+
+
+def _epoch(loader):
+    for _ in loader:
+        pass
+
+
+def _bench_loader(benchmark, **kwargs):
+    loader = DataLoader(_dataset(), batch_size=BATCH_SIZE, **kwargs)
+    benchmark(_epoch, loader, rounds=5, warmup=1)
+    benchmark.extra_info["items_per_second"] = NUM_SAMPLES / (
+        sum(benchmark.times) / len(benchmark.times)
+    )
+
+
+def bench_dataloader_sequential(benchmark):
+    _bench_loader(benchmark)
+
+
+def bench_dataloader_shuffle(benchmark):
+    _bench_loader(benchmark, shuffle=True)
+
+
+def bench_dataloader_workers(benchmark):
+    _bench_loader(benchmark, num_workers=2)
@@ -0,0 +1,51 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+"""
+Eager dispatch overhead: ops on tiny tensors, so the time is dominated by the
+Python binding, functional dispatch and instruction scheduling instead of kernels.
+"""
+import oneflow as flow
+
+
+def bench_add_scalar(benchmark):
+    x = flow.ones(1, device=benchmark.device)
+    benchmark(flow.add, x, 1, iterations=100)
+
+
+def bench_add_tensor(benchmark):
+    x = flow.ones(1, device=benchmark.device)
+    y = flow.ones(1, device=benchmark.device)
+    benchmark(flow.add, x, y, iterations=100)
+
+
+def bench_relu_inplace(benchmark):
+    x = flow.ones(1, device=benchmark.device)
+    benchmark(flow.nn.functional.relu, x, inplace=True, iterations=100)
+
+
+def bench_reshape_view(benchmark):
+    x = flow.ones(4, 4, device=benchmark.device)
+    benchmark(flow.reshape, x, (2, 8), iterations=100)
+
+
+def bench_linear_forward_backward(benchmark):
+    m = flow.nn.Linear(4, 4).to(benchmark.device)
+    x = flow.ones(1, 4, device=benchmark.device)
+
+    def step():
+        m(x).sum().backward()
+
+    benchmark(step, iterations=20)
@@ -0,0 +1,72 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+"""
+nn.Graph compile time (building and running the first step of a fresh graph) and
+the time of a compiled training step.
+"""
+import oneflow as flow
+import oneflow.nn as nn
+
+
+def _model(device):
+    return nn.Sequential(
+        nn.Linear(256, 512),
+        nn.ReLU(),
+        nn.Linear(512, 512),
+        nn.ReLU(),
+        nn.Linear(512, 10),
+    ).to(device)
+
+
+class _TrainGraph(nn.Graph):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        self.add_optimizer(flow.optim.SGD(model.parameters(), lr=0.01))
+
+    def build(self, x):
+        loss = self.model(x).sum()
+        loss.backward()
+        return loss
+
+
+class _EvalGraph(nn.Graph):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def build(self, x):
+        return self.model(x)
+
+
+def bench_graph_compile(benchmark):
+    model = _model(benchmark.device)
+    x = flow.randn(64, 256, device=benchmark.device)
+    benchmark(lambda: _TrainGraph(model)(x), rounds=3, warmup=1)
+
+
+def bench_graph_train_step(benchmark):
+    model = _model(benchmark.device)
+    x = flow.randn(64, 256, device=benchmark.device)
+    graph = _TrainGraph(model)
+    benchmark(graph, x)
+
+
+def bench_graph_eval_step(benchmark):
+    model = _model(benchmark.device)
+    x = flow.randn(64, 256, device=benchmark.device)
+    graph = _EvalGraph(model)
+    benchmark(graph, x)
@@ -0,0 +1,89 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+"""
+Core kernels on problem sizes where the kernel, not the dispatch, dominates.
+"""
+import oneflow as flow
+
+
+def bench_matmul_512(benchmark):
+    a = flow.randn(512, 512, device=benchmark.device)
+    b = flow.randn(512, 512, device=benchmark.device)
+    benchmark(flow.matmul, a, b)
+
+
+def bench_batch_matmul(benchmark):
+    a = flow.randn(32, 128, 64, device=benchmark.device)
+    b = flow.randn(32, 64, 128, device=benchmark.device)
+    benchmark(flow.bmm, a, b)
+
+
+def bench_conv2d_3x3(benchmark):
+    m = flow.nn.Conv2d(64, 64, 3, padding=1).to(benchmark.device)
+    x = flow.randn(8, 64, 56, 56, device=benchmark.device)
+    with flow.no_grad():
+        benchmark(m, x)
+
+
+def bench_conv2d_backward(benchmark):
+    m = flow.nn.Conv2d(32, 32, 3, padding=1).to(benchmark.device)
+    x = flow.randn(8, 32, 28, 28, device=benchmark.device)
+
+    def step():
+        m(x).sum().backward()
+
+    benchmark(step)
+
+
+def bench_batch_norm(benchmark):
+    m = flow.nn.BatchNorm2d(64).to(benchmark.device)
+    x = flow.randn(16, 64, 28, 28, device=benchmark.device)
+    benchmark(m, x)
+
+
+def bench_layer_norm(benchmark):
+    m = flow.nn.LayerNorm(1024).to(benchmark.device)
+    x = flow.randn(64, 128, 1024, device=benchmark.device)
+    with flow.no_grad():
+        benchmark(m, x)
+
+
+def bench_softmax(benchmark):
+    x = flow.randn(256, 4096, device=benchmark.device)
+    benchmark(flow.softmax, x, dim=-1)
+
+
+def bench_reduce_sum(benchmark):
+    x = flow.randn(1024, 4096, device=benchmark.device)
+    benchmark(flow.sum, x, dim=1)
+
+
+def bench_reduce_mean_all(benchmark):
+    x = flow.randn(1024, 4096, device=benchmark.device)
+    benchmark(flow.mean, x)
+
+
+def bench_gather(benchmark):
+    weight = flow.randn(100000, 128, device=benchmark.device)
+    indices = flow.randint(0, 100000, (65536,), device=benchmark.device)
+    benchmark(flow.gather, weight, 0, indices.unsqueeze(1).expand(65536, 128))
+
+
+def bench_embedding(benchmark):
+    m = flow.nn.Embedding(100000, 128).to(benchmark.device)
+    indices = flow.randint(0, 100000, (256, 64), device=benchmark.device)
+    with flow.no_grad():
+        benchmark(m, indices)
@@ -0,0 +1,51 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+"""
+flow.save / flow.load of a ResNet-sized state dict (about 25M parameters).
+"""
+import os
+import shutil
+import tempfile
+
+import oneflow as flow
+
+
+def _state_dict():
+    return {f"layer{i}.weight": flow.randn(1024, 1024) for i in range(24)}
+
+
+def bench_save(benchmark):
+    state_dict = _state_dict()
+    root = tempfile.mkdtemp()
+    path = os.path.join(root, "model")
+
+    def clear():
+        shutil.rmtree(path, ignore_errors=True)
+
+    try:
+        benchmark(flow.save, state_dict, path, setup=clear, rounds=5, warmup=1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_load(benchmark):
+    root = tempfile.mkdtemp()
+    path = os.path.join(root, "model")
+    try:
+        flow.save(_state_dict(), path)
+        benchmark(flow.load, path, rounds=5, warmup=1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
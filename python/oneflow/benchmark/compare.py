@@ -0,0 +1,86 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from typing import Dict, List
+
+REGRESSION = "regression"
+IMPROVEMENT = "improvement"
+UNCHANGED = "unchanged"
+MISSING = "missing"
+ERROR = "error"
+NEW = "new"
+
+# statuses that make a comparison fail
+FAILURES = (REGRESSION, MISSING, ERROR)
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    metric: str = "p50",
+    threshold: float = 0.1,
+) -> List[Dict]:
+    """Compares ``metric`` of every case against a baseline run.
+
+    A case is a regression when it is slower than the baseline by more than
+    ``threshold`` (a fraction, ``0.1`` means 10%) and an improvement when it is
+    faster by more than ``threshold``. A case that raised in the current run is an
+    ``error``, a baseline case absent from the current run is ``missing`` and a case
+    without a usable baseline is ``new``. See ``FAILURES`` for the statuses that
+    count as a failed comparison.
+    """
+    assert threshold >= 0, "threshold must be non-negative"
+    rows = []
+    for name in sorted(set(results) | set(baseline)):
+        current = results.get(name, {})
+        base = baseline.get(name, {})
+        row = {
+            "name": name,
+            "baseline": base.get(metric),
+            "current": current.get(metric),
+        }
+        if "error" in current:
+            row["status"] = ERROR
+        elif row["current"] is None:
+            row["status"] = MISSING
+        elif row["baseline"] is None:
+            row["status"] = NEW
+        else:
+            ratio = row["current"] / row["baseline"] if row["baseline"] > 0 else 1.0
+            row["ratio"] = ratio
+            if ratio > 1 + threshold:
+                row["status"] = REGRESSION
+            elif ratio < 1 - threshold:
+                row["status"] = IMPROVEMENT
+            else:
+                row["status"] = UNCHANGED
+        rows.append(row)
+    return rows
+
+
+def format_comparison(rows: List[Dict], metric: str = "p50") -> str:
+    lines = [
+        f"{'case':<56} {'baseline ' + metric:>16} {'current ' + metric:>16} {'ratio':>8}  status"
+    ]
+    for row in rows:
+
+        def fmt(value):
+            return "-" if value is None else f"{value * 1e3:.4f} ms"
+
+        ratio = f"{row['ratio']:.3f}" if "ratio" in row else "-"
+        lines.append(
+            f"{row['name']:<56} {fmt(row['baseline']):>16} {fmt(row['current']):>16} {ratio:>8}  {row['status']}"
+        )
+    return "\n".join(lines)
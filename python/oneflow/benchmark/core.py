@@ -0,0 +1,229 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import fnmatch
+import importlib
+import importlib.util
+import inspect
+import math
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import oneflow as flow
+
+DEFAULT_WARMUP = 3
+DEFAULT_ROUNDS = 20
+
+
+def compute_stats(times: List[float]) -> Dict[str, float]:
+    """Summarizes per-call times in seconds as mean, p50, p99, variance, stddev, min
+    and max. Percentiles use linear interpolation between the closest ranks.
+    """
+    assert len(times) > 0, "at least one timing is required"
+    ordered = sorted(times)
+    n = len(ordered)
+
+    def percentile(q):
+        pos = (n - 1) * q / 100.0
+        lo = int(math.floor(pos))
+        hi = min(lo + 1, n - 1)
+        return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+    mean = sum(ordered) / n
+    variance = sum((t - mean) ** 2 for t in ordered) / n
+    return {
+        "mean": mean,
+        "p50": percentile(50),
+        "p99": percentile(99),
+        "variance": variance,
+        "stddev": math.sqrt(variance),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "rounds": n,
+    }
+
+
+def _sync():
+    flow._oneflow_internal.eager.Sync()
+
+
+class Benchmark(object):
+    """The fixture passed to every ``bench_*`` case, in the spirit of pytest fixtures.
+
+    Calling it times ``fn(*args, **kwargs)``. Every round runs ``fn`` ``iterations``
+    times followed by a sync of the eager stream, and records the mean time of one
+    call, so asynchronously launched kernels are included in the measurement.
+
+    For example:
+
+    .. code-block:: python
+
+        def bench_relu(benchmark):
+            x = flow.randn(1024, 1024, device=benchmark.device)
+            benchmark(flow.relu, x)
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        device: str = "cpu",
+        warmup: int = DEFAULT_WARMUP,
+        rounds: int = DEFAULT_ROUNDS,
+    ):
+        self.name = name
+        self.device = device
+        self.warmup = warmup
+        self.rounds = rounds
+        self.times = None
+        self.extra_info = dict()
+
+    def __call__(
+        self,
+        fn: Callable,
+        *args,
+        iterations: int = 1,
+        rounds: Optional[int] = None,
+        warmup: Optional[int] = None,
+        setup: Optional[Callable] = None,
+        **kwargs,
+    ):
+        """Times ``fn``. ``setup``, if given, runs untimed before every round, e.g. to
+        build a fresh object whose construction is being measured by ``fn``.
+
+        Returns the result of the last call of ``fn``.
+        """
+        assert self.times is None, f"benchmark {self.name} is already measured"
+        assert iterations > 0
+        rounds = self.rounds if rounds is None else rounds
+        warmup = self.warmup if warmup is None else warmup
+        result = None
+        for _ in range(warmup):
+            if setup is not None:
+                setup()
+            for _ in range(iterations):
+                result = fn(*args, **kwargs)
+            _sync()
+        times = []
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            _sync()
+            start = time.perf_counter()
+            for _ in range(iterations):
+                result = fn(*args, **kwargs)
+            _sync()
+            times.append((time.perf_counter() - start) / iterations)
+        self.times = times
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        assert self.times is not None, f"benchmark {self.name} did not measure anything"
+        stats = compute_stats(self.times)
+        stats.update(self.extra_info)
+        return stats
+
+
+def _load_module(path):
+    module_name = "oneflow_benchmark_" + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _case_files(path):
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, _, names in os.walk(path):
+        for name in sorted(names):
+            if fnmatch.fnmatch(name, "bench_*.py"):
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+
+def collect(
+    paths: Optional[List[str]] = None, pattern: Optional[str] = None
+) -> Dict[str, Callable]:
+    """Collects ``bench_*`` functions from ``bench_*.py`` files under ``paths``, which
+    default to the built-in cases. Cases are named ``<module>::<function>``;
+    ``pattern`` is a substring or glob that selects a subset of them.
+    """
+    if not paths:
+        paths = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "cases")]
+    cases = dict()
+    for path in paths:
+        for case_file in _case_files(path):
+            module = _load_module(case_file)
+            module_name = os.path.splitext(os.path.basename(case_file))[0]
+            for fn_name, fn in inspect.getmembers(module, inspect.isfunction):
+                if not fn_name.startswith("bench_") or fn.__module__ != module.__name__:
+                    continue
+                case_name = f"{module_name}::{fn_name}"
+                if pattern is not None and not (
+                    pattern in case_name or fnmatch.fnmatch(case_name, pattern)
+                ):
+                    continue
+                cases[case_name] = fn
+    return cases
+
+
+def run(
+    cases: Dict[str, Callable],
+    device: str = "cpu",
+    warmup: int = DEFAULT_WARMUP,
+    rounds: int = DEFAULT_ROUNDS,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Runs the collected cases and returns their statistics keyed by case name.
+    A case that raises is reported with an ``error`` entry instead of stopping the run.
+    """
+    results = dict()
+    for case_name, fn in cases.items():
+        benchmark = Benchmark(case_name, device=device, warmup=warmup, rounds=rounds)
+        try:
+            fn(benchmark)
+            results[case_name] = benchmark.stats()
+        except Exception as e:
+            results[case_name] = {"error": f"{type(e).__name__}: {e}"}
+        if log is not None:
+            log(_format_result(case_name, results[case_name]))
+    return results
+
+
+def _format_result(case_name, stats):
+    if "error" in stats:
+        return f"{case_name:<56} ERROR {stats['error']}"
+    return (
+        f"{case_name:<56} mean {stats['mean'] * 1e3:10.4f} ms"
+        f"  p50 {stats['p50'] * 1e3:10.4f} ms  p99 {stats['p99'] * 1e3:10.4f} ms"
+    )
+
+
+def environment() -> Dict[str, str]:
+    import platform
+
+    return {
+        "oneflow_version": flow.__version__,
+        "git_commit": getattr(flow, "__git_commit__", "unknown"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "omp_num_threads": os.getenv("OMP_NUM_THREADS"),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
@@ -22,4 +22,6 @@ from oneflow.comm.comm_ops import all_to_all
 from oneflow.comm.comm_ops import barrier
 from oneflow.comm.comm_ops import reduce_scatter
 from oneflow.comm.comm_ops import gather
+from oneflow.comm.group import Group, new_group
+from oneflow.comm.work import Work
 from oneflow._C import send, recv
@@ -16,9 +16,23 @@ limitations under the License.
 
 import oneflow as flow
 import numpy as np
+from oneflow.comm.group import get_group
+from oneflow.comm.work import Work
 
 
-def all_reduce(tensor):
+def _local_to_global(tensor, placement, sbp, shape):
+    # Passing the global shape avoids the blocking shape consistency check across
+    # the ranks, so the collective is only queued and not waited for.
+    return flow._C.local_to_global(tensor, placement, [sbp], shape, tensor.dtype)
+
+
+def _finish(tensors, async_op):
+    if async_op:
+        return Work(tensors)
+    return None
+
+
+def all_reduce(tensor, group=None, async_op=False):
     """
     Reduces the tensor data across all machines in such a way that all get
     the final result.
@@ -26,6 +40,14 @@ def all_reduce(tensor):
 
     Args:
         tensor (Tensor): the input tensor
+        group (Group, optional): The group to work on, created by
+            :func:`oneflow.comm.new_group`. Defaults to all the processes.
+        async_op (bool, optional): Whether to return a :class:`Work` handle
+            instead of None. Default: ``False``.
+
+    Returns:
+        A :class:`Work` handle if ``async_op`` is True and the current process is
+        in the group, else None.
 
     For example:
 
@@ -52,16 +74,18 @@ def all_reduce(tensor):
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
     assert tensor.device.index == flow.env.get_local_rank()
     assert tensor.is_local
-    device_type = tensor.device.type
-    placement = flow.env.all_device_placement(device_type)
-    result = tensor.to_global(placement=placement, sbp=flow.sbp.partial_sum).to_global(
-        placement=placement, sbp=flow.sbp.broadcast
-    )
-
+    group = get_group(group)
+    if not group.is_member():
+        return None
+    placement = group.placement(tensor.device.type)
+    result = _local_to_global(
+        tensor, placement, flow.sbp.partial_sum, tensor.shape
+    ).to_global(placement=placement, sbp=flow.sbp.broadcast)
     tensor.data = result.to_local()
+    return _finish([tensor], async_op)
 
 
-def all_gather(tensor_list, tensor):
+def all_gather(tensor_list, tensor, group=None, async_op=False):
     """
     Gathers tensors from the whole group in a list.
 
@@ -69,6 +93,14 @@ def all_gather(tensor_list, tensor):
         tensor_list (list[Tensor]): Output list. It should contain
             correctly-sized tensors to be used for output of the collective.
         tensor (Tensor): Tensor to be broadcast from current process.
+        group (Group, optional): The group to work on, created by
+            :func:`oneflow.comm.new_group`. Defaults to all the processes.
+        async_op (bool, optional): Whether to return a :class:`Work` handle
+            instead of None. Default: ``False``.
+
+    Returns:
+        A :class:`Work` handle if ``async_op`` is True and the current process is
+        in the group, else None.
 
     For example:
 
@@ -102,24 +134,27 @@ def all_gather(tensor_list, tensor):
     """
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
     assert isinstance(tensor_list, list)
-    assert len(tensor_list) == flow.env.get_world_size()
     assert tensor.device.index == flow.env.get_local_rank()
     assert tensor.is_local
-    tensor = tensor.expand(*([1] + list(tensor.shape)))
-    device_type = tensor.device.type
-    placement = flow.env.all_device_placement(device_type)
+    group = get_group(group)
+    assert len(tensor_list) == group.size()
+    if not group.is_member():
+        return None
+    shape = list(tensor.shape)
+    tensor = tensor.expand(*([1] + shape))
+    placement = group.placement(tensor.device.type)
     tensor = (
-        tensor.to_global(placement=placement, sbp=flow.sbp.split(0))
+        _local_to_global(tensor, placement, flow.sbp.split(0), [group.size()] + shape)
         .to_global(placement=placement, sbp=flow.sbp.broadcast)
         .to_local()
     )
-    assert len(tensor_list) == flow.env.get_world_size()
     # TODO(): getitem has bug on global tensor with size = [2, 1].
     for i in range(tensor.shape[0]):
         tensor_list[i] = tensor[i]
+    return _finish(tensor_list, async_op)
 
 
-def broadcast(tensor, src):
+def broadcast(tensor, src, group=None, async_op=False):
     """
     Broadcasts the tensor to the whole group.
     ``tensor`` must have the same number of elements in all processes
@@ -129,6 +164,14 @@ def broadcast(tensor, src):
         tensor (Tensor): Data to be sent if ``src`` is the rank of current
             process, and tensor to be used to save received data otherwise.
         src (int): Source rank.
+        group (Group, optional): The group to work on, created by
+            :func:`oneflow.comm.new_group`. Defaults to all the processes.
+        async_op (bool, optional): Whether to return a :class:`Work` handle
+            instead of None. Default: ``False``.
+
+    Returns:
+        A :class:`Work` handle if ``async_op`` is True and the current process is
+        in the group, else None.
 
     .. code-block:: python
 
@@ -153,10 +196,16 @@ def broadcast(tensor, src):
     assert isinstance(src, int)
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
     assert tensor.is_local
-    flow._C.broadcast(tensor, src_rank=src, inplace=True)
+    group = get_group(group)
+    assert src in group.ranks, f"src rank {src} is not in {group}"
+    if not group.is_member():
+        return None
+    with group.scope():
+        flow._C.broadcast(tensor, src_rank=src, inplace=True)
+    return _finish([tensor], async_op)
 
 
-def scatter(tensor, scatter_list=None, src=0):
+def scatter(tensor, scatter_list=None, src=0, group=None):
     """
     Scatters a list of tensors to all processes in a group.
 
@@ -168,30 +217,34 @@ def scatter(tensor, scatter_list=None, src=0):
         scatter_list (list[Tensor]): List of tensors to scatter (default is
             None, must be specified on the source rank)
         src (int): Source rank (default is 0)
+        group (Group, optional): The group to work on, created by
+            :func:`oneflow.comm.new_group`. Defaults to all the processes.
     """
     assert isinstance(src, int)
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
     assert tensor.is_local
+    group = get_group(group)
+    assert src in group.ranks, f"src rank {src} is not in {group}"
+    if not group.is_member():
+        return
     out_shape = tensor.shape
     if flow.env.get_rank() == src:
-        tensor.data = scatter_list[src]
         assert isinstance(scatter_list, list)
-        assert len(scatter_list) == flow.env.get_world_size()
+        assert len(scatter_list) == group.size()
         for i in range(len(scatter_list)):
-            if i == src:
-                continue
             assert isinstance(scatter_list[i], flow._oneflow_internal.Tensor)
             assert scatter_list[i].is_local
             assert (
                 scatter_list[i].shape == out_shape
             ), f"invalid tensor size at index {i}: {out_shape} vs {scatter_list[i].shape}"
-            flow.comm.send(scatter_list[i], i)
-    # send/recv on the same rank is invalid
-    if flow.env.get_rank() != src:
-        flow.comm.recv(src, out=tensor)
+        stacked = flow.stack(scatter_list)
+    else:
+        stacked = tensor
+    with group.scope():
+        tensor.data = flow._C.local_scatter(stacked, src=src)
 
 
-def reduce(tensor, dst):
+def reduce(tensor, dst, group=None):
     """
     Reduces the tensor data across all machines.
 
@@ -201,18 +254,22 @@ def reduce(tensor, dst):
         tensor (Tensor): Input and output of the collective. The function
             operates in-place.
         dst (int): Destination rank
+        group (Group, optional): The group to work on, created by
+            :func:`oneflow.comm.new_group`. Defaults to all the processes.
 
     """
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
     assert tensor.is_local
     assert isinstance(dst, int)
-    original_tensor = flow._C.identity(tensor)
-    flow.comm.all_reduce(tensor)
-    if flow.env.get_rank() != dst:
-        tensor.data = original_tensor
+    group = get_group(group)
+    assert dst in group.ranks, f"dst rank {dst} is not in {group}"
+    if not group.is_member():
+        return
+    with group.scope():
+        flow._C.local_reduce(tensor, dst=dst, inplace=True)
 
 
-def all_to_all(output_tensor_list, input_tensor_list):
+def all_to_all(output_tensor_list, input_tensor_list, group=None, async_op=False):
     """
     Each process scatters list of input tensors to all processes in a group and
     return gathered list of tensors in output list.
@@ -221,12 +278,21 @@ def all_to_all(output_tensor_list, input_tensor_list):
         output_tensor_list (list[Tensor]): List of tensors to be gathered one
             per rank.
         input_tensor_list (list[Tensor]): List of tensors to scatter one per rank.
+        group (Group, optional): The group to work on, created by
+            :func:`oneflow.comm.new_group`. Defaults to all the processes.
+        async_op (bool, optional): Whether to return a :class:`Work` handle
+            instead of None. Default: ``False``.
+
+    Returns:
+        A :class:`Work` handle if ``async_op`` is True and the current process is
+        in the group, else None.
 
     """
+    group = get_group(group)
 
     def _check_list(tensor_list):
         assert isinstance(tensor_list, list)
-        assert len(tensor_list) == flow.env.get_world_size()
+        assert len(tensor_list) == group.size()
         shape = tensor_list[0].shape
         dtype = tensor_list[0].dtype
         device = tensor_list[0].device
@@ -244,50 +310,81 @@ def all_to_all(output_tensor_list, input_tensor_list):
     assert input_tensor_list[0].dtype == output_tensor_list[0].dtype
     assert input_tensor_list[0].device == output_tensor_list[0].device
 
-    for i in range(flow.env.get_world_size()):
-        flow.comm.scatter(
-            output_tensor_list[i],
-            input_tensor_list if i == flow.env.get_rank() else [],
-            src=i,
-        )
+    if not group.is_member():
+        return None
+    # Rank i holds column i of a (group_size, group_size) grid of chunks, boxing it
+    # from split(1) to split(0) hands row j to rank j in a single exchange.
+    placement = group.placement(input_tensor_list[0].device.type)
+    grid = flow.stack(input_tensor_list).unsqueeze(1)
+    grid_shape = [group.size(), group.size()] + list(input_tensor_list[0].shape)
+    grid = _local_to_global(grid, placement, flow.sbp.split(1), grid_shape).to_global(
+        placement=placement, sbp=flow.sbp.split(0)
+    )
+    received = grid.to_local()[0]
+    for i in range(len(output_tensor_list)):
+        output_tensor_list[i].data = received[i]
+    return _finish(output_tensor_list, async_op)
 
 
-def barrier():
+def barrier(group=None):
     """
     Synchronizes all processes.
 
-    """
-    flow._oneflow_internal.eager.Sync()
-
+    Args:
+        group (Group, optional): The group to work on, created by
+            :func:`oneflow.comm.new_group`. Defaults to all the processes.
 
-def reduce_scatter(output, input_list):
+    """
+    if group is None:
+        flow._oneflow_internal.eager.Sync()
+        return
+    group = get_group(group)
+    if not group.is_member():
+        return
+    # Reading the result of a collective blocks until every member has joined it.
+    token = flow.zeros(1)
+    all_reduce(token, group=group)
+    token.numpy()
+
+
+def reduce_scatter(output, input_list, group=None, async_op=False):
     """
     Reduces, then scatters a list of tensors to all processes in a group.
 
     Args:
         output (Tensor): Output tensor.
         input_list (list[Tensor]): List of tensors to reduce and scatter.
+        group (Group, optional): The group to work on, created by
+            :func:`oneflow.comm.new_group`. Defaults to all the processes.
+        async_op (bool, optional): Whether to return a :class:`Work` handle
+            instead of None. Default: ``False``.
+
+    Returns:
+        A :class:`Work` handle if ``async_op`` is True and the current process is
+        in the group, else None.
 
     """
     assert isinstance(output, flow._oneflow_internal.Tensor)
     assert output.is_local
     assert isinstance(input_list, list)
-    assert len(input_list) == flow.env.get_world_size()
+    group = get_group(group)
+    assert len(input_list) == group.size()
+    if not group.is_member():
+        return None
     output_shape = output.shape
-    device_type = output.device.type
-    placement = flow.env.all_device_placement(device_type)
-    reduced_tensor_list = []
     for tensor in input_list:
         assert tensor.is_local
         assert tensor.shape == output_shape
-        tensor = tensor.to_global(
-            placement=placement, sbp=flow.sbp.partial_sum
-        ).to_global(placement=placement, sbp=flow.sbp.broadcast)
-        reduced_tensor_list.append(tensor.to_local())
-    output.data = reduced_tensor_list[flow.env.get_rank()]
+    placement = group.placement(output.device.type)
+    stacked = flow.stack(input_list)
+    stacked = _local_to_global(
+        stacked, placement, flow.sbp.partial_sum, stacked.shape
+    ).to_global(placement=placement, sbp=flow.sbp.split(0))
+    output.data = stacked.to_local()[0]
+    return _finish([output], async_op)
 
 
-def gather(tensor, gather_list=None, dst=0):
+def gather(tensor, gather_list=None, dst=0, group=None):
     """
     Gathers a list of tensors in a single process.
 
@@ -297,26 +394,23 @@ def gather(tensor, gather_list=None, dst=0):
             tensors to use for gathered data (default is None, must be specified
             on the destination rank)
         dst (int, optional): Destination rank (default is 0)
+        group (Group, optional): The group to work on, created by
+            :func:`oneflow.comm.new_group`. Defaults to all the processes.
 
     """
     assert isinstance(tensor, flow._oneflow_internal.Tensor)
     assert tensor.is_local
-    shape = tensor.shape
-    dtype = tensor.dtype
-    tensor = tensor.expand(*([1] + list(shape)))
-    device_type = tensor.device.type
-    placement = flow.env.all_device_placement(device_type)
-    tensor = tensor.to_global(placement=placement, sbp=flow.sbp.split(0)).to_global(
-        placement=placement, sbp=flow.sbp.broadcast
-    )
-
+    group = get_group(group)
+    assert dst in group.ranks, f"dst rank {dst} is not in {group}"
+    if not group.is_member():
+        return
+    with group.scope():
+        gathered = flow._C.local_gather(tensor, dst=dst)
+    if flow.env.get_rank() != dst:
+        return
     if gather_list is None:
-        gather_list = [
-            flow.empty(shape, dtype=dtype) for _ in range(flow.env.get_world_size())
-        ]
-
-    assert gather_list is not None
+        gather_list = [None] * group.size()
     assert isinstance(gather_list, list)
-    assert len(gather_list) == flow.env.get_world_size()
-    for i in range(tensor.shape[0]):
-        gather_list[i] = tensor[i].to_local()
+    assert len(gather_list) == group.size()
+    for i in range(len(gather_list)):
+        gather_list[i] = gathered[i]
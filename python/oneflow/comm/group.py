@@ -0,0 +1,122 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from contextlib import contextmanager
+
+import oneflow as flow
+
+
+class Group(object):
+    """
+    A set of processes that collectives in ``oneflow.comm`` can run on.
+
+    Groups are created by :func:`oneflow.comm.new_group` and cached per rank set, so
+    every call with the same ranks returns the same group and reuses its
+    communicators.
+    """
+
+    def __init__(self, ranks):
+        self._ranks = tuple(ranks)
+        self._placements = {}
+
+    @property
+    def ranks(self):
+        """The global ranks of the group in ascending order."""
+        return self._ranks
+
+    def size(self):
+        """Number of processes in the group."""
+        return len(self._ranks)
+
+    def rank(self):
+        """Index of the current process in the group, or -1 if it is not a member."""
+        current = flow.env.get_rank()
+        return self._ranks.index(current) if current in self._ranks else -1
+
+    def is_member(self):
+        return flow.env.get_rank() in self._ranks
+
+    def placement(self, device_type):
+        placement = self._placements.get(device_type)
+        if placement is None:
+            placement = flow.placement(device_type, ranks=list(self._ranks))
+            self._placements[device_type] = placement
+        return placement
+
+    @contextmanager
+    def scope(self):
+        # Local collectives run on the rank group of the innermost scope.
+        rank_group_scope = flow._oneflow_internal.NewRankGroupScope(list(self._ranks))
+        try:
+            yield
+        finally:
+            del rank_group_scope
+
+    def __repr__(self):
+        return f"Group(ranks={list(self._ranks)})"
+
+
+_rank_set2group = {}
+
+
+def new_group(ranks=None):
+    """
+    Creates a group made of the given processes.
+
+    Creating a group does not communicate, the communicators of the group are set
+    up by its first collective and then reused. Collectives called with
+    ``group=...`` only run on the members of the group and are no-ops on the other
+    processes.
+
+    Args:
+        ranks (list[int], optional): Global ranks of the group members. Defaults to
+            all the ranks.
+
+    Returns:
+        Group: the group, shared by all calls with the same rank set.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> group = flow.comm.new_group([0, 1])
+        >>> group.ranks
+        (0, 1)
+
+    """
+    world_size = flow.env.get_world_size()
+    if ranks is None:
+        ranks = range(world_size)
+    rank_set = tuple(sorted(set(ranks)))
+    assert len(rank_set) > 0, "a group needs at least one rank"
+    for rank in rank_set:
+        assert isinstance(rank, int), f"rank should be int, but got {type(rank)}"
+        assert (
+            0 <= rank < world_size
+        ), f"rank {rank} out of range for world size {world_size}"
+    group = _rank_set2group.get(rank_set)
+    if group is None:
+        group = Group(rank_set)
+        _rank_set2group[rank_set] = group
+    return group
+
+
+def get_group(group=None):
+    """Returns ``group``, or the group of all the processes if it is None."""
+    if group is None:
+        return new_group()
+    assert isinstance(group, Group), f"expected a oneflow.comm.Group, but got {group}"
+    return group
@@ -0,0 +1,39 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import oneflow as flow
+
+
+class Work(object):
+    """
+    Handle of a collective launched with ``async_op=True``.
+
+    The collective is queued on the device streams and the call returns right away,
+    so communication overlaps with the computation issued after it. Reading the
+    output tensors synchronizes with the collective as usual, ``wait`` blocks until
+    all of them have been written.
+    """
+
+    def __init__(self, tensors):
+        self._work = flow._oneflow_internal.comm.RecordCommWork(list(tensors))
+
+    def is_completed(self):
+        """Returns True if the collective has finished, without blocking."""
+        return self._work.is_completed()
+
+    def wait(self):
+        """Blocks until the collective has finished."""
+        self._work.wait()
+        return True
@@ -0,0 +1,69 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import oneflow as flow
+
+
+def memory_stats() -> dict:
+    r"""Returns a dict of the host memory statistics of the caching cpu allocator.
+
+    The returned dict contains:
+
+    - ``allocated_bytes``: bytes currently held by tensors.
+    - ``reserved_bytes``: bytes obtained from the system, including the cached free memory.
+    - ``peak_allocated_bytes`` / ``peak_reserved_bytes``: the maximum of the above since
+      startup or the last call to :func:`reset_peak_memory_stats`.
+    - ``num_alloc_calls`` / ``num_free_calls``: number of allocations and deallocations.
+    - ``num_system_allocs`` / ``num_system_frees``: number of times memory was requested
+      from or returned to the system.
+
+    The caching can be disabled with ``ONEFLOW_CPU_CACHING_ALLOCATOR=0``, and the amount of
+    cached free memory is bounded by ``ONEFLOW_CPU_ALLOCATOR_MAX_CACHED_MB`` (2048 by default).
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> x = flow.ones(1024, 1024)
+        >>> flow.cpu.memory_stats()["allocated_bytes"] >= 4 * 1024 * 1024
+        True
+
+    """
+    flow._oneflow_internal.eager.Sync()
+    return flow._oneflow_internal.cpu.MemoryStats()
+
+
+def memory_allocated() -> int:
+    r"""Returns the host memory in bytes currently occupied by tensors."""
+    return memory_stats()["allocated_bytes"]
+
+
+def memory_reserved() -> int:
+    r"""Returns the host memory in bytes managed by the caching cpu allocator."""
+    return memory_stats()["reserved_bytes"]
+
+
+def reset_peak_memory_stats() -> None:
+    r"""Resets the peak statistics tracked by the caching cpu allocator."""
+    flow._oneflow_internal.cpu.ResetPeakMemoryStats()
+
+
+def empty_cache() -> None:
+    r"""Releases all unoccupied host memory cached by the caching cpu allocator back to
+    the system.
+    """
+    flow._oneflow_internal.eager.Sync()
+    flow._oneflow_internal.cpu.EmptyCache()
@@ -16,17 +16,124 @@ limitations under the License.
 """
 This file is mostly copied from PyTorch v1.8.1 torch/distributed/launch.py
 """
+import glob
 import os
+import re
+import shutil
 import signal
+import socket
 import subprocess
 import sys
 import time
 from argparse import REMAINDER, ArgumentParser
-from typing import IO, Any, List, Optional
+from typing import IO, Any, Dict, List, Optional, Tuple
 
 stdout_filename = "stdout"
 stderr_filename = "stderr"
 
+_sys_node_dir = "/sys/devices/system/node"
+_sys_cpu_dir = "/sys/devices/system/cpu"
+
+
+def _parse_cpulist(cpulist: str) -> List[int]:
+    """Parses the kernel cpulist format, e.g. ``0-3,8,10-11``."""
+    cpus = []
+    for part in cpulist.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            begin, end = part.split("-")
+            cpus.extend(range(int(begin), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def _format_cpulist(cpus: List[int]) -> str:
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(b) if b == e else f"{b}-{e}" for (b, e) in ranges)
+
+
+def _read_sys_file(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _read_numa_topology() -> List[Tuple[int, List[List[int]]]]:
+    """
+    Returns ``[(numa_node_id, physical_cores)]`` for the cpus this process may run on,
+    where each physical core is the list of its hyper-thread siblings. Falls back to a
+    single node when the kernel does not expose NUMA information.
+    """
+    allowed = set(os.sched_getaffinity(0))
+    node_cpus: Dict[int, List[int]] = {}
+    for node_dir in glob.glob(os.path.join(_sys_node_dir, "node[0-9]*")):
+        cpulist = _read_sys_file(os.path.join(node_dir, "cpulist"))
+        if cpulist is None:
+            continue
+        cpus = [cpu for cpu in _parse_cpulist(cpulist) if cpu in allowed]
+        if cpus:
+            node_cpus[int(re.findall(r"\d+$", node_dir)[0])] = cpus
+    if not node_cpus:
+        node_cpus[0] = sorted(allowed)
+    topology = []
+    for node_id in sorted(node_cpus):
+        cores: Dict[int, List[int]] = {}
+        for cpu in node_cpus[node_id]:
+            siblings = _read_sys_file(
+                os.path.join(
+                    _sys_cpu_dir, f"cpu{cpu}", "topology", "thread_siblings_list"
+                )
+            )
+            siblings = _parse_cpulist(siblings) if siblings is not None else [cpu]
+            cores.setdefault(min(siblings), []).append(cpu)
+        topology.append((node_id, [cores[key] for key in sorted(cores)]))
+    return topology
+
+
+def _assign_cores(
+    topology: List[Tuple[int, List[List[int]]]], nproc: int
+) -> List[Tuple[List[int], List[List[int]]]]:
+    """
+    Splits the physical cores into disjoint sets, one per local rank. Ranks are spread
+    evenly over NUMA nodes and never straddle one unless there are fewer ranks than nodes.
+    Returns ``[(numa_node_ids, physical_cores)]`` indexed by local rank.
+    """
+    num_nodes = len(topology)
+    plans = []
+    if nproc <= num_nodes:
+        for rank in range(nproc):
+            nodes = topology[
+                rank * num_nodes // nproc : (rank + 1) * num_nodes // nproc
+            ]
+            plans.append(
+                (
+                    [node_id for (node_id, _) in nodes],
+                    [c for (_, cs) in nodes for c in cs],
+                )
+            )
+        return plans
+    for (i, (node_id, cores)) in enumerate(topology):
+        node_nproc = (i + 1) * nproc // num_nodes - i * nproc // num_nodes
+        if len(cores) < node_nproc:
+            raise ValueError(
+                f"NUMA node {node_id} has {len(cores)} physical cores available, "
+                f"which is not enough for {node_nproc} processes."
+            )
+        for j in range(node_nproc):
+            begin = j * len(cores) // node_nproc
+            end = (j + 1) * len(cores) // node_nproc
+            plans.append(([node_id], cores[begin:end]))
+    return plans
+
 
 def parse_args():
     """
@@ -91,6 +198,64 @@ def parse_args():
         type=str,
         help=f"Relative path to write subprocess logs to. Passing in a relative\n        path will create a directory if needed. Note that\n        successive runs with the same path to write logs to will overwrite existing logs,\n        so be sure to save logs as needed.",
     )
+    parser.add_argument(
+        "--bind_cores",
+        "--bind-cores",
+        default=False,
+        action="store_true",
+        help="Pin each process to a disjoint set of physical cores on one NUMA node and set OMP_NUM_THREADS to match, unless it is already set.",
+    )
+    parser.add_argument(
+        "--numa_bind",
+        "--numa-bind",
+        default=False,
+        action="store_true",
+        help="Like --bind_cores, and also restrict memory allocation of each process to its NUMA node through numactl.",
+    )
+    parser.add_argument(
+        "--reserved_cores_per_proc",
+        default=0,
+        type=int,
+        help="The number of cores in each process's set that are left out of OMP_NUM_THREADS, e.g. for DataLoader workers. Only used with --bind_cores or --numa_bind.",
+    )
+    parser.add_argument(
+        "--max_restarts",
+        "--max-restarts",
+        default=0,
+        type=int,
+        help="Restart the local workers up to this many times when one of them fails. The attempt number is exported to the workers as RESTART_COUNT.",
+    )
+    parser.add_argument(
+        "--monitor_interval",
+        "--monitor-interval",
+        default=1.0,
+        type=float,
+        help="Seconds between two checks of the worker processes.",
+    )
+    parser.add_argument(
+        "--restart_backoff",
+        default=1.0,
+        type=float,
+        help="Seconds to wait before the first restart, doubled on every following restart.",
+    )
+    parser.add_argument(
+        "--rdzv_dir",
+        default=None,
+        type=str,
+        help="A directory on a filesystem shared by all nodes, used to agree on the nodes of every restart. Required with --max_restarts when --nnodes > 1. Use a fresh directory for every job.",
+    )
+    parser.add_argument(
+        "--min_nnodes",
+        default=None,
+        type=int,
+        help="The number of nodes a restart may continue with after --rdzv_timeout when some nodes do not come back. Defaults to --nnodes.",
+    )
+    parser.add_argument(
+        "--rdzv_timeout",
+        default=600,
+        type=float,
+        help="Seconds to wait for all nodes to join a restart.",
+    )
     parser.add_argument(
         "training_script",
         type=str,
@@ -100,113 +265,383 @@ def parse_args():
     return parser.parse_args()
 
 
-def main():
-    args = parse_args()
-    dist_world_size = args.nproc_per_node * args.nnodes
-    current_env = os.environ.copy()
-    current_env["MASTER_ADDR"] = args.master_addr
-    current_env["MASTER_PORT"] = str(args.master_port)
-    current_env["WORLD_SIZE"] = str(dist_world_size)
+class _FileRendezvous(object):
+    """
+    Agrees on the nodes taking part in each restart round through a directory shared by
+    all nodes. Round ``k`` lives in ``<rdzv_dir>/round_<k>``: every node writes a
+    ``node_<node_rank>`` file holding its address, and the first node that sees enough
+    nodes publishes the member list as ``members``. A node that arrives after the list
+    is published opens the next round, which makes the others restart and admit it.
+    """
 
-    if "OMP_NUM_THREADS" not in os.environ and args.nproc_per_node > 1:
-        current_env["OMP_NUM_THREADS"] = str(1)
-        print(
-            "*****************************************\n"
-            "Setting OMP_NUM_THREADS environment variable for each process "
-            "to be {} in default, to avoid your system being overloaded, "
-            "please further tune the variable for optimal performance in "
-            "your application as needed. \n"
-            "*****************************************".format(
-                current_env["OMP_NUM_THREADS"]
+    def __init__(self, rdzv_dir, node_rank, nnodes, min_nnodes, address, timeout):
+        self.rdzv_dir = rdzv_dir
+        self.node_rank = node_rank
+        self.nnodes = nnodes
+        self.min_nnodes = min_nnodes
+        self.address = address
+        self.timeout = timeout
+        os.makedirs(rdzv_dir, exist_ok=True)
+
+    def _round_dir(self, round_id):
+        return os.path.join(self.rdzv_dir, f"round_{round_id}")
+
+    def latest_round(self) -> int:
+        rounds = [
+            int(name[len("round_") :])
+            for name in os.listdir(self.rdzv_dir)
+            if re.fullmatch(r"round_\d+", name)
+        ]
+        return max(rounds, default=-1)
+
+    def _write_exclusive(self, path, content) -> bool:
+        # os.link fails if the target exists, so readers never see a partial file.
+        tmp_path = f"{path}.{self.node_rank}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        try:
+            os.link(tmp_path, path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp_path)
+
+    def _joined_nodes(self, round_dir) -> Dict[int, str]:
+        nodes = {}
+        for name in os.listdir(round_dir):
+            if re.fullmatch(r"node_\d+", name):
+                address = _read_sys_file(os.path.join(round_dir, name))
+                if address:
+                    nodes[int(name[len("node_") :])] = address.strip()
+        return nodes
+
+    def _read_members(self, round_dir) -> Optional[List[Tuple[int, str]]]:
+        content = _read_sys_file(os.path.join(round_dir, "members"))
+        if content is None:
+            return None
+        members = []
+        for line in content.splitlines():
+            (node_rank, address) = line.split()
+            members.append((int(node_rank), address))
+        return members
+
+    def join(self, round_id) -> Tuple[int, int, int, str]:
+        """
+        Joins round ``round_id``, or a later one if the other nodes have moved on.
+        Returns ``(round_id, node_rank, nnodes, master_addr)`` of the new node group.
+        """
+        while True:
+            round_id = max(round_id, self.latest_round())
+            round_dir = self._round_dir(round_id)
+            os.makedirs(round_dir, exist_ok=True)
+            self._write_exclusive(
+                os.path.join(round_dir, f"node_{self.node_rank}"), self.address
             )
+            start = time.time()
+            members = self._read_members(round_dir)
+            while members is None and self.latest_round() == round_id:
+                joined = self._joined_nodes(round_dir)
+                elapsed = time.time() - start
+                if len(joined) >= self.nnodes or (
+                    elapsed >= self.timeout and len(joined) >= self.min_nnodes
+                ):
+                    content = "".join(
+                        f"{node_rank} {joined[node_rank]}\n"
+                        for node_rank in sorted(joined)[: self.nnodes]
+                    )
+                    self._write_exclusive(os.path.join(round_dir, "members"), content)
+                elif elapsed >= self.timeout:
+                    raise RuntimeError(
+                        f"Rendezvous round {round_id} timed out with {len(joined)} of at least {self.min_nnodes} nodes."
+                    )
+                else:
+                    time.sleep(1)
+                members = self._read_members(round_dir)
+            if members is None:
+                continue
+            member_ranks = [node_rank for (node_rank, _) in members]
+            if self.node_rank in member_ranks:
+                return (
+                    round_id,
+                    member_ranks.index(self.node_rank),
+                    len(members),
+                    members[0][1],
+                )
+            print(f"Node {self.node_rank} missed rendezvous round {round_id}.")
+            round_id += 1
+
+
+def _worker_cmd(args) -> List[str]:
+    with_python = not args.no_python
+    cmd = []
+    if with_python:
+        cmd = [sys.executable, "-u"]
+        if args.module:
+            cmd.append("-m")
+    elif args.module:
+        raise ValueError(
+            "Don't use both the '--no_python' flag and the '--module' flag at the same time."
         )
+    cmd.append(args.training_script)
+    cmd.extend(args.training_script_args)
+    return cmd
+
 
+def _spawn_workers(
+    args, current_env, node_rank, core_plans, numactl, restart_count=0, elastic=False
+):
+    """
+    Starts the local worker group. Elastic workers get their own session so that the
+    group can be stopped without signalling the launcher.
+    """
     processes: List[Any] = []
-    if os.path.exists(args.logdir):
-        if not os.path.isdir(args.logdir):
-            raise ValueError("argument --logdir must be a path to a directory.")
-    else:
-        os.mkdir(os.path.join(os.getcwd(), args.logdir))
     subprocess_file_handles = []
+    if core_plans is not None:
+        print("local_rank  numa_node  omp_threads  cpus")
     for local_rank in range(0, args.nproc_per_node):
-        dist_rank = args.nproc_per_node * args.node_rank + local_rank
+        dist_rank = args.nproc_per_node * node_rank + local_rank
         current_env["RANK"] = str(dist_rank)
         current_env["LOCAL_RANK"] = str(local_rank)
-        with_python = not args.no_python
-        cmd = []
-        if with_python:
-            cmd = [sys.executable, "-u"]
-            if args.module:
-                cmd.append("-m")
-        elif args.module:
-            raise ValueError(
-                "Don't use both the '--no_python' flag and the '--module' flag at the same time."
+        cmd = _worker_cmd(args)
+        preexec_fn = None
+        if core_plans is not None:
+            (numa_nodes, cores) = core_plans[local_rank]
+            cpus = [cpu for core in cores for cpu in core]
+            if "OMP_NUM_THREADS" not in os.environ:
+                current_env["OMP_NUM_THREADS"] = str(
+                    max(len(cores) - args.reserved_cores_per_proc, 1)
+                )
+            print(
+                f"{local_rank:>10}  {_format_cpulist(numa_nodes):>9}  "
+                f"{current_env['OMP_NUM_THREADS']:>11}  {_format_cpulist(cpus)}"
             )
-        cmd.append(args.training_script)
-        cmd.extend(args.training_script_args)
-        stdout_handle: Optional[IO]
-        stderr_handle: Optional[IO]
+            if numactl is not None:
+                cmd = [numactl, f"--membind={_format_cpulist(numa_nodes)}"] + cmd
+            preexec_fn = lambda cpus=cpus: os.sched_setaffinity(0, cpus)
+        stdout_handle: Optional[IO] = None
+        stderr_handle: Optional[IO] = None
         log_directory_path = os.path.join(
             os.getcwd(), args.logdir, f"local_rank_{local_rank}"
         )
         os.makedirs(log_directory_path, exist_ok=True)
         current_env["GLOG_log_dir"] = log_directory_path
         if args.redirect_stdout_and_stderr:
-            node_rank = args.node_rank
-            stdout_handle = open(os.path.join(log_directory_path, stdout_filename), "w")
-            stderr_handle = open(os.path.join(log_directory_path, stderr_filename), "w")
+            # keep the logs of earlier attempts when restarting
+            mode = "w" if restart_count == 0 else "a"
+            stdout_handle = open(
+                os.path.join(log_directory_path, stdout_filename), mode
+            )
+            stderr_handle = open(
+                os.path.join(log_directory_path, stderr_filename), mode
+            )
             subprocess_file_handles.append((stdout_handle, stderr_handle))
             stdout_name = stdout_handle.name
             stderr_name = stderr_handle.name
             print(
                 f"Note: Stdout and stderr for node {node_rank} rank {local_rank} will\n            be written to {stdout_name}, {stderr_name} respectively."
             )
-        sig_names = {2: "SIGINT", 15: "SIGTERM"}
-        last_return_code = None
+        process = subprocess.Popen(
+            cmd,
+            env=current_env,
+            stdout=stdout_handle,
+            stderr=stderr_handle,
+            preexec_fn=preexec_fn,
+            start_new_session=elastic,
+        )
+        processes.append(process)
+    return processes, subprocess_file_handles
 
-        # set killing flag to make sure killing signal only executed once
-        kill_flag = True
 
-        def sigkill_handler(signum, frame):
-            nonlocal kill_flag
-            if not kill_flag:
-                return
-            for process in processes:
-                print(f"Killing subprocess {process.pid}")
-            kill_flag = False
+def _stop_workers(processes, timeout=30):
+    for process in processes:
+        if process.poll() is None:
+            print(f"Killing subprocess {process.pid}")
             try:
-                # Note: use os.kill or process.kill() may only kill current process
-                # use killpg will kill(use signal) this process and all sub-processes
-                #
-                # Note: Worker processes launched by data loader will exit automatically
-                # when its parent process exits because of `_prctl_pr_set_pdeathsig`.
-                os.killpg(os.getpid(), signal.SIGTERM)
-            except Exception:
+                os.killpg(process.pid, signal.SIGTERM)
+            except ProcessLookupError:
                 pass
-            if last_return_code is not None:
-                raise subprocess.CalledProcessError(
-                    returncode=last_return_code, cmd=cmd
-                )
-            if signum in sig_names:
-                print(f"Main process received {sig_names[signum]}, exiting")
-            sys.exit(1)
-
-        signal.signal(signal.SIGINT, sigkill_handler)
-        signal.signal(signal.SIGTERM, sigkill_handler)
-        stdout_handle = (
-            None
-            if not subprocess_file_handles
-            else subprocess_file_handles[local_rank][0]
+    deadline = time.time() + timeout
+    for process in processes:
+        try:
+            process.wait(timeout=max(deadline - time.time(), 0))
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            process.wait()
+
+
+def _run_elastic(args, current_env, core_plans, numactl):
+    """
+    Restarts the local worker group when a worker fails, at most ``--max_restarts``
+    times and with exponential backoff. Multi-node jobs agree on the nodes of every
+    attempt through a file rendezvous in ``--rdzv_dir``.
+    """
+    rendezvous = None
+    if args.nnodes > 1:
+        if args.rdzv_dir is None:
+            raise ValueError("--rdzv_dir is required to restart a multi-node job.")
+        address = args.master_addr if args.node_rank == 0 else socket.getfqdn()
+        rendezvous = _FileRendezvous(
+            args.rdzv_dir,
+            args.node_rank,
+            args.nnodes,
+            args.min_nnodes or args.nnodes,
+            address,
+            args.rdzv_timeout,
         )
-        stderr_handle = (
-            None
-            if not subprocess_file_handles
-            else subprocess_file_handles[local_rank][1]
+    processes: List[Any] = []
+
+    def sigkill_handler(signum, frame):
+        _stop_workers(processes)
+        sys.exit(1)
+
+    signal.signal(signal.SIGINT, sigkill_handler)
+    signal.signal(signal.SIGTERM, sigkill_handler)
+
+    restart_count = 0
+    while True:
+        (node_rank, nnodes, master_addr) = (
+            args.node_rank,
+            args.nnodes,
+            args.master_addr,
         )
-        process = subprocess.Popen(
-            cmd, env=current_env, stdout=stdout_handle, stderr=stderr_handle
+        if rendezvous is not None:
+            (restart_count, node_rank, nnodes, master_addr) = rendezvous.join(
+                restart_count
+            )
+            print(
+                f"Rendezvous round {restart_count}: node {args.node_rank} runs as node {node_rank} of {nnodes}"
+            )
+        current_env["MASTER_ADDR"] = master_addr
+        current_env["WORLD_SIZE"] = str(args.nproc_per_node * nnodes)
+        current_env["RESTART_COUNT"] = str(restart_count)
+        (processes, subprocess_file_handles) = _spawn_workers(
+            args, current_env, node_rank, core_plans, numactl, restart_count, True
         )
-        processes.append(process)
+        last_return_code = None
+        peer_restarted = False
+        try:
+            alive_processes = set(processes)
+            while len(alive_processes) and last_return_code is None:
+                time.sleep(args.monitor_interval)
+                for process in processes:
+                    if process.poll() is not None and process.returncode != 0:
+                        last_return_code = process.returncode
+                alive_processes = {p for p in processes if p.poll() is None}
+                if rendezvous is not None and rendezvous.latest_round() > restart_count:
+                    peer_restarted = True
+                    break
+        finally:
+            _stop_workers(processes)
+            for (stdout_handle, stderr_handle) in subprocess_file_handles:
+                stdout_handle.close()
+                stderr_handle.close()
+        if last_return_code is None and not peer_restarted:
+            return
+        if restart_count >= args.max_restarts:
+            print(f"Workers failed after {restart_count} restarts, exiting")
+            raise subprocess.CalledProcessError(
+                returncode=last_return_code or 1, cmd=_worker_cmd(args)
+            )
+        restart_count += 1
+        if peer_restarted:
+            print("Another node restarted its workers, restarting local workers")
+            continue
+        backoff = min(args.restart_backoff * 2 ** (restart_count - 1), 300)
+        print(
+            f"A worker exited with code {last_return_code}, restarting local workers "
+            f"({restart_count}/{args.max_restarts}) in {backoff:.1f}s"
+        )
+        time.sleep(backoff)
+
+
+def main():
+    args = parse_args()
+    dist_world_size = args.nproc_per_node * args.nnodes
+    current_env = os.environ.copy()
+    current_env["MASTER_ADDR"] = args.master_addr
+    current_env["MASTER_PORT"] = str(args.master_port)
+    current_env["WORLD_SIZE"] = str(dist_world_size)
+
+    bind_cores = args.bind_cores or args.numa_bind
+    if (
+        "OMP_NUM_THREADS" not in os.environ
+        and args.nproc_per_node > 1
+        and not bind_cores
+    ):
+        current_env["OMP_NUM_THREADS"] = str(1)
+        print(
+            "*****************************************\n"
+            "Setting OMP_NUM_THREADS environment variable for each process "
+            "to be {} in default, to avoid your system being overloaded, "
+            "please further tune the variable for optimal performance in "
+            "your application as needed. \n"
+            "*****************************************".format(
+                current_env["OMP_NUM_THREADS"]
+            )
+        )
+
+    core_plans = None
+    if bind_cores:
+        core_plans = _assign_cores(_read_numa_topology(), args.nproc_per_node)
+    numactl = None
+    if args.numa_bind:
+        numactl = shutil.which("numactl")
+        if numactl is None:
+            print(
+                "numactl is not found, --numa_bind only binds cores and relies on "
+                "first-touch allocation to keep memory on the local NUMA node."
+            )
+
+    if os.path.exists(args.logdir):
+        if not os.path.isdir(args.logdir):
+            raise ValueError("argument --logdir must be a path to a directory.")
+    else:
+        os.mkdir(os.path.join(os.getcwd(), args.logdir))
+
+    if args.max_restarts > 0:
+        _run_elastic(args, current_env, core_plans, numactl)
+        return
+
+    processes: List[Any] = []
+    sig_names = {2: "SIGINT", 15: "SIGTERM"}
+    last_return_code = None
+
+    # set killing flag to make sure killing signal only executed once
+    kill_flag = True
+
+    def sigkill_handler(signum, frame):
+        nonlocal kill_flag
+        if not kill_flag:
+            return
+        for process in processes:
+            print(f"Killing subprocess {process.pid}")
+        kill_flag = False
+        try:
+            # Note: use os.kill or process.kill() may only kill current process
+            # use killpg will kill(use signal) this process and all sub-processes
+            #
+            # Note: Worker processes launched by data loader will exit automatically
+            # when its parent process exits because of `_prctl_pr_set_pdeathsig`.
+            os.killpg(os.getpid(), signal.SIGTERM)
+        except Exception:
+            pass
+        if last_return_code is not None:
+            raise subprocess.CalledProcessError(
+                returncode=last_return_code, cmd=_worker_cmd(args)
+            )
+        if signum in sig_names:
+            print(f"Main process received {sig_names[signum]}, exiting")
+        sys.exit(1)
+
+    signal.signal(signal.SIGINT, sigkill_handler)
+    signal.signal(signal.SIGTERM, sigkill_handler)
+    (processes, subprocess_file_handles) = _spawn_workers(
+        args, current_env, args.node_rank, core_plans, numactl
+    )
     try:
         alive_processes = set(processes)
         while len(alive_processes):
@@ -220,7 +655,7 @@ def main():
                 else:
                     finished_processes.append(process)
             alive_processes = set(alive_processes) - set(finished_processes)
-            time.sleep(1)
+            time.sleep(args.monitor_interval)
     finally:
         for (stdout_handle, stderr_handle) in subprocess_file_handles:
             stdout_handle.close()
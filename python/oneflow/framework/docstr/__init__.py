@@ -23,6 +23,7 @@ from .dropout import *
 from .vision import *
 from .norm import *
 from .normalization import *
+from .attention import *
 from .loss import *
 from .onehot import *
 from .comparison import *
@@ -0,0 +1,56 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import oneflow
+from oneflow.framework.docstr.utils import add_docstr
+
+add_docstr(
+    oneflow.nn.functional.scaled_dot_product_attention,
+    r"""nn.functional.scaled_dot_product_attention(query, key, value, attn_mask=None, dropout_p=0.0, is_causal=False, scale=None, generator=None) -> Tensor
+
+    Computes :math:`\mathrm{softmax}(QK^T \cdot scale + M)V` with optional dropout on the
+    attention weights.
+
+    On CPU the attention weights are never materialized: keys are processed in blocks with an
+    online softmax, so memory grows linearly with the sequence length. The backward pass
+    recomputes the weights from the saved log-sum-exp of every query.
+
+    Args:
+        query (Tensor): tensor of shape :math:`(*, L, E)`.
+        key (Tensor): tensor of shape :math:`(*, S, E)`.
+        value (Tensor): tensor of shape :math:`(*, S, E_v)`.
+        attn_mask (Tensor, optional): additive mask broadcastable to :math:`(*, L, S)`. Use
+            ``-inf`` to exclude a position. The mask receives no gradient.
+        dropout_p (float): dropout probability of the attention weights. Default: 0.0
+        is_causal (bool): if ``True``, query ``i`` only attends to keys ``j <= i``. Default: ``False``
+        scale (float, optional): scaling factor of :math:`QK^T`. Default: :math:`1 / \sqrt{E}`
+
+    Returns:
+        Tensor of shape :math:`(*, L, E_v)`.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> q = flow.randn(2, 4, 16, 8)
+        >>> k = flow.randn(2, 4, 32, 8)
+        >>> v = flow.randn(2, 4, 32, 8)
+        >>> out = flow.nn.functional.scaled_dot_product_attention(q, k, v)
+        >>> out.shape
+        oneflow.Size([2, 4, 16, 8])
+
+    """,
+)
@@ -27,3 +27,11 @@ add_docstr(
 
     """,
 )
+
+add_docstr(
+    oneflow.get_num_threads,
+    """
+    Returns the number of threads used for intraop parallelism on CPU.
+
+    """,
+)
@@ -1262,6 +1262,8 @@ add_docstr(
         input (oneflow.Tensor): An input tensor.
         *args (oneflow.Tensor or oneflow.device or oneflow.dtype): Positional arguments
         **kwargs (oneflow.device or oneflow.dtype) : Key-value arguments
+        memory_format (oneflow.memory_format, optional): the desired memory format of the
+            returned Tensor. Default: ``oneflow.preserve_format``.
 
     Returns:
         oneflow.Tensor: A Tensor.
@@ -1723,9 +1725,42 @@ add_docstr(
 add_docstr(
     oneflow.Tensor.is_contiguous,
     r"""
-    Tensor.is_contiguous() -> bool
+    Tensor.is_contiguous(memory_format=oneflow.contiguous_format) -> bool
 
-    Returns True if `self` tensor is contiguous in memory.
+    Returns True if `self` tensor is contiguous in memory in the order specified by
+    memory format.
+
+    Args:
+        memory_format (oneflow.memory_format, optional): Specifies memory allocation order.
+            Default: ``oneflow.contiguous_format``.
+    """,
+)
+
+add_docstr(
+    oneflow.Tensor.contiguous,
+    r"""
+    Tensor.contiguous(memory_format=oneflow.contiguous_format) -> Tensor
+
+    Returns a contiguous in memory tensor containing the same data as `self` tensor. If
+    `self` tensor is already in the specified memory format, this function returns the
+    `self` tensor.
+
+    Args:
+        memory_format (oneflow.memory_format, optional): the desired memory format of the
+            returned Tensor. Default: ``oneflow.contiguous_format``.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+
+        >>> x = flow.randn(2, 3, 4, 5)
+        >>> y = x.contiguous(memory_format=flow.channels_last)
+        >>> y.stride()
+        (60, 1, 15, 3)
+        >>> y.is_contiguous(memory_format=flow.channels_last)
+        True
     """,
 )
 
@@ -15,6 +15,7 @@ limitations under the License.
 """
 import os
 import socket
+import threading
 import traceback
 from contextlib import closing
 
@@ -224,6 +225,39 @@ def GetEnv():
     return EnvHolder()
 
 
+def LazyInitEnabled():
+    return os.getenv("ONEFLOW_LAZY_INIT", "0").lower() in ("1", "true", "on")
+
+
+_default_env = None
+_default_env_lock = threading.Lock()
+
+
+def InitDefaultEnv():
+    """Creates the global env and the default session if they do not exist yet.
+
+    ``import oneflow`` calls this directly unless ``ONEFLOW_LAZY_INIT`` is set, in which
+    case it runs on the first tensor, placement, rank query or graph construction.
+    The transport token scope it sets up is thread local, so that first use should
+    happen on the thread that drives global tensors.
+    """
+    global _default_env
+    if _default_env is not None:
+        return _default_env
+    with _default_env_lock:
+        if _default_env is None:
+            env = GetEnv()
+            session_ctx.NewDefaultSession(env)
+            oneflow._oneflow_internal.InitDefaultConsistentTransportTokenScope()
+            _default_env = env
+    return _default_env
+
+
+def GetDefaultEnv():
+    """Returns the env created by `InitDefaultEnv`, or None if it has not been created."""
+    return _default_env
+
+
 device_tag2default_parallel_conf = {}
 default_env_proto = _DefaultEnvProto()
 config_master_addr = ctrl_bootstrap_pb.Address()
@@ -0,0 +1,109 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import importlib.abc
+import sys
+import time
+
+# Records how long each module takes to execute while ONEFLOW_IMPORT_PROFILE is set.
+# Self time excludes the modules imported from inside a module, cumulative time does not.
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, profiler, loader):
+        self._profiler = profiler
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(module.__name__)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    def __init__(self):
+        self._stack = []
+        self._records = []
+        self._in_find_spec = False
+
+    def find_spec(self, fullname, path, target=None):
+        if self._in_find_spec:
+            return None
+        self._in_find_spec = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._in_find_spec = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(self, spec.loader)
+        return spec
+
+    def _enter(self):
+        # [start time, time spent in nested imports]
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _exit(self, name):
+        start, nested = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][1] += cumulative
+        self._records.append((name, cumulative - nested, cumulative))
+
+    def report(self, title, file=None):
+        records, self._records = self._records, []
+        if len(records) == 0:
+            return
+        file = file if file is not None else sys.stderr
+        total = sum(self_time for (_, self_time, _) in records)
+        print(
+            f"{title}: {len(records)} modules, {total * 1000:.1f} ms", file=file,
+        )
+        print(f"{'self(ms)':>10} {'cumulative(ms)':>15}  module", file=file)
+        for (name, self_time, cumulative) in sorted(
+            records, key=lambda r: r[1], reverse=True
+        ):
+            print(
+                f"{self_time * 1000:10.2f} {cumulative * 1000:15.2f}  {name}", file=file
+            )
+
+
+_profiler = None
+
+
+def start():
+    global _profiler
+    if _profiler is None:
+        _profiler = ImportProfiler()
+        sys.meta_path.insert(0, _profiler)
+
+
+def report(title):
+    if _profiler is not None:
+        _profiler.report(title)
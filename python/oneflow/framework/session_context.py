@@ -28,6 +28,12 @@ class SessionStatus:
 
 def GetDefaultSession():
     global _sess_id2sess
+    if len(_sess_id2sess) == 0:
+        # The default session is created together with the env, which is deferred
+        # until first use when ONEFLOW_LAZY_INIT is set.
+        import oneflow.framework.env_util as env_util
+
+        env_util.InitDefaultEnv()
     default_sess_id = oneflow._oneflow_internal.GetDefaultSessionId()
     assert default_sess_id in _sess_id2sess
     return _sess_id2sess[default_sess_id]
@@ -845,7 +845,56 @@ def _format(self, format_spec):
     return object.__format__(self, format_spec)
 
 
+_pybind_contiguous = Tensor.contiguous
+_pybind_is_contiguous = Tensor.is_contiguous
+
+
+def _is_channels_last(self):
+    if self.dim() != 4:
+        return False
+    shape = self.shape
+    stride = self.stride()
+    expected_stride = 1
+    # NHWC order from the innermost dim to the outermost one: C, W, H, N
+    for dim in (1, 3, 2, 0):
+        if shape[dim] != 1 and stride[dim] != expected_stride:
+            return False
+        expected_stride *= shape[dim]
+    return True
+
+
+def _contiguous(self, memory_format=None):
+    if memory_format is None or memory_format is flow.contiguous_format:
+        return _pybind_contiguous(self)
+    if memory_format is flow.channels_last:
+        return flow._C.to_memory_format(self, "channels_last")
+    raise RuntimeError(
+        f"memory format {memory_format} is not supported by the contiguous operator"
+    )
+
+
+def _is_contiguous(self, memory_format=None):
+    if memory_format is None or memory_format is flow.contiguous_format:
+        return _pybind_is_contiguous(self)
+    if memory_format is flow.channels_last:
+        return _is_channels_last(self)
+    raise RuntimeError(
+        f"memory format {memory_format} is not supported by is_contiguous"
+    )
+
+
 def _to(self, *args, **kwargs):
+    memory_format = kwargs.pop("memory_format", None)
+    if memory_format is not None and len(args) == 0 and len(kwargs) == 0:
+        result = self
+    else:
+        result = _to_device_or_dtype(self, *args, **kwargs)
+    if memory_format is None or memory_format is flow.preserve_format:
+        return result
+    return result.contiguous(memory_format=memory_format)
+
+
+def _to_device_or_dtype(self, *args, **kwargs):
     new_args = list()
     # If device is single int, replace it with flow.device("cuda:{device}")
     if len(args) > 0 and isinstance(args[0], int):
@@ -1213,6 +1262,8 @@ def RegisterMethods():
     Tensor.unsqueeze = _unsqueeze
     Tensor.permute = _permute
     Tensor.to = _to
+    Tensor.contiguous = _contiguous
+    Tensor.is_contiguous = _is_contiguous
     Tensor.gather = _gather
     Tensor.all = _all
     Tensor.any = _any
@@ -71,6 +71,7 @@ from oneflow.nn.modules.moving_average_min_max_observer import (
 )
 from oneflow.nn.modules.fake_quantization import FakeQuantization
 from oneflow.nn.modules.quantization import Quantization
+from oneflow.nn.modules.quantized import QuantizedConv2d, QuantizedLinear
 from oneflow.nn.modules.distributed_partial_fc_sample import (
     DistributedPariticalFCSample,
 )
@@ -134,7 +135,7 @@ from oneflow.nn.modules.pooling import (
     AdaptiveAvgPool2d,
     AdaptiveAvgPool3d,
 )
-from oneflow.nn.modules.sparse import Embedding
+from oneflow.nn.modules.sparse import Embedding, EmbeddingBag
 from oneflow.nn.modules.upsampling import (
     Upsample,
     UpsamplingBilinear2d,
@@ -52,6 +52,7 @@ from oneflow._C import threshold
 from oneflow._C import silu
 from oneflow._C import mish
 from oneflow._C import layer_norm
+from oneflow._C import scaled_dot_product_attention
 from oneflow._C import dropout
 from oneflow._C import smooth_l1_loss
 from oneflow._C import pad
@@ -61,6 +62,6 @@ from oneflow._C import ctc_greedy_decoder
 from oneflow._C import one_hot
 from oneflow._C import normalize
 from oneflow._C import cross_entropy
-from oneflow.nn.modules.sparse import embedding
+from oneflow.nn.modules.sparse import embedding, embedding_bag
 from oneflow.nn.modules.linear import linear
 from oneflow.nn.modules.activation import relu6
@@ -23,6 +23,7 @@ import numpy as np
 import oneflow as flow
 from oneflow.framework.tensor import Tensor
 from oneflow.nn.parameter import Parameter
+from oneflow.utils.hooks import BackwardHook, RemovableHandle
 from contextlib import contextmanager
 
 
@@ -58,6 +59,7 @@ class Module(object):
         self._buffers = OrderedDict()
         self._non_persistent_buffers_set = set()
         self._backward_hooks = OrderedDict()
+        self._backward_pre_hooks = OrderedDict()
         self._is_full_backward_hook = None
         self._forward_hooks = OrderedDict()
         self._forward_pre_hooks = OrderedDict()
@@ -76,6 +78,17 @@ class Module(object):
                     result = (result,)
                 args = result
 
+        backward_hook = None
+        if (
+            len(self._backward_hooks) > 0 or len(self._backward_pre_hooks) > 0
+        ) and flow.is_grad_enabled():
+            backward_hook = BackwardHook(
+                self,
+                list(self._backward_hooks.values()),
+                list(self._backward_pre_hooks.values()),
+            )
+            args = backward_hook.setup_input_hook(args)
+
         res = self.forward(*args, **kwargs)
 
         for hook in itertools.chain(self._forward_hooks.values()):
@@ -83,6 +96,9 @@ class Module(object):
             if result is not None:
                 res = result
 
+        if backward_hook is not None:
+            res = backward_hook.setup_output_hook(res)
+
         return res
 
     def add_module(self, name: str, module: Optional["Module"]) -> None:
@@ -332,7 +348,10 @@ class Module(object):
                 "If you need gradients in your forward method, consider using autograd.grad instead."
             )
 
+        from oneflow.nn.modules.sparse import clear_sparse_grad
+
         for p in self.parameters():
+            clear_sparse_grad(p)
             if p.grad is not None:
                 if set_to_none:
                     p.grad = None
@@ -488,11 +507,71 @@ class Module(object):
                 destination = hook_result
         return destination
 
-    def register_forward_pre_hook(self, hook: Callable[..., None]) -> None:
-        self._forward_pre_hooks[len(self._forward_pre_hooks)] = hook
+    def register_forward_pre_hook(self, hook: Callable[..., None]) -> RemovableHandle:
+        r"""Registers a forward pre-hook on the module.
+
+        The hook will be called every time before :func:`forward` is invoked
+        with the signature ``hook(module, input) -> None or modified input``.
+
+        Returns:
+            a handle that can be used to remove the added hook by calling
+            ``handle.remove()``
+        """
+        handle = RemovableHandle(self._forward_pre_hooks)
+        self._forward_pre_hooks[handle.id] = hook
+        return handle
+
+    def register_forward_hook(self, hook: Callable[..., None]) -> RemovableHandle:
+        r"""Registers a forward hook on the module.
+
+        The hook will be called every time after :func:`forward` has computed an output
+        with the signature ``hook(module, input, output) -> None or modified output``.
+
+        Returns:
+            a handle that can be used to remove the added hook by calling
+            ``handle.remove()``
+        """
+        handle = RemovableHandle(self._forward_hooks)
+        self._forward_hooks[handle.id] = hook
+        return handle
+
+    def register_full_backward_hook(self, hook: Callable[..., None]) -> RemovableHandle:
+        r"""Registers a backward hook on the module.
+
+        The hook will be called every time the gradients with respect to the module
+        inputs are computed, with the signature
+        ``hook(module, grad_input, grad_output) -> tuple(Tensor) or None``.
+
+        ``grad_input`` and ``grad_output`` are tuples that contain the gradients with
+        respect to the positional inputs and outputs, entries that are not tensors
+        requiring grad are ``None``. The hook may return a new ``grad_input`` that
+        will be used in place of ``grad_input`` in the subsequent computations.
+
+        Returns:
+            a handle that can be used to remove the added hook by calling
+            ``handle.remove()``
+        """
+        self._is_full_backward_hook = True
+        handle = RemovableHandle(self._backward_hooks)
+        self._backward_hooks[handle.id] = hook
+        return handle
+
+    def register_full_backward_pre_hook(
+        self, hook: Callable[..., None]
+    ) -> RemovableHandle:
+        r"""Registers a backward pre-hook on the module.
 
-    def register_forward_hook(self, hook: Callable[..., None]) -> None:
-        self._forward_hooks[len(self._forward_hooks)] = hook
+        The hook will be called every time the gradients with respect to the module
+        outputs are computed, before the backward of the module runs, with the signature
+        ``hook(module, grad_output) -> tuple(Tensor) or None``.
+
+        Returns:
+            a handle that can be used to remove the added hook by calling
+            ``handle.remove()``
+        """
+        handle = RemovableHandle(self._backward_pre_hooks)
+        self._backward_pre_hooks[handle.id] = hook
+        return handle
 
     def _apply(self, fn, applied_dict=None):
         # A dict to store tensors that has already been applied.
@@ -559,7 +638,22 @@ class Module(object):
         fn(self)
         return self
 
-    def to(self, device: Optional[Union[str, flow.device]] = None):
+    def to(
+        self,
+        device: Optional[Union[str, flow.device]] = None,
+        memory_format: Optional[flow.memory_format] = None,
+    ):
+        if memory_format is not None:
+            # Parameters keep their contiguous layout so that optimizers update them in place,
+            # layout aware submodules convert their activations to ``memory_format`` instead.
+            # ``preserve_format`` keeps the current format, as in ``Tensor.to``.
+            if memory_format is not flow.preserve_format:
+                for module in self.modules():
+                    if hasattr(module, "_memory_format"):
+                        module._memory_format = memory_format
+            if device is None:
+                return self
+
         def convert(t):
             return t.to(device)
 
@@ -102,9 +102,12 @@ class _BatchNorm(_NormBase):
     ):
         super().__init__(num_features, eps, momentum, affine, track_running_stats)
         self.channel_axis = 1
+        self._memory_format = None
 
     def forward(self, x):
         self._check_input_dim(x)
+        if self._memory_format is not None and x.dim() == 4:
+            x = x.contiguous(memory_format=self._memory_format)
         if self.training:
             is_training = True
         else:
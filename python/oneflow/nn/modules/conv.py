@@ -372,6 +372,7 @@ class Conv2d(Module):
             self.channel_pos = "channels_last"
         else:
             self.channel_pos = "channels_first"
+        self._memory_format = None
 
         assert in_channels % groups == 0
         assert out_channels % groups == 0
@@ -402,6 +403,8 @@ class Conv2d(Module):
     def forward(self, x):
         if self.channel_pos == "channels_first":
             in_channel_axis = 1
+            if self._memory_format is not None and x.dim() == 4:
+                x = x.contiguous(memory_format=self._memory_format)
         else:
             in_channel_axis = 3
         if x.shape[in_channel_axis] != self.in_channels:
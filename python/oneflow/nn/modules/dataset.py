@@ -399,17 +399,33 @@ class OFRecordImageDecoderRandomCrop(Module):
 
 
 class OFRecordImageDecoder(Module):
-    def __init__(self, blob_name: str, color_space: str = "BGR"):
+    """Decodes the encoded image stored in the ``blob_name`` field of each OFRecord.
+
+    If ``cache_size_bytes`` is positive, decoded images are kept in an in-memory
+    LRU cache of at most that many bytes (counting the decoded images and the
+    encoded bytes they are keyed by), so that records seen again in later epochs
+    are not decoded again. Random
+    augmentations placed after the decoder still run every epoch.
+    """
+
+    def __init__(
+        self, blob_name: str, color_space: str = "BGR", cache_size_bytes: int = 0
+    ):
         super().__init__()
         self._op = (
             flow.stateful_op("ofrecord_image_decoder").Input("in").Output("out").Build()
         )
         self.blob_name = blob_name
         self.color_space = color_space
+        self.cache_size_bytes = cache_size_bytes
 
     def forward(self, input):
         res = _C.dispatch_ofrecord_image_decoder(
-            self._op, input, name=self.blob_name, color_space=self.color_space
+            self._op,
+            input,
+            name=self.blob_name,
+            color_space=self.color_space,
+            cache_size_bytes=self.cache_size_bytes,
         )
         return res
 
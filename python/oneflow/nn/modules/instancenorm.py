@@ -28,32 +28,10 @@ class _InstanceNorm(_NormBase):
     ):
         super().__init__(num_features, eps, momentum, affine, track_running_stats)
 
-    def _forward(self, x):
-        axis = 1
-        params_shape = [x.shape[axis]]
-        weight = self.weight
-        bias = self.bias
-        nd_params_shape = [1] * len(x.shape)
-        nd_params_shape[axis] = params_shape[0]
-        mean = x.mean(2, keepdim=True)
-        variance = x.var(2, unbiased=False, keepdim=True)
-        normalized = (x - mean) / flow.sqrt(variance + self.eps)
-        if self.weight is not None and params_shape[0] == self.weight.nelement():
-            weight = flow.reshape(self.weight, shape=nd_params_shape)
-        if self.bias is not None and params_shape[0] == self.bias.nelement():
-            bias = flow.reshape(self.bias, shape=nd_params_shape)
-        if self.weight is not None:
-            normalized = normalized * weight
-        if self.bias is not None:
-            normalized = normalized + bias
-        return normalized
-
     def forward(self, x):
         self._check_input_dim(x)
-        reshape_to_1d = flow.reshape(x, [x.shape[0], x.shape[1], -1])
-        normalized_1d_out = self._forward(reshape_to_1d)
-        reshape_back_to_nd = flow.reshape(normalized_1d_out, list(x.shape))
-        return reshape_back_to_nd
+        # Instance norm is group norm with one channel per group.
+        return flow._C.group_norm(x, x.shape[1], self.weight, self.bias, self.eps)
 
 
 class InstanceNorm1d(_InstanceNorm):
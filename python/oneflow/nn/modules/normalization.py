@@ -110,22 +110,9 @@ class GroupNorm(Module):
         assert (
             input.shape[1] == self.num_channels
         ), "The channels of input tensor must equal num_channels"
-        origin_shape = input.shape
-        reshape_to_1d = flow.reshape(
-            input, shape=[origin_shape[0], self.num_groups, -1]
+        return flow._C.group_norm(
+            input, self.num_groups, self.weight, self.bias, self.eps
         )
-        mean = flow.mean(reshape_to_1d, dim=2, keepdim=True)
-        variance = flow.var(reshape_to_1d, dim=2, unbiased=False, keepdim=True)
-        normalized = (reshape_to_1d - mean) / flow.sqrt(variance + self.eps)
-        normalized = flow.reshape(
-            normalized, shape=[origin_shape[0], self.num_channels, -1]
-        )
-        if self.weight is not None:
-            normalized = normalized * self.weight.reshape(1, self.num_channels, 1)
-        if self.bias is not None:
-            normalized = normalized + self.bias.reshape(1, self.num_channels, 1)
-        res = flow.reshape(normalized, shape=tuple(input.shape))
-        return res
 
     def extra_repr(self) -> str:
         return "{num_groups}, {num_channels}, eps={eps}, affine={affine}".format(
@@ -260,57 +247,23 @@ class LayerNorm(Module):
                     f"Given normalized_shape={self.normalized_shape}, expected input with shape [*, {str(self.normalized_shape)[1:-1]}], but got input of size {x.shape}"
                 )
 
-        if not x.is_cuda:
-            reduce_axis = []
-            for dim in range(len(x.shape)):
-                if dim >= self.begin_norm_axis:
-                    reduce_axis.append(dim)
-            mean = x.mean(dim=reduce_axis, keepdim=True)
-            variance = x.var(dim=reduce_axis, unbiased=False, keepdim=True)
-            params_shape = x.shape[self.begin_params_axis :]
-            weight = self.weight
-            bias = self.bias
-            if len(mean.shape) == 1:
-                nd_params_shape = [1] * len(x.shape)
-                nd_params_shape[self.begin_norm_axis] = params_shape[0]
-                mean = flow.reshape(mean, shape=nd_params_shape)
-                variance = flow.reshape(variance, nd_params_shape)
-                if (
-                    self.weight is not None
-                    and params_shape[0] == self.weight.nelement()
-                ):
-                    weight = flow.reshape(self.weight, shape=nd_params_shape)
-                if self.bias is not None and params_shape[0] == self.bias.nelement():
-                    bias = flow.reshape(self.bias, shape=nd_params_shape)
-            elif len(mean.shape) == len(x.shape):
-                pass
-            else:
-                raise ValueError(
-                    "shape of mean and variance should be 1D or has number of axes and x's"
-                )
-            variance += self.eps
-            normalized = (x - mean) * variance.rsqrt()
-            if self.elementwise_affine:
-                normalized = normalized * weight + bias
-            return normalized
+        if self.elementwise_affine:
+            res = flow._C.layer_norm_affine(
+                x,
+                self.weight,
+                self.bias,
+                begin_norm_axis=self.begin_norm_axis,
+                begin_params_axis=self.begin_params_axis,
+                epsilon=self.eps,
+            )
         else:
-            if self.elementwise_affine:
-                res = flow._C.layer_norm_affine(
-                    x,
-                    self.weight,
-                    self.bias,
-                    begin_norm_axis=self.begin_norm_axis,
-                    begin_params_axis=self.begin_params_axis,
-                    epsilon=self.eps,
-                )
-            else:
-                res = flow._C.layer_norm(
-                    x,
-                    begin_norm_axis=self.begin_norm_axis,
-                    begin_params_axis=self.begin_params_axis,
-                    epsilon=self.eps,
-                )
-            return res
+            res = flow._C.layer_norm(
+                x,
+                begin_norm_axis=self.begin_norm_axis,
+                begin_params_axis=self.begin_params_axis,
+                epsilon=self.eps,
+            )
+        return res
 
     def extra_repr(self) -> str:
         return "{normalized_shape}, eps={eps}, elementwise_affine={elementwise_affine}".format(
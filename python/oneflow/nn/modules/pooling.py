@@ -246,8 +246,11 @@ class MaxPool2d(Module):
             self.channel_pos = "channels_last"
         else:
             self.channel_pos = "channels_first"
+        self._memory_format = None
 
     def forward(self, x):
+        if self.channel_pos == "channels_first" and self._memory_format is not None:
+            x = x.contiguous(memory_format=self._memory_format)
         if not self.return_indices:
             return flow._C.max_pool2d(
                 x,
@@ -554,9 +557,12 @@ class AvgPool2d(Module):
             self.padding = _pair(padding)
             self.count_include_pad = count_include_pad
             self.divisor_override = int(divisor_override)
+        self._memory_format = None
 
     def forward(self, x):
         if self.data_format == "NCHW":
+            if self._memory_format is not None and x.dim() == 4:
+                x = x.contiguous(memory_format=self._memory_format)
             return flow._C.avg_pool2d(
                 x,
                 kernel_size=self.kernel_size,
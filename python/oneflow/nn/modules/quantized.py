@@ -0,0 +1,266 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import oneflow as flow
+from oneflow.nn.module import Module
+from oneflow.nn.modules.utils import _pair
+
+
+def _quantize_weight_per_channel(weight):
+    # Symmetric int8 weights with one scale per output channel, computed by the min max
+    # observer in the same way as for quantization aware training.
+    scale, zero_point = flow._C.min_max_observer(
+        weight.detach(), "google", 8, "symmetric", False
+    )
+    # Channels of all zeros would otherwise be divided by a zero scale.
+    scale = flow.where(scale > 0, scale, flow.ones_like(scale))
+    quantized = flow._C.quantization(
+        weight.detach(), scale, zero_point, "google", 8, "symmetric"
+    )
+    return quantized.to(flow.int8), scale
+
+
+class QuantizedLinear(Module):
+    """Applies a linear transformation with int8 weights: :math:`y = act(xA^T + b)`.
+
+    The float input is quantized to uint8 with the affine ``input_scale`` and
+    ``input_zero_point`` collected during calibration, multiplied with the per output
+    channel quantized int8 weight into int32 accumulators, and requantized back to float
+    together with the bias and the activation in the same kernel.
+
+    Only CPU float32 inputs are supported. Instances are usually created by
+    :func:`oneflow.quantization.convert` or :meth:`from_float`.
+
+    Args:
+        in_features: size of each input sample
+        out_features: size of each output sample
+        bias: If set to ``False``, the layer will not add an additive bias. Default: ``True``
+        input_scale (float): scale of the uint8 quantized input. Default: 1.0
+        input_zero_point (int): zero point of the uint8 quantized input, in [0, 255]. Default: 0
+        activation (str): ``"none"`` or ``"relu"``, fused into the output. Default: ``"none"``
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> linear = flow.nn.Linear(20, 30)
+        >>> m = flow.nn.QuantizedLinear.from_float(linear, input_scale=0.02, input_zero_point=128)
+        >>> m.weight.dtype
+        oneflow.int8
+        >>> m(flow.randn(128, 20)).shape
+        oneflow.Size([128, 30])
+
+    """
+
+    def __init__(
+        self,
+        in_features: int,
+        out_features: int,
+        bias: bool = True,
+        input_scale: float = 1.0,
+        input_zero_point: int = 0,
+        activation: str = "none",
+    ) -> None:
+        super().__init__()
+        self.in_features = in_features
+        self.out_features = out_features
+        self.input_scale = float(input_scale)
+        self.input_zero_point = int(input_zero_point)
+        self.activation = activation
+        self.register_buffer(
+            "weight", flow.zeros(out_features, in_features, dtype=flow.int8)
+        )
+        self.register_buffer("weight_scale", flow.ones(out_features))
+        if bias:
+            self.register_buffer("bias", flow.zeros(out_features))
+        else:
+            self.register_buffer("bias", None)
+
+    @classmethod
+    def from_float(
+        cls, mod, input_scale: float, input_zero_point: int, activation: str = "none"
+    ):
+        """Creates a :class:`QuantizedLinear` from a float :class:`oneflow.nn.Linear`."""
+        qmod = cls(
+            mod.in_features,
+            mod.out_features,
+            bias=mod.bias is not None,
+            input_scale=input_scale,
+            input_zero_point=input_zero_point,
+            activation=activation,
+        )
+        qmod.weight, qmod.weight_scale = _quantize_weight_per_channel(mod.weight)
+        if mod.bias is not None:
+            qmod.bias = mod.bias.detach().clone()
+        return qmod
+
+    def forward(self, x):
+        return flow._C.quantized_linear(
+            x,
+            self.weight,
+            self.weight_scale,
+            self.input_scale,
+            self.input_zero_point,
+            self.bias,
+            self.activation,
+        )
+
+    def extra_repr(self) -> str:
+        return "in_features={}, out_features={}, bias={}, input_scale={}, input_zero_point={}, activation={}".format(
+            self.in_features,
+            self.out_features,
+            self.bias is not None,
+            self.input_scale,
+            self.input_zero_point,
+            self.activation,
+        )
+
+
+class QuantizedConv2d(Module):
+    """Applies a 2D convolution with int8 weights over an NCHW input.
+
+    The float input is quantized to uint8 with the affine ``input_scale`` and
+    ``input_zero_point`` collected during calibration and convolved with the per output
+    channel quantized int8 weight into int32 accumulators, which are requantized back to
+    float together with the bias and the activation in the same kernel.
+
+    Only CPU float32 inputs with ``channels_first`` layout and ``zeros`` padding are
+    supported. Instances are usually created by :func:`oneflow.quantization.convert` or
+    :meth:`from_float`.
+
+    Args:
+        in_channels (int): Number of channels in the input image
+        out_channels (int): Number of channels produced by the convolution
+        kernel_size (int or tuple): Size of the convolving kernel
+        stride (int or tuple, optional): Stride of the convolution. Default: 1
+        padding (int or tuple, optional): Zero-padding added to both sides of the input. Default: 0
+        dilation (int or tuple, optional): Spacing between kernel elements. Default: 1
+        groups (int, optional): Number of blocked connections from input channels to output channels. Default: 1
+        bias (bool, optional): If ``True``, adds a learnable bias to the output. Default: ``True``
+        input_scale (float): scale of the uint8 quantized input. Default: 1.0
+        input_zero_point (int): zero point of the uint8 quantized input, in [0, 255]. Default: 0
+        activation (str): ``"none"`` or ``"relu"``, fused into the output. Default: ``"none"``
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> conv = flow.nn.Conv2d(3, 8, 3, padding=1)
+        >>> m = flow.nn.QuantizedConv2d.from_float(conv, input_scale=0.02, input_zero_point=128)
+        >>> m(flow.randn(2, 3, 16, 16)).shape
+        oneflow.Size([2, 8, 16, 16])
+
+    """
+
+    def __init__(
+        self,
+        in_channels: int,
+        out_channels: int,
+        kernel_size,
+        stride=1,
+        padding=0,
+        dilation=1,
+        groups: int = 1,
+        bias: bool = True,
+        input_scale: float = 1.0,
+        input_zero_point: int = 0,
+        activation: str = "none",
+    ) -> None:
+        super().__init__()
+        assert in_channels % groups == 0
+        assert out_channels % groups == 0
+        self.in_channels = in_channels
+        self.out_channels = out_channels
+        self.kernel_size = _pair(kernel_size)
+        self.stride = _pair(stride)
+        self.padding = _pair(padding)
+        self.dilation = _pair(dilation)
+        self.groups = groups
+        self.input_scale = float(input_scale)
+        self.input_zero_point = int(input_zero_point)
+        self.activation = activation
+        self.register_buffer(
+            "weight",
+            flow.zeros(
+                out_channels, in_channels // groups, *self.kernel_size, dtype=flow.int8
+            ),
+        )
+        self.register_buffer("weight_scale", flow.ones(out_channels))
+        if bias:
+            self.register_buffer("bias", flow.zeros(out_channels))
+        else:
+            self.register_buffer("bias", None)
+
+    @classmethod
+    def from_float(
+        cls, mod, input_scale: float, input_zero_point: int, activation: str = "none"
+    ):
+        """Creates a :class:`QuantizedConv2d` from a float :class:`oneflow.nn.Conv2d`."""
+        if mod.channel_pos != "channels_first":
+            raise ValueError("QuantizedConv2d only supports channels_first Conv2d")
+        qmod = cls(
+            mod.in_channels,
+            mod.out_channels,
+            mod.kernel_size,
+            stride=mod.stride,
+            padding=mod.padding,
+            dilation=mod.dilation,
+            groups=mod.groups,
+            bias=mod.bias is not None,
+            input_scale=input_scale,
+            input_zero_point=input_zero_point,
+            activation=activation,
+        )
+        qmod.weight, qmod.weight_scale = _quantize_weight_per_channel(mod.weight)
+        if mod.bias is not None:
+            qmod.bias = mod.bias.detach().clone()
+        return qmod
+
+    def forward(self, x):
+        return flow._C.quantized_conv2d(
+            x,
+            self.weight,
+            self.weight_scale,
+            self.input_scale,
+            self.input_zero_point,
+            self.bias,
+            stride=self.stride,
+            padding=self.padding,
+            dilation=self.dilation,
+            groups=self.groups,
+            activation=self.activation,
+        )
+
+    def extra_repr(self):
+        s = "{in_channels}, {out_channels}, kernel_size={kernel_size}, stride={stride}"
+        if self.padding != (0,) * len(self.padding):
+            s += ", padding={padding}"
+        if self.dilation != (1,) * len(self.dilation):
+            s += ", dilation={dilation}"
+        if self.groups != 1:
+            s += ", groups={groups}"
+        if self.bias is None:
+            s += ", bias=False"
+        s += ", input_scale={input_scale}, input_zero_point={input_zero_point}"
+        s += ", activation={activation}"
+        return s.format(**self.__dict__)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod(raise_on_error=True)
@@ -19,6 +19,126 @@ import oneflow as flow
 from oneflow.framework.tensor import Tensor
 from oneflow.nn.module import Module
 
+# Gradients of embedding tables created with ``sparse=True`` are stored on the
+# weight itself as a ``_sparse_grad`` attribute holding an ``(indices, values)``
+# pair. Duplicate indices are reduced by the ``indexed_slices_*_update`` kernels
+# of the optimizers.
+
+
+def get_sparse_grad(param):
+    """Returns the ``(indices, values)`` gradient of ``param`` accumulated by sparse
+    embedding lookups, or ``None`` if it has not received one.
+    """
+    return getattr(param, "_sparse_grad", None)
+
+
+def clear_sparse_grad(param):
+    if get_sparse_grad(param) is not None:
+        param._sparse_grad = None
+
+
+def coalesce_sparse_grad(param):
+    """Sums the rows of the sparse gradient of ``param`` that share an index.
+
+    The sum of every index is stored in its first row and the duplicated rows are
+    set to zero, so the values can be clipped or have their norm taken as if they
+    were the dense gradient. Returns the coalesced ``(indices, values)`` pair, or
+    ``None`` if ``param`` has no sparse gradient.
+    """
+    sparse_grad = get_sparse_grad(param)
+    if sparse_grad is None:
+        return None
+    indices, values = sparse_grad
+    if indices.shape[0] > 1:
+        with flow.no_grad():
+            indices, order = flow.sort(indices)
+            values = flow.index_select(values, 0, order)
+            is_first = flow.cat(
+                [
+                    flow.ones(1, dtype=flow.bool, device=indices.device),
+                    indices[1:] != indices[:-1],
+                ]
+            )
+            segment_ids = flow.cumsum(is_first.to(flow.int64), dim=0) - 1
+            sums = flow.scatter_add(
+                flow.zeros_like(values),
+                0,
+                segment_ids.unsqueeze(1).expand(*values.shape),
+                values,
+            )
+            values = flow.index_select(sums, 0, segment_ids) * is_first.to(
+                values.dtype
+            ).unsqueeze(1)
+        param._sparse_grad = (indices, values)
+    return param._sparse_grad
+
+
+def sparse_grad_with_l2(param, sparse_grad, l2):
+    """Returns ``sparse_grad`` with the L2 penalty ``l2 * param`` of the rows it holds
+    added, once per index, like the dense optimizer updates add it to the gradient.
+
+    The ``indexed_slices_*_update`` kernels sum the rows sharing an index, so the
+    penalty is appended as extra rows rather than added to every duplicate.
+    """
+    if l2 == 0:
+        return sparse_grad
+    indices, values = sparse_grad
+    sorted_indices, _ = flow.sort(indices)
+    is_first = flow.cat(
+        [
+            flow.ones(1, dtype=flow.bool, device=indices.device),
+            sorted_indices[1:] != sorted_indices[:-1],
+        ]
+    )
+    penalty = flow.index_select(param, 0, sorted_indices) * (
+        is_first.to(values.dtype).unsqueeze(1) * l2
+    )
+    return (
+        flow.cat([indices, sorted_indices.to(indices.dtype)], dim=0),
+        flow.cat([values, penalty], dim=0),
+    )
+
+
+def _accumulate_sparse_grad(param, indices, values):
+    sparse_grad = get_sparse_grad(param)
+    if sparse_grad is not None:
+        prev_indices, prev_values = sparse_grad
+        indices = flow.cat([prev_indices, indices], dim=0)
+        values = flow.cat([prev_values, values], dim=0)
+    param._sparse_grad = (indices, values)
+
+
+def _use_sparse_grad(weight):
+    return (
+        weight.requires_grad
+        and flow.is_grad_enabled()
+        and not weight.is_lazy
+        and not weight.is_global
+    )
+
+
+def _sparse_gather(weight, indices, padding_idx=None):
+    if not _use_sparse_grad(weight):
+        return flow._C.gather(weight, indices, axis=0)
+
+    # Only the gathered rows take part in autograd, so backward never materializes
+    # a gradient of the whole table.
+    res = flow._C.gather(weight.detach(), indices, axis=0)
+    res.requires_grad_()
+    flat_indices = indices.flatten()
+    embedding_dim = weight.shape[-1]
+
+    def accumulate_grad(grad):
+        values = grad.reshape(-1, embedding_dim)
+        if padding_idx is not None:
+            values = values * (flat_indices != padding_idx).to(values.dtype).unsqueeze(
+                1
+            )
+        _accumulate_sparse_grad(weight, flat_indices, values)
+
+    res.register_hook(accumulate_grad)
+    return res
+
 
 class Embedding(Module):
     """A simple lookup table that stores embeddings of a fixed dictionary and size.
@@ -35,6 +155,9 @@ class Embedding(Module):
                                     i.e. it remains as a fixed "pad". For a newly constructed Embedding,
                                     the embedding vector at :attr:`padding_idx` will default to all zeros,
                                     but can be updated to another value to be used as the padding vector.
+        sparse (bool, optional): If ``True``, the gradient w.r.t. :attr:`weight` only holds the rows looked up
+                                 in the batch, and :class:`oneflow.optim.SGD`, :class:`oneflow.optim.Adam` and
+                                 :class:`oneflow.optim.Adagrad` update just those rows. Default: ``False``
     
     For example:
 
@@ -77,7 +200,6 @@ class Embedding(Module):
         assert max_norm is None, "Not support max_norm yet!"
         assert norm_type is None, "Not support norm_type yet!"
         assert scale_grad_by_freq is False, "Not support scale_grad_by_freq=True yet!"
-        assert sparse is False, "Not support sparse=True yet!"
         if _weight is None:
             self.weight = flow.nn.Parameter(Tensor(num_embeddings, embedding_dim))
             self.reset_parameters()
@@ -99,6 +221,8 @@ class Embedding(Module):
                 self.weight[self.padding_idx].fill_(0)
 
     def forward(self, indices):
+        if self.sparse:
+            return _sparse_gather(self.weight, indices, self.padding_idx)
         res = flow._C.gather(self.weight, indices, axis=0)
         return res
 
@@ -127,6 +251,8 @@ def embedding(
         padding_idx (int, optional): If specified, the entries at :attr:`padding_idx` do not contribute to the gradient;
                                      therefore, the embedding vector at :attr:`padding_idx` is not updated during training,
                                      i.e. it remains as a fixed "pad".
+        sparse (bool, optional): If ``True``, the gradient w.r.t. :attr:`weight` will be a sparse gradient.
+            See :class:`oneflow.nn.Embedding` for more details regarding sparse gradients.
 
     For example:
 
@@ -151,13 +277,216 @@ def embedding(
     assert max_norm is None, "Not support max_norm yet!"
     assert norm_type is None, "Not support norm_type yet!"
     assert scale_grad_by_freq is False, "Not support scale_grad_by_freq=True yet!"
-    assert sparse is False, "Not support sparse=True yet!"
     if padding_idx is not None:
         weight[padding_idx].fill_(0)
+    if sparse:
+        return _sparse_gather(weight, input, padding_idx)
     res = flow._C.gather(weight, input, axis=0)
     return res
 
 
+def _sparse_embedding_bag(weight, indices, offsets, per_sample_weights, mode):
+    if not _use_sparse_grad(weight):
+        return flow._C.embedding_bag(weight, indices, offsets, per_sample_weights, mode)
+
+    detached_weight = weight.detach()
+    res = flow._C.embedding_bag(
+        detached_weight, indices, offsets, per_sample_weights, mode
+    )
+    # already part of the graph when per_sample_weights requires grad
+    if not res.requires_grad:
+        res.requires_grad_()
+
+    def accumulate_grad(grad):
+        values = flow._C.embedding_bag_grad(
+            grad, detached_weight, indices, offsets, per_sample_weights, mode
+        )
+        _accumulate_sparse_grad(weight, indices, values)
+
+    res.register_hook(accumulate_grad)
+    return res
+
+
+def _embedding_bag_inputs(input, offsets, per_sample_weights, include_last_offset):
+    if per_sample_weights is not None:
+        assert (
+            per_sample_weights.shape == input.shape
+        ), "per_sample_weights must have the same shape as input"
+    if input.ndim == 2:
+        assert offsets is None, "offsets has to be None if input is 2D"
+        batch_size, bag_size = input.shape
+        offsets = flow.arange(
+            0, batch_size * bag_size, bag_size, dtype=input.dtype, device=input.device,
+        )
+        input = input.flatten()
+        if per_sample_weights is not None:
+            per_sample_weights = per_sample_weights.flatten()
+    elif input.ndim == 1:
+        assert offsets is not None, "offsets has to be a 1D Tensor if input is 1D"
+        assert offsets.ndim == 1, "offsets has to be a 1D Tensor"
+        offsets = offsets.to(input.dtype)
+        if include_last_offset:
+            offsets = offsets[:-1]
+    else:
+        raise ValueError(
+            f"input has to be 1D or 2D Tensor, but got Tensor of dimension {input.ndim}"
+        )
+    return input, offsets, per_sample_weights
+
+
+class EmbeddingBag(Module):
+    """Computes sums, means or maxes of `bags` of embeddings, without instantiating the
+    intermediate embeddings.
+
+    For bags of constant length, no :attr:`per_sample_weights` and 2D inputs, this class
+
+        * with ``mode="sum"`` is equivalent to :class:`oneflow.nn.Embedding` followed by ``oneflow.sum(dim=1)``,
+        * with ``mode="mean"`` is equivalent to :class:`oneflow.nn.Embedding` followed by ``oneflow.mean(dim=1)``,
+        * with ``mode="max"`` is equivalent to :class:`oneflow.nn.Embedding` followed by ``oneflow.max(dim=1)``.
+
+    Bags of variable length are given as a 1D :attr:`input` holding all indices and a 1D
+    :attr:`offsets` holding the start position of each bag in :attr:`input`. Empty bags
+    produce zeros.
+
+    Args:
+        num_embeddings (int): size of the dictionary of embeddings
+        embedding_dim (int): the size of each embedding vector
+        mode (str, optional): ``"sum"``, ``"mean"`` or ``"max"``. Specifies the way to reduce the bag.
+                              Default: ``"mean"``
+        sparse (bool, optional): If ``True``, the gradient w.r.t. :attr:`weight` only holds the rows looked up
+                                 in the batch. See :class:`oneflow.nn.Embedding` for more details regarding
+                                 sparse gradients. Default: ``False``
+        include_last_offset (bool, optional): If ``True``, :attr:`offsets` has one additional element, the size
+                                              of :attr:`input`. Default: ``False``
+
+    Inputs:
+        - **input** (Tensor): 2D Tensor of bags of constant length, or 1D Tensor of concatenated bags
+        - **offsets** (Tensor, optional): start position of each bag in a 1D :attr:`input`
+        - **per_sample_weights** (Tensor, optional): weights of the same shape as :attr:`input` that scale
+          each looked up embedding, only supported for ``mode="sum"``. No gradient is computed for them.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+
+        >>> m = flow.nn.EmbeddingBag(10, 3, mode="sum")
+        >>> input = flow.tensor([1, 2, 4, 5, 4, 3, 2, 9], dtype=flow.int64)
+        >>> offsets = flow.tensor([0, 4], dtype=flow.int64)
+        >>> m(input, offsets).shape
+        oneflow.Size([2, 3])
+
+    """
+
+    def __init__(
+        self,
+        num_embeddings: int,
+        embedding_dim: int,
+        max_norm: Optional[float] = None,
+        norm_type: float = 2.0,
+        scale_grad_by_freq: bool = False,
+        mode: str = "mean",
+        sparse: bool = False,
+        _weight: Optional[Tensor] = None,
+        include_last_offset: bool = False,
+        padding_idx: Optional[int] = None,
+    ):
+        super().__init__()
+        self.num_embeddings = num_embeddings
+        self.embedding_dim = embedding_dim
+        assert max_norm is None, "Not support max_norm yet!"
+        assert scale_grad_by_freq is False, "Not support scale_grad_by_freq=True yet!"
+        assert padding_idx is None, "Not support padding_idx yet!"
+        assert mode in ("sum", "mean", "max"), f"Unsupported mode {mode}"
+        if _weight is None:
+            self.weight = flow.nn.Parameter(Tensor(num_embeddings, embedding_dim))
+            self.reset_parameters()
+        else:
+            assert list(_weight.shape) == [
+                num_embeddings,
+                embedding_dim,
+            ], "Shape of weight does not match num_embeddings and embedding_dim"
+            self.weight = flow.nn.Parameter(_weight)
+        self.mode = mode
+        self.sparse = sparse
+        self.include_last_offset = include_last_offset
+
+    def reset_parameters(self) -> None:
+        flow.nn.init.normal_(self.weight)
+
+    def forward(self, input, offsets=None, per_sample_weights=None):
+        return embedding_bag(
+            input,
+            self.weight,
+            offsets,
+            mode=self.mode,
+            sparse=self.sparse,
+            per_sample_weights=per_sample_weights,
+            include_last_offset=self.include_last_offset,
+        )
+
+    def extra_repr(self) -> str:
+        return f"{self.num_embeddings}, {self.embedding_dim}, mode={self.mode}"
+
+
+def embedding_bag(
+    input,
+    weight,
+    offsets=None,
+    max_norm=None,
+    norm_type=2,
+    scale_grad_by_freq=False,
+    mode="mean",
+    sparse=False,
+    per_sample_weights=None,
+    include_last_offset=False,
+    padding_idx=None,
+):
+    r"""Computes sums, means or maxes of `bags` of embeddings, without instantiating the
+    intermediate embeddings.
+
+    See :class:`oneflow.nn.EmbeddingBag` for more details.
+
+    Args:
+        input (LongTensor): Tensor containing bags of indices into the embedding matrix
+        weight (Tensor): The embedding matrix with number of rows equal to the maximum possible index + 1,
+            and number of columns equal to the embedding size
+        offsets (LongTensor, optional): Only used when :attr:`input` is 1D. :attr:`offsets` determines
+            the starting index position of each bag in :attr:`input`.
+        mode (str, optional): ``"sum"``, ``"mean"`` or ``"max"``. Default: ``"mean"``
+        sparse (bool, optional): If ``True``, the gradient w.r.t. :attr:`weight` will be a sparse gradient.
+        per_sample_weights (Tensor, optional): weights of the same shape as :attr:`input`, only supported
+            for ``mode="sum"``.
+        include_last_offset (bool, optional): If ``True``, :attr:`offsets` has one additional element,
+            the size of :attr:`input`. Default: ``False``
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> import oneflow.nn.functional as F
+
+        >>> embedding_matrix = flow.rand(10, 3)
+        >>> input = flow.tensor([1, 2, 4, 5, 4, 3, 2, 9])
+        >>> offsets = flow.tensor([0, 4])
+        >>> F.embedding_bag(input, embedding_matrix, offsets).shape
+        oneflow.Size([2, 3])
+    """
+    assert max_norm is None, "Not support max_norm yet!"
+    assert scale_grad_by_freq is False, "Not support scale_grad_by_freq=True yet!"
+    assert padding_idx is None, "Not support padding_idx yet!"
+    if per_sample_weights is not None:
+        assert mode == "sum", "per_sample_weights is only supported for mode='sum'"
+    input, offsets, per_sample_weights = _embedding_bag_inputs(
+        input, offsets, per_sample_weights, include_last_offset
+    )
+    if sparse:
+        return _sparse_embedding_bag(weight, input, offsets, per_sample_weights, mode)
+    return flow._C.embedding_bag(weight, input, offsets, per_sample_weights, mode)
+
+
 if __name__ == "__main__":
     import doctest
 
@@ -108,8 +108,11 @@ class Upsample(Module):
         self.scale_factor = scale_factor
         self.mode = mode
         self.align_corners = align_corners
+        self._memory_format = None
 
     def forward(self, x):
+        if self._memory_format is not None and x.dim() == 4:
+            x = x.contiguous(memory_format=self._memory_format)
         return flow.nn.functional.interpolate(
             x,
             size=self.size,
@@ -18,6 +18,7 @@ import math
 from typing import Callable, Dict, Iterator, List, Tuple, Union
 
 import oneflow as flow
+from oneflow.nn.modules.sparse import get_sparse_grad, sparse_grad_with_l2
 from oneflow.nn.optimizer.optimizer import Optimizer, ParamGroup
 from oneflow.nn.parameter import Parameter
 
@@ -129,6 +130,15 @@ class Adagrad(Optimizer):
             .Input("sum")
             .Build()
         )
+        self._indexed_slices_op = (
+            flow.stateful_op("indexed_slices_adagrad_update")
+            .Input("model")
+            .Input("model_diff_indices")
+            .Input("model_diff_values")
+            .Input("learning_rate")
+            .Input("sum")
+            .Build()
+        )
 
     def step(self, closure: Callable = None):
         """Performs a single optimization step.
@@ -150,6 +160,9 @@ class Adagrad(Optimizer):
                     "train_step_val": self._state["step"] + 1,
                 }
                 for param in param_group.parameters:
+                    sparse_grad = get_sparse_grad(param)
+                    if sparse_grad is not None:
+                        self._sparse_update(param, sparse_grad, param_group)
                     if param.grad is None:
                         continue
                     sum_tensor = self._state[param]["sum"]
@@ -160,6 +173,21 @@ class Adagrad(Optimizer):
             self._state["step"] = self._state["step"] + 1
             return loss
 
+    def _sparse_update(self, param, sparse_grad, param_group):
+        # Lazy Adagrad: only the rows present in the sparse gradient update their
+        # accumulated squares, the learning rate decays and weight decay is applied as
+        # an L2 penalty the same way as in the dense update.
+        indices, values = sparse_grad_with_l2(
+            param, sparse_grad, param_group["weight_decay"]
+        )
+        lr = param_group["lr"] / (1 + self._state["step"] * param_group["lr_decay"])
+        learning_rate = flow.tensor([lr], dtype=flow.float32, device=param.device)
+        flow._C.dispatch_indexed_slices_adagrad_update(
+            self._indexed_slices_op,
+            (param, indices, values, learning_rate, self._state[param]["sum"]),
+            epsilon=param_group["eps"],
+        )
+
     def _generate_conf_for_graph(self, train_conf, vars_conf):
         new_opt_confs = []
         for param_group in self.param_groups:
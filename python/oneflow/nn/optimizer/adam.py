@@ -17,6 +17,7 @@ import math
 from typing import Callable, Dict, Iterator, List, Tuple, Union
 
 import oneflow as flow
+from oneflow.nn.modules.sparse import get_sparse_grad, sparse_grad_with_l2
 from oneflow.nn.optimizer.optimizer import Optimizer, ParamGroup
 from oneflow.nn.parameter import Parameter
 
@@ -161,6 +162,33 @@ class Adam(Optimizer):
             .Build()
         )
 
+        self._indexed_slices_op_with_amsgrad = (
+            flow.stateful_op("indexed_slices_adam_update")
+            .Input("model")
+            .Input("model_diff_indices")
+            .Input("model_diff_values")
+            .Input("learning_rate")
+            .Input("bias_correction1")
+            .Input("bias_correction2")
+            .Input("m")
+            .Input("v")
+            .Input("max_v")
+            .Build()
+        )
+
+        self._indexed_slices_op_without_amsgrad = (
+            flow.stateful_op("indexed_slices_adam_update")
+            .Input("model")
+            .Input("model_diff_indices")
+            .Input("model_diff_values")
+            .Input("learning_rate")
+            .Input("bias_correction1")
+            .Input("bias_correction2")
+            .Input("m")
+            .Input("v")
+            .Build()
+        )
+
     def step(self, closure: Callable = None):
         """Performs a single optimization step.
 
@@ -194,7 +222,8 @@ class Adam(Optimizer):
                     "amsgrad": param_group["amsgrad"],
                 }
                 for param in param_group.parameters:
-                    if param.grad is None:
+                    sparse_grad = get_sparse_grad(param)
+                    if param.grad is None and sparse_grad is None:
                         continue
                     if "exp_avg" not in self._state[param]:
                         self._state[param]["exp_avg"] = flow.zeros_like(param)
@@ -209,6 +238,11 @@ class Adam(Optimizer):
                     m_tensor = self._state[param]["exp_avg"]
                     v_tensor = self._state[param]["exp_avg_sq"]
 
+                    if sparse_grad is not None:
+                        self._sparse_update(param, sparse_grad, param_group)
+                    if param.grad is None:
+                        continue
+
                     if param_group["amsgrad"]:
                         max_v_tensor = self._state[param]["max_exp_avg_sq"]
                         flow._C.dispatch_adam_update(
@@ -227,6 +261,46 @@ class Adam(Optimizer):
 
             return loss
 
+    def _sparse_update(self, param, sparse_grad, param_group):
+        # Lazy Adam: only the rows present in the sparse gradient update their
+        # moments, weight decay is the same L2 penalty as in the dense update and
+        # only applies to those rows.
+        indices, values = sparse_grad_with_l2(
+            param, sparse_grad, param_group["weight_decay"]
+        )
+        learning_rate, bias_correction1, bias_correction2 = (
+            flow.tensor([value], dtype=flow.float32, device=param.device)
+            for value in (
+                param_group["lr"],
+                param_group["bias_correction1"],
+                param_group["bias_correction2"],
+            )
+        )
+        inputs = (
+            param,
+            indices,
+            values,
+            learning_rate,
+            bias_correction1,
+            bias_correction2,
+            self._state[param]["exp_avg"],
+            self._state[param]["exp_avg_sq"],
+        )
+        if param_group["amsgrad"]:
+            op = self._indexed_slices_op_with_amsgrad
+            inputs += (self._state[param]["max_exp_avg_sq"],)
+        else:
+            op = self._indexed_slices_op_without_amsgrad
+        flow._C.dispatch_indexed_slices_adam_update(
+            op,
+            inputs,
+            beta1=param_group["betas"][0],
+            beta2=param_group["betas"][1],
+            epsilon=param_group["eps"],
+            amsgrad=param_group["amsgrad"],
+            do_bias_correction=param_group["do_bias_correction"],
+        )
+
     def _generate_conf_for_graph(self, train_conf, vars_conf):
         new_opt_confs = []
         for param_group in self.param_groups:
@@ -21,6 +21,7 @@ from typing import Any, Callable, Dict, Union
 
 from oneflow.framework.tensor import Tensor
 from oneflow.nn.graph.block import TensorBlock
+from oneflow.nn.modules.sparse import clear_sparse_grad, get_sparse_grad
 from oneflow.nn.parameter import Parameter
 from oneflow.nn.utils.clip_grad import clip_grad_norm_
 import oneflow as flow
@@ -287,6 +288,7 @@ class Optimizer(object):
         """
         for param_group in self.param_groups:
             for param in param_group.parameters:
+                clear_sparse_grad(param)
                 if param.grad is not None:
                     if set_to_none:
                         param.grad = None
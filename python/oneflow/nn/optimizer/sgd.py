@@ -17,6 +17,7 @@ import collections
 from typing import Callable, Dict, Iterator, List, Union
 
 import oneflow as flow
+from oneflow.nn.modules.sparse import get_sparse_grad, sparse_grad_with_l2
 from oneflow.nn.parameter import Parameter
 
 from .optimizer import Optimizer, ParamGroup
@@ -126,6 +127,23 @@ class SGD(Optimizer):
         self._sgd = (
             flow.stateful_op("sgd_update").Input("model").Input("model_diff").Build()
         )
+        self._indexed_slices_momentum_sgd = (
+            flow.stateful_op("indexed_slices_momentum_update")
+            .Input("model")
+            .Input("model_diff_indices")
+            .Input("model_diff_values")
+            .Input("learning_rate")
+            .Input("momentum")
+            .Build()
+        )
+        self._indexed_slices_sgd = (
+            flow.stateful_op("indexed_slices_sgd_update")
+            .Input("model")
+            .Input("model_diff_indices")
+            .Input("model_diff_values")
+            .Input("learning_rate")
+            .Build()
+        )
 
     def step(self, closure: Callable = None):
         """Performs a single optimization step.
@@ -142,6 +160,9 @@ class SGD(Optimizer):
                 lr = param_group["lr"]
                 l2 = param_group["weight_decay"]
                 for param in param_group.parameters:
+                    sparse_grad = get_sparse_grad(param)
+                    if sparse_grad is not None:
+                        self._sparse_update(param, sparse_grad, param_group)
                     if param.grad is None:
                         continue
                     if param_group["momentum"] == 0.0:
@@ -163,6 +184,35 @@ class SGD(Optimizer):
             self._state["step"] = self._state["step"] + 1
             return loss
 
+    def _sparse_update(self, param, sparse_grad, param_group):
+        # Lazy update: only the rows present in the sparse gradient (and their
+        # momentum) are touched, weight decay is the same L2 penalty as in the
+        # dense update and only applies to those rows.
+        indices, values = sparse_grad_with_l2(
+            param, sparse_grad, param_group["weight_decay"]
+        )
+        learning_rate = flow.tensor(
+            [param_group["lr"]], dtype=flow.float32, device=param.device
+        )
+        if param_group["momentum"] == 0.0:
+            flow._C.dispatch_indexed_slices_sgd_update(
+                self._indexed_slices_sgd, (param, indices, values, learning_rate),
+            )
+        else:
+            if "momentum_buf" not in self._state[param]:
+                self._state[param]["momentum_buf"] = flow.zeros_like(param)
+            flow._C.dispatch_indexed_slices_momentum_update(
+                self._indexed_slices_momentum_sgd,
+                (
+                    param,
+                    indices,
+                    values,
+                    learning_rate,
+                    self._state[param]["momentum_buf"],
+                ),
+                beta=param_group["momentum"],
+            )
+
     def _generate_conf_for_graph(self, train_conf, vars_conf):
         new_opt_confs = []
         for param_group in self.param_groups:
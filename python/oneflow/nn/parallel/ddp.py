@@ -69,6 +69,12 @@ def DistributedDataParallel(
     module: "flow.nn.Module", *, broadcast_buffers: bool = True, bucket_size: int = 10
 ):
     assert all(x.dtype == flow.float32 for x in module.parameters())
+    # Sparse embedding gradients never reach the gradient buckets, so the
+    # allreduce of the bucket holding such a weight would never start.
+    assert not any(
+        isinstance(m, (flow.nn.Embedding, flow.nn.EmbeddingBag)) and m.sparse
+        for m in module.modules()
+    ), "DistributedDataParallel does not support embeddings with sparse=True"
     if parse_boolean_form_env("ONEFLOW_DISABLE_VIEW", False):
         warnings.warn(
             "because the environment variable 'ONEFLOW_DISABLE_VIEW' is set to true, so the view mechanism is disabled, and we will set bucket_size = 1"
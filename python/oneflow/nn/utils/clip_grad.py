@@ -23,6 +23,7 @@ import oneflow as flow
 from oneflow.framework.tensor import Tensor
 from oneflow.framework.tensor import register_tensor_op
 from oneflow.nn.module import Module
+from oneflow.nn.modules.sparse import coalesce_sparse_grad, get_sparse_grad
 
 
 _tensor_or_tensors = Union[Tensor, Iterable[Tensor]]
@@ -38,6 +39,9 @@ def clip_grad_norm_(
     The norm is computed over all gradients together, as if they were
     concatenated into a single vector.
 
+    Sparse gradients of embedding tables created with ``sparse=True`` take part in the
+    norm and are scaled as well.
+
     Args:
         parameters (Iterable[Tensor] or Tensor): an iterable of Tensors or a
             single Tensor that will have gradients normalized
@@ -85,7 +89,9 @@ def clip_grad_norm_(
 
     if isinstance(parameters, (Tensor, flow._oneflow_internal.Tensor)):
         parameters = [parameters]
-    parameters = [p for p in parameters if p.grad is not None]
+    parameters = [
+        p for p in parameters if p.grad is not None or get_sparse_grad(p) is not None
+    ]
     max_norm = float(max_norm)
     norm_type = float(norm_type)
     if len(parameters) == 0:
@@ -135,20 +141,25 @@ def clip_grad_norm_(
         for p in parameters:
             p.grad.detach().mul_(clip_coef_clamped)
     else:
-        device = parameters[0].grad.device
+        grads = [p.grad.detach() for p in parameters if p.grad is not None]
+        # The duplicated rows of a sparse gradient have to be summed first, otherwise
+        # their norm is not the norm of the gradient they stand for.
+        grads += [
+            coalesce_sparse_grad(p)[1]
+            for p in parameters
+            if get_sparse_grad(p) is not None
+        ]
+        device = grads[0].device
         if norm_type == float("inf"):
-            norms = [p.grad.detach().abs().max().to(device) for p in parameters]
+            norms = [g.abs().max().to(device) for g in grads]
             total_norm = norms[0] if len(norms) == 1 else flow.max(flow.stack(norms))
         elif norm_type == float("-inf"):
-            norms = [p.grad.detach().abs().min().to(device) for p in parameters]
+            norms = [g.abs().min().to(device) for g in grads]
             total_norm = norms[0] if len(norms) == 1 else flow.min(flow.stack(norms))
         else:
             total_norm = flow.linalg.vector_norm(
                 flow.stack(
-                    [
-                        flow.linalg.vector_norm(p.grad.detach(), norm_type).to(device)
-                        for p in parameters
-                    ]
+                    [flow.linalg.vector_norm(g, norm_type).to(device) for g in grads]
                 ),
                 norm_type,
             )
@@ -163,15 +174,16 @@ def clip_grad_norm_(
             )
         clip_coef = max_norm / (total_norm + 1e-6)
         clip_coef_clamped = clip_coef.clamp(max=1.0)
-        for p in parameters:
-            p.grad.detach().mul_(clip_coef_clamped.to(p.grad.device))
+        for g in grads:
+            g.mul_(clip_coef_clamped.to(g.device))
     return total_norm
 
 
 def clip_grad_value_(parameters: _tensor_or_tensors, clip_value: float) -> None:
     r"""Clips gradient of an iterable of parameters at specified value.
 
-    Gradients are modified in-place.
+    Gradients are modified in-place. Sparse gradients of embedding tables created with
+    ``sparse=True`` are clipped after the rows sharing an index are summed.
 
     Args:
         parameters (Iterable[Tensor] or Tensor): an iterable of Tensors or a
@@ -182,10 +194,15 @@ def clip_grad_value_(parameters: _tensor_or_tensors, clip_value: float) -> None:
     """
     if isinstance(parameters, flow.Tensor):
         parameters = [parameters]
+    parameters = list(parameters)
     clip_value = float(clip_value)
     for p in filter(lambda p: p.grad is not None, parameters):
         # TODO: Switch to inplace clamp function
         p.grad[:] = p.grad.clamp(min=-clip_value, max=clip_value)
+    for p in parameters:
+        sparse_grad = coalesce_sparse_grad(p)
+        if sparse_grad is not None:
+            sparse_grad[1].clamp_(min=-clip_value, max=clip_value)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,287 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+from collections import OrderedDict
+
+
+class Event(object):
+    r"""A single record produced by :class:`oneflow.profiler.profile`.
+
+    ``kind`` is ``"dispatch"`` for the time the interpreter thread spent dispatching
+    an eager op, ``"kernel"`` for the time a vm worker thread spent running its
+    kernel and ``"user"`` for ranges annotated with
+    :class:`oneflow.profiler.record_function`. Times are in microseconds.
+    """
+
+    def __init__(
+        self,
+        name,
+        kind,
+        device="",
+        input_shapes=None,
+        input_dtypes=None,
+        start_us=0.0,
+        end_us=0.0,
+        allocated_bytes=0,
+        thread_id=0,
+        stack="",
+    ):
+        self.name = name
+        self.kind = kind
+        self.device = device
+        self.input_shapes = list(input_shapes or [])
+        self.input_dtypes = list(input_dtypes or [])
+        self.start_us = start_us
+        self.end_us = end_us
+        self.allocated_bytes = allocated_bytes
+        self.thread_id = thread_id
+        self.stack = stack
+
+    @property
+    def duration_us(self):
+        return self.end_us - self.start_us
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            name=d["name"],
+            kind=d["kind"],
+            device=d["device"],
+            input_shapes=d["input_shapes"],
+            input_dtypes=d["input_dtypes"],
+            start_us=d["start_ns"] / 1000.0,
+            end_us=d["end_ns"] / 1000.0,
+            allocated_bytes=d["allocated_bytes"],
+            thread_id=d["thread_id"],
+            stack=d["stack"],
+        )
+
+    def __repr__(self):
+        return "<Event name={} kind={} device={} duration_us={:.3f}>".format(
+            self.name, self.kind, self.device, self.duration_us
+        )
+
+
+class KeyAverage(object):
+    r"""Statistics of all the events that share the same key.
+
+    ``count`` is the number of calls, ``cpu_time_total`` sums the dispatch time and
+    ``kernel_time_total`` sums the kernel time, both in microseconds.
+    """
+
+    def __init__(self, name, input_shapes="", stack=""):
+        self.name = name
+        self.input_shapes = input_shapes
+        self.stack = stack
+        self.devices = set()
+        self.count = 0
+        self.kernel_count = 0
+        self.cpu_time_total = 0.0
+        self.kernel_time_total = 0.0
+        self.allocated_bytes = 0
+
+    def add(self, event):
+        self.devices.add(event.device)
+        if event.kind == "kernel":
+            self.kernel_count += 1
+            self.kernel_time_total += event.duration_us
+            self.allocated_bytes += event.allocated_bytes
+        else:
+            self.count += 1
+            self.cpu_time_total += event.duration_us
+
+    @property
+    def device(self):
+        return ",".join(sorted(d for d in self.devices if d))
+
+    @property
+    def cpu_time(self):
+        return self.cpu_time_total / self.count if self.count > 0 else 0.0
+
+    @property
+    def kernel_time(self):
+        return (
+            self.kernel_time_total / self.kernel_count if self.kernel_count > 0 else 0.0
+        )
+
+    def __repr__(self):
+        return "<KeyAverage name={} count={} cpu_time_total={:.3f} kernel_time_total={:.3f}>".format(
+            self.name, self.count, self.cpu_time_total, self.kernel_time_total
+        )
+
+
+def _format_time(time_us):
+    if time_us >= 1e6:
+        return "{:.3f}s".format(time_us / 1e6)
+    if time_us >= 1e3:
+        return "{:.3f}ms".format(time_us / 1e3)
+    return "{:.3f}us".format(time_us)
+
+
+def _format_bytes(nbytes):
+    if nbytes >= 1 << 30:
+        return "{:.2f}GB".format(nbytes / float(1 << 30))
+    if nbytes >= 1 << 20:
+        return "{:.2f}MB".format(nbytes / float(1 << 20))
+    if nbytes >= 1 << 10:
+        return "{:.2f}KB".format(nbytes / float(1 << 10))
+    return "{}B".format(nbytes)
+
+
+def _format_table(headers, rows):
+    widths = [len(h) for h in headers]
+    for row in rows:
+        widths = [max(w, len(c)) for (w, c) in zip(widths, row)]
+    line = "-" * (sum(widths) + 2 * (len(widths) - 1))
+    fmt = "  ".join("{:<%d}" % w for w in widths)
+    lines = [line, fmt.format(*headers), line]
+    lines.extend(fmt.format(*row) for row in rows)
+    lines.append(line)
+    return "\n".join(lines)
+
+
+_SORT_KEYS = (
+    "count",
+    "cpu_time",
+    "cpu_time_total",
+    "kernel_time",
+    "kernel_time_total",
+    "allocated_bytes",
+)
+
+
+class KeyAverageList(list):
+    r"""The result of :meth:`EventList.key_averages`, a list of :class:`KeyAverage`."""
+
+    def __init__(self, items=(), group_by_input_shape=False, group_by_stack=False):
+        super().__init__(items)
+        self._group_by_input_shape = group_by_input_shape
+        self._group_by_stack = group_by_stack
+
+    def table(self, sort_by="cpu_time_total", row_limit=-1):
+        r"""Returns the statistics as a printable table sorted by ``sort_by`` (descending).
+
+        Args:
+            sort_by (str): one of ``count``, ``cpu_time``, ``cpu_time_total``,
+                ``kernel_time``, ``kernel_time_total`` and ``allocated_bytes``.
+            row_limit (int): the maximal number of rows, ``-1`` means no limit.
+        """
+        assert sort_by in _SORT_KEYS, "sort_by must be one of {}".format(_SORT_KEYS)
+        items = sorted(self, key=lambda item: getattr(item, sort_by), reverse=True)
+        if row_limit >= 0:
+            items = items[:row_limit]
+        headers = [
+            "Name",
+            "Device",
+            "Calls",
+            "CPU Total",
+            "CPU Avg",
+            "Kernel Total",
+            "Kernel Avg",
+            "Allocated",
+        ]
+        if self._group_by_input_shape:
+            headers.append("Input Shapes")
+        if self._group_by_stack:
+            headers.append("Stack")
+        rows = []
+        for item in items:
+            row = [
+                item.name,
+                item.device,
+                str(max(item.count, item.kernel_count)),
+                _format_time(item.cpu_time_total),
+                _format_time(item.cpu_time),
+                _format_time(item.kernel_time_total),
+                _format_time(item.kernel_time),
+                _format_bytes(item.allocated_bytes),
+            ]
+            if self._group_by_input_shape:
+                row.append(item.input_shapes)
+            if self._group_by_stack:
+                row.append(item.stack)
+            rows.append(row)
+        return _format_table(headers, rows)
+
+    def __str__(self):
+        return self.table()
+
+
+class EventList(list):
+    r"""The list of :class:`Event` recorded by :class:`oneflow.profiler.profile`."""
+
+    def key_averages(self, group_by_input_shape=False, group_by_stack=False):
+        r"""Groups the events by op name and returns a :class:`KeyAverageList`.
+
+        Args:
+            group_by_input_shape (bool): also group by the input shapes, which requires
+                ``record_shapes=True`` when profiling.
+            group_by_stack (bool): also group by the python stack, which requires
+                ``with_stack=True`` when profiling.
+        """
+        averages = OrderedDict()
+        for event in self:
+            key = [event.name]
+            input_shapes = ""
+            stack = ""
+            if group_by_input_shape:
+                input_shapes = "[" + ", ".join(event.input_shapes) + "]"
+                key.append(input_shapes)
+            if group_by_stack:
+                stack = event.stack
+                key.append(stack)
+            key = tuple(key)
+            if key not in averages:
+                averages[key] = KeyAverage(event.name, input_shapes, stack)
+            averages[key].add(event)
+        return KeyAverageList(
+            averages.values(),
+            group_by_input_shape=group_by_input_shape,
+            group_by_stack=group_by_stack,
+        )
+
+    def table(self, sort_by="cpu_time_total", row_limit=-1):
+        return self.key_averages().table(sort_by=sort_by, row_limit=row_limit)
+
+    def export_chrome_trace(self, path):
+        r"""Exports the events in the Chrome trace event format.
+
+        The result can be opened by ``chrome://tracing`` or https://ui.perfetto.dev.
+        """
+        trace_events = []
+        for event in self:
+            args = {"kind": event.kind, "device": event.device}
+            if event.input_shapes:
+                args["input_shapes"] = event.input_shapes
+                args["input_dtypes"] = event.input_dtypes
+            if event.kind == "kernel":
+                args["allocated_bytes"] = event.allocated_bytes
+            if event.stack:
+                args["stack"] = event.stack
+            trace_events.append(
+                {
+                    "name": event.name,
+                    "cat": event.kind,
+                    "ph": "X",
+                    "ts": event.start_us,
+                    "dur": event.duration_us,
+                    "pid": 0,
+                    "tid": event.thread_id,
+                    "args": args,
+                }
+            )
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,138 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import threading
+
+import oneflow._oneflow_internal
+from oneflow.profiler.events import Event, EventList
+
+
+_user_events_lock = threading.Lock()
+_user_events = None
+
+
+class profile(object):
+    r"""Context manager that records every eager op dispatched inside its scope.
+
+    For each op the profiler records the op type, the device, the time the python
+    thread spent dispatching it (``cpu_time``), the time the kernel ran on its vm
+    worker thread (``kernel_time``) and the bytes allocated for its outputs and
+    temporary buffers. For cuda ops ``kernel_time`` is the host-side launch time.
+
+    Args:
+        record_shapes (bool): record the shapes and dtypes of the op inputs. Default: ``False``
+        with_stack (bool): record the python frames that dispatched each op. Default: ``False``
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> x = flow.randn(4, 8)
+        >>> with flow.profiler.profile(record_shapes=True) as prof:
+        ...     y = flow.matmul(x, x.T).relu()
+        >>> table = prof.key_averages().table(sort_by="cpu_time_total")
+        >>> prof.export_chrome_trace("trace.json")  # doctest: +SKIP
+
+    """
+
+    def __init__(self, record_shapes=False, with_stack=False):
+        self.record_shapes = record_shapes
+        self.with_stack = with_stack
+        self._events = None
+
+    def __enter__(self):
+        global _user_events
+        assert (
+            not oneflow._oneflow_internal.profiler.IsEventRecorderEnabled()
+        ), "oneflow.profiler.profile can not be nested"
+        # Make sure the ops launched before the profiler are not recorded.
+        oneflow._oneflow_internal.eager.Sync()
+        with _user_events_lock:
+            _user_events = []
+        oneflow._oneflow_internal.profiler.EnableEventRecorder(
+            self.record_shapes, self.with_stack
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _user_events
+        # Wait for the kernels of the recorded ops to finish.
+        oneflow._oneflow_internal.eager.Sync()
+        raw_events = oneflow._oneflow_internal.profiler.DisableEventRecorder()
+        with _user_events_lock:
+            user_events = _user_events
+            _user_events = None
+        events = [Event.from_dict(e) for e in raw_events] + user_events
+        events.sort(key=lambda e: e.start_us)
+        self._events = EventList(events)
+
+    def events(self):
+        r"""Returns the recorded :class:`oneflow.profiler.events.EventList`."""
+        assert self._events is not None, "the profiler has not finished yet"
+        return self._events
+
+    def key_averages(self, group_by_input_shape=False, group_by_stack=False):
+        return self.events().key_averages(
+            group_by_input_shape=group_by_input_shape, group_by_stack=group_by_stack
+        )
+
+    def table(self, sort_by="cpu_time_total", row_limit=-1):
+        return self.events().table(sort_by=sort_by, row_limit=row_limit)
+
+    def export_chrome_trace(self, path):
+        self.events().export_chrome_trace(path)
+
+
+class record_function(object):
+    r"""Context manager that annotates a python code range in the profiler results.
+
+    It does nothing when no :class:`oneflow.profiler.profile` is active.
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> with flow.profiler.profile() as prof:
+        ...     with flow.profiler.record_function("my_block"):
+        ...         y = flow.ones(2, 3) * 2
+        >>> "my_block" in [e.name for e in prof.events()]
+        True
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._start_ns = None
+
+    def __enter__(self):
+        if oneflow._oneflow_internal.profiler.IsEventRecorderEnabled():
+            self._start_ns = oneflow._oneflow_internal.profiler.NowNs()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._start_ns is None:
+            return
+        end_ns = oneflow._oneflow_internal.profiler.NowNs()
+        event = Event(
+            self.name,
+            "user",
+            start_us=self._start_ns / 1000.0,
+            end_us=end_ns / 1000.0,
+            thread_id=oneflow._oneflow_internal.profiler.CurrentThreadId(),
+        )
+        with _user_events_lock:
+            if _user_events is not None:
+                _user_events.append(event)
+        self._start_ns = None
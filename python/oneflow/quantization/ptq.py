@@ -0,0 +1,157 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import oneflow as flow
+from oneflow.nn.module import Module
+from oneflow.nn.modules.quantized import QuantizedConv2d, QuantizedLinear
+
+_QUANTIZED_MODULES = {
+    flow.nn.Linear: QuantizedLinear,
+    flow.nn.Conv2d: QuantizedConv2d,
+}
+
+
+class _InputObserver(object):
+    # Records the range of the input of a Linear / Conv2d with the moving average min max
+    # observer used by quantization aware training. It is not a Module so that attaching it
+    # leaves the parameters and the state dict of the observed module untouched.
+    def __init__(self, momentum):
+        self.observer = flow.nn.MovingAverageMinMaxObserver(
+            training=True,
+            quantization_formula="google",
+            stop_update_after_iters=1,
+            quantization_bit=8,
+            quantization_scheme="affine",
+            momentum=momentum,
+        )
+        self.current_train_step = flow.zeros(1, dtype=flow.int64)
+        self.num_batches = 0
+        self.handle = None
+
+    def __call__(self, module, args):
+        self.observer(args[0].detach(), self.current_train_step)
+        self.num_batches += 1
+
+    def qparams(self):
+        # The range always covers 0 so that zero padding and relu outputs are exact.
+        low = min(self.observer.moving_min.item(), 0.0)
+        high = max(self.observer.moving_max.item(), 0.0)
+        scale = (high - low) / 255.0
+        if scale == 0.0:
+            return 1.0, 0
+        zero_point = int(round(-low / scale))
+        return scale, min(max(zero_point, 0), 255)
+
+
+def prepare(model: Module, momentum: float = 0.95) -> Module:
+    r"""Prepares a float model for post training quantization.
+
+    Every :class:`oneflow.nn.Linear` and :class:`oneflow.nn.Conv2d` of ``model`` gets an
+    observer which records the moving average of the min and max of its input, see
+    :class:`oneflow.nn.MovingAverageMinMaxObserver`. Run the model on some representative
+    batches afterwards and call :func:`convert`.
+
+    Args:
+        model (oneflow.nn.Module): the float model, modified in place.
+        momentum (float): momentum of the moving average of the input range. Default: 0.95
+
+    Returns:
+        The prepared ``model``.
+    """
+    for module in model.modules():
+        if type(module) in _QUANTIZED_MODULES and not hasattr(
+            module, "_input_observer"
+        ):
+            observer = _InputObserver(momentum)
+            observer.handle = module.register_forward_pre_hook(observer)
+            module._input_observer = observer
+    return model
+
+
+def _convert_children(module: Module) -> None:
+    names = list(module._modules.keys())
+    for i, name in enumerate(names):
+        child = module._modules[name]
+        if child is None:
+            continue
+        observer = getattr(child, "_input_observer", None)
+        if observer is None:
+            _convert_children(child)
+            continue
+        observer.handle.remove()
+        del child._input_observer
+        if observer.num_batches == 0:
+            # Never run during calibration, keep it in float.
+            continue
+        activation = "none"
+        # Fuse a relu following the layer in a Sequential into the quantized kernel.
+        if isinstance(module, flow.nn.Sequential) and i + 1 < len(names):
+            next_child = module._modules[names[i + 1]]
+            if type(next_child) is flow.nn.ReLU:
+                activation = "relu"
+                module._modules[names[i + 1]] = flow.nn.Identity()
+        input_scale, input_zero_point = observer.qparams()
+        module._modules[name] = _QUANTIZED_MODULES[type(child)].from_float(
+            child, input_scale, input_zero_point, activation=activation
+        )
+
+
+def convert(model: Module) -> Module:
+    r"""Converts a model calibrated after :func:`prepare` to int8 inference.
+
+    Every observed :class:`oneflow.nn.Linear` / :class:`oneflow.nn.Conv2d` is replaced by
+    :class:`oneflow.nn.QuantizedLinear` / :class:`oneflow.nn.QuantizedConv2d` with int8
+    weights quantized symmetrically per output channel, and the input scale and zero point
+    taken from its observer. A :class:`oneflow.nn.ReLU` directly following such a layer in
+    a :class:`oneflow.nn.Sequential` is fused into the quantized kernel. Layers which were
+    never run during calibration stay in float.
+
+    The quantized modules only run on CPU.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> model = flow.nn.Sequential(
+        ...     flow.nn.Conv2d(3, 8, 3, padding=1),
+        ...     flow.nn.ReLU(),
+        ...     flow.nn.Flatten(),
+        ...     flow.nn.Linear(8 * 16 * 16, 10),
+        ... ).eval()
+        >>> model = flow.quantization.prepare(model)
+        >>> for _ in range(4):
+        ...     _ = model(flow.randn(2, 3, 16, 16))
+        >>> model = flow.quantization.convert(model)
+        >>> type(model[0]).__name__, model[0].activation
+        ('QuantizedConv2d', 'relu')
+        >>> model(flow.randn(2, 3, 16, 16)).shape
+        oneflow.Size([2, 10])
+
+    Args:
+        model (oneflow.nn.Module): the calibrated model, modified in place.
+
+    Returns:
+        The converted ``model``.
+    """
+    with flow.no_grad():
+        _convert_children(model)
+    return model
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod(raise_on_error=True)
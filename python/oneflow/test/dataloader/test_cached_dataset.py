@@ -0,0 +1,98 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+class _DecodeLoggingDataset(flow.utils.data.Dataset):
+    def __init__(self, num_samples, log_path):
+        self.num_samples = num_samples
+        self.log_path = log_path
+
+    def __len__(self):
+        return self.num_samples
+
+    def __getitem__(self, index):
+        with open(self.log_path, "a") as f:
+            f.write(f"{index}\n")
+        return np.full((16,), index, dtype=np.int64)
+
+    def decoded(self):
+        with open(self.log_path) as f:
+            return [int(line) for line in f]
+
+
+def _add_one(sample):
+    return sample + 1
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestCachedDataset(flow.unittest.TestCase):
+    def test_decodes_once_across_workers_and_epochs(test_case):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inner = _DecodeLoggingDataset(64, os.path.join(tmpdir, "log"))
+            dataset = flow.utils.data.CachedDataset(inner, transform=_add_one)
+            loader = flow.utils.data.DataLoader(
+                dataset, batch_size=8, shuffle=True, num_workers=2
+            )
+            for _ in range(3):
+                indices = sorted(
+                    int(i) for batch in loader for i in batch[:, 0].numpy() - 1
+                )
+                test_case.assertEqual(indices, list(range(64)))
+            # concurrent misses of the same index in two workers may both decode
+            test_case.assertEqual(sorted(set(inner.decoded())), list(range(64)))
+            test_case.assertLessEqual(len(inner.decoded()), 2 * 64)
+
+    def test_max_bytes(test_case):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inner = _DecodeLoggingDataset(100, os.path.join(tmpdir, "log"))
+            cache_dir = os.path.join(tmpdir, "cache")
+            dataset = flow.utils.data.CachedDataset(
+                inner, cache_dir=cache_dir, max_bytes=4096
+            )
+            for _ in range(2):
+                for i in range(len(dataset)):
+                    test_case.assertEqual(int(dataset[i][0]), i)
+                    test_case.assertEqual(int(dataset[0][0]), 0)
+            sizes = [
+                os.path.getsize(os.path.join(cache_dir, name))
+                for name in os.listdir(cache_dir)
+                if not name.startswith(".")
+            ]
+            test_case.assertLessEqual(sum(sizes), 4096)
+            # the sample read on every step is never the least recently used
+            test_case.assertTrue(os.path.exists(os.path.join(cache_dir, "0")))
+
+    def test_shm_budget(test_case):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inner = _DecodeLoggingDataset(4, os.path.join(tmpdir, "log"))
+            dataset = flow.utils.data.CachedDataset(inner)
+            if not dataset.cache_dir.startswith("/dev/shm"):
+                return
+            stat = os.statvfs(dataset.cache_dir)
+            test_case.assertIsNotNone(dataset.max_bytes)
+            test_case.assertLess(dataset.max_bytes, stat.f_blocks * stat.f_frsize)
+
+
+if __name__ == "__main__":
+    unittest.main()
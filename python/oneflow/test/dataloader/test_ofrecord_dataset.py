@@ -0,0 +1,96 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+import oneflow.core.record.record_pb2 as record_pb
+
+
+def _write_parts(ofrecord_dir, num_parts, records_per_part):
+    index = 0
+    for part in range(num_parts):
+        with open(os.path.join(ofrecord_dir, f"part-{part}"), "wb") as f:
+            for _ in range(records_per_part):
+                record = record_pb.OFRecord()
+                feature = record.feature["index"]
+                feature.int64_list.value.append(index)
+                # records of different sizes
+                feature = record.feature["data"]
+                feature.bytes_list.value.append(b"x" * (index % 7))
+                data = record.SerializeToString()
+                f.write(struct.pack("<q", len(data)))
+                f.write(data)
+                index += 1
+        flow.utils.data.build_ofrecord_index(os.path.join(ofrecord_dir, f"part-{part}"))
+
+
+def _record_index(record):
+    return record.feature["index"].int64_list.value[0]
+
+
+def _record_index_array(record):
+    return np.array(_record_index(record))
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestOFRecordDataset(flow.unittest.TestCase):
+    def test_random_access(test_case):
+        for use_mmap in [False, True]:
+            with tempfile.TemporaryDirectory() as ofrecord_dir:
+                _write_parts(ofrecord_dir, 3, 5)
+                dataset = flow.utils.data.OFRecordDataset(
+                    ofrecord_dir,
+                    data_part_num=3,
+                    transform=_record_index,
+                    use_mmap=use_mmap,
+                )
+                test_case.assertEqual(len(dataset), 15)
+                test_case.assertEqual(dataset[7], 7)
+                test_case.assertEqual(dataset[-1], 14)
+                indices = [14, 0, 3, 4, 5, 9, 2]
+                test_case.assertEqual(dataset.__getitems__(indices), indices)
+                with test_case.assertRaises(IndexError):
+                    dataset[15]
+
+    def test_stale_index(test_case):
+        with tempfile.TemporaryDirectory() as ofrecord_dir:
+            _write_parts(ofrecord_dir, 1, 3)
+            with open(os.path.join(ofrecord_dir, "part-0"), "ab") as f:
+                f.write(struct.pack("<q", 1) + b"x")
+            with test_case.assertRaises(ValueError):
+                flow.utils.data.OFRecordDataset(ofrecord_dir)
+
+    def test_dataloader_shuffle(test_case):
+        with tempfile.TemporaryDirectory() as ofrecord_dir:
+            _write_parts(ofrecord_dir, 4, 8)
+            dataset = flow.utils.data.OFRecordDataset(
+                ofrecord_dir, data_part_num=4, transform=_record_index_array,
+            )
+            loader = flow.utils.data.DataLoader(
+                dataset, batch_size=5, shuffle=True, num_workers=2
+            )
+            indices = np.concatenate([batch.numpy() for batch in loader])
+            test_case.assertEqual(sorted(indices.tolist()), list(range(32)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import math
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.data.sampler import _FeistelPermutation
+
+
+def _list_distributed_indices(n, num_replicas, rank, indices, drop_last):
+    if drop_last and n % num_replicas != 0:
+        num_samples = math.ceil((n - num_replicas) / num_replicas)
+    else:
+        num_samples = math.ceil(n / num_replicas)
+    total_size = num_samples * num_replicas
+    if not drop_last:
+        padding_size = total_size - len(indices)
+        indices += (indices * math.ceil(padding_size / len(indices)))[:padding_size]
+    else:
+        indices = indices[:total_size]
+    return indices[rank:total_size:num_replicas]
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestSampler(flow.unittest.TestCase):
+    def test_feistel_permutation(test_case):
+        for n in [1, 2, 3, 17, 1000, 4097]:
+            permutation = _FeistelPermutation(n, seed=n)
+            out = permutation(np.arange(n))
+            test_case.assertEqual(sorted(out.tolist()), list(range(n)))
+            test_case.assertTrue(np.array_equal(out[5:9], permutation(np.arange(5, 9))))
+
+    def test_random_sampler_chunked(test_case):
+        generator = flow.Generator("cpu")
+        generator.manual_seed(0)
+        sampler = flow.utils.data.RandomSampler(
+            range(1000), generator=generator, chunk_size=7
+        )
+        test_case.assertEqual(sorted(sampler), list(range(1000)))
+
+    def test_distributed_sampler(test_case):
+        for n in [1, 7, 10, 100]:
+            for num_replicas in [1, 3, 4, 13]:
+                for drop_last in [False, True]:
+                    for rank in range(num_replicas):
+                        sampler = flow.utils.data.DistributedSampler(
+                            range(n), num_replicas, rank, False, drop_last=drop_last
+                        )
+                        test_case.assertEqual(
+                            list(sampler),
+                            _list_distributed_indices(
+                                n, num_replicas, rank, list(range(n)), drop_last
+                            ),
+                        )
+
+    def test_distributed_sampler_chunked(test_case):
+        num_replicas = 4
+        shards = []
+        for rank in range(num_replicas):
+            sampler = flow.utils.data.DistributedSampler(
+                range(1001), num_replicas, rank, seed=3, drop_last=True, chunk_size=16
+            )
+            shards.append(list(sampler))
+            test_case.assertEqual(len(shards[-1]), len(sampler))
+        indices = sum(shards, [])
+        test_case.assertEqual(len(set(indices)), len(indices))
+
+    def test_batch_sampler_yields_arrays(test_case):
+        for drop_last in [False, True]:
+            batch_sampler = flow.utils.data.BatchSampler(
+                flow.utils.data.SequentialSampler(range(10)), 3, drop_last
+            )
+            batches = list(batch_sampler)
+            test_case.assertTrue(all(isinstance(b, np.ndarray) for b in batches))
+            test_case.assertEqual(len(batches), len(batch_sampler))
+            test_case.assertEqual(
+                [b.tolist() for b in batches],
+                list(flow.utils.data.BatchSampler(list(range(10)), 3, drop_last)),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
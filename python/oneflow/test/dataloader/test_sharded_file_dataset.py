@@ -0,0 +1,148 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _write_shards(dirname, sizes):
+    jsonl_paths = []
+    npy_paths = []
+    start = 0
+    for (i, size) in enumerate(sizes):
+        jsonl_paths.append(os.path.join(dirname, f"part-{i}.jsonl"))
+        with open(jsonl_paths[-1], "w") as f:
+            for j in range(start, start + size):
+                f.write(json.dumps({"index": j, "text": "x" * (j % 13)}) + "\n")
+        npy_paths.append(os.path.join(dirname, f"part-{i}.npy"))
+        np.save(
+            npy_paths[-1],
+            np.arange(start * 2, (start + size) * 2, dtype=np.int64).reshape(-1, 2),
+        )
+        start += size
+    return (jsonl_paths, npy_paths, start)
+
+
+def _index(sample):
+    if isinstance(sample, dict):
+        return sample["index"]
+    return int(sample[0]) // 2
+
+
+def _batches(loader):
+    return [[_index(sample) for sample in batch] for batch in loader]
+
+
+def _collate_list(samples):
+    return samples
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestShardedFileDataset(flow.unittest.TestCase):
+    def test_every_sample_once(test_case):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (jsonl_paths, npy_paths, num_samples) = _write_shards(
+                tmpdir, [7, 0, 30, 11]
+            )
+            for (paths, format) in [(jsonl_paths, "jsonl"), (npy_paths, "npy")]:
+                for num_workers in [0, 3]:
+                    seen = []
+                    for rank in range(2):
+                        dataset = flow.utils.data.ShardedFileDataset(
+                            paths,
+                            format,
+                            shuffle_buffer_size=8,
+                            num_replicas=2,
+                            rank=rank,
+                        )
+                        dataset.set_epoch(1)
+                        loader = flow.utils.data.DataLoader(
+                            dataset,
+                            batch_size=4,
+                            num_workers=num_workers,
+                            collate_fn=_collate_list,
+                        )
+                        seen += sum(_batches(loader), [])
+                    test_case.assertEqual(sorted(seen), list(range(num_samples)))
+
+    def test_equal_samples_per_rank(test_case):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (jsonl_paths, npy_paths, num_samples) = _write_shards(tmpdir, [3, 40, 9])
+            for (paths, format) in [(jsonl_paths, "jsonl"), (npy_paths, "npy")]:
+                for drop_last in [False, True]:
+                    seen = []
+                    for rank in range(3):
+                        dataset = flow.utils.data.ShardedFileDataset(
+                            paths,
+                            format,
+                            num_replicas=3,
+                            rank=rank,
+                            drop_last=drop_last,
+                        )
+                        samples = [_index(sample) for sample in dataset]
+                        test_case.assertEqual(len(samples), len(dataset))
+                        seen.append(samples)
+                    test_case.assertEqual(len(seen[0]), 17 if drop_last else 18)
+                    test_case.assertTrue(all(len(x) == len(seen[0]) for x in seen))
+                    if drop_last:
+                        test_case.assertEqual(len(set(sum(seen, []))), len(seen[0]) * 3)
+                    else:
+                        test_case.assertEqual(
+                            set(sum(seen, [])), set(range(num_samples))
+                        )
+
+    def test_exact_resume(test_case):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (jsonl_paths, npy_paths, _) = _write_shards(tmpdir, [40, 25, 35])
+            for (paths, format) in [(jsonl_paths, "jsonl"), (npy_paths, "npy")]:
+                for num_workers in [0, 2]:
+
+                    def make_loader(state=None):
+                        dataset = flow.utils.data.ShardedFileDataset(
+                            paths,
+                            format,
+                            shuffle_buffer_size=16,
+                            seed=5,
+                            num_replicas=1,
+                            rank=0,
+                            batch_size=4,
+                        )
+                        dataset.set_epoch(2)
+                        if state is not None:
+                            dataset.load_state_dict(state)
+                        loader = flow.utils.data.DataLoader(
+                            dataset,
+                            batch_size=4,
+                            num_workers=num_workers,
+                            collate_fn=_collate_list,
+                        )
+                        return (dataset, loader)
+
+                    (dataset, loader) = make_loader()
+                    batches = _batches(loader)
+                    state = dataset.state_dict(5 * 4)
+                    (_, resumed_loader) = make_loader(state)
+                    test_case.assertEqual(_batches(resumed_loader), batches[5:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+import os
+import tempfile
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.benchmark import collect, compare, compute_stats, run
+from oneflow.benchmark.__main__ import main
+
+_CASES = """
+import oneflow as flow
+
+
+def bench_add(benchmark):
+    x = flow.ones(4, device=benchmark.device)
+    benchmark(flow.add, x, 1, iterations=2)
+
+
+def bench_broken(benchmark):
+    raise RuntimeError("broken case")
+
+
+def helper(benchmark):
+    raise AssertionError("helpers are not collected")
+"""
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestBenchmark(flow.unittest.TestCase):
+    def test_compute_stats(test_case):
+        stats = compute_stats([1.0, 2.0, 3.0, 4.0, 100.0])
+        test_case.assertEqual(stats["mean"], 22.0)
+        test_case.assertEqual(stats["p50"], 3.0)
+        test_case.assertAlmostEqual(stats["p99"], 96.16)
+        test_case.assertEqual(stats["variance"], 1522.0)
+        test_case.assertEqual(stats["rounds"], 5)
+
+    def test_compare(test_case):
+        rows = compare(
+            {
+                "a": {"p50": 1.2},
+                "b": {"p50": 0.5},
+                "c": {"p50": 1.0},
+                "e": {"error": "RuntimeError: broken"},
+                "n": {"p50": 1},
+            },
+            {
+                "a": {"p50": 1.0},
+                "b": {"p50": 1.0},
+                "c": {"p50": 1.05},
+                "e": {"p50": 1.0},
+                "m": {"p50": 1},
+            },
+            threshold=0.1,
+        )
+        status = {row["name"]: row["status"] for row in rows}
+        test_case.assertEqual(
+            status,
+            {
+                "a": "regression",
+                "b": "improvement",
+                "c": "unchanged",
+                "e": "error",
+                "m": "missing",
+                "n": "new",
+            },
+        )
+
+    def test_collect_and_run(test_case):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "bench_tmp.py"), "w") as f:
+                f.write(_CASES)
+            cases = collect([root])
+            test_case.assertEqual(
+                sorted(cases), ["bench_tmp::bench_add", "bench_tmp::bench_broken"]
+            )
+            test_case.assertEqual(
+                list(collect([root], "*add")), ["bench_tmp::bench_add"]
+            )
+            results = run(cases, warmup=1, rounds=3)
+            test_case.assertEqual(results["bench_tmp::bench_add"]["rounds"], 3)
+            test_case.assertIn("error", results["bench_tmp::bench_broken"])
+
+    def test_cli_regression_exit_code(test_case):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "bench_tmp.py"), "w") as f:
+                f.write(_CASES)
+            output = os.path.join(root, "current.json")
+            baseline = os.path.join(root, "baseline.json")
+            args = [root, "-k", "add", "--rounds", "3", "--warmup", "1"]
+            test_case.assertEqual(main(args + ["--output", output]), 0)
+            with open(output) as f:
+                report = json.load(f)
+            for key in ["mean", "p50", "p99", "variance"]:
+                test_case.assertIn(key, report["results"]["bench_tmp::bench_add"])
+            # a baseline that is much faster than any real run
+            report["results"]["bench_tmp::bench_add"]["p50"] = 1e-12
+            with open(baseline, "w") as f:
+                json.dump(report, f)
+            test_case.assertEqual(
+                main(args + ["--output", output, "--compare", baseline]), 1
+            )
+
+    def test_cli_failed_case_exit_code(test_case):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "bench_tmp.py"), "w") as f:
+                f.write(_CASES)
+            output = os.path.join(root, "current.json")
+            baseline = os.path.join(root, "baseline.json")
+            args = [root, "--rounds", "3", "--warmup", "1", "--output", output]
+            with open(baseline, "w") as f:
+                json.dump(
+                    {
+                        "results": {
+                            "bench_tmp::bench_add": {"p50": 1e3},
+                            "bench_tmp::bench_broken": {"p50": 1e3},
+                        }
+                    },
+                    f,
+                )
+            # bench_broken raises, which fails the comparison
+            test_case.assertEqual(main(args + ["--compare", baseline]), 1)
+            # deselected cases are not reported as missing
+            test_case.assertEqual(main(args + ["-k", "add", "--compare", baseline]), 0)
+            with open(output) as f:
+                rows = json.load(f)["comparison"]["cases"]
+            test_case.assertEqual(
+                [row["name"] for row in rows], ["bench_tmp::bench_add"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
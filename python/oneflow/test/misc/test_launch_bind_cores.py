@@ -0,0 +1,67 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.distributed.launch import _assign_cores, _format_cpulist, _parse_cpulist
+
+
+def _dual_socket_topology(cores_per_socket):
+    # two hyper-threads per physical core, siblings numbered like Linux does
+    num_cpus = 2 * cores_per_socket
+    return [
+        (
+            node_id,
+            [
+                [cpu, cpu + num_cpus]
+                for cpu in range(
+                    node_id * cores_per_socket, (node_id + 1) * cores_per_socket
+                )
+            ],
+        )
+        for node_id in range(2)
+    ]
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestLaunchBindCores(flow.unittest.TestCase):
+    def test_cpulist(test_case):
+        test_case.assertEqual(_parse_cpulist("0-3,8,10-11\n"), [0, 1, 2, 3, 8, 10, 11])
+        test_case.assertEqual(_format_cpulist([11, 0, 1, 2, 3, 8, 10]), "0-3,8,10-11")
+
+    def test_ranks_per_numa_node(test_case):
+        plans = _assign_cores(_dual_socket_topology(24), 4)
+        test_case.assertEqual([nodes for (nodes, _) in plans], [[0], [0], [1], [1]])
+        test_case.assertEqual(
+            _format_cpulist([cpu for core in plans[2][1] for cpu in core]),
+            "24-35,72-83",
+        )
+        all_cpus = [cpu for (_, cores) in plans for core in cores for cpu in core]
+        test_case.assertEqual(sorted(all_cpus), list(range(96)))
+
+    def test_fewer_ranks_than_numa_nodes(test_case):
+        plans = _assign_cores(_dual_socket_topology(4), 1)
+        test_case.assertEqual(plans[0][0], [0, 1])
+        test_case.assertEqual(len(plans[0][1]), 8)
+
+    def test_not_enough_cores(test_case):
+        with test_case.assertRaises(ValueError):
+            _assign_cores(_dual_socket_topology(2), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
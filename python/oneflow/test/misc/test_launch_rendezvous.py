@@ -0,0 +1,63 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import tempfile
+import threading
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.distributed.launch import _FileRendezvous
+
+
+def _join_all(rdzv_dir, node_ranks, nnodes, min_nnodes=None, timeout=10):
+    results = {}
+
+    def join(node_rank):
+        rendezvous = _FileRendezvous(
+            rdzv_dir,
+            node_rank,
+            nnodes,
+            min_nnodes or nnodes,
+            f"host{node_rank}",
+            timeout,
+        )
+        results[node_rank] = rendezvous.join(0)
+
+    threads = [threading.Thread(target=join, args=(r,)) for r in node_ranks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestLaunchRendezvous(flow.unittest.TestCase):
+    def test_all_nodes_join(test_case):
+        with tempfile.TemporaryDirectory() as rdzv_dir:
+            results = _join_all(rdzv_dir, [0, 1, 2], 3)
+        test_case.assertEqual(results[0], (0, 0, 3, "host0"))
+        test_case.assertEqual(results[2], (0, 2, 3, "host0"))
+
+    def test_continue_without_lost_node(test_case):
+        with tempfile.TemporaryDirectory() as rdzv_dir:
+            results = _join_all(rdzv_dir, [1, 2], 3, min_nnodes=2, timeout=1)
+        test_case.assertEqual(results[1], (0, 0, 2, "host1"))
+        test_case.assertEqual(results[2], (0, 1, 2, "host1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
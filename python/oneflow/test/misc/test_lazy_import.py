@@ -0,0 +1,78 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _run_python(code, **env_vars):
+    env = dict(os.environ)
+    # The child is a standalone single process job.
+    for name in ["MASTER_ADDR", "MASTER_PORT", "WORLD_SIZE", "RANK", "LOCAL_RANK"]:
+        env.pop(name, None)
+    env.update(env_vars)
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestLazyImport(flow.unittest.TestCase):
+    def test_lazy_submodule(test_case):
+        test_case.assertIn("one_embedding", dir(flow))
+        test_case.assertIsNotNone(flow.one_embedding.MultiTableEmbedding)
+        test_case.assertIsNotNone(flow.profiler.record_function)
+        with test_case.assertRaises(AttributeError):
+            flow.no_such_submodule
+
+    def test_lazy_init_env(test_case):
+        code = "\n".join(
+            [
+                "import sys",
+                "import oneflow as flow",
+                "assert not flow._oneflow_internal.IsEnvInited()",
+                "assert sys.version_info < (3, 7) or 'oneflow.one_embedding' not in sys.modules",
+                "assert 'softmax' in flow._C.softmax.__doc__",
+                "x = flow.ones(2, 3)",
+                "assert flow._oneflow_internal.IsEnvInited()",
+                "assert x.sum().item() == 6",
+                "assert flow.env.get_world_size() == 1",
+            ]
+        )
+        result = _run_python(code, ONEFLOW_LAZY_INIT="1")
+        test_case.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_lazy_init_unused(test_case):
+        result = _run_python("import oneflow", ONEFLOW_LAZY_INIT="1")
+        test_case.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_import_profile(test_case):
+        result = _run_python("import oneflow", ONEFLOW_IMPORT_PROFILE="1")
+        test_case.assertEqual(result.returncode, 0, result.stderr)
+        test_case.assertIn("oneflow import profile", result.stderr)
+        test_case.assertIn("oneflow.framework.env_util", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import unittest
+
+import numpy as np
+import oneflow as flow
+import oneflow.unittest
+
+
+def _linear_and_optimizer():
+    linear = flow.nn.Linear(4, 2)
+    optimizer = flow.optim.SGD(linear.parameters(), lr=1.0)
+    return linear, optimizer
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestGradScaler(flow.unittest.TestCase):
+    def test_unscale_recovers_grads(test_case):
+        linear, optimizer = _linear_and_optimizer()
+        x = flow.randn(3, 4)
+        linear(x).sum().backward()
+        expected = linear.weight.grad.numpy()
+        optimizer.zero_grad()
+
+        scaler = flow.amp.GradScaler(init_scale=1024.0)
+        scaler.scale(linear(x).sum()).backward()
+        test_case.assertTrue(
+            np.allclose(linear.weight.grad.numpy(), expected * 1024, 1e-4, 1e-4)
+        )
+        scaler.unscale_(optimizer)
+        test_case.assertTrue(
+            np.allclose(linear.weight.grad.numpy(), expected, 1e-5, 1e-5)
+        )
+
+    def test_step_skipped_on_inf(test_case):
+        linear, optimizer = _linear_and_optimizer()
+        weight = linear.weight.numpy()
+        scaler = flow.amp.GradScaler(init_scale=1024.0)
+        x = flow.tensor([[float("inf"), 1.0, 1.0, 1.0]])
+        scaler.scale(linear(x).sum()).backward()
+        scaler.step(optimizer)
+        scaler.update()
+        test_case.assertTrue(np.array_equal(linear.weight.numpy(), weight))
+        test_case.assertEqual(scaler.get_scale(), 512.0)
+
+    def test_scale_growth(test_case):
+        linear, optimizer = _linear_and_optimizer()
+        scaler = flow.amp.GradScaler(init_scale=4.0, growth_interval=2)
+        weight = linear.weight.numpy()
+        for _ in range(2):
+            optimizer.zero_grad()
+            scaler.scale(linear(flow.ones(1, 4)).sum()).backward()
+            scaler.step(optimizer)
+            scaler.update()
+        test_case.assertFalse(np.array_equal(linear.weight.numpy(), weight))
+        test_case.assertEqual(scaler.get_scale(), 8.0)
+
+    def test_disabled_scaler(test_case):
+        linear, optimizer = _linear_and_optimizer()
+        scaler = flow.amp.GradScaler(enabled=False)
+        loss = linear(flow.ones(1, 4)).sum()
+        test_case.assertTrue(scaler.scale(loss) is loss)
+        loss.backward()
+        scaler.step(optimizer)
+        scaler.update()
+        test_case.assertEqual(scaler.get_scale(), 1.0)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestAutocast(flow.unittest.TestCase):
+    def test_autocast_state(test_case):
+        test_case.assertFalse(flow.amp.is_autocast_enabled())
+        with flow.autocast("cuda"):
+            test_case.assertTrue(flow.amp.is_autocast_enabled())
+            with flow.autocast("cuda", enabled=False):
+                test_case.assertFalse(flow.amp.is_autocast_enabled())
+            test_case.assertTrue(flow.amp.is_autocast_enabled())
+        test_case.assertFalse(flow.amp.is_autocast_enabled())
+
+    @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
+    def test_autocast_cuda(test_case):
+        linear = flow.nn.Linear(4, 4).to("cuda")
+        x = flow.randn(2, 4, device="cuda")
+        with flow.autocast("cuda"):
+            y = linear(x)
+            test_case.assertEqual(y.dtype, flow.float16)
+            # Gray ops run in the widest dtype of their inputs.
+            test_case.assertEqual(flow.softmax(y, dim=-1).dtype, flow.float16)
+            test_case.assertEqual((y + x).dtype, flow.float32)
+        y.float().sum().backward()
+        test_case.assertEqual(linear.weight.grad.dtype, flow.float32)
+        # Ops outside the region are not affected.
+        test_case.assertEqual(linear(x).dtype, flow.float32)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -127,6 +127,32 @@ class TestAutograd(flow.unittest.TestCase):
         )[0]
         return x_grad_grad
 
+    def test_cache_backward_schedule(test_case):
+        def run_step(model, x):
+            model.zero_grad()
+            x = x.detach().requires_grad_()
+            y = model(x)
+            # x is used twice, so its node has two dependencies.
+            (y.sum() + (x * x).sum()).backward()
+            return x.grad.numpy(), [p.grad.numpy() for p in model.parameters()]
+
+        model = flow.nn.Sequential(
+            flow.nn.Linear(4, 8), flow.nn.ReLU(), flow.nn.Linear(8, 2)
+        )
+        inputs = [flow.randn(3, 4) for _ in range(3)] + [flow.randn(5, 4)]
+        expected = [run_step(model, x) for x in inputs]
+        with flow.autograd.cache_backward_schedule():
+            # The schedule is cached by the first step and replayed by the next two, the
+            # last step has other shapes and misses the cache.
+            for (x, (x_grad, p_grads)) in zip(inputs, expected):
+                (cached_x_grad, cached_p_grads) = run_step(model, x)
+                test_case.assertTrue(np.allclose(x_grad, cached_x_grad, 1e-5, 1e-5))
+                for (g, cached_g) in zip(p_grads, cached_p_grads):
+                    test_case.assertTrue(np.allclose(g, cached_g, 1e-5, 1e-5))
+        test_case.assertFalse(
+            flow._oneflow_internal.autograd.is_backward_schedule_cache_enabled()
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,124 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+from oneflow.test_utils.test_util import GenArgList
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _compare_with_contiguous(test_case, device, module, shape=(2, 3, 6, 8)):
+    np_x = np.random.randn(*shape).astype(np.float32)
+    x = flow.tensor(np_x, device=flow.device(device), requires_grad=True)
+    y = module(x)
+    y.sum().backward()
+    x_cl = flow.tensor(np_x, device=flow.device(device), requires_grad=True)
+    y_cl = module(x_cl.contiguous(memory_format=flow.channels_last))
+    y_cl.sum().backward()
+    test_case.assertTrue(np.allclose(y.numpy(), y_cl.numpy(), 1e-4, 1e-4))
+    test_case.assertTrue(np.allclose(x.grad.numpy(), x_cl.grad.numpy(), 1e-4, 1e-4))
+
+
+def _test_channels_last_stride(test_case, device):
+    x = flow.randn(2, 3, 4, 5, device=flow.device(device))
+    test_case.assertTrue(x.is_contiguous())
+    y = x.contiguous(memory_format=flow.channels_last)
+    test_case.assertEqual(y.shape, x.shape)
+    test_case.assertEqual(y.stride(), (60, 1, 15, 3))
+    test_case.assertFalse(y.is_contiguous())
+    test_case.assertTrue(y.is_contiguous(memory_format=flow.channels_last))
+    test_case.assertTrue(np.array_equal(x.numpy(), y.numpy()))
+    z = y.contiguous()
+    test_case.assertTrue(z.is_contiguous())
+    test_case.assertTrue(np.array_equal(x.numpy(), z.numpy()))
+    w = x.to(memory_format=flow.channels_last)
+    test_case.assertEqual(w.stride(), (60, 1, 15, 3))
+
+
+def _test_channels_last_conv2d(test_case, device):
+    m = flow.nn.Conv2d(3, 4, 3, padding=1, bias=True).to(flow.device(device))
+    _compare_with_contiguous(test_case, device, m)
+
+
+def _test_channels_last_batchnorm2d(test_case, device):
+    m = flow.nn.BatchNorm2d(3).to(flow.device(device))
+    _compare_with_contiguous(test_case, device, m)
+    m.eval()
+    _compare_with_contiguous(test_case, device, m)
+
+
+def _test_channels_last_pooling(test_case, device):
+    _compare_with_contiguous(test_case, device, flow.nn.MaxPool2d(2))
+    _compare_with_contiguous(test_case, device, flow.nn.AvgPool2d(2))
+
+
+def _test_channels_last_upsample(test_case, device):
+    _compare_with_contiguous(
+        test_case, device, flow.nn.Upsample(scale_factor=2.0, mode="nearest")
+    )
+    _compare_with_contiguous(
+        test_case, device, flow.nn.Upsample(scale_factor=2.0, mode="bilinear")
+    )
+
+
+def _test_channels_last_elementwise(test_case, device):
+    _compare_with_contiguous(test_case, device, lambda x: flow.relu(x) + x)
+
+
+def _test_channels_last_module_to(test_case, device):
+    m = flow.nn.Sequential(
+        flow.nn.Conv2d(3, 8, 3, padding=1),
+        flow.nn.BatchNorm2d(8),
+        flow.nn.ReLU(),
+        flow.nn.MaxPool2d(2),
+    ).to(flow.device(device))
+    np_x = np.random.randn(2, 3, 8, 8).astype(np.float32)
+    m.to(memory_format=flow.preserve_format)
+    y = m(flow.tensor(np_x, device=flow.device(device)))
+    m.to(memory_format=flow.channels_last)
+    y_cl = m(flow.tensor(np_x, device=flow.device(device)))
+    test_case.assertTrue(y_cl.is_contiguous(memory_format=flow.channels_last))
+    test_case.assertTrue(np.allclose(y.numpy(), y_cl.numpy(), 1e-4, 1e-4))
+    # preserve_format keeps the format set before
+    m.to(memory_format=flow.preserve_format)
+    y_cl = m(flow.tensor(np_x, device=flow.device(device)))
+    test_case.assertTrue(y_cl.is_contiguous(memory_format=flow.channels_last))
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestChannelsLast(flow.unittest.TestCase):
+    def test_channels_last(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["test_fun"] = [
+            _test_channels_last_stride,
+            _test_channels_last_conv2d,
+            _test_channels_last_batchnorm2d,
+            _test_channels_last_pooling,
+            _test_channels_last_upsample,
+            _test_channels_last_elementwise,
+            _test_channels_last_module_to,
+        ]
+        arg_dict["device"] = ["cpu"]
+        for arg in GenArgList(arg_dict):
+            arg[0](test_case, *arg[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
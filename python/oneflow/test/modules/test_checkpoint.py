@@ -0,0 +1,91 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+
+import numpy as np
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.checkpoint import checkpoint, checkpoint_sequential
+
+
+def _grads(model, x, use_checkpoint, segments=2):
+    model.zero_grad()
+    x = x.detach().requires_grad_()
+    if use_checkpoint:
+        y = checkpoint_sequential(model, segments, x)
+    else:
+        y = model(x)
+    y.sum().backward()
+    return (
+        y.numpy(),
+        x.grad.numpy(),
+        [p.grad.numpy() for p in model.parameters()],
+    )
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestCheckpoint(flow.unittest.TestCase):
+    def test_checkpoint_sequential(test_case):
+        model = flow.nn.Sequential(
+            flow.nn.Linear(4, 8),
+            flow.nn.ReLU(),
+            flow.nn.Linear(8, 8),
+            flow.nn.Tanh(),
+            flow.nn.Linear(8, 2),
+        )
+        x = flow.randn(3, 4)
+        (y, x_grad, p_grads) = _grads(model, x, False)
+        for segments in [1, 2, 5]:
+            (cy, cx_grad, cp_grads) = _grads(model, x, True, segments)
+            test_case.assertTrue(np.allclose(y, cy, 1e-5, 1e-5))
+            test_case.assertTrue(np.allclose(x_grad, cx_grad, 1e-5, 1e-5))
+            for (g, cg) in zip(p_grads, cp_grads):
+                test_case.assertTrue(np.allclose(g, cg, 1e-5, 1e-5))
+
+    def test_checkpoint_preserves_rng_state(test_case):
+        x = flow.randn(16, 16, requires_grad=True)
+
+        def fn(t):
+            return flow.nn.functional.dropout(t, p=0.5) * 2
+
+        y = checkpoint(fn, x)
+        y.sum().backward()
+        # The dropout mask used by the recomputation must match the forward one.
+        test_case.assertTrue(np.array_equal(y.numpy() != 0, x.grad.numpy() != 0))
+
+    def test_checkpoint_input_without_grad(test_case):
+        linear = flow.nn.Linear(4, 4)
+        x = flow.randn(2, 4)
+        y = checkpoint(linear, x)
+        test_case.assertTrue(y.requires_grad)
+        y.sum().backward()
+        test_case.assertTrue(
+            np.allclose(linear.weight.grad.numpy(), np.tile(x.numpy().sum(0), (4, 1)))
+        )
+
+    def test_checkpoint_multiple_outputs_and_non_tensor_args(test_case):
+        x = flow.randn(2, 3, requires_grad=True)
+
+        def fn(t, scale):
+            return t * scale, t + scale
+
+        (a, b) = checkpoint(fn, x, 3.0)
+        (a.sum() + b.sum()).backward()
+        test_case.assertTrue(np.allclose(x.grad.numpy(), np.full((2, 3), 4.0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -176,6 +176,141 @@ class TestReduceScatter(flow.unittest.TestCase):
         )
 
 
+class TestCpuCollectives(flow.unittest.TestCase):
+    @flow.unittest.skip_unless_1n4d()
+    def test_scatter_cpu_1n4d(test_case):
+        output = flow.zeros(2, 3, dtype=flow.int32)
+        base = np.arange(6, dtype=np.int32).reshape(2, 3)
+        if flow.env.get_rank() == 2:
+            tensor_list = [flow.tensor(base + 10 * i) for i in range(4)]
+            flow.comm.scatter(output, tensor_list, src=2)
+        else:
+            flow.comm.scatter(output, src=2)
+        test_case.assertTrue(
+            np.array_equal(output.numpy(), base + 10 * flow.env.get_rank())
+        )
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_gather_cpu_1n4d(test_case):
+        base = np.arange(6, dtype=np.float32).reshape(3, 2)
+        input = flow.tensor(base + flow.env.get_rank())
+        if flow.env.get_rank() == 3:
+            tensor_list = [flow.zeros(3, 2) for _ in range(4)]
+            flow.comm.gather(input, gather_list=tensor_list, dst=3)
+            for i in range(4):
+                test_case.assertTrue(np.allclose(tensor_list[i].numpy(), base + i))
+        else:
+            flow.comm.gather(input, dst=3)
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_reduce_cpu_1n4d(test_case):
+        np_arr = np.arange(8, dtype=np.float32).reshape(2, 4)
+        tensor = flow.tensor(np_arr * (flow.env.get_rank() + 1))
+        flow.comm.reduce(tensor, 1)
+        if flow.env.get_rank() == 1:
+            test_case.assertTrue(np.allclose(tensor.numpy(), np_arr * 10))
+        else:
+            test_case.assertTrue(
+                np.allclose(tensor.numpy(), np_arr * (flow.env.get_rank() + 1))
+            )
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_all_to_all_cpu_1n4d(test_case):
+        rank = flow.env.get_rank()
+        input_list = [
+            flow.tensor([[0, 1], [2, 3]]) + 4 * i + 16 * rank for i in range(4)
+        ]
+        output_list = [flow.zeros(2, 2, dtype=flow.int64) for _ in range(4)]
+        flow.comm.all_to_all(output_list, input_list)
+        for i in range(4):
+            test_case.assertTrue(
+                np.array_equal(
+                    output_list[i].numpy(),
+                    np.array([[0, 1], [2, 3]]) + 4 * rank + 16 * i,
+                )
+            )
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_reduce_scatter_cpu_1n4d(test_case):
+        output = flow.zeros(2, 2)
+        tensor_list = [
+            flow.tensor([[1.0, 2.0], [3.0, 4.0]]) + flow.env.get_rank() + i
+            for i in range(4)
+        ]
+        flow.comm.reduce_scatter(output, tensor_list)
+        test_case.assertTrue(
+            np.allclose(
+                output.numpy(),
+                np.array([[1.0, 2.0], [3.0, 4.0]]) * 4 + 6 + 4 * flow.env.get_rank(),
+            )
+        )
+
+
+class TestAsyncCollectives(flow.unittest.TestCase):
+    @flow.unittest.skip_unless_1n2d()
+    def test_async_all_reduce_1n2d(test_case):
+        np_arr = np.arange(6, dtype=np.float32).reshape(2, 3)
+        tensor = flow.tensor(np_arr + flow.env.get_rank())
+        work = flow.comm.all_reduce(tensor, async_op=True)
+        test_case.assertTrue(isinstance(work, flow.comm.Work))
+        test_case.assertTrue(work.wait())
+        test_case.assertTrue(work.is_completed())
+        test_case.assertTrue(np.allclose(tensor.numpy(), np_arr * 2 + 1))
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_async_all_gather_1n2d(test_case):
+        tensor = flow.tensor([1.0, 2.0]) + flow.env.get_rank()
+        tensor_list = [flow.zeros(2) for _ in range(2)]
+        work = flow.comm.all_gather(tensor_list, tensor, async_op=True)
+        work.wait()
+        for i in range(2):
+            test_case.assertTrue(
+                np.allclose(tensor_list[i].numpy(), np.array([1.0, 2.0]) + i)
+            )
+
+    @flow.unittest.skip_unless_1n2d()
+    def test_sync_returns_none_1n2d(test_case):
+        tensor = flow.ones(2)
+        test_case.assertIsNone(flow.comm.all_reduce(tensor))
+        test_case.assertTrue(np.allclose(tensor.numpy(), np.array([2.0, 2.0])))
+
+
+class TestNewGroup(flow.unittest.TestCase):
+    @flow.unittest.skip_unless_1n4d()
+    def test_new_group_is_cached_1n4d(test_case):
+        group = flow.comm.new_group([2, 0])
+        test_case.assertIs(group, flow.comm.new_group([0, 2]))
+        test_case.assertEqual(group.ranks, (0, 2))
+        test_case.assertEqual(group.size(), 2)
+        expected_rank = {0: 0, 2: 1}.get(flow.env.get_rank(), -1)
+        test_case.assertEqual(group.rank(), expected_rank)
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_group_all_reduce_1n4d(test_case):
+        rank = flow.env.get_rank()
+        group = flow.comm.new_group([1, 3] if rank % 2 == 1 else [0, 2])
+        tensor = flow.tensor([1.0, 2.0]) * (rank + 1)
+        work = flow.comm.all_reduce(tensor, group=group, async_op=True)
+        work.wait()
+        total = sum(r + 1 for r in group.ranks)
+        test_case.assertTrue(np.allclose(tensor.numpy(), np.array([1.0, 2.0]) * total))
+
+    @flow.unittest.skip_unless_1n4d()
+    def test_group_broadcast_and_reduce_1n4d(test_case):
+        group = flow.comm.new_group([1, 2, 3])
+        rank = flow.env.get_rank()
+        tensor = flow.tensor([0.0, 1.0]) + rank
+        flow.comm.broadcast(tensor, 3, group=group)
+        expected = np.array([0.0, 1.0]) + (3 if rank in group.ranks else 0)
+        test_case.assertTrue(np.allclose(tensor.numpy(), expected))
+
+        tensor = flow.tensor([1.0, 1.0]) * rank
+        flow.comm.reduce(tensor, 2, group=group)
+        expected = np.array([1.0, 1.0]) * (6 if rank == 2 else rank)
+        test_case.assertTrue(np.allclose(tensor.numpy(), expected))
+        flow.comm.barrier(group)
+
+
 @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
 @flow.unittest.skip_unless_1n2d()
 class TestDocs(flow.unittest.TestCase):
@@ -0,0 +1,80 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestCpuMemoryStats(flow.unittest.TestCase):
+    def test_memory_stats_keys(test_case):
+        stats = flow.cpu.memory_stats()
+        for key in [
+            "allocated_bytes",
+            "reserved_bytes",
+            "peak_allocated_bytes",
+            "peak_reserved_bytes",
+            "num_alloc_calls",
+            "num_free_calls",
+            "num_system_allocs",
+            "num_system_frees",
+        ]:
+            test_case.assertTrue(key in stats)
+        test_case.assertGreaterEqual(stats["reserved_bytes"], stats["allocated_bytes"])
+
+    def test_allocated_and_peak(test_case):
+        flow.cpu.reset_peak_memory_stats()
+        before = flow.cpu.memory_allocated()
+        x = flow.ones(1024, 1024)
+        test_case.assertGreaterEqual(
+            flow.cpu.memory_allocated() - before, 1024 * 1024 * 4
+        )
+        del x
+        stats = flow.cpu.memory_stats()
+        test_case.assertEqual(stats["allocated_bytes"], before)
+        test_case.assertGreaterEqual(
+            stats["peak_allocated_bytes"], before + 1024 * 1024 * 4
+        )
+        flow.cpu.reset_peak_memory_stats()
+        test_case.assertEqual(flow.cpu.memory_stats()["peak_allocated_bytes"], before)
+
+    @unittest.skipIf(
+        os.getenv("ONEFLOW_CPU_CACHING_ALLOCATOR") in ["0", "false", "False"],
+        "caching cpu allocator is disabled",
+    )
+    def test_cached_memory_is_reused(test_case):
+        x = flow.ones(256, 256)
+        del x
+        num_system_allocs = flow.cpu.memory_stats()["num_system_allocs"]
+        for _ in range(10):
+            y = flow.ones(256, 256)
+            del y
+        test_case.assertEqual(
+            flow.cpu.memory_stats()["num_system_allocs"], num_system_allocs
+        )
+
+    def test_empty_cache(test_case):
+        x = flow.ones(4096, 1024)
+        del x
+        flow.cpu.empty_cache()
+        stats = flow.cpu.memory_stats()
+        test_case.assertGreaterEqual(stats["reserved_bytes"], stats["allocated_bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
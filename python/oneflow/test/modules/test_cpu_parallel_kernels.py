@@ -0,0 +1,156 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import os
+import unittest
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _default_num_threads():
+    return max(1, (os.cpu_count() or 1) - 2)
+
+
+def _run_with_num_threads(num_threads, fn):
+    previous = flow.get_num_threads()
+    flow.set_num_threads(num_threads)
+    try:
+        return fn()
+    finally:
+        flow.set_num_threads(previous)
+
+
+def _check_same_as_single_thread(test_case, name, fn):
+    # Every parallelized kernel keeps the per-element order of the serial loop,
+    # so the multi-threaded result must match the single-threaded one bitwise.
+    single = [t.numpy() for t in _run_with_num_threads(1, fn)]
+    multi = [t.numpy() for t in _run_with_num_threads(_default_num_threads(), fn)]
+    for s, m in zip(single, multi):
+        test_case.assertTrue(np.array_equal(s, m), name)
+
+
+def _forward_backward(op, *inputs):
+    def fn():
+        xs = [x.detach().requires_grad_(x.dtype == flow.float32) for x in inputs]
+        y = op(*xs)
+        y.sum().backward()
+        return [y.detach()] + [x.grad for x in xs if x.grad is not None]
+
+    return fn
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestCpuParallelKernels(flow.unittest.TestCase):
+    def test_softmax(test_case):
+        x = flow.randn(512, 1000)
+        _check_same_as_single_thread(
+            test_case,
+            "softmax",
+            _forward_backward(lambda t: flow.softmax(t, dim=-1), x),
+        )
+        _check_same_as_single_thread(
+            test_case,
+            "log_softmax",
+            _forward_backward(lambda t: flow.log_softmax(t, dim=-1), x),
+        )
+
+    def test_reduce(test_case):
+        x = flow.randn(64, 256, 64)
+        for axis in [[0], [1], [2], [0, 2]]:
+            _check_same_as_single_thread(
+                test_case,
+                "reduce_max axis={}".format(axis),
+                lambda: [flow._C.reduce_max(x, axis)],
+            )
+            _check_same_as_single_thread(
+                test_case,
+                "reduce_prod axis={}".format(axis),
+                lambda: [flow.prod(x, dim=axis)],
+            )
+
+    def test_pool(test_case):
+        x = flow.randn(16, 32, 56, 56)
+        for data_format in ["channels_first", "channels_last"]:
+            inp = x if data_format == "channels_first" else x.permute(0, 2, 3, 1)
+            _check_same_as_single_thread(
+                test_case,
+                "avg_pool2d " + data_format,
+                _forward_backward(
+                    lambda t: flow._C.avg_pool2d_nhwc(
+                        t, [3, 3], [2, 2], "customized", [1, 1], [1, 1], data_format,
+                    ),
+                    inp.contiguous(),
+                ),
+            )
+
+    def test_gather(test_case):
+        x = flow.randn(1000, 256)
+        index = flow.randint(0, 1000, (4096,))
+        _check_same_as_single_thread(
+            test_case,
+            "gather",
+            lambda: [flow.gather(x, 0, index.unsqueeze(1).expand(4096, 256))],
+        )
+        _check_same_as_single_thread(
+            test_case, "index_select", lambda: [flow.index_select(x, 0, index)]
+        )
+
+    def test_scatter(test_case):
+        src = flow.randn(64, 128, 32)
+        index = flow.randint(0, 16, (64, 128, 32))
+        for dim in [0, 1, 2]:
+            _check_same_as_single_thread(
+                test_case,
+                "scatter_add dim={}".format(dim),
+                lambda: [flow.scatter_add(flow.zeros(64, 128, 32), dim, index, src)],
+            )
+
+    def test_upsample(test_case):
+        x = flow.randn(8, 32, 64, 64)
+        for mode in ["nearest", "bilinear", "bicubic"]:
+            _check_same_as_single_thread(
+                test_case,
+                "upsample " + mode,
+                _forward_backward(
+                    lambda t: flow.nn.functional.interpolate(
+                        t, scale_factor=2.0, mode=mode
+                    ),
+                    x,
+                ),
+            )
+
+    def test_pad(test_case):
+        x = flow.randn(16, 32, 64, 64)
+        _check_same_as_single_thread(
+            test_case,
+            "constant pad",
+            _forward_backward(
+                lambda t: flow.nn.functional.pad(t, (1, 2, 3, 4), value=1.0), x
+            ),
+        )
+
+    def test_where(test_case):
+        cond = flow.randn(1 << 20) > 0
+        x = flow.randn(1 << 20)
+        y = flow.randn(1 << 20)
+        _check_same_as_single_thread(
+            test_case, "where", lambda: [flow.where(cond, x, y)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -173,7 +173,8 @@ class TestFusedMatmulBiasAddRelu(flow.unittest.TestCase):
     def test_fused_matmul_op(test_case):
         args_dict = OrderedDict()
         args_dict["test_fun"] = [_test_fused_matmul_bias_add_relu]
-        args_dict["batchsize"] = [1, 2, 4]
+        # 300 rows span several of the CPU kernel's row blocks.
+        args_dict["batchsize"] = [1, 2, 4, 300]
         args_dict["in_feature"] = [96, 128]
         args_dict["hidden_size_list"] = [[256, 512], [256], [96, 144], []]
         args_dict["out_feature"] = [512, 1024, 288]
@@ -42,8 +42,8 @@ def _test_fused_dot_feature_interaction(
         np_dtype = np.float32
     feature_0_np = np.random.rand(batch_size, embedding_size).astype(np_dtype)
     feature_1_np = np.random.rand(batch_size, 26, embedding_size).astype(np_dtype)
-    feature_0_tensor = flow.tensor(feature_0_np, device="cuda", requires_grad=True)
-    feature_1_tensor = flow.tensor(feature_1_np, device="cuda", requires_grad=True)
+    feature_0_tensor = flow.tensor(feature_0_np, device=device_type, requires_grad=True)
+    feature_1_tensor = flow.tensor(feature_1_np, device=device_type, requires_grad=True)
     if self_interaction:
         offset = 1
     else:
@@ -69,7 +69,7 @@ def _test_fused_dot_feature_interaction(
     if output_padding != 0:
         padding_tensor = flow.tensor(
             np.zeros((batch_size, output_padding)).astype(np_dtype),
-            device="cuda",
+            device=device_type,
             requires_grad=False,
         )
         R = flow.cat([R, padding_tensor], dim=1)
@@ -77,10 +77,10 @@ def _test_fused_dot_feature_interaction(
     loss.backward()
 
     fused_feature_0_tensor = flow.tensor(
-        feature_0_np, device="cuda", requires_grad=True
+        feature_0_np, device=device_type, requires_grad=True
     )
     fused_feature_1_tensor = flow.tensor(
-        feature_1_np, device="cuda", requires_grad=True
+        feature_1_np, device=device_type, requires_grad=True
     )
     if output_concat:
         output_concat_tensor = fused_feature_0_tensor
@@ -129,5 +129,18 @@ class FusedDotFeatureInteractionTestCase(flow.unittest.TestCase):
             _test_fused_dot_feature_interaction(test_case, **kwargs)
 
 
+@flow.unittest.skip_unless_1n1d()
+class FusedDotFeatureInteractionCpuTestCase(flow.unittest.TestCase):
+    def test_fused_dot_feature_interaction_cpu(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["self_interaction"] = [True, False]
+        arg_dict["output_concat"] = [False, True]
+        arg_dict["output_padding"] = [0, 1]
+        arg_dict["dtype"] = [flow.float32]
+        arg_dict["device_type"] = ["cpu"]
+        for kwargs in GenArgDict(arg_dict):
+            _test_fused_dot_feature_interaction(test_case, **kwargs)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -327,6 +327,57 @@ def _test_groupnorm_backward_3d(test_case, device):
     )
 
 
+def _test_group_norm_functional(test_case, device, num_groups, affine):
+    np_x = np.random.randn(4, 6, 5, 7)
+    np_weight = np.random.randn(6)
+    np_bias = np.random.randn(6)
+    np_dy = np.random.randn(*np_x.shape)
+    eps = 1e-5
+    x = flow.tensor(np_x, dtype=flow.float64, device=device, requires_grad=True)
+    weight = None
+    bias = None
+    if affine:
+        weight = flow.tensor(
+            np_weight, dtype=flow.float64, device=device, requires_grad=True
+        )
+        bias = flow.tensor(
+            np_bias, dtype=flow.float64, device=device, requires_grad=True
+        )
+    y = flow._C.group_norm(x, num_groups, weight, bias, eps)
+    (y * flow.tensor(np_dy, dtype=flow.float64, device=device)).sum().backward()
+
+    grouped = np_x.reshape(4, num_groups, -1)
+    mean = grouped.mean(axis=2, keepdims=True)
+    inv_std = 1.0 / np.sqrt(grouped.var(axis=2, keepdims=True) + eps)
+    x_hat = ((grouped - mean) * inv_std).reshape(np_x.shape)
+    param_shape = (1, 6, 1, 1)
+    np_y = x_hat
+    g = np_dy
+    if affine:
+        np_y = x_hat * np_weight.reshape(param_shape) + np_bias.reshape(param_shape)
+        g = np_dy * np_weight.reshape(param_shape)
+    g = g.reshape(4, num_groups, -1)
+    grouped_x_hat = x_hat.reshape(4, num_groups, -1)
+    np_dx = inv_std * (
+        g
+        - g.mean(axis=2, keepdims=True)
+        - grouped_x_hat * (g * grouped_x_hat).mean(axis=2, keepdims=True)
+    )
+    test_case.assertTrue(np.allclose(y.numpy(), np_y, 1e-6, 1e-6))
+    test_case.assertTrue(
+        np.allclose(x.grad.numpy(), np_dx.reshape(np_x.shape), 1e-6, 1e-6)
+    )
+    if affine:
+        test_case.assertTrue(
+            np.allclose(
+                weight.grad.numpy(), (np_dy * x_hat).sum(axis=(0, 2, 3)), 1e-6, 1e-6
+            )
+        )
+        test_case.assertTrue(
+            np.allclose(bias.grad.numpy(), np_dy.sum(axis=(0, 2, 3)), 1e-6, 1e-6)
+        )
+
+
 @flow.unittest.skip_unless_1n1d()
 class TestGroupNorm(flow.unittest.TestCase):
     def test_groupnorm(test_case):
@@ -341,6 +392,14 @@ class TestGroupNorm(flow.unittest.TestCase):
         for arg in GenArgList(arg_dict):
             arg[0](test_case, *arg[1:])
 
+    def test_group_norm_functional(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["num_groups"] = [1, 3, 6]
+        arg_dict["affine"] = [True, False]
+        for arg in GenArgList(arg_dict):
+            _test_group_norm_functional(test_case, *arg)
+
     @autotest(rtol=1e-03, atol=1e-03, check_graph=True)
     def test_group_norm_with_random_data(test_case):
         channels = random(5, 20)
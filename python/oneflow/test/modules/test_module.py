@@ -321,6 +321,80 @@ class TestModule(flow.unittest.TestCase):
         output = model(input, "conv", "relu")
         test_case.assertEqual(output.shape, flow.Size([4, 10, 30, 30]))
 
+    @flow.unittest.skip_unless_1n1d()
+    def test_full_backward_hook(test_case):
+        m = nn.Linear(3, 4)
+        records = []
+
+        def pre_hook(module, grad_output):
+            records.append(("pre", grad_output[0].shape))
+
+        def hook(module, grad_input, grad_output):
+            records.append(("post", grad_input[0].shape, grad_output[0].shape))
+            return (grad_input[0] * 2,)
+
+        pre_handle = m.register_full_backward_pre_hook(pre_hook)
+        handle = m.register_full_backward_hook(hook)
+        x = flow.randn(2, 3, requires_grad=True)
+        m(x).sum().backward()
+        test_case.assertEqual(
+            records,
+            [
+                ("pre", flow.Size([2, 4])),
+                ("post", flow.Size([2, 3]), flow.Size([2, 4])),
+            ],
+        )
+        expected = np.tile(m.weight.numpy().sum(axis=0), (2, 1)) * 2
+        test_case.assertTrue(np.allclose(x.grad.numpy(), expected, 1e-5, 1e-5))
+
+        pre_handle.remove()
+        handle.remove()
+        records.clear()
+        x.grad = None
+        m(x).sum().backward()
+        test_case.assertEqual(records, [])
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_full_backward_hook_without_input_grad(test_case):
+        m = nn.Linear(3, 4)
+        grad_inputs = []
+        m.register_full_backward_hook(
+            lambda module, grad_input, grad_output: grad_inputs.append(grad_input)
+        )
+        m(flow.randn(2, 3)).sum().backward()
+        test_case.assertEqual(grad_inputs, [(None,)])
+        test_case.assertIsNotNone(m.weight.grad)
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_remove_forward_hook(test_case):
+        m = nn.ReLU()
+        calls = []
+        handle = m.register_forward_hook(lambda *args: calls.append(1))
+        m(flow.randn(2, 3))
+        handle.remove()
+        m(flow.randn(2, 3))
+        test_case.assertEqual(len(calls), 1)
+
+    @flow.unittest.skip_unless_1n1d()
+    def test_module_profiler(test_case):
+        model = nn.Sequential(nn.Linear(8, 16), nn.ReLU(), nn.Linear(16, 4))
+        with flow.utils.module_profiler(model) as prof:
+            model(flow.randn(2, 8)).sum().backward()
+        stats = {s.name: s for s in prof.stats()}
+        test_case.assertEqual(stats["0"].forward_calls, 1)
+        test_case.assertEqual(stats["2"].backward_calls, 1)
+        # the input of the first layer does not require grad
+        test_case.assertEqual(stats["0"].backward_calls, 0)
+        test_case.assertEqual(stats["0"].activation_bytes, 2 * 16 * 4)
+        test_case.assertEqual(stats["0"].param_bytes, (8 * 16 + 16) * 4)
+        test_case.assertEqual(stats["0"].grad_bytes, (8 * 16 + 16) * 4)
+        test_case.assertEqual(
+            stats["Sequential"].param_bytes, (8 * 16 + 16 + 16 * 4 + 4) * 4
+        )
+        test_case.assertIn("Forward", prof.table(sort_by="forward_time_total"))
+        test_case.assertEqual(len(model[0]._forward_hooks), 0)
+        test_case.assertEqual(len(model[0]._backward_hooks), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,215 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from oneflow.test_utils.test_util import GenArgList
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _quantize_input(x, scale, zero_point):
+    return np.clip(np.rint(x / scale) + zero_point, 0, 255).astype(np.int64)
+
+
+def _quantize_weight(weight):
+    flat = weight.reshape(weight.shape[0], -1)
+    scale = np.max(np.abs(flat), axis=1) / 127.0
+    scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+    q = np.clip(np.rint(flat / scale[:, None]), -128, 127).astype(np.int8)
+    return q.reshape(weight.shape), scale
+
+
+def _np_quantized_linear(x, qweight, weight_scale, bias, input_scale, zero_point, relu):
+    qx = _quantize_input(x, input_scale, zero_point) - zero_point
+    acc = qx.reshape(-1, x.shape[-1]) @ qweight.astype(np.int64).T
+    out = acc.astype(np.float32) * (input_scale * weight_scale)
+    if bias is not None:
+        out += bias
+    if relu:
+        out = np.maximum(out, 0)
+    return out.reshape(*x.shape[:-1], qweight.shape[0])
+
+
+def _np_quantized_conv2d(
+    x,
+    qweight,
+    weight_scale,
+    bias,
+    input_scale,
+    zero_point,
+    stride,
+    padding,
+    groups,
+    relu,
+):
+    qx = _quantize_input(x, input_scale, zero_point) - zero_point
+    qx = np.pad(qx, ((0, 0), (0, 0), (padding, padding), (padding, padding)))
+    (n, c, h, w) = qx.shape
+    (o, cg, kh, kw) = qweight.shape
+    oh = (h - kh) // stride + 1
+    ow = (w - kw) // stride + 1
+    og = o // groups
+    acc = np.zeros((n, o, oh, ow), dtype=np.int64)
+    for g in range(groups):
+        xg = qx[:, g * cg : (g + 1) * cg]
+        wg = qweight[g * og : (g + 1) * og].astype(np.int64)
+        for i in range(oh):
+            for j in range(ow):
+                patch = xg[
+                    :, :, i * stride : i * stride + kh, j * stride : j * stride + kw
+                ]
+                acc[:, g * og : (g + 1) * og, i, j] = np.einsum(
+                    "nchw,ochw->no", patch, wg
+                )
+    out = acc.astype(np.float32) * (input_scale * weight_scale)[None, :, None, None]
+    if bias is not None:
+        out += bias[None, :, None, None]
+    if relu:
+        out = np.maximum(out, 0)
+    return out
+
+
+def _test_quantized_linear(test_case, has_bias, activation, batch_shape):
+    in_features, out_features = 37, 70
+    x = np.random.randn(*batch_shape, in_features).astype(np.float32)
+    weight = np.random.randn(out_features, in_features).astype(np.float32)
+    weight[3] = 0
+    bias = np.random.randn(out_features).astype(np.float32) if has_bias else None
+    qweight, weight_scale = _quantize_weight(weight)
+    input_scale, zero_point = 0.03, 117
+    out = flow._C.quantized_linear(
+        flow.tensor(x),
+        flow.tensor(qweight, dtype=flow.int8),
+        flow.tensor(weight_scale),
+        input_scale,
+        zero_point,
+        flow.tensor(bias) if has_bias else None,
+        activation,
+    )
+    expected = _np_quantized_linear(
+        x, qweight, weight_scale, bias, input_scale, zero_point, activation == "relu"
+    )
+    test_case.assertTrue(np.allclose(out.numpy(), expected, rtol=1e-4, atol=1e-4))
+
+
+def _test_quantized_conv2d(test_case, has_bias, activation, stride, padding, groups):
+    x = np.random.randn(2, 4, 9, 11).astype(np.float32)
+    weight = np.random.randn(6, 4 // groups, 3, 3).astype(np.float32)
+    bias = np.random.randn(6).astype(np.float32) if has_bias else None
+    qweight, weight_scale = _quantize_weight(weight)
+    input_scale, zero_point = 0.02, 131
+    out = flow._C.quantized_conv2d(
+        flow.tensor(x),
+        flow.tensor(qweight, dtype=flow.int8),
+        flow.tensor(weight_scale),
+        input_scale,
+        zero_point,
+        flow.tensor(bias) if has_bias else None,
+        stride=stride,
+        padding=padding,
+        groups=groups,
+        activation=activation,
+    )
+    expected = _np_quantized_conv2d(
+        x,
+        qweight,
+        weight_scale,
+        bias,
+        input_scale,
+        zero_point,
+        stride,
+        padding,
+        groups,
+        activation == "relu",
+    )
+    test_case.assertEqual(out.shape, expected.shape)
+    test_case.assertTrue(np.allclose(out.numpy(), expected, rtol=1e-4, atol=1e-4))
+
+
+def _relative_error(actual, expected):
+    return np.linalg.norm(actual - expected) / (np.linalg.norm(expected) + 1e-6)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestPostTrainingQuantization(flow.unittest.TestCase):
+    def test_quantized_linear(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["has_bias"] = [True, False]
+        arg_dict["activation"] = ["none", "relu"]
+        arg_dict["batch_shape"] = [(1,), (16,), (3, 5)]
+        for arg in GenArgList(arg_dict):
+            _test_quantized_linear(test_case, *arg)
+
+    def test_quantized_conv2d(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["has_bias"] = [True, False]
+        arg_dict["activation"] = ["none", "relu"]
+        arg_dict["stride"] = [1, 2]
+        arg_dict["padding"] = [0, 1]
+        arg_dict["groups"] = [1, 2]
+        for arg in GenArgList(arg_dict):
+            _test_quantized_conv2d(test_case, *arg)
+
+    def test_quantized_linear_from_float(test_case):
+        linear = flow.nn.Linear(64, 32)
+        qlinear = flow.nn.QuantizedLinear.from_float(
+            linear, input_scale=8.0 / 255, input_zero_point=128
+        )
+        test_case.assertEqual(qlinear.weight.dtype, flow.int8)
+        x = flow.rand(8, 64) * 6 - 3
+        test_case.assertLess(
+            _relative_error(qlinear(x).numpy(), linear(x).detach().numpy()), 0.05
+        )
+
+    def test_prepare_and_convert(test_case):
+        model = flow.nn.Sequential(
+            flow.nn.Conv2d(3, 8, 3, padding=1),
+            flow.nn.ReLU(),
+            flow.nn.Conv2d(8, 8, 3, stride=2, groups=2),
+            flow.nn.Flatten(),
+            flow.nn.Linear(8 * 7 * 7, 16),
+            flow.nn.ReLU(),
+            flow.nn.Linear(16, 4),
+        ).eval()
+        calibration = [flow.randn(4, 3, 16, 16) for _ in range(8)]
+        with flow.no_grad():
+            expected = [model(x).numpy() for x in calibration]
+        model = flow.quantization.prepare(model)
+        with flow.no_grad():
+            for x in calibration:
+                model(x)
+        model = flow.quantization.convert(model)
+        test_case.assertTrue(isinstance(model[0], flow.nn.QuantizedConv2d))
+        test_case.assertEqual(model[0].activation, "relu")
+        test_case.assertTrue(isinstance(model[1], flow.nn.Identity))
+        test_case.assertTrue(isinstance(model[2], flow.nn.QuantizedConv2d))
+        test_case.assertEqual(model[2].activation, "none")
+        test_case.assertTrue(isinstance(model[4], flow.nn.QuantizedLinear))
+        test_case.assertEqual(model[4].activation, "relu")
+        test_case.assertTrue(isinstance(model[6], flow.nn.QuantizedLinear))
+        with flow.no_grad():
+            actual = [model(x).numpy() for x in calibration]
+        test_case.assertLess(
+            _relative_error(np.concatenate(actual), np.concatenate(expected)), 0.1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import json
+import os
+import tempfile
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestProfiler(flow.unittest.TestCase):
+    def test_profile_records_ops(test_case):
+        x = flow.randn(4, 8)
+        with flow.profiler.profile(record_shapes=True) as prof:
+            y = flow.matmul(x, x.T)
+            z = flow.relu(y)
+        events = prof.events()
+        names = set(e.name for e in events)
+        test_case.assertIn("matmul", names)
+        test_case.assertIn("relu", names)
+        kinds = set(e.kind for e in events if e.name == "matmul")
+        test_case.assertEqual(kinds, set(["dispatch", "kernel"]))
+        matmul_kernel = [e for e in events if e.name == "matmul" and e.kind == "kernel"]
+        test_case.assertEqual(matmul_kernel[0].input_shapes, ["(4,8)", "(8,4)"])
+        test_case.assertEqual(matmul_kernel[0].allocated_bytes, 4 * 4 * 4)
+        test_case.assertTrue(all(e.duration_us >= 0 for e in events))
+
+    def test_key_averages(test_case):
+        x = flow.randn(4, 8)
+        with flow.profiler.profile() as prof:
+            for _ in range(3):
+                x = flow.relu(x)
+        averages = prof.key_averages()
+        relu = [item for item in averages if item.name == "relu"]
+        test_case.assertEqual(len(relu), 1)
+        test_case.assertEqual(relu[0].count, 3)
+        test_case.assertEqual(relu[0].kernel_count, 3)
+        table = averages.table(sort_by="kernel_time_total", row_limit=1)
+        test_case.assertIn("Kernel Total", table)
+
+    def test_not_recording_outside(test_case):
+        x = flow.randn(4, 8)
+        with flow.profiler.profile() as prof:
+            pass
+        flow.relu(x)
+        test_case.assertEqual(len(prof.events()), 0)
+
+    def test_record_function_and_chrome_trace(test_case):
+        with flow.profiler.profile(with_stack=True) as prof:
+            with flow.profiler.record_function("block"):
+                y = flow.ones(2, 3) * 2
+        names = [e.name for e in prof.events()]
+        test_case.assertIn("block", names)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "trace.json")
+            prof.export_chrome_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+        test_case.assertEqual(len(trace["traceEvents"]), len(names))
+        test_case.assertTrue(all(e["ph"] == "X" for e in trace["traceEvents"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import unittest
+import numpy as np
+from collections import OrderedDict
+
+from oneflow.test_utils.test_util import GenArgList
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _np_attention(q, k, v, mask, is_causal, scale, out_grad):
+    scores = np.matmul(q, np.swapaxes(k, -1, -2)) * scale
+    if mask is not None:
+        scores = scores + mask
+    if is_causal:
+        causal = np.tril(np.ones(scores.shape[-2:], dtype=bool))
+        scores = np.where(causal, scores, -np.inf)
+    weights = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    weights = weights / weights.sum(axis=-1, keepdims=True)
+    out = np.matmul(weights, v)
+    v_grad = np.matmul(np.swapaxes(weights, -1, -2), out_grad)
+    weights_grad = np.matmul(out_grad, np.swapaxes(v, -1, -2))
+    scores_grad = weights * (
+        weights_grad - (weights_grad * weights).sum(axis=-1, keepdims=True)
+    )
+    q_grad = np.matmul(scores_grad, k) * scale
+    k_grad = np.matmul(np.swapaxes(scores_grad, -1, -2), q) * scale
+    return out, q_grad, k_grad, v_grad
+
+
+def _test_scaled_dot_product_attention(
+    test_case, device, query_len, key_len, with_mask, is_causal
+):
+    batch, heads, head_size, value_head_size = 2, 3, 8, 5
+    np_q = np.random.randn(batch, heads, query_len, head_size)
+    np_k = np.random.randn(batch, heads, key_len, head_size)
+    np_v = np.random.randn(batch, heads, key_len, value_head_size)
+    np_out_grad = np.random.randn(batch, heads, query_len, value_head_size)
+    np_mask = None
+    mask = None
+    if with_mask:
+        # Broadcast over batch and heads; the last key is padding.
+        np_mask = np.random.randn(query_len, key_len)
+        np_mask[:, -1] = -np.inf
+        mask = flow.tensor(np_mask, dtype=flow.float64, device=device)
+    scale = 1.0 / np.sqrt(head_size)
+    q = flow.tensor(np_q, dtype=flow.float64, device=device, requires_grad=True)
+    k = flow.tensor(np_k, dtype=flow.float64, device=device, requires_grad=True)
+    v = flow.tensor(np_v, dtype=flow.float64, device=device, requires_grad=True)
+    out = flow._C.scaled_dot_product_attention(q, k, v, mask, is_causal=is_causal)
+    out.backward(flow.tensor(np_out_grad, dtype=flow.float64, device=device))
+    np_out, np_q_grad, np_k_grad, np_v_grad = _np_attention(
+        np_q, np_k, np_v, np_mask, is_causal, scale, np_out_grad
+    )
+    test_case.assertTrue(np.allclose(out.numpy(), np_out, 1e-6, 1e-6))
+    test_case.assertTrue(np.allclose(q.grad.numpy(), np_q_grad, 1e-6, 1e-6))
+    test_case.assertTrue(np.allclose(k.grad.numpy(), np_k_grad, 1e-6, 1e-6))
+    test_case.assertTrue(np.allclose(v.grad.numpy(), np_v_grad, 1e-6, 1e-6))
+
+
+def _test_scaled_dot_product_attention_dropout(test_case, device):
+    q = flow.randn(2, 4, 40, 16, device=device, requires_grad=True)
+    k = flow.randn(2, 4, 40, 16, device=device, requires_grad=True)
+    v = flow.ones(2, 4, 40, 16, device=device, requires_grad=True)
+    out = flow._C.scaled_dot_product_attention(q, k, v, dropout_p=0.5)
+    # The rows of the dropped attention weights average to 1 over the kept ones.
+    test_case.assertTrue(np.allclose(out.numpy().mean(), 1.0, atol=0.1))
+    test_case.assertFalse(np.allclose(out.numpy(), 1.0))
+    out.sum().backward()
+    # Every dropped weight sends no gradient to its value row, and the kept weights of a
+    # query are scaled by 1 / (1 - p), so the value gradient sums to the number of queries.
+    test_case.assertTrue(
+        np.allclose(v.grad.numpy().sum(axis=(2, 3)).mean(), 40 * 16, rtol=0.1)
+    )
+    test_case.assertTrue(np.isfinite(q.grad.numpy()).all())
+    test_case.assertTrue(np.isfinite(k.grad.numpy()).all())
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestScaledDotProductAttention(flow.unittest.TestCase):
+    def test_scaled_dot_product_attention(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        # Lengths that are not multiples of the CPU block sizes.
+        arg_dict["query_len"] = [1, 37, 150]
+        arg_dict["key_len"] = [37, 150]
+        arg_dict["with_mask"] = [True, False]
+        arg_dict["is_causal"] = [True, False]
+        for arg in GenArgList(arg_dict):
+            _test_scaled_dot_product_attention(test_case, *arg)
+
+    def test_scaled_dot_product_attention_dropout(test_case):
+        for device in ["cpu", "cuda"]:
+            _test_scaled_dot_product_attention_dropout(test_case, device)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -147,6 +147,219 @@ def _test_embedding_functional_impl(test_case, device):
     test_case.assertTrue(np.allclose(weight.grad.numpy(), weight_grad_np, 1e-05, 1e-05))
 
 
+def _test_embedding_sparse_grad_impl(test_case, device):
+    m = flow.nn.Embedding(10, 3, padding_idx=3, sparse=True).to(device)
+    indices = flow.tensor(
+        [[1, 2, 4, 5], [4, 3, 2, 9]], dtype=flow.int, device=flow.device(device)
+    )
+    y = m(indices)
+    test_case.assertTrue(
+        np.allclose(y.numpy(), m.weight.numpy()[indices.numpy()], 1e-05, 1e-05)
+    )
+    y.sum().backward()
+    test_case.assertIsNone(m.weight.grad)
+    grad_indices, grad_values = flow.nn.modules.sparse.get_sparse_grad(m.weight)
+    test_case.assertEqual(grad_values.shape, flow.Size([8, 3]))
+    dense_grad = np.zeros((10, 3), dtype=np.float32)
+    np.add.at(dense_grad, grad_indices.numpy(), grad_values.numpy())
+    weight_grad_np = [
+        [0.0, 0.0, 0.0],
+        [1.0, 1.0, 1.0],
+        [2.0, 2.0, 2.0],
+        [0.0, 0.0, 0.0],
+        [2.0, 2.0, 2.0],
+        [1.0, 1.0, 1.0],
+        [0.0, 0.0, 0.0],
+        [0.0, 0.0, 0.0],
+        [0.0, 0.0, 0.0],
+        [1.0, 1.0, 1.0],
+    ]
+    test_case.assertTrue(np.allclose(dense_grad, weight_grad_np, 1e-05, 1e-05))
+    m.zero_grad()
+    test_case.assertIsNone(flow.nn.modules.sparse.get_sparse_grad(m.weight))
+
+
+def _test_embedding_sparse_optimizer_impl(test_case, device, optimizer, options):
+    weight = np.random.randn(10, 4).astype(np.float32)
+    # every row is looked up, so lazy updates have to match the dense ones
+    indices = flow.tensor(
+        [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9], [9, 2, 2, 0, 5]],
+        dtype=flow.int64,
+        device=flow.device(device),
+    )
+    dense = flow.nn.Embedding(10, 4, _weight=flow.Tensor(weight)).to(device)
+    sparse = flow.nn.Embedding(10, 4, sparse=True, _weight=flow.Tensor(weight)).to(
+        device
+    )
+    dense_optimizer = optimizer(dense.parameters(), **options)
+    sparse_optimizer = optimizer(sparse.parameters(), **options)
+    for _ in range(3):
+        for m, opt in ((dense, dense_optimizer), (sparse, sparse_optimizer)):
+            y = m(indices)
+            (y * y).sum().backward()
+            opt.step()
+            opt.zero_grad()
+    test_case.assertTrue(
+        np.allclose(dense.weight.numpy(), sparse.weight.numpy(), 1e-04, 1e-04)
+    )
+
+    # rows that are not looked up keep their values
+    indices = flow.tensor([1, 2, 2], dtype=flow.int64, device=flow.device(device))
+    before = sparse.weight.numpy()
+    sparse(indices).sum().backward()
+    sparse_optimizer.step()
+    after = sparse.weight.numpy()
+    test_case.assertTrue(np.array_equal(before[3:], after[3:]))
+    test_case.assertTrue(np.array_equal(before[0], after[0]))
+    test_case.assertFalse(np.allclose(before[1:3], after[1:3]))
+
+
+def _test_embedding_sparse_clip_grad_impl(test_case, device, norm_type):
+    weight = np.random.randn(10, 4).astype(np.float32)
+    indices = flow.tensor(
+        [[9, 2, 2, 0], [5, 2, 9, 1]], dtype=flow.int64, device=flow.device(device)
+    )
+    dense = flow.nn.Embedding(10, 4, _weight=flow.Tensor(weight)).to(device)
+    sparse = flow.nn.Embedding(10, 4, sparse=True, _weight=flow.Tensor(weight)).to(
+        device
+    )
+    norms = []
+    for m in (dense, sparse):
+        (m(indices) * 3).sum().backward()
+        norms.append(flow.nn.utils.clip_grad_norm_(m.parameters(), 1.0, norm_type))
+    test_case.assertTrue(np.allclose(norms[0].numpy(), norms[1].numpy(), 1e-05, 1e-05))
+    grad_indices, grad_values = flow.nn.modules.sparse.get_sparse_grad(sparse.weight)
+    dense_grad = np.zeros((10, 4), dtype=np.float32)
+    np.add.at(dense_grad, grad_indices.numpy(), grad_values.numpy())
+    test_case.assertTrue(
+        np.allclose(dense_grad, dense.weight.grad.numpy(), 1e-05, 1e-05)
+    )
+
+    for m in (dense, sparse):
+        m.zero_grad()
+        (m(indices) * 3).sum().backward()
+        flow.nn.utils.clip_grad_value_(m.parameters(), 4.0)
+    grad_indices, grad_values = flow.nn.modules.sparse.get_sparse_grad(sparse.weight)
+    dense_grad = np.zeros((10, 4), dtype=np.float32)
+    np.add.at(dense_grad, grad_indices.numpy(), grad_values.numpy())
+    test_case.assertTrue(
+        np.allclose(dense_grad, dense.weight.grad.numpy(), 1e-05, 1e-05)
+    )
+
+
+def _np_embedding_bag(weight, indices, offsets, mode, per_sample_weights=None):
+    bounds = list(offsets) + [len(indices)]
+    out = np.zeros((len(offsets), weight.shape[1]), dtype=weight.dtype)
+    grad = np.zeros_like(weight)
+    for bag in range(len(offsets)):
+        bag_indices = indices[bounds[bag] : bounds[bag + 1]]
+        if len(bag_indices) == 0:
+            continue
+        rows = weight[bag_indices]
+        scale = np.ones((len(bag_indices), 1), dtype=weight.dtype)
+        if per_sample_weights is not None:
+            scale = per_sample_weights[bounds[bag] : bounds[bag + 1], None]
+        if mode == "sum":
+            out[bag] = (rows * scale).sum(axis=0)
+            np.add.at(grad, bag_indices, np.ones_like(rows) * scale)
+        elif mode == "mean":
+            out[bag] = rows.mean(axis=0)
+            np.add.at(grad, bag_indices, np.ones_like(rows) / len(bag_indices))
+        else:
+            out[bag] = rows.max(axis=0)
+            arg_max = rows.argmax(axis=0)
+            grad[bag_indices[arg_max], np.arange(weight.shape[1])] += 1
+    return out, grad
+
+
+def _test_embedding_bag_impl(test_case, device, mode, index_dtype):
+    weight = np.random.randn(10, 4).astype(np.float32)
+    indices = np.array([1, 2, 4, 5, 4, 3, 2, 9, 9, 0], dtype=np.int64)
+    # the third bag is empty
+    offsets = np.array([0, 3, 7, 7], dtype=np.int64)
+    m = flow.nn.EmbeddingBag(10, 4, mode=mode, _weight=flow.Tensor(weight)).to(device)
+    y = m(
+        flow.tensor(indices, dtype=index_dtype, device=flow.device(device)),
+        flow.tensor(offsets, dtype=index_dtype, device=flow.device(device)),
+    )
+    out_np, grad_np = _np_embedding_bag(weight, indices, offsets, mode)
+    test_case.assertTrue(np.allclose(y.numpy(), out_np, 1e-05, 1e-05))
+    y.sum().backward()
+    test_case.assertTrue(np.allclose(m.weight.grad.numpy(), grad_np, 1e-05, 1e-05))
+
+
+def _test_embedding_bag_2d_impl(test_case, device, mode):
+    weight = flow.randn(10, 4, device=flow.device(device))
+    indices = flow.tensor(
+        [[1, 2, 4, 5], [4, 3, 2, 9]], dtype=flow.int64, device=flow.device(device)
+    )
+    y = flow.nn.functional.embedding_bag(indices, weight, mode=mode)
+    gathered = flow.nn.functional.embedding(indices, weight)
+    if mode == "sum":
+        expected = gathered.sum(dim=1)
+    elif mode == "mean":
+        expected = gathered.mean(dim=1)
+    else:
+        expected = gathered.max(dim=1)[0]
+    test_case.assertTrue(np.allclose(y.numpy(), expected.numpy(), 1e-05, 1e-05))
+
+
+def _test_embedding_bag_per_sample_weights_impl(test_case, device, sparse):
+    weight = np.random.randn(10, 4).astype(np.float32)
+    indices = np.array([1, 2, 4, 5, 4, 3, 2, 9], dtype=np.int64)
+    offsets = np.array([0, 4], dtype=np.int64)
+    per_sample_weights = np.random.rand(8).astype(np.float32)
+    m = flow.nn.EmbeddingBag(
+        10, 4, mode="sum", sparse=sparse, _weight=flow.Tensor(weight)
+    ).to(device)
+    per_sample_weights_tensor = flow.tensor(
+        per_sample_weights, device=flow.device(device), requires_grad=True
+    )
+    y = m(
+        flow.tensor(indices, device=flow.device(device)),
+        flow.tensor(offsets, device=flow.device(device)),
+        per_sample_weights_tensor,
+    )
+    out_np, grad_np = _np_embedding_bag(
+        weight, indices, offsets, "sum", per_sample_weights
+    )
+    test_case.assertTrue(np.allclose(y.numpy(), out_np, 1e-05, 1e-05))
+    y.sum().backward()
+    if not sparse:
+        test_case.assertTrue(np.allclose(m.weight.grad.numpy(), grad_np, 1e-05, 1e-05))
+    # every per sample weight scales one looked up row
+    test_case.assertTrue(
+        np.allclose(
+            per_sample_weights_tensor.grad.numpy(),
+            weight[indices].sum(axis=1),
+            1e-05,
+            1e-05,
+        )
+    )
+
+
+def _test_embedding_bag_sparse_grad_impl(test_case, device, mode):
+    weight = np.random.randn(10, 4).astype(np.float32)
+    indices = np.array([1, 2, 4, 5, 4, 3, 2, 9], dtype=np.int64)
+    offsets = np.array([0, 3, 3], dtype=np.int64)
+    m = flow.nn.EmbeddingBag(
+        10, 4, mode=mode, sparse=True, _weight=flow.Tensor(weight)
+    ).to(device)
+    y = m(
+        flow.tensor(indices, device=flow.device(device)),
+        flow.tensor(offsets, device=flow.device(device)),
+    )
+    out_np, grad_np = _np_embedding_bag(weight, indices, offsets, mode)
+    test_case.assertTrue(np.allclose(y.numpy(), out_np, 1e-05, 1e-05))
+    y.sum().backward()
+    test_case.assertIsNone(m.weight.grad)
+    grad_indices, grad_values = flow.nn.modules.sparse.get_sparse_grad(m.weight)
+    test_case.assertEqual(grad_values.shape, flow.Size([8, 4]))
+    dense_grad = np.zeros((10, 4), dtype=np.float32)
+    np.add.at(dense_grad, grad_indices.numpy(), grad_values.numpy())
+    test_case.assertTrue(np.allclose(dense_grad, grad_np, 1e-05, 1e-05))
+
+
 @flow.unittest.skip_unless_1n1d()
 class TestEmbedding(flow.unittest.TestCase):
     def test_embedding(test_case):
@@ -156,6 +369,66 @@ class TestEmbedding(flow.unittest.TestCase):
             _test_embedding_impl(test_case, *arg)
             _test_embedding_functional_impl(test_case, *arg)
 
+    def test_embedding_sparse_grad(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        for arg in GenArgList(arg_dict):
+            _test_embedding_sparse_grad_impl(test_case, *arg)
+
+    def test_embedding_sparse_optimizer(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["optimizer"] = [
+            (flow.optim.SGD, {"lr": 0.1}),
+            (flow.optim.SGD, {"lr": 0.1, "momentum": 0.9}),
+            (flow.optim.Adam, {"lr": 0.1}),
+            (flow.optim.Adam, {"lr": 0.1, "amsgrad": True}),
+            (flow.optim.Adagrad, {"lr": 0.1, "lr_decay": 0.1}),
+            # weight decay is an L2 penalty in the dense and the sparse updates
+            (flow.optim.SGD, {"lr": 0.1, "weight_decay": 0.1}),
+            (flow.optim.SGD, {"lr": 0.1, "momentum": 0.9, "weight_decay": 0.1}),
+            (flow.optim.Adam, {"lr": 0.1, "weight_decay": 0.1}),
+            (flow.optim.Adagrad, {"lr": 0.1, "weight_decay": 0.1}),
+        ]
+        for arg in GenArgList(arg_dict):
+            _test_embedding_sparse_optimizer_impl(test_case, arg[0], *arg[1])
+
+    def test_embedding_sparse_clip_grad(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["norm_type"] = [2.0, float("inf")]
+        for arg in GenArgList(arg_dict):
+            _test_embedding_sparse_clip_grad_impl(test_case, *arg)
+
+    def test_embedding_bag(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["mode"] = ["sum", "mean", "max"]
+        arg_dict["index_dtype"] = [flow.int32, flow.int64]
+        for arg in GenArgList(arg_dict):
+            _test_embedding_bag_impl(test_case, *arg)
+
+    def test_embedding_bag_2d(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["mode"] = ["sum", "mean", "max"]
+        for arg in GenArgList(arg_dict):
+            _test_embedding_bag_2d_impl(test_case, *arg)
+
+    def test_embedding_bag_per_sample_weights(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["sparse"] = [False, True]
+        for arg in GenArgList(arg_dict):
+            _test_embedding_bag_per_sample_weights_impl(test_case, *arg)
+
+    def test_embedding_bag_sparse_grad(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["mode"] = ["sum", "mean", "max"]
+        for arg in GenArgList(arg_dict):
+            _test_embedding_bag_sparse_grad_impl(test_case, *arg)
+
 
 if __name__ == "__main__":
     unittest.main()
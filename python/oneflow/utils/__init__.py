@@ -15,3 +15,5 @@ limitations under the License.
 """
 from oneflow.framework.config_util import api_load_library_now as load_library
 from oneflow.utils.torch.from_or_to_torch_tensor import from_torch, to_torch
+from oneflow.utils.module_profiler import module_profiler
+from oneflow.utils import checkpoint
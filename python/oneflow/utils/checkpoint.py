@@ -0,0 +1,191 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import oneflow as flow
+from oneflow._oneflow_internal.autograd import AutogradFunctionBase
+
+
+def _default_generators(tensors):
+    devices = set(str(t.device) for t in tensors if t.is_local and t.is_cuda)
+    generators = [flow.default_generator]
+    for device in sorted(devices):
+        generators.append(flow._oneflow_internal.default_generator(device))
+    return generators
+
+
+def checkpoint(function, *args, preserve_rng_state=True):
+    r"""Checkpoints a part of a model in eager mode.
+
+    Checkpointing trades compute for memory. ``function`` runs without autograd in
+    the forward pass so none of its intermediate activations are saved. In the
+    backward pass the inputs are used to run ``function`` again with autograd
+    enabled and the gradients are computed through the recomputed graph.
+
+    The random number generator states are saved before the forward pass and restored
+    during the recomputation, so random ops such as dropout produce the same results.
+
+    Args:
+        function: a callable that takes ``*args`` and returns a tensor or a tuple of tensors.
+        args: the inputs of ``function``, tensors and non-tensor values are both accepted.
+        preserve_rng_state (bool): restore the random number generator states during the
+            recomputation. Default: ``True``
+
+    Returns:
+        The outputs of ``function(*args)``.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> from oneflow.utils.checkpoint import checkpoint
+        >>> linear = flow.nn.Linear(4, 4)
+        >>> x = flow.randn(2, 4, requires_grad=True)
+        >>> y = checkpoint(lambda t: linear(t).relu(), x)
+        >>> y.sum().backward()
+        >>> x.grad.shape
+        oneflow.Size([2, 4])
+
+    """
+    if not flow.is_grad_enabled():
+        return function(*args)
+
+    tensor_indices = [
+        i
+        for (i, arg) in enumerate(args)
+        if isinstance(arg, flow.Tensor) and arg.requires_grad
+    ]
+    tensor_inputs = [args[i] for i in tensor_indices]
+    if len(tensor_inputs) == 0:
+        # The parameters used in function still need grads, a dummy input makes sure
+        # the backward of the checkpoint is reached.
+        tensor_inputs = [flow.zeros(1, requires_grad=True)]
+
+    generators = []
+    rng_states = []
+    if preserve_rng_state:
+        generators = _default_generators(
+            [arg for arg in args if isinstance(arg, flow.Tensor)]
+        )
+        rng_states = [g.get_state() for g in generators]
+    is_single_output = []
+
+    def forward(ctx, *inputs):
+        outputs = function(*args)
+        is_single_output.append(isinstance(outputs, flow.Tensor))
+        if is_single_output[0]:
+            outputs = (outputs,)
+        assert all(
+            isinstance(out, flow.Tensor) for out in outputs
+        ), "the function to checkpoint must return a tensor or a tuple of tensors"
+        # The outputs of an autograd function must be new tensor objects.
+        return tuple(
+            flow._C.view(out, out.shape) if any(out is arg for arg in args) else out
+            for out in outputs
+        )
+
+    def backward(ctx, *grad_outputs):
+        detached_args = list(args)
+        detached_inputs = []
+        for i in tensor_indices:
+            detached_args[i] = args[i].detach().requires_grad_()
+            detached_inputs.append(detached_args[i])
+        prev_rng_states = [g.get_state() for g in generators]
+        for (g, state) in zip(generators, rng_states):
+            g.set_state(state)
+        try:
+            with flow.grad_enable():
+                outputs = function(*detached_args)
+        finally:
+            for (g, state) in zip(generators, prev_rng_states):
+                g.set_state(state)
+        if isinstance(outputs, flow.Tensor):
+            outputs = (outputs,)
+        outputs_with_grad = []
+        grads_with_grad = []
+        for (out, grad) in zip(outputs, grad_outputs):
+            if out.requires_grad:
+                outputs_with_grad.append(out)
+                grads_with_grad.append(grad)
+        if len(outputs_with_grad) > 0:
+            flow.autograd.backward(outputs_with_grad, grads_with_grad)
+        if len(detached_inputs) == 0:
+            return flow.zeros_like(tensor_inputs[0])
+        return tuple(
+            t.grad if t.grad is not None else flow.zeros_like(t)
+            for t in detached_inputs
+        )
+
+    outputs = AutogradFunctionBase.apply(
+        "CheckpointFunction", forward, backward, *tensor_inputs
+    )
+    if is_single_output[0]:
+        return outputs if isinstance(outputs, flow.Tensor) else outputs[0]
+    return (outputs,) if isinstance(outputs, flow.Tensor) else tuple(outputs)
+
+
+def checkpoint_sequential(functions, segments, input, preserve_rng_state=True):
+    r"""Checkpoints a sequential model in eager mode.
+
+    ``functions`` is divided into ``segments`` chunks that run one after another. All
+    the chunks except the last one are run through :func:`checkpoint`, so only their
+    inputs are kept for the backward pass.
+
+    Args:
+        functions: a :class:`oneflow.nn.Sequential` or a list of modules or functions to
+            run sequentially.
+        segments (int): the number of chunks to create in the model.
+        input (Tensor): the input of the first function.
+        preserve_rng_state (bool): restore the random number generator states during the
+            recomputation. Default: ``True``
+
+    Returns:
+        The output of running ``functions`` sequentially on ``input``.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> from oneflow.utils.checkpoint import checkpoint_sequential
+        >>> model = flow.nn.Sequential(*[flow.nn.Linear(4, 4) for _ in range(4)])
+        >>> x = flow.randn(2, 4, requires_grad=True)
+        >>> y = checkpoint_sequential(model, 2, x)
+        >>> y.sum().backward()
+
+    """
+    if isinstance(functions, flow.nn.Sequential):
+        functions = list(functions.children())
+    functions = list(functions)
+    assert segments > 0, "segments must be positive"
+
+    def run_function(start, end):
+        def forward(x):
+            for j in range(start, end):
+                x = functions[j](x)
+            return x
+
+        return forward
+
+    segment_size = max(len(functions) // segments, 1)
+    end = 0
+    for start in range(0, segment_size * (segments - 1), segment_size):
+        end = min(start + segment_size, len(functions))
+        input = checkpoint(
+            run_function(start, end), input, preserve_rng_state=preserve_rng_state
+        )
+        if end == len(functions):
+            return input
+    return run_function(end, len(functions))(input)
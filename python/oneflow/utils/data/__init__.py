@@ -36,6 +36,9 @@ from oneflow.utils.data.decorator import (
     non_deterministic,
 )
 from oneflow.utils.data.distributed import DistributedSampler
+from oneflow.utils.data.ofrecord import OFRecordDataset, build_ofrecord_index
+from oneflow.utils.data.cache import CachedDataset
+from oneflow.utils.data.sharded_file import ShardedFileDataset
 
 
 __all__ = [
@@ -57,4 +60,8 @@ __all__ = [
     "guaranteed_datapipes_determinism",
     "non_deterministic",
     "DistributedSampler",
+    "OFRecordDataset",
+    "build_ofrecord_index",
+    "CachedDataset",
+    "ShardedFileDataset",
 ]
@@ -17,6 +17,7 @@ limitations under the License.
 data from an iterable-style or map-style dataset. This logic is shared in both
 single- and multi-processing data loading.
 """
+import numpy as np
 
 
 class _BaseDatasetFetcher(object):
@@ -62,7 +63,14 @@ class _MapDatasetFetcher(_BaseDatasetFetcher):
 
     def fetch(self, possibly_batched_index):
         if self.auto_collation:
-            data = [self.dataset[idx] for idx in possibly_batched_index]
+            if hasattr(self.dataset, "__getitems__"):
+                data = self.dataset.__getitems__(possibly_batched_index)
+            else:
+                if isinstance(possibly_batched_index, np.ndarray):
+                    # array batches from the built-in samplers; hand datasets
+                    # plain Python ints as before
+                    possibly_batched_index = possibly_batched_index.tolist()
+                data = [self.dataset[idx] for idx in possibly_batched_index]
         else:
             data = self.dataset[possibly_batched_index]
         return self.collate_fn(data)
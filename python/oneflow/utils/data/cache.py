@@ -0,0 +1,271 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import contextlib
+import errno
+import fcntl
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import warnings
+import weakref
+from typing import Any, Callable, List, Optional, Sequence
+
+from oneflow.utils.data.dataset import Dataset, T_co
+
+# The cache directory holds one pickled sample per file, named after its index.
+# Files starting with "." are bookkeeping: ".lock" serializes inserts and
+# evictions across processes and stores the total size of the cached samples
+# as an int64 at offset 0; ".tmp-*" are samples being written.
+_LOCK_NAME = ".lock"
+_USAGE = struct.Struct("<q")
+# eviction frees space down to this fraction of max_bytes so that the
+# directory scan it needs runs rarely
+_EVICT_LOW_WATERMARK = 0.9
+
+# share of the free space of /dev/shm a cache there uses without an explicit
+# max_bytes, which leaves room for the DataLoader workers and NCCL using it too
+_SHM_BUDGET_FRACTION = 0.5
+
+_MISS = object()
+
+
+def _default_cache_root() -> Optional[str]:
+    # /dev/shm is RAM backed, so the cache lives in memory shared by all
+    # processes on the host
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return None
+
+
+def _in_shm(path: str) -> bool:
+    return os.path.realpath(path).startswith("/dev/shm" + os.sep)
+
+
+def _default_shm_budget(path: str) -> int:
+    stat = os.statvfs(path)
+    return max(1, int(stat.f_bavail * stat.f_frsize * _SHM_BUDGET_FRACTION))
+
+
+def _remove_cache_dir(path: str, owner_pid: int) -> None:
+    if os.getpid() == owner_pid:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class CachedDataset(Dataset[T_co]):
+    r"""Wraps a map-style dataset and caches its samples in a directory shared by
+    all processes on the host, so that expensive loading such as image decoding
+    runs once instead of every epoch in every :class:`DataLoader` worker.
+
+    The wrapped dataset should return samples before random augmentation; pass
+    the augmentations as :attr:`transform`, which is applied after the cache
+    lookup and therefore still runs on every access. Samples are pickled, so
+    they should be picklable and are best kept as NumPy arrays.
+
+    Args:
+        dataset (Dataset): map-style dataset whose samples are cached.
+        transform (callable, optional): applied to every sample after it is read
+            from the cache or loaded from :attr:`dataset`. Default: ``None``.
+        cache_dir (str, optional): directory holding the cache. By default a new
+            directory is created under ``/dev/shm`` (or the temporary directory
+            if there is no ``/dev/shm``) and removed when the process that
+            created the :class:`CachedDataset` exits. A given directory is kept
+            and reused as is, so it must only ever be used for the same dataset.
+        max_bytes (int, optional): byte budget of the cache. When it is
+            exceeded, the least recently used samples are evicted. Default:
+            ``None``, half of the space free when the dataset is created if the
+            cache is under ``/dev/shm``, which other processes such as the
+            :class:`DataLoader` workers need as well, no limit elsewhere.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> dataset = CachedDataset(decoded_images, transform=random_augment, max_bytes=64 << 30) # doctest: +SKIP
+        >>> loader = flow.utils.data.DataLoader(dataset, batch_size=256, shuffle=True, num_workers=8) # doctest: +SKIP
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        transform: Optional[Callable] = None,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes <= 0):
+            raise ValueError(
+                "max_bytes should be a positive integer value, "
+                "but got max_bytes={}".format(max_bytes)
+            )
+        self.dataset = dataset
+        self.transform = transform
+        if cache_dir is None:
+            cache_dir = tempfile.mkdtemp(
+                prefix="oneflow-cached-dataset-", dir=_default_cache_root()
+            )
+            weakref.finalize(self, _remove_cache_dir, cache_dir, os.getpid())
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+        if max_bytes is None and _in_shm(cache_dir):
+            max_bytes = _default_shm_budget(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._lock_fd = None
+        self._lock_pid = None
+        self._insert_failed = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_lock_fd"] = None
+        state["_lock_pid"] = None
+        return state
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+    def __getitem__(self, index):
+        index = self._normalize(index)
+        sample = self._lookup(index)
+        if sample is _MISS:
+            sample = self.dataset[index]
+            self._insert(index, sample)
+        return self._transform(sample)
+
+    def __getitems__(self, indices: Sequence[int]) -> List[Any]:
+        indices = [self._normalize(index) for index in indices]
+        samples = [self._lookup(index) for index in indices]
+        missing = [i for (i, sample) in enumerate(samples) if sample is _MISS]
+        if len(missing) > 0:
+            missing_indices = [indices[i] for i in missing]
+            if hasattr(self.dataset, "__getitems__"):
+                loaded = self.dataset.__getitems__(missing_indices)
+            else:
+                loaded = [self.dataset[index] for index in missing_indices]
+            for (i, index, sample) in zip(missing, missing_indices, loaded):
+                self._insert(index, sample)
+                samples[i] = sample
+        return [self._transform(sample) for sample in samples]
+
+    def _transform(self, sample):
+        return sample if self.transform is None else self.transform(sample)
+
+    def _normalize(self, index) -> int:
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError(f"index {index} out of range for {len(self)} samples")
+        return index
+
+    def _path(self, index: int) -> str:
+        return os.path.join(self.cache_dir, str(index))
+
+    def _lookup(self, index: int):
+        path = self._path(index)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return _MISS
+        if self.max_bytes is not None:
+            # the modification time orders samples for LRU eviction
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+        return pickle.loads(data)
+
+    def _insert(self, index: int, sample) -> None:
+        if self._insert_failed:
+            return
+        data = pickle.dumps(sample, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            return
+        path = self._path(index)
+        tmp_path = os.path.join(self.cache_dir, f".tmp-{os.getpid()}-{index}")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            # linking a complete file publishes the sample atomically and loses
+            # gracefully against another process inserting the same index
+            if self.max_bytes is None:
+                with contextlib.suppress(FileExistsError):
+                    os.link(tmp_path, path)
+            else:
+                with self._locked() as fd:
+                    try:
+                        os.link(tmp_path, path)
+                    except FileExistsError:
+                        return
+                    usage = self._read_usage(fd) + len(data)
+                    if usage > self.max_bytes:
+                        usage = self._evict()
+                    os.pwrite(fd, _USAGE.pack(usage), 0)
+        except OSError as e:
+            if e.errno not in (errno.ENOSPC, errno.EDQUOT):
+                raise
+            # keep serving samples uncached rather than failing the epoch
+            self._insert_failed = True
+            warnings.warn(
+                f"CachedDataset stops caching in process {os.getpid()}: {e}. "
+                "Consider setting max_bytes or a larger cache_dir."
+            )
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        if self._lock_pid != os.getpid():
+            self._lock_fd = os.open(
+                os.path.join(self.cache_dir, _LOCK_NAME), os.O_RDWR | os.O_CREAT, 0o644
+            )
+            self._lock_pid = os.getpid()
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield self._lock_fd
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_usage(fd: int) -> int:
+        data = os.pread(fd, _USAGE.size, 0)
+        return _USAGE.unpack(data)[0] if len(data) == _USAGE.size else 0
+
+    def _evict(self) -> int:
+        # Called with the lock held. The scan also recomputes the usage, which
+        # corrects any drift left by processes that died mid-insert.
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        usage = sum(size for (_, size, _) in entries)
+        target = int(self.max_bytes * _EVICT_LOW_WATERMARK)
+        entries.sort()
+        for (_, size, path) in entries:
+            if usage <= target:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            usage -= size
+        return usage
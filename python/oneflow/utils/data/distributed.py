@@ -19,6 +19,7 @@ from typing import TypeVar, Optional, Iterator
 
 import oneflow as flow
 from oneflow.utils.data import Sampler, Dataset
+from oneflow.utils.data.sampler import _DEFAULT_CHUNK_SIZE, _FeistelPermutation
 
 
 T_co = TypeVar("T_co", covariant=True)
@@ -53,6 +54,11 @@ class DistributedSampler(Sampler[T_co]):
             tail of the data to make it evenly divisible across the number of
             replicas. If ``False``, the sampler will add extra indices to make
             the data evenly divisible across the replicas. Default: ``False``.
+        chunk_size (int, optional): if given and :attr:`shuffle=True`, the
+            permutation is evaluated lazily, ``chunk_size`` indices at a time,
+            through a Feistel bijection seeded by :attr:`seed` and the epoch, so
+            no rank ever holds more than ``chunk_size`` indices. The resulting
+            order differs from the default ``randperm`` one. Default: ``None``.
 
     .. warning::
         In distributed mode, calling the :meth:`set_epoch` method at
@@ -80,6 +86,7 @@ class DistributedSampler(Sampler[T_co]):
         shuffle: bool = True,
         seed: int = 0,
         drop_last: bool = False,
+        chunk_size: Optional[int] = None,
     ) -> None:
         if num_replicas is None:
             num_replicas = flow.env.get_world_size()
@@ -117,35 +124,51 @@ class DistributedSampler(Sampler[T_co]):
         self.total_size = self.num_samples * self.num_replicas
         self.shuffle = shuffle
         self.seed = seed
+        if chunk_size is not None and (
+            not isinstance(chunk_size, int) or chunk_size <= 0
+        ):
+            raise ValueError(
+                "chunk_size should be a positive integer "
+                "value, but got chunk_size={}".format(chunk_size)
+            )
+        self.chunk_size = chunk_size
 
     def __iter__(self) -> Iterator[T_co]:
+        for chunk in self._index_chunks():
+            yield from chunk.tolist()
+
+    def _index_chunks(self) -> Iterator[np.ndarray]:
+        if self.num_samples == 0:
+            return
+        n = len(self.dataset)
+        shuffled = None
+        feistel = None
         if self.shuffle:
             # deterministically shuffle based on epoch and seed
-            g = flow.Generator("cpu")
-            g.manual_seed(self.seed + self.epoch)
-            indices = flow._C.randperm(len(self.dataset), generator=g).tolist()
-        else:
-            indices = list(range(len(self.dataset)))
-
-        if not self.drop_last:
-            # add extra samples to make it evenly divisible
-            padding_size = self.total_size - len(indices)
-            if padding_size <= len(indices):
-                indices += indices[:padding_size]
+            if self.chunk_size is None:
+                g = flow.Generator("cpu")
+                g.manual_seed(self.seed + self.epoch)
+                shuffled = flow._C.randperm(n, generator=g).numpy()
             else:
-                indices += (indices * math.ceil(padding_size / len(indices)))[
-                    :padding_size
-                ]
-        else:
-            # remove tail of data to make it evenly divisible.
-            indices = indices[: self.total_size]
-        assert len(indices) == self.total_size
-
-        # subsample
-        indices = indices[self.rank : self.total_size : self.num_replicas]
-        assert len(indices) == self.num_samples
-
-        return iter(indices)
+                feistel = _FeistelPermutation(n, self.seed + self.epoch)
+
+        # Position ``p`` of the padded (or truncated) global order holds the
+        # ``p % n``-th permuted index, and this rank owns positions
+        # ``rank, rank + num_replicas, ...``.
+        chunk_size = self.chunk_size or _DEFAULT_CHUNK_SIZE
+        for start in range(0, self.num_samples, chunk_size):
+            positions = np.arange(
+                start, min(start + chunk_size, self.num_samples), dtype=np.int64
+            )
+            positions *= self.num_replicas
+            positions += self.rank
+            if self.total_size > n:
+                np.remainder(positions, n, out=positions)
+            if shuffled is not None:
+                positions = shuffled[positions]
+            elif feistel is not None:
+                positions = feistel(positions)
+            yield positions
 
     def __len__(self) -> int:
         return self.num_samples
@@ -0,0 +1,294 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import mmap
+import os
+import struct
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+
+import oneflow.core.record.record_pb2 as record_pb
+from oneflow.utils.data.dataset import Dataset
+
+# An OFRecord part file is a sequence of records, each an int64 length followed by
+# that many bytes of serialized OFRecord. The sidecar index next to it holds
+#   magic (8 bytes) | part file size (uint64) | record count (uint64) | offsets (int64 * count)
+# where every offset points at the length prefix of a record.
+_INDEX_MAGIC = b"OFRIDX01"
+_INDEX_HEADER = struct.Struct("<8sQQ")
+_RECORD_SIZE = struct.Struct("<q")
+INDEX_SUFFIX = ".idx"
+
+# batched reads merge records that are at most this far apart into one read
+_MAX_READ_GAP = 64 * 1024
+_MAX_READ_SIZE = 16 * 1024 * 1024
+
+
+def ofrecord_part_paths(
+    ofrecord_dir: str,
+    data_part_num: int = 1,
+    part_name_prefix: str = "part-",
+    part_name_suffix_length: int = -1,
+) -> List[str]:
+    """Returns the part file paths that :class:`oneflow.nn.OFRecordReader` reads."""
+    paths = []
+    for i in range(data_part_num):
+        num = str(i)
+        zero_count = max(part_name_suffix_length - len(num), 0)
+        paths.append(
+            os.path.join(ofrecord_dir, part_name_prefix + "0" * zero_count + num)
+        )
+    return paths
+
+
+def build_ofrecord_index(part_path: str, index_path: Optional[str] = None) -> int:
+    r"""Scans an OFRecord part file and writes its sidecar index.
+
+    Args:
+        part_path (str): path of the part file.
+        index_path (str, optional): where to write the index. Default: ``part_path + ".idx"``.
+
+    Returns:
+        The number of records in the part file.
+    """
+    index_path = index_path or part_path + INDEX_SUFFIX
+    file_size = os.path.getsize(part_path)
+    offsets = []
+    with open(part_path, "rb") as f:
+        offset = 0
+        while offset < file_size:
+            prefix = f.read(_RECORD_SIZE.size)
+            (size,) = (
+                _RECORD_SIZE.unpack(prefix)
+                if len(prefix) == _RECORD_SIZE.size
+                else (-1,)
+            )
+            if size <= 0 or offset + _RECORD_SIZE.size + size > file_size:
+                raise ValueError(
+                    f"{part_path} is truncated or corrupted at offset {offset}"
+                )
+            offsets.append(offset)
+            offset += _RECORD_SIZE.size + size
+            f.seek(offset)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, file_size, len(offsets)))
+        f.write(np.asarray(offsets, dtype="<i8").tobytes())
+    os.replace(tmp_path, index_path)
+    return len(offsets)
+
+
+def load_ofrecord_index(part_path: str, index_path: Optional[str] = None) -> np.ndarray:
+    r"""Loads the record offsets of a part file from its sidecar index.
+
+    Raises ``ValueError`` if the index is missing its header or was built for a
+    different version of the part file.
+    """
+    index_path = index_path or part_path + INDEX_SUFFIX
+    with open(index_path, "rb") as f:
+        header = f.read(_INDEX_HEADER.size)
+        if len(header) != _INDEX_HEADER.size:
+            raise ValueError(f"{index_path} is not an OFRecord index")
+        (magic, file_size, num_records) = _INDEX_HEADER.unpack(header)
+        if magic != _INDEX_MAGIC:
+            raise ValueError(f"{index_path} is not an OFRecord index")
+        if file_size != os.path.getsize(part_path):
+            raise ValueError(
+                f"{index_path} is stale, rebuild it with `python -m oneflow.utils.data.ofrecord {part_path}`"
+            )
+        offsets = np.fromfile(f, dtype="<i8", count=num_records)
+    if len(offsets) != num_records:
+        raise ValueError(f"{index_path} is truncated")
+    return offsets.astype(np.int64)
+
+
+class OFRecordDataset(Dataset[Any]):
+    r"""A map-style dataset over OFRecord part files with sidecar indexes.
+
+    Every sample is located through the index built by :func:`build_ofrecord_index`
+    and read on demand with ``pread`` (or from a memory map), so the dataset supports
+    global shuffling, exact resume and sharding with
+    :class:`~oneflow.utils.data.distributed.DistributedSampler` without holding the
+    parts in memory. Batches fetched by :class:`~oneflow.utils.data.DataLoader` are
+    read with one call per run of nearby records.
+
+    Args:
+        ofrecord_dir (str): directory of the part files.
+        data_part_num (int): number of part files. Default: 1
+        part_name_prefix (str): part file name prefix. Default: ``"part-"``
+        part_name_suffix_length (int): zero padded length of the part number, -1 for
+            no padding. Default: -1
+        transform (callable, optional): applied to every sample.
+        parse (bool): whether a sample is parsed into an ``OFRecord`` message before
+            ``transform``, otherwise it is the serialized ``bytes``. Default: ``True``
+        use_mmap (bool): read through a memory map of each part instead of ``pread``.
+            Default: ``False``
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> dataset = flow.utils.data.OFRecordDataset(
+        ...     "/dataset/imagenet/train", data_part_num=256, part_name_suffix_length=5,
+        ...     transform=lambda record: record.feature["class/label"].int32_list.value[0],
+        ... ) # doctest: +SKIP
+        >>> sampler = flow.utils.data.DistributedSampler(dataset) # doctest: +SKIP
+        >>> loader = flow.utils.data.DataLoader(dataset, 64, sampler=sampler) # doctest: +SKIP
+
+    """
+
+    def __init__(
+        self,
+        ofrecord_dir: str,
+        data_part_num: int = 1,
+        part_name_prefix: str = "part-",
+        part_name_suffix_length: int = -1,
+        transform: Optional[Callable] = None,
+        parse: bool = True,
+        use_mmap: bool = False,
+    ) -> None:
+        self.part_paths = ofrecord_part_paths(
+            ofrecord_dir, data_part_num, part_name_prefix, part_name_suffix_length
+        )
+        self.transform = transform
+        self.parse = parse
+        self.use_mmap = use_mmap
+        self._offsets = []
+        self._sizes = []
+        for path in self.part_paths:
+            offsets = load_ofrecord_index(path)
+            ends = np.append(offsets[1:], os.path.getsize(path))
+            self._offsets.append(offsets + _RECORD_SIZE.size)
+            self._sizes.append(ends - offsets - _RECORD_SIZE.size)
+        self._cumulative_sizes = np.cumsum([len(o) for o in self._offsets])
+        self._files = None
+        self._files_pid = None
+
+    def __len__(self):
+        return int(self._cumulative_sizes[-1]) if len(self._cumulative_sizes) else 0
+
+    def __getstate__(self):
+        # file descriptors and maps are reopened by each DataLoader worker
+        state = self.__dict__.copy()
+        state["_files"] = None
+        state["_files_pid"] = None
+        return state
+
+    def _file(self, part):
+        if self._files_pid != os.getpid():
+            self._files = [None] * len(self.part_paths)
+            self._files_pid = os.getpid()
+        if self._files[part] is None:
+            fd = os.open(self.part_paths[part], os.O_RDONLY)
+            if self.use_mmap:
+                self._files[part] = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+                os.close(fd)
+            else:
+                self._files[part] = fd
+        return self._files[part]
+
+    def _read(self, part, offset, size) -> bytes:
+        f = self._file(part)
+        if self.use_mmap:
+            return f[offset : offset + size]
+        data = os.pread(f, size, offset)
+        if len(data) != size:
+            raise IOError(f"short read from {self.part_paths[part]} at offset {offset}")
+        return data
+
+    def _locate(self, index: int):
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError(f"index {index} out of range for {len(self)} records")
+        part = int(np.searchsorted(self._cumulative_sizes, index, side="right"))
+        local_index = index - (int(self._cumulative_sizes[part - 1]) if part else 0)
+        return (
+            part,
+            int(self._offsets[part][local_index]),
+            int(self._sizes[part][local_index]),
+        )
+
+    def _decode(self, data: bytes):
+        if self.parse:
+            record = record_pb.OFRecord()
+            record.ParseFromString(data)
+            data = record
+        if self.transform is not None:
+            data = self.transform(data)
+        return data
+
+    def __getitem__(self, index):
+        return self._decode(self._read(*self._locate(index)))
+
+    def __getitems__(self, indices: Sequence[int]) -> List[Any]:
+        locations = [self._locate(index) for index in indices]
+        order = sorted(range(len(locations)), key=lambda i: locations[i][:2])
+        samples = [None] * len(locations)
+        i = 0
+        while i < len(order):
+            (part, begin, size) = locations[order[i]]
+            end = begin + size
+            j = i + 1
+            while j < len(order):
+                (next_part, next_begin, next_size) = locations[order[j]]
+                if (
+                    next_part != part
+                    or next_begin - end > _MAX_READ_GAP
+                    or next_begin + next_size - begin > _MAX_READ_SIZE
+                ):
+                    break
+                end = max(end, next_begin + next_size)
+                j += 1
+            data = self._read(part, begin, end - begin)
+            for k in order[i:j]:
+                (_, offset, size) = locations[k]
+                samples[k] = data[offset - begin : offset - begin + size]
+            i = j
+        return [self._decode(sample) for sample in samples]
+
+
+def _main():
+    parser = argparse.ArgumentParser(
+        description="Build the sidecar indexes used by oneflow.utils.data.OFRecordDataset"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="OFRecord part files, or directories whose files starting with --part_name_prefix are indexed",
+    )
+    parser.add_argument("--part_name_prefix", default="part-")
+    args = parser.parse_args()
+    part_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            part_paths.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.startswith(args.part_name_prefix)
+                and not name.endswith(INDEX_SUFFIX)
+            )
+        else:
+            part_paths.append(path)
+    for part_path in part_paths:
+        num_records = build_ofrecord_index(part_path)
+        print(f"{part_path}: {num_records} records")
+
+
+if __name__ == "__main__":
+    _main()
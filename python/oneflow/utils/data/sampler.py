@@ -21,6 +21,86 @@ import oneflow as flow
 
 T_co = TypeVar("T_co", covariant=True)
 
+# Number of indices materialized at a time by the array-backed samplers below.
+_DEFAULT_CHUNK_SIZE = 65536
+
+
+class _FeistelPermutation(object):
+    r"""A seeded bijection on ``[0, n)`` that can be evaluated at arbitrary
+    positions, so that a random permutation can be generated chunk by chunk in
+    O(chunk) memory instead of materializing ``randperm(n)``.
+
+    A balanced Feistel network permutes ``[0, 4^k)`` with ``4^k >= n``; values
+    that land outside ``[0, n)`` are re-encrypted ("cycle walking") until they
+    fall inside, which keeps the mapping a bijection on ``[0, n)``. Since
+    ``4^k < 4n`` the expected number of walks per element is below 4.
+    """
+
+    _NUM_ROUNDS = 4
+
+    def __init__(self, n: int, seed: int) -> None:
+        assert n > 0, n
+        self.n = n
+        self._half_bits = np.uint64(max(1, ((n - 1).bit_length() + 1) // 2))
+        self._mask = np.uint64((1 << int(self._half_bits)) - 1)
+        self._keys = np.random.SeedSequence(seed % (1 << 64)).generate_state(
+            self._NUM_ROUNDS, dtype=np.uint64
+        )
+
+    @staticmethod
+    def _mix(x, key):
+        # splitmix64 finalizer; uint64 arithmetic wraps around on purpose
+        x = (x ^ key) * np.uint64(0xBF58476D1CE4E5B9)
+        x ^= x >> np.uint64(31)
+        x *= np.uint64(0x94D049BB133111EB)
+        x ^= x >> np.uint64(29)
+        return x
+
+    def _encrypt(self, x):
+        left = x >> self._half_bits
+        right = x & self._mask
+        for key in self._keys:
+            left, right = right, left ^ (self._mix(right, key) & self._mask)
+        return (left << self._half_bits) | right
+
+    def __call__(self, positions: np.ndarray) -> np.ndarray:
+        with np.errstate(over="ignore"):
+            out = self._encrypt(np.asarray(positions, dtype=np.uint64))
+            n = np.uint64(self.n)
+            pending = np.flatnonzero(out >= n)
+            while pending.size > 0:
+                walked = self._encrypt(out[pending])
+                out[pending] = walked
+                pending = pending[walked >= n]
+        return out.astype(np.int64)
+
+
+def _draw_seed(generator) -> int:
+    if generator is None:
+        return int(np.random.randint(0, np.iinfo(np.int64).max))
+    return int(
+        flow._C.randint(
+            high=np.iinfo(np.int64).max,
+            size=(1,),
+            dtype=flow.int64,
+            generator=generator,
+        ).numpy()[0]
+    )
+
+
+def _has_index_chunks(sampler) -> bool:
+    # A subclass that overrides ``__iter__`` but not ``_index_chunks`` has to
+    # keep being iterated through its own ``__iter__``.
+    for klass in type(sampler).__mro__:
+        if "__iter__" in vars(klass):
+            return "_index_chunks" in vars(klass)
+    return False
+
+
+def _split(indices: np.ndarray, chunk_size: int) -> Iterator[np.ndarray]:
+    for start in range(0, indices.shape[0], chunk_size):
+        yield indices[start : start + chunk_size]
+
 
 class Sampler(Generic[T_co]):
     r"""Base class for all Samplers.
@@ -82,6 +162,11 @@ class SequentialSampler(Sampler[int]):
     def __iter__(self):
         return iter(range(len(self.data_source)))
 
+    def _index_chunks(self) -> Iterator[np.ndarray]:
+        n = len(self.data_source)
+        for start in range(0, n, _DEFAULT_CHUNK_SIZE):
+            yield np.arange(start, min(start + _DEFAULT_CHUNK_SIZE, n), dtype=np.int64)
+
     def __len__(self) -> int:
         return len(self.data_source)
 
@@ -96,6 +181,11 @@ class RandomSampler(Sampler[int]):
         num_samples (int): number of samples to draw, default=`len(dataset)`. This argument
             is supposed to be specified only when `replacement` is ``True``.
         generator (Generator): Generator used in sampling.
+        chunk_size (int, optional): if given, the permutation is evaluated lazily,
+            ``chunk_size`` indices at a time, through a seeded Feistel bijection
+            instead of materializing ``randperm(len(dataset))``, so memory stays
+            O(chunk_size) regardless of the dataset size. The resulting order
+            differs from the ``randperm`` one. Default: ``None``.
     """
     data_source: Sized
     replacement: bool
@@ -106,11 +196,21 @@ class RandomSampler(Sampler[int]):
         replacement: bool = False,
         num_samples: Optional[int] = None,
         generator=None,
+        chunk_size: Optional[int] = None,
     ) -> None:
         self.data_source = data_source
         self.replacement = replacement
         self._num_samples = num_samples
         self.generator = generator
+        self.chunk_size = chunk_size
+
+        if chunk_size is not None and (
+            not isinstance(chunk_size, int) or chunk_size <= 0
+        ):
+            raise ValueError(
+                "chunk_size should be a positive integer "
+                "value, but got chunk_size={}".format(chunk_size)
+            )
 
         if not isinstance(self.replacement, bool):
             raise TypeError(
@@ -138,7 +238,19 @@ class RandomSampler(Sampler[int]):
         return self._num_samples
 
     def __iter__(self):
+        for chunk in self._index_chunks():
+            yield from chunk.tolist()
+
+    def _index_chunks(self) -> Iterator[np.ndarray]:
         n = len(self.data_source)
+        chunk_size = self.chunk_size or _DEFAULT_CHUNK_SIZE
+        if self.chunk_size is not None and not self.replacement:
+            permutation = _FeistelPermutation(n, _draw_seed(self.generator))
+            for start in range(0, n, chunk_size):
+                yield permutation(
+                    np.arange(start, min(start + chunk_size, n), dtype=np.int64)
+                )
+            return
         if self.generator is None:
             generator = flow.Generator("cpu")
             generator.manual_seed(np.random.randint(0, np.iinfo(np.int64).max))
@@ -149,18 +261,17 @@ class RandomSampler(Sampler[int]):
         else:
             generator = self.generator
         if self.replacement:
-            for _ in range(self.num_samples // 32):
-                yield from flow._C.randint(
-                    high=n, size=(32,), dtype=flow.int64, generator=generator
-                ).numpy().tolist()
-            yield from flow._C.randint(
-                high=n,
-                size=(self.num_samples % 32,),
-                dtype=flow.int64,
-                generator=generator,
-            ).numpy().tolist()
+            for start in range(0, self.num_samples, chunk_size):
+                yield flow._C.randint(
+                    high=n,
+                    size=(min(chunk_size, self.num_samples - start),),
+                    dtype=flow.int64,
+                    generator=generator,
+                ).numpy()
         else:
-            yield from flow._C.randperm(n, generator=generator).numpy().tolist()
+            yield from _split(
+                flow._C.randperm(n, generator=generator).numpy(), chunk_size
+            )
 
     def __len__(self):
         return self.num_samples
@@ -192,6 +303,11 @@ class SubsetRandomSampler(Sampler[int]):
 class BatchSampler(Sampler[List[int]]):
     r"""Wraps another sampler to yield a mini-batch of indices.
 
+    When the base sampler is one of the samplers of this module (including
+    :class:`~flow.utils.data.DistributedSampler`), its indices are consumed as
+    NumPy int64 arrays and every mini-batch is an array slice. Any other
+    iterable yields mini-batches as lists.
+
     Args:
         sampler (Sampler or Iterable): Base sampler. Can be any iterable object
         batch_size (int): Size of mini-batch.
@@ -199,9 +315,9 @@ class BatchSampler(Sampler[List[int]]):
             its size would be less than ``batch_size``
 
     Example:
-        >>> list(BatchSampler(SequentialSampler(range(10)), batch_size=3, drop_last=False))
+        >>> [b.tolist() for b in BatchSampler(SequentialSampler(range(10)), batch_size=3, drop_last=False)]
         [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
-        >>> list(BatchSampler(SequentialSampler(range(10)), batch_size=3, drop_last=True))
+        >>> [b.tolist() for b in BatchSampler(SequentialSampler(range(10)), batch_size=3, drop_last=True)]
         [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
     """
 
@@ -228,6 +344,9 @@ class BatchSampler(Sampler[List[int]]):
         self.drop_last = drop_last
 
     def __iter__(self):
+        if _has_index_chunks(self.sampler):
+            yield from self._iter_arrays()
+            return
         batch = []
         for idx in self.sampler:
             batch.append(idx)
@@ -237,6 +356,18 @@ class BatchSampler(Sampler[List[int]]):
         if len(batch) > 0 and not self.drop_last:
             yield batch
 
+    def _iter_arrays(self):
+        remainder = np.empty((0,), dtype=np.int64)
+        for chunk in self.sampler._index_chunks():
+            if remainder.shape[0] > 0:
+                chunk = np.concatenate((remainder, chunk))
+            num_full = chunk.shape[0] - chunk.shape[0] % self.batch_size
+            for start in range(0, num_full, self.batch_size):
+                yield chunk[start : start + self.batch_size]
+            remainder = chunk[num_full:]
+        if remainder.shape[0] > 0 and not self.drop_last:
+            yield remainder
+
     def __len__(self):
         # Can only be called if self.sampler has __len__ implemented
         # We cannot enforce this condition, so we turn off typechecking for the
@@ -0,0 +1,468 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import glob
+import itertools
+import json
+import os
+import random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+import oneflow as flow
+from oneflow.utils.data._utils.worker import get_worker_info
+from oneflow.utils.data.dataset import IterableDataset
+
+_FORMATS = ("jsonl", "npy", "raw")
+# every _JSONL_INDEX_STRIDE-th record of a jsonl shard has its byte offset indexed
+_JSONL_INDEX_STRIDE = 4096
+# the bytes stripped by bytes.strip(), a line made of them only is not a record
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[list(b" \t\n\r\x0b\x0c")] = True
+
+
+class _ShardLayout(object):
+    __slots__ = (
+        "path",
+        "data_offset",
+        "num_records",
+        "record_size",
+        "dtype",
+        "shape",
+        "record_offsets",
+    )
+
+    def __init__(
+        self,
+        path,
+        data_offset,
+        num_records,
+        record_size,
+        dtype=None,
+        shape=None,
+        record_offsets=None,
+    ):
+        self.path = path
+        self.data_offset = data_offset
+        self.num_records = num_records
+        # None for variable-length records (jsonl lines)
+        self.record_size = record_size
+        self.dtype = dtype
+        self.shape = shape
+        # byte offsets of every _JSONL_INDEX_STRIDE-th jsonl record
+        self.record_offsets = record_offsets
+
+
+def _read_jsonl_layout(path: str, chunk_size: int) -> _ShardLayout:
+    # Counts the non-blank lines in one sequential pass, and indexes the offset of
+    # every _JSONL_INDEX_STRIDE-th one so that readers can seek to any record.
+    num_records = 0
+    record_offsets = []
+    chunk_offset = 0
+    # start of the line that runs past the current chunk, and whether it is blank so far
+    line_start = 0
+    line_blank = True
+    with open(path, "rb") as f:
+        while True:
+            chunk = np.frombuffer(f.read(chunk_size), dtype=np.uint8)
+            if len(chunk) == 0:
+                break
+            newlines = np.flatnonzero(chunk == ord("\n"))
+            non_blank = np.concatenate(
+                [[0], np.cumsum(~_WHITESPACE[chunk], dtype=np.int64)]
+            )
+            begins = np.concatenate([[0], newlines + 1])
+            if len(newlines) > 0:
+                # the lines ending in this chunk
+                is_record = non_blank[newlines] > non_blank[begins[:-1]]
+                is_record[0] |= not line_blank
+                starts = np.concatenate([[line_start], chunk_offset + begins[1:-1]])[
+                    is_record
+                ]
+                first = -num_records % _JSONL_INDEX_STRIDE
+                record_offsets.extend(starts[first::_JSONL_INDEX_STRIDE].tolist())
+                num_records += len(starts)
+                line_start = chunk_offset + begins[-1]
+                line_blank = True
+            line_blank &= bool(non_blank[-1] == non_blank[begins[-1]])
+            chunk_offset += len(chunk)
+    if not line_blank:
+        # the last line has no trailing newline
+        if num_records % _JSONL_INDEX_STRIDE == 0:
+            record_offsets.append(line_start)
+        num_records += 1
+    return _ShardLayout(
+        path,
+        0,
+        num_records,
+        None,
+        record_offsets=np.array(record_offsets, dtype=np.int64),
+    )
+
+
+def _read_npy_layout(path: str) -> _ShardLayout:
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            (shape, fortran_order, dtype) = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            (shape, fortran_order, dtype) = np.lib.format.read_array_header_2_0(f)
+        else:
+            raise ValueError(f"unsupported npy format version {version} in {path}")
+        data_offset = f.tell()
+    if dtype.hasobject:
+        raise ValueError(f"{path} holds Python objects, which cannot be streamed")
+    if len(shape) == 0:
+        raise ValueError(f"{path} holds a scalar, expected at least one dimension")
+    if fortran_order and len(shape) > 1:
+        raise ValueError(f"{path} is Fortran ordered, its rows are not contiguous")
+    record_size = dtype.itemsize * int(np.prod(shape[1:], dtype=np.int64))
+    if os.path.getsize(path) < data_offset + shape[0] * record_size:
+        raise ValueError(f"{path} is truncated")
+    return _ShardLayout(path, data_offset, shape[0], record_size, dtype, shape[1:])
+
+
+class ShardedFileDataset(IterableDataset):
+    r"""Streams samples from a set of local file shards, splitting them between
+    ranks and :class:`~flow.utils.data.DataLoader` workers so that every sample
+    is read once per epoch, padding aside, without any user code.
+
+    Each epoch, the shards are (optionally) shuffled with :attr:`seed` and the
+    epoch, and concatenated. The concatenation is cut into ``num_replicas``
+    contiguous ranges of the same number of records, one per rank, and every rank
+    range into one range per worker. Every worker reads one long sequential
+    stretch spanning one or a few shards, whatever the number of shards, workers
+    and nodes.
+
+    Every rank yields the same number of samples, as distributed training needs.
+    Like :class:`~flow.utils.data.DistributedSampler`, when the number of records
+    does not divide evenly between the ranks, the last ranks are padded with
+    records from the beginning of the epoch, or with :attr:`drop_last` the
+    records past the last full share are dropped. ``len(dataset)`` is the number
+    of samples per rank.
+
+    Supported formats:
+
+    * ``"jsonl"``: one JSON document per line, yields the parsed objects. Blank
+      lines are skipped. The shards are scanned once, when the dataset is
+      created, to count and index their lines.
+    * ``"npy"``: NumPy ``.npy`` files, yields the rows (sub-arrays along the
+      first dimension).
+    * ``"raw"``: fixed-size binary records of :attr:`record_size` bytes, yields
+      ``bytes``.
+
+    Args:
+        shards (str or sequence of str): shard paths, or a glob pattern matching
+            them.
+        format (str): ``"jsonl"``, ``"npy"`` or ``"raw"``. Default: ``"jsonl"``.
+        record_size (int, optional): record size in bytes, required by ``"raw"``.
+        transform (callable, optional): applied to every sample. Default: ``None``.
+        shuffle_shards (bool): shuffle the shard order every epoch. Default: ``True``.
+        shuffle_buffer_size (int): size of the buffer each worker draws its samples
+            from at random, ``0`` keeps the file order. Default: ``0``.
+        seed (int): seed of the shard and buffer shuffles, which must be identical
+            across ranks. Default: ``0``.
+        num_replicas (int, optional): number of ranks. By default the world size.
+        rank (int, optional): rank of this process. By default the current rank.
+        drop_last (bool): drop the records that do not divide evenly between the
+            ranks instead of padding the last ranks. Default: ``False``.
+        batch_size (int, optional): batch size of the :class:`DataLoader`, only
+            needed to resume in the middle of an epoch with ``num_workers > 0``.
+        read_buffer_size (int): size of the reads issued to the shards in bytes.
+            Default: 8 MiB.
+
+    The samples each worker yields only depend on the seed, the epoch, the rank,
+    the worker id and the numbers of ranks and workers. This makes resuming exact:
+    save :meth:`state_dict` with the number of samples this rank has consumed in
+    the current epoch, and :meth:`load_state_dict` it into a dataset fed to a
+    :class:`DataLoader` with the same configuration. With ``num_workers > 0``, the
+    :class:`DataLoader` takes its batches from the workers in turn, and each worker
+    works out its share of the consumed samples from :attr:`batch_size`. Past
+    the point where the first worker runs out of data, at the very end of an
+    epoch, that share is no longer exact.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> dataset = ShardedFileDataset("/data/train-*.jsonl", shuffle_buffer_size=10000, batch_size=64) # doctest: +SKIP
+        >>> loader = flow.utils.data.DataLoader(dataset, batch_size=64, num_workers=4) # doctest: +SKIP
+        >>> for epoch in range(start_epoch, n_epochs): # doctest: +SKIP
+        ...     dataset.set_epoch(epoch)
+        ...     for step, batch in enumerate(loader):
+        ...         train(batch)
+        ...         checkpoint["data"] = dataset.state_dict((step + 1) * 64)
+    """
+
+    def __init__(
+        self,
+        shards: Union[str, Sequence[str]],
+        format: str = "jsonl",
+        record_size: Optional[int] = None,
+        transform: Optional[Callable] = None,
+        shuffle_shards: bool = True,
+        shuffle_buffer_size: int = 0,
+        seed: int = 0,
+        num_replicas: Optional[int] = None,
+        rank: Optional[int] = None,
+        drop_last: bool = False,
+        batch_size: Optional[int] = None,
+        read_buffer_size: int = 8 * 1024 * 1024,
+    ) -> None:
+        super(ShardedFileDataset, self).__init__()
+        if isinstance(shards, str):
+            paths = sorted(glob.glob(shards))
+        else:
+            paths = list(shards)
+        if len(paths) == 0:
+            raise ValueError("no shards found in {}".format(shards))
+        if format not in _FORMATS:
+            raise ValueError(
+                "format should be one of {}, but got format={}".format(_FORMATS, format)
+            )
+        if format == "raw" and (not isinstance(record_size, int) or record_size <= 0):
+            raise ValueError(
+                "raw shards need a positive integer record_size, "
+                "but got record_size={}".format(record_size)
+            )
+        if shuffle_buffer_size < 0:
+            raise ValueError(
+                "shuffle_buffer_size should be a non-negative integer, "
+                "but got shuffle_buffer_size={}".format(shuffle_buffer_size)
+            )
+        if num_replicas is None:
+            num_replicas = flow.env.get_world_size()
+        if rank is None:
+            rank = flow.env.get_rank()
+        if rank >= num_replicas or rank < 0:
+            raise ValueError(
+                "Invalid rank {}, rank should be in the interval"
+                " [0, {}]".format(rank, num_replicas - 1)
+            )
+        self.paths = paths
+        self.format = format
+        self.record_size = record_size
+        self.transform = transform
+        self.shuffle_shards = shuffle_shards
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.seed = seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.drop_last = drop_last
+        self.batch_size = batch_size
+        self.read_buffer_size = read_buffer_size
+        self.epoch = 0
+        self._resume_epoch = None
+        self._resume_num_samples = 0
+        self._layouts = None
+        # read once here rather than in every DataLoader worker
+        self._get_layouts()
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch, which reshuffles the shards and the shuffle buffers."""
+        self.epoch = epoch
+
+    def state_dict(self, num_samples: int) -> Dict[str, int]:
+        """Returns the position of this rank after it consumed ``num_samples``
+        samples of the current epoch."""
+        return {"epoch": self.epoch, "num_samples": num_samples}
+
+    def load_state_dict(self, state_dict: Dict[str, int]) -> None:
+        """Resumes from a :meth:`state_dict`: the epoch is set, and the next
+        iteration over that epoch skips the samples that were consumed."""
+        self.epoch = state_dict["epoch"]
+        self._resume_epoch = state_dict["epoch"]
+        self._resume_num_samples = state_dict["num_samples"]
+
+    def _get_layouts(self) -> List[_ShardLayout]:
+        if self._layouts is None:
+            layouts = [self._read_layout(path) for path in self.paths]
+            for layout in layouts[1:]:
+                if (layout.dtype, layout.shape) != (layouts[0].dtype, layouts[0].shape):
+                    raise ValueError(
+                        f"rows of {layout.path} ({layout.dtype}, {layout.shape}) differ "
+                        f"from rows of {layouts[0].path} "
+                        f"({layouts[0].dtype}, {layouts[0].shape})"
+                    )
+            self._layouts = layouts
+        return self._layouts
+
+    def _read_layout(self, path: str) -> _ShardLayout:
+        if self.format == "npy":
+            return _read_npy_layout(path)
+        if self.format == "jsonl":
+            return _read_jsonl_layout(path, self.read_buffer_size)
+        size = os.path.getsize(path)
+        if size % self.record_size != 0:
+            raise ValueError(
+                f"size {size} of {path} is not a multiple of "
+                f"record_size {self.record_size}"
+            )
+        return _ShardLayout(path, 0, size // self.record_size, self.record_size)
+
+    def _segments(self, worker_id: int, num_workers: int):
+        # Returns the (layout, begin, end) record ranges of the shards this worker
+        # reads, in order.
+        layouts = self._get_layouts()
+        order = np.arange(len(layouts))
+        if self.shuffle_shards:
+            order = np.random.default_rng([self.seed, self.epoch]).permutation(order)
+        layouts = [layouts[i] for i in order]
+        total = sum(layout.num_records for layout in layouts)
+        num_samples = self._num_samples(total)
+        lo = self.rank * num_samples + num_samples * worker_id // num_workers
+        hi = self.rank * num_samples + num_samples * (worker_id + 1) // num_workers
+        segments = []
+        while lo < hi:
+            # past the end of the epoch, the ranks are padded from its beginning
+            begin = lo % total
+            end = min(total, begin + hi - lo)
+            start = 0
+            for layout in layouts:
+                stop = start + layout.num_records
+                if stop > begin and start < end:
+                    segments.append(
+                        (layout, max(begin, start) - start, min(end, stop) - start)
+                    )
+                start = stop
+            lo += end - begin
+        return segments
+
+    def _num_samples(self, total: int) -> int:
+        # number of samples every rank yields in an epoch
+        if self.drop_last:
+            return total // self.num_replicas
+        return (total + self.num_replicas - 1) // self.num_replicas
+
+    def __len__(self) -> int:
+        return self._num_samples(
+            sum(layout.num_records for layout in self._get_layouts())
+        )
+
+    def _read_fixed(self, layout: _ShardLayout, begin: int, end: int):
+        record_size = layout.record_size
+        chunk_records = max(1, self.read_buffer_size // record_size)
+        with open(layout.path, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            f.seek(layout.data_offset + begin * record_size)
+            remaining = end - begin
+            while remaining > 0:
+                count = min(chunk_records, remaining)
+                chunk = f.read(count * record_size)
+                if len(chunk) != count * record_size:
+                    raise EOFError(f"{layout.path} is truncated")
+                for offset in range(0, len(chunk), record_size):
+                    yield chunk[offset : offset + record_size]
+                remaining -= count
+
+    def _read_lines(self, layout: _ShardLayout, begin: int, end: int):
+        with open(layout.path, "rb", buffering=self.read_buffer_size) as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            # seek to the closest indexed record and read up to `begin` from there
+            f.seek(int(layout.record_offsets[begin // _JSONL_INDEX_STRIDE]))
+            skip = begin % _JSONL_INDEX_STRIDE
+            remaining = end - begin
+            while remaining > 0:
+                line = f.readline()
+                if not line:
+                    raise EOFError(f"{layout.path} is truncated")
+                if not line.strip():
+                    continue
+                if skip > 0:
+                    skip -= 1
+                    continue
+                remaining -= 1
+                yield line
+
+    def _records(self, segments, skip: int) -> Iterator[bytes]:
+        # `skip` leading records are seeked over
+        for (layout, begin, end) in segments:
+            skipped = min(skip, end - begin)
+            skip -= skipped
+            if begin + skipped == end:
+                continue
+            if layout.record_size is None:
+                yield from self._read_lines(layout, begin + skipped, end)
+            else:
+                yield from self._read_fixed(layout, begin + skipped, end)
+
+    def _shuffle(self, records: Iterator[bytes], rng: random.Random):
+        buffer = []
+        for record in records:
+            if len(buffer) < self.shuffle_buffer_size:
+                buffer.append(record)
+                continue
+            i = rng.randrange(len(buffer))
+            yield buffer[i]
+            buffer[i] = record
+        rng.shuffle(buffer)
+        yield from buffer
+
+    def _decode(self, record: bytes, layout: _ShardLayout):
+        if self.format == "jsonl":
+            return json.loads(record)
+        if self.format == "npy":
+            return (
+                np.frombuffer(record, dtype=layout.dtype).reshape(layout.shape).copy()
+            )
+        return record
+
+    def _resume_position(self, worker_id: int, num_workers: int):
+        # Returns the worker whose stream this worker continues and how many of
+        # its samples were already consumed.
+        if self._resume_epoch != self.epoch or self._resume_num_samples == 0:
+            return (worker_id, 0)
+        if get_worker_info() is None:
+            return (worker_id, self._resume_num_samples)
+        if self.batch_size is None:
+            raise ValueError(
+                "resuming with DataLoader workers needs the batch_size of the DataLoader"
+            )
+        # The DataLoader takes batch k from worker k % num_workers, and a resumed
+        # DataLoader starts over from worker 0, so worker 0 takes over the worker
+        # the next batch would have come from.
+        num_batches = self._resume_num_samples // self.batch_size
+        worker_id = (worker_id + num_batches) % num_workers
+        (rounds, extra) = divmod(num_batches, num_workers)
+        return (worker_id, (rounds + (1 if worker_id < extra else 0)) * self.batch_size)
+
+    def __iter__(self) -> Iterator[Any]:
+        worker_info = get_worker_info()
+        if worker_info is None:
+            (worker_id, num_workers) = (0, 1)
+        else:
+            (worker_id, num_workers) = (worker_info.id, worker_info.num_workers)
+        (worker_id, skip) = self._resume_position(worker_id, num_workers)
+        segments = self._segments(worker_id, num_workers)
+        if self.shuffle_buffer_size > 0:
+            # replay the stream, without decoding, up to the resume point
+            rng = random.Random(
+                int(
+                    np.random.SeedSequence(
+                        [self.seed, self.epoch, self.rank, worker_id]
+                    ).generate_state(1)[0]
+                )
+            )
+            records = self._shuffle(self._records(segments, 0), rng)
+            records = itertools.islice(records, skip, None)
+        else:
+            records = self._records(segments, skip)
+        layout = self._get_layouts()[0]
+        for record in records:
+            sample = self._decode(record, layout)
+            yield sample if self.transform is None else self.transform(sample)
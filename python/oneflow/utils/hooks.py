@@ -0,0 +1,160 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import weakref
+
+import oneflow as flow
+from oneflow._oneflow_internal.autograd import AutogradFunctionBase
+
+
+class RemovableHandle(object):
+    r"""A handle which provides the capability to remove a hook."""
+
+    next_id = 0
+
+    def __init__(self, hooks_dict):
+        self.hooks_dict_ref = weakref.ref(hooks_dict)
+        self.id = RemovableHandle.next_id
+        RemovableHandle.next_id += 1
+
+    def remove(self):
+        hooks_dict = self.hooks_dict_ref()
+        if hooks_dict is not None and self.id in hooks_dict:
+            del hooks_dict[self.id]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.remove()
+
+
+def _view_as_new_tensors(tensors):
+    # The outputs of an autograd function must be new tensor objects, a same-shape view
+    # shares the storage so that no data is copied.
+    return tuple(flow._C.view(t, t.shape) for t in tensors)
+
+
+class BackwardHook(object):
+    r"""Runs the module full backward hooks and backward pre hooks.
+
+    The tensor inputs and outputs of a module call are wrapped by identity autograd
+    functions. The output function observes ``grad_output`` when the gradients reach
+    the module, the input function observes ``grad_input`` when they leave it.
+    """
+
+    def __init__(self, module, full_hooks, pre_hooks):
+        self.module = module
+        self.full_hooks = full_hooks
+        self.pre_hooks = pre_hooks
+        self.n_inputs = 0
+        self.input_indices = []
+        self.grad_outputs = None
+
+    def _call_full_hooks(self, grad_inputs):
+        for hook in self.full_hooks:
+            result = hook(self.module, grad_inputs, self.grad_outputs)
+            if result is not None:
+                if not isinstance(result, tuple):
+                    result = (result,)
+                assert len(result) == len(
+                    grad_inputs
+                ), "backward hook returned {} gradients but the module has {} inputs".format(
+                    len(result), len(grad_inputs)
+                )
+                grad_inputs = result
+        return grad_inputs
+
+    def setup_input_hook(self, args):
+        self.n_inputs = len(args)
+        self.input_indices = [
+            i
+            for (i, arg) in enumerate(args)
+            if isinstance(arg, flow.Tensor) and arg.requires_grad
+        ]
+        if len(self.input_indices) == 0 or len(self.full_hooks) == 0:
+            return args
+
+        def forward(ctx, *tensors):
+            return _view_as_new_tensors(tensors)
+
+        def backward(ctx, *grads):
+            grad_inputs = [None] * self.n_inputs
+            for (i, grad) in zip(self.input_indices, grads):
+                grad_inputs[i] = grad
+            grad_inputs = self._call_full_hooks(tuple(grad_inputs))
+            return tuple(grad_inputs[i] for i in self.input_indices)
+
+        new_tensors = AutogradFunctionBase.apply(
+            "BackwardHookFunction",
+            forward,
+            backward,
+            *[args[i] for i in self.input_indices]
+        )
+        if isinstance(new_tensors, flow.Tensor):
+            new_tensors = (new_tensors,)
+        args = list(args)
+        for (i, t) in zip(self.input_indices, new_tensors):
+            args[i] = t
+        return tuple(args)
+
+    def setup_output_hook(self, result):
+        is_tensor = isinstance(result, flow.Tensor)
+        outputs = (result,) if is_tensor else result
+        if not isinstance(outputs, (tuple, list)):
+            return result
+        output_indices = [
+            i
+            for (i, out) in enumerate(outputs)
+            if isinstance(out, flow.Tensor) and out.requires_grad
+        ]
+        if len(output_indices) == 0:
+            return result
+        n_outputs = len(outputs)
+
+        def forward(ctx, *tensors):
+            return _view_as_new_tensors(tensors)
+
+        def backward(ctx, *grads):
+            grad_outputs = [None] * n_outputs
+            for (i, grad) in zip(output_indices, grads):
+                grad_outputs[i] = grad
+            grad_outputs = tuple(grad_outputs)
+            for hook in self.pre_hooks:
+                hook_result = hook(self.module, grad_outputs)
+                if hook_result is not None:
+                    if not isinstance(hook_result, tuple):
+                        hook_result = (hook_result,)
+                    grad_outputs = hook_result
+            self.grad_outputs = grad_outputs
+            if len(self.input_indices) == 0:
+                # No gradient flows to the inputs so the full hooks are called here.
+                self._call_full_hooks((None,) * self.n_inputs)
+            return tuple(grad_outputs[i] for i in output_indices)
+
+        new_tensors = AutogradFunctionBase.apply(
+            "BackwardHookFunction",
+            forward,
+            backward,
+            *[outputs[i] for i in output_indices]
+        )
+        if isinstance(new_tensors, flow.Tensor):
+            new_tensors = (new_tensors,)
+        if is_tensor:
+            return new_tensors[0]
+        new_outputs = list(outputs)
+        for (i, t) in zip(output_indices, new_tensors):
+            new_outputs[i] = t
+        return type(outputs)(new_outputs)
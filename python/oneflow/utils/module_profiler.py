@@ -0,0 +1,212 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import time
+
+import oneflow as flow
+
+
+def _tensor_bytes(tensor):
+    return tensor.nelement() * tensor.element_size()
+
+
+def _output_bytes(output):
+    if isinstance(output, flow.Tensor):
+        return _tensor_bytes(output)
+    if isinstance(output, (tuple, list)):
+        return sum(_output_bytes(o) for o in output)
+    if isinstance(output, dict):
+        return sum(_output_bytes(o) for o in output.values())
+    return 0
+
+
+class ModuleStats(object):
+    r"""The statistics of a named submodule collected by :class:`module_profiler`.
+
+    Times are in milliseconds and memory sizes are in bytes. ``activation_bytes`` is
+    the size of the outputs produced by the module in the profiled steps, which are
+    held until backward when autograd is enabled.
+    """
+
+    def __init__(self, name, module_type):
+        self.name = name
+        self.module_type = module_type
+        self.forward_calls = 0
+        self.backward_calls = 0
+        self.forward_time_total = 0.0
+        self.backward_time_total = 0.0
+        self.activation_bytes = 0
+        self.param_bytes = 0
+        self.grad_bytes = 0
+
+    def __repr__(self):
+        return "<ModuleStats name={} type={} forward_time_total={:.3f} backward_time_total={:.3f}>".format(
+            self.name,
+            self.module_type,
+            self.forward_time_total,
+            self.backward_time_total,
+        )
+
+
+_SORT_KEYS = (
+    "forward_time_total",
+    "backward_time_total",
+    "activation_bytes",
+    "param_bytes",
+    "grad_bytes",
+)
+
+
+class module_profiler(object):
+    r"""Context manager that reports the cost of every named submodule of a model.
+
+    It uses forward hooks and full backward hooks to measure, for each submodule, the
+    forward time, the backward time and the size of the activations it produces. The
+    parameter and gradient sizes are collected when leaving the context. All the values
+    of a module include its children.
+
+    Args:
+        model (oneflow.nn.Module): the model to profile.
+        synchronize (bool): wait for the pending eager ops before taking each timestamp,
+            so that the times include the execution of the ops and not only their
+            dispatch. This serializes the eager pipeline at every submodule boundary and
+            slows the profiled steps down. Default: ``False``
+
+    .. note::
+        The backward of a module is timed from the arrival of the gradients of its outputs
+        to the departure of the gradients of its inputs. If none of the inputs of a module
+        requires grad (e.g. the first layer of a model), its backward is not measured:
+        ``backward_calls`` stays 0 and the table shows ``-`` as its backward time.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import oneflow as flow
+        >>> model = flow.nn.Sequential(flow.nn.Linear(8, 16), flow.nn.ReLU(), flow.nn.Linear(16, 4))
+        >>> with flow.utils.module_profiler(model) as prof:
+        ...     model(flow.randn(2, 8)).sum().backward()
+        >>> print(prof.table(sort_by="forward_time_total"))  # doctest: +SKIP
+
+    """
+
+    def __init__(self, model, synchronize=False):
+        self.model = model
+        self.synchronize = synchronize
+        self._handles = []
+        self._stats = None
+
+    def _now(self):
+        if self.synchronize:
+            flow._oneflow_internal.eager.Sync()
+        return time.perf_counter()
+
+    def _register(self, module, stats):
+        forward_starts = []
+        backward_starts = []
+
+        def forward_pre_hook(module, inputs):
+            forward_starts.append(self._now())
+
+        def forward_hook(module, inputs, output):
+            stats.forward_time_total += (self._now() - forward_starts.pop()) * 1000
+            stats.forward_calls += 1
+            stats.activation_bytes += _output_bytes(output)
+
+        def backward_pre_hook(module, grad_output):
+            backward_starts.append(self._now())
+
+        def backward_hook(module, grad_input, grad_output):
+            start = backward_starts.pop()
+            if all(grad is None for grad in grad_input):
+                # no gradient leaves the module, so there is no backward to time
+                return
+            stats.backward_time_total += (self._now() - start) * 1000
+            stats.backward_calls += 1
+
+        self._handles.append(module.register_forward_pre_hook(forward_pre_hook))
+        self._handles.append(module.register_forward_hook(forward_hook))
+        self._handles.append(module.register_full_backward_pre_hook(backward_pre_hook))
+        self._handles.append(module.register_full_backward_hook(backward_hook))
+
+    def __enter__(self):
+        self._stats = []
+        for (name, module) in self.model.named_modules():
+            stats = ModuleStats(
+                name if name != "" else type(module).__name__, type(module).__name__
+            )
+            self._register(module, stats)
+            self._stats.append((module, stats))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+        for (module, stats) in self._stats:
+            for param in module.parameters():
+                stats.param_bytes += _tensor_bytes(param)
+                if param.grad is not None:
+                    stats.grad_bytes += _tensor_bytes(param.grad)
+
+    def stats(self):
+        r"""Returns the list of :class:`ModuleStats` in the order of ``model.named_modules()``."""
+        assert self._stats is not None, "the module profiler has not been entered"
+        return [stats for (_, stats) in self._stats]
+
+    def table(self, sort_by=None, row_limit=-1):
+        r"""Returns the statistics as a printable table.
+
+        Args:
+            sort_by (str): one of ``forward_time_total``, ``backward_time_total``,
+                ``activation_bytes``, ``param_bytes`` and ``grad_bytes``. The modules are
+                listed in the order of ``model.named_modules()`` if it is ``None``.
+            row_limit (int): the maximal number of rows, ``-1`` means no limit.
+        """
+        # imported here, flow.profiler is only loaded on first use
+        from oneflow.profiler.events import _format_bytes, _format_table, _format_time
+
+        items = self.stats()
+        if sort_by is not None:
+            assert sort_by in _SORT_KEYS, "sort_by must be one of {}".format(_SORT_KEYS)
+            items = sorted(items, key=lambda s: getattr(s, sort_by), reverse=True)
+        if row_limit >= 0:
+            items = items[:row_limit]
+        headers = [
+            "Module",
+            "Type",
+            "Calls",
+            "Forward",
+            "Backward",
+            "Activations",
+            "Params",
+            "Grads",
+        ]
+        rows = [
+            [
+                s.name,
+                s.module_type,
+                str(s.forward_calls),
+                _format_time(s.forward_time_total * 1e3),
+                _format_time(s.backward_time_total * 1e3)
+                if s.backward_calls > 0
+                else "-",
+                _format_bytes(s.activation_bytes),
+                _format_bytes(s.param_bytes),
+                _format_bytes(s.grad_bytes),
+            ]
+            for s in items
+        ]
+        return _format_table(headers, rows)